@@ -0,0 +1,56 @@
+"""Bitacora de cambios de estado de cuota (sincronizacion de cartera set-based).
+
+Revision ID: 086_cuota_estado_cambios
+Revises: 085_aseguradora_universo
+Create Date: 2026-10-19
+
+`sincronizar_estado_cuotas_cartera` (motor SQL) inserta aqui las cuotas cuyo estado cambia
+en cada corrida (INSERT ... SELECT) antes del UPDATE por rango de id.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "086_cuota_estado_cambios"
+down_revision = "085_aseguradora_universo"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("cuota_estado_cambios"):
+        return
+    op.create_table(
+        "cuota_estado_cambios",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("corrida_id", sa.String(length=36), nullable=False),
+        sa.Column("cuota_id", sa.Integer(), nullable=False),
+        sa.Column("prestamo_id", sa.Integer(), nullable=False),
+        sa.Column("estado_anterior", sa.String(length=20), nullable=True),
+        sa.Column("estado_nuevo", sa.String(length=20), nullable=False),
+        sa.Column("fecha_referencia", sa.Date(), nullable=False),
+        sa.Column("motor", sa.String(length=10), nullable=False),
+        sa.Column(
+            "creado_en",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.create_index("ix_cuota_estado_cambios_corrida_id", "cuota_estado_cambios", ["corrida_id"])
+    op.create_index("ix_cuota_estado_cambios_cuota_id", "cuota_estado_cambios", ["cuota_id"])
+    op.create_index("ix_cuota_estado_cambios_prestamo_id", "cuota_estado_cambios", ["prestamo_id"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("cuota_estado_cambios"):
+        return
+    op.drop_index("ix_cuota_estado_cambios_prestamo_id", table_name="cuota_estado_cambios")
+    op.drop_index("ix_cuota_estado_cambios_cuota_id", table_name="cuota_estado_cambios")
+    op.drop_index("ix_cuota_estado_cambios_corrida_id", table_name="cuota_estado_cambios")
+    op.drop_table("cuota_estado_cambios")
@@ -0,0 +1,62 @@
+"""Resumen por prestamo de cuotas (prestamo_saldos).
+
+Revision ID: 087_prestamo_saldos
+Revises: 086_cuota_estado_cambios
+Create Date: 2026-10-19
+
+Una fila por prestamo con totales de cuotas (monto, pagado, saldo, atraso, ultimo pago).
+La mantiene app.services.prestamo_saldos (cascada de pagos y editores de cuota) y la
+verifica/repara el job nocturno. El backfill inicial lo hace el primer job o
+POST /auditoria/prestamos/cartera/verificar-saldos-resumen; no se llena en la migracion.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "087_prestamo_saldos"
+down_revision = "086_cuota_estado_cambios"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("prestamo_saldos"):
+        return
+    op.create_table(
+        "prestamo_saldos",
+        sa.Column(
+            "prestamo_id",
+            sa.Integer(),
+            sa.ForeignKey("prestamos.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("cuotas_total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cuotas_pagadas", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_monto", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("total_pagado", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("saldo_pendiente", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("cuotas_vencidas", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_dias_atraso", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("fecha_vencimiento_pendiente_min", sa.Date(), nullable=True),
+        sa.Column("ultima_fecha_pago", sa.Date(), nullable=True),
+        sa.Column("fecha_referencia", sa.Date(), nullable=False),
+        sa.Column(
+            "actualizado_en",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+    op.create_index("ix_prestamo_saldos_cuotas_vencidas", "prestamo_saldos", ["cuotas_vencidas"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("prestamo_saldos"):
+        return
+    op.drop_index("ix_prestamo_saldos_cuotas_vencidas", table_name="prestamo_saldos")
+    op.drop_table("prestamo_saldos")
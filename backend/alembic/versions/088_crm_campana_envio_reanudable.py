@@ -0,0 +1,70 @@
+"""Envio de campañas CRM reanudable: destinatarios materializados con estado y cursor.
+
+Revision ID: 088_crm_campana_envio_reanudable
+Revises: 087_prestamo_saldos
+Create Date: 2026-10-19
+
+crm_campana_destinatario: emails resueltos, estado por destinatario y reclamado_en (claim con SKIP LOCKED).
+crm_campana: destinatarios_modo, cursor de materializacion, bandera de materializacion completa y latido.
+Las filas existentes (campañas con seleccion) quedan en estado 'pendiente' con emails NULL; se resuelven
+al iniciar el envio.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "088_crm_campana_envio_reanudable"
+down_revision = "087_prestamo_saldos"
+branch_labels = None
+depends_on = None
+
+_DEST_COLS = (
+    ("emails", sa.Text(), {"nullable": True}),
+    ("estado", sa.String(20), {"nullable": False, "server_default": "pendiente"}),
+    ("reclamado_en", sa.DateTime(timezone=False), {"nullable": True}),
+)
+_CAMP_COLS = (
+    ("destinatarios_modo", sa.String(20), {"nullable": True}),
+    ("destinatarios_cursor", sa.Integer(), {"nullable": True}),
+    ("destinatarios_materializados", sa.Boolean(), {"nullable": False, "server_default": sa.false()}),
+    ("envio_heartbeat", sa.DateTime(timezone=False), {"nullable": True}),
+)
+_IX = "ix_crm_campana_dest_campana_estado_id"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    dest = {c["name"] for c in insp.get_columns("crm_campana_destinatario")}
+    for name, type_, kw in _DEST_COLS:
+        if name not in dest:
+            op.add_column("crm_campana_destinatario", sa.Column(name, type_, **kw))
+    camp = {c["name"] for c in insp.get_columns("crm_campana")}
+    for name, type_, kw in _CAMP_COLS:
+        if name not in camp:
+            op.add_column("crm_campana", sa.Column(name, type_, **kw))
+    if _IX not in {ix["name"] for ix in insp.get_indexes("crm_campana_destinatario")}:
+        op.create_index(_IX, "crm_campana_destinatario", ["campana_id", "estado", "id"])
+    # Campañas ya creadas: seleccion explicita si tienen filas; el resto, todos.
+    op.execute(
+        "UPDATE crm_campana SET destinatarios_modo = 'seleccion' "
+        "WHERE destinatarios_modo IS NULL AND EXISTS "
+        "(SELECT 1 FROM crm_campana_destinatario d WHERE d.campana_id = crm_campana.id)"
+    )
+    op.execute("UPDATE crm_campana SET destinatarios_modo = 'todos' WHERE destinatarios_modo IS NULL")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if _IX in {ix["name"] for ix in insp.get_indexes("crm_campana_destinatario")}:
+        op.drop_index(_IX, table_name="crm_campana_destinatario")
+    dest = {c["name"] for c in insp.get_columns("crm_campana_destinatario")}
+    for name, _, _ in reversed(_DEST_COLS):
+        if name in dest:
+            op.drop_column("crm_campana_destinatario", name)
+    camp = {c["name"] for c in insp.get_columns("crm_campana")}
+    for name, _, _ in reversed(_CAMP_COLS):
+        if name in camp:
+            op.drop_column("crm_campana", name)
@@ -0,0 +1,56 @@
+"""Veredicto materializado de la cola manual en pagos_reportados.
+
+Revision ID: 089_pagos_reportados_veredicto
+Revises: 088_crm_campana_envio_reanudable
+Create Date: 2026-10-19
+
+cola_manual, dedup_lider_id, validadores_fallidos, prestamo_objetivo_id y veredicto_en.
+Filas existentes quedan con veredicto_en NULL: el listado usa el barrido anterior hasta que
+el job de reconciliacion (o el refresco acotado del propio listado) las calcule.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "089_pagos_reportados_veredicto"
+down_revision = "088_crm_campana_envio_reanudable"
+branch_labels = None
+depends_on = None
+
+_COLS = (
+    ("cola_manual", sa.Boolean()),
+    ("dedup_lider_id", sa.Integer()),
+    ("validadores_fallidos", sa.String(255)),
+    ("prestamo_objetivo_id", sa.Integer()),
+    ("veredicto_en", sa.DateTime(timezone=False)),
+)
+_IX_COLA = "ix_pagos_reportados_estado_cola_manual_created"
+_IX_LIDER = "ix_pagos_reportados_dedup_lider_id"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    cols = {c["name"] for c in insp.get_columns("pagos_reportados")}
+    for name, type_ in _COLS:
+        if name not in cols:
+            op.add_column("pagos_reportados", sa.Column(name, type_, nullable=True))
+    ixs = {ix["name"] for ix in insp.get_indexes("pagos_reportados")}
+    if _IX_COLA not in ixs:
+        op.create_index(_IX_COLA, "pagos_reportados", ["estado", "cola_manual", "created_at"])
+    if _IX_LIDER not in ixs:
+        op.create_index(_IX_LIDER, "pagos_reportados", ["dedup_lider_id"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    ixs = {ix["name"] for ix in insp.get_indexes("pagos_reportados")}
+    for ix in (_IX_LIDER, _IX_COLA):
+        if ix in ixs:
+            op.drop_index(ix, table_name="pagos_reportados")
+    cols = {c["name"] for c in insp.get_columns("pagos_reportados")}
+    for name, _ in reversed(_COLS):
+        if name in cols:
+            op.drop_column("pagos_reportados", name)
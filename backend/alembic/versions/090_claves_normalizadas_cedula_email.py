@@ -0,0 +1,74 @@
+"""Índices de expresión para búsquedas por cédula normalizada y por correo (trim + minúsculas).
+
+Revision ID: 090_claves_normalizadas_cedula_email
+Revises: 089_pagos_reportados_veredicto
+Create Date: 2026-10-19
+
+`expr_cedula_normalizada_para_comparar` (app.utils.cedula_almacenamiento) y
+`expr_email_normalizado_para_comparar` (app.utils.cliente_emails) envuelven la columna en funciones;
+sin índice sobre la misma expresión cada búsqueda (portales públicos, estado de cuenta, evidencias,
+dedup de cobros) es un seq scan. Estos índices repiten exactamente esas expresiones (constantes
+literales), así que no hay columnas extra que mantener al escribir.
+
+Solo PostgreSQL (regexp_replace); en otros motores la migración no hace nada.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+from sqlalchemy import inspect
+
+revision = "090_claves_normalizadas_cedula_email"
+down_revision = "089_pagos_reportados_veredicto"
+branch_labels = None
+depends_on = None
+
+
+def expr_cedula_sql(col_sql: str) -> str:
+    """Misma expresión que `expr_cedula_normalizada_para_comparar` en PostgreSQL."""
+    return (
+        "regexp_replace(replace(replace(replace(upper(trim(coalesce("
+        + col_sql
+        + ", ''))), '-', ''), '.', ''), ' ', ''), '[^VEGJ0-9]', '', 'g')"
+    )
+
+
+def expr_email_sql(col_sql: str) -> str:
+    """Misma expresión que `expr_email_normalizado_para_comparar`."""
+    return f"lower(trim({col_sql}))"
+
+
+# (tabla, nombre del índice, expresión)
+INDICES = (
+    ("clientes", "ix_clientes_cedula_norm", expr_cedula_sql("cedula")),
+    ("prestamos", "ix_prestamos_cedula_norm", expr_cedula_sql("cedula")),
+    ("pagos", "ix_pagos_cedula_cliente_norm", expr_cedula_sql("cedula_cliente")),
+    (
+        "pagos_reportados",
+        "ix_pagos_reportados_cedula_norm",
+        expr_cedula_sql("coalesce(tipo_cedula, '') || coalesce(numero_cedula, '')"),
+    ),
+    ("clientes", "ix_clientes_email_norm", expr_email_sql("email")),
+    ("clientes", "ix_clientes_email_secundario_norm", expr_email_sql("email_secundario")),
+    ("envios_notificacion", "ix_envios_notificacion_email_norm", expr_email_sql("email")),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    insp = inspect(bind)
+    tablas = set(insp.get_table_names())
+    for tabla, nombre, expr in INDICES:
+        if tabla not in tablas:
+            continue
+        op.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} (({expr}))")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for _tabla, nombre, _expr in INDICES:
+        op.execute(f"DROP INDEX IF EXISTS {nombre}")
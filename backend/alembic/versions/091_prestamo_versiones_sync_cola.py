@@ -0,0 +1,53 @@
+"""Versión por préstamo (cache de estado de cuenta) y cola de sincronización de pagos.
+
+Revision ID: 091_prestamo_versiones_sync_cola
+Revises: 090_claves_normalizadas_cedula_email
+Create Date: 2026-10-19
+
+- prestamo_versiones: contador por préstamo que sube con cada cambio de cuotas/pagos/cliente.
+- prestamos_sync_pendiente: préstamos con pagos por aplicar a cuotas; la drena el job
+  prestamos_sync_cola. El barrido horario encola lo que ya estuviera pendiente al migrar.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "091_prestamo_versiones_sync_cola"
+down_revision = "090_claves_normalizadas_cedula_email"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("prestamo_versiones"):
+        op.create_table(
+            "prestamo_versiones",
+            sa.Column("prestamo_id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"),
+            sa.Column("actualizado_en", sa.DateTime(timezone=False), nullable=False, server_default=sa.text("now()")),
+        )
+    if not insp.has_table("prestamos_sync_pendiente"):
+        op.create_table(
+            "prestamos_sync_pendiente",
+            sa.Column("prestamo_id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("encolado_en", sa.DateTime(timezone=False), nullable=False, server_default=sa.text("now()")),
+            sa.Column("reclamado_en", sa.DateTime(timezone=False), nullable=True),
+            sa.Column("intentos", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("ultimo_error", sa.String(500), nullable=True),
+        )
+        op.create_index(
+            "ix_prestamos_sync_pendiente_encolado_en", "prestamos_sync_pendiente", ["encolado_en"]
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("prestamos_sync_pendiente"):
+        op.drop_index("ix_prestamos_sync_pendiente_encolado_en", table_name="prestamos_sync_pendiente")
+        op.drop_table("prestamos_sync_pendiente")
+    if insp.has_table("prestamo_versiones"):
+        op.drop_table("prestamo_versiones")
@@ -0,0 +1,50 @@
+"""Historial de ejecuciones de jobs programados.
+
+Revision ID: 092_scheduler_job_runs
+Revises: 091_prestamo_versiones_sync_cola
+Create Date: 2026-10-19
+
+- scheduler_job_runs: una fila por corrida (inicio/fin, duración, espera por exclusión, filas, resultado)
+  y por misfire u omisión; la escribe app/core/scheduler.py.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "092_scheduler_job_runs"
+down_revision = "091_prestamo_versiones_sync_cola"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("scheduler_job_runs"):
+        op.create_table(
+            "scheduler_job_runs",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("job_id", sa.String(120), nullable=False),
+            sa.Column("clase", sa.String(20), nullable=True),
+            sa.Column("programado_para", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("inicio", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+            sa.Column("fin", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("duracion_ms", sa.Integer(), nullable=True),
+            sa.Column("espera_exclusion_ms", sa.Integer(), nullable=True),
+            sa.Column("retraso_ms", sa.Integer(), nullable=True),
+            sa.Column("filas", sa.Integer(), nullable=True),
+            sa.Column("resultado", sa.String(30), nullable=False),
+            sa.Column("error", sa.Text(), nullable=True),
+        )
+        op.create_index("ix_scheduler_job_runs_job_id", "scheduler_job_runs", ["job_id"])
+        op.create_index("ix_scheduler_job_runs_inicio", "scheduler_job_runs", ["inicio"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("scheduler_job_runs"):
+        op.drop_index("ix_scheduler_job_runs_inicio", table_name="scheduler_job_runs")
+        op.drop_index("ix_scheduler_job_runs_job_id", table_name="scheduler_job_runs")
+        op.drop_table("scheduler_job_runs")
@@ -0,0 +1,78 @@
+"""Sync incremental de la hoja CONCILIACIÓN: hash por fila, baja lógica y cambios por corrida.
+
+Revision ID: 093_conciliacion_sheet_sync_incremental
+Revises: 092_scheduler_job_runs
+Create Date: 2026-10-19
+
+- conciliacion_sheet_rows / drive: row_hash (sha256 del contenido) y eliminado_en (fila ya no está en la hoja).
+  Las filas existentes quedan con row_hash NULL: el primer sync tras la migración las reescribe una vez.
+- conciliacion_sheet_sync_run: filas_nuevas / filas_modificadas / filas_eliminadas por corrida.
+- conciliacion_sheet_cambios: change set por corrida (fila, tipo, cédula antes/después) para jobs posteriores.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "093_conciliacion_sheet_sync_incremental"
+down_revision = "092_scheduler_job_runs"
+branch_labels = None
+depends_on = None
+
+_TABLAS_SNAPSHOT = ("conciliacion_sheet_rows", "drive")
+_CONTADORES_RUN = ("filas_nuevas", "filas_modificadas", "filas_eliminadas")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    for tabla in _TABLAS_SNAPSHOT:
+        if not insp.has_table(tabla):
+            continue
+        cols = {c["name"] for c in insp.get_columns(tabla)}
+        if "row_hash" not in cols:
+            op.add_column(tabla, sa.Column("row_hash", sa.String(64), nullable=True))
+        if "eliminado_en" not in cols:
+            op.add_column(tabla, sa.Column("eliminado_en", sa.DateTime(timezone=True), nullable=True))
+
+    if insp.has_table("conciliacion_sheet_sync_run"):
+        cols = {c["name"] for c in insp.get_columns("conciliacion_sheet_sync_run")}
+        for nombre in _CONTADORES_RUN:
+            if nombre not in cols:
+                op.add_column("conciliacion_sheet_sync_run", sa.Column(nombre, sa.Integer(), nullable=True))
+
+    if not insp.has_table("conciliacion_sheet_cambios"):
+        op.create_table(
+            "conciliacion_sheet_cambios",
+            sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+            sa.Column("run_id", sa.BigInteger(), nullable=False),
+            sa.Column("sheet_row_number", sa.Integer(), nullable=False),
+            sa.Column("tipo", sa.String(12), nullable=False),
+            sa.Column("cedula", sa.String(40), nullable=True),
+            sa.Column("cedula_anterior", sa.String(40), nullable=True),
+            sa.Column("creado_en", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        )
+        op.create_index("ix_conciliacion_sheet_cambios_run_id", "conciliacion_sheet_cambios", ["run_id"])
+        op.create_index("ix_conciliacion_sheet_cambios_creado_en", "conciliacion_sheet_cambios", ["creado_en"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("conciliacion_sheet_cambios"):
+        op.drop_index("ix_conciliacion_sheet_cambios_creado_en", table_name="conciliacion_sheet_cambios")
+        op.drop_index("ix_conciliacion_sheet_cambios_run_id", table_name="conciliacion_sheet_cambios")
+        op.drop_table("conciliacion_sheet_cambios")
+    if insp.has_table("conciliacion_sheet_sync_run"):
+        cols = {c["name"] for c in insp.get_columns("conciliacion_sheet_sync_run")}
+        for nombre in _CONTADORES_RUN:
+            if nombre in cols:
+                op.drop_column("conciliacion_sheet_sync_run", nombre)
+    for tabla in _TABLAS_SNAPSHOT:
+        if not insp.has_table(tabla):
+            continue
+        cols = {c["name"] for c in insp.get_columns(tabla)}
+        if "eliminado_en" in cols:
+            op.drop_column(tabla, "eliminado_en")
+        if "row_hash" in cols:
+            op.drop_column(tabla, "row_hash")
@@ -0,0 +1,72 @@
+"""Listas de elegibles de Notificaciones materializadas por día y segmento.
+
+Revision ID: 094_notificacion_elegibles_dia
+Revises: 093_conciliacion_sheet_sync_incremental
+Create Date: 2026-10-19
+
+- notificacion_elegibles_dia: un ítem por fila (payload JSON + item_hash), único por (fecha, segmento, clave).
+- notificacion_elegibles_estado: última materialización por (fecha, segmento): total, hash de lista, inicio/fin.
+- ix_prestamo_versiones_actualizado_en: la frescura compara max(actualizado_en) con el inicio del cálculo.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "094_notificacion_elegibles_dia"
+down_revision = "093_conciliacion_sheet_sync_incremental"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("notificacion_elegibles_dia"):
+        op.create_table(
+            "notificacion_elegibles_dia",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("fecha_referencia", sa.Date(), nullable=False),
+            sa.Column("segmento", sa.String(40), nullable=False),
+            sa.Column("clave", sa.String(80), nullable=False),
+            sa.Column("posicion", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("prestamo_id", sa.Integer(), nullable=True),
+            sa.Column("cliente_id", sa.Integer(), nullable=True),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("item_hash", sa.String(64), nullable=False),
+            sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+            sa.UniqueConstraint("fecha_referencia", "segmento", "clave", name="uq_notificacion_elegibles_dia_clave"),
+        )
+        op.create_index(
+            "ix_notificacion_elegibles_dia_prestamo_id", "notificacion_elegibles_dia", ["prestamo_id"]
+        )
+    if not insp.has_table("notificacion_elegibles_estado"):
+        op.create_table(
+            "notificacion_elegibles_estado",
+            sa.Column("fecha_referencia", sa.Date(), primary_key=True),
+            sa.Column("segmento", sa.String(40), primary_key=True),
+            sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("lista_hash", sa.String(64), nullable=True),
+            sa.Column("calculado_desde", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("calculado_en", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("duracion_ms", sa.Integer(), nullable=True),
+            sa.Column("filas_cambiadas", sa.Integer(), nullable=True),
+        )
+    if insp.has_table("prestamo_versiones"):
+        idx = {i["name"] for i in insp.get_indexes("prestamo_versiones")}
+        if "ix_prestamo_versiones_actualizado_en" not in idx:
+            op.create_index("ix_prestamo_versiones_actualizado_en", "prestamo_versiones", ["actualizado_en"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("prestamo_versiones"):
+        idx = {i["name"] for i in insp.get_indexes("prestamo_versiones")}
+        if "ix_prestamo_versiones_actualizado_en" in idx:
+            op.drop_index("ix_prestamo_versiones_actualizado_en", table_name="prestamo_versiones")
+    if insp.has_table("notificacion_elegibles_estado"):
+        op.drop_table("notificacion_elegibles_estado")
+    if insp.has_table("notificacion_elegibles_dia"):
+        op.drop_index("ix_notificacion_elegibles_dia_prestamo_id", table_name="notificacion_elegibles_dia")
+        op.drop_table("notificacion_elegibles_dia")
@@ -0,0 +1,49 @@
+"""Pares de numero_documento similares por préstamo LIQUIDADO, persistidos con firma por préstamo.
+
+Revision ID: 095_auditoria_docs_similares
+Revises: 094_notificacion_elegibles_dia
+Create Date: 2026-10-19
+
+- auditoria_docs_similares_pares: (prestamo_id, pago_id_a, pago_id_b) con ratio >= umbral base.
+- auditoria_docs_similares_estado: firma de los documentos analizados por préstamo (recálculo incremental).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "095_auditoria_docs_similares"
+down_revision = "094_notificacion_elegibles_dia"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("auditoria_docs_similares_pares"):
+        op.create_table(
+            "auditoria_docs_similares_pares",
+            sa.Column("prestamo_id", sa.Integer(), primary_key=True),
+            sa.Column("pago_id_a", sa.Integer(), primary_key=True),
+            sa.Column("pago_id_b", sa.Integer(), primary_key=True),
+            sa.Column("similitud", sa.Float(), nullable=False),
+        )
+    if not insp.has_table("auditoria_docs_similares_estado"):
+        op.create_table(
+            "auditoria_docs_similares_estado",
+            sa.Column("prestamo_id", sa.Integer(), primary_key=True),
+            sa.Column("firma", sa.String(64), nullable=False),
+            sa.Column("umbral_base", sa.Float(), nullable=False),
+            sa.Column("n_pagos_con_documento", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("calculado_en", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("auditoria_docs_similares_estado"):
+        op.drop_table("auditoria_docs_similares_estado")
+    if insp.has_table("auditoria_docs_similares_pares"):
+        op.drop_table("auditoria_docs_similares_pares")
@@ -0,0 +1,56 @@
+"""Snapshot de hallazgos de cierre de préstamos LIQUIDADO (auditoría intensiva).
+
+Revision ID: 096_auditoria_liquidados_hallazgos
+Revises: 095_auditoria_docs_similares
+Create Date: 2026-10-19
+
+- auditoria_liquidados_hallazgos: una fila por (prestamo_id, codigo) con datos del préstamo desnormalizados;
+  índices por código y por cédula normalizada para filtrar y contar en SQL.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "096_auditoria_liquidados_hallazgos"
+down_revision = "095_auditoria_docs_similares"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("auditoria_liquidados_hallazgos"):
+        op.create_table(
+            "auditoria_liquidados_hallazgos",
+            sa.Column("prestamo_id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("codigo", sa.String(80), primary_key=True),
+            sa.Column("orden", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("titulo", sa.String(200), nullable=False),
+            sa.Column("detalle", sa.String(500), nullable=True),
+            sa.Column("cliente_id", sa.Integer(), nullable=True),
+            sa.Column("cedula", sa.String(40), nullable=True),
+            sa.Column("cedula_busqueda", sa.String(40), nullable=True),
+            sa.Column("nombres", sa.String(255), nullable=True),
+            sa.Column("estado_prestamo", sa.String(40), nullable=True),
+            sa.Column("cliente_email", sa.String(255), nullable=True),
+            sa.Column("calculado_en", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        )
+        op.create_index(
+            "ix_auditoria_liquidados_hallazgos_codigo", "auditoria_liquidados_hallazgos", ["codigo"]
+        )
+        op.create_index(
+            "ix_auditoria_liquidados_hallazgos_cedula_busqueda",
+            "auditoria_liquidados_hallazgos",
+            ["cedula_busqueda"],
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("auditoria_liquidados_hallazgos"):
+        op.drop_index("ix_auditoria_liquidados_hallazgos_cedula_busqueda", table_name="auditoria_liquidados_hallazgos")
+        op.drop_index("ix_auditoria_liquidados_hallazgos_codigo", table_name="auditoria_liquidados_hallazgos")
+        op.drop_table("auditoria_liquidados_hallazgos")
@@ -0,0 +1,69 @@
+"""Clave de identidad por teléfono en clientes (últimos 10 dígitos) con índice y backfill.
+
+Revision ID: 097_clientes_telefono_clave
+Revises: 096_auditoria_liquidados_hallazgos
+Create Date: 2026-10-19
+
+- clientes.telefono_clave: solo dígitos de telefono; >= 10 dígitos -> últimos 10, 8-9 -> completo, < 8 -> NULL
+  (misma regla que app/utils/cliente_telefonos.clave_telefono).
+- ix_clientes_telefono_clave: resolución teléfono -> cliente en Comunicaciones, webhook y altas.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "097_clientes_telefono_clave"
+down_revision = "096_auditoria_liquidados_hallazgos"
+branch_labels = None
+depends_on = None
+
+
+def _clave(telefono):
+    digitos = "".join(ch for ch in (telefono or "") if ch.isdigit())
+    return digitos[-10:] if len(digitos) >= 8 else None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("clientes"):
+        return
+    columnas = {c["name"] for c in insp.get_columns("clientes")}
+    if "telefono_clave" not in columnas:
+        op.add_column("clientes", sa.Column("telefono_clave", sa.String(10), nullable=True))
+
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            r"""
+            UPDATE clientes
+            SET telefono_clave = RIGHT(regexp_replace(telefono, '\D', '', 'g'), 10)
+            WHERE length(regexp_replace(COALESCE(telefono, ''), '\D', '', 'g')) >= 8
+              AND telefono_clave IS DISTINCT FROM RIGHT(regexp_replace(telefono, '\D', '', 'g'), 10)
+            """
+        )
+    else:
+        filas = bind.execute(sa.text("SELECT id, telefono FROM clientes")).fetchall()
+        for cid, telefono in filas:
+            clave = _clave(telefono)
+            if clave is not None:
+                bind.execute(
+                    sa.text("UPDATE clientes SET telefono_clave = :k WHERE id = :id"), {"k": clave, "id": cid}
+                )
+
+    idx = {i["name"] for i in insp.get_indexes("clientes")}
+    if "ix_clientes_telefono_clave" not in idx:
+        op.create_index("ix_clientes_telefono_clave", "clientes", ["telefono_clave"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("clientes"):
+        return
+    idx = {i["name"] for i in insp.get_indexes("clientes")}
+    if "ix_clientes_telefono_clave" in idx:
+        op.drop_index("ix_clientes_telefono_clave", table_name="clientes")
+    columnas = {c["name"] for c in insp.get_columns("clientes")}
+    if "telefono_clave" in columnas:
+        op.drop_column("clientes", "telefono_clave")
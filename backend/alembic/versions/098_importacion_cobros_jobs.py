@@ -0,0 +1,56 @@
+"""Jobs reanudables de importación de reportados aprobados (Cobros) a pagos.
+
+Revision ID: 098_importacion_cobros_jobs
+Revises: 097_clientes_telefono_clave
+Create Date: 2026-10-19
+
+- importacion_cobros_jobs: estado, cursor por pagos_reportados.id, tope del job, contadores del resumen,
+  detalle JSON y latido/ejecutor del hilo que procesa (POST /pagos/importar-desde-cobros).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "098_importacion_cobros_jobs"
+down_revision = "097_clientes_telefono_clave"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("importacion_cobros_jobs"):
+        op.create_table(
+            "importacion_cobros_jobs",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("estado", sa.String(20), nullable=False, server_default="en_proceso"),
+            sa.Column("usuario_email", sa.String(255), nullable=True),
+            sa.Column("usuario_rol", sa.String(20), nullable=True),
+            sa.Column("cursor_reportado_id", sa.Integer(), nullable=True),
+            sa.Column("hasta_reportado_id", sa.Integer(), nullable=True),
+            sa.Column("total_estimado", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("reportados_revisados", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("tramos", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("registros_procesados", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("registros_con_error", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("operaciones_cuota_total", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("pagos_con_aplicacion_a_cuotas", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("pagos_sin_aplicacion_cuotas_total", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("detalle", sa.Text(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("ejecutor", sa.String(36), nullable=True),
+            sa.Column("creado_en", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+            sa.Column("latido", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finalizado_en", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_importacion_cobros_jobs_estado", "importacion_cobros_jobs", ["estado"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("importacion_cobros_jobs"):
+        op.drop_index("ix_importacion_cobros_jobs_estado", table_name="importacion_cobros_jobs")
+        op.drop_table("importacion_cobros_jobs")
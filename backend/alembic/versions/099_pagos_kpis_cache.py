@@ -0,0 +1,42 @@
+"""Cache de KPIs y estadísticas de pagos (GET /pagos/kpis, /pagos/stats).
+
+Revision ID: 099_pagos_kpis_cache
+Revises: 098_importacion_cobros_jobs
+Create Date: 2026-10-19
+
+- pagos_kpis_cache: una fila por (tipo, parámetros); marca = suma de prestamo_versiones.version al calcular.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "099_pagos_kpis_cache"
+down_revision = "098_importacion_cobros_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("pagos_kpis_cache"):
+        op.create_table(
+            "pagos_kpis_cache",
+            sa.Column("clave", sa.String(64), primary_key=True),
+            sa.Column("tipo", sa.String(10), nullable=False),
+            sa.Column("parametros", sa.Text(), nullable=False),
+            sa.Column("fecha_referencia", sa.Date(), nullable=False),
+            sa.Column("marca", sa.BigInteger(), nullable=False),
+            sa.Column("datos", sa.Text(), nullable=False),
+            sa.Column("calculado_en", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        )
+        op.create_index("ix_pagos_kpis_cache_calculado_en", "pagos_kpis_cache", ["calculado_en"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if insp.has_table("pagos_kpis_cache"):
+        op.drop_index("ix_pagos_kpis_cache_calculado_en", table_name="pagos_kpis_cache")
+        op.drop_table("pagos_kpis_cache")
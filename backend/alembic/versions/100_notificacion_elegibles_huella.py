@@ -0,0 +1,39 @@
+"""Huella de prestamo_versiones bajo la marca de elegibles de Notificaciones.
+
+Revision ID: 100_notificacion_elegibles_huella
+Revises: 099_pagos_kpis_cache
+Create Date: 2026-10-19
+
+- notificacion_elegibles_estado.calculado_huella: huella_versiones de la ventana bajo calculado_desde; si
+  cambia, una transacción confirmó tarde por debajo de la marca y el parche relee esa ventana. NULL en filas
+  previas: la siguiente lectura relee la ventana una vez y la completa.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "100_notificacion_elegibles_huella"
+down_revision = "099_pagos_kpis_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("notificacion_elegibles_estado"):
+        return
+    columnas = {c["name"] for c in insp.get_columns("notificacion_elegibles_estado")}
+    if "calculado_huella" not in columnas:
+        op.add_column("notificacion_elegibles_estado", sa.Column("calculado_huella", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if not insp.has_table("notificacion_elegibles_estado"):
+        return
+    columnas = {c["name"] for c in insp.get_columns("notificacion_elegibles_estado")}
+    if "calculado_huella" in columnas:
+        op.drop_column("notificacion_elegibles_estado", "calculado_huella")
@@ -4,7 +4,8 @@ Endpoints de auditoria.
 - Tabla `auditoria`: GET listado, GET stats, GET exportar, GET /{id}, POST /registrar.
 - Cartera (prestamos/cartera/*): chequeos paginados, resumen sin items, meta persistida, ejecutar/corregir,
   POST sincronizar-estados-cuotas (solo alinea cuotas.estado, sin meta ni controles).
-- Liquidados intensiva: GET `/prestamos/liquidados/auditoria-intensiva` (cartera solo LIQUIDADO + hallazgos de cierre).
+- Liquidados intensiva: GET `/prestamos/liquidados/auditoria-intensiva` (cartera solo LIQUIDADO + hallazgos de cierre
+  desde snapshot); POST `/prestamos/liquidados/cierre/refrescar` recalcula el snapshot (todo o un prestamo).
   Ver `docs/auditoria-api-cartera.md` para contrato y parametros (`solo_alertas` es historico y no filtra).
 """
 import io
@@ -53,6 +54,11 @@ from app.services.pago_control5_visto_service import (
 from app.services.auditoria_liquidados_docs_similares import (
     documentos_similares_liquidados,
 )
+from app.services.auditoria_liquidados_cierre_snapshot import (
+    listar_hallazgos_cierre,
+    refrescar_hallazgos_cierre,
+    snapshot_disponible,
+)
 from app.services.auditoria_liquidados_intensiva import (
     cobertura_pagos_prestamos_liquidados,
     filtrar_filas_cierre,
@@ -404,7 +410,8 @@ class LiquidadosCierreChequeoResponse(BaseModel):
         ...,
         description=(
             "Hallazgos de cierre solo para prestamos LIQUIDADO (fecha_liquidado, finiquito_casos, documentos). "
-            "Totales reflejan el filtro (cedula/prestamo_id) antes de paginar; prestamos_listados es la pagina."
+            "Totales reflejan el filtro (cedula/prestamo_id) antes de paginar; prestamos_listados es la pagina. "
+            "fuente: snapshot (auditoria_liquidados_hallazgos, con snapshot_calculado_en) o en_vivo."
         ),
     )
 
@@ -646,6 +653,21 @@ def sincronizar_estados_cuotas_cartera_endpoint(
     )
 
 
+@router.post("/prestamos/cartera/verificar-saldos-resumen", response_model=dict)
+def verificar_saldos_resumen_cartera_endpoint(
+    reparar: bool = Query(True, description="Si True, reescribe filas con diferencias y faltantes."),
+    db: Session = Depends(get_db),
+    _aud: UserResponse = Depends(require_auditoria_cartera_access),
+):
+    """
+    Compara `prestamo_saldos` (resumen por préstamo) con el agregado real de `cuotas`, mismo paso que el job
+    03:30. Con reparar=True también sirve como backfill inicial de la tabla.
+    """
+    from app.services.prestamo_saldos import verificar_prestamo_saldos
+
+    return verificar_prestamo_saldos(db, reparar=reparar)
+
+
 @router.get("/prestamos/cartera/resumen", response_model=AuditoriaCarteraResumenResponse)
 def resumen_auditoria_cartera(
     prestamo_id: Optional[int] = Query(
@@ -808,14 +830,24 @@ def auditoria_intensiva_prestamos_liquidados(
         meta_ultima_corrida=meta,
     )
 
-    hall_full, _ = hallazgos_cierre_prestamos_liquidados(db)
-    hall_filtrado = filtrar_filas_cierre(
-        hall_full,
+    snap = listar_hallazgos_cierre(
+        db,
         prestamo_id=prestamo_id,
         cedula_contiene=cedula,
+        skip=skip,
+        limit=limit,
     )
-    res_global = resumen_cierre_desde_filas(hall_filtrado)
-    hall_page = paginar_filas(hall_filtrado, skip=skip, limit=limit)
+    if snap is not None:
+        hall_page, res_global = snap
+    else:
+        hall_full, _ = hallazgos_cierre_prestamos_liquidados(db)
+        hall_filtrado = filtrar_filas_cierre(
+            hall_full,
+            prestamo_id=prestamo_id,
+            cedula_contiene=cedula,
+        )
+        res_global = {**resumen_cierre_desde_filas(hall_filtrado), "fuente": "en_vivo"}
+        hall_page = paginar_filas(hall_filtrado, skip=skip, limit=limit)
     cierre_resumen = {
         **res_global,
         "pagina_skip": int(skip),
@@ -862,6 +894,20 @@ def auditoria_intensiva_prestamos_liquidados(
     )
 
 
+@router.post("/prestamos/liquidados/cierre/refrescar", response_model=dict)
+def refrescar_snapshot_cierre_liquidados(
+    prestamo_id: Optional[int] = Query(
+        None, ge=1, description="Solo ese prestamo; sin valor se recalcula todo el snapshot (consulta pesada)."
+    ),
+    db: Session = Depends(get_db),
+    _aud: UserResponse = Depends(require_auditoria_cartera_access),
+):
+    """Recalcula el snapshot de hallazgos de cierre (seccion `cierre` de la auditoria intensiva)."""
+    if not snapshot_disponible(db):
+        raise HTTPException(status_code=503, detail="Snapshot de cierre no disponible (falta migracion 096).")
+    return refrescar_hallazgos_cierre(db, prestamo_ids=[prestamo_id] if prestamo_id is not None else None)
+
+
 @router.get(
     "/prestamos/{prestamo_id}/revision-descuadre-pagos-cuotas",
     response_model=RevisionDescuadrePagosCuotasResponse,
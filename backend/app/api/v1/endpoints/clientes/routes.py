@@ -26,8 +26,12 @@ from app.models.estado_cliente import EstadoCliente
 from app.models.prestamo import Prestamo
 from app.schemas.auth import UserResponse
 from app.schemas.cliente import ClienteResponse, ClienteCreate, ClienteUpdate
-from app.utils.cliente_emails import secundario_distinto_del_principal
+from app.utils.cliente_emails import (
+    expr_email_normalizado_para_comparar,
+    secundario_distinto_del_principal,
+)
 from app.utils.cedula_busqueda import cedula_busqueda_canonica
+from app.utils.cliente_telefonos import digitos_telefono, telefono_exacto_registrado
 
 logger = logging.getLogger(__name__)
 router = APIRouter(dependencies=[Depends(get_current_user)])
@@ -604,12 +608,12 @@ def check_emails(
     if not emails_norm:
         return CheckEmailsResponse(existing_emails=[])
     r1 = db.execute(
-        select(func.lower(Cliente.email)).where(func.lower(Cliente.email).in_(emails_norm))
+        select(expr_email_normalizado_para_comparar(Cliente.email)).where(expr_email_normalizado_para_comparar(Cliente.email).in_(emails_norm))
     ).scalars().all()
     r2 = db.execute(
-        select(func.lower(Cliente.email_secundario)).where(
+        select(expr_email_normalizado_para_comparar(Cliente.email_secundario)).where(
             Cliente.email_secundario.isnot(None),
-            func.lower(Cliente.email_secundario).in_(emails_norm),
+            expr_email_normalizado_para_comparar(Cliente.email_secundario).in_(emails_norm),
         )
     ).scalars().all()
     existing = sorted({str(x) for x in (list(r1) + list(r2)) if x})
@@ -652,7 +656,7 @@ def _normalize_for_duplicate(s: str) -> str:
 
 def _digits_telefono(s: str) -> str:
     """Solo dígitos del teléfono para comparar duplicados."""
-    return re.sub(r"\D", "", (s or "").strip())
+    return digitos_telefono(s)
 
 
 def create_cliente_from_payload(db: Session, payload: ClienteCreate, *, commit: bool = True) -> Cliente:
@@ -707,14 +711,12 @@ def create_cliente_from_payload(db: Session, payload: ClienteCreate, *, commit:
     # Si teléfono duplicado (2 números exactamente iguales) â†’ reemplazar por +589999999999
     telefono_final = payload.telefono
     tel_10 = telefono_dig[-10:] if len(telefono_dig) >= 10 else telefono_dig
-    if len(telefono_dig) >= 8 and tel_10 != "4111111111":
-        rows_telefono = db.execute(
-            select(Cliente.id, Cliente.telefono).where(Cliente.telefono.isnot(None))
-        ).all()
-        for r in rows_telefono:
-            if r.telefono and _digits_telefono(r.telefono) == telefono_dig:
-                telefono_final = "+589999999999"
-                break
+    if (
+        len(telefono_dig) >= 8
+        and tel_10 != "4111111111"
+        and telefono_exacto_registrado(db, telefono_dig) is not None
+    ):
+        telefono_final = "+589999999999"
 
     row = Cliente(
         cedula=cedula_norm,
@@ -834,17 +836,12 @@ def _perform_update_cliente(cliente_id: int, payload: ClienteUpdate, db: Session
     if "telefono" in data:
         telefono_dig = _digits_telefono(data.get("telefono") or getattr(row, "telefono") or "")
         tel_10 = telefono_dig[-10:] if len(telefono_dig) >= 10 else telefono_dig
-        if len(telefono_dig) >= 8 and tel_10 != "4111111111":
-            rows_telefono = db.execute(
-                select(Cliente.id, Cliente.telefono).where(
-                    Cliente.telefono.isnot(None),
-                    Cliente.id != cliente_id,
-                )
-            ).all()
-            for r in rows_telefono:
-                if r.telefono and _digits_telefono(r.telefono) == telefono_dig:
-                    data["telefono"] = "+589999999999"
-                    break
+        if (
+            len(telefono_dig) >= 8
+            and tel_10 != "4111111111"
+            and telefono_exacto_registrado(db, telefono_dig, excluir_cliente_id=cliente_id) is not None
+        ):
+            data["telefono"] = "+589999999999"
 
     for k, v in data.items():
         setattr(row, k, v)
@@ -30,6 +30,7 @@ from app.core.documento import normalize_documento
 from app.core.deps import get_current_user
 from app.services.cobros import infopagos_escaner_borrador_service as ieb
 from app.core.rate_limit_store import get_redis_client
+from app.core.public_rate_limit import check_rate_limit
 from app.api.v1.endpoints.pagos.pago_integridad_db import _integridad_error_pgcode_y_constraint
 from app.models.pago_reportado import PagoReportado, PagoReportadoHistorial
 from app.models.pago_reportado_exportado import PagoReportadoExportado
@@ -126,50 +127,15 @@ def _cache_payload_es_vista_default(cache_payload: str) -> bool:
         and int(p.get("per_page") or 0) == 20
         and not p.get("incluir_exportados")
     )
-_ESCANER_RATE_LIMIT_WINDOW_SEC = 60
-_ESCANER_RATE_LIMIT_MAX_COUNT = 20
-_escaner_rate_limit_mem: Dict[str, Tuple[int, float]] = {}
-_escaner_rate_limit_mem_lock = threading.Lock()
-
-
 def _enforce_escaner_rate_limit(request: Request) -> None:
     """
     Limita llamadas al escáner por usuario (o IP fallback) para evitar picos de costo/latencia.
-    Ventana fija de 60s: máx 20 solicitudes.
+    Política `cobros_escaner` (20 por minuto) en app.core.public_rate_limit.
     """
     cur = getattr(request.state, "user", None)
     uid = getattr(cur, "id", None) if cur is not None else None
     actor = f"user:{uid}" if uid is not None else f"ip:{getattr(request.client, 'host', None) or 'unknown'}"
-    detail_429 = "Demasiadas solicitudes al escáner. Espere un minuto e intente de nuevo."
-    key = f"rate_limit:cobros_escaner:{actor}"
-    now = time.time()
-
-    client = get_redis_client()
-    if client:
-        try:
-            pipe = client.pipeline()
-            pipe.incr(key)
-            pipe.ttl(key)
-            incr_result, ttl = pipe.execute()
-            if ttl == -1:
-                client.expire(key, _ESCANER_RATE_LIMIT_WINDOW_SEC)
-            if int(incr_result or 0) > _ESCANER_RATE_LIMIT_MAX_COUNT:
-                raise HTTPException(status_code=429, detail=detail_429)
-            return
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.warning("[ESCANER] Rate limit Redis error: %s", e)
-
-    with _escaner_rate_limit_mem_lock:
-        count, start_ts = _escaner_rate_limit_mem.get(key, (0, now))
-        if now - start_ts >= _ESCANER_RATE_LIMIT_WINDOW_SEC:
-            _escaner_rate_limit_mem[key] = (1, now)
-            return
-        count += 1
-        _escaner_rate_limit_mem[key] = (count, start_ts)
-        if count > _ESCANER_RATE_LIMIT_MAX_COUNT:
-            raise HTTPException(status_code=429, detail=detail_429)
+    check_rate_limit("cobros_escaner", actor)
 
 
 def _cobros_listado_kpis_cache_key_payload(
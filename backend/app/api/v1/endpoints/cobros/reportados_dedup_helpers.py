@@ -1304,8 +1304,18 @@ def _query_reportados_falla_validadores_pendientes_exportar(
 ) -> List[PagoReportado]:
     """Pendiente, en revisión o aprobado (legacy), aún no marcados como exportados; sin fechas (mismos filtros opcionales que el front)."""
     exportados_subq = select(PagoReportadoExportado.pago_reportado_id)
+    from .reportados_veredicto import veredictos_habilitados
+
     q = select(PagoReportado).where(PagoReportado.estado.in_(("pendiente", "en_revision", "aprobado")))
     q = q.where(~PagoReportado.id.in_(exportados_subq))
+    if veredictos_habilitados():
+        # Veredicto vigente sin validadores fallidos: no hace falta rearmar el item para descartarlo.
+        q = q.where(
+            or_(
+                PagoReportado.veredicto_en.is_(None),
+                PagoReportado.validadores_fallidos.isnot(None),
+            )
+        )
     if cedula:
         ced_clean = cedula.strip().replace("-", "").replace(" ", "").upper()
         cond_cedula = or_(
@@ -125,6 +125,11 @@ from .reportados_validadores_helpers import (
     _item_falla_validadores_cola_manual,
     reportado_falla_validadores_cobros,
 )
+from .reportados_veredicto import (
+    contar_cola_por_estado,
+    invalidar_veredictos,
+    veredictos_al_dia,
+)
 from .schemas import PagoReportadoListItem
 
 # Cola manual (pendiente/en_revision) es pequena; no ocultar backlog viejo.
@@ -263,6 +268,8 @@ def _persist_marcar_exportados_y_cola(db: Session, ids: List[int]) -> dict:
 
     if nuevos:
         db.add_all(nuevos)
+        # Exportar saca pendientes del alcance de dedup: recalcular su veredicto y el de sus seguidores.
+        invalidar_veredictos(db, [n.pago_reportado_id for n in nuevos])
 
     res_cola = db.execute(
         delete(PagoPendienteDescargar).where(
@@ -563,6 +570,55 @@ def _get_primer_triple_cached(
     return primer_precalc, primer_num_op, numeros_en_pagos
 
 
+def _list_pagos_reportados_desde_veredicto(
+    db: Session,
+    wh: List[Any],
+    *,
+    page: int,
+    per_page: int,
+    emit_counts: bool,
+) -> dict:
+    """
+    Cola manual desde el veredicto materializado: COUNT + página por `cola_manual` (indexado).
+    Solo la página se arma con `_pago_reportado_list_items_from_rows` (observación, tasa, duplicados).
+    """
+    wh_v = list(wh) + [PagoReportado.cola_manual.is_(True)]
+    total = int(db.execute(select(func.count(PagoReportado.id)).where(*wh_v)).scalar() or 0)
+    q = (
+        _select_reportados_sin_blob()
+        .where(*wh_v)
+        .order_by(
+            case((PagoReportado.estado == "rechazado", 1), else_=0),
+            PagoReportado.created_at.asc(),
+            PagoReportado.id.asc(),
+        )
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    )
+    rows = _rows_reportados_sin_blob(db, q)
+    page_items: List[PagoReportadoListItem] = []
+    if rows:
+        norms: Set[str] = set()
+        for r in rows:
+            _, n_eff = documento_numero_desde_pago_reportado(r)
+            if n_eff:
+                norms.add(n_eff)
+        page_items = _pago_reportado_list_items_from_rows(
+            db,
+            rows,
+            primer_id_por_norm_precalc=primer_reportado_id_por_norm_peer_first_map(db, norms),
+            include_financial_fields=True,
+        )
+    out: Dict[str, Any] = {"items": page_items, "total": total, "page": page, "per_page": per_page}
+    if emit_counts:
+        por_estado = contar_cola_por_estado(db, wh)
+        out["_manual_kpi_counts"] = {
+            "pendiente": por_estado.get("pendiente", 0),
+            "en_revision": por_estado.get("en_revision", 0),
+        }
+    return out
+
+
 def _list_pagos_reportados_payload(
     db: Session,
     *,
@@ -626,6 +682,11 @@ def _list_pagos_reportados_payload(
         if estado in ("pendiente", "en_revision")
         else wh
     )
+    emit_counts = bool(emit_manual_estado_counts_for_kpis and estado is None)
+    if veredictos_al_dia(db, wh):
+        return _list_pagos_reportados_desde_veredicto(
+            db, wh, page=page, per_page=per_page, emit_counts=emit_counts
+        )
     primer_scope_key = _primer_maps_scope_key(
         incluir_exportados=incluir_exportados,
         fecha_desde=fecha_desde,
@@ -651,7 +712,6 @@ def _list_pagos_reportados_payload(
         PagoReportado.created_at.asc(),
     )
 
-    emit_counts = bool(emit_manual_estado_counts_for_kpis and estado is None)
     by_estado_manual: Dict[str, int] = {"pendiente": 0, "en_revision": 0}
 
     batch = _dedup._COBROS_LISTADO_SCAN_BATCH
@@ -786,6 +846,12 @@ def _kpis_pagos_reportados_payload(
     else:
         exportados_subq = select(PagoReportadoExportado.pago_reportado_id)
         wh_kpi = _where_clauses_cola_reportados(None, incluir_exportados, exportados_subq, filtros)
+        if veredictos_al_dia(db, wh_kpi):
+            por_estado = contar_cola_por_estado(db, wh_kpi)
+            counts["pendiente"] = por_estado.get("pendiente", 0)
+            counts["en_revision"] = por_estado.get("en_revision", 0)
+            counts["total"] = sum(counts[k] for k in ("pendiente", "en_revision", "rechazado", "importado"))
+            return counts
         kpi_scope_key = _primer_maps_scope_key(
             incluir_exportados=incluir_exportados,
             fecha_desde=fecha_desde,
@@ -161,6 +161,10 @@ def _reconciliar_reportados_ya_en_cartera(
             .where(PagoReportado.id.in_(ids_colision))
             .values(estado="importado", falla_validadores_manual=False, updated_at=func.now())
         )
+        # UPDATE Core: no pasa por los eventos ORM; sus seguidores de dedup cambian de veredicto.
+        from .reportados_veredicto import invalidar_veredictos
+
+        invalidar_veredictos(db, ids_colision)
         db.commit()
         logger.info(
             "[COBROS_COLA_RECONCILIA] Marcados %s reportados como importado (comprobante ya en pagos).",
@@ -265,6 +269,9 @@ def _regularizar_reportados_gemini_ok_sin_falla_manual(
                 .where(PagoReportado.id.in_(ids_colision_importado))
                 .values(estado="importado", falla_validadores_manual=False, updated_at=func.now())
             )
+            from .reportados_veredicto import invalidar_veredictos
+
+            invalidar_veredictos(db, ids_colision_importado)
             db.commit()
             logger.info(
                 "[COBROS_COLA_REGULARIZA] Marcados %s reportados como importado (comprobante ya en pagos).",
@@ -479,18 +486,27 @@ def _item_falla_validadores_cola_manual(it: PagoReportadoListItem) -> bool:
 
     `error` (fallo de API / sin clave) sigue exigiendo revisión manual.
     """
+    return bool(_codigos_falla_validadores_cola_manual(it))
+
+
+def _codigos_falla_validadores_cola_manual(it: PagoReportadoListItem) -> List[str]:
+    """
+    Motivos por los que el item requiere revisión manual (vacío = cumple validadores).
+    Misma regla que `_item_falla_validadores_cola_manual`; se persiste en `validadores_fallidos`.
+    """
     from app.services.pagos_gmail.parse_campos_comprobante import reportado_exento_autoconciliacion
 
+    codigos: List[str] = []
     if (getattr(it, "estado", None) or "").strip() == "en_revision":
-        return True
+        codigos.append("EN_REVISION")
     if reportado_exento_autoconciliacion(
         getattr(it, "monto", None),
         moneda=getattr(it, "moneda", None),
     ):
-        return True
+        codigos.append("EXENTO_AUTOCONCILIACION")
     # Every document already in the portfolio needs a human decision.
     if getattr(it, "duplicado_en_pagos", False):
-        return True
+        codigos.append("DUPLICADO_EN_PAGOS")
     obs = _obs_efectiva_para_validadores(
         (it.observacion or "").strip(),
         getattr(it, "institucion_financiera", "") or "",
@@ -499,14 +515,12 @@ def _item_falla_validadores_cola_manual(it: PagoReportadoListItem) -> bool:
         )
         is True,
     )
-    if _gemini_coincide_exacto_ok(it.gemini_coincide_exacto):
-        return bool(obs)
     gem = (it.gemini_coincide_exacto or "").strip().lower()
-    if gem == "error":
-        return True
-    if gem == "false":
-        return bool(obs)
-    return bool(obs)
+    if not _gemini_coincide_exacto_ok(it.gemini_coincide_exacto) and gem == "error":
+        codigos.append("GEMINI_ERROR")
+    if obs:
+        codigos.append("OBSERVACION")
+    return codigos
 
 
 def reportado_falla_validadores_cobros(db: Session, pr: PagoReportado) -> bool:
@@ -0,0 +1,441 @@
+"""
+Cobros: veredicto materializado de la cola manual de pagos reportados.
+
+Por fila se persiste lo que antes el listado/KPIs recalculaban en Python en cada barrido:
+- ``validadores_fallidos``: códigos de `_codigos_falla_validadores_cola_manual` (NULL = cumple).
+- ``dedup_lider_id``: primer reporte de su cadena de nº de operación (misma agrupación por evasión
+  que `_primer_id_por_numero_operacion_para_where`), sobre la cola completa sin filtros de pantalla.
+- ``prestamo_objetivo_id``: préstamo destino resuelto por cédula.
+- ``cola_manual``: pendiente/en_revision, líder de su cadena y con algún validador fallido.
+
+Mantenimiento en la transacción que escribe: los eventos de abajo anotan en ``Session.info`` (y ponen
+``veredicto_en = NULL``) los reportes creados o editados, sus seguidores cuando cambia el estado o el nº de
+operación del líder, los que colisionan con un pago insertado y los exportados; antes del commit se
+recalculan (hasta COBROS_VEREDICTOS_REFRESCO_MAX, en un savepoint: un fallo no tumba la escritura).
+El listado y los KPIs solo leen: si su alcance tiene filas desactualizadas (cambios por SQL directo, tope
+superado, justo tras la migración) usan el barrido anterior. El job de reconciliación recalcula todo.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, bindparam, event, exists, func, inspect as sa_inspect, or_, select, update
+from sqlalchemy.orm import Session, aliased, defer, object_session
+
+from app.models.pago import Pago
+from app.models.pago_reportado import PagoReportado
+from app.models.pago_reportado_exportado import PagoReportadoExportado
+from app.models.prestamo_version import tabla_disponible
+from app.services.cobros.pago_reportado_documento import (
+    documento_numero_desde_pago_reportado,
+    primer_reportado_id_por_norm_peer_first_map,
+)
+
+from .reportados_dedup_helpers import (
+    _numero_operacion_canonico,
+    _pago_reportado_list_items_from_rows,
+    _primer_id_por_numero_operacion_para_where,
+)
+from .reportados_validadores_helpers import _codigos_falla_validadores_cola_manual
+
+logger = logging.getLogger(__name__)
+
+_ESTADOS_COLA = ("pendiente", "en_revision")
+_CHUNK = 400
+_MAX_CONDS_LIDERES = 600
+
+# Clave en Session.info: reportes a recalcular antes del commit (se vacía al commit / rollback).
+_INFO_VEREDICTO = "_reportados_veredicto_pendiente"
+
+# Columnas que alteran el veredicto; `falla_validadores_manual` no (la escribe el propio veredicto).
+_CAMPOS_VEREDICTO = (
+    "estado",
+    "numero_operacion",
+    "referencia_interna",
+    "monto",
+    "moneda",
+    "tipo_cedula",
+    "numero_cedula",
+    "institucion_financiera",
+    "fecha_pago",
+    "gemini_coincide_exacto",
+    "gemini_comentario",
+)
+
+
+def veredictos_habilitados() -> bool:
+    try:
+        from app.core.config import settings
+
+        return bool(getattr(settings, "COBROS_VEREDICTOS_MATERIALIZADOS", True))
+    except Exception:
+        return True
+
+
+def _refresco_max() -> int:
+    try:
+        from app.core.config import settings
+
+        return max(0, int(getattr(settings, "COBROS_VEREDICTOS_REFRESCO_MAX", 1500)))
+    except Exception:
+        return 1500
+
+
+def clausulas_alcance_dedup() -> List[Any]:
+    """Cola completa sin filtros (en_revision + pendiente no exportado): alcance del líder de cada cadena."""
+    from .reportados_listado_payload import _where_clauses_cola_reportados
+
+    return _where_clauses_cola_reportados(
+        None, False, select(PagoReportadoExportado.pago_reportado_id), []
+    )
+
+
+def _lider_num_op(numero_operacion: Optional[str], mapa: Dict[str, int]) -> Optional[int]:
+    """Misma búsqueda que `_reportado_pasa_filtro_dedup_num_op` (clave canónica y luego texto crudo)."""
+    num_key = _numero_operacion_canonico(numero_operacion)
+    num_raw = (numero_operacion or "").strip()
+    first_id = mapa.get(num_key) if num_key else None
+    if first_id is None and num_raw:
+        first_id = mapa.get(num_raw)
+    return int(first_id) if first_id is not None else None
+
+
+def _lideres_para_filas(db: Session, rows: List[PagoReportado]) -> Dict[str, int]:
+    """Mapa de líderes restringido a candidatos que prefiltran por nº operación de `rows`."""
+    from app.services.pagos_gmail.parse_campos_comprobante import _condiciones_sql_numero_operacion
+
+    conds: List[Any] = []
+    for op in {(r.numero_operacion or "").strip() for r in rows}:
+        if op:
+            conds.extend(_condiciones_sql_numero_operacion(PagoReportado.numero_operacion, op))
+    if not conds:
+        return {}
+    mapa: Dict[str, int] = {}
+    for i in range(0, len(conds), _MAX_CONDS_LIDERES):
+        parcial = _primer_id_por_numero_operacion_para_where(
+            db, clausulas_alcance_dedup() + [or_(*conds[i : i + _MAX_CONDS_LIDERES])]
+        )
+        for k, v in parcial.items():
+            mapa.setdefault(k, v)
+    return mapa
+
+
+def calcular_veredictos(
+    db: Session,
+    rows: List[PagoReportado],
+    *,
+    lideres: Optional[Dict[str, int]] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """Veredicto por id (sin escribir). `lideres` precalculado evita un mapa por lote en la reconciliación."""
+    out: Dict[int, Dict[str, Any]] = {}
+    activos = [r for r in rows if (r.estado or "").strip() in _ESTADOS_COLA + ("aprobado",)]
+    ids_activos = {int(r.id) for r in activos}
+    for r in rows:
+        if int(r.id) not in ids_activos:
+            # Terminales: fuera de cola (mismo criterio que actualizar_flag_falla_validadores).
+            out[int(r.id)] = {
+                "cola_manual": False,
+                "dedup_lider_id": None,
+                "validadores_fallidos": None,
+                "prestamo_objetivo_id": None,
+                "falla_validadores_manual": False,
+            }
+    if not activos:
+        return out
+    if lideres is None:
+        lideres = _lideres_para_filas(db, activos)
+    norms = set()
+    for r in activos:
+        _, n_eff = documento_numero_desde_pago_reportado(
+            SimpleNamespace(numero_operacion=r.numero_operacion, referencia_interna=r.referencia_interna)
+        )
+        if n_eff:
+            norms.add(n_eff)
+    primer = primer_reportado_id_por_norm_peer_first_map(db, norms)
+    items = _pago_reportado_list_items_from_rows(
+        db, activos, primer_id_por_norm_precalc=primer, include_financial_fields=False
+    )
+    for it in items:
+        codigos = _codigos_falla_validadores_cola_manual(it)
+        lider = _lider_num_op(it.numero_operacion, lideres)
+        es_lider = lider is None or lider == int(it.id)
+        out[int(it.id)] = {
+            "cola_manual": (it.estado or "").strip() in _ESTADOS_COLA and es_lider and bool(codigos),
+            "dedup_lider_id": lider,
+            "validadores_fallidos": ",".join(codigos) if codigos else None,
+            "prestamo_objetivo_id": it.prestamo_objetivo_id,
+            "falla_validadores_manual": bool(codigos),
+        }
+    return out
+
+
+def _escribir_veredictos(db: Session, veredictos: Dict[int, Dict[str, Any]]) -> None:
+    """
+    Core UPDATE en executemany: no dispara los eventos ORM ni toca `updated_at`
+    (token de revisión de los caches del listado).
+    """
+    if not veredictos:
+        return
+    tabla = PagoReportado.__table__
+    ahora = datetime.utcnow()
+    stmt = (
+        update(tabla)
+        .where(tabla.c.id == bindparam("_id"))
+        .values(
+            cola_manual=bindparam("_cola_manual"),
+            dedup_lider_id=bindparam("_dedup_lider_id"),
+            validadores_fallidos=bindparam("_validadores_fallidos"),
+            prestamo_objetivo_id=bindparam("_prestamo_objetivo_id"),
+            falla_validadores_manual=bindparam("_falla_validadores_manual"),
+            veredicto_en=ahora,
+            updated_at=tabla.c.updated_at,
+        )
+    )
+    db.execute(
+        stmt,
+        [{"_id": pid, **{f"_{k}": val for k, val in v.items()}} for pid, v in veredictos.items()],
+    )
+
+
+def _rows_sin_blob(db: Session, ids: Iterable[int]) -> List[PagoReportado]:
+    ids = list(ids)
+    if not ids:
+        return []
+    return list(
+        db.execute(
+            select(PagoReportado)
+            .options(defer(PagoReportado.recibo_pdf))
+            .where(PagoReportado.id.in_(ids))
+            .order_by(PagoReportado.id)
+        ).scalars()
+    )
+
+
+def refrescar_veredictos(db: Session, ids: Iterable[int], *, commit: bool = True) -> int:
+    """Recalcula y persiste el veredicto de `ids` (por lotes). Devuelve filas escritas."""
+    ids = sorted({int(i) for i in ids})
+    n = 0
+    for i in range(0, len(ids), _CHUNK):
+        rows = _rows_sin_blob(db, ids[i : i + _CHUNK])
+        if not rows:
+            continue
+        ver = calcular_veredictos(db, rows)
+        _escribir_veredictos(db, ver)
+        n += len(ver)
+        if commit:
+            db.commit()
+    return n
+
+
+def _condicion_lider_fuera_de_alcance() -> Any:
+    """Seguidor cuyo líder ya no está en la cola (aprobado, rechazado, exportado...): su veredicto cambió."""
+    lider = aliased(PagoReportado)
+    exportados = select(PagoReportadoExportado.pago_reportado_id)
+    lider_en_alcance = exists().where(
+        lider.id == PagoReportado.dedup_lider_id,
+        or_(
+            lider.estado == "en_revision",
+            and_(lider.estado == "pendiente", ~lider.id.in_(exportados)),
+        ),
+    )
+    return and_(
+        PagoReportado.dedup_lider_id.isnot(None),
+        PagoReportado.dedup_lider_id != PagoReportado.id,
+        ~lider_en_alcance,
+    )
+
+
+def _clausula_desactualizado() -> Any:
+    return or_(PagoReportado.veredicto_en.is_(None), _condicion_lider_fuera_de_alcance())
+
+
+def veredictos_al_dia(db: Session, wh: List[Any]) -> bool:
+    """
+    Solo lectura: True si ninguna fila de `wh` tiene el veredicto desactualizado y el listado puede contar
+    por columnas. Si no, el llamador usa el barrido clásico hasta la reconciliación.
+    """
+    if not veredictos_habilitados():
+        return False
+    if db.execute(select(exists().where(*wh, _clausula_desactualizado()))).scalar():
+        logger.info("[COBROS_VEREDICTO] veredictos desactualizados en el alcance; barrido clásico")
+        return False
+    return True
+
+
+def reconciliar_veredictos_pagos_reportados(db: Session, *, chunk_size: int = _CHUNK) -> Dict[str, int]:
+    """
+    Recalcula el veredicto de toda la cola (pendiente/en_revision/aprobado) con un único mapa de líderes,
+    corrige diferencias y apaga `cola_manual` en filas terminales. Commit por lote.
+    """
+    campos = ("cola_manual", "dedup_lider_id", "validadores_fallidos", "prestamo_objetivo_id")
+    lideres = _primer_id_por_numero_operacion_para_where(db, clausulas_alcance_dedup())
+    stats = {"revisados": 0, "cambiados": 0, "terminales_limpiados": 0}
+    ultimo_id = 0
+    while True:
+        rows = list(
+            db.execute(
+                select(PagoReportado)
+                .options(defer(PagoReportado.recibo_pdf))
+                .where(
+                    PagoReportado.id > ultimo_id,
+                    PagoReportado.estado.in_(_ESTADOS_COLA + ("aprobado",)),
+                )
+                .order_by(PagoReportado.id)
+                .limit(chunk_size)
+            ).scalars()
+        )
+        if not rows:
+            break
+        ultimo_id = int(rows[-1].id)
+        ver = calcular_veredictos(db, rows, lideres=lideres)
+        cambiados = {
+            int(r.id): ver[int(r.id)]
+            for r in rows
+            if r.veredicto_en is None or any(getattr(r, c) != ver[int(r.id)][c] for c in campos)
+        }
+        stats["revisados"] += len(rows)
+        stats["cambiados"] += len(cambiados)
+        _escribir_veredictos(db, cambiados)
+        db.commit()
+        db.expunge_all()
+
+    tabla = PagoReportado.__table__
+    res = db.execute(
+        update(tabla)
+        .where(
+            ~tabla.c.estado.in_(_ESTADOS_COLA + ("aprobado",)),
+            or_(tabla.c.cola_manual.is_(True), tabla.c.veredicto_en.is_(None)),
+        )
+        .values(
+            cola_manual=False,
+            dedup_lider_id=None,
+            validadores_fallidos=None,
+            veredicto_en=datetime.utcnow(),
+            updated_at=tabla.c.updated_at,
+        )
+    )
+    stats["terminales_limpiados"] = int(res.rowcount or 0)
+    db.commit()
+    return stats
+
+
+# --- Mantenimiento en la transacción que escribe ------------------------------------------------
+
+
+def _anotar(session: Optional[Session], ids: Iterable[int]) -> None:
+    if session is not None:
+        session.info.setdefault(_INFO_VEREDICTO, set()).update(int(i) for i in ids if i is not None)
+
+
+def _invalidar_por_condicion(connection, condicion: Any) -> List[int]:
+    """veredicto_en = NULL en las filas de `condicion` (sin tocar updated_at); devuelve sus ids."""
+    tabla = PagoReportado.__table__
+    ids = [int(i) for i in connection.execute(select(tabla.c.id).where(condicion)).scalars()]
+    if ids:
+        connection.execute(
+            update(tabla).where(tabla.c.id.in_(ids)).values(veredicto_en=None, updated_at=tabla.c.updated_at)
+        )
+    return ids
+
+
+@event.listens_for(PagoReportado, "after_insert")
+def _pago_reportado_creado(_mapper, _connection, target: PagoReportado) -> None:
+    _anotar(object_session(target), [target.id])
+
+
+@event.listens_for(PagoReportado, "before_update")
+def _pago_reportado_invalidar_veredicto(_mapper, _connection, target: PagoReportado) -> None:
+    state = sa_inspect(target)
+    for campo in _CAMPOS_VEREDICTO:
+        if state.attrs[campo].history.has_changes():
+            target.veredicto_en = None
+            _anotar(object_session(target), [target.id])
+            return
+
+
+@event.listens_for(PagoReportado, "after_update")
+def _pago_reportado_invalidar_seguidores(_mapper, connection, target: PagoReportado) -> None:
+    state = sa_inspect(target)
+    if not (
+        state.attrs["estado"].history.has_changes()
+        or state.attrs["numero_operacion"].history.has_changes()
+    ):
+        return
+    tabla = PagoReportado.__table__
+    seguidores = _invalidar_por_condicion(
+        connection, and_(tabla.c.dedup_lider_id == target.id, tabla.c.id != target.id)
+    )
+    _anotar(object_session(target), seguidores)
+
+
+@event.listens_for(Pago, "after_insert")
+def _pago_invalidar_reportados_en_conflicto(_mapper, connection, target: Pago) -> None:
+    from app.services.pagos_gmail.parse_campos_comprobante import _condiciones_sql_numero_operacion
+
+    tabla = PagoReportado.__table__
+    conds: List[Any] = []
+    for doc in {(target.numero_documento or "").strip(), (target.referencia_pago or "").strip()}:
+        if doc:
+            conds.extend(_condiciones_sql_numero_operacion(tabla.c.numero_operacion, doc))
+    if not conds or not tabla_disponible(connection, tabla.name):
+        return
+    ids = _invalidar_por_condicion(
+        connection, and_(tabla.c.estado.in_(_ESTADOS_COLA + ("aprobado",)), or_(*conds))
+    )
+    _anotar(object_session(target), ids)
+
+
+def invalidar_veredictos(db: Session, ids: Iterable[int]) -> None:
+    """Recalcula `ids` y sus seguidores al commit de `db` (p. ej. al exportar: cambia el alcance de la cola)."""
+    ids = list({int(i) for i in ids})
+    if not ids:
+        return
+    tabla = PagoReportado.__table__
+    _anotar(db, _invalidar_por_condicion(db, or_(tabla.c.id.in_(ids), tabla.c.dedup_lider_id.in_(ids))))
+
+
+@event.listens_for(Session, "before_commit")
+def _refrescar_veredictos_anotados(session: Session) -> None:
+    session.flush()
+    ids = session.info.pop(_INFO_VEREDICTO, None)
+    if not ids or not veredictos_habilitados():
+        return
+    if len(ids) > _refresco_max():
+        logger.info(
+            "[COBROS_VEREDICTO] %s veredictos en la transacción (tope %s): quedan para la reconciliación",
+            len(ids),
+            _refresco_max(),
+        )
+        return
+    t0 = time.perf_counter()
+    try:
+        with session.begin_nested():
+            refrescar_veredictos(session, ids, commit=False)
+    except Exception:
+        # Quedan con veredicto_en NULL: el listado usa el barrido clásico y la reconciliación los corrige.
+        logger.exception("[COBROS_VEREDICTO] no se pudo recalcular el veredicto de %s reportados", len(ids))
+        return
+    logger.debug(
+        "[COBROS_VEREDICTO] veredictos recalculados en la escritura filas=%s ms=%.0f",
+        len(ids),
+        (time.perf_counter() - t0) * 1000,
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_veredictos_anotados(session: Session) -> None:
+    session.info.pop(_INFO_VEREDICTO, None)
+
+
+def contar_cola_por_estado(db: Session, wh: List[Any]) -> Dict[str, int]:
+    """KPIs de cola manual: GROUP BY estado sobre `cola_manual` (índice estado, cola_manual, created_at)."""
+    rows = db.execute(
+        select(PagoReportado.estado, func.count(PagoReportado.id))
+        .where(*wh, PagoReportado.cola_manual.is_(True))
+        .group_by(PagoReportado.estado)
+    ).all()
+    return {str(e): int(n or 0) for e, n in rows}
@@ -7,11 +7,11 @@ Persistencia: las conversaciones y mensajes se guardan en BD (conversacion_cobra
 Se mantienen indefinidamente a menos que se borren explícitamente; en este módulo no hay endpoint de borrado.
 
 Conexión con Clientes: el listado acepta cliente_id (desde /pagos/clientes → Ver comunicaciones).
-- WhatsApp: se filtra por clientes.telefono ↔ conversacion_cobranza.telefono (mismo número = misma conversación).
+- WhatsApp: se filtra por clientes.telefono ↔ conversacion_cobranza.telefono (mismo número = misma conversación);
+  el cliente de cada conversación se resuelve por clientes.telefono_clave (app/utils/cliente_telefonos.py).
 - Email: stub (lista vacía hasta integración IMAP); clientes.email se usa en notificaciones y crear-cliente-automatico.
 """
 import logging
-import re
 import time
 from typing import Optional, Dict, List, Tuple, Any
 
@@ -28,46 +28,15 @@ from app.core.database import get_db
 from app.models.conversacion_cobranza import ConversacionCobranza
 from app.models.cliente import Cliente
 from app.models.mensaje_whatsapp import MensajeWhatsapp
+from app.utils.cliente_emails import expr_email_normalizado_para_comparar
+from app.utils.cliente_telefonos import clientes_por_telefonos, digitos_telefono, telefono_exacto_registrado
 
 logger = logging.getLogger(__name__)
 router = APIRouter(dependencies=[Depends(get_current_user)])
 
 
 def _digits(s: str) -> str:
-    return re.sub(r"\D", "", (s or "").strip())
-
-
-def _build_telefono_to_cliente_index(db: Session) -> Tuple[Dict[str, int], Dict[str, List[Tuple[str, int]]]]:
-    """
-    Una sola query a clientes: construye índices por dígitos completos y por sufijo (10 dígitos)
-    para búsqueda O(1) / O(k) por conversación en lugar de O(N×M).
-    """
-    by_full: Dict[str, int] = {}
-    by_suffix: Dict[str, List[Tuple[str, int]]] = {}
-    result = db.execute(select(Cliente))
-    for c in result.scalars().all():
-        cd = _digits(c.telefono or "")
-        if not cd or len(cd) < 8:
-            continue
-        by_full[cd] = c.id
-        if len(cd) >= 10:
-            suf = cd[-10:]
-            by_suffix.setdefault(suf, []).append((cd, c.id))
-    return by_full, by_suffix
-
-
-def _lookup_cliente_id(phone_digits: str, by_full: Dict[str, int], by_suffix: Dict[str, List[Tuple[str, int]]]) -> Optional[int]:
-    """Busca cliente_id por teléfono normalizado (coincidencia exacta o por sufijo 10 dígitos)."""
-    if not phone_digits or len(phone_digits) < 8:
-        return None
-    cid = by_full.get(phone_digits)
-    if cid is not None:
-        return cid
-    if len(phone_digits) >= 10:
-        for cd, id_ in by_suffix.get(phone_digits[-10:], []):
-            if cd == phone_digits or (len(cd) >= 10 and phone_digits.endswith(cd[-10:])) or (len(phone_digits) >= 10 and cd.endswith(phone_digits[-10:])):
-                return id_
-    return None
+    return digitos_telefono(s)
 
 
 def _build_cedula_to_cliente_index(db: Session, cedulas: List[str]) -> Dict[str, int]:
@@ -133,12 +102,12 @@ def listar_comunicaciones(
         q_pag = base_q.offset(offset).limit(per_page)
         rows = db.execute(q_pag).scalars().all()
 
-        # Una sola carga de clientes + índice por teléfono (evita N+1)
-        by_full, by_suffix = _build_telefono_to_cliente_index(db)
+        # Teléfonos de la página -> cliente por clientes.telefono_clave (una consulta indexada)
+        tel_a_cliente = clientes_por_telefonos(db, [row.telefono or "" for row in rows])
         cids_en_pagina = set()
         cedulas_sin_cliente: List[str] = []
         for row in rows:
-            cid = _lookup_cliente_id(_digits(row.telefono), by_full, by_suffix)
+            cid = tel_a_cliente.get(_digits(row.telefono))
             if cid is not None:
                 cids_en_pagina.add(cid)
             elif (row.cedula or "").strip():
@@ -153,10 +122,17 @@ def listar_comunicaciones(
             for c in db.execute(st).scalars().all():
                 clientes_pagina[c.id] = c
 
-        # Teléfonos con al menos un mensaje saliente (OUTBOUND) = comunicación ya operada
+        # Teléfonos de la página con al menos un mensaje saliente (OUTBOUND) = comunicación ya operada
         telefonos_operados: set = set()
         try:
-            outbound = select(MensajeWhatsapp.telefono).where(MensajeWhatsapp.direccion == "OUTBOUND").distinct()
+            outbound = (
+                select(MensajeWhatsapp.telefono)
+                .where(
+                    MensajeWhatsapp.direccion == "OUTBOUND",
+                    MensajeWhatsapp.telefono.in_({_digits(row.telefono) for row in rows}),
+                )
+                .distinct()
+            )
             for (tel,) in db.execute(outbound).all():
                 if tel:
                     telefonos_operados.add(_digits(tel))
@@ -165,7 +141,7 @@ def listar_comunicaciones(
 
         for row in rows:
             telefono_display = row.telefono if (row.telefono or "").startswith("+") else f"+{row.telefono}"
-            cid = _lookup_cliente_id(_digits(row.telefono), by_full, by_suffix)
+            cid = tel_a_cliente.get(_digits(row.telefono))
             if cid is None and (row.cedula or "").strip():
                 cid = cedula_to_cid.get((row.cedula or "").strip())
             nombre = (row.nombre_cliente or "").strip()
@@ -390,8 +366,8 @@ def crear_cliente_automatico(payload: CrearClienteAutomaticoRequest, db: Session
         existing_email = db.execute(
             select(Cliente.id).where(
                 or_(
-                    func.lower(func.trim(Cliente.email)) == em_cmp,
-                    func.lower(func.trim(func.coalesce(Cliente.email_secundario, ""))) == em_cmp,
+                    expr_email_normalizado_para_comparar(Cliente.email) == em_cmp,
+                    expr_email_normalizado_para_comparar(Cliente.email_secundario) == em_cmp,
                 )
             )
         ).first()
@@ -402,14 +378,8 @@ def crear_cliente_automatico(payload: CrearClienteAutomaticoRequest, db: Session
             )
     # Si teléfono duplicado (2 números exactamente iguales) → reemplazar por +589999999999
     telefono_final = telefono if telefono_dig else "+589999999999"
-    if len(telefono_dig) >= 8:
-        rows_telefono = db.execute(
-            select(Cliente.id, Cliente.telefono).where(Cliente.telefono.isnot(None))
-        ).all()
-        for r in rows_telefono:
-            if r.telefono and _digits(r.telefono) == telefono_dig:
-                telefono_final = "+589999999999"
-                break
+    if len(telefono_dig) >= 8 and telefono_exacto_registrado(db, telefono_dig) is not None:
+        telefono_final = "+589999999999"
 
     email_final = email or "actualizar@ejemplo.com"
     direccion = _normalize_for_duplicate(payload.direccion) or "Actualizar dirección"
@@ -56,20 +56,20 @@ def _run_sync_to_db_y_refrescar_cache_q(
     db: Session,
     background_tasks: BackgroundTasks,
 ) -> Dict[str, Any]:
-    """Sync CONCILIACIÓN → BD y programa recálculo masivo Q vs aprobación en segundo plano."""
+    """Sync CONCILIACIÓN → BD y programa en segundo plano el recálculo Q vs aprobación de lo que cambió."""
     res = run_sync_to_db(db)
     try:
         from app.services.fecha_entrega_q_aprobacion_cache_job import (
             ejecutar_refresh_fecha_entrega_q_cache_background,
         )
 
-        background_tasks.add_task(ejecutar_refresh_fecha_entrega_q_cache_background)
+        background_tasks.add_task(ejecutar_refresh_fecha_entrega_q_cache_background, res.get("run_id"))
         res["fecha_entrega_q_aprobacion_cache_refresh"] = {
             "ok": True,
             "en_background": True,
             "mensaje": (
                 "Recálculo de caché «Fecha Q vs aprobación» programado en segundo plano "
-                "(varios minutos con miles de préstamos). La respuesta del sync no espera a que termine."
+                "(solo préstamos de las filas que cambiaron en la hoja). La respuesta del sync no espera a que termine."
             ),
         }
     except Exception as e:
@@ -329,9 +329,15 @@ def get_conciliacion_sheet_status(
         (getattr(settings, "CONCILIACION_SHEET_SPREADSHEET_ID", None) or "").strip()
     )
     snapshot_row_count = int(
-        db.execute(select(func.count()).select_from(ConciliacionSheetRow)).scalar_one() or 0
+        db.execute(
+            select(func.count()).select_from(ConciliacionSheetRow).where(ConciliacionSheetRow.eliminado_en.is_(None))
+        ).scalar_one()
+        or 0
+    )
+    drive_row_count = int(
+        db.execute(select(func.count()).select_from(DriveRow).where(DriveRow.eliminado_en.is_(None))).scalar_one()
+        or 0
     )
-    drive_row_count = int(db.execute(select(func.count()).select_from(DriveRow)).scalar_one() or 0)
     hdrs = list(meta.headers) if meta and meta.headers else []
     headers_ok = len(hdrs) >= _MIN_HEADERS_FOR_FECHA_DRIVE
     fecha_drive_ready = (
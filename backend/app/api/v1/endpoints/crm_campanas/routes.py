@@ -4,7 +4,6 @@ Evita congestión y políticas Gmail enviando en lotes con delay configurable.
 """
 import base64
 import logging
-import time
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 
@@ -20,6 +19,7 @@ from app.models.cliente import Cliente
 from app.models.crm_campana import CampanaCrm
 from app.models.crm_campana_destinatario import CampanaDestinatarioCrm
 from app.models.crm_campana_envio import CampanaEnvioCrm
+from app.core.config import settings
 from app.schemas.crm_campana import (
     CampanaCrmCreate,
     CampanaCrmUpdate,
@@ -29,6 +29,12 @@ from app.schemas.crm_campana import (
     CampanaDestinatarioResponse,
 )
 from app.schemas.auth import UserResponse
+from app.services.crm_campanas_envio import (
+    MODO_SELECCION,
+    MODO_TODOS,
+    ejecutar_envio_campana,
+    progreso_campana,
+)
 from app.utils.cliente_emails import emails_destino_cliente, unir_destinatarios_log
 
 logger = logging.getLogger(__name__)
@@ -71,46 +77,6 @@ def _get_destinatarios_clientes(db: Session) -> List[Tuple[int, List[str], Optio
     return out
 
 
-def _get_destinatarios_para_campana(
-    db: Session, campana: CampanaCrm
-) -> List[Tuple[int, List[str], Optional[str]]]:
-    """
-    Si la campaña tiene filas en crm_campana_destinatario: solo esos clientes (con email válido).
-    Si no tiene: todos los de tabla clientes (comportamiento anterior).
-    """
-    rows_dest = db.execute(
-        select(CampanaDestinatarioCrm.cliente_id).where(
-            CampanaDestinatarioCrm.campana_id == campana.id
-        )
-    ).all()
-    dest_ids = [r[0] for r in rows_dest]
-    if not dest_ids:
-        return _get_destinatarios_clientes(db)
-    rows = (
-        db.execute(
-            select(Cliente.id, Cliente.email, Cliente.email_secundario, Cliente.nombres)
-            .where(Cliente.id.in_(dest_ids))
-            .where(Cliente.email.isnot(None))
-            .order_by(Cliente.id)
-        )
-        .all()
-    )
-    out: List[Tuple[int, List[str], Optional[str]]] = []
-    seen: set = set()
-    for cliente_id, email, email_sec, nombres in rows:
-        if not email or not _valid_email((email or "").strip()):
-            continue
-        tos_all = emails_destino_cliente(email, email_sec)
-        tos_all = [e for e in tos_all if _valid_email(e)]
-        tos = [e for e in tos_all if e.strip().lower() not in seen]
-        if not tos:
-            continue
-        for e in tos:
-            seen.add(e.strip().lower())
-        out.append((cliente_id, tos, (nombres or "").strip() or None))
-    return out
-
-
 def _get_destinatarios_by_ids(
     db: Session, ids: List[int]
 ) -> List[Tuple[int, List[str], Optional[str]]]:
@@ -259,6 +225,7 @@ def crear_campana(
         adjunto_nombre=adjunto_nombre,
         adjunto_contenido=adjunto_bytes,
         usuario_creacion=current_user.email,
+        destinatarios_modo=MODO_SELECCION if ids_a_guardar else MODO_TODOS,
     )
     db.add(row)
     db.commit()
@@ -318,140 +285,11 @@ def actualizar_campana(
 
 def _run_envio_lotes(campana_id: int) -> None:
     """
-    Tarea en segundo plano: envía por lotes a todos los correos de clientes.
+    Tarea en segundo plano: envía la campaña con el pipeline reanudable
+    (destinatarios materializados por tramos, claim SKIP LOCKED, parada inmediata).
     Usa SessionLocal propia para no depender de la sesión del request.
     """
-    db = SessionLocal()
-    try:
-        campana = db.get(CampanaCrm, campana_id)
-        if not campana or campana.estado not in ("borrador", "enviando", "programada"):
-            logger.warning("Campaña %s no existe o no está en borrador/enviando/programada", campana_id)
-            return
-        era_programada = bool(
-            (getattr(campana, "programado_cada_dias", None) or 0) or (getattr(campana, "programado_cada_horas", None) or 0)
-        )
-        if campana.estado == "borrador" or campana.estado == "programada":
-            campana.estado = "enviando"
-            campana.fecha_envio_inicio = datetime.utcnow()
-            db.commit()
-
-        destinatarios = _get_destinatarios_para_campana(db, campana)
-        from app.core.email import send_email
-        from app.core.email_config_holder import get_email_activo_servicio
-        from app.services.notificaciones_exclusion_desistimiento import (
-            cliente_bloqueado_para_notificacion,
-        )
-
-        cc_list: List[str] = []
-        if campana.cc_emails and campana.cc_emails.strip():
-            cc_list = [e.strip() for e in campana.cc_emails.split(",") if e and _valid_email(e.strip())]
-        attachments: Optional[List[Tuple[str, bytes]]] = None
-        if campana.adjunto_contenido and campana.adjunto_nombre:
-            attachments = [(campana.adjunto_nombre, bytes(campana.adjunto_contenido))]
-
-        batch_size = max(5, min(100, campana.batch_size))
-        delay = max(1, min(60, campana.delay_entre_batches_seg))
-        enviados = campana.enviados
-        fallidos = campana.fallidos
-
-        for i in range(0, len(destinatarios), batch_size):
-            campana = db.get(CampanaCrm, campana_id)
-            if campana and campana.estado == "cancelada":
-                logger.info("Campaña %s detenida por el usuario (cancelada)", campana_id)
-                break
-            lote = destinatarios[i : i + batch_size]
-            if not get_email_activo_servicio("campanas"):
-                continue
-            for cliente_id, emails, _ in lote:
-                if not emails:
-                    continue
-                email_log = unir_destinatarios_log(emails)
-                bloq_cli, motivo_cli = cliente_bloqueado_para_notificacion(
-                    db, cliente_id=cliente_id, email=emails[0]
-                )
-                if bloq_cli:
-                    logger.info(
-                        "Campaña %s: omitir cliente_id=%s por %s",
-                        campana_id,
-                        cliente_id,
-                        motivo_cli or "LIQUIDADO_O_DESISTIMIENTO",
-                    )
-                    registro = CampanaEnvioCrm(
-                        campana_id=campana_id,
-                        cliente_id=cliente_id,
-                        email=email_log or emails[0],
-                        estado="fallido",
-                        fecha_envio=datetime.utcnow(),
-                        error_mensaje=f"Bloqueado por regla {motivo_cli or 'LIQUIDADO_O_DESISTIMIENTO'}",
-                    )
-                    db.add(registro)
-                    fallidos += 1
-                    db.commit()
-                    continue
-                ok, err = send_email(
-                    emails,
-                    campana.asunto,
-                    campana.cuerpo_texto or "",
-                    body_html=campana.cuerpo_html or None,
-                    cc_emails=cc_list if cc_list else None,
-                    attachments=attachments,
-                    servicio="campanas",
-                )
-                registro = CampanaEnvioCrm(
-                    campana_id=campana_id,
-                    cliente_id=cliente_id,
-                    email=email_log or emails[0],
-                    estado="enviado" if ok else "fallido",
-                    fecha_envio=datetime.utcnow(),
-                    error_mensaje=None if ok else (err or "Error desconocido"),
-                )
-                db.add(registro)
-                if ok:
-                    enviados += 1
-                else:
-                    fallidos += 1
-                db.commit()
-
-            campana = db.get(CampanaCrm, campana_id)
-            if campana:
-                campana.enviados = enviados
-                campana.fallidos = fallidos
-                db.commit()
-
-            if i + batch_size < len(destinatarios):
-                time.sleep(delay)
-
-        campana = db.get(CampanaCrm, campana_id)
-        if campana:
-            now = datetime.utcnow()
-            campana.fecha_envio_fin = now
-            campana.enviados = enviados
-            campana.fallidos = fallidos
-            if era_programada and campana.estado != "cancelada":
-                dias = getattr(campana, "programado_cada_dias", None) or 0
-                horas = getattr(campana, "programado_cada_horas", None) or 0
-                if dias or horas:
-                    delta = timedelta(days=dias, hours=horas)
-                    campana.programado_proxima_ejecucion = now + delta
-                    campana.estado = "programada"
-                    db.commit()
-                    logger.info("Campaña %s programada: próxima ejecución %s", campana_id, campana.programado_proxima_ejecucion)
-                    return
-            campana.estado = "completada"
-            db.commit()
-        logger.info("Campaña %s completada: enviados=%s fallidos=%s", campana_id, enviados, fallidos)
-    except Exception as e:
-        logger.exception("Error en envío campaña %s: %s", campana_id, e)
-        try:
-            campana = db.get(CampanaCrm, campana_id)
-            if campana:
-                campana.estado = "completada"
-                campana.fecha_envio_fin = datetime.utcnow()
-                db.commit()
-        except Exception:
-            pass
-    finally:
-        db.close()
+    ejecutar_envio_campana(campana_id)
 
 
 @router.post("/{campana_id}/parar", response_model=dict)
@@ -468,7 +306,50 @@ def parar_campana(campana_id: int, db: Session = Depends(get_db)):
     row.estado = "cancelada"
     row.fecha_envio_fin = datetime.utcnow()
     db.commit()
-    return {"success": True, "mensaje": "Envío detenido. La campaña quedó en estado cancelada."}
+    return {
+        "success": True,
+        "mensaje": "Envío detenido. La campaña quedó en estado cancelada; puede reanudarse sin reenviar.",
+    }
+
+
+@router.post("/{campana_id}/reanudar", response_model=dict)
+def reanudar_campana(
+    campana_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """
+    Continúa un envío detenido (cancelada) o interrumpido (enviando sin latido reciente, p. ej. reinicio).
+    Solo se envía a destinatarios pendientes: no hay reenvíos.
+    """
+    row = db.get(CampanaCrm, campana_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Campaña no encontrada")
+    if row.estado == "enviando":
+        stale_min = int(getattr(settings, "CRM_CAMPANA_CLAIM_STALE_MIN", 10) or 10)
+        latido = row.envio_heartbeat or row.fecha_envio_inicio
+        if latido and latido > datetime.utcnow() - timedelta(minutes=stale_min):
+            raise HTTPException(status_code=409, detail="La campaña ya se está enviando")
+    elif row.estado != "cancelada" or row.fecha_envio_inicio is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Solo se puede reanudar una campaña detenida o interrumpida durante el envío",
+        )
+    row.estado = "enviando"
+    row.fecha_envio_fin = None
+    row.envio_heartbeat = datetime.utcnow()
+    db.commit()
+    background_tasks.add_task(_run_envio_lotes, campana_id)
+    return {"success": True, "mensaje": "Envío reanudado en segundo plano."}
+
+
+@router.get("/{campana_id}/progreso", response_model=dict)
+def progreso_envio_campana(campana_id: int, db: Session = Depends(get_db)):
+    """Avance del envío: destinatarios por estado, materialización y ritmo reciente (correos/min, ETA)."""
+    data = progreso_campana(db, campana_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Campaña no encontrada")
+    return data
 
 
 @router.delete("/{campana_id}", status_code=204)
@@ -9,7 +9,7 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends
 
-from app.core.database import SessionLocal
+from app.core.database import ReadSessionLocal
 from app.core.deps import get_current_user
 
 from . import financiamiento_inicial, graficos, kpis, pagos_inicial
@@ -38,7 +38,7 @@ router.include_router(financiamiento_inicial.router, tags=["dashboard-financiami
 
 def _refresh_dashboard_admin_cache() -> None:
     """Actualiza la caché de dashboard/admin en background."""
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
         data = kpis._compute_dashboard_admin(db, None, None)
         with _lock:
@@ -54,7 +54,7 @@ def _refresh_dashboard_admin_cache() -> None:
 def _refresh_all_dashboard_caches() -> None:
     """Actualiza todas las cachés de gráficos del dashboard (1:00, 13:00)."""
     _refresh_dashboard_admin_cache()
-    db = SessionLocal()
+    db = ReadSessionLocal()
     try:
         try:
             data = kpis._compute_kpis_principales(db, None, None, None, None, None)
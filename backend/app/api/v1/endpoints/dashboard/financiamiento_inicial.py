@@ -8,7 +8,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import get_current_user
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
@@ -22,7 +22,7 @@ def get_financiamiento_dashboard_inicial(
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
     meses_tendencia: int = Query(12, ge=1, le=24),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     from app.api.v1.endpoints.dashboard.graficos import get_financiamiento_tendencia_mensual
     from app.api.v1.endpoints.dashboard.kpis import get_kpis_dashboard, get_opciones_filtros
@@ -16,7 +16,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import Date, Float, Integer, and_, case, cast, distinct, exists, extract, func, literal, literal_column, not_, or_, select
 from sqlalchemy.orm import Session, aliased
 
-from app.core.database import get_db, SessionLocal
+from app.core.database import get_read_db, SessionLocal
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.envio_notificacion import EnvioNotificacion
@@ -50,6 +50,7 @@ from .utils import (
     _CACHE_MOROSIDAD_DIA,
     _CACHE_PRESTAMOS_POR_CONCESIONARIO,
     _CACHE_PRESTAMOS_POR_MODELO,
+    _contar_cache,
     _lock,
     _modelo_label_dashboard_expr,
     _next_refresh_local,
@@ -460,7 +461,7 @@ def get_financiamiento_tendencia_mensual(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Tendencia mensual de financiamiento."""
     analista = _sanitize_filter_string(analista)
@@ -498,7 +499,7 @@ def get_morosidad_por_dia(
     fecha_inicio: Optional[str] = Query(None),
     fecha_fin: Optional[str] = Query(None),
     dias: Optional[int] = Query(30, ge=7, le=90),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Morosidad por día. Con caché 2 veces/día (1:00, 13:00) cuando no se envían fechas."""
     use_cache = not (fecha_inicio and fecha_fin)
@@ -506,7 +507,7 @@ def get_morosidad_por_dia(
         with _lock:
             cached = _CACHE_MOROSIDAD_DIA["data"]
             refreshed = _CACHE_MOROSIDAD_DIA.get("refreshed_at")
-        if cached is not None and refreshed is not None and datetime.now() < _next_refresh_local():
+        if _contar_cache("morosidad_dia", cached is not None and refreshed is not None and datetime.now() < _next_refresh_local()):
             return cached
     data = _compute_morosidad_por_dia(db, fecha_inicio, fecha_fin, dias)
     if use_cache:
@@ -517,7 +518,7 @@ def get_morosidad_por_dia(
 
 
 @router.get("/proyeccion-cobro-30-dias")
-def get_proyeccion_cobro_30_dias(db: Session = Depends(get_db)):
+def get_proyeccion_cobro_30_dias(db: Session = Depends(get_read_db)):
     """Proyección de cobro: monto programado por día desde hoy hasta hoy+30."""
     try:
         hoy_utc = datetime.now(timezone.utc)
@@ -656,7 +657,7 @@ def get_tendencia_programado_total_cobrado_diario(
         le=90,
         description="Dias anteriores a hoy (Caracas). 30 = hoy + 30 dias previos.",
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Programado vs cobrado por dia: hoy y los N dias anteriores (default 30).
@@ -683,7 +684,7 @@ def get_monto_programado_proxima_semana(
         le=90,
         description="Dias anteriores a hoy. Default 30 (hoy + 30 previos).",
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Ventana diaria: desde hoy-N hasta hoy (Caracas).
@@ -824,7 +825,7 @@ def get_prestamos_por_concesionario(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Préstamos aprobados por concesionario. Caché en memoria 5 min por misma consulta."""
     analista = _sanitize_filter_string(analista)
@@ -832,7 +833,7 @@ def get_prestamos_por_concesionario(
     modelo = _sanitize_filter_string(modelo)
     ck = _prestamos_graficos_cache_key(fecha_inicio, fecha_fin, analista, concesionario, modelo)
     hit = _prestamos_graficos_try_hit(_CACHE_PRESTAMOS_POR_CONCESIONARIO, ck)
-    if hit is not None:
+    if _contar_cache("prestamos_por_concesionario", hit is not None):
         return hit
     data = _compute_prestamos_por_concesionario(db, fecha_inicio, fecha_fin, analista, concesionario, modelo)
     _prestamos_graficos_store(_CACHE_PRESTAMOS_POR_CONCESIONARIO, ck, data)
@@ -846,7 +847,7 @@ def get_prestamos_por_modelo(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Préstamos aprobados por modelo. Caché en memoria 5 min por misma consulta."""
     analista = _sanitize_filter_string(analista)
@@ -854,7 +855,7 @@ def get_prestamos_por_modelo(
     modelo_filtro = _sanitize_filter_string(modelo)
     ck = _prestamos_graficos_cache_key(fecha_inicio, fecha_fin, analista, concesionario, modelo_filtro)
     hit = _prestamos_graficos_try_hit(_CACHE_PRESTAMOS_POR_MODELO, ck)
-    if hit is not None:
+    if _contar_cache("prestamos_por_modelo", hit is not None):
         return hit
     data = _compute_prestamos_por_modelo(db, fecha_inicio, fecha_fin, analista, concesionario, modelo_filtro)
     _prestamos_graficos_store(_CACHE_PRESTAMOS_POR_MODELO, ck, data)
@@ -868,7 +869,7 @@ def get_financiamiento_por_rangos(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Bandas por total_financiamiento. Con caché 2 veces/día (1:00, 13:00) cuando no se envían filtros."""
     analista = _sanitize_filter_string(analista)
@@ -879,7 +880,7 @@ def get_financiamiento_por_rangos(
         with _lock:
             cached = _CACHE_FINANCIAMIENTO_RANGOS["data"]
             refreshed = _CACHE_FINANCIAMIENTO_RANGOS.get("refreshed_at")
-        if cached is not None and refreshed is not None and datetime.now() < _next_refresh_local():
+        if _contar_cache("financiamiento_rangos", cached is not None and refreshed is not None and datetime.now() < _next_refresh_local()):
             return cached
     data = _compute_financiamiento_por_rangos(db, fecha_inicio, fecha_fin, analista, concesionario, modelo)
     if use_cache:
@@ -896,7 +897,7 @@ def get_composicion_morosidad(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Composición de morosidad. Con caché 2 veces/día (1:00, 13:00) cuando no se envían filtros."""
     analista = _sanitize_filter_string(analista)
@@ -907,7 +908,7 @@ def get_composicion_morosidad(
         with _lock:
             cached = _CACHE_COMPOSICION_MOROSIDAD["data"]
             refreshed = _CACHE_COMPOSICION_MOROSIDAD.get("refreshed_at")
-        if cached is not None and refreshed is not None and datetime.now() < _next_refresh_local():
+        if _contar_cache("composicion_morosidad", cached is not None and refreshed is not None and datetime.now() < _next_refresh_local()):
             return cached
     data = _compute_composicion_morosidad(db, fecha_inicio, fecha_fin, analista, concesionario, modelo)
     if use_cache:
@@ -924,7 +925,7 @@ def get_cobranza_fechas_especificas(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Cobranza por fechas específicas. Stub: requiere tabla pagos/cobranzas."""
     return {"dias": []}
@@ -938,7 +939,7 @@ def get_cobranzas_semanales(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Cobranzas semanales. Con caché 2 veces/día (1:00, 13:00) cuando no se envían filtros."""
     analista = _sanitize_filter_string(analista)
@@ -949,7 +950,7 @@ def get_cobranzas_semanales(
         with _lock:
             cached = _CACHE_COBRANZAS_SEMANALES["data"]
             refreshed = _CACHE_COBRANZAS_SEMANALES.get("refreshed_at")
-        if cached is not None and refreshed is not None and datetime.now() < _next_refresh_local():
+        if _contar_cache("cobranzas_semanales", cached is not None and refreshed is not None and datetime.now() < _next_refresh_local()):
             return cached
     data = _compute_cobranzas_semanales(db, fecha_inicio, fecha_fin, semanas, analista, concesionario, modelo)
     if use_cache:
@@ -966,7 +967,7 @@ def get_morosidad_por_analista(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Morosidad por analista. Con caché 2 veces/día (1:00, 13:00) cuando no se envían filtros."""
     analista = _sanitize_filter_string(analista)
@@ -977,7 +978,7 @@ def get_morosidad_por_analista(
         with _lock:
             cached = _CACHE_MOROSIDAD_ANALISTA["data"]
             refreshed = _CACHE_MOROSIDAD_ANALISTA.get("refreshed_at")
-        if cached is not None and refreshed is not None and datetime.now() < _next_refresh_local():
+        if _contar_cache("morosidad_analista", cached is not None and refreshed is not None and datetime.now() < _next_refresh_local()):
             return cached
     data = _compute_morosidad_por_analista(db, fecha_inicio, fecha_fin, analista, concesionario, modelo)
     if use_cache:
@@ -994,7 +995,7 @@ def get_evolucion_morosidad(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Evolución de morosidad por mes."""
     analista = _sanitize_filter_string(analista)
@@ -1036,7 +1037,7 @@ def get_evolucion_pagos(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Evolución de pagos por mes."""
     analista = _sanitize_filter_string(analista)
@@ -1096,7 +1097,7 @@ def get_cuotas_con_pago_aplicado_por_mes_cuota(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Por mes **calendario** de `cuotas.fecha_vencimiento` (igual criterio de “cuota de ese mes” que
@@ -1419,7 +1420,7 @@ def get_recibos_pagos_mensual_usd(
     periodo: Optional[str] = Query(None),
     fecha_inicio: Optional[str] = Query(None),
     fecha_fin: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Recibos solo en Bs.: equivalente USD por mes (pago conciliado o tasa del día) + estadística."""
     fi, ff = fecha_inicio, fecha_fin
@@ -1525,7 +1526,7 @@ def get_pagos_realizados_mensual(
     periodo: Optional[str] = Query(None),
     fecha_inicio: Optional[str] = Query(None),
     fecha_fin: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Resumen mensual: número de pagos realizados (cualquier contexto operativo)."""
     fi, ff = fecha_inicio, fecha_fin
@@ -1543,7 +1544,7 @@ def get_cobranza_por_dia(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Cobranza por día desde BD."""
     return {"dias": []}
@@ -1556,7 +1557,7 @@ def get_cobranzas_mensuales(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Cobranzas mensuales desde BD."""
     return {"meses": []}
@@ -1569,7 +1570,7 @@ def get_cobros_por_analista(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Cobros por analista desde BD."""
     return {"analistas": []}
@@ -1582,7 +1583,7 @@ def get_cobros_diarios(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Cobros diarios desde BD."""
     return {"dias": []}
@@ -1595,7 +1596,7 @@ def get_cuentas_cobrar_tendencias(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Tendencias cuentas por cobrar desde BD."""
     return {"tendencias": []}
@@ -1695,7 +1696,7 @@ def get_notificaciones_envios_por_dia(
         ),
     ),
     dias: int = Query(90, ge=7, le=366),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Tendencia diaria de envíos de notificación (éxito / fallo) desde envios_notificacion."""
     if tipo_tab not in TIPOS_NOTIFICACIONES_ENVIOS_TENDENCIA:
@@ -1826,7 +1827,7 @@ def get_notificaciones_envios_por_intervalo(
         le=12,
         description="Tamaño del bucket intradía en horas (debe dividir 24). Usar 1 para desempeño por hora.",
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Desempeño de envíos por intervalos intradía (p. ej. cada 1 h) desde envios_notificacion."""
     if tipo_tab not in TIPOS_NOTIFICACIONES_ENVIOS_TENDENCIA:
@@ -1845,7 +1846,7 @@ def get_notificaciones_envios_por_intervalo(
 @router.get("/desempeno-1-cuota-stock")
 def get_desempeno_1_cuota_stock(
     dias: int = Query(20, ge=7, le=90),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Dos cantidades por día (últimos `dias`, default 20) — segmento 1 cuota:
@@ -1860,7 +1861,7 @@ def get_desempeno_1_cuota_stock(
 @router.get("/desempeno-2-cuotas-stock")
 def get_desempeno_2_cuotas_stock(
     dias: int = Query(20, ge=7, le=90),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Dos cantidades por día (últimos `dias`, default 20) — segmento 2 cuotas:
@@ -1875,7 +1876,7 @@ def get_desempeno_2_cuotas_stock(
 @router.get("/desempeno-3-cuotas-stock")
 def get_desempeno_3_cuotas_stock(
     dias: int = Query(20, ge=7, le=90),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Segmento 3 cuotas (excluyente): exactamente 3 atrasadas (atraso ≥1).
@@ -1887,7 +1888,7 @@ def get_desempeno_3_cuotas_stock(
 @router.get("/desempeno-4plus-cuotas-stock")
 def get_desempeno_4plus_cuotas_stock(
     dias: int = Query(20, ge=7, le=90),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Segmento 4 o mas cuotas (excluyente): >=4 atrasadas (atraso ≥1).
@@ -2043,7 +2044,7 @@ def get_pagos_ingresados_por_dia(
         le=90,
         description="Días calendario inclusive (hoy atrás). Default 60.",
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Monto diario (USD) de pagos ingresados por institución (barras apiladas)."""
     return _compute_pagos_ingresados_por_dia(db, dias, solo_moneda_bs=False)
@@ -2057,7 +2058,7 @@ def get_pagos_bs_ingresados_por_dia(
         le=90,
         description="Días calendario inclusive (hoy atrás). Default 60.",
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Pagos registrados en BS (moneda_registro=BS), día a día, expresados en USD
@@ -2073,7 +2074,7 @@ def get_distribucion_prestamos(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Distribución de préstamos desde BD."""
     return {"distribucion": []}
@@ -2086,7 +2087,7 @@ def get_metricas_acumuladas(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Métricas acumuladas desde BD."""
     return {"metricas": []}
@@ -15,7 +15,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import Date, and_, case, cast, func, or_, select
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db, SessionLocal
+from app.core.database import get_read_db, SessionLocal
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
@@ -37,6 +37,7 @@ from .utils import (
     _CACHE_KPIS,
     _CACHE_OPCIONES_FILTROS,
     _DASHBOARD_ADMIN_CACHE,
+    _contar_cache,
     _lock,
     _modelo_label_dashboard_expr,
     _next_refresh_local,
@@ -624,7 +625,7 @@ def get_kpis_dashboard(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """KPIs planos de financiamiento (usado por DashboardFinanciamiento: /api/v1/kpis/dashboard)."""
     try:
@@ -647,16 +648,17 @@ def get_kpis_dashboard(
 
 
 @router.get("/opciones-filtros")
-def get_opciones_filtros(db: Session = Depends(get_db)):
+def get_opciones_filtros(db: Session = Depends(get_read_db)):
     """Opciones para filtros desde BD: analistas, concesionarios, modelos. Caché 5 min."""
     now = datetime.now()
     with _lock:
         cached = _CACHE_OPCIONES_FILTROS.get("data")
         refreshed = _CACHE_OPCIONES_FILTROS.get("refreshed_at")
-    if cached is not None and refreshed is not None:
-        age_sec = (now - refreshed).total_seconds()
-        if age_sec < _OPCIONES_FILTROS_TTL_SEC:
-            return cached
+    if _contar_cache(
+        "opciones_filtros",
+        cached is not None and refreshed is not None and (now - refreshed).total_seconds() < _OPCIONES_FILTROS_TTL_SEC,
+    ):
+        return cached
     try:
         analistas = [r[0] for r in db.execute(
             select(Prestamo.analista).select_from(Prestamo).join(Cliente, Prestamo.cliente_id == Cliente.id)
@@ -697,7 +699,7 @@ def get_kpis_principales(
     analista: Optional[str] = Query(None),
     concesionario: Optional[str] = Query(None),
     modelo: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """KPIs principales. Con caché 2 veces/día (1:00, 13:00) cuando no se envían fechas ni filtros."""
     analista = _sanitize_filter_string(analista)
@@ -708,7 +710,7 @@ def get_kpis_principales(
         with _lock:
             cached = _CACHE_KPIS["data"]
             refreshed = _CACHE_KPIS.get("refreshed_at")
-        if cached is not None and refreshed is not None and datetime.now() < _next_refresh_local():
+        if _contar_cache("kpis", cached is not None and refreshed is not None and datetime.now() < _next_refresh_local()):
             # KPI diario: recalcular siempre para reflejar el día actual (el resto sigue en caché).
             merged = dict(cached)
             merged["pagos_conciliados_hoy"] = _kpi_pagos_conciliados_hoy(
@@ -908,7 +910,7 @@ def get_dashboard_admin(
     periodo: Optional[str] = Query(None),
     fecha_inicio: Optional[str] = Query(None),
     fecha_fin: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Dashboard admin: evolucion_mensual desde tabla cuotas. Con caché 2 veces/día (1:00, 13:00) cuando no se envían fechas."""
     use_cache = not (fecha_inicio and fecha_fin)
@@ -916,11 +918,8 @@ def get_dashboard_admin(
         with _lock:
             cached = _DASHBOARD_ADMIN_CACHE["data"]
             refreshed = _DASHBOARD_ADMIN_CACHE.get("refreshed_at")
-        if cached is not None and refreshed is not None:
-            now = datetime.now()
-            next_refresh = _next_refresh_local()
-            if now < next_refresh:
-                return cached
+        if _contar_cache("admin", cached is not None and refreshed is not None and datetime.now() < _next_refresh_local()):
+            return cached
         data = _compute_dashboard_admin(db, fecha_inicio, fecha_fin)
         with _lock:
             _DASHBOARD_ADMIN_CACHE["data"] = data
@@ -934,7 +933,7 @@ def get_analisis_cuentas_por_cobrar(
     periodo: Optional[str] = Query(None),
     fecha_inicio: Optional[str] = Query(None),
     fecha_fin: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Análisis de cuentas por cobrar: cartera vs pagos de atrasos por mes."""
     return _compute_analisis_cuentas_por_cobrar(db, fecha_inicio, fecha_fin)
@@ -945,7 +944,7 @@ def get_tendencia_programado_total_cobrado(
     periodo: Optional[str] = Query(None),
     fecha_inicio: Optional[str] = Query(None),
     fecha_fin: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Tendencia mensual: cuotas programadas vs total cobrado (conciliados del mes + pagos de meses anteriores)."""
     return _compute_tendencia_programado_vs_total_cobrado(db, fecha_inicio, fecha_fin)
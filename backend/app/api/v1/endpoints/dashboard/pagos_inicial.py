@@ -61,6 +61,7 @@ def get_pagos_dashboard_inicial(
                     analista=analista,
                     concesionario=concesionario,
                     modelo=modelo,
+                    refrescar=False,
                     db=s,
                 ),
             )
@@ -77,6 +78,7 @@ def get_pagos_dashboard_inicial(
                     anio=None,
                     fecha_inicio=fecha_inicio,
                     fecha_fin=fecha_fin,
+                    refrescar=False,
                     db=s,
                 ),
             )
@@ -10,6 +10,7 @@ from typing import Any, Optional
 from sqlalchemy import case, func, select
 from sqlalchemy.orm import aliased
 
+from app.core.metricas import cache_consulta
 from app.models.modelo_vehiculo import ModeloVehiculo
 from app.models.prestamo import Prestamo
 
@@ -71,6 +72,12 @@ def _prestamos_graficos_try_hit(cache_box: dict[str, Any], key: str) -> Optional
         return cache_box.get("data")
 
 
+def _contar_cache(nombre: str, hit: bool) -> bool:
+    """Cuenta hit/miss de una caché del dashboard (rapicredit_cache_consultas_total) y devuelve `hit`."""
+    cache_consulta(f"dashboard_{nombre}", hit)
+    return hit
+
+
 def _prestamos_graficos_store(cache_box: dict[str, Any], key: str, data: Any) -> None:
     with _lock:
         cache_box["key"] = key
@@ -7,12 +7,24 @@ GET /health/cobros                  - Módulo Cobros: BD, GEMINI_API_KEY y SMTP
 GET /health/gemini-live             - Prueba real a la API Gemini (facturacion / permisos; sin exponer la clave)
 GET /health/clientes-stats-diagnostico - Diagnóstico KPI nuevos_este_mes (público, sin auth)
 GET /health/detailed                - Reporte completo (solo dev)
+GET /health/rate-limit              - Rate limit público: permitidas/rechazadas por política (contadores del proceso)
+GET /health/sql-perfiles            - Perfilador SQL (admin): sentencias/ms por ruta y job, sospechas de N+1
+GET /health/bulkhead                - Bulkhead por clase de tráfico (admin): activos, cola, 503, pools BD e hilos
+GET /health/replica                 - Réplica de lectura (admin): disponible, retraso medido, error
+GET /health/metrics                 - Métricas del proceso en formato Prometheus (admin o METRICS_TOKEN)
+GET /health/scheduler-runs          - Historial de jobs programados (admin): duración, espera, retraso, misfires
 GET /health/integrity               - Integridad préstamos/cuotas/pagos (cédula en clientes, cuotas con prestamo_id, pagos con prestamo_id, préstamos sin cuotas)
 """
-from fastapi import APIRouter, Depends, HTTPException
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from sqlalchemy import text, inspect
 from app.core.database import get_db, engine, BUSINESS_TIMEZONE
+from app.core.deps import get_current_user, require_admin, security_optional_bearer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -96,6 +108,89 @@ async def health_check_db(db: Session = Depends(get_db)):
         raise HTTPException(status_code=503, detail=result)
 
 
+@router.get("/rate-limit")
+async def health_rate_limit():
+    """Contadores del limitador público por política (desde el arranque; por proceso). Sin IPs."""
+    from app.core.public_rate_limit import rate_limit_metrics_snapshot
+
+    return rate_limit_metrics_snapshot()
+
+
+@router.get("/sql-perfiles", dependencies=[Depends(require_admin)])
+async def health_sql_perfiles(
+    orden: str = Query("sentencias_max", pattern="^(sentencias_max|db_ms_total|n_mas_1)$"),
+    limite: int = Query(50, ge=1, le=500),
+):
+    """
+    Perfilador SQL (SQL_PROFILER_ENABLED): por ruta/job, sentencias (total, máx, promedio), ms en BD y
+    sentencias más repetidas; últimos requests/jobs con sospecha de N+1 (con request_id). Por proceso.
+    """
+    from app.core.sql_profiler import sql_profiler_snapshot
+
+    return sql_profiler_snapshot(orden=orden, limite=limite)
+
+
+@router.delete("/sql-perfiles", dependencies=[Depends(require_admin)])
+async def health_sql_perfiles_reset():
+    """Vacía el agregado del perfilador (p. ej. antes de una prueba de carga)."""
+    from app.core.sql_profiler import sql_profiler_reset
+
+    sql_profiler_reset()
+    return {"ok": True}
+
+
+@router.get("/bulkhead", dependencies=[Depends(require_admin)])
+async def health_bulkhead():
+    """Por clase (publico/interactivo/pesado): concurrencia, activos, en cola, admitidos y 503; conexiones por engine."""
+    from app.middleware.bulkhead import bulkhead_snapshot
+
+    return bulkhead_snapshot()
+
+
+def _autorizar_metricas(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_optional_bearer),
+    db: Session = Depends(get_db),
+) -> None:
+    """METRICS_TOKEN (scraper) o, si no coincide, JWT de un usuario admin."""
+    from app.core.config import settings
+
+    token = settings.METRICS_TOKEN
+    if token and credentials and hmac.compare_digest(credentials.credentials.encode(), token.encode()):
+        return
+    require_admin(get_current_user(request, credentials, db))
+
+
+@router.get("/metrics", dependencies=[Depends(_autorizar_metricas)], response_class=PlainTextResponse)
+async def health_metrics():
+    """Pools BD, hilos AnyIO, bulkhead, cachés, envíos en segundo plano y jobs (por worker; ver core/metricas.py)."""
+    from app.core.metricas import exponer_prometheus
+
+    # async: los medidores del threadpool de AnyIO se leen desde el hilo del event loop.
+    return PlainTextResponse(exponer_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/replica", dependencies=[Depends(require_admin)])
+def health_replica():
+    """Estado de DATABASE_REPLICA_URL (medición nueva) y presupuesto de retraso de las sesiones de lectura."""
+    from app.core.config import settings
+    from app.core.database import estado_replica
+
+    return {**estado_replica(forzar=True), "retraso_max_seg": settings.DATABASE_REPLICA_MAX_LAG_SEG}
+
+
+@router.get("/scheduler-runs", dependencies=[Depends(require_admin)])
+def health_scheduler_runs(
+    horas: int = Query(24, ge=1, le=24 * 31),
+    limite: int = Query(200, ge=1, le=2000),
+    db: Session = Depends(get_db),
+):
+    """Historial scheduler_job_runs en la ventana: resumen por job (tiempo total, errores, misfires) y últimas corridas."""
+    from app.services.scheduler_job_runs import resumen_job_runs
+
+    return resumen_job_runs(db, horas=horas, limite_corridas=limite)
+
+
 @router.get("/gemini")
 async def health_check_gemini():
     """Test indirecto de Gemini: prompt de texto simple para verificar API key y que el servicio responde."""
@@ -13,7 +13,7 @@ import uuid
 import logging
 from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 from fastapi import APIRouter, Depends, HTTPException, Body, Query, File, UploadFile, BackgroundTasks
 from fastapi.responses import Response, JSONResponse, RedirectResponse
@@ -2831,6 +2831,51 @@ def get_historial_envio_comprobante_pdf(
     )
 
 
+def build_liquidados_items(db: Session, prestamo_ids: Optional[Sequence[int]] = None) -> List[dict]:
+    """
+    Crédito pagado: préstamos en estado LIQUIDADO (alineado con prestamos.estado), con suma de abonos.
+    ``prestamo_ids``: solo esos préstamos (recálculo incremental de elegibles); None = todos.
+    """
+    subq = (
+        select(Cuota.prestamo_id, func.coalesce(func.sum(Cuota.total_pagado), 0).label("total_abonos"))
+        .group_by(Cuota.prestamo_id)
+    ).subquery()
+    # Core tables only: el ORM Prestamo incluye fecha_liquidado en el mapper y SQLAlchemy
+    # expande a todas las columnas al unir con Cliente; si la migracion no esta en BD, falla.
+    p_t = Prestamo.__table__
+    c_t = Cliente.__table__
+    q_liq = (
+        select(
+            p_t.c.id.label("prestamo_id"),
+            p_t.c.total_financiamiento,
+            c_t.c.id.label("cliente_id"),
+            c_t.c.nombres,
+            c_t.c.cedula,
+            subq.c.total_abonos,
+        )
+        .select_from(
+            p_t.join(c_t, p_t.c.cliente_id == c_t.c.id).join(
+                subq, p_t.c.id == subq.c.prestamo_id
+            )
+        )
+        .where(p_t.c.estado == "LIQUIDADO")
+    )
+    if prestamo_ids is not None:
+        q_liq = q_liq.where(p_t.c.id.in_(list(prestamo_ids)))
+    liquidados: List[dict] = []
+    for row in db.execute(q_liq).all():
+        m = row._mapping
+        liquidados.append({
+            "cliente_id": m["cliente_id"],
+            "nombre": m.get("nombres") or "",
+            "cedula": m.get("cedula") or "",
+            "prestamo_id": m["prestamo_id"],
+            "total_financiamiento": to_finite_float_or_zero(m.get("total_financiamiento")),
+            "total_abonos": to_finite_float_or_zero(m.get("total_abonos")),
+        })
+    return liquidados
+
+
 @router.get("/clientes-retrasados", response_model=dict)
 def get_clientes_retrasados(
     db: Session = Depends(get_db),
@@ -2862,17 +2907,33 @@ def get_clientes_retrasados(
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e)) from e
     hoy = ref_opt or hoy_negocio()
+    from app.services.notificaciones_elegibles_dia import (
+        SEGMENTO_DIAS_1_RETRASO,
+        SEGMENTO_DIAS_10_RETRASO,
+        SEGMENTO_LIQUIDADOS,
+        leer_elegibles,
+    )
+
+    listas = leer_elegibles(
+        db, (SEGMENTO_DIAS_1_RETRASO, SEGMENTO_DIAS_10_RETRASO, SEGMENTO_LIQUIDADOS), hoy
+    )
     try:
         from app.services.notificaciones_listados_motor import (
             build_items_retraso_uno_y_diez_dias,
         )
 
-        dias_1_atraso, dias_10_atraso = build_items_retraso_uno_y_diez_dias(
-            db,
-            hoy,
-            formato="item",
-            con_enriquecimiento_revision_manual=True,
-        )
+        if listas is not None:
+            # Formato pestaña (superconjunto de ``_item``): mismas filas que el envío.
+            dias_1_atraso = listas[SEGMENTO_DIAS_1_RETRASO]
+            dias_10_atraso = listas[SEGMENTO_DIAS_10_RETRASO]
+            enriquecer_items_notificacion_revision_manual(db, dias_1_atraso + dias_10_atraso)
+        else:
+            dias_1_atraso, dias_10_atraso = build_items_retraso_uno_y_diez_dias(
+                db,
+                hoy,
+                formato="item",
+                con_enriquecimiento_revision_manual=True,
+            )
     except Exception as e:
         logger.exception("clientes-retrasados: error cargando cuotas pendientes: %s", e)
         raise HTTPException(
@@ -2885,44 +2946,9 @@ def get_clientes_retrasados(
     dias_1: List[dict] = []
     hoy_list: List[dict] = []
 
-    # Crédito pagado: préstamos en estado LIQUIDADO (alineado con prestamos.estado).
-    subq = (
-        select(Cuota.prestamo_id, func.coalesce(func.sum(Cuota.total_pagado), 0).label("total_abonos"))
-        .group_by(Cuota.prestamo_id)
-    ).subquery()
-    # Core tables only: el ORM Prestamo incluye fecha_liquidado en el mapper y SQLAlchemy
-    # expande a todas las columnas al unir con Cliente; si la migracion no esta en BD, falla.
-    p_t = Prestamo.__table__
-    c_t = Cliente.__table__
-    q_liq = (
-        select(
-            p_t.c.id.label("prestamo_id"),
-            p_t.c.total_financiamiento,
-            c_t.c.id.label("cliente_id"),
-            c_t.c.nombres,
-            c_t.c.cedula,
-            subq.c.total_abonos,
-        )
-        .select_from(
-            p_t.join(c_t, p_t.c.cliente_id == c_t.c.id).join(
-                subq, p_t.c.id == subq.c.prestamo_id
-            )
-        )
-        .where(p_t.c.estado == "LIQUIDADO")
-    )
     liquidados: List[dict] = []
     try:
-        rows_liq = db.execute(q_liq).all()
-        for row in rows_liq:
-            m = row._mapping
-            liquidados.append({
-                "cliente_id": m["cliente_id"],
-                "nombre": m.get("nombres") or "",
-                "cedula": m.get("cedula") or "",
-                "prestamo_id": m["prestamo_id"],
-                "total_financiamiento": to_finite_float_or_zero(m.get("total_financiamiento")),
-                "total_abonos": to_finite_float_or_zero(m.get("total_abonos")),
-            })
+        liquidados = listas[SEGMENTO_LIQUIDADOS] if listas is not None else build_liquidados_items(db)
     except Exception as e:
         logger.exception(
             "clientes-retrasados: error liquidados (respuesta parcial sin lista liquidados): %s",
@@ -2985,14 +3011,23 @@ def ejecutar_actualizacion_notificaciones(db: Session) -> dict:
     """
     Punto de entrada para el botón «Actualización manual» del frontend.
 
-    Los listados (clientes-retrasados, cuotas-pendiente-2-dias-antes, etc.) se leen en vivo desde la BD.
-    La columna «Diferencia abono» (submódulo General) usa la caché `prestamos.abonos_drive_cuotas_cache`,
-    recalculada en servidor por el job semanal domingo 04:35 America/Caracas (y al aplicar ABONOS desde la UI);
-    este botón no fuerza ese recálculo. Este endpoint devuelve 200 para que el cliente invalide React Query
-    y vuelva a cargar listados.
+    Los listados (clientes-retrasados, cuotas-pendiente-2-dias-antes, etc.) de hoy salen de la
+    materialización diaria (notificacion_elegibles_dia); este botón la marca para recálculo, que ocurre en
+    la siguiente lectura. La columna «Diferencia abono» (submódulo General) usa la caché
+    `prestamos.abonos_drive_cuotas_cache`, recalculada en servidor por el job semanal domingo 04:35
+    America/Caracas (y al aplicar ABONOS desde la UI); este botón no fuerza ese recálculo. Este endpoint
+    devuelve 200 para que el cliente invalide React Query y vuelva a cargar listados.
 
-    No realiza escrituras en BD ni modifica ningún estado.
+    Única escritura: `notificacion_elegibles_estado.calculado_desde = NULL` para hoy.
     """
+    from app.services.notificaciones_elegibles_dia import invalidar_elegibles_dia
+
+    try:
+        invalidar_elegibles_dia(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("[notificaciones] no se pudo invalidar elegibles del día: %s", e)
     return {"mensaje": "Actualización solicitada. Los listados se recargarán desde la BD.", "clientes_actualizados": 0}
 
 
@@ -3000,12 +3035,40 @@ def ejecutar_actualizacion_notificaciones(db: Session) -> dict:
 def actualizar_notificaciones(db: Session = Depends(get_db)):
     """
     Dispara el refresco de listados de notificaciones en el cliente.
-    No escribe en BD: los datos de mora son en tiempo real (consulta directa a cuotas/préstamos).
+    Marca las listas materializadas de hoy para recálculo en la siguiente lectura.
     El frontend invalida su caché de React Query tras recibir 200.
     """
     return ejecutar_actualizacion_notificaciones(db)
 
 
+def _run_materializar_elegibles_dia_bg() -> None:
+    db = SessionLocal()
+    try:
+        from app.services.notificaciones_elegibles_dia import materializar_elegibles_dia
+
+        res = materializar_elegibles_dia(db)
+        logger.info("[notificaciones] materializar elegibles background resultado=%s", res.get("errores"))
+    except Exception:
+        logger.exception("[notificaciones] materializar elegibles background error")
+    finally:
+        db.close()
+
+
+@router.get("/elegibles-dia/estado")
+def get_elegibles_dia_estado(db: Session = Depends(get_db)):
+    """Estado de las listas de elegibles materializadas para hoy: total, hash, hora de cálculo y si está vencida."""
+    from app.services.notificaciones_elegibles_dia import estado_elegibles_dia
+
+    return estado_elegibles_dia(db)
+
+
+@router.post("/elegibles-dia/recalcular")
+def post_elegibles_dia_recalcular(background_tasks: BackgroundTasks):
+    """Programa en segundo plano la materialización completa de hoy (misma lógica que el job 00:15 Caracas)."""
+    background_tasks.add_task(_run_materializar_elegibles_dia_bg)
+    return {"ok": True, "mensaje": "Recálculo de listas de elegibles programado en segundo plano."}
+
+
 def _run_refresh_abonos_drive_cache_bg() -> None:
     """Misma lógica que el job domingo 04:35 Caracas; sesión propia para no mezclar con el request HTTP."""
     db = SessionLocal()
@@ -3139,15 +3202,34 @@ def build_prejudicial_items(
     Lista «2 Cuotas» (a-2-cuotas): >=2 cuotas impagas atrasadas (atraso >= 1 dia).
     Sin tope. Segunda en jerarquia: no incluye titulares en dia siguiente;
     prioriza sobre «1 Cuota». Un item por prestamo. Revalida cada item.
+    Hoy: lista materializada (notificacion_elegibles_dia); otra fecha o sin tabla: en vivo.
     """
+    from app.services.notificaciones_elegibles_dia import SEGMENTO_PREJUDICIAL, leer_elegibles
+
     hoy = fecha_referencia or hoy_negocio()
+    listas = leer_elegibles(db, (SEGMENTO_PREJUDICIAL,), hoy)
+    if listas is not None:
+        prejudicial = listas[SEGMENTO_PREJUDICIAL]
+    else:
+        prejudicial = build_prejudicial_items_vivo(db, hoy)
+    enriquecer_items_notificacion_revision_manual(db, prejudicial)
+    return prejudicial
+
+
+def build_prejudicial_items_vivo(
+    db: Session, hoy: date, prestamo_ids: Optional[Sequence[int]] = None
+) -> List[dict]:
+    """
+    Motor «2 Cuotas» en vivo, sin enriquecimiento (revisión manual / cachés): lo materializa el job.
+    ``prestamo_ids``: solo esos préstamos (recálculo incremental de elegibles); None = todos.
+    """
     fv_max = hoy - timedelta(days=1)
     from app.services.notificaciones_dedup_segmentos import (
         select_prestamos_prejudicial,
     )
 
     # Regla unica: >=2 atrasadas (atraso >=1); select ya excluye dia siguiente.
-    rows = select_prestamos_prejudicial(db, fecha_referencia=hoy)
+    rows = select_prestamos_prejudicial(db, fecha_referencia=hoy, prestamo_ids=prestamo_ids)
     if not rows:
         return []
 
@@ -3228,7 +3310,6 @@ def build_prejudicial_items(
             fv_max.isoformat(),
             PREJUDICIAL_MIN_CUOTAS_CON_ATRASO_60,
         )
-    enriquecer_items_notificacion_revision_manual(db, prejudicial)
     # No filtrar por Cobranzas/4+: este modulo es el de >=2 cuotas del producto.
     return prejudicial
 
@@ -3252,28 +3333,45 @@ def get_notificaciones_tabs_data(
     Prejudicial («2 Cuotas»): >=2 cuotas atrasadas (atraso >=1) en el mismo préstamo;
     sin fecha_pago, saldo pendiente; préstamo no LIQUIDADO/DESISTIMIENTO y titular sin
     DESISTIMIENTO. Jerarquia: dia siguiente > 2 Cuotas > 1 Cuota (sin solape).
+
+    Para hoy las tres listas salen de la materialización diaria (ver notificaciones_elegibles_dia);
+    fechas retroactivas se calculan en vivo.
     """
     hoy = fecha_referencia or hoy_negocio()
+    from app.services.notificaciones_elegibles_dia import (
+        SEGMENTO_DIAS_1_RETRASO,
+        SEGMENTO_DIAS_10_RETRASO,
+        SEGMENTO_PREJUDICIAL,
+        leer_elegibles,
+    )
     from app.services.notificaciones_listados_motor import (
         build_items_retraso_uno_y_diez_dias,
     )
 
-    dias_1_retraso, dias_10_retraso = build_items_retraso_uno_y_diez_dias(
-        db,
-        hoy,
-        formato="item_tab",
-        con_enriquecimiento_revision_manual=False,
+    listas = leer_elegibles(
+        db, (SEGMENTO_DIAS_1_RETRASO, SEGMENTO_DIAS_10_RETRASO, SEGMENTO_PREJUDICIAL), hoy
     )
+    if listas is not None:
+        dias_1_retraso = listas[SEGMENTO_DIAS_1_RETRASO]
+        dias_10_retraso = listas[SEGMENTO_DIAS_10_RETRASO]
+        prejudicial = listas[SEGMENTO_PREJUDICIAL]
+    else:
+        dias_1_retraso, dias_10_retraso = build_items_retraso_uno_y_diez_dias(
+            db,
+            hoy,
+            formato="item_tab",
+            con_enriquecimiento_revision_manual=False,
+        )
+        prejudicial = build_prejudicial_items_vivo(db, hoy)
 
     dias_5: List[dict] = []
     dias_3: List[dict] = []
     dias_1: List[dict] = []
     hoy_list: List[dict] = []
 
-    prejudicial = build_prejudicial_items(db, fecha_referencia=hoy)
     enriquecer_items_notificacion_revision_manual(
         db,
-        dias_1_retraso + dias_10_retraso,
+        dias_1_retraso + dias_10_retraso + prejudicial,
     )
 
     return {
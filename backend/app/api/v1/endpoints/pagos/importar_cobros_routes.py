@@ -100,8 +100,6 @@ from app.models.cuota import Cuota
 
 from app.models.prestamo import Prestamo
 
-from app.models.pago import Pago
-
 from app.models.pago_comprobante_imagen import PagoComprobanteImagen
 
 from app.models.pago_con_error import PagoConError
@@ -110,10 +108,10 @@ from app.models.revisar_pago import RevisarPago
 
 from app.models.cuota_pago import CuotaPago
 
-from app.models.pago_reportado import PagoReportado
-
 from app.models.datos_importados_conerrores import DatosImportadosConErrores
 
+from app.models.importacion_cobros_job import ImportacionCobrosJob
+
 from app.models.cedula_reportar_bs import CedulaReportarBs
 
 from app.schemas.pago import (
@@ -128,7 +126,6 @@ from app.schemas.auth import UserResponse
 from app.services.cobros.pago_reportado_documento import (
     claves_documento_pago_desde_campos,
     claves_documento_pago_para_reportado,
-    claves_documento_para_lote_reportados,
     documento_numero_desde_pago_reportado,
     pago_reportado_colisiona_tabla_pagos,
 )
@@ -148,7 +145,6 @@ from app.services.pagos_cuotas_reaplicacion import (
     reset_y_reaplicar_cascada_prestamo,
 )
 from app.services.pagos_cascada_aplicacion import (
-    _aplicar_pago_a_cuotas_interno,
     _marcar_prestamo_liquidado_si_corresponde,
 )
 from app.services.pagos_aplicacion_prestamo import (
@@ -157,6 +153,15 @@ from app.services.pagos_aplicacion_prestamo import (
 )
 from app.services.pagos_cascada_mensajes import _mensaje_sin_aplicacion_cascada
 
+from app.services.pagos_importacion_cobros import (
+    cancelar_importacion,
+    estado_importacion,
+    iniciar_importacion,
+    lanzar_importacion,
+    reanudar_importacion,
+    resumen_vacio,
+)
+
 
 from app.services.tasa_cambio_service import (
     convertir_bs_a_usd,
@@ -234,7 +239,6 @@ from .constants import (
     _MIN_MONTO_PAGADO,
     _PRESTAMO_ID_MAX,
 )
-from .cascada_estado import _estado_pago_tras_aplicar_cascada
 from .sql_where_pagos import (
     _where_pago_elegible_reaplicacion_cascada,
     _where_pago_excluido_operacion,
@@ -247,7 +251,6 @@ from .pago_normalizacion import (
     _validar_monto,
 )
 from .pago_zona_horaria import _calcular_dias_mora, _hoy_local
-from .pago_usuario_registro import _usuario_registro_desde_current_user
 from .pago_conciliacion_estado import (
     _alinear_estado_si_toggle_conciliado_actualizar_pago,
     _estado_conciliacion_post_cascada,
@@ -291,263 +294,148 @@ def importar_reportados_aprobados_a_pagos(
 
     Los que no cumplen se guardan en datos_importados_conerrores; descargar Excel desde el frontend.
 
-    Los pagos válidos se aplican a cuotas del préstamo (asignación en cascada) en el mismo request.
+    Corre como job en segundo plano (tramos con commit propio y cascada por préstamo; ver
+    app.services.pagos_importacion_cobros): responde de inmediato con el job y el cliente consulta
+    GET /importar-desde-cobros/jobs/{job_id} hasta estado completado. Si ya hay uno en curso se devuelve ese;
+    uno interrumpido (reinicio del worker) se reanuda desde su cursor.
 
     """
 
-    rows = db.execute(
-
-        select(PagoReportado).where(PagoReportado.estado == "aprobado").order_by(PagoReportado.id)
-
-    ).scalars().all()
-
-    reportados = [r for r in rows if r is not None]
-
-    if not reportados:
-
-        return {
-
-            "registros_procesados": 0,
-
-            "registros_con_error": 0,
-
-            "errores_detalle": [],
-
-            "ids_pagos_con_errores": [],
-
-            "total_datos_revisar": 0,
-
-            "mensaje": "No hay pagos reportados aprobados para importar.",
-
-            "cuotas_aplicadas": 0,
-
-            "operaciones_cuota_total": 0,
+    job, ejecutor = iniciar_importacion(db, current_user)
 
-            "pagos_con_aplicacion_a_cuotas": 0,
+    if job is None:
 
-            "pagos_sin_aplicacion_cuotas": [],
+        return resumen_vacio()
 
-            "pagos_sin_aplicacion_cuotas_total": 0,
+    if ejecutor:
 
-            "pagos_sin_aplicacion_cuotas_truncados": False,
+        lanzar_importacion(job.id, ejecutor)
 
-        }
+    return estado_importacion(db, job)
 
 
 
-    usuario_registro = _usuario_registro_desde_current_user(current_user)
 
-    documentos_ya_en_bd: set[str] = set()
 
-    todas_claves_lote = claves_documento_para_lote_reportados(reportados)
+def _job_importacion_o_404(db: Session, job_id: int) -> ImportacionCobrosJob:
 
-    if todas_claves_lote:
+    job = db.get(ImportacionCobrosJob, job_id)
 
-        cl_list = list(todas_claves_lote)
+    if job is None:
 
-        _chunk_claves = 800
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
 
-        for i in range(0, len(cl_list), _chunk_claves):
+    return job
 
-            chunk = cl_list[i : i + _chunk_claves]
 
-            existentes = db.execute(
 
-                select(Pago.numero_documento).where(Pago.numero_documento.in_(chunk))
 
-            ).scalars().all()
 
-            documentos_ya_en_bd.update(str(d) for d in existentes if d)
+@router.get("/importar-desde-cobros/jobs/actual", response_model=dict)
 
+def get_importacion_cobros_actual(
 
+    db: Session = Depends(get_db),
 
-    registros_procesados = 0
-
-    ids_pagos_con_errores: list[int] = []
-
-    errores_detalle: list[dict] = []
-
-    docs_en_lote: set[str] = set()
-
-    huellas_funcional_lote_cobros: set[tuple[int, str, str, str]] = set()
-
-    pagos_creados: list[Pago] = []
-
-
-
-    for pr in reportados:
-
-        res = importar_un_pago_reportado_a_pagos(
-
-            db,
-
-            pr,
-
-            usuario_email=usuario_registro,
-
-            documentos_ya_en_bd=documentos_ya_en_bd,
-
-            docs_en_lote=docs_en_lote,
-
-            registrar_error_en_tabla=True,
-
-            huellas_funcional_lote=huellas_funcional_lote_cobros,
-
-        )
-
-        if res.get("ok"):
-
-            registros_procesados += 1
-
-            pagos_creados.append(res["pago"])
-
-            continue
-
-        pce_id = res.get("pce_id")
-
-        if pce_id is not None:
-
-            ids_pagos_con_errores.append(pce_id)
-
-        errores_detalle.append(
-
-            {"referencia": res.get("referencia"), "error": res.get("error", "Error")}
-
-        )
-
-
+    current_user: UserResponse = Depends(get_current_user),
 
+):
 
+    """Última importación (en curso o terminada); {"job_id": null} si nunca se importó."""
 
-    operaciones_cuota_total = 0
+    job = db.execute(
 
-    pagos_con_aplicacion_a_cuotas = 0
+        select(ImportacionCobrosJob).order_by(ImportacionCobrosJob.id.desc()).limit(1)
 
-    pagos_sin_aplicacion_cuotas: list[dict] = []
+    ).scalar_one_or_none()
 
-    for p in pagos_creados:
+    if job is None:
 
-        pid = getattr(p, "id", None)
+        return {"job_id": None, "estado": None, "en_curso": False}
 
-        ced = (getattr(p, "cedula_cliente", None) or "") or ""
+    return estado_importacion(db, job)
 
-        pr_id = getattr(p, "prestamo_id", None)
 
-        try:
 
-            cc, cp = _aplicar_pago_a_cuotas_interno(p, db)
 
-            p.estado = _estado_pago_tras_aplicar_cascada(cc, cp)
 
-            if cc > 0 or cp > 0:
+@router.get("/importar-desde-cobros/jobs/{job_id}", response_model=dict)
 
-                operaciones_cuota_total += cc + cp
+def get_importacion_cobros(
 
-                pagos_con_aplicacion_a_cuotas += 1
+    job_id: int,
 
-            elif pr_id and float(p.monto_pagado or 0) > 0:
+    db: Session = Depends(get_db),
 
-                pagos_sin_aplicacion_cuotas.append(
+    current_user: UserResponse = Depends(get_current_user),
 
-                    {
+):
 
-                        "pago_id": pid,
+    """Avance de la importación: reportados revisados, pagos creados, errores y, al completar, el resumen."""
 
-                        "cedula_cliente": ced,
+    return estado_importacion(db, _job_importacion_o_404(db, job_id))
 
-                        "prestamo_id": pr_id,
 
-                        "motivo": "sin_cuotas_afectadas",
 
-                        "detalle": "Ninguna cuota recibió monto; revise cuotas pendientes o use Aplicar a cuotas.",
 
-                    }
 
-                )
+@router.post("/importar-desde-cobros/jobs/{job_id}/cancelar", response_model=dict)
 
-        except Exception as e:
+def cancelar_importacion_cobros(
 
-            logger.warning(
+    job_id: int,
 
-                "Importar Cobros: no se pudo aplicar pago id=%s a cuotas: %s",
+    db: Session = Depends(get_db),
 
-                getattr(p, "id", "?"),
+    current_user: UserResponse = Depends(get_current_user),
 
-                e,
+):
 
-            )
+    """Detiene la importación al terminar el tramo en curso (lo ya confirmado queda en pagos)."""
 
-            pagos_sin_aplicacion_cuotas.append(
+    job = _job_importacion_o_404(db, job_id)
 
-                {
+    if not cancelar_importacion(db, job):
 
-                    "pago_id": pid,
+        raise HTTPException(status_code=400, detail="Solo se puede cancelar una importación en curso")
 
-                    "cedula_cliente": ced,
+    return estado_importacion(db, job)
 
-                    "prestamo_id": pr_id,
 
-                    "motivo": "error",
 
-                    "detalle": str(e),
 
-                }
 
-            )
+@router.post("/importar-desde-cobros/jobs/{job_id}/reanudar", response_model=dict)
 
-    db.commit()
+def reanudar_importacion_cobros(
 
-    total_datos_revisar = db.execute(select(func.count()).select_from(DatosImportadosConErrores)).scalar() or 0
+    job_id: int,
 
-    n_sin_aplicacion = len(pagos_sin_aplicacion_cuotas)
+    db: Session = Depends(get_db),
 
-    _limite_sin_aplicacion = 50
+    current_user: UserResponse = Depends(get_current_user),
 
-    mensaje_base = (
+):
 
-        f"Importados {registros_procesados} pagos desde Cobros; "
+    """Continúa una importación cancelada, con error o interrumpida desde su cursor, sin duplicar pagos."""
 
-        f"{len(ids_pagos_con_errores)} con error (revisar: descargar Excel)."
+    job = _job_importacion_o_404(db, job_id)
 
-    )
+    ejecutor = reanudar_importacion(db, job)
 
-    if n_sin_aplicacion > 0:
+    if ejecutor is None:
 
-        mensaje_base += (
+        raise HTTPException(
 
-            f" Atención: {n_sin_aplicacion} pago(s) creado(s) pero sin aplicar a cuotas "
+            status_code=409,
 
-            "(error o sin cuotas pendientes según reglas); use Aplicar a cuotas o revise el préstamo."
+            detail="La importación ya está en curso, ya terminó o hay otra importación activa",
 
         )
 
-    return {
-
-        "registros_procesados": registros_procesados,
-
-        "registros_con_error": len(ids_pagos_con_errores),
-
-        "errores_detalle": errores_detalle[:100],
-
-        "ids_pagos_con_errores": ids_pagos_con_errores,
-
-        "cuotas_aplicadas": operaciones_cuota_total,
-
-        "operaciones_cuota_total": operaciones_cuota_total,
-
-        "pagos_con_aplicacion_a_cuotas": pagos_con_aplicacion_a_cuotas,
-
-        "pagos_sin_aplicacion_cuotas": pagos_sin_aplicacion_cuotas[:_limite_sin_aplicacion],
-
-        "pagos_sin_aplicacion_cuotas_total": n_sin_aplicacion,
-
-        "pagos_sin_aplicacion_cuotas_truncados": n_sin_aplicacion > _limite_sin_aplicacion,
-
-        "total_datos_revisar": total_datos_revisar,
-
-        "mensaje": mensaje_base,
+    lanzar_importacion(job.id, ejecutor)
 
-    }
+    return estado_importacion(db, job)
 
 
 
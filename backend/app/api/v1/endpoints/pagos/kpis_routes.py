@@ -54,7 +54,7 @@ from fastapi.responses import StreamingResponse, Response
 
 from pydantic import BaseModel, field_validator
 
-from sqlalchemy import and_, case, delete, desc, exists, func, inspect, not_, or_, select, text
+from sqlalchemy import delete, desc, exists, inspect, not_, or_, text
 
 from sqlalchemy.orm import Session, aliased
 
@@ -94,12 +94,6 @@ from app.services.pago_numero_documento import (
 
 from app.core.serializers import to_float, format_date_iso
 
-from app.models.cliente import Cliente
-
-from app.models.cuota import Cuota
-
-from app.models.prestamo import Prestamo
-
 from app.models.pago import Pago
 
 from app.models.pago_comprobante_imagen import PagoComprobanteImagen
@@ -172,7 +166,6 @@ from app.services.pago_registro_moneda import (
 )
 from app.services.pago_huella_funcional import (
     conflicto_huella_para_creacion,
-    contar_prestamos_con_huella_funcional_duplicada,
     HTTP_409_DETAIL_HUELLA_FUNCIONAL,
     mensaje_409_huella_funcional_con_id,
     primer_id_conflicto_huella_funcional,
@@ -183,6 +176,7 @@ from app.services.pago_huella_metricas import (
     registrar_rechazo_huella_funcional,
     snapshot_rechazos_huella_funcional,
 )
+from app.services import pagos_kpis
 
 from app.services.cobros.cedula_reportar_bs_service import (
 
@@ -243,7 +237,6 @@ from .pago_integridad_db import _integridad_error_pgcode_y_constraint
 from .pago_normalizacion import (
     _celda_a_string_documento,
     _normalizar_ref_fingerprint,
-    _safe_float,
     _validar_monto,
 )
 from .pago_zona_horaria import _calcular_dias_mora, _hoy_local
@@ -285,6 +278,8 @@ def get_pagos_kpis(
 
     fecha_fin: Optional[str] = Query(None),
 
+    refrescar: bool = Query(False, description="Ignora pagos_kpis_cache y recalcula en vivo."),
+
     db: Session = Depends(get_db),
 
 ):
@@ -301,6 +296,8 @@ def get_pagos_kpis(
 
     Parámetros: mes (1-12) y anio (2000-2100). Si no se envían, se usa el mes actual.
 
+    Cache: pagos_kpis_cache (app.services.pagos_kpis), invalidada por prestamo_versiones y TTL.
+
     """
 
     try:
@@ -345,247 +342,25 @@ def get_pagos_kpis(
 
 
 
-        # Condiciones base: solo clientes ACTIVOS
-
-        conds_activo = [
-
-            Cuota.prestamo_id == Prestamo.id,
-
-            Prestamo.cliente_id == Cliente.id,
-
-            Cliente.estado == "ACTIVO",
-
-            Prestamo.estado == "APROBADO",
-
-        ]
-
-        base_where = and_(*conds_activo)
-
-
-
-        # Una sola consulta con agregación condicional para los 5 montos (menos round-trips a BD)
-
-        aggr = select(
-
-            func.coalesce(
-
-                func.sum(
-
-                    case(
-
-                        (
-
-                            and_(
-
-                                Cuota.fecha_vencimiento >= inicio_mes,
-
-                                Cuota.fecha_vencimiento <= fin_mes,
-
-                            ),
-
-                            Cuota.monto,
-
-                        ),
-
-                        else_=0,
-
-                    )
-
-                ),
-
-                0,
-
-            ).label("monto_a_cobrar_mes"),
-
-            func.coalesce(
-
-                func.sum(
-
-                    case(
-
-                        (
-
-                            and_(
-
-                                Cuota.fecha_pago.isnot(None),
-
-                                Cuota.fecha_pago >= inicio_mes,
-
-                                Cuota.fecha_pago <= fecha_referencia,
-
-                            ),
-
-                            Cuota.monto,
-
-                        ),
-
-                        else_=0,
-
-                    )
-
-                ),
-
-                0,
-
-            ).label("monto_cobrado_mes"),
-
-            func.coalesce(
-
-                func.sum(
-
-                    case(
+        datos = dict(
 
-                        (
+            pagos_kpis.obtener(
 
-                            and_(
+                db,
 
-                                Cuota.fecha_vencimiento >= inicio_mes,
-
-                                Cuota.fecha_vencimiento <= fin_mes,
-
-                                Cuota.fecha_vencimiento < fecha_referencia,
-
-                            ),
-
-                            Cuota.monto,
-
-                        ),
-
-                        else_=0,
-
-                    )
-
-                ),
-
-                0,
-
-            ).label("total_vencido_mes"),
-
-            func.coalesce(
-
-                func.sum(
-
-                    case(
-
-                        (
-
-                            and_(
-
-                                Cuota.fecha_vencimiento >= inicio_mes,
-
-                                Cuota.fecha_vencimiento <= fin_mes,
-
-                                Cuota.fecha_vencimiento < fecha_referencia,
-
-                                Cuota.fecha_pago.is_(None),
-
-                            ),
-
-                            Cuota.monto,
-
-                        ),
-
-                        else_=0,
-
-                    )
-
-                ),
-
-                0,
-
-            ).label("no_cobrado_mes"),
-
-            func.coalesce(
-
-                func.sum(case((Cuota.fecha_pago.is_(None), Cuota.monto), else_=0)),
-
-                0,
-
-            ).label("cartera_pendiente"),
-
-        ).select_from(Cuota).join(Prestamo, Cuota.prestamo_id == Prestamo.id).join(
-
-            Cliente, Prestamo.cliente_id == Cliente.id
-
-        ).where(base_where)
-
-
-
-        row = db.execute(aggr).one()
-
-        monto_a_cobrar_mes = row.monto_a_cobrar_mes or 0
-
-        monto_cobrado_mes = row.monto_cobrado_mes or 0
-
-        total_vencido_mes = row.total_vencido_mes or 0
-
-        no_cobrado_mes = row.no_cobrado_mes or 0
-
-        cartera_pendiente = row.cartera_pendiente or 0
-
-
-
-        morosidad_porcentaje = (
-
-            (_safe_float(no_cobrado_mes) / _safe_float(total_vencido_mes) * 100.0)
-
-            if total_vencido_mes and _safe_float(total_vencido_mes) > 0
-
-            else 0.0
-
-        )
+                pagos_kpis.TIPO_KPIS,
 
+                pagos_kpis.parametros_kpis(inicio_mes, fin_mes, fecha_referencia),
 
+                lambda: pagos_kpis.calcular_kpis(db, inicio_mes, fin_mes, fecha_referencia),
 
-        # Conteos: clientes en mora y clientes con préstamo (2 consultas ligeras)
-
-        subq = (
-
-            select(Prestamo.cliente_id)
-
-            .select_from(Cuota)
-
-            .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-            .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-            .where(
-
-                and_(*conds_activo),
-
-                Cuota.fecha_pago.is_(None),
-
-                Cuota.fecha_vencimiento < fecha_referencia,
+                refrescar=refrescar is True,
 
             )
 
-            .distinct()
-
         )
 
-        clientes_en_mora = db.scalar(select(func.count()).select_from(subq.subquery())) or 0
-
-        clientes_con_prestamo = db.scalar(
-
-            select(func.count(func.distinct(Prestamo.cliente_id)))
-
-            .select_from(Prestamo)
-
-            .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-            .where(Cliente.estado == "ACTIVO", Prestamo.estado == "APROBADO")
-
-        ) or 0
-
-        clientes_al_dia = max(0, clientes_con_prestamo - clientes_en_mora)
-
-
-
-        mes_resp = mes if mes is not None else inicio_mes.month
-
-        anio_resp = anio if anio is not None else inicio_mes.year
-
-        n_prestamos_huella_dup = contar_prestamos_con_huella_funcional_duplicada(db)
+        n_prestamos_huella_dup = datos.pop("prestamos_con_alerta_control_huella_funcional_duplicada", None)
 
         calidad_huella = {
 
@@ -599,7 +374,9 @@ def get_pagos_kpis(
 
                 "rechazos_409_* cuenta rechazos API desde el ultimo arranque del proceso; "
 
-                "prestamos_con_alerta_* es conteo en tiempo real en BD (misma regla que auditoria cartera)."
+                "prestamos_con_alerta_* es conteo en BD (misma regla que auditoria cartera), "
+
+                "recalculado con los KPI al registrarse cualquier pago o cambio de cuotas."
 
             ),
 
@@ -607,21 +384,21 @@ def get_pagos_kpis(
 
         return {
 
-            "montoACobrarMes": _safe_float(monto_a_cobrar_mes),
+            "montoACobrarMes": datos["montoACobrarMes"],
 
-            "montoCobradoMes": _safe_float(monto_cobrado_mes),
+            "montoCobradoMes": datos["montoCobradoMes"],
 
-            "morosidadMensualPorcentaje": round(morosidad_porcentaje, 2),
+            "morosidadMensualPorcentaje": datos["morosidadMensualPorcentaje"],
 
-            "mes": mes_resp,
+            "mes": mes if mes is not None else inicio_mes.month,
 
-            "anio": anio_resp,
+            "anio": anio if anio is not None else inicio_mes.year,
 
-            "saldoPorCobrar": _safe_float(cartera_pendiente),
+            "saldoPorCobrar": datos["saldoPorCobrar"],
 
-            "clientesEnMora": clientes_en_mora,
+            "clientesEnMora": datos["clientesEnMora"],
 
-            "clientesAlDia": clientes_al_dia,
+            "clientesAlDia": datos["clientesAlDia"],
 
             "calidad_carga_pagos_huella": calidad_huella,
 
@@ -677,35 +454,27 @@ def get_pagos_kpis(
 
 
 
-def _stats_conds_cuota(analista: Optional[str], concesionario: Optional[str], modelo: Optional[str]):
-
-    """Condiciones base para filtrar cuotas por préstamo (solo clientes ACTIVOS + analista/concesionario/modelo)."""
-
-    conds = [
+@router.post("/kpis/verificar-cache")
 
-        Cuota.prestamo_id == Prestamo.id,
+def verificar_pagos_kpis_cache(
 
-        Prestamo.cliente_id == Cliente.id,
+    corregir: bool = Query(True, description="Reescribe con el valor en vivo las entradas con diferencias."),
 
-        Cliente.estado == "ACTIVO",
-
-        Prestamo.estado == "APROBADO",
-
-    ]
+    db: Session = Depends(get_db),
 
-    if analista:
+    _admin: UserResponse = Depends(require_admin),
 
-        conds.append(Prestamo.analista == analista)
+):
 
-    if concesionario:
+    """
 
-        conds.append(Prestamo.concesionario == concesionario)
+    Control de consistencia de pagos_kpis_cache: recalcula en vivo cada entrada vigente de /kpis y /stats y
 
-    if modelo:
+    devuelve las diferencias campo a campo (cache vs vivo).
 
-        conds.append(Prestamo.modelo_vehiculo == modelo)
+    """
 
-    return conds
+    return pagos_kpis.verificar_cache(db, corregir=corregir)
 
 
 
@@ -725,6 +494,8 @@ def get_pagos_stats(
 
     modelo: Optional[str] = Query(None),
 
+    refrescar: bool = Query(False, description="Ignora pagos_kpis_cache y recalcula en vivo."),
+
     db: Session = Depends(get_db),
 
 ):
@@ -735,128 +506,28 @@ def get_pagos_stats(
 
     cuotas_pagadas, cuotas_pendientes, cuotas_atrasadas, pagos_hoy.
 
+    Un rollup por estado de cuota, cacheado en pagos_kpis_cache por filtros y día.
+
     """
 
     hoy = _hoy_local()
 
-    use_filters = bool(analista or concesionario or modelo)
-
-
-
-    def _q_cuotas():
-
-        return (
-
-            select(Cuota)
-
-            .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-            .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-            .where(and_(*_stats_conds_cuota(analista, concesionario, modelo)))
-
-        )
-
-
-
-    def _count(q):
-
-        subq = q.subquery()
-
-        return int(db.scalar(select(func.count()).select_from(subq)) or 0)
-
-
-
     try:
 
-        # Cuotas pagadas / pendientes / atrasadas (solo clientes ACTIVOS)
-
-        cuotas_pagadas = _count(_q_cuotas().where(Cuota.fecha_pago.isnot(None)))
-
-        cuotas_pendientes = _count(_q_cuotas().where(Cuota.fecha_pago.is_(None)))
-
-        cuotas_atrasadas = _count(
-
-            _q_cuotas().where(Cuota.fecha_pago.is_(None), Cuota.fecha_vencimiento < hoy)
-
-        )
+        return pagos_kpis.obtener(
 
-        # Total pagado (solo clientes ACTIVOS)
+            db,
 
-        q_sum = (
+            pagos_kpis.TIPO_STATS,
 
-            select(func.coalesce(func.sum(Cuota.monto), 0))
+            pagos_kpis.parametros_stats(hoy, analista, concesionario, modelo),
 
-            .select_from(Cuota)
+            lambda: pagos_kpis.calcular_stats(db, hoy, analista, concesionario, modelo),
 
-            .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-            .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-            .where(and_(*_stats_conds_cuota(analista, concesionario, modelo), Cuota.fecha_pago.isnot(None))
-
-            )
+            refrescar=refrescar is True,
 
         )
 
-        total_pagado = db.scalar(q_sum) or 0
-
-        # Pagos hoy
-
-        pagos_hoy = _count(
-
-            _q_cuotas().where(
-
-                Cuota.fecha_pago.isnot(None),
-
-                func.date(Cuota.fecha_pago) == hoy,
-
-            )
-
-        )
-
-        # Pagos por estado
-
-        q_estado = (
-
-            select(Cuota.estado, func.count())
-
-            .select_from(Cuota)
-
-            .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-            .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-            .where(and_(*_stats_conds_cuota(analista, concesionario, modelo)))
-
-            .group_by(Cuota.estado)
-
-        )
-
-        rows_estado = db.execute(q_estado).all()
-
-        pagos_por_estado = [{"estado": str(r[0]) if r[0] is not None else "N/A", "count": int(r[1])} for r in rows_estado]
-
-        total_pagos = cuotas_pagadas + cuotas_pendientes
-
-        return {
-
-            "total_pagos": total_pagos,
-
-            "total_pagado": _safe_float(total_pagado),
-
-            "pagos_por_estado": pagos_por_estado,
-
-            "cuotas_pagadas": cuotas_pagadas,
-
-            "cuotas_pendientes": cuotas_pendientes,
-
-            "cuotas_atrasadas": cuotas_atrasadas,
-
-            "pagos_hoy": pagos_hoy,
-
-        }
-
     except Exception as e:
 
         logger.exception("Error en GET /pagos/stats: %s", e)
@@ -887,7 +558,3 @@ def get_pagos_stats(
 
         }
 
-
-
-
-
@@ -1515,6 +1515,8 @@ def importar_un_pago_reportado_a_pagos(
 
     huellas_funcional_lote: Optional[set[tuple[int, str, str, str]]] = None,
 
+    usuario: Optional[Any] = None,
+
 ) -> dict:
 
     """
@@ -1526,6 +1528,9 @@ def importar_un_pago_reportado_a_pagos(
 
     No hace commit ni aplica a cuotas (el lote o el caller aplican después).
 
+    `usuario`: quien importa (objeto o dict con rol); sin usuario no se cargan pagos de préstamos en
+    DESISTIMIENTO/LIQUIDADO (canales automáticos).
+
     Retorna {"ok": True, "pago": Pago} o {"ok": False, "error": str, "referencia": ..., "pce_id": int|None}.
 
     """
@@ -1881,7 +1886,7 @@ def importar_un_pago_reportado_a_pagos(
     )
 
     err_desist = None
-    if not usuario_puede_cargar_pago_desistimiento_a_cartera(current_user):
+    if not usuario_puede_cargar_pago_desistimiento_a_cartera(usuario):
         err_desist = bloquear_carga_automatica_a_cartera_si_desistimiento(db, prestamo_id)
     if err_desist:
         return _err_con_pce(err_desist, cedula_cliente=cedula_raw, prestamo_id=prestamo_id)
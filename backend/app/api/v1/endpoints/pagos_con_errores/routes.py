@@ -51,12 +51,14 @@ from app.services.pago_numero_documento import (
     numero_documento_ya_registrado,
     pago_con_error_ya_cargado_estricto,
     pago_huerfano_adoptable_por_documento,
+    pagos_con_error_ya_cargados_estricto,
     primer_pago_cartera_por_documento,
 )
 from app.services.pagos_gmail.gmail_service import extract_lote_it_master_cedula_from_subject
 from app.utils.cedula_almacenamiento import (
     normalizar_cedula_almacenamiento,
     resolver_cedula_almacenada_en_clientes,
+    resolver_cedulas_almacenadas_en_clientes,
 )
 
 
@@ -115,10 +117,13 @@ def _resolver_prestamo_id_para_mover_a_cartera(
     db: Session,
     cedula_resuelta: str,
     prestamo_id_hint: Optional[int] = None,
+    *,
+    aprobados_por_cedula: Optional[dict[str, list[int]]] = None,
 ) -> tuple[Optional[int], Optional[str]]:
     """
     Préstamo destino al pasar de pagos_con_errores a pagos.
     Si la fila no trae prestamo_id, intenta el único APROBADO de la cédula.
+    `aprobados_por_cedula` (precargado por lote en mover-a-pagos) evita la consulta por fila.
     """
     if prestamo_id_hint is not None and int(prestamo_id_hint) > 0:
         from app.services.pagos_desistimiento_politica import (
@@ -131,20 +136,23 @@ def _resolver_prestamo_id_para_mover_a_cartera(
             return None, err_desist
         return pid, None
 
-    prestamos = (
-        db.execute(
-            select(Prestamo)
-            .where(
-                Prestamo.cedula == cedula_resuelta,
-                Prestamo.estado == "APROBADO",
+    if aprobados_por_cedula is not None and cedula_resuelta in aprobados_por_cedula:
+        prestamos = aprobados_por_cedula[cedula_resuelta]
+    else:
+        prestamos = (
+            db.execute(
+                select(Prestamo.id)
+                .where(
+                    Prestamo.cedula == cedula_resuelta,
+                    Prestamo.estado == "APROBADO",
+                )
+                .order_by(Prestamo.id.asc())
             )
-            .order_by(Prestamo.id.asc())
+            .scalars()
+            .all()
         )
-        .scalars()
-        .all()
-    )
     if len(prestamos) == 1:
-        return int(prestamos[0].id), None
+        return int(prestamos[0]), None
     if len(prestamos) > 1:
         return None, (
             f"cédula {cedula_resuelta} con {len(prestamos)} préstamos APROBADOS: "
@@ -990,292 +998,340 @@ def limpiar_pagos_con_error_ya_cargados(
     }
 
 
-@router.post("/mover-a-pagos", response_model=dict)
+def _crear_o_adoptar_pago_desde_pago_con_error(
+    db: Session,
+    row: PagoConError,
+    cedula_resuelta: str,
+    prestamo_id_destino: Optional[int],
+) -> tuple[Optional[Pago], Optional[str]]:
+    """
+    Crea el `Pago` de cartera para la fila (o adopta el huérfano con el mismo documento).
+    Retorna (pago, None) o (None, motivo) si el documento/huella ya existe. Hace flush; no aplica cuotas.
+    """
+    pid = int(row.id)
+    numero_documento_normalizado = row.numero_documento or ""
 
-def mover_a_pagos_normales(
+    adopt_pago_id = None
+    if numero_documento_normalizado and prestamo_id_destino:
+        adopt_pago_id = pago_huerfano_adoptable_por_documento(
+            db,
+            numero_documento_normalizado,
+            prestamo_id_destino=int(prestamo_id_destino),
+            cedula_cliente=cedula_resuelta,
+        )
 
-    payload: EliminarPorDescargaBody = Body(...),
+    if adopt_pago_id is None and numero_documento_normalizado:
+        if numero_documento_ya_registrado(
+            db,
+            numero_documento_normalizado,
+            exclude_pago_con_error_id=pid,
+        ):
+            logger.warning(
+                "mover_a_pagos_normales: pago %s documento duplicado en pagos: %s",
+                pid,
+                numero_documento_normalizado,
+            )
+            return None, f"documento '{numero_documento_normalizado}' ya existe en tabla pagos"
+
+    pago_huella_id = pago_con_error_conflicto_huella_existente(db, row)
+    if pago_huella_id is not None and adopt_pago_id != pago_huella_id:
+        return None, mensaje_409_huella_funcional_con_id(pago_huella_id)
+
+    # «Guardar y procesar» = intención explícita de pasar a cartera. Si hay préstamo y monto,
+    # forzamos validación cartera (conciliado + verificado SI) para que la columna Cartera y la
+    # cascada queden alineadas con el estado final. Sin préstamo respetamos la fila origen.
+    debe_validar_cartera = bool(prestamo_id_destino) and float(row.monto_pagado or 0) > 0
+    if debe_validar_cartera:
+        conciliado = True
+    else:
+        conciliado = bool(row.conciliado) if row.conciliado is not None else False
+
+    ahora = datetime.now(ZoneInfo("America/Caracas")) if conciliado else None
+
+    # `chk_pagos_conciliado_pendiente_inconsistente` rechaza (conciliado=True ∧ estado=PENDIENTE).
+    # Si vamos a marcar conciliado y el origen estaba en PENDIENTE/sin estado, abrimos en PAGADO; la
+    # cascada posterior puede sobrescribir si aplica cuotas (mismo patrón que revision_manual).
+    estado_inicial = (row.estado or "PENDIENTE").strip().upper() or "PENDIENTE"
+    if conciliado and estado_inicial == "PENDIENTE":
+        estado_inicial = "PAGADO"
+
+    if adopt_pago_id is None:
+        pago = Pago(
+            cedula_cliente=cedula_resuelta,
+            prestamo_id=prestamo_id_destino,
+            fecha_pago=row.fecha_pago,
+            monto_pagado=row.monto_pagado,
+            numero_documento=row.numero_documento or "",
+            institucion_bancaria=row.institucion_bancaria,
+            estado=estado_inicial,
+            conciliado=conciliado,
+            fecha_conciliacion=ahora,
+            verificado_concordancia="SI" if conciliado else "",
+            notas=row.notas,
+            referencia_pago=row.referencia_pago or row.numero_documento or "N/A",
+        )
+        db.add(pago)
+        db.flush()
+        return pago, None
 
-    db: Session = Depends(get_db),
+    pago = db.get(Pago, int(adopt_pago_id))
+    if pago is None:
+        return None, f"no se encontró pago huérfano id={adopt_pago_id} para adoptar"
+    logger.info(
+        "mover_a_pagos_normales: adoptando pago huérfano id=%s con datos de pago_con_error id=%s",
+        adopt_pago_id,
+        pid,
+    )
+    pago.cedula_cliente = cedula_resuelta
+    pago.prestamo_id = prestamo_id_destino
+    pago.fecha_pago = row.fecha_pago
+    pago.monto_pagado = row.monto_pagado
+    if row.institucion_bancaria:
+        pago.institucion_bancaria = row.institucion_bancaria
+    pago.estado = estado_inicial
+    pago.conciliado = conciliado
+    pago.fecha_conciliacion = ahora
+    pago.verificado_concordancia = "SI" if conciliado else ""
+    if row.notas:
+        pago.notas = row.notas
+    pago.referencia_pago = (
+        row.referencia_pago or row.numero_documento or pago.referencia_pago or "N/A"
+    )
+    db.flush()
+    return pago, None
 
-):
 
-    """Mueve pagos corregidos de pagos_con_errores a pagos (y los elimina de con_errores). Aplica cada pago a cuotas (cascada) para que préstamos y estado de cuenta se actualicen."""
+@router.post("/mover-a-pagos", response_model=dict)
+def mover_a_pagos_normales(
+    payload: EliminarPorDescargaBody = Body(...),
+    db: Session = Depends(get_db),
+):
+    """Mueve pagos corregidos de pagos_con_errores a pagos (y los elimina de con_errores). Aplica cada pago a cuotas (cascada) para que préstamos y estado de cuenta se actualicen.
 
+    Por lote: 1) precarga filas, cédulas en `clientes`, préstamos destino y "ya cargados" con pocas
+    consultas de conjunto; 2) crea/adopta cada `Pago` en su savepoint (un fallo no revierte las demás
+    filas); 3) una cascada por préstamo (lock una vez, pagos por fecha). `resultados` trae el
+    desenlace de cada id enviado.
+    """
     ids = payload.ids
-
     if not ids:
-
         logger.info("mover_a_pagos_normales: lista vacía de IDs")
         return {"movidos": 0, "mensaje": "No hay IDs"}
 
     logger.info(f"mover_a_pagos_normales: iniciando con {len(ids)} pago(s): {ids}")
 
-    from app.models.pago import Pago
-
-    from app.api.v1.endpoints.pagos import _aplicar_pago_a_cuotas_interno
-
-
+    from app.services.pagos_cascada_aplicacion import aplicar_pagos_a_cuotas_por_prestamo
+    from app.services.pagos_desistimiento_politica import (
+        bloquear_carga_automatica_a_cartera_si_desistimiento,
+    )
 
     movidos = 0
-
     cuotas_aplicadas = 0
-
     errores_procesamiento = []
     # Filas eliminadas en silencio porque ya están cargadas y aplicadas en cartera
     # (mismo doc + cuota_pagos + cliente/préstamo): redundantes, no se mueven.
     ya_cargado_eliminados: list[dict[str, Any]] = []
     movidos_detalle: list[dict[str, Any]] = []
+    resultados: dict[Any, dict[str, Any]] = {}
 
-    for idx, pid in enumerate(ids, start=1):
+    def _error(pid: Any, mensaje: str) -> None:
+        errores_procesamiento.append(f"Pago {pid}: {mensaje}")
+        resultados[pid] = {"pago_con_error_id": pid, "resultado": "error", "error": mensaje}
 
+    # --- 1) Precarga por conjuntos -------------------------------------------------------------
+    ids_validos: list[int] = []
+    for pid in ids:
         if not isinstance(pid, int) or pid <= 0:
-
             logger.warning(f"mover_a_pagos_normales: ID inválido (tipo/valor): {pid}")
-            continue
-
-        row = db.get(PagoConError, pid)
-
+            resultados[pid] = {"pago_con_error_id": pid, "resultado": "id_invalido"}
+        elif pid not in ids_validos:
+            ids_validos.append(pid)
+
+    filas = {
+        int(r.id): r
+        for r in db.execute(select(PagoConError).where(PagoConError.id.in_(ids_validos))).scalars()
+    } if ids_validos else {}
+    cedulas_resueltas = resolver_cedulas_almacenadas_en_clientes(
+        db, [r.cedula_cliente for r in filas.values()]
+    )
+    ya_cargados = pagos_con_error_ya_cargados_estricto(db, list(filas.values()))
+
+    cedulas_sin_prestamo = {
+        cedulas_resueltas.get(r.cedula_cliente)
+        for r in filas.values()
+        if not (r.prestamo_id and int(r.prestamo_id) > 0)
+    } - {None}
+    aprobados_por_cedula: dict[str, list[int]] = {c: [] for c in cedulas_sin_prestamo}
+    if cedulas_sin_prestamo:
+        for pres_id, ced in db.execute(
+            select(Prestamo.id, Prestamo.cedula)
+            .where(Prestamo.cedula.in_(list(cedulas_sin_prestamo)), Prestamo.estado == "APROBADO")
+            .order_by(Prestamo.id.asc())
+        ).all():
+            aprobados_por_cedula[ced].append(int(pres_id))
+    # Deja los préstamos en el identity map: el chequeo de desistimiento (db.get) no vuelve a la BD.
+    ids_prestamo = {int(r.prestamo_id) for r in filas.values() if r.prestamo_id and int(r.prestamo_id) > 0}
+    ids_prestamo.update(p for lista in aprobados_por_cedula.values() for p in lista)
+    if ids_prestamo:
+        db.execute(select(Prestamo).where(Prestamo.id.in_(sorted(ids_prestamo)))).scalars().all()
+
+    # --- 2) Alta/adopción de cada Pago (savepoint por fila) ------------------------------------
+    pagos_por_fila: dict[int, Pago] = {}
+    for idx, pid in enumerate(ids_validos, start=1):
+        row = filas.get(pid)
         if not row:
-
             logger.warning(f"mover_a_pagos_normales: PagoConError {pid} no encontrado")
+            resultados[pid] = {"pago_con_error_id": pid, "resultado": "no_encontrado"}
             continue
 
-        logger.debug(f"mover_a_pagos_normales: procesando pago {idx}/{len(ids)} (id={pid}, cedula={row.cedula_cliente}, monto={row.monto_pagado})")
-
-        # Aislar el procesamiento de cada fila: si una explota (constraint, cascada, etc.) hacemos
-        # rollback parcial y seguimos con las demás, evitando 500 por toda la lista.
-        try:
+        logger.debug(f"mover_a_pagos_normales: procesando pago {idx}/{len(ids_validos)} (id={pid}, cedula={row.cedula_cliente}, monto={row.monto_pagado})")
 
-            # Prechequeo estricto: si el documento ya está aplicado a cuotas con misma cédula y
-            # mismo préstamo (cuando el origen lo informa), la fila es redundante: la eliminamos
-            # silenciosamente y la reportamos como "ya_cargado_eliminados". Ahorra a operación
-            # tener que ir a borrar manualmente filas duplicadas que ya pasaron al préstamo.
-            pago_existente_id = pago_con_error_ya_cargado_estricto(db, row)
+        # Prechequeo estricto: si el documento ya está aplicado a cuotas con misma cédula y
+        # mismo préstamo (cuando el origen lo informa), la fila es redundante: la eliminamos
+        # silenciosamente y la reportamos como "ya_cargado_eliminados". Ahorra a operación
+        # tener que ir a borrar manualmente filas duplicadas que ya pasaron al préstamo.
+        pago_existente_id = ya_cargados.get(pid)
+        if pago_existente_id is not None:
             motivo_ya_cargado = "estricto"
-            if pago_existente_id is not None:
-                ya_cargado_eliminados.append(
-                    {
-                        "pago_con_error_id": pid,
-                        "pago_id": pago_existente_id,
-                        "cedula": row.cedula_cliente,
-                        "prestamo_id": row.prestamo_id,
-                        "numero_documento": row.numero_documento,
-                        "motivo": motivo_ya_cargado,
-                    }
-                )
-                logger.info(
-                    "mover_a_pagos_normales: pago_con_error_id=%s ya cargado en pago_id=%s (%s); eliminado por redundante",
-                    pid,
-                    pago_existente_id,
-                    motivo_ya_cargado,
+            detalle_ya_cargado = {
+                "pago_con_error_id": pid,
+                "pago_id": pago_existente_id,
+                "cedula": row.cedula_cliente,
+                "prestamo_id": row.prestamo_id,
+                "numero_documento": row.numero_documento,
+                "motivo": motivo_ya_cargado,
+            }
+            try:
+                with db.begin_nested():
+                    db.delete(row)
+                    db.flush()
+            except Exception as e_row:
+                logger.error(
+                    f"mover_a_pagos_normales: fallo eliminando pago_con_error id={pid}: {e_row}",
+                    exc_info=True,
                 )
-                db.delete(row)
-                db.flush()
+                _error(pid, _mensaje_error_mover_pago_a_cartera(e_row))
                 continue
-
-            numero_documento_normalizado = row.numero_documento or ""
-
-            # Resolver la cédula EXACTA como está almacenada en `clientes` (FK fk_pagos_cedula).
-            cedula_resuelta = resolver_cedula_almacenada_en_clientes(db, row.cedula_cliente)
-            if not cedula_resuelta:
-                cedula_norm_orig = (
-                    normalizar_cedula_almacenamiento(row.cedula_cliente) or "(vacía)"
-                )
-                logger.warning(
-                    "mover_a_pagos_normales: pago %s sin cliente en `clientes` (cedula=%s)",
-                    pid,
-                    cedula_norm_orig,
-                )
-                errores_procesamiento.append(
-                    f"Pago {pid}: cliente '{cedula_norm_orig}' no existe en `clientes`. "
-                    "Registre/ajuste la cédula del cliente y reintente."
-                )
-                continue  # No insertar: violaría fk_pagos_cedula.
-
-            prestamo_id_destino, err_prestamo = _resolver_prestamo_id_para_mover_a_cartera(
-                db,
-                cedula_resuelta,
-                row.prestamo_id,
+            ya_cargado_eliminados.append(detalle_ya_cargado)
+            resultados[pid] = {**detalle_ya_cargado, "resultado": "ya_cargado"}
+            logger.info(
+                "mover_a_pagos_normales: pago_con_error_id=%s ya cargado en pago_id=%s (%s); eliminado por redundante",
+                pid,
+                pago_existente_id,
+                motivo_ya_cargado,
             )
-            if err_prestamo:
-                logger.warning(
-                    "mover_a_pagos_normales: pago %s sin préstamo destino (%s)",
-                    pid,
-                    err_prestamo,
-                )
-                errores_procesamiento.append(f"Pago {pid}: {err_prestamo}")
-                continue
+            continue
 
-            from app.services.pagos_desistimiento_politica import (
-                bloquear_carga_automatica_a_cartera_si_desistimiento,
+        # Cédula EXACTA como está almacenada en `clientes` (FK fk_pagos_cedula).
+        cedula_resuelta = cedulas_resueltas.get(row.cedula_cliente)
+        if not cedula_resuelta:
+            cedula_norm_orig = (
+                normalizar_cedula_almacenamiento(row.cedula_cliente) or "(vacía)"
             )
-
-            err_desist = bloquear_carga_automatica_a_cartera_si_desistimiento(
-                db, prestamo_id_destino
+            logger.warning(
+                "mover_a_pagos_normales: pago %s sin cliente en `clientes` (cedula=%s)",
+                pid,
+                cedula_norm_orig,
             )
-            if err_desist:
-                logger.warning(
-                    "mover_a_pagos_normales: pago %s bloqueado DESISTIMIENTO prestamo=%s",
-                    pid,
-                    prestamo_id_destino,
-                )
-                errores_procesamiento.append(f"Pago {pid}: {err_desist}")
-                continue
+            _error(
+                pid,
+                f"cliente '{cedula_norm_orig}' no existe en `clientes`. "
+                "Registre/ajuste la cédula del cliente y reintente.",
+            )
+            continue  # No insertar: violaría fk_pagos_cedula.
 
-            adopt_pago_id = None
-            if numero_documento_normalizado and prestamo_id_destino:
-                adopt_pago_id = pago_huerfano_adoptable_por_documento(
-                    db,
-                    numero_documento_normalizado,
-                    prestamo_id_destino=int(prestamo_id_destino),
-                    cedula_cliente=cedula_resuelta,
-                )
+        prestamo_id_destino, err_prestamo = _resolver_prestamo_id_para_mover_a_cartera(
+            db,
+            cedula_resuelta,
+            row.prestamo_id,
+            aprobados_por_cedula=aprobados_por_cedula,
+        )
+        if err_prestamo:
+            logger.warning(
+                "mover_a_pagos_normales: pago %s sin préstamo destino (%s)",
+                pid,
+                err_prestamo,
+            )
+            _error(pid, err_prestamo)
+            continue
 
-            if adopt_pago_id is None and numero_documento_normalizado:
-                duplicado_existe = numero_documento_ya_registrado(
-                    db,
-                    numero_documento_normalizado,
-                    exclude_pago_con_error_id=pid,
-                )
-                if duplicado_existe:
-                    logger.warning(
-                        "mover_a_pagos_normales: pago %s documento duplicado en pagos: %s",
-                        pid,
-                        numero_documento_normalizado,
-                    )
-                    errores_procesamiento.append(
-                        f"Pago {pid}: documento '{numero_documento_normalizado}' ya existe en tabla pagos"
-                    )
-                    continue
+        err_desist = bloquear_carga_automatica_a_cartera_si_desistimiento(
+            db, prestamo_id_destino
+        )
+        if err_desist:
+            logger.warning(
+                "mover_a_pagos_normales: pago %s bloqueado DESISTIMIENTO prestamo=%s",
+                pid,
+                prestamo_id_destino,
+            )
+            _error(pid, err_desist)
+            continue
 
-            pago_huella_id = pago_con_error_conflicto_huella_existente(db, row)
-            if pago_huella_id is not None and adopt_pago_id != pago_huella_id:
-                errores_procesamiento.append(
-                    f"Pago {pid}: {mensaje_409_huella_funcional_con_id(pago_huella_id)}"
+        try:
+            with db.begin_nested():
+                pago, err_alta = _crear_o_adoptar_pago_desde_pago_con_error(
+                    db, row, cedula_resuelta, prestamo_id_destino
                 )
-                continue
-
-            # «Guardar y procesar» = intención explícita de pasar a cartera. Si hay préstamo y monto,
-            # forzamos validación cartera (conciliado + verificado SI) para que la columna Cartera y la
-            # cascada queden alineadas con el estado final. Sin préstamo respetamos la fila origen.
-            debe_validar_cartera = bool(prestamo_id_destino) and float(row.monto_pagado or 0) > 0
-            if debe_validar_cartera:
-                conciliado = True
-            else:
-                conciliado = bool(row.conciliado) if row.conciliado is not None else False
-
-            ahora = datetime.now(ZoneInfo("America/Caracas")) if conciliado else None
-
-            # `chk_pagos_conciliado_pendiente_inconsistente` rechaza (conciliado=True ∧ estado=PENDIENTE).
-            # Si vamos a marcar conciliado y el origen estaba en PENDIENTE/sin estado, abrimos en PAGADO; la
-            # cascada posterior puede sobrescribir si aplica cuotas (mismo patrón que revision_manual).
-            estado_inicial = (row.estado or "PENDIENTE").strip().upper() or "PENDIENTE"
-            if conciliado and estado_inicial == "PENDIENTE":
-                estado_inicial = "PAGADO"
-
-            if adopt_pago_id is not None:
-                pago = db.get(Pago, int(adopt_pago_id))
                 if pago is None:
-                    errores_procesamiento.append(
-                        f"Pago {pid}: no se encontró pago huérfano id={adopt_pago_id} para adoptar"
-                    )
+                    _error(pid, err_alta or "no se pudo crear el pago")
                     continue
-                logger.info(
-                    "mover_a_pagos_normales: adoptando pago huérfano id=%s con datos de pago_con_error id=%s",
-                    adopt_pago_id,
-                    pid,
-                )
-            else:
-                pago = Pago(
-                    cedula_cliente=cedula_resuelta,
-                    prestamo_id=prestamo_id_destino,
-                    fecha_pago=row.fecha_pago,
-                    monto_pagado=row.monto_pagado,
-                    numero_documento=row.numero_documento or "",
-                    institucion_bancaria=row.institucion_bancaria,
-                    estado=estado_inicial,
-                    conciliado=conciliado,
-                    fecha_conciliacion=ahora,
-                    verificado_concordancia="SI" if conciliado else "",
-                    notas=row.notas,
-                    referencia_pago=row.referencia_pago or row.numero_documento or "N/A",
-                )
-                db.add(pago)
-                db.flush()
-                db.refresh(pago)
-
-            if adopt_pago_id is not None:
-                pago.cedula_cliente = cedula_resuelta
-                pago.prestamo_id = prestamo_id_destino
-                pago.fecha_pago = row.fecha_pago
-                pago.monto_pagado = row.monto_pagado
-                if row.institucion_bancaria:
-                    pago.institucion_bancaria = row.institucion_bancaria
-                pago.estado = estado_inicial
-                pago.conciliado = conciliado
-                pago.fecha_conciliacion = ahora
-                pago.verificado_concordancia = "SI" if conciliado else ""
-                if row.notas:
-                    pago.notas = row.notas
-                pago.referencia_pago = (
-                    row.referencia_pago or row.numero_documento or pago.referencia_pago or "N/A"
-                )
+                db.delete(row)
                 db.flush()
-                db.refresh(pago)
-
-            nuevo_pago_id = pago.id
-            cc_aplicadas = 0
-            cp_aplicadas = 0
-
-            if pago.prestamo_id and float(pago.monto_pagado or 0) > 0:
-                try:
-                    cc, cp = _aplicar_pago_a_cuotas_interno(pago, db)
-                    cc_aplicadas = cc
-                    cp_aplicadas = cp
-
-                    if cc > 0 or cp > 0:
-                        pago.estado = "PAGADO"
-                        cuotas_aplicadas += cc + cp
-                        logger.info(
-                            f"mover_a_pagos_normales: pago id={nuevo_pago_id} aplicado a {cc} cuota(s) completa(s), {cp} parcial(es)"
-                        )
-                    else:
-                        logger.warning(
-                            f"mover_a_pagos_normales: pago id={nuevo_pago_id} no se aplicó a ninguna cuota (prestamo={pago.prestamo_id})"
-                        )
-                except Exception as e:
-                    logger.error(
-                        f"mover_a_pagos_normales: error aplicando pago id={nuevo_pago_id} a cuotas: {str(e)}",
-                        exc_info=True,
-                    )
-                    errores_procesamiento.append(f"Pago {pid}: cuotas: {str(e)}")
-
-            db.delete(row)
-            logger.debug(
-                f"mover_a_pagos_normales: pago id={pid} eliminado de pagos_con_errores, creado pago id={nuevo_pago_id}"
-            )
-
-            db.flush()
-            movidos += 1
-            movidos_detalle.append(
-                {
-                    "pago_con_error_id": pid,
-                    "pago_id": nuevo_pago_id,
-                }
-            )
-
         except Exception as e_row:
-            db.rollback()
             logger.error(
                 f"mover_a_pagos_normales: fallo procesando pago_con_error id={pid}: {e_row}",
                 exc_info=True,
             )
-            errores_procesamiento.append(
-                f"Pago {pid}: {_mensaje_error_mover_pago_a_cartera(e_row)}"
-            )
+            _error(pid, _mensaje_error_mover_pago_a_cartera(e_row))
             continue
 
+        pagos_por_fila[pid] = pago
+        logger.debug(
+            f"mover_a_pagos_normales: pago id={pid} eliminado de pagos_con_errores, creado pago id={pago.id}"
+        )
+
+    # --- 3) Una cascada por préstamo --------------------------------------------------------------
+    try:
+        aplicacion = aplicar_pagos_a_cuotas_por_prestamo(list(pagos_por_fila.values()), db)
+    except Exception as e_cascada:
+        db.rollback()
+        logger.error(f"mover_a_pagos_normales: fallo en cascada por lote: {e_cascada}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error aplicando pagos a cuotas: {_mensaje_error_mover_pago_a_cartera(e_cascada)}",
+        ) from e_cascada
+
+    for pid, pago in pagos_por_fila.items():
+        cc, cp, err_cuotas = aplicacion.get(int(pago.id), (0, 0, None))
+        if err_cuotas:
+            errores_procesamiento.append(f"Pago {pid}: cuotas: {err_cuotas}")
+        elif cc > 0 or cp > 0:
+            pago.estado = "PAGADO"
+            cuotas_aplicadas += cc + cp
+            logger.info(
+                f"mover_a_pagos_normales: pago id={pago.id} aplicado a {cc} cuota(s) completa(s), {cp} parcial(es)"
+            )
+        elif pago.prestamo_id and float(pago.monto_pagado or 0) > 0:
+            logger.warning(
+                f"mover_a_pagos_normales: pago id={pago.id} no se aplicó a ninguna cuota (prestamo={pago.prestamo_id})"
+            )
+        movidos += 1
+        movidos_detalle.append(
+            {
+                "pago_con_error_id": pid,
+                "pago_id": pago.id,
+            }
+        )
+        resultados[pid] = {
+            "pago_con_error_id": pid,
+            "resultado": "movido",
+            "pago_id": pago.id,
+            "prestamo_id": pago.prestamo_id,
+            "cuotas_completadas": cc,
+            "cuotas_parciales": cp,
+            **({"error_cuotas": err_cuotas} if err_cuotas else {}),
+        }
+
     try:
         db.commit()
     except Exception as e_commit:
@@ -1287,12 +1343,13 @@ def mover_a_pagos_normales(
             status_code=500,
             detail=f"Error al confirmar movimiento ({len(errores_procesamiento)} fila(s) con error). {e_commit}",
         )
-    
+
     logger.info(
-        "mover_a_pagos_normales: COMPLETADO - movidos=%s cuotas=%s ya_cargado_eliminados=%s",
+        "mover_a_pagos_normales: COMPLETADO - movidos=%s cuotas=%s ya_cargado_eliminados=%s prestamos=%s",
         movidos,
         cuotas_aplicadas,
         len(ya_cargado_eliminados),
+        len({p.prestamo_id for p in pagos_por_fila.values() if p.prestamo_id}),
     )
 
     mensaje = (
@@ -1310,6 +1367,7 @@ def mover_a_pagos_normales(
         "movidos_detalle": movidos_detalle,
         "ya_cargado_eliminados": ya_cargado_eliminados,
         "ya_cargado_eliminados_count": len(ya_cargado_eliminados),
+        "resultados": [resultados[pid] for pid in dict.fromkeys(ids) if pid in resultados],
         "mensaje": mensaje,
     }
 
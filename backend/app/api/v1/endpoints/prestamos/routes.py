@@ -109,6 +109,13 @@ from app.services.cuota_estado import (
     sincronizar_columna_estado_cuotas,
 )
 
+from app.services.prestamos.amortizacion_lote import (
+    PlanCuotas,
+    fechas_vencimiento_cuotas,
+    filas_cuotas_plan_lote,
+    insertar_filas_cuotas,
+)
+from app.services.prestamo_saldos import refrescar_prestamo_saldos
 from app.services.prestamos.cupo_cedula_aprobados import (
     validar_cupo_nuevo_prestamo_aprobado,
     contar_aprobados_misma_clave_cupo,
@@ -2577,6 +2584,8 @@ def _generar_cuotas_amortizacion(db: Session, p: Prestamo, fecha_base: date, num
 
     se derivan en el frontend desde saldo_capital_inicial / saldo_capital_final.
 
+    Filas calculadas con `amortizacion_lote.filas_cuotas_plan_lote` (mismo motor que la generación masiva).
+
     """
 
     bloqueo_ins = prestamo_bloquea_insertar_filas_cuota_si_liquidado_bd(p)
@@ -2585,69 +2594,35 @@ def _generar_cuotas_amortizacion(db: Session, p: Prestamo, fecha_base: date, num
 
         raise HTTPException(status_code=400, detail=bloqueo_ins)
 
-    modalidad = (p.modalidad_pago or "MENSUAL").upper()
-
-    delta_dias = 15 if modalidad == "QUINCENAL" else (7 if modalidad == "SEMANAL" else None)
-
-    cliente_id = p.cliente_id
-
-    total = monto_cuota * numero_cuotas
-
-    monto_cuota_dec = Decimal(str(round(monto_cuota, 2)))
-
-    creadas = 0
-
-    for n in range(1, numero_cuotas + 1):
-
-        if modalidad == "MENSUAL":
-
-            next_date = _fecha_base_mas_meses(fecha_base, n)
-
-        else:
-
-            # QUINCENAL: 15*n-1 días (1 ene → 15 ene, 30 ene, 14 feb); SEMANAL: 7*n-1
-
-            next_date = fecha_base + timedelta(days=delta_dias * n - 1)
-
-        saldo_inicial = Decimal(str(round(total - (n - 1) * monto_cuota, 2)))
-
-        saldo_final = Decimal(str(round(total - n * monto_cuota, 2)))
-
-        if saldo_final < 0:
+    filas = filas_cuotas_plan_lote(
 
-            saldo_final = Decimal("0")
+        [
 
-        c = Cuota(
+            PlanCuotas(
 
-            prestamo_id=p.id,
+                prestamo_id=p.id,
 
-            cliente_id=cliente_id,
-
-            numero_cuota=n,
-
-            fecha_vencimiento=next_date,
-
-            monto=monto_cuota_dec,
+                cliente_id=p.cliente_id,
 
-            saldo_capital_inicial=saldo_inicial,
+                fecha_base=fecha_base,
 
-            saldo_capital_final=saldo_final,
+                modalidad_pago=p.modalidad_pago,
 
-            # [B3] Calcular desglose: capital = diferencia de saldos; interés = residuo
+                numero_cuotas=numero_cuotas,
 
-            monto_capital=saldo_inicial - saldo_final,
+                monto_cuota=monto_cuota,
 
-            monto_interes=monto_cuota_dec - (saldo_inicial - saldo_final),
+            )
 
-            estado="PENDIENTE",
+        ]
 
-            dias_mora=0,
+    )
 
-        )
+    # INSERT multi-fila (sin objetos ORM pendientes): las cuotas quedan visibles en la transacción.
 
-        db.add(c)
+    creadas = insertar_filas_cuotas(db, filas)
 
-        creadas += 1
+    refrescar_prestamo_saldos(db, [p.id])
 
     return creadas
 
@@ -2660,7 +2635,8 @@ def _recalcular_fechas_vencimiento_cuotas(db: Session, p: Prestamo, fecha_base:
     
     Regla: fecha_base debe ser la nueva fecha_base_calculo del prestamo (alineada con fecha_aprobacion).
     
-    No hace commit: el llamador persiste la sesión (p. ej. junto con filas de auditoría).
+    No hace commit: el llamador persiste la sesión (p. ej. junto con filas de auditoría); `prestamo_saldos`
+    se refresca en la misma transacción.
 
     Returns: dict con estadísticas de actualización.
     """
@@ -2671,22 +2647,15 @@ def _recalcular_fechas_vencimiento_cuotas(db: Session, p: Prestamo, fecha_base:
     if not cuotas:
         return {"message": "Sin cuotas para recalcular", "actualizadas": 0}
     
-    modalidad = (p.modalidad_pago or "MENSUAL").upper()
-    delta_dias = 15 if modalidad == "QUINCENAL" else (7 if modalidad == "SEMANAL" else None)
     hoy = hoy_negocio()
+    # Mismo algoritmo que la generación (MENSUAL: +n meses; QUINCENAL: 15*n-1 días; SEMANAL: 7*n-1).
+    nuevas_fechas = fechas_vencimiento_cuotas(
+        fecha_base, p.modalidad_pago, [int(c.numero_cuota) for c in cuotas]
+    )
     
     actualizadas = 0
     
-    for cuota in cuotas:
-        numero_cuota = cuota.numero_cuota
-        
-        # Calcular nueva fecha de vencimiento usando mismo algoritmo que generación
-        if modalidad == "MENSUAL":
-            nueva_fecha = _fecha_base_mas_meses(fecha_base, numero_cuota)
-        else:
-            # QUINCENAL: 15*n-1 días; SEMANAL: 7*n-1
-            nueva_fecha = fecha_base + timedelta(days=delta_dias * numero_cuota - 1)
-        
+    for cuota, nueva_fecha in zip(cuotas, nuevas_fechas):
         # Actualizar fecha de vencimiento
         cuota.fecha_vencimiento = nueva_fecha
         
@@ -2706,6 +2675,9 @@ def _recalcular_fechas_vencimiento_cuotas(db: Session, p: Prestamo, fecha_base:
         db.add(cuota)
         actualizadas += 1
 
+    # fecha_vencimiento cambia cuotas_vencidas / fecha_vencimiento_pendiente_min del resumen.
+    refrescar_prestamo_saldos(db, [p.id])
+
     return {
         "message": "Fechas de vencimiento recalculadas exitosamente",
         "actualizadas": actualizadas
@@ -2765,6 +2737,7 @@ def put_cuota_prestamo(
         select(Cuota).where(Cuota.prestamo_id == prestamo_id).order_by(Cuota.numero_cuota)
     ).scalars().all()
     sincronizar_columna_estado_cuotas(db, todas, commit=False)
+    refrescar_prestamo_saldos(db, [prestamo_id])
     db.commit()
     refreshed = _listado_cuotas_prestamo_dicts(db, prestamo_id) or []
     for row in refreshed:
@@ -2783,6 +2756,7 @@ def delete_cuota_prestamo(
     if not c or c.prestamo_id != prestamo_id:
         raise HTTPException(status_code=404, detail="Cuota no encontrada")
     db.delete(c)
+    refrescar_prestamo_saldos(db, [prestamo_id])
     db.commit()
     return None
 
@@ -4489,47 +4463,105 @@ def generar_cuotas_aprobados_sin_cuotas(
 
     errores = []
 
+    planes: List[PlanCuotas] = []
+
     for p in prestamos_sin_cuotas:
 
-        try:
+        fecha_base = _fecha_para_amortizacion(p)
 
-            fecha_base = _fecha_para_amortizacion(p)
+        if not fecha_base:
 
-            if not fecha_base:
+            errores.append({"prestamo_id": p.id, "error": "Sin fecha base de cálculo ni fecha de aprobación; obligatorias para generar amortización."})
 
-                errores.append({"prestamo_id": p.id, "error": "Sin fecha base de cálculo ni fecha de aprobación; obligatorias para generar amortización."})
+            continue
 
-                continue
+        numero_cuotas = p.numero_cuotas or 12
 
-            numero_cuotas = p.numero_cuotas or 12
+        total = float(p.total_financiamiento or 0)
 
-            total = float(p.total_financiamiento or 0)
+        if numero_cuotas <= 0 or total <= 0:
 
-            if numero_cuotas <= 0 or total <= 0:
+            errores.append({"prestamo_id": p.id, "error": "numero_cuotas o total_financiamiento inválido"})
 
-                errores.append({"prestamo_id": p.id, "error": "numero_cuotas o total_financiamiento inválido"})
+            continue
 
-                continue
+        bloqueo_ins = prestamo_bloquea_insertar_filas_cuota_si_liquidado_bd(p)
 
-            monto_cuota = _resolver_monto_cuota(p, total, numero_cuotas)
+        if bloqueo_ins:
 
-            creadas = _generar_cuotas_amortizacion(db, p, fecha_base, numero_cuotas, monto_cuota)
+            errores.append({"prestamo_id": p.id, "error": bloqueo_ins})
 
-            aplicar_pagos_pendientes_prestamo(p.id, db)
+            continue
 
-            db.commit()
+        planes.append(
+
+            PlanCuotas(
+
+                prestamo_id=p.id,
+
+                cliente_id=p.cliente_id,
+
+                fecha_base=fecha_base,
+
+                modalidad_pago=p.modalidad_pago,
+
+                numero_cuotas=numero_cuotas,
+
+                monto_cuota=_resolver_monto_cuota(p, total, numero_cuotas),
+
+            )
+
+        )
+
+    # Tablas calculadas por lote (NumPy) y un INSERT multi-fila por grupo de préstamos; los pagos
+
+    # pendientes se aplican por préstamo en un savepoint: si falla, se retiran solo sus cuotas.
+
+    lote_prestamos = 200
 
-            total_cuotas += creadas
+    for start in range(0, len(planes), lote_prestamos):
 
-            logger.info("Préstamo %s: %s cuotas generadas (fecha_base=%s)", p.id, creadas, fecha_base)
+        grupo = planes[start : start + lote_prestamos]
+
+        try:
+
+            filas = filas_cuotas_plan_lote(grupo)
+
+            insertar_filas_cuotas(db, filas)
 
         except Exception as e:
 
             db.rollback()
 
-            logger.exception("Error generando cuotas para préstamo %s: %s", p.id, e)
+            logger.exception("Error generando cuotas para lote de %s préstamos: %s", len(grupo), e)
+
+            errores.extend({"prestamo_id": pl.prestamo_id, "error": str(e)} for pl in grupo)
+
+            continue
+
+        for pl in grupo:
+
+            try:
+
+                with db.begin_nested():
 
-            errores.append({"prestamo_id": p.id, "error": str(e)})
+                    aplicar_pagos_pendientes_prestamo(pl.prestamo_id, db)
+
+                total_cuotas += int(pl.numero_cuotas)
+
+                logger.info("Préstamo %s: %s cuotas generadas (fecha_base=%s)", pl.prestamo_id, pl.numero_cuotas, pl.fecha_base)
+
+            except Exception as e:
+
+                logger.exception("Error generando cuotas para préstamo %s: %s", pl.prestamo_id, e)
+
+                db.execute(delete(Cuota).where(Cuota.prestamo_id == pl.prestamo_id))
+
+                errores.append({"prestamo_id": pl.prestamo_id, "error": str(e)})
+
+        refrescar_prestamo_saldos(db, [pl.prestamo_id for pl in grupo])
+
+        db.commit()
 
     return {
 
@@ -10,7 +10,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
@@ -23,7 +23,7 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 
 @router.get("/asesores/por-mes")
 def get_asesores_por_mes(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     meses: int = Query(12, ge=1, le=24, description="Cantidad de meses hacia atrás"),
     anos: Optional[str] = Query(None),
     meses_list: Optional[str] = Query(None),
@@ -78,7 +78,7 @@ def get_asesores_por_mes(
 
 @router.get("/asesores")
 def get_reporte_asesores(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     fecha_corte: Optional[str] = Query(None),
 ):
     """Reporte por asesor/analista. Datos reales desde BD (solo clientes ACTIVOS)."""
@@ -11,7 +11,7 @@ from fastapi.responses import Response
 from sqlalchemy import and_, case, func, or_, select, text
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
@@ -208,7 +208,7 @@ def _cartera_por_periodos(db: Session, periodos: List[tuple]) -> dict:
 
 @router.get("/cartera/por-mes")
 def get_cartera_por_mes(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     meses: int = Query(12, ge=1, le=24, description="Cantidad de meses hacia atrás"),
     anos: Optional[str] = Query(None, description="Años separados por coma, ej: 2023,2024"),
     meses_list: Optional[str] = Query(None, description="Meses 1-12 separados por coma, ej: 1,2,3"),
@@ -220,7 +220,7 @@ def get_cartera_por_mes(
 
 @router.get("/cartera")
 def get_reporte_cartera(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     fecha_corte: Optional[str] = Query(None, description="Fecha de corte YYYY-MM-DD"),
 ):
     """Reporte de cartera en JSON. Datos reales desde BD."""
@@ -1474,7 +1474,7 @@ def _generar_pdf_cuentas_por_cobrar(data: dict) -> bytes:
 
 @router.get("/exportar/cartera")
 def exportar_cartera(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     formato: str = Query("excel", pattern="^(excel|pdf)$"),
     fecha_corte: Optional[str] = Query(None),
     fecha_desde: Optional[str] = Query(None, description="YYYY-MM-DD vencimiento desde"),
@@ -10,7 +10,7 @@ from fastapi.responses import Response
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
@@ -23,7 +23,7 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 
 
 @router.get("/por-cedula")
-def get_reportes_por_cedula(db: Session = Depends(get_db)):
+def get_reportes_por_cedula(db: Session = Depends(get_read_db)):
     """
     Reporte por cédula: id préstamo, cédula, nombre, total financiamiento, total abono,
     cuotas totales, cuotas pagadas, cuotas atrasadas, monto cuotas atrasadas.
@@ -133,7 +133,7 @@ def _generar_excel_por_cedula(items: List[dict]) -> bytes:
 
 
 @router.get("/exportar/cedula")
-def exportar_cedula(db: Session = Depends(get_db)):
+def exportar_cedula(db: Session = Depends(get_read_db)):
     """Exporta reporte por cédula en Excel."""
     data = get_reportes_por_cedula(db=db)
     items = data.get("items", [])
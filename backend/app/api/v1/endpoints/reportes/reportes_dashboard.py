@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import func, select, text
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
@@ -19,7 +19,7 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 
 
 @router.get("/dashboard/resumen")
-def get_resumen_dashboard(db: Session = Depends(get_db)):
+def get_resumen_dashboard(db: Session = Depends(get_read_db)):
     """
     Resumen para el dashboard de reportes: total_clientes, total_prestamos, total_pagos,
     cartera_activa, prestamos_mora, pagos_mes, fecha_actualizacion. Datos reales desde BD.
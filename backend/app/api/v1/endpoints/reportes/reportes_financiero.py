@@ -9,7 +9,7 @@ from fastapi.responses import Response
 from sqlalchemy import func, select, and_
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
@@ -22,7 +22,7 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 
 @router.get("/financiero")
 def get_reporte_financiero(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     fecha_corte: Optional[str] = Query(None),
 ):
     """Reporte financiero. Datos reales desde BD (solo clientes ACTIVOS)."""
@@ -186,7 +186,7 @@ def _generar_pdf_financiero(data: dict) -> bytes:
 
 @router.get("/exportar/financiero")
 def exportar_financiero(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     formato: str = Query("excel", pattern="^(excel|pdf)$"),
     fecha_corte: Optional[str] = Query(None),
 ):
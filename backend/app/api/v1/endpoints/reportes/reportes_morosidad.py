@@ -22,7 +22,9 @@ import logging
 
 import io
 
-from datetime import date
+from datetime import date, timedelta
+
+from decimal import Decimal
 
 from typing import List, Optional
 
@@ -32,13 +34,13 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 
 from fastapi.responses import Response
 
-from sqlalchemy import func, literal_column, select, text
+from sqlalchemy import Date, Integer, and_, cast, func, literal, literal_column, select, union_all
 
 from sqlalchemy.orm import Session, aliased
 
 
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 
 from app.core.deps import get_current_user
 
@@ -95,9 +97,149 @@ RANGOS_ATRASO = [
 ]
 
 
+# Pago vencido (4 meses calendario + 1 dia): fecha_vencimiento + INTERVAL '4 months 1 day' <= fc equivale a
+# fecha_vencimiento <= _umbral_vencimiento_moroso(fc). El umbral se calcula en Python (mismo recorte a fin de
+# mes que PostgreSQL) y la condicion queda portable e indexable sobre cuotas.fecha_vencimiento.
+def _umbral_vencimiento_moroso(fc: date) -> date:
+    g = fc - timedelta(days=1)
+    ano, mes = g.year, g.month - 4
+    if mes <= 0:
+        mes += 12
+        ano -= 1
+    ultimo_m = calendar.monthrange(ano, mes)[1]
+    if g.day == calendar.monthrange(g.year, g.month)[1]:
+        return date(ano, mes, ultimo_m)
+    return date(ano, mes, min(g.day, ultimo_m))
+
+
+def _dias_entre(db: Session, fc_expr, fv_expr):
+    """Dias enteros fc - fv en SQL (date - date en PostgreSQL, julianday en SQLite)."""
+    if db.get_bind().dialect.name == "postgresql":
+        return fc_expr - fv_expr
+    return cast(func.julianday(fc_expr) - func.julianday(fv_expr), Integer)
+
+
+def _fecha_sql(db: Session, d: date):
+    lit = literal(d, Date)
+    return cast(lit, Date) if db.get_bind().dialect.name == "postgresql" else lit
+
+
+def _a_fecha(v) -> Optional[date]:
+    """min()/max() sobre CASE puede volver como texto en SQLite."""
+    if v is None or isinstance(v, date):
+        return v.date() if hasattr(v, "hour") else v
+    return date.fromisoformat(str(v)[:10])
+
+
+def _mora_por_corte(db: Session, cortes: List[date]) -> dict:
+    """
+    Una sola consulta para todos los cortes: CTE con (fc, umbral) por corte (UNION ALL de literales;
+    los periodos pueden no ser consecutivos) unida a cuotas impagas con vencimiento <= umbral.
+    Retorna {fc: [fila por prestamo (prestamo_id, cliente_id, cedula, nombres, n_cuotas, monto, dias)]}.
+    """
+    out: dict = {fc: [] for fc in cortes}
+    if not cortes:
+        return out
+    filas_cte = [
+        select(_fecha_sql(db, fc).label("fc"), _fecha_sql(db, _umbral_vencimiento_moroso(fc)).label("umbral"))
+        for fc in cortes
+    ]
+    cte = (filas_cte[0] if len(filas_cte) == 1 else union_all(*filas_cte)).cte("cortes_mora")
+    dias = _dias_entre(db, cte.c.fc, Cuota.fecha_vencimiento)
+    rows = db.execute(
+        select(
+            cte.c.fc,
+            Prestamo.id.label("prestamo_id"),
+            Prestamo.cliente_id,
+            Prestamo.cedula,
+            Prestamo.nombres,
+            func.count(Cuota.id).label("n_cuotas"),
+            func.coalesce(func.sum(Cuota.monto), 0).label("monto"),
+            func.coalesce(func.sum(dias), 0).label("dias"),
+        )
+        .select_from(Cuota)
+        .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
+        .join(Cliente, Prestamo.cliente_id == Cliente.id)
+        .join(cte, Cuota.fecha_vencimiento <= cte.c.umbral)
+        .where(
+            Cliente.estado == "ACTIVO",
+            Prestamo.estado == "APROBADO",
+            Cuota.fecha_pago.is_(None),
+        )
+        .group_by(cte.c.fc, Prestamo.id, Prestamo.cliente_id, Prestamo.cedula, Prestamo.nombres)
+        .order_by(cte.c.fc, Prestamo.id)
+    ).all()
+    for r in rows:
+        fc = _a_fecha(r.fc)
+        if fc in out:
+            out[fc].append(r)
+    return out
+
+
+def _mora_por_prestamo_al_corte(db: Session, fc: date) -> list:
+    """
+    Una fila por prestamo en pago vencido a `fc` con todos los agregados que usan /morosidad y
+    /morosidad/por-rangos (agregados con FILTER sobre las cuotas del prestamo, sin consultas por prestamo).
+    """
+    umbral = _umbral_vencimiento_moroso(fc)
+    impaga = Cuota.fecha_pago.is_(None)
+    moroso = and_(impaga, Cuota.fecha_vencimiento <= umbral)
+    vencida = and_(impaga, Cuota.fecha_vencimiento < fc)
+    dias = _dias_entre(db, _fecha_sql(db, fc), Cuota.fecha_vencimiento)
+    n_mora = func.count(Cuota.id).filter(moroso)
+    return db.execute(
+        select(
+            Prestamo.id.label("prestamo_id"),
+            Prestamo.cliente_id,
+            Prestamo.cedula,
+            Prestamo.nombres,
+            Prestamo.analista,
+            Prestamo.concesionario,
+            Prestamo.total_financiamiento,
+            n_mora.label("n_mora"),
+            func.coalesce(func.sum(Cuota.monto).filter(moroso), 0).label("monto_mora"),
+            func.coalesce(func.sum(dias).filter(moroso), 0).label("dias_mora"),
+            func.min(Cuota.fecha_vencimiento).filter(moroso).label("primera_mora"),
+            func.count(Cuota.id).filter(vencida).label("n_vencidas"),
+            func.coalesce(func.sum(Cuota.monto).filter(vencida), 0).label("monto_vencido"),
+            func.min(Cuota.fecha_vencimiento).filter(vencida).label("primera_vencida"),
+            func.coalesce(func.sum(Cuota.monto).filter(impaga), 0).label("saldo"),
+            func.coalesce(func.sum(Cuota.total_pagado), 0).label("pagos_totales"),
+            func.max(Cuota.fecha_pago).label("ultimo_pago"),
+            func.min(Cuota.fecha_vencimiento).filter(impaga).label("proximo_pago"),
+        )
+        .select_from(Cuota)
+        .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
+        .join(Cliente, Prestamo.cliente_id == Cliente.id)
+        .where(Cliente.estado == "ACTIVO", Prestamo.estado == "APROBADO")
+        .group_by(
+            Prestamo.id,
+            Prestamo.cliente_id,
+            Prestamo.cedula,
+            Prestamo.nombres,
+            Prestamo.analista,
+            Prestamo.concesionario,
+            Prestamo.total_financiamiento,
+        )
+        .having(n_mora > 0)
+        .order_by(Prestamo.id)
+    ).all()
+
+
+def _totales_mora(filas: list, n_attr: str, monto_attr: str, dias_attr: str) -> dict:
+    n_cuotas = sum(int(getattr(r, n_attr) or 0) for r in filas)
+    dias = sum(int(getattr(r, dias_attr) or 0) for r in filas)
+    return {
+        "total_prestamos_mora": len(filas),
+        "total_clientes_mora": len({r.cliente_id for r in filas if r.cliente_id is not None}),
+        "monto_total_mora": _safe_float(sum(Decimal(str(getattr(r, monto_attr) or 0)) for r in filas)),
+        "promedio_dias_mora": dias / n_cuotas if n_cuotas else 0,
+    }
+
+
 @router.get("/morosidad/auditoria/mora-por-cliente")
 def get_auditoria_mora_por_cliente(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     cedula: Optional[str] = Query(
         None,
         description="Cedula del cliente: mismo alcance que GET /exportar/morosidad-cedulas (una fila por cedula)",
@@ -192,7 +334,7 @@ def get_auditoria_mora_por_prestamo(
         ge=1,
         description="Solo diagnostico por un prestamo; el reporte de morosidad es por cliente/cedula (ver mora-por-cliente)",
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Opcional: desglose por un prestamo (amortizacion). El informe oficial es por cedula: usar mora-por-cliente."""
 
@@ -240,7 +382,7 @@ def get_auditoria_mora_por_prestamo(
 
 def get_morosidad_clientes(
 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 
     fecha_corte: Optional[str] = Query(None),
 
@@ -302,7 +444,7 @@ def get_morosidad_clientes(
 
 def exportar_morosidad_clientes(
 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 
     fecha_corte: Optional[str] = Query(None),
 
@@ -420,687 +562,162 @@ def exportar_morosidad_clientes(
 
 
 @router.get("/morosidad")
-
 def get_reporte_morosidad(
-
-    db: Session = Depends(get_db),
-
+    db: Session = Depends(get_read_db),
     fecha_corte: Optional[str] = Query(None),
-
 ):
-
     """Reporte de pago vencido. Moroso = 4 meses calendario + 1 dia de atraso."""
-
     fc = _parse_fecha(fecha_corte)
-
-    subq_mora = (
-
-        select(Cuota.prestamo_id)
-
-        .select_from(Cuota)
-
-        .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-        .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-        .where(
-
-            Cliente.estado == "ACTIVO",
-
-            Prestamo.estado == "APROBADO",
-
-            Cuota.fecha_pago.is_(None),
-
-            Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
-        )
-
-        .distinct()
-
-    )
-
-    total_prestamos_mora = db.scalar(select(func.count()).select_from(subq_mora.subquery())) or 0
-
-    prestamos_ids = [r[0] for r in db.execute(subq_mora).fetchall()]
-
-    total_clientes_mora = 0
-
-    if prestamos_ids:
-
-        total_clientes_mora = db.scalar(
-
-            select(func.count(func.distinct(Prestamo.cliente_id))).select_from(Prestamo).where(Prestamo.id.in_(prestamos_ids))
-
-        ) or 0
-
-    monto_total_mora = _safe_float(
-
-        db.scalar(
-
-            select(func.coalesce(func.sum(Cuota.monto), 0))
-
-            .select_from(Cuota)
-
-            .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-            .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-            .where(
-
-                Cliente.estado == "ACTIVO",
-
-                Prestamo.estado == "APROBADO",
-
-                Cuota.fecha_pago.is_(None),
-
-                Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
-            )
-
-        )
-
-        or 0
-
-    )
-
-    cuotas_mora = db.execute(
-
-        select(Cuota.prestamo_id, Cuota.fecha_vencimiento)
-
-        .select_from(Cuota)
-
-        .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-        .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-        .where(
-
-            Cliente.estado == "ACTIVO",
-
-            Prestamo.estado == "APROBADO",
-
-            Cuota.fecha_pago.is_(None),
-
-            Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
-        )
-
-    ).fetchall()
-
-    dias_list = [(fc - r.fecha_vencimiento).days for r in cuotas_mora]
-
-    promedio_dias_mora = sum(dias_list) / len(dias_list) if dias_list else 0
+    filas = _mora_por_prestamo_al_corte(db, fc)
+    totales = _totales_mora(filas, "n_mora", "monto_mora", "dias_mora")
 
     distribucion_por_rango: List[dict] = []
-
+    por_analista: dict = {}
+    for r in filas:
+        if r.analista:
+            por_analista.setdefault(r.analista, []).append(r)
     morosidad_por_analista: List[dict] = []
-
-    analistas = db.execute(select(Prestamo.analista).where(Prestamo.id.in_(prestamos_ids)).distinct()).fetchall()
-
-    for (analista,) in analistas:
-
-        if not analista:
-
-            continue
-
-        ids_ana = db.execute(select(Prestamo.id).where(Prestamo.analista == analista, Prestamo.id.in_(prestamos_ids))).fetchall()
-
-        ids_ana = [x[0] for x in ids_ana]
-
-        monto_ana = _safe_float(db.scalar(select(func.coalesce(func.sum(Cuota.monto), 0)).select_from(Cuota).where(Cuota.fecha_pago.is_(None), Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc, Cuota.prestamo_id.in_(ids_ana)))) or 0
-
-        cuotas_ana = db.execute(
-
-            select(Cuota.fecha_vencimiento).select_from(Cuota).where(
-
-                Cuota.fecha_pago.is_(None), Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc, Cuota.prestamo_id.in_(ids_ana)
-
-            )
-
-        ).fetchall()
-
-        dias_ana = [(fc - r.fecha_vencimiento).days for r in cuotas_ana]
-
-        prom_dias_ana = sum(dias_ana) / len(dias_ana) if dias_ana else 0
-
+    for analista, filas_ana in por_analista.items():
+        t = _totales_mora(filas_ana, "n_mora", "monto_mora", "dias_mora")
         morosidad_por_analista.append({
-
             "analista": analista,
-
-            "cantidad_prestamos": len(ids_ana),
-
-            "cantidad_clientes": db.scalar(select(func.count(func.distinct(Prestamo.cliente_id))).select_from(Prestamo).where(Prestamo.id.in_(ids_ana))) or 0,
-
-            "monto_total_mora": monto_ana,
-
-            "promedio_dias_mora": prom_dias_ana,
-
+            "cantidad_prestamos": t["total_prestamos_mora"],
+            "cantidad_clientes": t["total_clientes_mora"],
+            "monto_total_mora": t["monto_total_mora"],
+            "promedio_dias_mora": t["promedio_dias_mora"],
         })
 
     detalle: List[dict] = []
-
-    for pid in prestamos_ids[:200]:
-
-        p = db.get(Prestamo, pid)
-
-        if not p:
-
-            continue
-
-        monto_mora = _safe_float(db.scalar(select(func.coalesce(func.sum(Cuota.monto), 0)).select_from(Cuota).where(Cuota.prestamo_id == pid, Cuota.fecha_pago.is_(None), Cuota.fecha_vencimiento < fc)) or 0)
-
-        cuotas_en_mora = db.scalar(select(func.count()).select_from(Cuota).where(Cuota.prestamo_id == pid, Cuota.fecha_pago.is_(None), Cuota.fecha_vencimiento < fc)) or 0
-
-        primera = db.execute(select(func.min(Cuota.fecha_vencimiento)).select_from(Cuota).where(Cuota.prestamo_id == pid, Cuota.fecha_pago.is_(None), Cuota.fecha_vencimiento < fc)).scalar()
-
-        max_dias = (fc - primera).days if primera else 0
-
+    for r in filas[:200]:
+        primera = _a_fecha(r.primera_vencida)
         detalle.append({
-
-            "prestamo_id": pid,
-
-            "cedula": p.cedula or "",
-
-            "nombres": p.nombres or "",
-
-            "total_financiamiento": _safe_float(p.total_financiamiento),
-
-            "analista": p.analista or "",
-
-            "concesionario": p.concesionario or "",
-
-            "cuotas_en_mora": cuotas_en_mora,
-
-            "monto_total_mora": monto_mora,
-
-            "max_dias_mora": max_dias,
-
+            "prestamo_id": r.prestamo_id,
+            "cedula": r.cedula or "",
+            "nombres": r.nombres or "",
+            "total_financiamiento": _safe_float(r.total_financiamiento),
+            "analista": r.analista or "",
+            "concesionario": r.concesionario or "",
+            "cuotas_en_mora": int(r.n_vencidas or 0),
+            "monto_total_mora": _safe_float(r.monto_vencido),
+            "max_dias_mora": (fc - primera).days if primera else 0,
             "primera_cuota_vencida": primera.isoformat() if primera else None,
-
         })
 
     return {
-
         "fecha_corte": fc.isoformat(),
-
-        "total_prestamos_mora": total_prestamos_mora,
-
-        "total_clientes_mora": total_clientes_mora,
-
-        "monto_total_mora": monto_total_mora,
-
-        "promedio_dias_mora": round(promedio_dias_mora, 2),
-
+        "total_prestamos_mora": totales["total_prestamos_mora"],
+        "total_clientes_mora": totales["total_clientes_mora"],
+        "monto_total_mora": totales["monto_total_mora"],
+        "promedio_dias_mora": round(totales["promedio_dias_mora"], 2),
         "distribucion_por_rango": distribucion_por_rango,
-
         "morosidad_por_analista": morosidad_por_analista,
-
         "detalle_prestamos": detalle,
-
     }
 
 
-
-
-
 @router.get("/morosidad/por-mes")
-
 def get_morosidad_por_mes(
-
-    db: Session = Depends(get_db),
-
+    db: Session = Depends(get_read_db),
     meses: int = Query(12, ge=1, le=24, description="Cantidad de meses hacia atrÃ¡s"),
-
     anos: Optional[str] = Query(None),
-
     meses_list: Optional[str] = Query(None),
-
 ):
-
     """Morosidad por mes: una pestaÃ±a por mes. Cuotas vencidas sin pagar a fin de cada mes, agrupadas por cÃ©dula."""
-
     resultado: dict = {"meses": []}
-
     periodos = _periodos_desde_filtros(anos, meses_list, meses)
+    cortes = [date(ano, mes, calendar.monthrange(ano, mes)[1]) for (ano, mes) in periodos]
+    filas_por_corte = _mora_por_corte(db, cortes)
 
+    for (ano, mes), fc in zip(periodos, cortes):
+        filas = filas_por_corte.get(fc, [])
+        totales = _totales_mora(filas, "n_cuotas", "monto", "dias")
 
-
-    for (ano, mes) in periodos:
-
-        _, ultimo = calendar.monthrange(ano, mes)
-
-        fc = date(ano, mes, ultimo)
-
-
-
-        subq_mora = (
-
-            select(Cuota.prestamo_id)
-
-            .select_from(Cuota)
-
-            .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-            .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-            .where(
-
-                Cliente.estado == "ACTIVO",
-
-                Prestamo.estado == "APROBADO",
-
-                Cuota.fecha_pago.is_(None),
-
-                Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
-            )
-
-            .distinct()
-
-        )
-
-        prestamos_ids = [r[0] for r in db.execute(subq_mora).fetchall()]
-
-        total_prestamos_mora = len(prestamos_ids)
-
-        total_clientes_mora = 0
-
-        monto_total_mora = 0.0
-
-        if prestamos_ids:
-
-            total_clientes_mora = db.scalar(
-
-                select(func.count(func.distinct(Prestamo.cliente_id))).select_from(Prestamo).where(Prestamo.id.in_(prestamos_ids))
-
-            ) or 0
-
-            monto_total_mora = _safe_float(
-
-                db.scalar(
-
-                    select(func.coalesce(func.sum(Cuota.monto), 0))
-
-                    .select_from(Cuota)
-
-                    .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-                    .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-                    .where(
-
-                        Cliente.estado == "ACTIVO",
-
-                        Prestamo.estado == "APROBADO",
-
-                        Cuota.fecha_pago.is_(None),
-
-                        Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
-                    )
-
-                )
-
-            ) or 0
-
-
-
-        cuotas_mora = db.execute(
-
-            select(Cuota.prestamo_id, Cuota.fecha_vencimiento)
-
-            .select_from(Cuota)
-
-            .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-            .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-            .where(
-
-                Cliente.estado == "ACTIVO",
-
-                Prestamo.estado == "APROBADO",
-
-                Cuota.fecha_pago.is_(None),
-
-                Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
+        cedula_agg: dict = {}
+        for r in filas:
+            if not r.cedula:
+                continue
+            agg = cedula_agg.setdefault(
+                r.cedula, {"nombres": r.nombres or "", "prestamos": 0, "monto": 0.0, "dias": 0, "n": 0}
             )
-
-        ).fetchall()
-
-        dias_list = [(fc - r.fecha_vencimiento).days for r in cuotas_mora]
-
-        promedio_dias_mora = sum(dias_list) / len(dias_list) if dias_list else 0
-
-
-
-        morosidad_por_cedula: List[dict] = []
-
-        if prestamos_ids:
-
-            monto_por_prestamo_rows = db.execute(
-
-                select(Cuota.prestamo_id, func.coalesce(func.sum(Cuota.monto), 0).label("monto"))
-
-                .select_from(Cuota)
-
-                .where(
-
-                    Cuota.prestamo_id.in_(prestamos_ids),
-
-                    Cuota.fecha_pago.is_(None),
-
-                    Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
-                )
-
-                .group_by(Cuota.prestamo_id)
-
-            ).fetchall()
-
-            monto_por_prestamo = {r.prestamo_id: _safe_float(r.monto) for r in monto_por_prestamo_rows}
-
-            prestamos_data = db.execute(
-
-                select(Prestamo.id, Prestamo.cedula, Prestamo.nombres)
-
-                .where(Prestamo.id.in_(prestamos_ids), Prestamo.cedula.isnot(None), Prestamo.cedula != "")
-
-            ).fetchall()
-
-            pid_to_cedula: dict = {}
-
-            cedula_agg: dict = {}
-
-            for pid, cedula, nombres in prestamos_data:
-
-                cedula = cedula or ""
-
-                pid_to_cedula[pid] = cedula
-
-                if cedula not in cedula_agg:
-
-                    cedula_agg[cedula] = {"nombres": nombres or "", "prestamos": set(), "dias": []}
-
-                cedula_agg[cedula]["prestamos"].add(pid)
-
-            for r in cuotas_mora:
-
-                cedula = pid_to_cedula.get(r.prestamo_id)
-
-                if cedula and cedula in cedula_agg:
-
-                    cedula_agg[cedula]["dias"].append((fc - r.fecha_vencimiento).days)
-
-            for cedula, data in cedula_agg.items():
-
-                monto_total = sum(monto_por_prestamo.get(pid, 0) for pid in data["prestamos"])
-
-                prom_dias = sum(data["dias"]) / len(data["dias"]) if data["dias"] else 0
-
-                morosidad_por_cedula.append({
-
-                    "cedula": cedula,
-
-                    "nombres": data["nombres"],
-
-                    "cantidad_prestamos": len(data["prestamos"]),
-
-                    "cantidad_clientes": 1,
-
-                    "monto_total_mora": round(monto_total, 2),
-
-                    "promedio_dias_mora": round(prom_dias, 1),
-
-                })
-
-            morosidad_por_cedula.sort(key=lambda x: -x["monto_total_mora"])
-
-
+            agg["prestamos"] += 1
+            agg["monto"] += _safe_float(r.monto)
+            agg["dias"] += int(r.dias or 0)
+            agg["n"] += int(r.n_cuotas or 0)
+        morosidad_por_cedula: List[dict] = [
+            {
+                "cedula": cedula,
+                "nombres": data["nombres"],
+                "cantidad_prestamos": data["prestamos"],
+                "cantidad_clientes": 1,
+                "monto_total_mora": round(data["monto"], 2),
+                "promedio_dias_mora": round(data["dias"] / data["n"] if data["n"] else 0, 1),
+            }
+            for cedula, data in cedula_agg.items()
+        ]
+        morosidad_por_cedula.sort(key=lambda x: -x["monto_total_mora"])
 
         resultado["meses"].append({
-
             "mes": mes,
-
             "ano": ano,
-
             "label": f"{mes:02d}/{ano}",
-
             "fecha_corte": fc.isoformat(),
-
-            "total_prestamos_mora": total_prestamos_mora,
-
-            "total_clientes_mora": total_clientes_mora,
-
-            "monto_total_mora": monto_total_mora,
-
-            "promedio_dias_mora": round(promedio_dias_mora, 1),
-
+            "total_prestamos_mora": totales["total_prestamos_mora"],
+            "total_clientes_mora": totales["total_clientes_mora"],
+            "monto_total_mora": totales["monto_total_mora"],
+            "promedio_dias_mora": round(totales["promedio_dias_mora"], 1),
             "morosidad_por_cedula": morosidad_por_cedula,
-
         })
 
-
-
     return resultado
 
 
-
-
-
 @router.get("/morosidad/por-rangos")
-
 def get_morosidad_por_rangos(
-
-    db: Session = Depends(get_db),
-
+    db: Session = Depends(get_read_db),
     fecha_corte: Optional[str] = Query(None),
-
 ):
-
     """Informe pago vencido por rangos de dÃ­as."""
-
     fc = _parse_fecha(fecha_corte)
-
-    subq_mora = (
-
-        select(Cuota.prestamo_id)
-
-        .select_from(Cuota)
-
-        .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
-
-        .join(Cliente, Prestamo.cliente_id == Cliente.id)
-
-        .where(
-
-            Cliente.estado == "ACTIVO",
-
-            Prestamo.estado == "APROBADO",
-
-            Cuota.fecha_pago.is_(None),
-
-            Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
-        )
-
-        .distinct()
-
-    )
-
-    prestamos_ids = [r[0] for r in db.execute(subq_mora).fetchall()]
-
-
-
+    filas = _mora_por_prestamo_al_corte(db, fc)
     resultado: dict = {"fecha_corte": fc.isoformat(), "rangos": {}}
 
-
-
     def _fecha_iso(d):
+        d = _a_fecha(d)
+        return d.isoformat() if d else None
 
-        if d is None:
-
-            return None
-
-        if hasattr(d, "date"):
-
-            d = d.date() if callable(getattr(d, "date", None)) else d
-
-        return d.isoformat()[:10] if hasattr(d, "isoformat") else str(d)[:10]
-
-
+    items_por_rango: dict = {rango["key"]: [] for rango in RANGOS_ATRASO}
+    for r in filas:
+        primera = _a_fecha(r.primera_mora)
+        if not primera:
+            continue
+        dias_atraso = (fc - primera).days
+        rango = next(
+            (x for x in RANGOS_ATRASO if x["min_dias"] <= dias_atraso <= x["max_dias"]),
+            None,
+        )
+        if rango is None:
+            continue
+        items_por_rango[rango["key"]].append({
+            "prestamo_id": r.prestamo_id,
+            "cedula": r.cedula or "",
+            "nombres": r.nombres or "",
+            "total_financiamiento": _safe_float(r.total_financiamiento),
+            "pagos_totales": _safe_float(r.pagos_totales),
+            "saldo": _safe_float(r.saldo),
+            "ultimo_pago_fecha": _fecha_iso(r.ultimo_pago),
+            "proximo_pago_fecha": _fecha_iso(r.proximo_pago),
+            "dias_atraso": dias_atraso,
+        })
 
     for rango in RANGOS_ATRASO:
-
-        min_d, max_d = rango["min_dias"], rango["max_dias"]
-
-        items: List[dict] = []
-
-
-
-        for pid in prestamos_ids:
-
-            p = db.get(Prestamo, pid)
-
-            if not p:
-
-                continue
-
-
-
-            primera = db.execute(
-
-                select(func.min(Cuota.fecha_vencimiento))
-
-                .select_from(Cuota)
-
-                .where(
-
-                    Cuota.prestamo_id == pid,
-
-                    Cuota.fecha_pago.is_(None),
-
-                    Cuota.fecha_vencimiento + text("INTERVAL '4 months 1 day'") <= fc,
-
-                )
-
-            ).scalar()
-
-            if not primera:
-
-                continue
-
-            dias_atraso = (fc - primera).days
-
-            if dias_atraso < min_d or dias_atraso > max_d:
-
-                continue
-
-
-
-            saldo = _safe_float(
-
-                db.scalar(
-
-                    select(func.coalesce(func.sum(Cuota.monto), 0))
-
-                    .select_from(Cuota)
-
-                    .where(
-
-                        Cuota.prestamo_id == pid,
-
-                        Cuota.fecha_pago.is_(None),
-
-                    )
-
-                )
-
-            ) or 0
-
-
-
-            pagos_totales = _safe_float(
-
-                db.scalar(
-
-                    select(func.coalesce(func.sum(Cuota.total_pagado), 0))
-
-                    .select_from(Cuota)
-
-                    .where(Cuota.prestamo_id == pid)
-
-                )
-
-            ) or 0
-
-
-
-            ultimo_pago = db.execute(
-
-                select(func.max(Cuota.fecha_pago))
-
-                .select_from(Cuota)
-
-                .where(Cuota.prestamo_id == pid, Cuota.fecha_pago.isnot(None))
-
-            ).scalar()
-
-
-
-            proximo_pago = db.execute(
-
-                select(func.min(Cuota.fecha_vencimiento))
-
-                .select_from(Cuota)
-
-                .where(Cuota.prestamo_id == pid, Cuota.fecha_pago.is_(None))
-
-            ).scalar()
-
-
-
-            items.append({
-
-                "prestamo_id": pid,
-
-                "cedula": p.cedula or "",
-
-                "nombres": p.nombres or "",
-
-                "total_financiamiento": _safe_float(p.total_financiamiento),
-
-                "pagos_totales": pagos_totales,
-
-                "saldo": saldo,
-
-                "ultimo_pago_fecha": _fecha_iso(ultimo_pago),
-
-                "proximo_pago_fecha": _fecha_iso(proximo_pago),
-
-                "dias_atraso": dias_atraso,
-
-            })
-
-
-
         resultado["rangos"][rango["key"]] = {
-
             "label": rango["label"],
-
-            "items": items,
-
+            "items": items_por_rango[rango["key"]],
         }
 
-
-
     return resultado
 
 
-
-
-
 def _generar_excel_morosidad_por_mes(data_por_mes: dict) -> bytes:
 
     """Genera Excel con una pestaÃ±a por mes."""
@@ -1273,7 +890,7 @@ def _generar_pdf_morosidad(data: dict) -> bytes:
 
 def exportar_morosidad(
 
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 
     formato: str = Query("excel", pattern="^(excel|pdf)$"),
 
@@ -1323,7 +940,7 @@ def exportar_morosidad(
 
 
 @router.get("/exportar/morosidad-cedulas")
-def exportar_morosidad_cedulas(db: Session = Depends(get_db)):
+def exportar_morosidad_cedulas(db: Session = Depends(get_read_db)):
     """Una fila por cedula: cuenta y suma cuotas donde cuotas.estado = 'MORA' (BD).
 
     Cliente ACTIVO, prestamos APROBADO. Sin recalcular estado en la API.
@@ -11,7 +11,7 @@ from fastapi.responses import Response
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
@@ -25,7 +25,7 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 
 @router.get("/pagos")
 def get_reporte_pagos(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     fecha_inicio: str = Query(..., description="YYYY-MM-DD"),
     fecha_fin: str = Query(..., description="YYYY-MM-DD"),
 ):
@@ -148,7 +148,7 @@ def _pagos_por_dia_periodos(db: Session, periodos: List[tuple]) -> dict:
 
 @router.get("/pagos/por-dia-mes")
 def get_pagos_por_dia_mes(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     meses: int = Query(12, ge=1, le=24, description="Cantidad de meses hacia atrás"),
     anos: Optional[str] = Query(None, description="Años separados por coma"),
     meses_list: Optional[str] = Query(None, description="Meses 1-12 separados por coma"),
@@ -160,7 +160,7 @@ def get_pagos_por_dia_mes(
 
 @router.get("/pagos/por-mes")
 def get_pagos_por_mes(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     meses: int = Query(12, ge=1, le=24, description="Cantidad de meses hacia atrás"),
 ):
     """Pagos agrupados por mes/año. Cada mes tiene lista de pagos."""
@@ -321,7 +321,7 @@ def _generar_pdf_pagos(data: dict) -> bytes:
 
 @router.get("/exportar/pagos")
 def exportar_pagos(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     formato: str = Query("excel", pattern="^(excel|pdf)$"),
     fecha_inicio: Optional[str] = Query(None),
     fecha_fin: Optional[str] = Query(None),
@@ -11,7 +11,7 @@ from fastapi.responses import Response
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.deps import get_current_user
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
@@ -27,7 +27,7 @@ router = APIRouter(dependencies=[Depends(get_current_user)])
 
 @router.get("/productos/por-mes")
 def get_productos_por_mes(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     meses: int = Query(12, ge=1, le=24, description="Cantidad de meses hacia atrás"),
     anos: Optional[str] = Query(None),
     meses_list: Optional[str] = Query(None),
@@ -81,7 +81,7 @@ def get_productos_por_mes(
 
 @router.get("/productos")
 def get_reporte_productos(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     fecha_corte: Optional[str] = Query(None),
 ):
     """Reporte por producto. Datos reales desde BD."""
@@ -246,7 +246,7 @@ def _generar_pdf_productos(data: dict) -> bytes:
 
 @router.get("/exportar/productos")
 def exportar_productos(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     formato: str = Query("excel", pattern="^(excel|pdf)$"),
     fecha_corte: Optional[str] = Query(None),
     meses: int = Query(12, ge=1, le=24, description="Para Excel: cantidad de meses"),
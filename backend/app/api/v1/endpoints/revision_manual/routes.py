@@ -43,6 +43,7 @@ from app.services.notificacion_service import (
 from app.services.cuota_estado import sincronizar_columna_estado_cuotas
 from app.services.pagos_cuotas_sincronizacion import sincronizar_pagos_pendientes_a_prestamos
 from app.services.prestamo_estado_coherencia import prestamo_bloquea_nuevas_cuotas_o_cambio_plazo
+from app.services.prestamo_saldos import refrescar_prestamo_saldos
 from app.services.prestamos.prestamo_cedula_cliente_coherencia import (
     PrestamoCedulaClienteError,
     asegurar_prestamo_alineado_con_cliente,
@@ -1330,6 +1331,8 @@ def editar_cuota_revision(
         )
         db.add(rev_manual)
     
+    refrescar_prestamo_saldos(db, [cuota.prestamo_id])
+
     _commit_revision_seguro(
         db,
         operacion="editar_cuota_revision",
@@ -1396,6 +1399,8 @@ def eliminar_cuota_revision(
         )
         db.add(rev_manual)
 
+    refrescar_prestamo_saldos(db, [prestamo_id])
+
     _commit_revision_seguro(
         db,
         operacion="eliminar_cuota_revision",
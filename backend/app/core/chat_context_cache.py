@@ -6,6 +6,8 @@ import threading
 import time
 from typing import Optional
 
+from app.core.metricas import cache_consulta, cache_tamano
+
 logger = __import__("logging").getLogger(__name__)
 
 # TTL en segundos (1.5 minutos)
@@ -14,17 +16,21 @@ CHAT_CONTEXT_CACHE_TTL = 90
 # Clave fija: el contexto es global (no por usuario)
 _cache: dict[str, tuple[str, float]] = {}  # "context" -> (value, expires_at)
 _lock = threading.Lock()
+cache_tamano("chat_context", lambda: len(_cache))
 
 
 def get_cached_context() -> Optional[str]:
     """Devuelve el contexto cacheado si existe y no ha expirado."""
     with _lock:
         if "context" not in _cache:
+            cache_consulta("chat_context", False)
             return None
         value, expires_at = _cache["context"]
         if time.monotonic() >= expires_at:
             del _cache["context"]
+            cache_consulta("chat_context", False)
             return None
+        cache_consulta("chat_context", True)
         return value
 
 
@@ -144,6 +144,179 @@ class Settings(BaseSettings):
             "automaticamente sin esperar a ventanas horarias fijas."
         ),
     )
+    # Resumen por préstamo (tabla prestamo_saldos): verificación nocturna + lectura opcional.
+    ENABLE_PRESTAMO_SALDOS_VERIFICACION_NIGHTLY: bool = Field(
+        default=True,
+        description=(
+            "Si True y ENABLE_AUTOMATIC_SCHEDULED_JOBS=True, cada día a las 03:30 America/Caracas "
+            "(tras la auditoría de cartera 03:00) compara prestamo_saldos con el agregado de cuotas, "
+            "repara diferencias y recalcula el atraso para el día."
+        ),
+    )
+    PRESTAMO_SALDOS_LECTURA_RESUMEN: bool = Field(
+        default=False,
+        description=(
+            "Si True, listados, notificaciones y finiquito leen totales por préstamo desde prestamo_saldos "
+            "(una fila por préstamo) en lugar de agregar cuotas en cada llamada. Activar cuando la "
+            "verificación nocturna no reporte diferencias; sin fila vigente se usa el agregado."
+        ),
+    )
+    # Estado de cuenta: lectura pura + cache por versión de préstamo; pagos pendientes por cola.
+    ESTADO_CUENTA_CACHE_TTL_SEC: int = Field(
+        default=600,
+        ge=0,
+        le=86400,
+        description=(
+            "Segundos de vida del estado de cuenta armado en cache (clave: préstamo + versión + fecha de "
+            "corte). 0 desactiva la cache. El TTL solo acota datos no versionados (recibos/instituciones)."
+        ),
+    )
+    ESTADO_CUENTA_CACHE_MAX_ITEMS: int = Field(
+        default=2000,
+        ge=1,
+        le=200000,
+        description="Entradas máximas del LRU de estado de cuenta por proceso.",
+    )
+    PRESTAMO_VERSIONES_MARGEN_RELECTURA_MIN: int = Field(
+        default=15,
+        ge=1,
+        le=24 * 60,
+        description=(
+            "Minutos que los lectores incrementales (snapshot de liquidados, elegibles de Notificaciones) "
+            "vuelven a leer por debajo de su marca de prestamo_versiones: actualizado_en se fija al flush, "
+            "no al commit, y una transacción de hasta este largo puede confirmar con una fecha anterior."
+        ),
+    )
+    ENABLE_PRESTAMOS_SYNC_COLA: bool = Field(
+        default=True,
+        description=(
+            "Si True y ENABLE_AUTOMATIC_SCHEDULED_JOBS=True, un job drena prestamos_sync_pendiente "
+            "(pagos registrados/conciliados por aplicar a cuotas) cada PRESTAMOS_SYNC_COLA_INTERVAL_MINUTES "
+            "y cada hora encola préstamos con pagos conciliados sin cuota_pagos (red de seguridad)."
+        ),
+    )
+    PRESTAMOS_SYNC_COLA_INTERVAL_MINUTES: int = Field(
+        default=2,
+        ge=1,
+        le=60,
+        description="Minutos entre corridas del drenado de prestamos_sync_pendiente.",
+    )
+    PRESTAMOS_SYNC_COLA_LOTE: int = Field(
+        default=50,
+        ge=1,
+        le=2000,
+        description="Préstamos reclamados por corrida del drenado (cada uno en su propia transacción).",
+    )
+    # Scheduler: un pool por clase de recurso (core/scheduler.py JOB_PERFILES) + exclusión por recurso.
+    SCHEDULER_WORKERS_DB: int = Field(
+        default=2,
+        ge=1,
+        le=8,
+        description=(
+            "Hilos para jobs pesados en BD (auditoría, prestamo_saldos, cachés masivos). Cada hilo usa una "
+            "conexión del pool DATABASE_POOL_SIZE; jobs que tocan las mismas tablas se excluyen igual."
+        ),
+    )
+    SCHEDULER_WORKERS_EXTERNO: int = Field(
+        default=2,
+        ge=1,
+        le=8,
+        description="Hilos para jobs dominados por APIs externas (Google Sheets/Drive, Gmail).",
+    )
+    SCHEDULER_WORKERS_LIGERO: int = Field(
+        default=2,
+        ge=1,
+        le=8,
+        description="Hilos para jobs cortos (limpiezas, colas frecuentes, purga de historial).",
+    )
+    SCHEDULER_EXCLUSION_WAIT_SEC: int = Field(
+        default=3600,
+        ge=0,
+        le=6 * 3600,
+        description=(
+            "Segundos que un job programado espera a que otro job con el mismo recurso (p. ej. cuotas, drive) "
+            "termine; luego se omite (resultado omitido_exclusion). Los jobs por intervalo no esperan."
+        ),
+    )
+    SCHEDULER_JOB_RUNS_RETENCION_DIAS: int = Field(
+        default=90,
+        ge=1,
+        le=3650,
+        description="Días de historial en scheduler_job_runs (purga diaria 04:10).",
+    )
+    COBROS_VEREDICTOS_MATERIALIZADOS: bool = Field(
+        default=True,
+        description=(
+            "Si True, el listado, KPIs y export de pagos reportados cuentan la cola manual por columnas "
+            "persistidas (cola_manual, validadores_fallidos) en lugar de validar cada fila en Python."
+        ),
+    )
+    COBROS_VEREDICTOS_REFRESCO_MAX: int = Field(
+        default=1500,
+        ge=0,
+        le=50000,
+        description=(
+            "Máximo de reportados cuyo veredicto se recalcula en la misma transacción que los cambia; si una "
+            "escritura toca más (cargas masivas), quedan para la reconciliación y el listado usa el barrido "
+            "clásico mientras tanto."
+        ),
+    )
+    ENABLE_COBROS_VEREDICTOS_RECONCILIACION_NIGHTLY: bool = Field(
+        default=True,
+        description=(
+            "Si True y ENABLE_AUTOMATIC_SCHEDULED_JOBS=True, cada día a las 03:45 America/Caracas "
+            "recalcula el veredicto de cola manual de todos los pagos reportados y corrige diferencias."
+        ),
+    )
+    # Notificaciones: listas de elegibles materializadas por día (notificacion_elegibles_dia).
+    NOTIFICACIONES_ELEGIBLES_MATERIALIZADOS: bool = Field(
+        default=True,
+        description=(
+            "Si True, pestañas, conteos y envíos de hoy leen las listas de elegibles materializadas "
+            "(recalculadas bajo demanda si algún préstamo cambió); si False, se calculan en vivo en cada lectura."
+        ),
+    )
+    NOTIFICACIONES_ELEGIBLES_MAX_EDAD_MIN: int = Field(
+        default=120,
+        ge=5,
+        le=24 * 60,
+        description=(
+            "Minutos tras los que una lista materializada se recalcula completa aunque solo se hayan "
+            "parcheado los préstamos con versión nueva (cubre cambios que no pasan por prestamo_versiones)."
+        ),
+    )
+    ENABLE_NOTIFICACIONES_ELEGIBLES_NIGHTLY: bool = Field(
+        default=True,
+        description=(
+            "Si True y ENABLE_AUTOMATIC_SCHEDULED_JOBS=True, cada día a las 00:15 America/Caracas "
+            "materializa las listas de elegibles del día y purga las de días anteriores."
+        ),
+    )
+    # Auditoría liquidados: pares de numero_documento similares persistidos (auditoria_docs_similares_*).
+    AUDITORIA_DOCS_SIMILARES_UMBRAL_BASE: float = Field(
+        default=0.5,
+        ge=0.5,
+        le=1.0,
+        description=(
+            "Umbral de similitud con el que se persisten los pares por préstamo; consultas con umbral mayor o "
+            "igual filtran lo guardado, las de umbral menor se calculan en vivo."
+        ),
+    )
+    # Auditoría liquidados: snapshot de hallazgos de cierre (auditoria_liquidados_hallazgos).
+    AUDITORIA_LIQUIDADOS_CIERRE_SNAPSHOT: bool = Field(
+        default=True,
+        description=(
+            "Si True, la sección cierre de la auditoría intensiva de liquidados filtra y pagina sobre el snapshot "
+            "(refrescado al leer para préstamos con versión nueva); si False, recorre toda la cartera en cada GET."
+        ),
+    )
+    ENABLE_AUDITORIA_LIQUIDADOS_CIERRE_NIGHTLY: bool = Field(
+        default=True,
+        description=(
+            "Si True y ENABLE_AUTOMATIC_SCHEDULED_JOBS=True, cada día a las 03:15 America/Caracas recalcula "
+            "completo el snapshot de hallazgos de cierre de préstamos LIQUIDADO."
+        ),
+    )
     FINIQUITO_REFRESH_INTERVAL_MINUTES: int = Field(
         default=15,
         ge=5,
@@ -182,6 +355,144 @@ class Settings(BaseSettings):
         le=300,
         description="Segundos esperando conexión libre antes de sqlalchemy.exc.TimeoutError",
     )
+    # Perfilador SQL por request/job (app/core/sql_profiler.py): apagado por defecto.
+    SQL_PROFILER_ENABLED: bool = Field(
+        default=False,
+        description=(
+            "Si True, cuenta sentencias, ms en BD y sentencias repetidas por request (X-Request-ID) y por job "
+            "programado; agregado en GET /health/sql-perfiles (admin). Con DEBUG=True agrega cabecera X-SQL-Stats."
+        ),
+    )
+    SQL_PROFILER_N1_UMBRAL: int = Field(
+        default=10,
+        ge=2,
+        le=10000,
+        description="Repeticiones de una misma sentencia normalizada en un request/job para marcar sospecha de N+1.",
+    )
+    # Aislamiento por clase de tráfico (app/middleware/bulkhead.py + engines por clase en core/database.py).
+    BULKHEAD_ENABLED: bool = Field(
+        default=True,
+        description=(
+            "Si True, cada request se clasifica (publico / interactivo / pesado) con concurrencia, cola y engine "
+            "propios; cola llena o espera vencida responde 503 con Retry-After. Jobs e hilos usan el engine fondo."
+        ),
+    )
+    BULKHEAD_PUBLICO_CONCURRENCIA: int = Field(
+        default=12,
+        ge=1,
+        le=100,
+        description="Requests simultáneos de portales públicos y webhook de WhatsApp; también tamaño de su pool.",
+    )
+    BULKHEAD_PUBLICO_COLA: int = Field(
+        default=50,
+        ge=0,
+        le=1000,
+        description="Requests públicos esperando turno; por encima se responde 503 de inmediato.",
+    )
+    BULKHEAD_PUBLICO_ESPERA_SEG: float = Field(
+        default=10.0,
+        ge=0.1,
+        le=120.0,
+        description="Segundos máximos en cola de un request público antes de responder 503.",
+    )
+    BULKHEAD_PUBLICO_STATEMENT_TIMEOUT_MS: int = Field(
+        default=20_000,
+        ge=0,
+        le=3_600_000,
+        description="statement_timeout de las conexiones del engine público (0 = sin límite).",
+    )
+    BULKHEAD_INTERACTIVO_CONCURRENCIA: int = Field(
+        default=20,
+        ge=1,
+        le=100,
+        description="Requests simultáneos del panel admin (engine principal, DATABASE_POOL_SIZE).",
+    )
+    BULKHEAD_INTERACTIVO_COLA: int = Field(
+        default=100,
+        ge=0,
+        le=1000,
+        description="Requests del panel esperando turno; por encima se responde 503 de inmediato.",
+    )
+    BULKHEAD_INTERACTIVO_ESPERA_SEG: float = Field(
+        default=30.0,
+        ge=0.1,
+        le=300.0,
+        description="Segundos máximos en cola de un request del panel antes de responder 503.",
+    )
+    BULKHEAD_PESADO_CONCURRENCIA: int = Field(
+        default=3,
+        ge=1,
+        le=20,
+        description="Exports/Excel, cargas masivas y comparación de lotes simultáneos; también tamaño de su pool.",
+    )
+    BULKHEAD_PESADO_COLA: int = Field(
+        default=6,
+        ge=0,
+        le=200,
+        description="Requests pesados esperando turno; por encima se responde 503 de inmediato.",
+    )
+    BULKHEAD_PESADO_ESPERA_SEG: float = Field(
+        default=5.0,
+        ge=0.1,
+        le=300.0,
+        description="Segundos máximos en cola de un request pesado antes de responder 503.",
+    )
+    BULKHEAD_PESADO_STATEMENT_TIMEOUT_MS: int = Field(
+        default=600_000,
+        ge=0,
+        le=3_600_000,
+        description="statement_timeout de las conexiones del engine pesado (0 = sin límite).",
+    )
+    BULKHEAD_FONDO_STATEMENT_TIMEOUT_MS: int = Field(
+        default=300_000,
+        ge=0,
+        le=3_600_000,
+        description="statement_timeout del engine de jobs programados e hilos de fondo (0 = sin límite).",
+    )
+    # Réplica de lectura (core/database.py get_read_db / ReadSessionLocal): reportes, dashboard y exports.
+    DATABASE_REPLICA_URL: Optional[str] = Field(
+        None,
+        description=(
+            "DSN de una réplica PostgreSQL (hot standby). Vacío: las sesiones de lectura usan el primario."
+        ),
+    )
+    DATABASE_REPLICA_MAX_LAG_SEG: float = Field(
+        default=30.0,
+        ge=0.0,
+        le=3600.0,
+        description="Retraso máximo tolerado de la réplica; con más retraso (o caída) se lee del primario.",
+    )
+    DATABASE_REPLICA_CHECK_SEG: float = Field(
+        default=10.0,
+        ge=1.0,
+        le=300.0,
+        description="Segundos que se reutiliza la última medición de retraso/disponibilidad de la réplica.",
+    )
+    DATABASE_REPLICA_POOL_SIZE: int = Field(
+        default=5,
+        ge=1,
+        le=50,
+        description="Conexiones persistentes del pool de la réplica por worker.",
+    )
+    DATABASE_REPLICA_MAX_OVERFLOW: int = Field(
+        default=5,
+        ge=0,
+        le=50,
+        description="Conexiones extra del pool de la réplica bajo ráfagas.",
+    )
+    DATABASE_REPLICA_STATEMENT_TIMEOUT_MS: int = Field(
+        default=900_000,
+        ge=0,
+        le=3_600_000,
+        description="statement_timeout de las conexiones a la réplica (0 = sin límite).",
+    )
+    # Métricas internas (core/metricas.py) en GET /health/metrics.
+    METRICS_TOKEN: Optional[str] = Field(
+        None,
+        description=(
+            "Token Bearer fijo para el scraper de Prometheus en /health/metrics. Vacío: solo usuarios admin."
+        ),
+    )
 
     # ============================================
     # Seguridad
@@ -236,6 +547,15 @@ class Settings(BaseSettings):
             "para rate limit cuando la peticion llega detras de proxy confiable."
         ),
     )
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = Field(
+        default=20000,
+        ge=100,
+        le=1_000_000,
+        description=(
+            "Maximo de claves (politica+IP) del rate limit publico en memoria cuando no hay Redis. "
+            "Se descartan las menos recientes (LRU): memoria acotada ante rafagas de bots."
+        ),
+    )
     @field_validator("SECRET_KEY")
     @classmethod
     def validate_secret_key(cls, v: str) -> str:
@@ -383,6 +703,52 @@ class Settings(BaseSettings):
         default="notificaciones@rapicreditca.com",
         description="Email(s) para notificar cuando se crea o actualiza un ticket (separados por coma). Por defecto notificaciones@rapicreditca.com."
     )
+    # Campañas CRM: envío reanudable (app.services.crm_campanas_envio).
+    CRM_CAMPANA_MATERIALIZAR_CHUNK: int = Field(
+        default=2000,
+        ge=50,
+        le=50000,
+        description="Clientes por transacción al materializar destinatarios de una campaña CRM (cursor por cliente_id).",
+    )
+    CRM_CAMPANA_CLAIM_STALE_MIN: int = Field(
+        default=10,
+        ge=1,
+        le=1440,
+        description=(
+            "Minutos tras los cuales un destinatario en 'enviando' se considera de un proceso caído "
+            "y se recupera al reanudar (resultado registrado o vuelta a pendiente)."
+        ),
+    )
+    # Importar reportados aprobados (Cobros) a pagos: job reanudable por tramos (app.services.pagos_importacion_cobros).
+    PAGOS_IMPORTAR_COBROS_CHUNK: int = Field(
+        default=200,
+        ge=10,
+        le=5000,
+        description="Reportados aprobados por transacción al importar desde Cobros (cursor por pagos_reportados.id).",
+    )
+    PAGOS_IMPORTAR_COBROS_STALE_MIN: int = Field(
+        default=10,
+        ge=1,
+        le=1440,
+        description=(
+            "Minutos sin latido tras los cuales un job de importación en curso se considera interrumpido "
+            "(reinicio del worker) y puede reanudarse desde su cursor."
+        ),
+    )
+    # GET /pagos/kpis y /pagos/stats: resultados guardados en pagos_kpis_cache (app.services.pagos_kpis).
+    PAGOS_KPIS_CACHE: bool = Field(
+        default=True,
+        description="Si False, /pagos/kpis y /pagos/stats siempre calculan en vivo (sin leer ni escribir pagos_kpis_cache).",
+    )
+    PAGOS_KPIS_CACHE_TTL_SEG: int = Field(
+        default=600,
+        ge=10,
+        le=86400,
+        description=(
+            "Edad máxima de una entrada de pagos_kpis_cache aunque la marca de prestamo_versiones no haya cambiado "
+            "(acota cambios no versionados: estado de préstamo/cliente, analista, concesionario, modelo)."
+        ),
+    )
     # URL pública del frontend (para enlaces y logo en emails de cobranza). Ej: https://rapicredit.onrender.com/pagos
     # Ruta al logo PNG para generar el PDF de carta de cobranza (adjunto al email). Opcional; si no existe se omite el logo en el PDF.
     LOGO_PDF_COBRANZA_PATH: Optional[str] = Field(
@@ -562,6 +928,14 @@ class Settings(BaseSettings):
         le=2.0,
         description="Pausa en segundos entre lotes consecutivos de metadata Gmail (amortigua concurrencia).",
     )
+    PAGOS_GMAIL_HISTORY_INCREMENTAL: bool = Field(
+        default=True,
+        description=(
+            "Escaneo programado Gmail incremental con la History API: solo correos agregados o con cambios de "
+            "etiqueta desde la última corrida exitosa (cursor historyId en configuracion). Sin cursor o con "
+            "historial vencido hace el listado completo. False: listado completo en cada corrida."
+        ),
+    )
 
     # Google Sheet CONCILIACIÓN → BD (snapshot dom/mié 01:20; caché Clientes Drive lun-sab 04:05 si jobs automáticos)
     CONCILIACION_SHEET_SPREADSHEET_ID: Optional[str] = Field(
@@ -1,15 +1,34 @@
 """
 Conexión a la base de datos PostgreSQL.
 Proporciona engine, sesión y dependencia get_db para inyectar en endpoints.
+
+Aislamiento por clase de tráfico (BULKHEAD_ENABLED, middleware app/middleware/bulkhead.py): el request
+fija su clase en un ContextVar y `SessionLocal()` / `get_db` toman conexión del engine de esa clase, cada
+uno con su pool y su statement_timeout. Un export pesado agota su pool, no el de los portales públicos.
+  - publico: portales sin auth (cobros, estado de cuenta, finiquito OTP) y webhook de WhatsApp.
+  - interactivo: resto del panel admin → `engine` (DATABASE_POOL_SIZE, PG_STATEMENT_TIMEOUT_MS).
+  - pesado: exports/Excel, cargas masivas, comparación de lotes.
+  - fondo: sin clase (jobs del scheduler, hilos lanzados desde un request, startup).
+Con BULKHEAD_ENABLED=False o fuera de Postgres todas las clases usan `engine`.
+
+Lecturas largas (reportes, dashboard, exports): `get_read_db` / `ReadSessionLocal()` usan la réplica
+DATABASE_REPLICA_URL dentro del presupuesto de retraso, con fallback al primario y sin escrituras.
 """
 import logging
 import os
-from typing import Generator
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Generator, Iterator, Optional
 
 from sqlalchemy import create_engine, event
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from sqlalchemy.pool import QueuePool
 
+from app.core import metricas
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -61,89 +80,143 @@ if _db_url.startswith("postgres://"):
 
 _is_postgres = _db_url.startswith("postgresql")
 
-if _is_postgres:
-    _engine_kwargs = dict(
-        pool_pre_ping=True,  # Verifica que la conexión esté viva antes de usarla (reconexión automática)
-        pool_size=settings.DATABASE_POOL_SIZE,
-        max_overflow=settings.DATABASE_MAX_OVERFLOW,
-        pool_recycle=300,  # Recicla cada 5 min (Render cierra SSL antes; evita SSL connection closed unexpectedly)
-        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
-        connect_args={
-            "connect_timeout": 15,  # Timeout de conexión inicial (psycopg2)
-            "application_name": "rapicredit_backend",
-            "keepalives": 1,  # Habilitar TCP keepalives (psycopg2 nativo)
-            "keepalives_idle": 30,  # Inicia keepalive tras 30s de inactividad
-            "keepalives_interval": 10,  # Envía keepalive cada 10s
-            "keepalives_count": 5,  # Máximo 5 keepalives sin respuesta antes de cerrar
-        },
-        echo=False,
-        pool_use_lifo=True,  # QueuePool: bajo ráfagas, LIFO reutiliza conexiones recientes
-    )
-    engine = create_engine(_db_url, **_engine_kwargs)
-
-    @event.listens_for(engine, "handle_error")
-    def _invalidate_on_disconnect(ctx):
-        """Tras SSL closed / conexion Postgres caida (deploy, idle), no reutilizar el socket."""
-        orig = getattr(ctx, "original_exception", None)
-        if isinstance(orig, OperationalError):
-            conn = getattr(ctx, "connection", None)
-            if conn is not None:
+_checkout_espera = metricas.histograma(
+    "rapicredit_db_pool_checkout_espera_segundos",
+    "Espera para obtener conexión del pool (incluye abrir una nueva dentro de max_overflow).",
+    ("motor",),
+)
+_checkout_timeouts = metricas.contador(
+    "rapicredit_db_pool_checkout_timeouts_total",
+    "Checkouts que agotaron DATABASE_POOL_TIMEOUT (sqlalchemy TimeoutError).",
+    ("motor",),
+)
+
+
+class _QueuePoolMedido(QueuePool):
+    """QueuePool que registra la espera de checkout; `logging_name` = nombre del motor (sobrevive a recreate)."""
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        motor = self._orig_logging_name or "principal"
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            _checkout_timeouts.inc(motor=motor)
+            raise
+        finally:
+            _checkout_espera.observe(time.perf_counter() - t0, motor=motor)
+
+
+def _normalizar_url(url: str) -> str:
+    # Render suele dar postgres://; SQLAlchemy exige postgresql://
+    return url.replace("postgres://", "postgresql://", 1) if url.startswith("postgres://") else url
+
+
+def _crear_engine(
+    *,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: int,
+    application_name: str = "rapicredit_backend",
+    url: Optional[str] = None,
+    connect_timeout: int = 15,
+) -> Engine:
+    """Engine con los listeners comunes (invalidar tras desconexión, timezone, statement_timeout, perfilador)."""
+    url = url or _db_url
+    if url.startswith("postgresql"):
+        eng = create_engine(
+            url,
+            pool_pre_ping=True,  # Verifica que la conexión esté viva antes de usarla (reconexión automática)
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=300,  # Recicla cada 5 min (Render cierra SSL antes; evita SSL connection closed unexpectedly)
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            connect_args={
+                "connect_timeout": connect_timeout,  # Timeout de conexión inicial (psycopg2)
+                "application_name": application_name,
+                "keepalives": 1,  # Habilitar TCP keepalives (psycopg2 nativo)
+                "keepalives_idle": 30,  # Inicia keepalive tras 30s de inactividad
+                "keepalives_interval": 10,  # Envía keepalive cada 10s
+                "keepalives_count": 5,  # Máximo 5 keepalives sin respuesta antes de cerrar
+            },
+            echo=False,
+            pool_use_lifo=True,  # QueuePool: bajo ráfagas, LIFO reutiliza conexiones recientes
+            poolclass=_QueuePoolMedido,
+            pool_logging_name=application_name.removeprefix("rapicredit_backend").lstrip("_") or "principal",
+        )
+
+        @event.listens_for(eng, "handle_error")
+        def _invalidate_on_disconnect(ctx):
+            """Tras SSL closed / conexion Postgres caida (deploy, idle), no reutilizar el socket."""
+            orig = getattr(ctx, "original_exception", None)
+            if isinstance(orig, OperationalError):
+                conn = getattr(ctx, "connection", None)
+                if conn is not None:
+                    try:
+                        conn.invalidate()
+                    except Exception:
+                        pass
+
+        @event.listens_for(eng, "connect")
+        def _set_timezone_vzla(dbapi_connection, connection_record):
+            """Set session timezone to Venezuela (America/Caracas) for every new connection."""
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET timezone = '{BUSINESS_TIMEZONE}'")
+            cursor.close()
+
+        @event.listens_for(eng, "connect")
+        def _set_statement_timeout(dbapi_connection, connection_record):
+            """
+            Aplica `statement_timeout` (ms) a cada nueva conexión Postgres.
+
+            Una query atascada en el único worker (workers=1 en Render) bloquearía a TODA la app
+            hasta que gunicorn `--timeout` la corte (con la mala señal de matar al worker entero).
+            Postgres puede cancelar la query individualmente sin tocar el proceso Python si
+            `statement_timeout` está configurado. Resulta en un error SQL recuperable que el
+            endpoint puede manejar (HTTP 500 limpio + logs), no en restart del dyno.
+
+            Engine principal: env `PG_STATEMENT_TIMEOUT_MS` (ver `_resolve_statement_timeout_ms()`);
+            engines por clase de tráfico: BULKHEAD_*_STATEMENT_TIMEOUT_MS.
+
+            `0` desactiva el límite; en ese caso, no ejecutamos SET (evita ruido).
+            """
+            if statement_timeout_ms <= 0:
+                return
+            try:
+                cursor = dbapi_connection.cursor()
+                cursor.execute(f"SET statement_timeout = {int(statement_timeout_ms)}")
+                cursor.close()
+            except Exception as e:
+                # Log defensivo: si el server PG no lo soporta (raro, está en core desde 8.x),
+                # no abortar la conexión. Los endpoints seguirán funcionando, solo perdemos la
+                # red de seguridad de timeout por query.
                 try:
-                    conn.invalidate()
+                    logger.warning(
+                        "[DB] No se pudo aplicar statement_timeout=%sms a la conexión nueva: %s",
+                        statement_timeout_ms,
+                        e,
+                    )
                 except Exception:
                     pass
-else:
-    # SQLite (p. ej. pytest): no acepta pool_size/max_overflow ni connect_args de psycopg2.
-    _non_pg_kwargs: dict = {"echo": False}
-    if _db_url.startswith("sqlite"):
-        _non_pg_kwargs["connect_args"] = {"check_same_thread": False}
-    engine = create_engine(_db_url, **_non_pg_kwargs)
-
-@event.listens_for(engine, "connect")
-def _set_timezone_vzla(dbapi_connection, connection_record):
-    """Set session timezone to Venezuela (America/Caracas) for every new connection."""
-    if not _is_postgres:
-        return
-    cursor = dbapi_connection.cursor()
-    cursor.execute(f"SET timezone = '{BUSINESS_TIMEZONE}'")
-    cursor.close()
-
-
-@event.listens_for(engine, "connect")
-def _set_statement_timeout(dbapi_connection, connection_record):
-    """
-    Aplica `statement_timeout` (ms) a cada nueva conexión Postgres.
+    else:
+        # SQLite (p. ej. pytest): no acepta pool_size/max_overflow ni connect_args de psycopg2.
+        _non_pg_kwargs: dict = {"echo": False}
+        if url.startswith("sqlite"):
+            _non_pg_kwargs["connect_args"] = {"check_same_thread": False}
+        eng = create_engine(url, **_non_pg_kwargs)
 
-    Una query atascada en el único worker (workers=1 en Render) bloquearía a TODA la app
-    hasta que gunicorn `--timeout` la corte (con la mala señal de matar al worker entero).
-    Postgres puede cancelar la query individualmente sin tocar el proceso Python si
-    `statement_timeout` está configurado. Resulta en un error SQL recuperable que el
-    endpoint puede manejar (HTTP 500 limpio + logs), no en restart del dyno.
+    if settings.SQL_PROFILER_ENABLED:
+        from app.core.sql_profiler import instalar_sql_profiler
 
-    Configurable vía env `PG_STATEMENT_TIMEOUT_MS`. Ver `_resolve_statement_timeout_ms()`.
+        instalar_sql_profiler(eng)
+    return eng
 
-    `0` desactiva el límite; en ese caso, no ejecutamos SET (evita ruido).
-    """
-    if not _is_postgres:
-        return
-    if _PG_STATEMENT_TIMEOUT_MS <= 0:
-        return
-    try:
-        cursor = dbapi_connection.cursor()
-        cursor.execute(f"SET statement_timeout = {int(_PG_STATEMENT_TIMEOUT_MS)}")
-        cursor.close()
-    except Exception as e:
-        # Log defensivo: si el server PG no lo soporta (raro, está en core desde 8.x),
-        # no abortar la conexión. Los endpoints seguirán funcionando, solo perdemos la
-        # red de seguridad de timeout por query.
-        try:
-            logger.warning(
-                "[DB] No se pudo aplicar statement_timeout=%sms a la conexión nueva: %s",
-                _PG_STATEMENT_TIMEOUT_MS,
-                e,
-            )
-        except Exception:
-            pass
+
+engine = _crear_engine(
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    statement_timeout_ms=_PG_STATEMENT_TIMEOUT_MS,
+)
 
 
 # Aviso único en logs al cargar el módulo: ayuda a confirmar el valor activo durante el
@@ -163,9 +236,114 @@ if _is_postgres:
         )
 
 
+CLASE_PUBLICO = "publico"
+CLASE_INTERACTIVO = "interactivo"
+CLASE_PESADO = "pesado"
+CLASE_FONDO = "fondo"
+CLASES_TRAFICO = (CLASE_PUBLICO, CLASE_INTERACTIVO, CLASE_PESADO, CLASE_FONDO)
+
+_clase_trafico: ContextVar[str] = ContextVar("clase_trafico", default=CLASE_FONDO)
+
+_motores_clase: Dict[str, Engine] = {}
+_motores_lock = threading.Lock()
+
+
+def clase_trafico_actual() -> str:
+    return _clase_trafico.get()
+
+
+@contextmanager
+def usar_clase_trafico(clase: str) -> Iterator[None]:
+    """Fija la clase de tráfico del contexto actual (AnyIO la copia a los hilos del threadpool)."""
+    token = _clase_trafico.set(clase)
+    try:
+        yield
+    finally:
+        _clase_trafico.reset(token)
+
+
+def _parametros_motor_clase(clase: str) -> tuple[int, int, int]:
+    """(pool_size, max_overflow, statement_timeout_ms): el pool cubre la concurrencia admitida de la clase."""
+    if clase == CLASE_PUBLICO:
+        n = settings.BULKHEAD_PUBLICO_CONCURRENCIA
+        return n, max(1, n // 2), settings.BULKHEAD_PUBLICO_STATEMENT_TIMEOUT_MS
+    if clase == CLASE_PESADO:
+        n = settings.BULKHEAD_PESADO_CONCURRENCIA
+        return n, max(1, n // 2), settings.BULKHEAD_PESADO_STATEMENT_TIMEOUT_MS
+    # Fondo: un hilo por worker del scheduler + holgura para hilos lanzados desde requests.
+    n = settings.SCHEDULER_WORKERS_DB + settings.SCHEDULER_WORKERS_EXTERNO + settings.SCHEDULER_WORKERS_LIGERO
+    return n, 4, settings.BULKHEAD_FONDO_STATEMENT_TIMEOUT_MS
+
+
+def motor_para_clase(clase: Optional[str] = None) -> Engine:
+    """Engine de la clase (por defecto la del contexto); se crea en el primer uso."""
+    clase = clase or clase_trafico_actual()
+    if clase == CLASE_INTERACTIVO or not _is_postgres or not settings.BULKHEAD_ENABLED:
+        return engine
+    eng = _motores_clase.get(clase)
+    if eng is not None:
+        return eng
+    with _motores_lock:
+        eng = _motores_clase.get(clase)
+        if eng is None:
+            pool_size, max_overflow, timeout_ms = _parametros_motor_clase(clase)
+            eng = _crear_engine(
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                statement_timeout_ms=timeout_ms,
+                application_name=f"rapicredit_backend_{clase}",
+            )
+            _motores_clase[clase] = eng
+            logger.info(
+                "[DB] engine clase=%s pool_size=%s max_overflow=%s statement_timeout=%sms",
+                clase,
+                pool_size,
+                max_overflow,
+                timeout_ms,
+            )
+    return eng
+
+
+def estado_pools() -> Dict[str, Dict[str, int]]:
+    """Conexiones por engine (principal, clases y réplica ya creados), para /health/bulkhead y métricas."""
+    out: Dict[str, Dict[str, int]] = {}
+    motores = [("principal", engine), *sorted(_motores_clase.items())]
+    if _motor_replica is not None:
+        motores.append(("replica", _motor_replica))
+    for nombre, eng in motores:
+        pool = eng.pool
+        if isinstance(pool, QueuePool):
+            out[nombre] = {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            }
+    return out
+
+
+metricas.medidor(
+    "rapicredit_db_pool_conexiones",
+    "Conexiones por engine: pool_size, checked_out (en uso), checked_in (libres), overflow.",
+    ("motor", "estado"),
+    funcion=lambda: [
+        ({"motor": motor, "estado": estado}, n) for motor, d in estado_pools().items() for estado, n in d.items()
+    ],
+)
+
+
+class _SessionmakerPorClase(sessionmaker):
+    """`SessionLocal()` sin bind explícito toma el engine de la clase de tráfico del contexto."""
+
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw:
+            local_kw["bind"] = motor_para_clase()
+        return super().__call__(**local_kw)
+
+
 # expire_on_commit=False evita el error F405: al cerrar la sesión los objetos no se "expiran",
 # así la serialización de la respuesta (Pydantic/model_validate) no intenta lazy load fuera de la sesión.
-SessionLocal = sessionmaker(
+SessionLocal = _SessionmakerPorClase(
     autocommit=False,
     autoflush=False,
     bind=engine,
@@ -181,3 +359,178 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+# --- Réplica de lectura -------------------------------------------------------------------------------
+# Reportes, dashboard y exports leen con `get_read_db` / `ReadSessionLocal()`: van a DATABASE_REPLICA_URL
+# si la réplica responde y su retraso está dentro del presupuesto (DATABASE_REPLICA_MAX_LAG_SEG, o el
+# `retraso_max_seg` de la sesión); si no, al primario (engine de la clase de tráfico). La medición se
+# reutiliza DATABASE_REPLICA_CHECK_SEG segundos; una desconexión de la réplica la invalida al instante.
+# Las sesiones de lectura rechazan escrituras: flush/DML del ORM lanzan EscrituraEnSesionLectura y en
+# Postgres la transacción se abre READ ONLY (cubre también text("UPDATE ...") cuando se cae al primario).
+
+# Sin escritura WAL pendiente el standby está al día aunque la última transacción aplicada sea antigua.
+_SQL_RETRASO_REPLICA = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class EscrituraEnSesionLectura(RuntimeError):
+    """Se intentó escribir con una sesión de `get_read_db` / `ReadSessionLocal`."""
+
+
+_motor_replica: Optional[Engine] = None
+_estado_replica: Dict[str, object] = {
+    "verificado": None,
+    "usable": False,
+    "retraso_seg": None,
+    "error": None,
+    "midiendo": False,
+}
+_replica_lock = threading.Lock()
+
+
+def replica_configurada() -> bool:
+    return bool((settings.DATABASE_REPLICA_URL or "").strip())
+
+
+def motor_replica() -> Optional[Engine]:
+    global _motor_replica
+    if not replica_configurada():
+        return None
+    if _motor_replica is None:
+        with _replica_lock:
+            if _motor_replica is None:
+                eng = _crear_engine(
+                    url=_normalizar_url(settings.DATABASE_REPLICA_URL.strip()),
+                    pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+                    max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+                    statement_timeout_ms=settings.DATABASE_REPLICA_STATEMENT_TIMEOUT_MS,
+                    application_name="rapicredit_backend_replica",
+                    connect_timeout=5,
+                )
+
+                @event.listens_for(eng, "handle_error")
+                def _replica_caida(ctx):
+                    # No usable hasta la próxima medición: mientras se mide, las lecturas van al primario.
+                    if ctx.is_disconnect:
+                        _estado_replica.update(verificado=None, usable=False, error="desconexión de la réplica")
+
+                _motor_replica = eng
+    return _motor_replica
+
+
+def _medir_retraso_replica(conn) -> float:
+    if conn.dialect.name != "postgresql":
+        return 0.0
+    return float(conn.exec_driver_sql(_SQL_RETRASO_REPLICA).scalar() or 0.0)
+
+
+def estado_replica(*, forzar: bool = False) -> Dict[str, object]:
+    """
+    {configurada, usable, retraso_seg, error}; mide de nuevo cada DATABASE_REPLICA_CHECK_SEG (o con `forzar`).
+
+    Una sola medición a la vez y fuera del lock (connect_timeout=5 con la réplica caída): mientras tanto los
+    demás llamadores usan el último estado conocido (sin medición previa: no usable → primario).
+    """
+    eng = motor_replica()
+    if eng is None:
+        return {"configurada": False, "usable": False, "retraso_seg": None, "error": None}
+    with _replica_lock:
+        verificado = _estado_replica["verificado"]
+        vigente = verificado is not None and time.monotonic() - verificado < settings.DATABASE_REPLICA_CHECK_SEG
+        medir = (forzar or not vigente) and not _estado_replica.get("midiendo")
+        if medir:
+            _estado_replica["midiendo"] = True
+        antes = _estado_replica["usable"]
+    if medir:
+        nuevo: Dict[str, object] = {"usable": False, "retraso_seg": None, "error": "medición interrumpida"}
+        try:
+            with eng.connect() as conn:
+                retraso = _medir_retraso_replica(conn)
+            nuevo = {"usable": True, "retraso_seg": round(retraso, 3), "error": None}
+        except Exception as e:
+            nuevo = {"usable": False, "retraso_seg": None, "error": str(e)[:200]}
+        finally:
+            with _replica_lock:
+                _estado_replica.update(nuevo, verificado=time.monotonic(), midiendo=False)
+        if nuevo["usable"] != antes:
+            logger.warning(
+                "[DB] réplica %s retraso=%s error=%s",
+                "disponible" if nuevo["usable"] else "NO disponible",
+                nuevo["retraso_seg"],
+                nuevo["error"],
+            )
+    with _replica_lock:
+        out = {k: v for k, v in _estado_replica.items() if k not in ("verificado", "midiendo")}
+    out["configurada"] = True
+    return out
+
+
+metricas.medidor(
+    "rapicredit_db_replica_retraso_segundos",
+    "Último retraso medido de la réplica de lectura (sin muestra si no está configurada o no responde).",
+    funcion=lambda: [({}, _estado_replica["retraso_seg"])] if _estado_replica["retraso_seg"] is not None else [],
+)
+
+
+def motor_lectura(retraso_max_seg: Optional[float] = None) -> Engine:
+    """Réplica si está disponible y dentro del presupuesto de retraso; si no, el engine de la clase."""
+    if replica_configurada():
+        est = estado_replica()
+        limite = settings.DATABASE_REPLICA_MAX_LAG_SEG if retraso_max_seg is None else retraso_max_seg
+        if est["usable"] and float(est["retraso_seg"] or 0.0) <= limite:
+            return motor_replica()
+    return motor_para_clase()
+
+
+class _SesionLectura(Session):
+    """Sesión de solo lectura (ver bloque "Réplica de lectura")."""
+
+
+@event.listens_for(_SesionLectura, "before_flush")
+def _rechazar_flush(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise EscrituraEnSesionLectura("Sesión de solo lectura: use get_db/SessionLocal para escribir.")
+
+
+@event.listens_for(_SesionLectura, "do_orm_execute")
+def _rechazar_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        raise EscrituraEnSesionLectura("Sesión de solo lectura: use get_db/SessionLocal para escribir.")
+
+
+@event.listens_for(_SesionLectura, "after_begin")
+def _transaccion_solo_lectura(session, transaction, connection):
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+class _SessionmakerLectura(sessionmaker):
+    """`ReadSessionLocal(retraso_max_seg=None)`: engine elegido por `motor_lectura` al crear la sesión."""
+
+    def __call__(self, *, retraso_max_seg: Optional[float] = None, **local_kw):
+        if "bind" not in local_kw:
+            local_kw["bind"] = motor_lectura(retraso_max_seg)
+        return super().__call__(**local_kw)
+
+
+ReadSessionLocal = _SessionmakerLectura(
+    class_=_SesionLectura,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Dependencia FastAPI para endpoints de solo lectura (réplica con fallback al primario)."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
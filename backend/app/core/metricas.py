@@ -0,0 +1,277 @@
+"""
+Registro de métricas en memoria por proceso, expuesto en formato texto de Prometheus (GET /health/metrics).
+
+Sin dependencias ni servicio externo: cada worker guarda sus contadores, medidores e histogramas y los
+serializa al recibir el scrape. Los valores se pierden al reiniciar el proceso (los contadores de Prometheus
+lo tratan como reset).
+
+Tipos:
+  - Contador: solo sube (`inc`).
+  - Medidor: valor actual (`set`/`inc`/`dec`) o `funcion` que se evalúa en cada scrape y devuelve
+    [(etiquetas, valor)] — así se leen pools de conexiones, hilos o tamaños de caché sin instrumentar cada
+    cambio.
+  - Histograma: buckets acumulados + suma + cuenta (`observe`).
+
+Uso: `contador("rapicredit_x_total", "ayuda", ("etiqueta",)).inc(etiqueta="a")`. Pedir dos veces el mismo
+nombre devuelve la misma métrica (idempotente entre imports). Nombres con prefijo `rapicredit_`.
+
+Métricas registradas (ver cada módulo):
+  - core/database.py: espera y timeouts de checkout por engine; conexiones por estado (pool_size, en uso,
+    libres, overflow).
+  - middleware/bulkhead.py: hilos AnyIO (total, en uso, esperando); activos/en cola/rechazos por clase.
+  - cachés: `cache_consulta(nombre, hit)` → rapicredit_cache_consultas_total{cache,resultado}
+    (cache_service, dashboard, gemini_cache, chat_context_cache, pagos_kpis) y rapicredit_cache_entradas{cache}.
+  - services/notificaciones_envio_bg_runner.py: hilos de envío activos, lotes y duración.
+  - services/scheduler_job_runs.py: corridas por job/resultado, duración y espera por exclusión.
+  - services/pagos_importacion_cobros.py: tramos de importación desde Cobros por resultado y duración.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Etiquetas = Dict[str, str]
+Muestras = Iterable[Tuple[Etiquetas, float]]
+
+BUCKETS_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BUCKETS_JOBS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_etiquetas(etiquetas: Sequence[Tuple[str, str]]) -> str:
+    if not etiquetas:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in etiquetas) + "}"
+
+
+def _formatear_valor(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    if math.isnan(v):
+        return "NaN"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas: Etiquetas) -> Tuple[str, ...]:
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(f"{self.nombre}: etiquetas {sorted(etiquetas)} != {sorted(self.etiquetas)}")
+        return tuple(str(etiquetas[k]) for k in self.etiquetas)
+
+    def _lineas(self) -> List[str]:
+        raise NotImplementedError
+
+    def exponer(self) -> List[str]:
+        return [f"# HELP {self.nombre} {_escapar(self.ayuda)}", f"# TYPE {self.nombre} {self.tipo}", *self._lineas()]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, valor: float = 1.0, **etiquetas: str) -> None:
+        if valor < 0:
+            raise ValueError(f"{self.nombre}: un contador no baja")
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + valor
+
+    def valor(self, **etiquetas: str) -> float:
+        with self._lock:
+            return self._valores.get(self._clave(etiquetas), 0.0)
+
+    def _lineas(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._valores.items())
+        return [
+            f"{self.nombre}{_formatear_etiquetas(list(zip(self.etiquetas, k)))} {_formatear_valor(v)}" for k, v in items
+        ]
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: Sequence[str] = (),
+        funcion: Optional[Callable[[], Muestras]] = None,
+    ):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+        self.funcion = funcion
+
+    def set(self, valor: float, **etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = float(valor)
+
+    def inc(self, valor: float = 1.0, **etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + valor
+
+    def dec(self, valor: float = 1.0, **etiquetas: str) -> None:
+        self.inc(-valor, **etiquetas)
+
+    def valor(self, **etiquetas: str) -> float:
+        with self._lock:
+            return self._valores.get(self._clave(etiquetas), 0.0)
+
+    def _lineas(self) -> List[str]:
+        if self.funcion is not None:
+            try:
+                items = sorted((self._clave(e), float(v)) for e, v in self.funcion())
+            except Exception as e:
+                # Un colector roto no debe tumbar el scrape completo.
+                logger.debug("[metricas] %s: colector falló: %s", self.nombre, e)
+                return []
+        else:
+            with self._lock:
+                items = sorted(self._valores.items())
+        return [
+            f"{self.nombre}{_formatear_etiquetas(list(zip(self.etiquetas, k)))} {_formatear_valor(v)}" for k, v in items
+        ]
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: Sequence[str] = (),
+        buckets: Sequence[float] = BUCKETS_SEGUNDOS,
+    ):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        # clave → [cuenta por bucket (no acumulada; el último es +Inf), suma, cuenta]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, valor: float, **etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        i = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def cuenta(self, **etiquetas: str) -> int:
+        with self._lock:
+            serie = self._series.get(self._clave(etiquetas))
+            return serie[2] if serie else 0
+
+    def _lineas(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, ([*s[0]], s[1], s[2])) for k, s in self._series.items())
+        out: List[str] = []
+        for clave, (conteos, suma, cuenta) in items:
+            base = list(zip(self.etiquetas, clave))
+            acumulado = 0
+            for limite, n in zip((*self.buckets, math.inf), conteos):
+                acumulado += n
+                le = "+Inf" if math.isinf(limite) else _formatear_valor(limite)
+                out.append(f"{self.nombre}_bucket{_formatear_etiquetas(base + [('le', le)])} {acumulado}")
+            out.append(f"{self.nombre}_sum{_formatear_etiquetas(base)} {_formatear_valor(suma)}")
+            out.append(f"{self.nombre}_count{_formatear_etiquetas(base)} {cuenta}")
+        return out
+
+
+class Registro:
+    def __init__(self) -> None:
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _obtener(self, cls, nombre: str, ayuda: str, etiquetas: Sequence[str], **kw) -> _Metrica:
+        with self._lock:
+            m = self._metricas.get(nombre)
+            if m is None:
+                m = self._metricas[nombre] = cls(nombre, ayuda, etiquetas, **kw)
+            elif not isinstance(m, cls) or m.etiquetas != tuple(etiquetas):
+                raise ValueError(f"Métrica {nombre} ya registrada con otro tipo o etiquetas")
+            elif kw.get("funcion") is not None:
+                m.funcion = kw["funcion"]
+            return m
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Contador:
+        return self._obtener(Contador, nombre, ayuda, etiquetas)
+
+    def medidor(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: Sequence[str] = (),
+        funcion: Optional[Callable[[], Muestras]] = None,
+    ) -> Medidor:
+        return self._obtener(Medidor, nombre, ayuda, etiquetas, funcion=funcion)
+
+    def histograma(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: Sequence[str] = (),
+        buckets: Sequence[float] = BUCKETS_SEGUNDOS,
+    ) -> Histograma:
+        return self._obtener(Histograma, nombre, ayuda, etiquetas, buckets=buckets)
+
+    def exponer(self) -> str:
+        with self._lock:
+            metricas = sorted(self._metricas.values(), key=lambda m: m.nombre)
+        lineas: List[str] = []
+        for m in metricas:
+            lineas.extend(m.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+REGISTRO = Registro()
+contador = REGISTRO.contador
+medidor = REGISTRO.medidor
+histograma = REGISTRO.histograma
+exponer_prometheus = REGISTRO.exponer
+
+_cache_consultas = contador(
+    "rapicredit_cache_consultas_total", "Lecturas de cachés en memoria por resultado.", ("cache", "resultado")
+)
+
+
+_tamanos_cache: Dict[str, Callable[[], int]] = {}
+medidor(
+    "rapicredit_cache_entradas",
+    "Entradas en cachés en memoria del proceso.",
+    ("cache",),
+    funcion=lambda: [({"cache": c}, f()) for c, f in sorted(_tamanos_cache.items())],
+)
+
+
+def cache_consulta(cache: str, hit: bool) -> None:
+    """Cuenta una lectura de caché (hit/miss) para rapicredit_cache_consultas_total."""
+    _cache_consultas.inc(cache=cache, resultado="hit" if hit else "miss")
+
+
+def cache_tamano(cache: str, funcion: Callable[[], int]) -> None:
+    """Registra cómo contar las entradas de una caché para rapicredit_cache_entradas{cache}."""
+    _tamanos_cache[cache] = funcion
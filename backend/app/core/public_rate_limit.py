@@ -0,0 +1,222 @@
+"""
+Limitador unico para endpoints publicos (Cobros, Estado de cuenta, Finiquito): GCRA por IP.
+
+GCRA (generic cell rate algorithm) guarda un solo numero por clave, el "TAT" (instante teorico de la
+siguiente peticion). Con limite N por ventana W: intervalo T = W/N; se admite una rafaga de N y luego
+una peticion cada T (ventana deslizante sin guardar timestamps).
+
+- Redis (si REDIS_URL responde): script Lua atomico (GET + SET PX en una sola llamada; sin carrera
+  INCR/EXPIRE). Usa TIME del servidor Redis para que todas las instancias compartan reloj.
+- Fallback en memoria: LRU acotado de claves (RATE_LIMIT_MEMORY_MAX_KEYS); bajo rafagas de bots con
+  miles de IPs la memoria queda fija y se descartan las claves menos recientes.
+
+Las politicas por ruta viven en POLICIES (un solo lugar). Rechazos y uso de Redis/memoria se cuentan
+por politica en `rate_limit_metrics_snapshot()`.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Limite `max_requests` por `window_sec` para una ruta publica."""
+
+    nombre: str
+    max_requests: int
+    window_sec: int
+    detail_429: str
+
+    @property
+    def emission_interval(self) -> float:
+        return float(self.window_sec) / float(max(1, self.max_requests))
+
+
+_MSG_MINUTO = "Demasiadas consultas. Espere un minuto e intente de nuevo."
+_MSG_15_MIN = "Demasiados intentos. Espere 15 minutos e intente de nuevo."
+_MSG_CODIGO_HORA = "Demasiadas solicitudes de codigo. Intente de nuevo en una hora."
+
+POLICIES: dict[str, RateLimitPolicy] = {
+    p.nombre: p
+    for p in (
+        # Cobros publico: validar cedula 30/min; enviar reporte 5/hora (spam de reportes).
+        RateLimitPolicy("validar_cedula", 30, 60, _MSG_MINUTO),
+        RateLimitPolicy(
+            "enviar_reporte", 5, 3600, "Ha alcanzado el límite de envíos por hora. Intente más tarde."
+        ),
+        RateLimitPolicy("cobros_pub_solicitar", 12, 3600, _MSG_CODIGO_HORA),
+        RateLimitPolicy("cobros_pub_verificar", 15, 900, _MSG_15_MIN),
+        # Estado de cuenta publico: validar 30/min, solicitar PDF 5/hora, verificar codigo 15/15 min.
+        RateLimitPolicy("ec_validar", 30, 60, _MSG_MINUTO),
+        RateLimitPolicy(
+            "ec_solicitar", 5, 3600, "Ha alcanzado el límite de consultas por hora. Intente más tarde."
+        ),
+        RateLimitPolicy("ec_verificar", 15, 900, _MSG_15_MIN),
+        # Finiquito: solicitar OTP, verificar OTP (fuerza bruta) y registro cedula+correo (enumeracion).
+        RateLimitPolicy("finiquito_otp", 15, 3600, _MSG_CODIGO_HORA),
+        RateLimitPolicy(
+            "finiquito_verificar",
+            15,
+            900,
+            "Demasiados intentos de verificacion. Espere 15 minutos e intente de nuevo.",
+        ),
+        RateLimitPolicy(
+            "finiquito_registro", 40, 3600, "Demasiados registros desde su red. Intente de nuevo en una hora."
+        ),
+        # Escáner de comprobantes (autenticado; por usuario o IP): picos de costo/latencia OCR.
+        RateLimitPolicy(
+            "cobros_escaner", 20, 60, "Demasiadas solicitudes al escáner. Espere un minuto e intente de nuevo."
+        ),
+    )
+}
+
+# KEYS[1] = clave; ARGV[1] = intervalo T (s); ARGV[2] = ventana W (s).
+# Devuelve {1, 0} si admite; {0, espera_ms} si rechaza.
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if (not tat) or tat < now then tat = now end
+local new_tat = tat + interval
+local diff = new_tat - now
+if diff > window then
+  return {0, math.ceil((diff - window) * 1000)}
+end
+redis.call('SET', KEYS[1], string.format('%.6f', new_tat), 'PX', math.ceil(diff * 1000))
+return {1, 0}
+"""
+
+_DEFAULT_MEMORY_MAX_KEYS = 20000
+
+_lock = Lock()
+_tat_memoria: "OrderedDict[str, float]" = OrderedDict()
+_metrics: dict[str, dict[str, int]] = {}
+_redis_script: Any = None
+_redis_script_client: Any = None
+
+
+def _memory_max_keys() -> int:
+    try:
+        from app.core.config import settings
+
+        return max(100, int(getattr(settings, "RATE_LIMIT_MEMORY_MAX_KEYS", _DEFAULT_MEMORY_MAX_KEYS)))
+    except Exception:
+        return _DEFAULT_MEMORY_MAX_KEYS
+
+
+def _bump(policy: str, key: str) -> None:
+    with _lock:
+        m = _metrics.setdefault(policy, {})
+        m[key] = m.get(key, 0) + 1
+
+
+def rate_limit_metrics_snapshot() -> dict[str, Any]:
+    """Contadores por politica (permitidas, rechazadas, redis, memoria, redis_error) y tamaño del LRU."""
+    with _lock:
+        return {
+            "politicas": {k: dict(v) for k, v in _metrics.items()},
+            "claves_en_memoria": len(_tat_memoria),
+            "max_claves_en_memoria": _memory_max_keys(),
+        }
+
+
+def rate_limit_reset() -> None:
+    """Tests o mantenimiento manual: vacia estado en memoria y contadores."""
+    with _lock:
+        _tat_memoria.clear()
+        _metrics.clear()
+
+
+def _gcra_memoria(clave: str, policy: RateLimitPolicy, now: float) -> Optional[float]:
+    """None si admite; segundos de espera si rechaza."""
+    interval = policy.emission_interval
+    max_keys = _memory_max_keys()
+    with _lock:
+        tat = _tat_memoria.get(clave)
+        if tat is None or tat < now:
+            tat = now
+        new_tat = tat + interval
+        diff = new_tat - now
+        if diff > policy.window_sec:
+            _tat_memoria.move_to_end(clave)
+            return diff - policy.window_sec
+        _tat_memoria[clave] = new_tat
+        _tat_memoria.move_to_end(clave)
+        while len(_tat_memoria) > max_keys:
+            _tat_memoria.popitem(last=False)
+        return None
+
+
+def _gcra_redis(client: Any, clave: str, policy: RateLimitPolicy) -> Optional[float]:
+    global _redis_script, _redis_script_client
+    if _redis_script is None or _redis_script_client is not client:
+        _redis_script = client.register_script(_GCRA_LUA)
+        _redis_script_client = client
+    admitida, espera_ms = _redis_script(
+        keys=[f"rate_limit:gcra:{clave}"],
+        args=[repr(policy.emission_interval), str(int(policy.window_sec))],
+    )
+    if int(admitida) == 1:
+        return None
+    return max(0.0, float(espera_ms) / 1000.0)
+
+
+def _default_redis_client() -> Any:
+    try:
+        from app.core.redis_client import get_redis_client
+
+        return get_redis_client()
+    except Exception:
+        return None
+
+
+def check_rate_limit(
+    policy: RateLimitPolicy | str,
+    ip: str,
+    *,
+    redis_client_getter: Callable[[], Any] = _default_redis_client,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """
+    Cuenta una peticion de `ip` contra la politica; lanza HTTPException 429 (con Retry-After) si excede.
+    Si Redis falla, cae a memoria sin bloquear la peticion por el error.
+    """
+    pol = POLICIES[policy] if isinstance(policy, str) else policy
+    clave = f"{pol.nombre}:{ip or 'unknown'}"
+
+    client = redis_client_getter()
+    usado_redis = False
+    espera: Optional[float] = None
+    if client is not None:
+        try:
+            espera = _gcra_redis(client, clave, pol)
+            usado_redis = True
+        except Exception as e:
+            logger.warning("Rate limit Redis error (%s): %s; fallback en memoria", pol.nombre, e)
+            _bump(pol.nombre, "redis_error")
+    if not usado_redis:
+        espera = _gcra_memoria(clave, pol, clock())
+    _bump(pol.nombre, "redis" if usado_redis else "memoria")
+
+    if espera is None:
+        _bump(pol.nombre, "permitidas")
+        return
+    _bump(pol.nombre, "rechazadas")
+    logger.info("Rate limit 429 politica=%s ip=%s retry_after=%.1fs", pol.nombre, ip, espera)
+    raise HTTPException(
+        status_code=429,
+        detail=pol.detail_429,
+        headers={"Retry-After": str(max(1, int(math.ceil(espera))))},
+    )
@@ -19,31 +19,26 @@ def check_rate_limit_redis(
     detail_429: str,
 ) -> bool:
     """
-    Comprueba límite con ventana fija en Redis. Lanza HTTPException 429 si se supera.
-    key_prefix: ej. "ec_solicitar", "ec_verificar"
+    Comprueba límite en Redis (GCRA atómico vía script Lua; ver app.core.public_rate_limit).
+    Lanza HTTPException 429 si se supera. key_prefix: ej. "ec_solicitar", "ec_verificar"
 
     Retorna True si el límite se aplicó vía Redis (petición contada).
-    Retorna False si no hay cliente Redis (el caller debe usar fallback en memoria).
+    Retorna False si no hay cliente Redis o falla (el caller debe usar fallback en memoria).
     """
+    from app.core.public_rate_limit import RateLimitPolicy, _gcra_redis
+
     from fastapi import HTTPException
 
     client = get_redis_client()
     if not client:
         return False
-    key = f"rate_limit:{key_prefix}:{ip}"
+    policy = RateLimitPolicy(key_prefix, int(max_count), int(window_sec), detail_429)
     try:
-        pipe = client.pipeline()
-        pipe.incr(key)
-        pipe.ttl(key)
-        incr_result, ttl = pipe.execute()
-        if ttl == -1:
-            client.expire(key, window_sec)
-        if incr_result > max_count:
-            raise HTTPException(status_code=429, detail=detail_429)
-        return True
-    except HTTPException:
-        raise
+        espera = _gcra_redis(client, f"{key_prefix}:{ip}", policy)
     except Exception as e:
         logger.warning("Rate limit Redis error: %s", e)
         # En fallo de Redis no bloqueamos; el caller usará fallback en memoria
         return False
+    if espera is not None:
+        raise HTTPException(status_code=429, detail=detail_429)
+    return True
@@ -6,15 +6,25 @@ Por defecto esta desactivado: ningun cron en servidor; la pantalla Configuracion
 
 Cuando esta activo:
 - finiquito: refresco automatico periodico cada N minutos (configurable) y ventanas de respaldo 00:45 + 13:00 lun-sab.
+- todos los dias 00:15  Notificaciones: listas de elegibles del día materializadas (notificacion_elegibles_dia) y purga
+  de días anteriores, si ENABLE_NOTIFICACIONES_ELEGIBLES_NIGHTLY.
+- cada N minutos (PRESTAMOS_SYNC_COLA_INTERVAL_MINUTES)  Cola prestamos_sync_pendiente: aplica a cuotas los pagos
+  registrados/conciliados (el estado de cuenta ya no sincroniza al leer); cada hora a :20 encola préstamos con pagos
+  conciliados sin cuota_pagos. Ambos si ENABLE_PRESTAMOS_SYNC_COLA.
 - todos los dias 01:00  Clientes (Drive): sync A:S, import automático filas seleccionable; resto en pantalla (ENABLE_DRIVE_CLIENTES_NIGHTLY_0100 / AUTO_GUARDAR).
 - todos los dias 02:00  Préstamos Drive: sync A:S, snapshot, guardar automático al 100% (_motivos_no_100); resto en pantalla (ENABLE_PRESTAMO_CANDIDATOS_DRIVE_NIGHTLY / AUTO_GUARDAR).
 - 03:00  Auditoria cartera: evaluacion de prestamos y metadatos en configuracion.
+- 03:15  Auditoria liquidados: snapshot completo de hallazgos de cierre (auditoria_liquidados_hallazgos),
+  si ENABLE_AUDITORIA_LIQUIDADOS_CIERRE_NIGHTLY.
+- 03:30  Resumen por prestamo (prestamo_saldos): verificacion/reparacion contra cuotas, si ENABLE_PRESTAMO_SALDOS_VERIFICACION_NIGHTLY.
+- 03:45  Cobros: reconciliacion del veredicto de cola manual (pagos_reportados), si ENABLE_COBROS_VEREDICTOS_RECONCILIACION_NIGHTLY.
 - 04:00  Limpieza codigos estado de cuenta.
+- 04:10  Purga del historial scheduler_job_runs (SCHEDULER_JOB_RUNS_RETENCION_DIAS).
 - todos los dias 04:05  Caché lista «Clientes (Drive)» solo recalculo (sin sync Sheets; respaldo tras auditoría).
 - todos los dias 04:45  Snapshot candidatos préstamo solo recalculo (sin sync; respaldo).
 - domingo 04:35  Notificaciones: caché «Diferencia abono» (masivo préstamos), si ENABLE_ABONOS_DRIVE_CACHE_NIGHTLY (separado de limpieza 04:00 y del job fecha).
 - lunes y jueves 04:00  Notificaciones: caché columna Q vs fecha_aprobacion (masivo), si ENABLE_FECHA_ENTREGA_Q_CACHE_NIGHTLY
-  (misma hora que limpieza códigos: un hilo; orden de registro en scheduler; además se recalcula tras cada sync Drive exitoso).
+  (misma hora que limpieza códigos: pools distintos, corren en paralelo; además se recalcula tras cada sync Drive exitoso).
 - todos los dias cada hora a :30 entre 06:30 y 19:30  Gmail pendientes (si PAGOS_GMAIL_SCHEDULED_SCAN_ENABLED=true).
 - Recibos (correo estado de cuenta tras pagos conciliados): manual (POST /notificaciones/recibos/ejecutar) y,
   si ENABLE_RECIBOS_CONCILIACION_EMAIL_JOBS, cron diario RECIBOS_CRON_HOUR:RECIBOS_CRON_MINUTE Caracas
@@ -24,13 +34,20 @@ Cuando esta activo:
 
 Reportes cobranzas, informe de pagos por email y campanas CRM: manual o bajo demanda.
 
+Ejecución: pools por clase de recurso (db / externo / ligero) y exclusión por recurso declarada en JOB_PERFILES;
+historial de corridas, misfires y omisiones en scheduler_job_runs (GET /health/scheduler-runs, admin).
+
 Criterios al cambiar horarios (carga, colisiones, dependencias): comentarios en este módulo y Field descriptions en Settings.
 """
 import logging
+import threading
 import time
 from contextlib import contextmanager
-from typing import Any, Callable, Dict, Optional
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
 
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -38,6 +55,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 
 from app.core.config import settings
 from app.core.database import SessionLocal
+from app.core.sql_profiler import perfil_sql
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +68,10 @@ SCHEDULER_TZ = "America/Caracas"
 #   Ligero: limpieza estado_cuenta_codigos.
 # Dependencia: sync dom/mié 01:20 alimenta `drive` y dispara recálculo masivo Q vs BD en la respuesta del sync; jobs que leen `drive` (clientes 04:05, candidatos 04:45, todos los días)
 # corren tras auditoría 03:00 y limpieza 04:00 para no competir con la carga de la BD en el mismo tramo que el sync.
-# El pool del scheduler usa 1 hilo: ningún job se solapa con otro (evita colisiones DB/API).
+# Ejecución: un pool por clase de recurso (db / externo / ligero; SCHEDULER_WORKERS_*), así un Sheets lento a las
+# 01:00 no retrasa la auditoría 03:00 ni el Gmail horario. Jobs que escriben las mismas tablas declaran el mismo
+# recurso en JOB_PERFILES y se excluyen entre sí (el segundo espera hasta SCHEDULER_EXCLUSION_WAIT_SEC).
+# Cada corrida, misfire u omisión queda en scheduler_job_runs (inicio/fin, retraso, espera, filas, resultado).
 
 # Debe coincidir con el id en add_job (Gmail pendientes diario :30).
 PAGOS_GMAIL_PENDING_SCAN_JOB_ID = "pagos_gmail_pending_scan_daily_0630_1930"
@@ -60,24 +81,196 @@ _scheduler: Optional[BackgroundScheduler] = None
 
 @contextmanager
 def _scheduler_job_span(job_id: str):
-    """Mide duración de un job programado (logs job_start / job_end con duration_ms)."""
+    """
+    Mide duración de un job programado (logs job_start / job_end con duration_ms).
+    Con SQL_PROFILER_ENABLED también cuenta sentencias y ms en BD del job (perfil "job").
+    """
     t0 = time.perf_counter()
     logger.info("[scheduler] job_start id=%s", job_id)
-    try:
-        yield
-    finally:
-        ms = int((time.perf_counter() - t0) * 1000)
-        logger.info("[scheduler] job_end id=%s duration_ms=%s", job_id, ms)
+    with perfil_sql("job", job_id) as perfil:
+        try:
+            yield
+        finally:
+            ms = int((time.perf_counter() - t0) * 1000)
+            if perfil is not None:
+                logger.info(
+                    "[scheduler] job_end id=%s duration_ms=%s sql_sentencias=%s sql_ms=%.0f",
+                    job_id,
+                    ms,
+                    perfil.sentencias,
+                    perfil.db_ms,
+                )
+            else:
+                logger.info("[scheduler] job_end id=%s duration_ms=%s", job_id, ms)
+
+
+# Clases de recurso: cada una es un executor de APScheduler con su propio pool de hilos.
+CLASE_DB = "db"
+CLASE_EXTERNO = "externo"
+CLASE_LIGERO = "ligero"
+
+
+@dataclass(frozen=True)
+class PerfilJob:
+    """Clase de executor y recursos exclusivos (tablas/servicios que el job escribe)."""
+
+    clase: str
+    recursos: Tuple[str, ...] = ()
+    # None: espera hasta SCHEDULER_EXCLUSION_WAIT_SEC; 0: si el recurso está ocupado se omite (jobs por intervalo).
+    espera_max_seg: Optional[int] = None
+
+
+# Recursos: "cuotas" (cuotas/pagos/prestamo_saldos), "drive" (tabla drive y cachés derivadas), "pagos_reportados",
+# "finiquito", "gmail". Jobs sin entrada: ligero, sin exclusión.
+JOB_PERFILES: Dict[str, PerfilJob] = {
+    "finiquito_refresh_interval": PerfilJob(CLASE_DB, ("finiquito",), espera_max_seg=0),
+    "finiquito_refresh_lun_sab_0045": PerfilJob(CLASE_DB, ("finiquito",)),
+    "notificaciones_elegibles_dia_0015": PerfilJob(CLASE_DB),
+    "finiquito_refresh_lun_sab_1300": PerfilJob(CLASE_DB, ("finiquito",)),
+    "prestamos_sync_cola": PerfilJob(CLASE_DB, ("cuotas",), espera_max_seg=0),
+    "prestamos_sync_cola_barrido": PerfilJob(CLASE_LIGERO),
+    "cobros_reconciliar_reportados_cartera": PerfilJob(CLASE_DB, ("pagos_reportados",), espera_max_seg=0),
+    "drive_clientes_noche_0100": PerfilJob(CLASE_EXTERNO, ("drive",)),
+    "prestamo_candidatos_noche_0200": PerfilJob(CLASE_EXTERNO, ("drive",)),
+    "auditoria_cartera_prestamos_0300": PerfilJob(CLASE_DB, ("cuotas",)),
+    "auditoria_liquidados_cierre_0315": PerfilJob(CLASE_DB),
+    "prestamo_saldos_verificacion_0330": PerfilJob(CLASE_DB, ("cuotas",)),
+    "cobros_veredictos_reconciliacion_0345": PerfilJob(CLASE_DB, ("pagos_reportados",)),
+    "limpiar_estado_cuenta_codigos": PerfilJob(CLASE_LIGERO),
+    "drive_clientes_candidatos_cache_0405": PerfilJob(CLASE_DB, ("drive",)),
+    "scheduler_job_runs_purga_0410": PerfilJob(CLASE_LIGERO),
+    "abonos_drive_cuotas_cache_dom_0435": PerfilJob(CLASE_DB, ("drive",)),
+    "abonos_drive_autosync_dom_0510": PerfilJob(CLASE_DB, ("drive", "cuotas")),
+    "prestamo_candidatos_drive_0445": PerfilJob(CLASE_DB, ("drive",)),
+    "fecha_entrega_q_aprobacion_cache_lun_0400": PerfilJob(CLASE_DB, ("drive",)),
+    "fecha_entrega_q_aprobacion_cache_jue_0400": PerfilJob(CLASE_DB, ("drive",)),
+    PAGOS_GMAIL_PENDING_SCAN_JOB_ID: PerfilJob(CLASE_EXTERNO, ("gmail",), espera_max_seg=0),
+}
+_PERFIL_DEFECTO = PerfilJob(CLASE_LIGERO)
+
+_exclusiones: Dict[str, threading.Lock] = {}
+_exclusiones_guard = threading.Lock()
+# Hora programada de la corrida enviada (EVENT_JOB_SUBMITTED), para el retraso en el historial.
+_programado_por_job: Dict[str, datetime] = {}
+# Filas/error que el cuerpo del job reporta con _reportar_job (un hilo por corrida).
+_corrida_actual = threading.local()
+
+
+def perfil_job(job_id: str) -> PerfilJob:
+    return JOB_PERFILES.get(job_id, _PERFIL_DEFECTO)
+
+
+def _lock_recurso(nombre: str) -> threading.Lock:
+    with _exclusiones_guard:
+        lock = _exclusiones.get(nombre)
+        if lock is None:
+            lock = _exclusiones[nombre] = threading.Lock()
+        return lock
+
+
+def _tomar_recursos(recursos: Tuple[str, ...], espera_seg: float) -> Optional[list]:
+    """Toma los locks en orden alfabético (sin interbloqueos). None si alguno no se liberó a tiempo."""
+    limite = time.monotonic() + max(0.0, espera_seg)
+    tomados: list = []
+    for nombre in sorted(set(recursos)):
+        lock = _lock_recurso(nombre)
+        restante = max(0.0, limite - time.monotonic())
+        if not (lock.acquire(timeout=restante) if restante > 0 else lock.acquire(blocking=False)):
+            for t in reversed(tomados):
+                t.release()
+            return None
+        tomados.append(lock)
+    return tomados
+
+
+def _reportar_job(*, filas: Any = None, error: Optional[BaseException] = None) -> None:
+    """Desde el cuerpo de un job: filas procesadas y/o error capturado (los jobs registran y no relanzan)."""
+    if filas is not None:
+        try:
+            _corrida_actual.filas = int(filas)
+        except (TypeError, ValueError):
+            pass
+    if error is not None:
+        _corrida_actual.error = f"{type(error).__name__}: {error}"
 
 
 def _wrap_job_with_timing(job_id: str, fn: Callable[[], None]) -> Callable[[], None]:
+    perfil = perfil_job(job_id)
+
     def _wrapped() -> None:
-        with _scheduler_job_span(job_id):
-            fn()
+        from app.services import scheduler_job_runs as runs
+
+        t_espera = time.perf_counter()
+        espera = perfil.espera_max_seg
+        if espera is None:
+            espera = int(getattr(settings, "SCHEDULER_EXCLUSION_WAIT_SEC", 3600) or 0)
+        tomados = _tomar_recursos(perfil.recursos, espera) if perfil.recursos else []
+        espera_ms = int((time.perf_counter() - t_espera) * 1000)
+        inicio = datetime.now(timezone.utc)
+        if tomados is None:
+            logger.warning(
+                "[scheduler] job omitido id=%s: recursos ocupados %s tras %s ms", job_id, perfil.recursos, espera_ms
+            )
+            runs.registrar_job_run(
+                job_id,
+                runs.RESULTADO_OMITIDO_EXCLUSION,
+                clase=perfil.clase,
+                programado_para=_programado_por_job.pop(job_id, None),
+                inicio=inicio,
+                fin=inicio,
+                espera_exclusion_ms=espera_ms,
+            )
+            return
+        _corrida_actual.filas = None
+        _corrida_actual.error = None
+        error: Optional[str] = None
+        try:
+            with _scheduler_job_span(job_id):
+                fn()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("[scheduler] job %s terminó con excepción: %s", job_id, e)
+        finally:
+            for lock in reversed(tomados):
+                lock.release()
+            error = error or getattr(_corrida_actual, "error", None)
+            runs.registrar_job_run(
+                job_id,
+                runs.RESULTADO_ERROR if error else runs.RESULTADO_OK,
+                clase=perfil.clase,
+                programado_para=_programado_por_job.pop(job_id, None),
+                inicio=inicio,
+                fin=datetime.now(timezone.utc),
+                espera_exclusion_ms=espera_ms if perfil.recursos else None,
+                filas=getattr(_corrida_actual, "filas", None),
+                error=error,
+            )
 
     return _wrapped
 
 
+def _on_evento_scheduler(event) -> None:
+    """Hora programada de cada envío; misfires y omisiones por max_instances al historial."""
+    from app.services import scheduler_job_runs as runs
+
+    if event.code == EVENT_JOB_SUBMITTED:
+        if event.scheduled_run_times:
+            _programado_por_job[event.job_id] = max(event.scheduled_run_times)
+        return
+    resultado = runs.RESULTADO_MISFIRE if event.code == EVENT_JOB_MISSED else runs.RESULTADO_OMITIDO_MAX_INSTANCIAS
+    programado = getattr(event, "scheduled_run_time", None)
+    if programado is None and getattr(event, "scheduled_run_times", None):
+        programado = max(event.scheduled_run_times)
+    logger.warning("[scheduler] %s id=%s programado=%s", resultado, event.job_id, programado)
+    runs.registrar_job_run(
+        event.job_id,
+        resultado,
+        clase=perfil_job(event.job_id).clase,
+        programado_para=programado,
+        inicio=datetime.now(timezone.utc),
+    )
+
+
 def get_pagos_gmail_scan_next_run_iso() -> Optional[str]:
     """Proxima ejecucion ISO8601 del job Gmail programado, o None si no hay scheduler o el job no esta registrado."""
     if _scheduler is None:
@@ -104,6 +297,7 @@ def _job_abonos_drive_cuotas_cache_dom_0435() -> None:
         )
 
         res = ejecutar_refresh_abonos_drive_cuotas_cache_nightly(db)
+        _reportar_job(filas=res.get("actualizados_ok"))
         logger.info(
             "[abonos_drive_cache] nightly prestamos=%s ok=%s err=%s skip=%s",
             res.get("prestamos_considerados"),
@@ -112,6 +306,7 @@ def _job_abonos_drive_cuotas_cache_dom_0435() -> None:
             res.get("omitidos_sin_cedula"),
         )
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("Error en job abonos_drive_cuotas_cache_dom_0435: %s", e)
     finally:
         db.close()
@@ -135,6 +330,7 @@ def _job_abonos_drive_autosync_dom_0510() -> None:
             aplicar_montos_altos=False,
             usuario_registro="AUTO_CRON_ABONOS_DRIVE",
         )
+        _reportar_job(filas=(res.get("resumen") or {}).get("aplicados"))
         logger.info(
             "[abonos_drive_autosync] programado total=%s aplicables=%s aplicados=%s omitidos_lote=%s omitidos_monto_alto=%s errores=%s",
             (res.get("resumen") or {}).get("total_evaluados"),
@@ -145,6 +341,7 @@ def _job_abonos_drive_autosync_dom_0510() -> None:
             (res.get("resumen") or {}).get("errores"),
         )
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("Error en job abonos_drive_autosync_dom_0510: %s", e)
     finally:
         db.close()
@@ -161,6 +358,7 @@ def _job_fecha_entrega_q_aprobacion_cache_lun_jue_0400() -> None:
         )
 
         res = ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db)
+        _reportar_job(filas=res.get("actualizados_ok"))
         logger.info(
             "[fecha_q_cache] programado lun/jue prestamos=%s ok=%s err=%s skip=%s",
             res.get("prestamos_considerados"),
@@ -169,6 +367,7 @@ def _job_fecha_entrega_q_aprobacion_cache_lun_jue_0400() -> None:
             res.get("omitidos_sin_cedula"),
         )
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("Error en job fecha_entrega_q_aprobacion_cache_lun_jue_0400: %s", e)
     finally:
         db.close()
@@ -181,6 +380,7 @@ def _job_finiquito_refresh() -> None:
         from app.services.finiquito_refresh import ejecutar_refresh_finiquito_casos
 
         res = ejecutar_refresh_finiquito_casos(db)
+        _reportar_job(filas=res.get("elegibles"))
         logger.info(
             "Finiquito refresh: elegibles=%s insertados=%s actualizados=%s eliminados=%s",
             res.get("elegibles"),
@@ -189,11 +389,155 @@ def _job_finiquito_refresh() -> None:
             res.get("eliminados"),
         )
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("Error en job finiquito_refresh: %s", e)
     finally:
         db.close()
 
 
+def _job_auditoria_liquidados_cierre_0315() -> None:
+    """Todos los dias 03:15 Caracas (tras auditoria cartera 03:00). Recalcula el snapshot de hallazgos de cierre."""
+    if not getattr(settings, "ENABLE_AUDITORIA_LIQUIDADOS_CIERRE_NIGHTLY", True):
+        return
+    db = SessionLocal()
+    try:
+        from app.services.auditoria_liquidados_cierre_snapshot import refrescar_hallazgos_cierre, snapshot_disponible
+
+        if not snapshot_disponible(db):
+            logger.warning("[auditoria_liquidados_cierre] tabla no disponible (migracion 096 pendiente)")
+            return
+        res = refrescar_hallazgos_cierre(db)
+        _reportar_job(filas=res.get("hallazgos_totales"))
+    except Exception as e:
+        _reportar_job(error=e)
+        logger.exception("Error en job auditoria_liquidados_cierre_0315: %s", e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
+def _job_prestamo_saldos_verificacion_0330() -> None:
+    """Todos los dias 03:30 Caracas (tras auditoria 03:00). Verifica/repara prestamo_saldos y recalcula atraso del dia."""
+    if not getattr(settings, "ENABLE_PRESTAMO_SALDOS_VERIFICACION_NIGHTLY", True):
+        return
+    db = SessionLocal()
+    try:
+        from app.services.prestamo_saldos import verificar_prestamo_saldos
+
+        res = verificar_prestamo_saldos(db, reparar=True)
+        _reportar_job(filas=res.get("prestamos_verificados"))
+        logger.info(
+            "[prestamo_saldos] verificacion prestamos=%s faltantes=%s sobrantes=%s con_diferencias=%s",
+            res.get("prestamos_verificados"),
+            res.get("faltantes"),
+            res.get("sobrantes"),
+            res.get("con_diferencias"),
+        )
+    except Exception as e:
+        _reportar_job(error=e)
+        logger.exception("Error en job prestamo_saldos_verificacion_0330: %s", e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
+def _job_prestamos_sync_cola() -> None:
+    """Cada N minutos. Drena prestamos_sync_pendiente (pagos por aplicar a cuotas)."""
+    if not getattr(settings, "ENABLE_PRESTAMOS_SYNC_COLA", True):
+        return
+    db = SessionLocal()
+    try:
+        from app.services.prestamos_sync_cola import drenar_cola_sync_prestamos
+
+        res = drenar_cola_sync_prestamos(db, int(getattr(settings, "PRESTAMOS_SYNC_COLA_LOTE", 50) or 50))
+        _reportar_job(filas=res.get("procesados"))
+        if res.get("reclamados"):
+            logger.info(
+                "[prestamos_sync_cola] reclamados=%s procesados=%s pagos_aplicados=%s errores=%s",
+                res.get("reclamados"),
+                res.get("procesados"),
+                res.get("pagos_aplicados"),
+                res.get("errores"),
+            )
+    except Exception as e:
+        _reportar_job(error=e)
+        logger.exception("Error en job prestamos_sync_cola: %s", e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
+def _job_prestamos_sync_cola_barrido() -> None:
+    """Cada hora a :20. Encola préstamos con pagos conciliados sin cuota_pagos (altas fuera del ORM)."""
+    if not getattr(settings, "ENABLE_PRESTAMOS_SYNC_COLA", True):
+        return
+    db = SessionLocal()
+    try:
+        from app.services.prestamos_sync_cola import (
+            encolar_prestamos_con_pagos_sin_aplicar,
+            resumen_cola_sync_prestamos,
+        )
+
+        n = encolar_prestamos_con_pagos_sin_aplicar(db)
+        _reportar_job(filas=n)
+        res = resumen_cola_sync_prestamos(db)
+        logger.info(
+            "[prestamos_sync_cola] barrido encolados=%s pendientes=%s agotadas=%s mas_antigua=%s",
+            n,
+            res.get("pendientes"),
+            res.get("agotadas"),
+            res.get("mas_antigua"),
+        )
+    except Exception as e:
+        _reportar_job(error=e)
+        logger.exception("Error en job prestamos_sync_cola_barrido: %s", e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
+def _job_cobros_veredictos_reconciliacion_0345() -> None:
+    """Todos los dias 03:45 Caracas. Recalcula el veredicto de cola manual de pagos_reportados y corrige diferencias."""
+    if not getattr(settings, "ENABLE_COBROS_VEREDICTOS_RECONCILIACION_NIGHTLY", True):
+        return
+    db = SessionLocal()
+    try:
+        from app.api.v1.endpoints.cobros.reportados_veredicto import reconciliar_veredictos_pagos_reportados
+        from app.api.v1.endpoints.cobros.listado_kpis_cache import _invalidate_cobros_listado_kpis_cache
+
+        res = reconciliar_veredictos_pagos_reportados(db)
+        _reportar_job(filas=res.get("revisados"))
+        if res.get("cambiados") or res.get("terminales_limpiados"):
+            _invalidate_cobros_listado_kpis_cache()
+        logger.info(
+            "[cobros_veredicto] reconciliacion revisados=%s cambiados=%s terminales_limpiados=%s",
+            res.get("revisados"),
+            res.get("cambiados"),
+            res.get("terminales_limpiados"),
+        )
+    except Exception as e:
+        _reportar_job(error=e)
+        logger.exception("Error en job cobros_veredictos_reconciliacion_0345: %s", e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
 def _job_auditoria_cartera_prestamos() -> None:
     """Job 03:00. Evalua prestamos (cartera), alinea cuotas.estado con reglas, persiste metadatos en configuracion."""
     db = SessionLocal()
@@ -221,6 +565,7 @@ def _job_auditoria_cartera_prestamos() -> None:
             reglas_version=str(resumen.get("reglas_version") or ""),
             commit=True,
         )
+        _reportar_job(filas=resumen.get("prestamos_evaluados"))
         logger.info(
             "Auditoria cartera prestamos: evaluados=%s con_alerta=%s; sync_estado cuotas escaneadas=%s actualizadas=%s",
             resumen.get("prestamos_evaluados"),
@@ -229,6 +574,7 @@ def _job_auditoria_cartera_prestamos() -> None:
             sync.get("estados_actualizados"),
         )
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("Error en job auditoria_cartera_prestamos: %s", e)
         try:
             db.rollback()
@@ -259,6 +605,7 @@ def _job_hoja_drive_conciliacion_sync() -> None:
         )
         return None
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("[drive/conciliacion_sheet] Sync error: %s", e)
         raise
     finally:
@@ -283,7 +630,7 @@ def _job_drive_clientes_noche_0100() -> None:
 
         res = run_sync_to_db(db)
         try:
-            ejecutar_refresh_fecha_entrega_q_cache_tras_sync_conciliacion(db)
+            ejecutar_refresh_fecha_entrega_q_cache_tras_sync_conciliacion(db, res.get("run_id"))
         except Exception as qe:
             logger.warning("[drive_clientes_0100] refresco Q tras sync: %s", qe)
         guardar_res: Dict[str, Any] = {}
@@ -294,6 +641,7 @@ def _job_drive_clientes_noche_0100() -> None:
             )
 
         cache = refrescar_cache_candidatos_drive(db)
+        _reportar_job(filas=res.get("row_count"))
         logger.info(
             "[drive_clientes_0100] OK filas=%s ultima_fila_a=%s candidatos_pantalla=%s auto_import=%s",
             res.get("row_count"),
@@ -304,6 +652,7 @@ def _job_drive_clientes_noche_0100() -> None:
     except ValueError as e:
         logger.warning("[drive_clientes_0100] omitido: %s", e)
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("[drive_clientes_0100] error: %s", e)
     finally:
         db.close()
@@ -326,6 +675,7 @@ def _job_prestamo_candidatos_noche_0200() -> None:
 
         sync_res = run_sync_to_db(db)
         refresh_res = ejecutar_refresh_prestamo_candidatos_drive(db)
+        _reportar_job(filas=sync_res.get("row_count"))
 
         guardar_res: Dict[str, Any] = {}
         if getattr(settings, "ENABLE_PRESTAMO_CANDIDATOS_AUTO_GUARDAR_NIGHTLY", True):
@@ -343,6 +693,7 @@ def _job_prestamo_candidatos_noche_0200() -> None:
     except ValueError as e:
         logger.warning("[prestamo_candidatos_0200] omitido: %s", e)
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("[prestamo_candidatos_0200] error: %s", e)
     finally:
         db.close()
@@ -359,12 +710,14 @@ def _job_prestamo_candidatos_drive_refresh() -> None:
         )
 
         res = ejecutar_refresh_prestamo_candidatos_drive(db)
+        _reportar_job(filas=res.get("candidatos_insertados"))
         logger.info(
             "[prestamo_candidatos_drive] programado ok insertados=%s filas_drive=%s",
             res.get("candidatos_insertados"),
             res.get("filas_en_drive"),
         )
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("[prestamo_candidatos_drive] programado error: %s", e)
     finally:
         db.close()
@@ -377,6 +730,7 @@ def _job_drive_clientes_candidatos_cache() -> None:
         from app.services.cliente_alta_desde_drive_service import refrescar_cache_candidatos_drive
 
         res = refrescar_cache_candidatos_drive(db)
+        _reportar_job(filas=res.get("total_candidatos"))
         logger.info(
             "[drive_clientes_candidatos_cache] job programado OK total=%s drive_synced_at=%s computed_at=%s",
             res.get("total_candidatos"),
@@ -384,6 +738,7 @@ def _job_drive_clientes_candidatos_cache() -> None:
             res.get("computed_at"),
         )
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("[drive_clientes_candidatos_cache] job programado error: %s", e)
     finally:
         db.close()
@@ -395,13 +750,65 @@ def _job_limpiar_estado_cuenta_codigos() -> None:
     try:
         from app.services.estado_cuenta_cleanup import limpiar_estado_cuenta_codigos
         result = limpiar_estado_cuenta_codigos(db)
+        _reportar_job(filas=result.get("borrados", 0))
         logger.info("Limpieza estado_cuenta_codigos: borrados=%s", result.get("borrados", 0))
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("Error en job limpiar_estado_cuenta_codigos: %s", e)
     finally:
         db.close()
 
 
+def _job_notificaciones_elegibles_dia_0015() -> None:
+    """00:15 Caracas. Materializa las listas de elegibles de Notificaciones del nuevo día y purga las anteriores."""
+    if not getattr(settings, "ENABLE_NOTIFICACIONES_ELEGIBLES_NIGHTLY", True):
+        return
+    db = SessionLocal()
+    try:
+        from app.services.notificaciones_elegibles_dia import materializar_elegibles_dia, purgar_elegibles_dia
+
+        purgadas = purgar_elegibles_dia(db)
+        res = materializar_elegibles_dia(db)
+        segmentos = res.get("segmentos") or {}
+        _reportar_job(filas=sum(int(r.get("total") or 0) for r in segmentos.values()))
+        logger.info(
+            "[elegibles_dia] programado 00:15 fecha=%s totales=%s errores=%s purgadas=%s",
+            res.get("fecha"),
+            {k: v.get("total") for k, v in segmentos.items()},
+            res.get("errores"),
+            purgadas,
+        )
+    except Exception as e:
+        _reportar_job(error=e)
+        logger.exception("Error en job notificaciones_elegibles_dia_0015: %s", e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
+def _job_scheduler_job_runs_purga() -> None:
+    """04:10 Caracas. Borra historial de scheduler_job_runs más antiguo que SCHEDULER_JOB_RUNS_RETENCION_DIAS."""
+    db = SessionLocal()
+    try:
+        from app.services.scheduler_job_runs import purgar_job_runs
+
+        n = purgar_job_runs(db, int(getattr(settings, "SCHEDULER_JOB_RUNS_RETENCION_DIAS", 90) or 90))
+        _reportar_job(filas=n)
+        logger.info("[scheduler] purga scheduler_job_runs borradas=%s", n)
+    except Exception as e:
+        _reportar_job(error=e)
+        logger.exception("Error en job scheduler_job_runs_purga: %s", e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
 def _job_pagos_gmail_pending_scan() -> None:
     """Todos los dias cada hora :30 entre 06:30 y 19:30 (America/Caracas): pipeline Gmail."""
     if not getattr(settings, "PAGOS_GMAIL_SCHEDULED_SCAN_ENABLED", False):
@@ -425,8 +832,13 @@ def _job_pagos_gmail_pending_scan() -> None:
             "[PAGOS_GMAIL] Escaneo programado: all (leídos + no leídos) sync_id=%s",
             sync.id,
         )
-        schedule_gmail_pipeline_background(sync.id, scan_filter="all")
+        schedule_gmail_pipeline_background(
+            sync.id,
+            scan_filter="all",
+            incremental=bool(getattr(settings, "PAGOS_GMAIL_HISTORY_INCREMENTAL", True)),
+        )
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("[PAGOS_GMAIL] Escaneo programado: %s", e)
     finally:
         db.close()
@@ -451,9 +863,11 @@ def _job_cobros_reconciliar_reportados_cartera() -> None:
         )
 
         n = _reconciliar_reportados_ya_en_cartera(db, max_ids=120)
+        _reportar_job(filas=n)
         if n:
             logger.info("[cobros] reconciliar reportados cartera: %s marcados importado", n)
     except Exception as e:
+        _reportar_job(error=e)
         logger.exception("[cobros] reconciliar reportados cartera: %s", e)
     finally:
         db.close()
@@ -471,7 +885,8 @@ def _job_recibos_conciliacion_email_diario() -> None:
 def start_scheduler() -> None:
     """Registra jobs en orden de flujo nocturno; horas espaciadas por carga (ver comentarios SCHEDULER_TZ).
 
-    Un solo hilo de ejecución (ThreadPoolExecutor(1)) evita que dos jobs distintos se solapen en BD/API.
+    Un executor por clase de recurso (JOB_PERFILES): jobs independientes corren en paralelo; los que declaran
+    el mismo recurso se excluyen en _wrap_job_with_timing. Corridas y misfires van a scheduler_job_runs.
     """
     global _scheduler
     if _scheduler is not None:
@@ -479,13 +894,21 @@ def start_scheduler() -> None:
         return
     _scheduler = BackgroundScheduler(
         timezone=SCHEDULER_TZ,
-        executors={"default": ThreadPoolExecutor(1)},
+        executors={
+            CLASE_DB: ThreadPoolExecutor(int(getattr(settings, "SCHEDULER_WORKERS_DB", 2) or 1)),
+            CLASE_EXTERNO: ThreadPoolExecutor(int(getattr(settings, "SCHEDULER_WORKERS_EXTERNO", 2) or 1)),
+            CLASE_LIGERO: ThreadPoolExecutor(int(getattr(settings, "SCHEDULER_WORKERS_LIGERO", 2) or 1)),
+            "default": ThreadPoolExecutor(1),
+        },
         job_defaults={
             "max_instances": 1,
             "coalesce": True,
             "misfire_grace_time": 3600,
         },
     )
+    _scheduler.add_listener(
+        _on_evento_scheduler, EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES
+    )
     _dow_lun_sab = "mon,tue,wed,thu,fri,sat"
     _dow_all_week = "sun,mon,tue,wed,thu,fri,sat"
 
@@ -502,10 +925,32 @@ def start_scheduler() -> None:
                 timezone=SCHEDULER_TZ,
             ),
             id="finiquito_refresh_interval",
+            executor=perfil_job("finiquito_refresh_interval").clase,
             name=f"Finiquito: refresco periodico cada {_minutes} min",
         )
 
 
+    # Pagos por aplicar a cuotas: drenado frecuente (ligero por lote) y barrido horario de respaldo.
+    if getattr(settings, "ENABLE_PRESTAMOS_SYNC_COLA", True):
+        _sync_min = int(getattr(settings, "PRESTAMOS_SYNC_COLA_INTERVAL_MINUTES", 2) or 2)
+        _scheduler.add_job(
+            _wrap_job_with_timing("prestamos_sync_cola", _job_prestamos_sync_cola),
+            IntervalTrigger(
+                minutes=max(1, min(_sync_min, 60)),
+                timezone=SCHEDULER_TZ,
+            ),
+            id="prestamos_sync_cola",
+            executor=perfil_job("prestamos_sync_cola").clase,
+            name=f"Prestamos: aplicar pagos encolados cada {_sync_min} min",
+        )
+        _scheduler.add_job(
+            _wrap_job_with_timing("prestamos_sync_cola_barrido", _job_prestamos_sync_cola_barrido),
+            CronTrigger(minute=20, timezone=SCHEDULER_TZ),
+            id="prestamos_sync_cola_barrido",
+            executor=perfil_job("prestamos_sync_cola_barrido").clase,
+            name="Prestamos: encolar pagos conciliados sin aplicar (cada hora :20)",
+        )
+
     # Cobros: reconciliar reportados ya en cartera (no dejar aprobado/en_revision huérfanos).
     _scheduler.add_job(
         _wrap_job_with_timing(
@@ -517,10 +962,21 @@ def start_scheduler() -> None:
             timezone=SCHEDULER_TZ,
         ),
         id="cobros_reconciliar_reportados_cartera",
+        executor=perfil_job("cobros_reconciliar_reportados_cartera").clase,
         name="Cobros: marcar importado si pago ya en cartera (cada 20 min)",
     )
 
 
+    # 00:15 todos los días — Notificaciones: listas de elegibles del día (antes de finiquito 00:45 y Drive 01:00)
+    if getattr(settings, "ENABLE_NOTIFICACIONES_ELEGIBLES_NIGHTLY", True):
+        _scheduler.add_job(
+            _wrap_job_with_timing("notificaciones_elegibles_dia_0015", _job_notificaciones_elegibles_dia_0015),
+            CronTrigger(hour=0, minute=15, timezone=SCHEDULER_TZ),
+            id="notificaciones_elegibles_dia_0015",
+            executor=perfil_job("notificaciones_elegibles_dia_0015").clase,
+            name="Notificaciones: materializar elegibles del día 00:15",
+        )
+
     # 00:45 lun-sab — finiquito (respaldo nocturno; antes del sync Drive 01:00)
     _scheduler.add_job(
         _wrap_job_with_timing("finiquito_refresh_lun_sab_0045", _job_finiquito_refresh),
@@ -531,6 +987,7 @@ def start_scheduler() -> None:
             timezone=SCHEDULER_TZ,
         ),
         id="finiquito_refresh_lun_sab_0045",
+        executor=perfil_job("finiquito_refresh_lun_sab_0045").clase,
         name="Finiquito: refrescar casos lun-sab 00:45",
     )
 
@@ -545,6 +1002,7 @@ def start_scheduler() -> None:
                 timezone=SCHEDULER_TZ,
             ),
             id="drive_clientes_noche_0100",
+            executor=perfil_job("drive_clientes_noche_0100").clase,
             name="Clientes Drive: sync A:S + caché 01:00 (todos los días)",
         )
 
@@ -561,6 +1019,7 @@ def start_scheduler() -> None:
                 timezone=SCHEDULER_TZ,
             ),
             id="prestamo_candidatos_noche_0200",
+            executor=perfil_job("prestamo_candidatos_noche_0200").clase,
             name="Prestamos Drive: sync A:S + snapshot 02:00 (todos los días)",
         )
 
@@ -569,14 +1028,46 @@ def start_scheduler() -> None:
         _wrap_job_with_timing("auditoria_cartera_prestamos_0300", _job_auditoria_cartera_prestamos),
         CronTrigger(hour=3, minute=0, timezone=SCHEDULER_TZ),
         id="auditoria_cartera_prestamos_0300",
+        executor=perfil_job("auditoria_cartera_prestamos_0300").clase,
         name="Auditoria cartera prestamos 03:00",
     )
 
+    # 03:15 todos los días — snapshot de hallazgos de cierre liquidados (tras alinear cuotas.estado a las 03:00)
+    if getattr(settings, "ENABLE_AUDITORIA_LIQUIDADOS_CIERRE_NIGHTLY", True):
+        _scheduler.add_job(
+            _wrap_job_with_timing("auditoria_liquidados_cierre_0315", _job_auditoria_liquidados_cierre_0315),
+            CronTrigger(hour=3, minute=15, timezone=SCHEDULER_TZ),
+            id="auditoria_liquidados_cierre_0315",
+            executor=perfil_job("auditoria_liquidados_cierre_0315").clase,
+            name="Auditoria liquidados: snapshot hallazgos de cierre 03:15",
+        )
+
+    # 03:30 todos los días — resumen por préstamo (después de alinear cuotas.estado a las 03:00)
+    if getattr(settings, "ENABLE_PRESTAMO_SALDOS_VERIFICACION_NIGHTLY", True):
+        _scheduler.add_job(
+            _wrap_job_with_timing("prestamo_saldos_verificacion_0330", _job_prestamo_saldos_verificacion_0330),
+            CronTrigger(hour=3, minute=30, timezone=SCHEDULER_TZ),
+            id="prestamo_saldos_verificacion_0330",
+            executor=perfil_job("prestamo_saldos_verificacion_0330").clase,
+            name="Prestamos: verificar resumen prestamo_saldos 03:30",
+        )
+
+    # 03:45 todos los días — veredicto cola manual Cobros (tras resumen de préstamos)
+    if getattr(settings, "ENABLE_COBROS_VEREDICTOS_RECONCILIACION_NIGHTLY", True):
+        _scheduler.add_job(
+            _wrap_job_with_timing("cobros_veredictos_reconciliacion_0345", _job_cobros_veredictos_reconciliacion_0345),
+            CronTrigger(hour=3, minute=45, timezone=SCHEDULER_TZ),
+            id="cobros_veredictos_reconciliacion_0345",
+            executor=perfil_job("cobros_veredictos_reconciliacion_0345").clase,
+            name="Cobros: reconciliar veredicto cola manual 03:45",
+        )
+
     # 04:00 todo — limpieza códigos (ligero)
     _scheduler.add_job(
         _wrap_job_with_timing("limpiar_estado_cuenta_codigos", _job_limpiar_estado_cuenta_codigos),
         CronTrigger(hour=4, minute=0, timezone=SCHEDULER_TZ),
         id="limpiar_estado_cuenta_codigos",
+        executor=perfil_job("limpiar_estado_cuenta_codigos").clase,
         name="Limpiar cÃ³digos estado de cuenta 4:00",
     )
 
@@ -590,15 +1081,26 @@ def start_scheduler() -> None:
             timezone=SCHEDULER_TZ,
         ),
         id="drive_clientes_candidatos_cache_0405",
+        executor=perfil_job("drive_clientes_candidatos_cache_0405").clase,
         name="Clientes Drive: caché candidatos 04:05 (todos los días)",
     )
 
+    # 04:10 todos los días — purga historial scheduler_job_runs (ligero)
+    _scheduler.add_job(
+        _wrap_job_with_timing("scheduler_job_runs_purga_0410", _job_scheduler_job_runs_purga),
+        CronTrigger(hour=4, minute=10, timezone=SCHEDULER_TZ),
+        id="scheduler_job_runs_purga_0410",
+        executor=perfil_job("scheduler_job_runs_purga_0410").clase,
+        name="Scheduler: purgar historial de corridas 04:10",
+    )
+
     # 04:35 domingo — caché abonos masivo (Notificaciones General)
     if getattr(settings, "ENABLE_ABONOS_DRIVE_CACHE_NIGHTLY", True):
         _scheduler.add_job(
             _wrap_job_with_timing("abonos_drive_cuotas_cache_dom_0435", _job_abonos_drive_cuotas_cache_dom_0435),
             CronTrigger(day_of_week="sun", hour=4, minute=35, timezone=SCHEDULER_TZ),
             id="abonos_drive_cuotas_cache_dom_0435",
+            executor=perfil_job("abonos_drive_cuotas_cache_dom_0435").clase,
             name="Notificaciones: caché Diferencia abono (hoja vs cuotas) domingo 04:35",
         )
     if getattr(settings, "ENABLE_ABONOS_DRIVE_AUTOSYNC_NIGHTLY", False):
@@ -606,6 +1108,7 @@ def start_scheduler() -> None:
             _wrap_job_with_timing("abonos_drive_autosync_dom_0510", _job_abonos_drive_autosync_dom_0510),
             CronTrigger(day_of_week="sun", hour=5, minute=10, timezone=SCHEDULER_TZ),
             id="abonos_drive_autosync_dom_0510",
+            executor=perfil_job("abonos_drive_autosync_dom_0510").clase,
             name="Notificaciones: autosync ABONOS->cuotas domingo 05:10",
         )
 
@@ -620,6 +1123,7 @@ def start_scheduler() -> None:
                 timezone=SCHEDULER_TZ,
             ),
             id="prestamo_candidatos_drive_0445",
+            executor=perfil_job("prestamo_candidatos_drive_0445").clase,
             name="Prestamos: recalculo snapshot Drive 04:45 (sin sync Sheets)",
         )
 
@@ -632,6 +1136,7 @@ def start_scheduler() -> None:
             ),
             CronTrigger(day_of_week="mon", hour=4, minute=0, timezone=SCHEDULER_TZ),
             id="fecha_entrega_q_aprobacion_cache_lun_0400",
+            executor=perfil_job("fecha_entrega_q_aprobacion_cache_lun_0400").clase,
             name="Notificaciones: caché Q vs fecha_aprobacion lunes 04:00",
         )
         _scheduler.add_job(
@@ -641,6 +1146,7 @@ def start_scheduler() -> None:
             ),
             CronTrigger(day_of_week="thu", hour=4, minute=0, timezone=SCHEDULER_TZ),
             id="fecha_entrega_q_aprobacion_cache_jue_0400",
+            executor=perfil_job("fecha_entrega_q_aprobacion_cache_jue_0400").clase,
             name="Notificaciones: caché Q vs fecha_aprobacion jueves 04:00",
         )
 
@@ -654,6 +1160,7 @@ def start_scheduler() -> None:
             timezone=SCHEDULER_TZ,
         ),
         id="finiquito_refresh_lun_sab_1300",
+        executor=perfil_job("finiquito_refresh_lun_sab_1300").clase,
         name="Finiquito: refrescar casos lun-sab 13:00",
     )
 
@@ -667,6 +1174,7 @@ def start_scheduler() -> None:
                 timezone=SCHEDULER_TZ,
             ),
             id=PAGOS_GMAIL_PENDING_SCAN_JOB_ID,
+            executor=perfil_job(PAGOS_GMAIL_PENDING_SCAN_JOB_ID).clase,
             name="Gmail Pagos pendientes cada dia :30 (06:30-19:30 Caracas)",
         )
         _gmail_log = (
@@ -0,0 +1,256 @@
+"""
+Perfilador SQL opcional por request HTTP y por job programado (detección de N+1).
+
+Con SQL_PROFILER_ENABLED=True se registran listeners `before/after_cursor_execute` en el engine. Cada
+request (RequestIdMiddleware) o job (`_scheduler_job_span`) abre un `PerfilSql` en un ContextVar; los
+listeners solo cuentan cuando hay perfil activo, así el costo fuera de un perfil es un `ContextVar.get`.
+
+Por perfil: sentencias, ms en BD y repeticiones por sentencia normalizada (literales y parámetros -> ?,
+listas IN colapsadas). Una sentencia repetida >= SQL_PROFILER_N1_UMBRAL veces se marca como sospecha de
+N+1 (log WARNING con request_id). Al cerrar, el perfil se agrega por (ámbito, etiqueta) — la etiqueta de un
+request es "METODO /plantilla/{de_ruta}" — en un registro acotado por proceso que expone
+`sql_profiler_snapshot()` (GET /health/sql-perfiles, solo admin).
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Etiquetas distintas retenidas en el agregado (LRU) y perfiles con N+1 recientes.
+_MAX_ETIQUETAS = 500
+_MAX_RECIENTES = 50
+# Sentencias repetidas que se guardan por perfil / por etiqueta.
+_TOP_SENTENCIAS = 5
+_SQL_MAX_CHARS = 400
+
+_perfil_actual: ContextVar[Optional["PerfilSql"]] = ContextVar("perfil_sql_actual", default=None)
+
+_lock = Lock()
+_agregado: "OrderedDict[tuple[str, str], dict[str, Any]]" = OrderedDict()
+_recientes: deque = deque(maxlen=_MAX_RECIENTES)
+_engines_instrumentados: set[int] = set()
+
+_RE_CADENA = re.compile(r"'(?:[^']|'')*'")
+_RE_PARAM = re.compile(r"%\([^)]+\)s|%s|\$\d+|(?<!:):[A-Za-z_]\w*")
+_RE_NUMERO = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_VALUES = re.compile(r"(VALUES\s*\(\?[^)]*\))(?:\s*,\s*\(\?[^)]*\))+", re.IGNORECASE)
+_RE_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalizar_sql(sentencia: str) -> str:
+    """Forma canónica para agrupar: sin literales ni nombres de parámetro; IN (?, ?, ...) y VALUES múltiples colapsados."""
+    s = _RE_CADENA.sub("?", sentencia)
+    s = _RE_PARAM.sub("?", s)
+    s = _RE_NUMERO.sub("?", s)
+    s = _RE_ESPACIOS.sub(" ", s).strip()
+    s = _RE_LISTA.sub("(?, ...)", s)
+    s = _RE_VALUES.sub(r"\1, ...", s)
+    return s
+
+
+@dataclass
+class PerfilSql:
+    """Sentencias ejecutadas dentro de un request o job."""
+
+    ambito: str
+    etiqueta: str
+    request_id: Optional[str] = None
+    sentencias: int = 0
+    db_ms: float = 0.0
+    por_sentencia: dict[str, list] = field(default_factory=dict)  # sql normalizado -> [veces, ms]
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    def registrar(self, sentencia: str, ms: float) -> None:
+        clave = normalizar_sql(sentencia)
+        with self._lock:
+            self.sentencias += 1
+            self.db_ms += ms
+            acc = self.por_sentencia.get(clave)
+            if acc is None:
+                self.por_sentencia[clave] = [1, ms]
+            else:
+                acc[0] += 1
+                acc[1] += ms
+
+    def repetidas(self, minimo: int = 2) -> list[dict[str, Any]]:
+        """Sentencias con >= `minimo` ejecuciones, de más a menos repetida."""
+        with self._lock:
+            filas = [(sql, v[0], v[1]) for sql, v in self.por_sentencia.items() if v[0] >= minimo]
+        filas.sort(key=lambda t: (-t[1], -t[2]))
+        return [{"sql": sql[:_SQL_MAX_CHARS], "veces": n, "ms": round(ms, 2)} for sql, n, ms in filas]
+
+    def sospechas_n_mas_1(self) -> list[dict[str, Any]]:
+        return self.repetidas(_umbral_n_mas_1())
+
+    def cabecera(self) -> str:
+        """Valor de X-SQL-Stats (modo DEBUG)."""
+        return (
+            f"sentencias={self.sentencias}; db_ms={self.db_ms:.1f}; "
+            f"distintas={len(self.por_sentencia)}; n_mas_1={len(self.sospechas_n_mas_1())}"
+        )
+
+
+def _umbral_n_mas_1() -> int:
+    return max(2, int(getattr(settings, "SQL_PROFILER_N1_UMBRAL", 10) or 10))
+
+
+def sql_profiler_habilitado() -> bool:
+    return bool(getattr(settings, "SQL_PROFILER_ENABLED", False))
+
+
+def perfil_sql_actual() -> Optional[PerfilSql]:
+    return _perfil_actual.get()
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _perfil_actual.get() is None or context is None:
+        return
+    context._perfil_sql_t0 = time.perf_counter()
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany) -> None:
+    perfil = _perfil_actual.get()
+    t0 = getattr(context, "_perfil_sql_t0", None) if context is not None else None
+    if perfil is None or t0 is None:
+        return
+    perfil.registrar(statement, (time.perf_counter() - t0) * 1000.0)
+
+
+def instalar_sql_profiler(engine: Engine) -> None:
+    """Registra los listeners en `engine` (idempotente)."""
+    if id(engine) in _engines_instrumentados:
+        return
+    event.listen(engine, "before_cursor_execute", _antes)
+    event.listen(engine, "after_cursor_execute", _despues)
+    _engines_instrumentados.add(id(engine))
+
+
+def _acumular(perfil: PerfilSql, sospechas: list[dict[str, Any]]) -> None:
+    clave = (perfil.ambito, perfil.etiqueta)
+    repetidas = perfil.repetidas()[:_TOP_SENTENCIAS]
+    with _lock:
+        acc = _agregado.get(clave)
+        if acc is None:
+            acc = {
+                "ambito": perfil.ambito,
+                "etiqueta": perfil.etiqueta,
+                "ejecuciones": 0,
+                "sentencias_total": 0,
+                "sentencias_max": 0,
+                "db_ms_total": 0.0,
+                "db_ms_max": 0.0,
+                "ejecuciones_con_n_mas_1": 0,
+                "repetidas": {},
+            }
+            _agregado[clave] = acc
+        else:
+            _agregado.move_to_end(clave)
+        acc["ejecuciones"] += 1
+        acc["sentencias_total"] += perfil.sentencias
+        acc["sentencias_max"] = max(acc["sentencias_max"], perfil.sentencias)
+        acc["db_ms_total"] += perfil.db_ms
+        acc["db_ms_max"] = max(acc["db_ms_max"], perfil.db_ms)
+        if sospechas:
+            acc["ejecuciones_con_n_mas_1"] += 1
+            _recientes.append(
+                {
+                    "ambito": perfil.ambito,
+                    "etiqueta": perfil.etiqueta,
+                    "request_id": perfil.request_id,
+                    "sentencias": perfil.sentencias,
+                    "db_ms": round(perfil.db_ms, 2),
+                    "sospechas": sospechas[:_TOP_SENTENCIAS],
+                }
+            )
+        # Máximo de repeticiones observado por sentencia (top por etiqueta).
+        top = acc["repetidas"]
+        for r in repetidas:
+            if r["veces"] > top.get(r["sql"], 0):
+                top[r["sql"]] = r["veces"]
+        if len(top) > _TOP_SENTENCIAS:
+            acc["repetidas"] = dict(sorted(top.items(), key=lambda kv: -kv[1])[:_TOP_SENTENCIAS])
+        while len(_agregado) > _MAX_ETIQUETAS:
+            _agregado.popitem(last=False)
+
+
+@contextmanager
+def perfil_sql(ambito: str, etiqueta: str, *, request_id: Optional[str] = None) -> Iterator[Optional[PerfilSql]]:
+    """
+    Abre un perfil para el bloque (None si el perfilador está apagado). La etiqueta puede corregirse
+    dentro del bloque (p. ej. con la plantilla de ruta, que solo se conoce tras el enrutado).
+    Un perfil anidado (job que llama a otro helper con perfil) reutiliza el exterior.
+    """
+    if not sql_profiler_habilitado() or _perfil_actual.get() is not None:
+        yield _perfil_actual.get()
+        return
+    perfil = PerfilSql(ambito=ambito, etiqueta=etiqueta, request_id=request_id)
+    token = _perfil_actual.set(perfil)
+    try:
+        yield perfil
+    finally:
+        _perfil_actual.reset(token)
+        sospechas = perfil.sospechas_n_mas_1()
+        if sospechas:
+            peor = sospechas[0]
+            logger.warning(
+                "[SQL_N+1] %s %s request_id=%s sentencias=%s db_ms=%.1f repetida=%sx sql=%s",
+                ambito,
+                perfil.etiqueta,
+                request_id or "-",
+                perfil.sentencias,
+                perfil.db_ms,
+                peor["veces"],
+                peor["sql"][:200],
+            )
+        _acumular(perfil, sospechas)
+
+
+def sql_profiler_snapshot(*, orden: str = "sentencias_max", limite: int = 50) -> dict[str, Any]:
+    """Agregado por etiqueta (peores primero) y últimos perfiles con sospecha de N+1. Por proceso."""
+    claves_orden = {
+        "sentencias_max": lambda a: a["sentencias_max"],
+        "db_ms_total": lambda a: a["db_ms_total"],
+        "n_mas_1": lambda a: (a["ejecuciones_con_n_mas_1"], a["sentencias_max"]),
+    }
+    clave = claves_orden.get(orden, claves_orden["sentencias_max"])
+    with _lock:
+        filas = [dict(a, repetidas=dict(a["repetidas"])) for a in _agregado.values()]
+        recientes = list(_recientes)
+    filas.sort(key=clave, reverse=True)
+    for f in filas[:limite]:
+        f["sentencias_promedio"] = round(f["sentencias_total"] / max(1, f["ejecuciones"]), 1)
+        f["db_ms_total"] = round(f["db_ms_total"], 2)
+        f["db_ms_max"] = round(f["db_ms_max"], 2)
+        f["repetidas"] = [{"sql": s, "veces_max": n} for s, n in f["repetidas"].items()]
+    return {
+        "habilitado": sql_profiler_habilitado(),
+        "umbral_n_mas_1": _umbral_n_mas_1(),
+        "etiquetas": len(filas),
+        "orden": orden if orden in claves_orden else "sentencias_max",
+        "perfiles": filas[:limite],
+        "recientes_n_mas_1": list(reversed(recientes)),
+    }
+
+
+def sql_profiler_reset() -> None:
+    """Tests o mantenimiento manual: vacía agregado y recientes."""
+    with _lock:
+        _agregado.clear()
+        _recientes.clear()
@@ -20,6 +20,7 @@ from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.config import settings
 from app.api.v1 import api_router
 from app.middleware.audit_middleware import AuditMiddleware
+from app.middleware.bulkhead import BulkheadMiddleware
 from app.middleware.validador_sobre_aplicacion import ValidadorSobreAplicacionMiddleware
 from app.services.liquidado_scheduler import liquidado_scheduler
 
@@ -279,6 +280,10 @@ app.add_middleware(ValidadorSobreAplicacionMiddleware)
 # Auditoria automatica: registra todos los POST/PUT/DELETE/PATCH en tabla auditoria
 app.add_middleware(AuditMiddleware)
 
+# Bulkhead por clase de tráfico (publico/interactivo/pesado): concurrencia, cola y engine BD propios; 503 rápido.
+# Dentro de CORS para que el 503 lleve cabeceras CORS.
+app.add_middleware(BulkheadMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,253 @@
+"""
+Bulkhead por clase de tráfico (BULKHEAD_ENABLED).
+
+Con un solo worker Uvicorn, los endpoints síncronos comparten el threadpool de AnyIO y antes compartían un
+único pool de conexiones: unos pocos exports pesados bastaban para dejar sin hilos ni conexiones a los
+portales públicos y al webhook de WhatsApp. Este middleware ASGI:
+
+  - clasifica cada request por ruta (publico / interactivo / pesado; health y docs quedan exentos) y fija la
+    clase en el ContextVar de core/database.py, así `get_db`/`SessionLocal()` usan el engine de la clase;
+  - admite como máximo BULKHEAD_<CLASE>_CONCURRENCIA requests simultáneos por clase; el resto espera en una
+    cola acotada (BULKHEAD_<CLASE>_COLA). Cola llena → 503 inmediato; espera > BULKHEAD_<CLASE>_ESPERA_SEG → 503.
+    Ambos con Retry-After;
+  - sube el límite de hilos de AnyIO a la suma de concurrencias (+ holgura): cada clase tiene su cuota de
+    hilos garantizada y ninguna puede tomar los de otra.
+
+El permiso se libera al terminar de enviar la respuesta (incluye StreamingResponse de exports).
+Contadores por proceso en GET /health/bulkhead (admin) y en GET /health/metrics (Prometheus).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import anyio
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import metricas
+from app.core.config import settings
+from app.core.database import (
+    CLASE_INTERACTIVO,
+    CLASE_PESADO,
+    CLASE_PUBLICO,
+    estado_pools,
+    usar_clase_trafico,
+)
+
+logger = logging.getLogger(__name__)
+
+_RE_EXENTAS = re.compile(r"^(/health|/api/v1/health|/docs|/redoc|/openapi\.json|/robots\.txt|/favicon\.ico)(/|$)")
+_RE_PUBLICAS = re.compile(r"^/api/v1/(cobros/public|estado-cuenta/public|finiquito/public|whatsapp/webhook)(/|$)")
+_RE_PESADAS = re.compile(
+    r"/(exportar|export)(/|-|$)"  # /reportes/exportar/morosidad, /export/excel/..., /exportar-excel
+    r"|excel"  # download-excel, upload-excel, cargar-excel, amortizacion/excel
+    r"|-masiv[ao](/|$)"  # reaplicar-cascada-aplicacion-masiva, decidir-masivo
+    r"|/lotes/[^/]+/comparar$"  # conciliación bancaria: comparación de lote
+)
+
+# Hilos extra sobre la suma de concurrencias (run_in_threadpool desde rutas exentas, StreamingResponse).
+_HOLGURA_HILOS = 5
+
+
+_rechazos = metricas.contador(
+    "rapicredit_bulkhead_rechazos_total", "Requests rechazados con 503 por clase y motivo (cola, espera).", ("clase", "motivo")
+)
+_espera = metricas.histograma(
+    "rapicredit_bulkhead_espera_segundos", "Espera en cola de los requests admitidos.", ("clase",)
+)
+
+
+def _muestras_compartimentos():
+    for c in list(_compartimentos.values()):
+        yield {"clase": c.clase, "estado": "activos"}, c.activos
+        yield {"clase": c.clase, "estado": "esperando"}, c.esperando
+        yield {"clase": c.clase, "estado": "concurrencia"}, c.concurrencia
+
+
+def _muestras_hilos():
+    # Solo desde el hilo del event loop (GET /health/metrics es async).
+    limitador = anyio.to_thread.current_default_thread_limiter()
+    stats = limitador.statistics()
+    yield {"estado": "total"}, limitador.total_tokens
+    yield {"estado": "en_uso"}, stats.borrowed_tokens
+    yield {"estado": "esperando"}, stats.tasks_waiting
+
+
+metricas.medidor(
+    "rapicredit_bulkhead_requests",
+    "Requests por clase: activos, esperando turno y concurrencia máxima.",
+    ("clase", "estado"),
+    funcion=_muestras_compartimentos,
+)
+metricas.medidor(
+    "rapicredit_anyio_hilos",
+    "Threadpool de AnyIO (endpoints síncronos): tokens totales, en uso y tareas esperando hilo.",
+    ("estado",),
+    funcion=_muestras_hilos,
+)
+
+
+def clasificar_ruta(path: str) -> Optional[str]:
+    """Clase de tráfico de la ruta; None si está exenta del bulkhead (health, docs)."""
+    if _RE_EXENTAS.match(path):
+        return None
+    if _RE_PUBLICAS.match(path):
+        return CLASE_PUBLICO
+    if _RE_PESADAS.search(path):
+        return CLASE_PESADO
+    return CLASE_INTERACTIVO
+
+
+@dataclass
+class _Compartimento:
+    clase: str
+    concurrencia: int
+    cola: int
+    espera_seg: float
+    semaforo: anyio.Semaphore = field(repr=False)
+    activos: int = 0
+    esperando: int = 0
+    admitidos: int = 0
+    rechazados_cola: int = 0
+    rechazados_espera: int = 0
+    espera_ms_max: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "concurrencia": self.concurrencia,
+            "cola": self.cola,
+            "espera_seg": self.espera_seg,
+            "activos": self.activos,
+            "esperando": self.esperando,
+            "admitidos": self.admitidos,
+            "rechazados_cola": self.rechazados_cola,
+            "rechazados_espera": self.rechazados_espera,
+            "espera_ms_max": self.espera_ms_max,
+        }
+
+
+# Se crean en el primer request (los semáforos de AnyIO necesitan el event loop); un worker = un loop.
+_compartimentos: Dict[str, _Compartimento] = {}
+
+
+def _crear_compartimentos() -> None:
+    for clase, prefijo in (
+        (CLASE_PUBLICO, "BULKHEAD_PUBLICO"),
+        (CLASE_INTERACTIVO, "BULKHEAD_INTERACTIVO"),
+        (CLASE_PESADO, "BULKHEAD_PESADO"),
+    ):
+        n = int(getattr(settings, f"{prefijo}_CONCURRENCIA"))
+        _compartimentos[clase] = _Compartimento(
+            clase=clase,
+            concurrencia=n,
+            cola=int(getattr(settings, f"{prefijo}_COLA")),
+            espera_seg=float(getattr(settings, f"{prefijo}_ESPERA_SEG")),
+            semaforo=anyio.Semaphore(n),
+        )
+    limitador = anyio.to_thread.current_default_thread_limiter()
+    objetivo = sum(c.concurrencia for c in _compartimentos.values()) + _HOLGURA_HILOS
+    if limitador.total_tokens < objetivo:
+        limitador.total_tokens = objetivo
+    logger.info(
+        "[bulkhead] %s hilos=%s",
+        " ".join(f"{c.clase}={c.concurrencia}/cola{c.cola}" for c in _compartimentos.values()),
+        limitador.total_tokens,
+    )
+
+
+def reiniciar_bulkhead() -> None:
+    """Descarta compartimentos y contadores (tests o cambio de configuración en caliente)."""
+    _compartimentos.clear()
+
+
+def bulkhead_snapshot() -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "habilitado": bool(settings.BULKHEAD_ENABLED),
+        "clases": {c: comp.snapshot() for c, comp in _compartimentos.items()},
+        "pools": estado_pools(),
+    }
+    try:
+        limitador = anyio.to_thread.current_default_thread_limiter()
+        out["hilos"] = {"total": limitador.total_tokens, "en_uso": limitador.borrowed_tokens}
+    except Exception:
+        pass
+    return out
+
+
+def _respuesta_ocupado(comp: _Compartimento) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Servicio ocupado, reintente en unos segundos",
+            "code": 503,
+            "clase": comp.clase,
+        },
+        headers={"Retry-After": str(max(1, math.ceil(comp.espera_seg)))},
+    )
+
+
+class BulkheadMiddleware:
+    """ASGI puro (no BaseHTTPMiddleware): el ContextVar de la clase llega al endpoint y a su threadpool."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.BULKHEAD_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        clase = clasificar_ruta(scope.get("path") or "")
+        if clase is None or scope.get("method") == "OPTIONS":
+            with usar_clase_trafico(CLASE_INTERACTIVO):
+                await self.app(scope, receive, send)
+            return
+
+        if not _compartimentos:
+            _crear_compartimentos()
+        comp = _compartimentos[clase]
+
+        sem = comp.semaforo
+        if sem.value == 0 and comp.esperando >= comp.cola:
+            comp.rechazados_cola += 1
+            _rechazos.inc(clase=clase, motivo="cola")
+            logger.warning("[bulkhead] 503 cola llena clase=%s %s %s", clase, scope.get("method"), scope.get("path"))
+            await _respuesta_ocupado(comp)(scope, receive, send)
+            return
+        t0 = time.perf_counter()
+        comp.esperando += 1
+        try:
+            with anyio.fail_after(comp.espera_seg):
+                await sem.acquire()
+            admitido = True
+        except TimeoutError:
+            admitido = False
+        finally:
+            comp.esperando -= 1
+        if not admitido:
+            comp.rechazados_espera += 1
+            _rechazos.inc(clase=clase, motivo="espera")
+            logger.warning(
+                "[bulkhead] 503 espera > %ss clase=%s %s %s",
+                comp.espera_seg,
+                clase,
+                scope.get("method"),
+                scope.get("path"),
+            )
+            await _respuesta_ocupado(comp)(scope, receive, send)
+            return
+        esperado = time.perf_counter() - t0
+        comp.espera_ms_max = max(comp.espera_ms_max, int(esperado * 1000))
+        _espera.observe(esperado, clase=clase)
+        comp.admitidos += 1
+        comp.activos += 1
+        try:
+            with usar_clase_trafico(clase):
+                await self.app(scope, receive, send)
+        finally:
+            comp.activos -= 1
+            sem.release()
@@ -7,6 +7,9 @@ from starlette.responses import Response
 import uuid
 import logging
 
+from app.core.config import settings
+from app.core.sql_profiler import perfil_sql
+
 logger = logging.getLogger(__name__)
 
 
@@ -149,8 +152,16 @@ class RequestIdMiddleware(BaseHTTPMiddleware):
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
         
-        response = await call_next(request)
+        # Perfil SQL del request (no-op salvo SQL_PROFILER_ENABLED); etiqueta = plantilla de ruta.
+        with perfil_sql("request", f"{request.method} {request.url.path}", request_id=request_id) as perfil:
+            response = await call_next(request)
+            if perfil is not None:
+                ruta = request.scope.get("route")
+                if getattr(ruta, "path", None):
+                    perfil.etiqueta = f"{request.method} {ruta.path}"
         response.headers["X-Request-ID"] = request_id
+        if perfil is not None and settings.DEBUG:
+            response.headers["X-SQL-Stats"] = perfil.cabecera()
         
         return response
 
@@ -4,6 +4,15 @@ from app.models.prestamo import Prestamo
 from app.models.ticket import Ticket
 from app.models.cuota import Cuota
 from app.models.cuota_pago import CuotaPago
+from app.models.cuota_estado_cambio import CuotaEstadoCambio
+from app.models.prestamo_saldo import PrestamoSaldo
+from app.models.prestamo_version import PrestamoSyncPendiente, PrestamoVersion
+from app.models.scheduler_job_run import SchedulerJobRun
+from app.models.notificacion_elegible_dia import NotificacionElegibleDia, NotificacionElegiblesEstado
+from app.models.auditoria_docs_similares import AuditoriaDocsSimilaresEstado, AuditoriaDocsSimilaresPar
+from app.models.auditoria_liquidados_hallazgo import AuditoriaLiquidadosHallazgo
+from app.models.importacion_cobros_job import ImportacionCobrosJob
+from app.models.pagos_kpis_cache import PagosKpisCache
 from app.models.pagos_whatsapp import PagosWhatsapp
 from app.models.conversacion_cobranza import ConversacionCobranza
 from app.models.pagos_informe import PagosInforme
@@ -69,6 +78,7 @@ from app.models.cobranza_universo import (
 )
 from app.models.aseguradora_universo import AseguradoraUniversoCedula
 from app.models.conciliacion_sheet import (
+    ConciliacionSheetCambio,
     ConciliacionSheetMeta,
     ConciliacionSheetRow,
     ConciliacionSheetSyncRun,
@@ -89,6 +99,18 @@ __all__ = [
     "Ticket",
     "Cuota",
     "CuotaPago",
+    "CuotaEstadoCambio",
+    "PrestamoSaldo",
+    "PrestamoVersion",
+    "PrestamoSyncPendiente",
+    "SchedulerJobRun",
+    "NotificacionElegibleDia",
+    "NotificacionElegiblesEstado",
+    "AuditoriaDocsSimilaresPar",
+    "AuditoriaDocsSimilaresEstado",
+    "AuditoriaLiquidadosHallazgo",
+    "ImportacionCobrosJob",
+    "PagosKpisCache",
     "Pago",
     "PagoComprobanteImagen",
     "PagosWhatsapp",
@@ -146,6 +168,7 @@ __all__ = [
     "CobranzaUniversoCedula",
     "CobranzaUniversoDesempenoDiario",
     "AseguradoraUniversoCedula",
+    "ConciliacionSheetCambio",
     "ConciliacionSheetMeta",
     "ConciliacionSheetRow",
     "ConciliacionSheetSyncRun",
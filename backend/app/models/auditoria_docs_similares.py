@@ -0,0 +1,31 @@
+"""
+Pares de numero_documento similares por préstamo LIQUIDADO, persistidos para la auditoría intensiva.
+
+- `auditoria_docs_similares_pares`: pares (pago_id_a, pago_id_b) con ratio >= umbral base, ratio exacto.
+- `auditoria_docs_similares_estado`: firma (sha256 de pago_id + numero_documento analizados) con la que se
+  calcularon los pares del préstamo; si la firma actual difiere, solo ese préstamo se recalcula.
+
+Los escribe app/services/auditoria_liquidados_docs_similares.py.
+"""
+from sqlalchemy import Column, DateTime, Float, Integer, String, func
+
+from app.core.database import Base
+
+
+class AuditoriaDocsSimilaresPar(Base):
+    __tablename__ = "auditoria_docs_similares_pares"
+
+    prestamo_id = Column(Integer, primary_key=True)
+    pago_id_a = Column(Integer, primary_key=True)
+    pago_id_b = Column(Integer, primary_key=True)
+    similitud = Column(Float, nullable=False)
+
+
+class AuditoriaDocsSimilaresEstado(Base):
+    __tablename__ = "auditoria_docs_similares_estado"
+
+    prestamo_id = Column(Integer, primary_key=True)
+    firma = Column(String(64), nullable=False)
+    umbral_base = Column(Float, nullable=False)
+    n_pagos_con_documento = Column(Integer, nullable=False, default=0)
+    calculado_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
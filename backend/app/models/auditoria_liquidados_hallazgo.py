@@ -0,0 +1,29 @@
+"""
+Snapshot de hallazgos de cierre de préstamos LIQUIDADO (auditoría intensiva, sección `cierre`).
+
+Una fila por (prestamo_id, codigo) con los datos del préstamo desnormalizados, para filtrar por cédula,
+paginar y contar por código en SQL. Lo escribe app/services/auditoria_liquidados_cierre_snapshot.py
+(job nocturno, refresco manual y préstamos con versión nueva al leer).
+"""
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from app.core.database import Base
+
+
+class AuditoriaLiquidadosHallazgo(Base):
+    __tablename__ = "auditoria_liquidados_hallazgos"
+
+    prestamo_id = Column(Integer, primary_key=True, autoincrement=False)
+    codigo = Column(String(80), primary_key=True, index=True)
+    # Posición del control dentro del préstamo (orden del motor).
+    orden = Column(Integer, nullable=False, default=0)
+    titulo = Column(String(200), nullable=False)
+    detalle = Column(String(500), nullable=True)
+    cliente_id = Column(Integer, nullable=True)
+    cedula = Column(String(40), nullable=True)
+    # Cédula en mayúsculas y sin espacios (filtro por fragmento).
+    cedula_busqueda = Column(String(40), nullable=True, index=True)
+    nombres = Column(String(255), nullable=True)
+    estado_prestamo = Column(String(40), nullable=True)
+    cliente_email = Column(String(255), nullable=True)
+    calculado_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -9,6 +9,9 @@ Dos campos de correo electrónico por cliente:
 Si falta la columna email_secundario en la BD, aplicar:
   backend/scripts/migracion_clientes_email_secundario.sql
 
+`telefono_clave` (indexada) es la clave de identidad del teléfono (app/utils/cliente_telefonos.py); se recalcula
+al asignar `telefono` por ORM. Migración 097: columna, índice y backfill.
+
 La tabla clientes NO tiene total_financiamiento ni dias_mora (eso está en prestamos / se calcula desde cuotas).
 """
 from sqlalchemy import Column, Integer, String, Date, DateTime, Text, text
@@ -16,6 +19,7 @@ from sqlalchemy.orm import validates
 
 from app.core.database import Base
 from app.utils.cedula_almacenamiento import normalizar_cedula_almacenamiento
+from app.utils.cliente_telefonos import clave_telefono
 
 
 class Cliente(Base):
@@ -25,6 +29,7 @@ class Cliente(Base):
     cedula = Column(String(20), nullable=False, index=True)  # UNIQUE parcial en BD: excluye Z999999999 (ver migracion_cedula_z999999999_repetible.sql)
     nombres = Column(String(100), nullable=False)
     telefono = Column(String(100), nullable=False)
+    telefono_clave = Column(String(10), nullable=True, index=True)
     email = Column(String(150), nullable=False)
     email_secundario = Column(String(150), nullable=True)
     direccion = Column(Text, nullable=False)
@@ -43,3 +48,7 @@ class Cliente(Base):
         n = normalizar_cedula_almacenamiento(value)
         return n if n is not None else ""
 
+    @validates("telefono")
+    def _telefono_sincroniza_clave(self, key, value):
+        self.telefono_clave = clave_telefono(value)
+        return value
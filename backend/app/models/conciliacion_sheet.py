@@ -1,5 +1,6 @@
 """
-Snapshot de la hoja CONCILIACIÓN (Google Sheets): metadatos, filas como JSON por cabecera, log de corridas.
+Snapshot de la hoja CONCILIACIÓN (Google Sheets): metadatos, filas como JSON por cabecera, log de corridas
+y cambios por corrida (sync incremental: solo se reescriben filas cuyo row_hash cambió).
 """
 from sqlalchemy import Boolean, Column, BigInteger, Integer, String, Text, DateTime, func, text
 from sqlalchemy.dialects.postgresql import JSONB
@@ -30,6 +31,9 @@ class ConciliacionSheetRow(Base):
 
     row_index = Column(Integer, primary_key=True)
     cells = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    row_hash = Column(String(64), nullable=True)
+    # Fila que ya no está en la hoja (baja lógica); los lectores filtran eliminado_en IS NULL.
+    eliminado_en = Column(DateTime(timezone=True), nullable=True)
 
 
 class ConciliacionSheetSyncRun(Base):
@@ -43,3 +47,20 @@ class ConciliacionSheetSyncRun(Base):
     row_count = Column(Integer, nullable=False, default=0)
     col_count = Column(Integer, nullable=False, default=0)
     duration_ms = Column(Integer, nullable=True)
+    filas_nuevas = Column(Integer, nullable=True)
+    filas_modificadas = Column(Integer, nullable=True)
+    filas_eliminadas = Column(Integer, nullable=True)
+
+
+class ConciliacionSheetCambio(Base):
+    """Fila de la hoja que cambió en una corrida de sync (tipo alta / cambio / baja)."""
+
+    __tablename__ = "conciliacion_sheet_cambios"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    run_id = Column(BigInteger, nullable=False, index=True)
+    sheet_row_number = Column(Integer, nullable=False)
+    tipo = Column(String(12), nullable=False)
+    cedula = Column(String(40), nullable=True)
+    cedula_anterior = Column(String(40), nullable=True)
+    creado_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
@@ -2,7 +2,7 @@
 Modelo SQLAlchemy para campañas CRM (envío de correo masivo por lotes).
 Tabla: crm_campana. Destinatarios: correos de tabla clientes.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, LargeBinary, func
+from sqlalchemy import Boolean, Column, Integer, String, Text, DateTime, LargeBinary, func
 
 from app.core.database import Base
 
@@ -32,6 +32,12 @@ class CampanaCrm(Base):
     programado_cada_dias = Column(Integer, nullable=True)
     programado_cada_horas = Column(Integer, nullable=True)
     programado_proxima_ejecucion = Column(DateTime(timezone=False), nullable=True)
+    # Envío reanudable (ver app.services.crm_campanas_envio): "todos" | "seleccion" (NULL = inferir),
+    # cursor por cliente_id de la materialización de destinatarios y latido del proceso que envía.
+    destinatarios_modo = Column(String(20), nullable=True)
+    destinatarios_cursor = Column(Integer, nullable=True)
+    destinatarios_materializados = Column(Boolean, nullable=False, server_default="false", default=False)
+    envio_heartbeat = Column(DateTime(timezone=False), nullable=True)
 
     @property
     def tiene_adjunto(self) -> bool:
@@ -1,8 +1,12 @@
 """
 Destinatarios seleccionados por campaña CRM.
 Si la campaña tiene filas aquí: se envía solo a esos clientes. Si no: a todos (emails de clientes).
+
+Al iniciar el envío la lista se materializa aquí por tramos (también en modo "todos"): `emails` guarda
+los correos resueltos y `estado` el avance por destinatario (pendiente -> enviando -> enviado/fallido/omitido),
+de modo que el envío se puede parar y reanudar sin reenviar ni perder progreso.
 """
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 
 from app.core.database import Base
 
@@ -13,5 +17,12 @@ class CampanaDestinatarioCrm(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     campana_id = Column(Integer, ForeignKey("crm_campana.id", ondelete="CASCADE"), nullable=False, index=True)
     cliente_id = Column(Integer, ForeignKey("clientes.id", ondelete="CASCADE"), nullable=False)
+    # Correos destino separados por ';' (NULL = aún no materializado).
+    emails = Column(Text, nullable=True)
+    estado = Column(String(20), nullable=False, server_default="pendiente", default="pendiente")
+    reclamado_en = Column(DateTime(timezone=False), nullable=True)
 
-    __table_args__ = (UniqueConstraint("campana_id", "cliente_id", name="uq_crm_campana_dest_campana_cliente"),)
+    __table_args__ = (
+        UniqueConstraint("campana_id", "cliente_id", name="uq_crm_campana_dest_campana_cliente"),
+        Index("ix_crm_campana_dest_campana_estado_id", "campana_id", "estado", "id"),
+    )
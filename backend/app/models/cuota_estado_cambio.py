@@ -0,0 +1,23 @@
+"""Bitacora de cambios de `cuotas.estado` hechos por la sincronizacion de cartera (job nocturno / POST admin)."""
+
+from sqlalchemy import Column, Date, DateTime, Integer, String, func
+
+from app.core.database import Base
+
+
+class CuotaEstadoCambio(Base):
+    __tablename__ = "cuota_estado_cambios"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    corrida_id = Column(String(36), nullable=False, index=True)
+    cuota_id = Column(Integer, nullable=False, index=True)
+    prestamo_id = Column(Integer, nullable=False, index=True)
+    estado_anterior = Column(String(20), nullable=True)
+    estado_nuevo = Column(String(20), nullable=False)
+    fecha_referencia = Column(Date, nullable=False)
+    motor = Column(String(10), nullable=False)
+    creado_en = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
@@ -1,8 +1,9 @@
 """
 Snapshot plano de la hoja Google (CONCILIACIÓN): columnas A a S por fila de datos.
-Se rellena en cada sync exitoso (misma corrida que conciliacion_sheet_*).
+Se actualiza en cada sync exitoso (misma corrida que conciliacion_sheet_*): solo filas nuevas o con
+row_hash distinto; las que ya no están en la hoja quedan con eliminado_en (los lectores las excluyen).
 """
-from sqlalchemy import Column, DateTime, Integer, Text, func
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
 
 from app.core.database import Base
 
@@ -15,6 +16,8 @@ class DriveRow(Base):
 
     sheet_row_number = Column(Integer, primary_key=True, nullable=False)
     synced_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    row_hash = Column(String(64), nullable=True)
+    eliminado_en = Column(DateTime(timezone=True), nullable=True)
 
     col_a = Column(Text, nullable=True)
     col_b = Column(Text, nullable=True)
@@ -0,0 +1,39 @@
+"""
+Jobs de «Importar reportados aprobados (Cobros)» a la tabla pagos.
+
+Una fila por importación: cursor por pagos_reportados.id (último tramo confirmado), tope fijado al crear el job,
+contadores del resumen y latido del hilo que procesa. La escribe app/services/pagos_importacion_cobros.py.
+
+estado: en_proceso | cancelando (el tramo en curso termina y se detiene) | cancelado | completado | error.
+"""
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+
+from app.core.database import Base
+
+
+class ImportacionCobrosJob(Base):
+    __tablename__ = "importacion_cobros_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    estado = Column(String(20), nullable=False, index=True, default="en_proceso")
+    usuario_email = Column(String(255), nullable=True)
+    # Rol canónico de quien inició el job: habilita cargar pagos de préstamos en DESISTIMIENTO al reanudar.
+    usuario_rol = Column(String(20), nullable=True)
+    cursor_reportado_id = Column(Integer, nullable=True)
+    hasta_reportado_id = Column(Integer, nullable=True)
+    total_estimado = Column(Integer, nullable=False, default=0)
+    reportados_revisados = Column(Integer, nullable=False, default=0)
+    tramos = Column(Integer, nullable=False, default=0)
+    registros_procesados = Column(Integer, nullable=False, default=0)
+    registros_con_error = Column(Integer, nullable=False, default=0)
+    operaciones_cuota_total = Column(Integer, nullable=False, default=0)
+    pagos_con_aplicacion_a_cuotas = Column(Integer, nullable=False, default=0)
+    pagos_sin_aplicacion_cuotas_total = Column(Integer, nullable=False, default=0)
+    # JSON: errores_detalle (100), ids_pagos_con_errores, pagos_sin_aplicacion_cuotas (50).
+    detalle = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    # Token del hilo que procesa: un hilo viejo (worker colgado) no puede confirmar tramos tras un reanudar.
+    ejecutor = Column(String(36), nullable=True)
+    creado_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    latido = Column(DateTime(timezone=True), nullable=True)
+    finalizado_en = Column(DateTime(timezone=True), nullable=True)
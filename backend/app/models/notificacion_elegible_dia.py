@@ -0,0 +1,49 @@
+"""
+Listas de elegibles de Notificaciones materializadas por día (America/Caracas) y segmento.
+
+- `notificacion_elegibles_dia`: un ítem por fila, con el mismo dict que devolvían los listados en vivo
+  (contacto ya alineado con el titular del préstamo) y su hash para detectar cambios entre recálculos.
+- `notificacion_elegibles_estado`: cuándo se calculó cada (fecha, segmento), total y hash de la lista;
+  sin fila (o con calculado_desde NULL) el segmento se recalcula en la siguiente lectura.
+
+Las escribe app/services/notificaciones_elegibles_dia.py (job 00:15 y recálculo bajo demanda).
+"""
+from sqlalchemy import Column, Date, DateTime, Integer, JSON, String, UniqueConstraint, func
+
+from app.core.database import Base
+
+
+class NotificacionElegibleDia(Base):
+    __tablename__ = "notificacion_elegibles_dia"
+    __table_args__ = (
+        UniqueConstraint("fecha_referencia", "segmento", "clave", name="uq_notificacion_elegibles_dia_clave"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    fecha_referencia = Column(Date, nullable=False)
+    segmento = Column(String(40), nullable=False)
+    clave = Column(String(80), nullable=False)
+    posicion = Column(Integer, nullable=False, default=0)
+    prestamo_id = Column(Integer, nullable=True, index=True)
+    cliente_id = Column(Integer, nullable=True)
+    payload = Column(JSON, nullable=False)
+    item_hash = Column(String(64), nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class NotificacionElegiblesEstado(Base):
+    __tablename__ = "notificacion_elegibles_estado"
+
+    fecha_referencia = Column(Date, primary_key=True)
+    segmento = Column(String(40), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    lista_hash = Column(String(64), nullable=True)
+    # Marca: mayor prestamo_versiones.actualizado_en ya reflejado; los préstamos con versión posterior se
+    # parchean en la siguiente lectura.
+    calculado_desde = Column(DateTime(timezone=True), nullable=True)
+    # huella_versiones de la ventana bajo la marca: cambia si una transacción confirmó tarde por debajo.
+    calculado_huella = Column(String(64), nullable=True)
+    # Último recálculo completo: NOTIFICACIONES_ELEGIBLES_MAX_EDAD_MIN se mide desde aquí.
+    calculado_en = Column(DateTime(timezone=True), nullable=True)
+    duracion_ms = Column(Integer, nullable=True)
+    filas_cambiadas = Column(Integer, nullable=True)
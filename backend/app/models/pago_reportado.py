@@ -7,7 +7,7 @@ Reportes de pago web (misma tabla para todo canal de entrada).
 - Binario del comprobante: solo en `pago_comprobante_imagen` (FK `comprobante_imagen_id`);
   `comprobante_nombre` conserva el nombre original del archivo.
 """
-from sqlalchemy import Boolean, Column, Integer, String, Numeric, DateTime, ForeignKey, Text, Date, LargeBinary
+from sqlalchemy import Boolean, Column, Integer, String, Numeric, DateTime, ForeignKey, Text, Date, LargeBinary, Index
 from sqlalchemy.sql import func, text
 
 from app.core.database import Base
@@ -55,9 +55,21 @@ class PagoReportado(Base):
     # Permite paginación SQL real en el listado (GET /pagos-reportados/listado-y-kpis).
     # Se recalcula en cada escritura (crear, Gemini, PATCH, cambio de estado).
     falla_validadores_manual = Column(Boolean, nullable=True, index=True)
+    # Veredicto materializado de la cola manual (app.api.v1.endpoints.cobros.reportados_veredicto):
+    # listado/KPIs cuentan con WHERE cola_manual en vez de validar fila a fila. veredicto_en NULL = pendiente
+    # de recalcular (alta, edicion, pago en conflicto o cambio del lider de su cadena de nº operacion).
+    cola_manual = Column(Boolean, nullable=True)
+    dedup_lider_id = Column(Integer, nullable=True, index=True)
+    validadores_fallidos = Column(String(255), nullable=True)
+    prestamo_objetivo_id = Column(Integer, nullable=True)
+    veredicto_en = Column(DateTime(timezone=False), nullable=True)
     created_at = Column(DateTime(timezone=False), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=False), nullable=False, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_pagos_reportados_estado_cola_manual_created", "estado", "cola_manual", "created_at"),
+    )
+
 
 class PagoReportadoHistorial(Base):
     __tablename__ = "pagos_reportados_historial"
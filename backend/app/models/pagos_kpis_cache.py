@@ -0,0 +1,23 @@
+"""
+Cache de GET /pagos/kpis y GET /pagos/stats.
+
+Una fila por (tipo, parámetros): mes/rango o filtros analista/concesionario/modelo más la fecha de referencia.
+`marca` es la suma de prestamo_versiones.version al calcular: cualquier pago registrado, cascada aplicada o
+cuota editada la sube, y la entrada deja de servirse. La escribe app/services/pagos_kpis.py.
+"""
+from sqlalchemy import BigInteger, Column, Date, DateTime, String, Text, func
+
+from app.core.database import Base
+
+
+class PagosKpisCache(Base):
+    __tablename__ = "pagos_kpis_cache"
+
+    # tipo + sha1 de los parámetros normalizados.
+    clave = Column(String(64), primary_key=True)
+    tipo = Column(String(10), nullable=False)  # kpis | stats
+    parametros = Column(Text, nullable=False)
+    fecha_referencia = Column(Date, nullable=False)
+    marca = Column(BigInteger, nullable=False)
+    datos = Column(Text, nullable=False)
+    calculado_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
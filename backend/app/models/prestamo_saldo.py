@@ -0,0 +1,36 @@
+"""
+Resumen por préstamo de la tabla `cuotas` (una fila por préstamo).
+
+Lo mantiene `app.services.prestamo_saldos` en la misma transacción que la cascada de pagos y los
+editores de cuota; el job nocturno de verificación lo compara contra el agregado real y repara.
+Los campos de atraso (cuotas_vencidas, max_dias_atraso) valen para `fecha_referencia`.
+"""
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric, func
+
+from app.core.database import Base
+
+
+class PrestamoSaldo(Base):
+    __tablename__ = "prestamo_saldos"
+
+    prestamo_id = Column(
+        Integer,
+        ForeignKey("prestamos.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    cuotas_total = Column(Integer, nullable=False, default=0)
+    cuotas_pagadas = Column(Integer, nullable=False, default=0)
+    total_monto = Column(Numeric(14, 2), nullable=False, default=0)
+    total_pagado = Column(Numeric(14, 2), nullable=False, default=0)
+    saldo_pendiente = Column(Numeric(14, 2), nullable=False, default=0)
+    cuotas_vencidas = Column(Integer, nullable=False, default=0, index=True)
+    max_dias_atraso = Column(Integer, nullable=False, default=0)
+    fecha_vencimiento_pendiente_min = Column(Date, nullable=True)
+    ultima_fecha_pago = Column(Date, nullable=True)
+    fecha_referencia = Column(Date, nullable=False)
+    actualizado_en = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
@@ -0,0 +1,226 @@
+"""
+Versión por préstamo (cache de estado de cuenta) y cola de sincronización de pagos pendientes.
+
+- `prestamo_versiones`: contador que sube en la misma transacción que cualquier cambio ORM de cuotas,
+  pagos, datos del cliente o campos del préstamo que muestra el estado de cuenta, y desde `refrescar_prestamo_saldos` (rutas Core: cascada, generación de
+  cuotas, editores). El estado de cuenta se cachea con clave (prestamo_id, version, fecha_corte).
+- Lectores incrementales (marca = mayor `actualizado_en` procesado): `actualizado_en` se fija al flush, no
+  al commit, así que guardan la `huella_versiones` de la ventana (marca - margen, marca] y la releen si
+  cambia: una transacción confirmó tarde por debajo de la marca (o una fila de la ventana volvió a cambiar,
+  y releerla es idempotente).
+- `prestamos_sync_pendiente`: préstamos con pagos por aplicar a cuotas. La alimenta el alta/cambio de
+  un pago (conciliado, monto, préstamo) y la drena el job `prestamos_sync_cola` (antes lo hacía cada GET).
+"""
+from __future__ import annotations
+
+import weakref
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, event, exists, func, insert, inspect, select, update
+from sqlalchemy.orm import Session, object_session
+
+from app.core.database import Base
+from app.models.cliente import Cliente
+from app.models.cuota import Cuota
+from app.models.pago import Pago
+from app.models.prestamo import Prestamo
+
+
+class PrestamoVersion(Base):
+    __tablename__ = "prestamo_versiones"
+
+    prestamo_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False, default=1)
+    actualizado_en = Column(DateTime(timezone=False), nullable=False, server_default=func.now(), index=True)
+
+
+class PrestamoSyncPendiente(Base):
+    __tablename__ = "prestamos_sync_pendiente"
+
+    prestamo_id = Column(Integer, primary_key=True, autoincrement=False)
+    encolado_en = Column(DateTime(timezone=False), nullable=False, server_default=func.now(), index=True)
+    reclamado_en = Column(DateTime(timezone=False), nullable=True)
+    intentos = Column(Integer, nullable=False, default=0)
+    ultimo_error = Column(String(500), nullable=True)
+
+
+# Claves en Session.info (se vacían en cada flush / fin de transacción).
+_INFO_VERSION = "_prestamos_version_pendiente"
+_INFO_COLA = "_prestamos_sync_pendiente"
+INFO_VERSION_TOCADA = "_prestamos_version_tocada"
+
+_PAGO_CAMPOS_SYNC = ("prestamo_id", "conciliado", "verificado_concordancia", "monto_pagado")
+_CLIENTE_CAMPOS_EC = ("nombres", "cedula", "email", "email_secundario")
+# estado decide además si se muestra la tabla de amortización (prestamo_muestra_tabla_amortizacion).
+_PRESTAMO_CAMPOS_EC = ("estado", "producto", "total_financiamiento", "cliente_id")
+
+
+_tablas_por_engine: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def tabla_disponible(conn, nombre: str) -> bool:
+    """Cache por engine: BD sin la migración 091 (o tests con esquema parcial) no rompen el flush."""
+    por_tabla = _tablas_por_engine.setdefault(conn.engine, {})
+    if nombre not in por_tabla:
+        por_tabla[nombre] = inspect(conn).has_table(nombre)
+    return por_tabla[nombre]
+
+
+def _upsert(conn, tabla, filas: list[dict], set_: dict) -> None:
+    """INSERT ... ON CONFLICT (prestamo_id) DO UPDATE en PostgreSQL/SQLite; UPDATE + INSERT en otros motores."""
+    dialecto = conn.dialect.name
+    if dialecto in ("postgresql", "sqlite"):
+        if dialecto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        conn.execute(
+            dialect_insert(tabla).values(filas).on_conflict_do_update(index_elements=["prestamo_id"], set_=set_)
+        )
+        return
+    for f in filas:
+        r = conn.execute(update(tabla).where(tabla.c.prestamo_id == f["prestamo_id"]).values(**set_))
+        if not r.rowcount:
+            conn.execute(insert(tabla).values(**f))
+
+
+def incrementar_version_prestamos(conn, prestamo_ids: Iterable[int]) -> None:
+    """Sube la versión de esos préstamos (crea la fila si no existe). `conn` es Connection o Session."""
+    ids = sorted({int(x) for x in prestamo_ids if x is not None})
+    if not ids:
+        return
+    if isinstance(conn, Session):
+        conn.info.setdefault(INFO_VERSION_TOCADA, set()).update(ids)
+        conn = conn.connection()
+    t = PrestamoVersion.__table__
+    if not tabla_disponible(conn, t.name):
+        return
+    now = datetime.utcnow()
+    _upsert(
+        conn,
+        t,
+        [{"prestamo_id": i, "version": 1, "actualizado_en": now} for i in ids],
+        {"version": t.c.version + 1, "actualizado_en": now},
+    )
+
+
+def encolar_sync_prestamos(conn, prestamo_ids: Iterable[int]) -> None:
+    """Encola préstamos para aplicar pagos pendientes; si ya estaban, renueva encolado_en y libera el claim."""
+    ids = sorted({int(x) for x in prestamo_ids if x is not None})
+    if not ids:
+        return
+    if isinstance(conn, Session):
+        conn = conn.connection()
+    t = PrestamoSyncPendiente.__table__
+    if not tabla_disponible(conn, t.name):
+        return
+    now = datetime.utcnow()
+    _upsert(
+        conn,
+        t,
+        [{"prestamo_id": i, "encolado_en": now, "intentos": 0} for i in ids],
+        {"encolado_en": now, "reclamado_en": None},
+    )
+
+
+def margen_relectura_versiones() -> timedelta:
+    from app.core.config import settings
+
+    return timedelta(minutes=int(getattr(settings, "PRESTAMO_VERSIONES_MARGEN_RELECTURA_MIN", 15) or 15))
+
+
+def huella_versiones(db, hasta: datetime) -> str:
+    """
+    `filas:suma de versiones:suma de préstamos` con actualizado_en en (hasta - margen, hasta] (`hasta` naive
+    UTC). Una transacción que confirma tarde con actualizado_en dentro de la ventana la cambia (fila nueva o
+    version + 1).
+    """
+    v = PrestamoVersion
+    n, versiones, prestamos = db.execute(
+        select(func.count(), func.coalesce(func.sum(v.version), 0), func.coalesce(func.sum(v.prestamo_id), 0)).where(
+            v.actualizado_en > hasta - margen_relectura_versiones(), v.actualizado_en <= hasta
+        )
+    ).one()
+    return f"{int(n)}:{int(versiones)}:{int(prestamos)}"
+
+
+def versiones_pendientes(db, desde: datetime, huella) -> bool:
+    """True si hay versiones que la marca (`desde` naive UTC, `huella`) no cubre."""
+    if db.execute(select(exists().where(PrestamoVersion.actualizado_en > desde))).scalar():
+        return True
+    return huella_versiones(db, desde) != huella
+
+
+def _anotar(target, clave: str, prestamo_id) -> None:
+    s = object_session(target)
+    if s is not None and prestamo_id is not None:
+        s.info.setdefault(clave, set()).add(int(prestamo_id))
+
+
+def _cambio(target, campos: tuple[str, ...]) -> bool:
+    st = target._sa_instance_state
+    return any(st.attrs[c].history.has_changes() for c in campos)
+
+
+@event.listens_for(Cuota, "after_insert")
+@event.listens_for(Cuota, "after_update")
+@event.listens_for(Cuota, "after_delete")
+def _cuota_toca_version(_mapper, _connection, target: Cuota) -> None:
+    _anotar(target, _INFO_VERSION, target.prestamo_id)
+
+
+@event.listens_for(Pago, "after_insert")
+def _pago_insertado(_mapper, _connection, target: Pago) -> None:
+    _anotar(target, _INFO_VERSION, target.prestamo_id)
+    _anotar(target, _INFO_COLA, target.prestamo_id)
+
+
+@event.listens_for(Pago, "after_update")
+def _pago_actualizado(_mapper, _connection, target: Pago) -> None:
+    _anotar(target, _INFO_VERSION, target.prestamo_id)
+    hist = target._sa_instance_state.attrs["prestamo_id"].history
+    for anterior in hist.deleted or ():
+        _anotar(target, _INFO_VERSION, anterior)
+    if _cambio(target, _PAGO_CAMPOS_SYNC):
+        _anotar(target, _INFO_COLA, target.prestamo_id)
+
+
+@event.listens_for(Pago, "after_delete")
+def _pago_eliminado(_mapper, _connection, target: Pago) -> None:
+    _anotar(target, _INFO_VERSION, target.prestamo_id)
+
+
+@event.listens_for(Prestamo, "after_update")
+def _prestamo_actualizado(_mapper, _connection, target: Prestamo) -> None:
+    if _cambio(target, _PRESTAMO_CAMPOS_EC):
+        _anotar(target, _INFO_VERSION, target.id)
+
+
+@event.listens_for(Cliente, "after_update")
+def _cliente_actualizado(_mapper, connection, target: Cliente) -> None:
+    if not _cambio(target, _CLIENTE_CAMPOS_EC):
+        return
+    ids = connection.execute(
+        Prestamo.__table__.select().with_only_columns(Prestamo.__table__.c.id).where(
+            Prestamo.__table__.c.cliente_id == target.id
+        )
+    ).scalars().all()
+    for pid in ids:
+        _anotar(target, _INFO_VERSION, pid)
+
+
+@event.listens_for(Session, "after_flush")
+def _escribir_versiones_y_cola(session: Session, _flush_context) -> None:
+    versiones = session.info.pop(_INFO_VERSION, None)
+    cola = session.info.pop(_INFO_COLA, None)
+    if versiones:
+        incrementar_version_prestamos(session, versiones)
+    if cola:
+        encolar_sync_prestamos(session, cola)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _limpiar_version_tocada(session: Session) -> None:
+    session.info.pop(INFO_VERSION_TOCADA, None)
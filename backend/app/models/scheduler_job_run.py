@@ -0,0 +1,26 @@
+"""
+Historial de ejecuciones de jobs programados (APScheduler): una fila por corrida, omisión o misfire.
+
+resultado: ok | error | omitido_exclusion (otro job con el mismo recurso no liberó a tiempo) |
+misfire (APScheduler descartó la corrida por superar misfire_grace_time) | omitido_max_instancias.
+"""
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+
+from app.core.database import Base
+
+
+class SchedulerJobRun(Base):
+    __tablename__ = "scheduler_job_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(120), nullable=False, index=True)
+    clase = Column(String(20), nullable=True)
+    programado_para = Column(DateTime(timezone=True), nullable=True)
+    inicio = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    fin = Column(DateTime(timezone=True), nullable=True)
+    duracion_ms = Column(Integer, nullable=True)
+    espera_exclusion_ms = Column(Integer, nullable=True)
+    retraso_ms = Column(Integer, nullable=True)
+    filas = Column(Integer, nullable=True)
+    resultado = Column(String(30), nullable=False)
+    error = Column(Text, nullable=True)
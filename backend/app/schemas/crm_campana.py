@@ -54,7 +54,7 @@ class CampanaCrmResponse(BaseModel):
     delay_entre_batches_seg: int
     cc_emails: Optional[str] = None
     tiene_adjunto: bool = False
-    destinatarios_modo: str = "todos"
+    destinatarios_modo: Optional[str] = "todos"
     fecha_creacion: Optional[datetime] = None
     fecha_actualizacion: Optional[datetime] = None
     fecha_envio_inicio: Optional[datetime] = None
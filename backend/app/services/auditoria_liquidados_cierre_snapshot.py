@@ -0,0 +1,348 @@
+"""
+Snapshot de hallazgos de cierre de préstamos LIQUIDADO (tabla auditoria_liquidados_hallazgos).
+
+`hallazgos_cierre_prestamos_liquidados` recorre toda la cartera con varias consultas pesadas; aquí se
+materializa su resultado para que la auditoría intensiva filtre por préstamo/cédula, pagine y cuente por
+código en SQL.
+
+- Refresco completo: job nocturno (03:15), POST de refresco sin préstamo o primera lectura sin snapshot.
+- Refresco puntual: POST con préstamo y, al leer, préstamos con versión nueva (prestamo_versiones) desde el
+  último refresco que hoy son LIQUIDADO o ya tienen filas en el snapshot (el resto no puede tener hallazgos
+  de cierre). Más de _MAX_PRESTAMOS_REFRESCO_PUNTUAL candidatos: la lectura sirve el snapshot marcado como
+  desactualizado y el refresco completo queda para el job o el POST. Cambios que no suben versión (p. ej.
+  finiquito_casos o un pago de otro préstamo con el mismo documento) esperan al siguiente refresco completo.
+- Meta en `configuracion` (CFG_SNAPSHOT): `calculado_desde` = mayor prestamo_versiones.actualizado_en leído
+  por el último refresco, `calculado_huella` = `huella_versiones` de la ventana bajo esa marca, fin, duración
+  y totales. actualizado_en es la hora del flush, no del commit: una transacción que confirma después de
+  avanzar la marca con un actualizado_en anterior cambia la huella, y entonces el refresco puntual relee la
+  ventana (marca - PRESTAMO_VERSIONES_MARGEN_RELECTURA_MIN, marca]. Transacciones más largas que el margen
+  esperan al siguiente refresco completo.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import delete, distinct, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.auditoria_liquidados_hallazgo import AuditoriaLiquidadosHallazgo
+from app.models.configuracion import Configuracion
+from app.models.prestamo import Prestamo
+from app.models.prestamo_version import (
+    PrestamoVersion,
+    huella_versiones,
+    margen_relectura_versiones,
+    tabla_disponible,
+    versiones_pendientes,
+)
+from app.services.auditoria_liquidados_intensiva import hallazgos_cierre_prestamos_liquidados
+from app.services.prestamo_cartera_auditoria import _upsert_config_valor
+
+logger = logging.getLogger(__name__)
+
+CFG_SNAPSHOT = "auditoria_liquidados_cierre_snapshot"
+# Más candidatos con versión nueva que esto: no se refresca al leer (las consultas puntuales usan IN).
+_MAX_PRESTAMOS_REFRESCO_PUNTUAL = 2000
+_LOTE_IN = 500
+
+# Un refresco bajo demanda por proceso: lecturas concurrentes esperan y luego leen lo ya refrescado.
+_refresco_lock = threading.Lock()
+
+
+def _cedula_busqueda(cedula: str) -> str:
+    return (cedula or "").strip().upper().replace(" ", "")
+
+
+def snapshot_disponible(db: Session) -> bool:
+    return tabla_disponible(db.connection(), AuditoriaLiquidadosHallazgo.__tablename__)
+
+
+def leer_meta_snapshot(db: Session) -> dict[str, Any]:
+    # Core (no db.get): otra sesión pudo refrescar y la identidad en caché quedaría vieja.
+    raw = db.execute(select(Configuracion.valor).where(Configuracion.clave == CFG_SNAPSHOT)).scalar()
+    try:
+        meta = json.loads(raw or "{}")
+    except json.JSONDecodeError:
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def refrescar_hallazgos_cierre(
+    db: Session,
+    *,
+    prestamo_ids: Optional[Sequence[int]] = None,
+    cubre_versiones_hasta: Optional[datetime] = None,
+    cubre_huella: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Recalcula hallazgos (todos o solo `prestamo_ids`) y reemplaza sus filas. Hace commit.
+    `cubre_versiones_hasta` / `cubre_huella`: en un refresco puntual, la marca de prestamo_versiones hasta la
+    que quedó al día (avanza `calculado_desde`); el refresco completo la avanza siempre a su propio inicio.
+    """
+    ids = sorted({int(x) for x in prestamo_ids}) if prestamo_ids is not None else None
+    # Marca leída antes del cálculo: versiones posteriores se vuelven a evaluar en la siguiente lectura.
+    desde = _max_version(db) if ids is None else None
+    huella = huella_versiones(db, desde) if desde is not None else None
+    t0 = time.perf_counter()
+    filas, _ = hallazgos_cierre_prestamos_liquidados(db, prestamo_ids=ids)
+
+    t = AuditoriaLiquidadosHallazgo.__table__
+    ahora = datetime.now(timezone.utc)
+    nuevas: list[dict[str, Any]] = []
+    for f in filas:
+        for orden, c in enumerate(f["controles"]):
+            nuevas.append(
+                {
+                    "prestamo_id": f["prestamo_id"],
+                    "codigo": c["codigo"],
+                    "orden": orden,
+                    "titulo": c["titulo"],
+                    "detalle": c.get("detalle"),
+                    "cliente_id": f["cliente_id"],
+                    "cedula": f["cedula"],
+                    "cedula_busqueda": _cedula_busqueda(f["cedula"]),
+                    "nombres": f["nombres"],
+                    "estado_prestamo": f["estado_prestamo"],
+                    "cliente_email": f["cliente_email"],
+                    "calculado_en": ahora,
+                }
+            )
+    if ids is None:
+        db.execute(delete(t))
+    else:
+        for k in range(0, len(ids), _LOTE_IN):
+            db.execute(delete(t).where(t.c.prestamo_id.in_(ids[k : k + _LOTE_IN])))
+    if nuevas:
+        db.execute(insert(t), nuevas)
+
+    ms = int((time.perf_counter() - t0) * 1000)
+    meta = leer_meta_snapshot(db)
+    if ids is None:
+        meta.update(
+            {
+                "calculado_desde": (desde or datetime.utcnow()).isoformat(),
+                "calculado_huella": huella,
+                "calculado_en": ahora.isoformat(),
+                "duracion_ms": ms,
+            }
+        )
+    else:
+        if cubre_versiones_hasta is not None and meta.get("calculado_desde"):
+            meta["calculado_desde"] = cubre_versiones_hasta.isoformat()
+            meta["calculado_huella"] = cubre_huella
+        meta["ultimo_refresco_puntual_en"] = ahora.isoformat()
+        meta["ultimo_refresco_puntual_prestamos"] = len(ids)
+    _upsert_config_valor(db, CFG_SNAPSHOT, json.dumps(meta, ensure_ascii=False))
+    db.commit()
+    logger.info(
+        "[auditoria_liquidados_cierre] refresco %s prestamos_con_hallazgo=%d hallazgos=%d ms=%d",
+        "completo" if ids is None else f"puntual n={len(ids)}",
+        len(filas),
+        len(nuevas),
+        ms,
+    )
+    return {
+        "alcance": "completo" if ids is None else "puntual",
+        "prestamos_evaluados": None if ids is None else len(ids),
+        "prestamos_con_hallazgo_cierre": len(filas),
+        "hallazgos_totales": len(nuevas),
+        "duracion_ms": ms,
+    }
+
+
+def _desde_meta(meta: dict[str, Any]) -> Optional[datetime]:
+    raw = meta.get("calculado_desde")
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(str(raw))
+    except ValueError:
+        return None
+
+
+def _max_version(db: Session) -> Optional[datetime]:
+    if not tabla_disponible(db.connection(), PrestamoVersion.__tablename__):
+        return None
+    return db.execute(select(func.max(PrestamoVersion.actualizado_en))).scalar()
+
+
+def _versiones_pendientes(db: Session, meta: dict[str, Any], desde: datetime) -> bool:
+    if not tabla_disponible(db.connection(), PrestamoVersion.__tablename__):
+        return False
+    return versiones_pendientes(db, desde, meta.get("calculado_huella"))
+
+
+def _prestamos_con_version_nueva(
+    db: Session, desde: datetime, huella_previa: Optional[str]
+) -> tuple[list[int], Optional[datetime], Optional[str]]:
+    """
+    (candidatos, hasta, huella): préstamos con versión en (desde, hasta] que son LIQUIDADO o ya están en el
+    snapshot, `hasta` = mayor actualizado_en y `huella` su `huella_versiones`, leída antes que los candidatos.
+    Si la huella bajo `desde` ya no es `huella_previa` (una transacción confirmó tarde) se relee desde
+    desde - margen; reevaluar préstamos ya al día es idempotente. A lo sumo _MAX_PRESTAMOS_REFRESCO_PUNTUAL + 1.
+    """
+    if not tabla_disponible(db.connection(), PrestamoVersion.__tablename__):
+        return [], None, None
+    v = PrestamoVersion
+    hasta = db.execute(select(func.max(v.actualizado_en))).scalar()
+    if hasta is None:
+        return [], None, None
+    huella = huella_versiones(db, hasta)
+    if huella_versiones(db, desde) != huella_previa:
+        desde = desde - margen_relectura_versiones()
+    liquidados = select(Prestamo.id).where(func.upper(func.trim(func.coalesce(Prestamo.estado, ""))) == "LIQUIDADO")
+    en_snapshot = select(AuditoriaLiquidadosHallazgo.prestamo_id)
+    pids = [
+        int(pid)
+        for pid in db.execute(
+            select(v.prestamo_id)
+            .where(
+                v.actualizado_en > desde,
+                v.actualizado_en <= hasta,
+                or_(v.prestamo_id.in_(liquidados), v.prestamo_id.in_(en_snapshot)),
+            )
+            .order_by(v.prestamo_id)
+            .limit(_MAX_PRESTAMOS_REFRESCO_PUNTUAL + 1)
+        ).scalars()
+    ]
+    return pids, hasta, huella
+
+
+def _avanzar_marca(db: Session, hasta: datetime, huella: str) -> None:
+    meta = leer_meta_snapshot(db)
+    if meta.get("calculado_desde"):
+        meta["calculado_desde"] = hasta.isoformat()
+        meta["calculado_huella"] = huella
+        _upsert_config_valor(db, CFG_SNAPSHOT, json.dumps(meta, ensure_ascii=False))
+        db.commit()
+
+
+def _poner_al_dia() -> bool:
+    """
+    Refresca en sesión propia (commit independiente del request que lee). True si el snapshot queda
+    desactualizado (demasiados candidatos: lo pone al día el job nocturno o el POST de refresco).
+    """
+    with _refresco_lock:
+        db = SessionLocal()
+        try:
+            # Otro hilo pudo refrescar mientras se esperaba el lock.
+            meta = leer_meta_snapshot(db)
+            desde = _desde_meta(meta)
+            if desde is None:
+                refrescar_hallazgos_cierre(db)
+                return False
+            pids, hasta, huella = _prestamos_con_version_nueva(db, desde, meta.get("calculado_huella"))
+            if len(pids) > _MAX_PRESTAMOS_REFRESCO_PUNTUAL:
+                logger.warning(
+                    "[auditoria_liquidados_cierre] más de %d préstamos con versión nueva: se sirve el snapshot "
+                    "desactualizado hasta el refresco completo",
+                    _MAX_PRESTAMOS_REFRESCO_PUNTUAL,
+                )
+                return True
+            if pids:
+                refrescar_hallazgos_cierre(db, prestamo_ids=pids, cubre_versiones_hasta=hasta, cubre_huella=huella)
+            elif hasta is not None:
+                # Solo cambiaron préstamos sin hallazgos posibles: basta con mover la marca.
+                _avanzar_marca(db, hasta, huella)
+            return False
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def listar_hallazgos_cierre(
+    db: Session,
+    *,
+    prestamo_id: Optional[int] = None,
+    cedula_contiene: Optional[str] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+) -> Optional[tuple[list[dict[str, Any]], dict[str, Any]]]:
+    """
+    (página de filas, resumen del filtro) desde el snapshot, con el mismo formato que
+    `hallazgos_cierre_prestamos_liquidados` + `filtrar_filas_cierre` + `paginar_filas`.
+    None si no aplica (función apagada, BD sin migración 096 o error): el llamador calcula en vivo.
+    """
+    if not getattr(settings, "AUDITORIA_LIQUIDADOS_CIERRE_SNAPSHOT", True):
+        return None
+    try:
+        if not snapshot_disponible(db):
+            return None
+        meta = leer_meta_snapshot(db)
+        desde = _desde_meta(meta)
+        desactualizado = False
+        if desde is None or _versiones_pendientes(db, meta, desde):
+            try:
+                desactualizado = _poner_al_dia()
+            except Exception as e:
+                logger.warning("[auditoria_liquidados_cierre] refresco al leer falló: %s", e)
+                if desde is None:
+                    return None
+                desactualizado = True
+            meta = leer_meta_snapshot(db)
+
+        t = AuditoriaLiquidadosHallazgo
+        conds = []
+        if prestamo_id is not None:
+            conds.append(t.prestamo_id == int(prestamo_id))
+        if cedula_contiene and str(cedula_contiene).strip():
+            conds.append(t.cedula_busqueda.contains(_cedula_busqueda(str(cedula_contiene)), autoescape=True))
+
+        n_prestamos = int(db.execute(select(func.count(distinct(t.prestamo_id))).where(*conds)).scalar() or 0)
+        conteos = {
+            str(cod): int(n)
+            for cod, n in db.execute(
+                select(t.codigo, func.count())
+                .where(*conds)
+                .group_by(t.codigo)
+                .order_by(func.min(t.orden), t.codigo)
+            )
+        }
+        pagina = select(t.prestamo_id).where(*conds).group_by(t.prestamo_id).order_by(t.prestamo_id)
+        if skip:
+            pagina = pagina.offset(max(0, int(skip)))
+        if limit is not None:
+            pagina = pagina.limit(int(limit))
+        filas = db.execute(
+            select(t).where(t.prestamo_id.in_(pagina.scalar_subquery())).order_by(t.prestamo_id, t.orden)
+        ).scalars()
+
+        out: list[dict[str, Any]] = []
+        for h in filas:
+            if not out or out[-1]["prestamo_id"] != h.prestamo_id:
+                out.append(
+                    {
+                        "prestamo_id": h.prestamo_id,
+                        "cliente_id": h.cliente_id,
+                        "cedula": h.cedula or "",
+                        "nombres": h.nombres or "",
+                        "estado_prestamo": h.estado_prestamo or "",
+                        "cliente_email": h.cliente_email or "",
+                        "tiene_alerta": True,
+                        "controles": [],
+                    }
+                )
+            out[-1]["controles"].append(
+                {"codigo": h.codigo, "titulo": h.titulo, "alerta": "SI", "detalle": h.detalle or ""}
+            )
+        resumen = {
+            "prestamos_con_hallazgo_cierre": n_prestamos,
+            "hallazgos_totales": sum(conteos.values()),
+            "conteos_por_codigo": conteos,
+            "fuente": "snapshot",
+            "snapshot_calculado_en": meta.get("calculado_en"),
+            "snapshot_desactualizado": desactualizado,
+        }
+        return out, resumen
+    except Exception as e:
+        logger.warning("[auditoria_liquidados_cierre] snapshot no disponible, cálculo en vivo: %s", e)
+        return None
@@ -3,30 +3,156 @@ Pares de numero_documento similares entre pagos operativos de prestamos LIQUIDAD
 
 Usa difflib.SequenceMatcher (ratio 0..1). Umbral por defecto 0,70: no sustituye el control de
 duplicado por doc_canon exacto; complementa capturas con errores tipograficos o variantes.
+
+Los pares por prestamo salen de app/services/documentos_similitud.pares_similares (mismo resultado que
+comparar todos los pares, sin el coste O(n^2)) y se persisten al umbral base
+(AUDITORIA_DOCS_SIMILARES_UMBRAL_BASE) junto con la firma de los documentos analizados: en cada consulta
+solo se recalculan los prestamos cuya firma cambio. El almacen se lee y escribe en sesion propia: la sesion
+del GET que consulta queda de solo lectura.
 """
 from __future__ import annotations
 
-from difflib import SequenceMatcher
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
 from typing import Any, Optional
 
-from sqlalchemy import text
+from sqlalchemy import delete, insert, select, text
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.auditoria_docs_similares import AuditoriaDocsSimilaresEstado, AuditoriaDocsSimilaresPar
+from app.models.prestamo_version import tabla_disponible
+from app.services.documentos_similitud import pares_similares
 from app.services.prestamo_cartera_auditoria import _sql_fragment_pago_excluido_cartera
 
-# Max pagos con documento por prestamo para comparar O(n^2) sin explotar CPU.
+logger = logging.getLogger(__name__)
+
+# Max pagos con documento por prestamo analizados (acota tarjetas y el peor caso del detector).
 _MAX_DOCS_POR_PRESTAMO_PAIRWISE = 100
+# Prestamos por sentencia IN al leer/escribir el almacen de pares.
+_LOTE_IN = 500
+
+# Una actualizacion del almacen por proceso: consultas concurrentes no insertan el mismo prestamo dos veces.
+_almacen_lock = threading.Lock()
+
+
+def _firma(filas: list[dict[str, Any]]) -> str:
+    h = hashlib.sha256()
+    for f in filas:
+        h.update(f"{f['pago_id']}\x1f{f['numero_documento']}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
 
+def _pares_prestamo(filas: list[dict[str, Any]], umbral: float) -> list[tuple[int, int, float]]:
+    """(pago_id_a, pago_id_b, ratio) con a antes que b en el orden de filas (p.id)."""
+    docs = [f["numero_documento"] for f in filas]
+    return [(filas[i]["pago_id"], filas[j]["pago_id"], r) for i, j, r in pares_similares(docs, umbral)]
+
+
+def _lotes(ids: list[int]):
+    for k in range(0, len(ids), _LOTE_IN):
+        yield ids[k : k + _LOTE_IN]
+
+
+def _pares_persistidos(
+    filas_por_pid: dict[int, list[dict[str, Any]]], *, purgar: bool
+) -> Optional[dict[int, list[tuple[int, int, float]]]]:
+    """
+    Pares al umbral base por prestamo, leidos del almacen y recalculados solo donde la firma cambio.
+    `purgar`: la consulta cubre todos los LIQUIDADO, se borran prestamos que ya no aplican.
+    En sesion propia (commit independiente del request que lee): la sesion del GET no escribe.
+    None si las tablas no existen o el almacen falla (el llamador calcula en vivo).
+    """
+    with _almacen_lock:
+        db = SessionLocal()
+        try:
+            return _leer_y_actualizar_almacen(db, filas_por_pid, purgar=purgar)
+        except Exception:
+            logger.exception("[auditoria_docs_similares] almacen no disponible; calculo en vivo")
+            db.rollback()
+            return None
+        finally:
+            db.close()
 
-def _norm_doc(s: str) -> str:
-    return (s or "").strip().upper()
 
+def _leer_y_actualizar_almacen(
+    db: Session, filas_por_pid: dict[int, list[dict[str, Any]]], *, purgar: bool
+) -> Optional[dict[int, list[tuple[int, int, float]]]]:
+    conn = db.connection()
+    t_par, t_est = AuditoriaDocsSimilaresPar.__table__, AuditoriaDocsSimilaresEstado.__table__
+    if not (tabla_disponible(conn, t_par.name) and tabla_disponible(conn, t_est.name)):
+        return None
+    base = float(settings.AUDITORIA_DOCS_SIMILARES_UMBRAL_BASE)
+    pids = sorted(filas_por_pid)
+    estados: dict[int, tuple[str, float]] = {}
+    for lote in _lotes(pids):
+        for pid, firma, umbral_base in db.execute(
+            select(t_est.c.prestamo_id, t_est.c.firma, t_est.c.umbral_base).where(t_est.c.prestamo_id.in_(lote))
+        ):
+            estados[int(pid)] = (firma, float(umbral_base))
+    firmas = {pid: _firma(filas_por_pid[pid]) for pid in pids}
+    # Pares guardados a un umbral <= base siguen sirviendo: se filtran por ratio al leer.
+    vigentes = [
+        pid for pid in pids
+        if pid in estados and estados[pid][0] == firmas[pid] and estados[pid][1] <= base
+    ]
+    vencidos = [pid for pid in pids if pid not in set(vigentes)]
 
-def _similitud(a: str, b: str) -> float:
-    na, nb = _norm_doc(a), _norm_doc(b)
-    if not na or not nb:
-        return 0.0
-    return float(SequenceMatcher(None, na, nb).ratio())
+    out: dict[int, list[tuple[int, int, float]]] = defaultdict(list)
+    for lote in _lotes(vigentes):
+        for pid, a, b, sim in db.execute(
+            select(t_par.c.prestamo_id, t_par.c.pago_id_a, t_par.c.pago_id_b, t_par.c.similitud).where(
+                t_par.c.prestamo_id.in_(lote)
+            )
+        ):
+            out[int(pid)].append((int(a), int(b), float(sim)))
+
+    obsoletos: list[int] = []
+    if purgar:
+        actuales = set(pids)
+        obsoletos = [
+            int(pid) for (pid,) in db.execute(select(t_est.c.prestamo_id)) if int(pid) not in actuales
+        ]
+    if not vencidos and not obsoletos:
+        return out
+
+    filas_par: list[dict[str, Any]] = []
+    filas_est: list[dict[str, Any]] = []
+    ahora = datetime.now(timezone.utc)
+    for pid in vencidos:
+        pares = _pares_prestamo(filas_por_pid[pid], base)
+        out[pid] = pares
+        filas_par.extend(
+            {"prestamo_id": pid, "pago_id_a": a, "pago_id_b": b, "similitud": r} for a, b, r in pares
+        )
+        filas_est.append(
+            {
+                "prestamo_id": pid,
+                "firma": firmas[pid],
+                "umbral_base": base,
+                "n_pagos_con_documento": len(filas_por_pid[pid]),
+                "calculado_en": ahora,
+            }
+        )
+    for lote in _lotes(vencidos + obsoletos):
+        db.execute(delete(t_par).where(t_par.c.prestamo_id.in_(lote)))
+        db.execute(delete(t_est).where(t_est.c.prestamo_id.in_(lote)))
+    if filas_par:
+        db.execute(insert(t_par), filas_par)
+    if filas_est:
+        db.execute(insert(t_est), filas_est)
+    db.commit()
+    logger.info(
+        "[auditoria_docs_similares] recalculados=%d vigentes=%d purgados=%d",
+        len(vencidos),
+        len(vigentes),
+        len(obsoletos),
+    )
+    return out
 
 
 def documentos_similares_liquidados(
@@ -88,42 +214,44 @@ def documentos_similares_liquidados(
         )
 
     min_r = max(0.5, min(1.0, float(min_ratio)))
+    # Cap: el detector evita el O(n^2), pero la tarjeta sigue acotada a los primeros pagos (p.id).
+    filas_por_pid = {
+        pid: info["filas"][:_MAX_DOCS_POR_PRESTAMO_PAIRWISE]
+        for pid, info in por_pid.items()
+        if len(info["filas"]) >= 2
+    }
+    pares_por_pid: Optional[dict[int, list[tuple[int, int, float]]]] = None
+    if min_r >= float(settings.AUDITORIA_DOCS_SIMILARES_UMBRAL_BASE):
+        pares_por_pid = _pares_persistidos(
+            filas_por_pid,
+            purgar=prestamo_id is None and not (cedula_contiene and str(cedula_contiene).strip()),
+        )
+    if pares_por_pid is None:
+        pares_por_pid = {pid: _pares_prestamo(filas, min_r) for pid, filas in filas_por_pid.items()}
+
     tarjetas: list[dict[str, Any]] = []
     total_pares = 0
 
-    for pid in sorted(por_pid.keys()):
+    for pid in sorted(filas_por_pid.keys()):
         info = por_pid[pid]
         filas = info["filas"]
-        if len(filas) < 2:
-            continue
-        # Cap para coste O(n^2)
-        filas_use = filas[:_MAX_DOCS_POR_PRESTAMO_PAIRWISE]
+        por_pago = {f["pago_id"]: f for f in filas_por_pid[pid]}
         pares: list[dict[str, Any]] = []
-        seen: set[tuple[int, int]] = set()
-        for i in range(len(filas_use)):
-            for j in range(i + 1, len(filas_use)):
-                a, b = filas_use[i], filas_use[j]
-                doc_a, doc_b = a["numero_documento"], b["numero_documento"]
-                r_sim = _similitud(doc_a, doc_b)
-                if r_sim < min_r:
-                    continue
-                # Evitar repetir el mismo par (orden estable)
-                pa, pb = sorted([a["pago_id"], b["pago_id"]])
-                key = (pa, pb)
-                if key in seen:
-                    continue
-                seen.add(key)
-                pares.append(
-                    {
-                        "pago_id_a": a["pago_id"],
-                        "pago_id_b": b["pago_id"],
-                        "numero_documento_a": doc_a,
-                        "numero_documento_b": doc_b,
-                        "similitud": round(r_sim, 4),
-                        "doc_canon_numero_a": a["doc_canon"] or None,
-                        "doc_canon_numero_b": b["doc_canon"] or None,
-                    }
-                )
+        for pago_a, pago_b, r_sim in pares_por_pid.get(pid, ()):
+            if r_sim < min_r:
+                continue
+            a, b = por_pago[pago_a], por_pago[pago_b]
+            pares.append(
+                {
+                    "pago_id_a": a["pago_id"],
+                    "pago_id_b": b["pago_id"],
+                    "numero_documento_a": a["numero_documento"],
+                    "numero_documento_b": b["numero_documento"],
+                    "similitud": round(r_sim, 4),
+                    "doc_canon_numero_a": a["doc_canon"] or None,
+                    "doc_canon_numero_b": b["doc_canon"] or None,
+                }
+            )
         if not pares:
             continue
         pares.sort(key=lambda x: (-float(x["similitud"]), x["pago_id_a"], x["pago_id_b"]))
@@ -144,6 +272,9 @@ def documentos_similares_liquidados(
         "prestamos_con_pares_similares": len(tarjetas),
         "total_pares_listados": total_pares,
         "max_pagos_analizados_por_prestamo": _MAX_DOCS_POR_PRESTAMO_PAIRWISE,
-        "metodo": "difflib.SequenceMatcher.ratio sobre numero_documento normalizado (trim + mayusculas)",
+        "metodo": (
+            "difflib.SequenceMatcher.ratio sobre numero_documento normalizado (trim + mayusculas); "
+            "pares candidatos por indice de caracteres y cotas de longitud/LCS, ratio exacto en los restantes"
+        ),
     }
     return tarjetas, resumen
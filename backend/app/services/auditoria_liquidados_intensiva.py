@@ -9,7 +9,7 @@ en otro prestamo (riesgo operativo de doble registro).
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
 from sqlalchemy import bindparam, text
 from sqlalchemy.orm import Session
@@ -189,24 +189,46 @@ def _add(
     )
 
 
-def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+def _texto_con_ids(sql: str, ids: Optional[list[int]]):
+    stmt = text(sql)
+    if ids is not None:
+        stmt = stmt.bindparams(bindparam("solo_ids", expanding=True))
+    return stmt
+
+
+def hallazgos_cierre_prestamos_liquidados(
+    db: Session,
+    *,
+    prestamo_ids: Optional[Sequence[int]] = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
     """
     Lista prestamos LIQUIDADO con al menos un hallazgo de cierre (alerta SI).
     No usa bitacora MARCAR_OK: es motor objetivo sobre tablas reales.
+    `prestamo_ids`: evalua solo esos prestamos (refresco puntual del snapshot de cierre).
     """
     excl = _sql_fragment_pago_excluido_cartera("p")
+    ids = sorted({int(x) for x in prestamo_ids}) if prestamo_ids is not None else None
+    if ids is not None and not ids:
+        return [], {"prestamos_con_hallazgo_cierre": 0, "hallazgos_totales": 0, "conteos_por_codigo": {}}
+    params: dict[str, Any] = {"solo_ids": ids} if ids is not None else {}
+
+    def solo(col: str) -> str:
+        return f" AND {col} IN :solo_ids" if ids is not None else ""
 
     por_pid: dict[int, list[dict[str, str]]] = defaultdict(list)
 
     sin_fecha = db.execute(
-        text(
-            """
+        _texto_con_ids(
+            f"""
             SELECT p.id
             FROM prestamos p
             WHERE UPPER(TRIM(COALESCE(p.estado, ''))) = 'LIQUIDADO'
               AND p.fecha_liquidado IS NULL
-            """
-        )
+              {solo("p.id")}
+            """,
+            ids,
+        ),
+        params,
     ).fetchall()
     for r in sin_fecha:
         _add(
@@ -218,17 +240,20 @@ def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, A
         )
 
     elegible_sin_finiquito = db.execute(
-        text(
-            """
+        _texto_con_ids(
+            f"""
             SELECT p.id
             FROM prestamos p
             INNER JOIN cuotas c ON c.prestamo_id = p.id
             WHERE UPPER(TRIM(COALESCE(p.estado, ''))) = 'LIQUIDADO'
+              {solo("p.id")}
             GROUP BY p.id, p.total_financiamiento
             HAVING COALESCE(SUM(COALESCE(c.total_pagado, 0)), 0) = p.total_financiamiento
               AND NOT EXISTS (SELECT 1 FROM finiquito_casos f WHERE f.prestamo_id = p.id)
-            """
-        )
+            """,
+            ids,
+        ),
+        params,
     ).fetchall()
     for r in elegible_sin_finiquito:
         _add(
@@ -240,8 +265,8 @@ def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, A
         )
 
     finiquito_desalineado = db.execute(
-        text(
-            """
+        _texto_con_ids(
+            f"""
             SELECT
               p.id,
               f.sum_total_pagado AS snap_sum,
@@ -250,6 +275,7 @@ def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, A
             FROM prestamos p
             INNER JOIN finiquito_casos f ON f.prestamo_id = p.id
             WHERE UPPER(TRIM(COALESCE(p.estado, ''))) = 'LIQUIDADO'
+              {solo("p.id")}
               AND (
                 f.total_financiamiento IS DISTINCT FROM p.total_financiamiento
                 OR ABS(
@@ -258,8 +284,10 @@ def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, A
                   - f.sum_total_pagado::numeric
                 ) > 0.02
               )
-            """
-        )
+            """,
+            ids,
+        ),
+        params,
     ).fetchall()
     for r in finiquito_desalineado:
         pid = int(r[0])
@@ -274,7 +302,7 @@ def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, A
         )
 
     dup_doc_mismo_prestamo = db.execute(
-        text(
+        _texto_con_ids(
             f"""
             SELECT DISTINCT p.prestamo_id
             FROM pagos p
@@ -283,10 +311,13 @@ def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, A
               AND p.prestamo_id IS NOT NULL
               AND TRIM(COALESCE(p.doc_canon_numero, '')) <> ''
               AND NOT ({excl})
+              {solo("p.prestamo_id")}
             GROUP BY p.prestamo_id, p.doc_canon_numero
             HAVING COUNT(*) > 1
-            """
-        )
+            """,
+            ids,
+        ),
+        params,
     ).fetchall()
     for r in dup_doc_mismo_prestamo:
         _add(
@@ -300,7 +331,7 @@ def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, A
     excl_p1 = _sql_fragment_pago_excluido_cartera("p1")
     excl_p2 = _sql_fragment_pago_excluido_cartera("p2")
     pendiente_doc_otro_prestamo = db.execute(
-        text(
+        _texto_con_ids(
             f"""
             SELECT DISTINCT p1.prestamo_id
             FROM pagos p1
@@ -316,14 +347,17 @@ def hallazgos_cierre_prestamos_liquidados(db: Session) -> tuple[list[dict[str, A
               AND NOT ({excl_p1})
               AND NOT ({excl_p2})
               AND p1.monto_pagado > 0
+              {solo("p1.prestamo_id")}
               AND (
                 NOT EXISTS (SELECT 1 FROM cuota_pagos cp WHERE cp.pago_id = p1.id)
                 OR COALESCE((
                      SELECT SUM(cp2.monto_aplicado) FROM cuota_pagos cp2 WHERE cp2.pago_id = p1.id
                    ), 0) < (p1.monto_pagado::numeric - 0.02)
               )
-            """
-        )
+            """,
+            ids,
+        ),
+        params,
     ).fetchall()
     for r in pendiente_doc_otro_prestamo:
         _add(
@@ -25,6 +25,7 @@ from app.utils.cedula_almacenamiento import (
     normalizar_cedula_almacenamiento,
     texto_cedula_comparable_bd,
 )
+from app.utils.cliente_emails import expr_email_normalizado_para_comparar
 
 logger = logging.getLogger(__name__)
 
@@ -220,7 +221,7 @@ def _cedula_por_correo(db: Session, email_raw: str) -> Optional[str]:
         rows_main = (
             db.execute(
                 select(Cliente.cedula)
-                .where(func.lower(func.trim(Cliente.email)) == em)
+                .where(expr_email_normalizado_para_comparar(Cliente.email) == em)
                 .limit(2)
             )
             .scalars()
@@ -236,7 +237,7 @@ def _cedula_por_correo(db: Session, email_raw: str) -> Optional[str]:
                 select(Cliente.cedula)
                 .where(Cliente.email_secundario.isnot(None))
                 .where(func.trim(Cliente.email_secundario) != "")
-                .where(func.lower(func.trim(Cliente.email_secundario)) == em)
+                .where(expr_email_normalizado_para_comparar(Cliente.email_secundario) == em)
                 .limit(2)
             )
             .scalars()
@@ -8,6 +8,8 @@ from typing import Any, Dict, Optional
 from datetime import datetime, timedelta
 from functools import wraps
 
+from app.core.metricas import cache_consulta, cache_tamano
+
 logger = logging.getLogger(__name__)
 
 # Intentar usar Redis
@@ -20,6 +22,7 @@ except ImportError:
 
 # Caché en memoria (fallback)
 MEMORY_CACHE: Dict[str, tuple] = {}  # {key: (value, expiry_time)}
+cache_tamano("cache_service", lambda: len(MEMORY_CACHE))
 
 
 class CacheService:
@@ -46,18 +49,22 @@ class CacheService:
         if self.use_redis and self.redis_client:
             try:
                 value = self.redis_client.get(key)
+                cache_consulta("cache_service", bool(value))
                 return json.loads(value) if value else None
             except Exception as e:
                 logger.warning("Error leyendo Redis: %s", e)
+                cache_consulta("cache_service", False)
                 return None
         else:
             # Caché en memoria
             if key in MEMORY_CACHE:
                 value, expiry = MEMORY_CACHE[key]
                 if datetime.now() < expiry:
+                    cache_consulta("cache_service", True)
                     return value
                 else:
                     del MEMORY_CACHE[key]
+            cache_consulta("cache_service", False)
             return None
     
     def set(self, key: str, value: Any, ttl_seconds: int = 300) -> bool:
@@ -161,7 +161,13 @@ def listar_candidatos_desde_drive(db: Session) -> Dict[str, Any]:
     from app.api.v1.endpoints.clientes import _normalize_for_duplicate
     from app.api.v1.endpoints.validadores import validate_cedula
 
-    rows = db.execute(select(DriveRow).order_by(DriveRow.sheet_row_number.asc())).scalars().all()
+    rows = (
+        db.execute(
+            select(DriveRow).where(DriveRow.eliminado_en.is_(None)).order_by(DriveRow.sheet_row_number.asc())
+        )
+        .scalars()
+        .all()
+    )
     cedulas_bd = db.execute(select(Cliente.cedula)).scalars().all()
     en_bd: set[str] = set()
     for c in cedulas_bd or []:
@@ -10,7 +10,7 @@ from decimal import Decimal
 from typing import Any, Optional, Sequence
 
 from fastapi import HTTPException, UploadFile
-from sqlalchemy import func
+from sqlalchemy import func, or_, text
 from sqlalchemy.orm import Session
 
 from app.models.cobranza_universo import CobranzaUniversoCedula, CobranzaUniversoDesempenoDiario
@@ -315,15 +315,14 @@ def _upsert_snapshot_hoy(
     montos: dict[str, Decimal],
     cantidades: dict[str, int],
 ) -> None:
+    existentes = {
+        r.bucket: r
+        for r in db.query(CobranzaUniversoDesempenoDiario)
+        .filter(CobranzaUniversoDesempenoDiario.fecha == hoy)
+        .all()
+    }
     for b in _BUCKET_KEYS:
-        row = (
-            db.query(CobranzaUniversoDesempenoDiario)
-            .filter(
-                CobranzaUniversoDesempenoDiario.fecha == hoy,
-                CobranzaUniversoDesempenoDiario.bucket == b,
-            )
-            .first()
-        )
+        row = existentes.get(b)
         monto = montos.get(b, Decimal("0"))
         cant = int(cantidades.get(b, 0) or 0)
         if row:
@@ -402,6 +401,151 @@ def _buckets_metricas_en_fecha(
     return montos, cants
 
 
+def _centavos(v: Any) -> int:
+    return int(round(float(v or 0) * 100))
+
+
+def _metricas_historicas_por_dia(
+    prestamo_ids: Sequence[int],
+    by_pid: dict[int, list[Any]],
+    desde: date,
+    hasta: date,
+) -> dict[date, tuple[dict[str, float], dict[str, int]]]:
+    """Mismos montos/cantidades que `_buckets_metricas_en_fecha` para cada dia historico de [desde, hasta].
+
+    Barrido por intervalos: cada cuota cuenta como vencida desde vencimiento+1 hasta el dia anterior a
+    fecha_pago (abierto si no hay pago), por el monto completo. Por prestamo, los eventos ordenados dan
+    tramos con conteo constante; cada tramo suma a su bucket en un arreglo de diferencias por dia.
+    O(cuotas log cuotas + dias) en lugar de O(dias x cuotas). No aplica a hoy (usa saldo y estado vivos).
+    """
+    n_dias = (hasta - desde).days + 1
+    if n_dias <= 0:
+        return {}
+    fin_ventana = hasta + timedelta(days=1)
+    dif_cant = {b: [0] * (n_dias + 1) for b in _BUCKET_KEYS}
+    dif_cent = {b: [0] * (n_dias + 1) for b in _BUCKET_KEYS}
+    for pid in prestamo_ids:
+        eventos: list[tuple[date, int, int]] = []
+        for c in by_pid.get(pid, []):
+            if c.fecha_vencimiento is None:
+                continue
+            ini = c.fecha_vencimiento + timedelta(days=1)
+            fin = c.fecha_pago
+            if ini >= fin_ventana or (fin is not None and (fin <= ini or fin <= desde)):
+                continue
+            cent = _centavos(c.monto)
+            eventos.append((max(ini, desde), 1, cent))
+            if fin is not None and fin < fin_ventana:
+                eventos.append((fin, -1, -cent))
+        if not eventos:
+            continue
+        eventos.sort(key=lambda e: e[0])
+        n = 0
+        saldo = 0
+        i = 0
+        while i < len(eventos):
+            dia = eventos[i][0]
+            while i < len(eventos) and eventos[i][0] == dia:
+                n += eventos[i][1]
+                saldo += eventos[i][2]
+                i += 1
+            b = _bucket_clave(n)
+            if not b:
+                continue
+            a = (dia - desde).days
+            e = ((eventos[i][0] if i < len(eventos) else fin_ventana) - desde).days
+            dif_cant[b][a] += 1
+            dif_cant[b][e] -= 1
+            dif_cent[b][a] += saldo
+            dif_cent[b][e] -= saldo
+
+    out: dict[date, tuple[dict[str, float], dict[str, int]]] = {}
+    acc_cant = {b: 0 for b in _BUCKET_KEYS}
+    acc_cent = {b: 0 for b in _BUCKET_KEYS}
+    for k in range(n_dias):
+        for b in _BUCKET_KEYS:
+            acc_cant[b] += dif_cant[b][k]
+            acc_cent[b] += dif_cent[b][k]
+        out[desde + timedelta(days=k)] = (
+            {b: acc_cent[b] / 100 for b in _BUCKET_KEYS},
+            dict(acc_cant),
+        )
+    return out
+
+
+_SQL_METRICAS_HISTORICAS_PG = text(
+    """
+    WITH dias AS (
+        SELECT CAST(g AS date) AS dia
+        FROM generate_series(CAST(:desde AS date), CAST(:hasta AS date), interval '1 day') AS g
+    ),
+    por_prestamo AS (
+        SELECT d.dia, c.prestamo_id, COUNT(*) AS n, SUM(c.monto_cuota) AS saldo
+        FROM dias d
+        JOIN cuotas c
+          ON c.fecha_vencimiento < d.dia
+         AND (c.fecha_pago IS NULL OR c.fecha_pago > d.dia)
+        JOIN prestamos p ON p.id = c.prestamo_id
+        WHERE upper(trim(coalesce(p.estado, ''))) = 'APROBADO'
+          AND c.fecha_vencimiento < CAST(:hasta AS date)
+          AND (c.fecha_pago IS NULL OR c.fecha_pago > CAST(:desde AS date))
+        GROUP BY d.dia, c.prestamo_id
+    )
+    SELECT dia,
+           CASE WHEN n >= 4 THEN '4plus' ELSE CAST(n AS text) END AS bucket,
+           COUNT(*) AS cantidad,
+           COALESCE(SUM(saldo), 0) AS monto
+    FROM por_prestamo
+    GROUP BY 1, 2
+    """
+)
+
+
+def _metricas_historicas_por_dia_sql(
+    db: Session, desde: date, hasta: date
+) -> dict[date, tuple[dict[str, float], dict[str, int]]]:
+    """Equivalente PostgreSQL de `_metricas_historicas_por_dia` (generate_series), para prestamos APROBADO."""
+    if hasta < desde:
+        return {}
+    out: dict[date, tuple[dict[str, float], dict[str, int]]] = {}
+    for k in range((hasta - desde).days + 1):
+        out[desde + timedelta(days=k)] = ({b: 0.0 for b in _BUCKET_KEYS}, {b: 0 for b in _BUCKET_KEYS})
+    for dia, bucket, cantidad, monto in db.execute(
+        _SQL_METRICAS_HISTORICAS_PG, {"desde": desde, "hasta": hasta}
+    ).all():
+        punto = out.get(dia)
+        if punto is None or bucket not in punto[1]:
+            continue
+        punto[0][bucket] = round(float(monto or 0), 2)
+        punto[1][bucket] = int(cantidad or 0)
+    return out
+
+
+def _metricas_por_dia(
+    db: Session,
+    prestamo_ids: Sequence[int],
+    by_pid: dict[int, list[Any]],
+    dias: Sequence[date],
+    hoy: date,
+) -> dict[date, tuple[dict[str, float], dict[str, int]]]:
+    """Metricas por bucket para `dias`: historicos en una pasada (SQL en PostgreSQL), hoy con saldo vivo."""
+    historicos = [d for d in dias if d < hoy]
+    out: dict[date, tuple[dict[str, float], dict[str, int]]] = {}
+    if historicos:
+        desde, hasta = min(historicos), max(historicos)
+        if _usar_sql_historico(db):
+            out.update(_metricas_historicas_por_dia_sql(db, desde, hasta))
+        else:
+            out.update(_metricas_historicas_por_dia(prestamo_ids, by_pid, desde, hasta))
+    if hoy in dias:
+        out[hoy] = _buckets_metricas_en_fecha(prestamo_ids, by_pid, hoy, hoy)
+    return out
+
+
+def _usar_sql_historico(db: Session) -> bool:
+    return (db.get_bind().dialect.name or "").lower() == "postgresql"
+
+
 def _punto_serie_vacio(d: date) -> dict[str, Any]:
     return {
         "fecha": d,
@@ -437,18 +581,16 @@ def _serie_diaria_30_vacia(hoy: date) -> list[dict[str, Any]]:
     return [_punto_serie_vacio(hoy - timedelta(days=29 - i)) for i in range(30)]
 
 
+def _fechas_serie_30(hoy: date) -> list[date]:
+    return [hoy - timedelta(days=29 - i) for i in range(30)]
+
+
 def _serie_diaria_30_desde_universo(
-    prestamo_ids: Sequence[int],
-    by_pid: dict[int, list[Cuota]],
+    metricas: dict[date, tuple[dict[str, float], dict[str, int]]],
     hoy: date,
 ) -> list[dict[str, Any]]:
-    """Reconstruye 30 dias (hoy-29..hoy): montos USD y cantidad de prestamos."""
-    serie: list[dict[str, Any]] = []
-    for i in range(30):
-        dia = hoy - timedelta(days=29 - i)
-        montos, cants = _buckets_metricas_en_fecha(prestamo_ids, by_pid, dia, hoy)
-        serie.append(_punto_serie_desde_metricas(dia, montos, cants))
-    return serie
+    """Reconstruye 30 dias (hoy-29..hoy): montos USD y cantidad de prestamos (ver `_metricas_por_dia`)."""
+    return [_punto_serie_desde_metricas(dia, *metricas[dia]) for dia in _fechas_serie_30(hoy)]
 
 
 def _pct_var(actual: float, base: float) -> Optional[float]:
@@ -482,16 +624,11 @@ def _etiqueta_lectura(d: date, hoy: date) -> str:
 
 
 def _lecturas_lunes_desempeno(
-    prestamo_ids: Sequence[int],
-    by_pid: dict[int, list[Cuota]],
+    metricas: dict[date, tuple[dict[str, float], dict[str, int]]],
     hoy: date,
 ) -> dict[str, Any]:
     """Cantidades y montos por bucket en 4 lunes previos + hoy. Sin deltas."""
-    fechas = _fechas_4_lunes_mas_hoy(hoy)
-    snaps: list[tuple[date, dict[str, float], dict[str, int]]] = []
-    for dia in fechas:
-        montos, cants = _buckets_metricas_en_fecha(prestamo_ids, by_pid, dia, hoy)
-        snaps.append((dia, montos, cants))
+    snaps = [(dia, *metricas[dia]) for dia in _fechas_4_lunes_mas_hoy(hoy)]
 
     columnas = [
         {
@@ -556,9 +693,29 @@ def analizar_universo(db: Session) -> dict[str, Any]:
         "fuente": "bd_completa",
     }
     pids = [p.id for p in prestamos]
-    by_pid: dict[int, list[Cuota]] = defaultdict(list)
+    dias_metricas = sorted(set(_fechas_serie_30(hoy)) | set(_fechas_4_lunes_mas_hoy(hoy)))
+    # Solo columnas y solo cuotas que pueden contar: vencidas antes de hoy y, o impagas por monto
+    # (tarjetas de hoy), o con pago posterior al inicio de la ventana (historico en Python).
+    filtro_cuenta = or_(func.coalesce(Cuota.total_pagado, 0) < Cuota.monto, Cuota.monto <= 0)
+    if not _usar_sql_historico(db):
+        filtro_cuenta = or_(
+            filtro_cuenta, Cuota.fecha_pago.is_(None), Cuota.fecha_pago > dias_metricas[0]
+        )
+    by_pid: dict[int, list[Any]] = defaultdict(list)
     if pids:
-        for c in db.query(Cuota).filter(Cuota.prestamo_id.in_(pids)).all():
+        for c in (
+            db.query(
+                Cuota.prestamo_id,
+                Cuota.monto,
+                Cuota.total_pagado,
+                Cuota.fecha_vencimiento,
+                Cuota.fecha_pago,
+            )
+            .join(Prestamo, Prestamo.id == Cuota.prestamo_id)
+            .filter(expr_prestamo_activo_cobranzas(), Cuota.fecha_vencimiento < hoy, filtro_cuenta)
+            .order_by(Cuota.prestamo_id, Cuota.fecha_vencimiento, Cuota.id)
+            .all()
+        ):
             by_pid[c.prestamo_id].append(c)
 
     montos_snap: dict[str, Decimal] = {k: Decimal("0") for k in _BUCKET_KEYS}
@@ -604,13 +761,14 @@ def analizar_universo(db: Session) -> dict[str, Any]:
 
     _upsert_snapshot_hoy(db, hoy, montos_snap, cant_snap)
 
-    serie = _serie_diaria_30_desde_universo(pids, by_pid, hoy)
+    metricas = _metricas_por_dia(db, pids, by_pid, dias_metricas, hoy)
+    serie = _serie_diaria_30_desde_universo(metricas, hoy)
 
     meta["cantidad"] = len(prestamos)
     return {
         "buckets": buckets,
         "sin_vencidas": sin_vencidas,
         "serie_diaria": serie,
-        "desempeno_lecturas": _lecturas_lunes_desempeno(pids, by_pid, hoy),
+        "desempeno_lecturas": _lecturas_lunes_desempeno(metricas, hoy),
         "meta": meta,
     }
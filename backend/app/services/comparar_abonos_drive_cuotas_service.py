@@ -181,6 +181,22 @@ def _norm_lote_param(raw: Optional[str]) -> Optional[str]:
     return _norm_lote_celda(s)
 
 
+def _total_pagado_cuotas_prestamo(db: Session, prestamo_id: int) -> float:
+    """SUM(cuotas.total_pagado) del préstamo; desde prestamo_saldos si la lectura por resumen está activa."""
+    from app.services.prestamo_saldos import leer_prestamo_saldos, lectura_resumen_habilitada
+
+    if lectura_resumen_habilitada():
+        fila = leer_prestamo_saldos(db, [prestamo_id]).get(int(prestamo_id))
+        if fila is not None:
+            return _to_float_cuota_total(fila["total_pagado"])
+    total_row = db.execute(
+        select(func.coalesce(func.sum(Cuota.total_pagado), 0)).where(
+            Cuota.prestamo_id == prestamo_id
+        )
+    ).scalar_one()
+    return _to_float_cuota_total(total_row)
+
+
 def comparar_abonos_drive_vs_cuotas(
     db: Session,
     *,
@@ -204,12 +220,7 @@ def comparar_abonos_drive_vs_cuotas(
     if clave_param and clave_prest and clave_param != clave_prest:
         raise ValueError("La cédula no coincide con el préstamo indicado.")
 
-    total_row = db.execute(
-        select(func.coalesce(func.sum(Cuota.total_pagado), 0)).where(
-            Cuota.prestamo_id == prestamo_id
-        )
-    ).scalar_one()
-    total_pagado_cuotas = _to_float_cuota_total(total_row)
+    total_pagado_cuotas = _total_pagado_cuotas_prestamo(db, prestamo_id)
 
     meta = get_conciliacion_sheet_meta(db)
     headers: List[str] = list(meta.headers) if meta and meta.headers else []
@@ -258,7 +269,9 @@ def comparar_abonos_drive_vs_cuotas(
     if ced_key:
         clave = clave_param or normalizar_cedula_clave_cupo(cedula_in)
         sheet_rows = db.execute(
-            select(ConciliacionSheetRow).order_by(ConciliacionSheetRow.row_index)
+            select(ConciliacionSheetRow)
+            .where(ConciliacionSheetRow.eliminado_en.is_(None))
+            .order_by(ConciliacionSheetRow.row_index)
         ).scalars().all()
         for sr in sheet_rows:
             cells = sr.cells or {}
@@ -466,12 +479,7 @@ def referencia_abonos_notificaciones_general(
         raise ValueError("Préstamo no encontrado.")
 
     cedula_in = (prestamo.cedula or "").strip()
-    total_row = db.execute(
-        select(func.coalesce(func.sum(Cuota.total_pagado), 0)).where(
-            Cuota.prestamo_id == prestamo_id
-        )
-    ).scalar_one()
-    total_pagado_cuotas = _to_float_cuota_total(total_row)
+    total_pagado_cuotas = _total_pagado_cuotas_prestamo(db, prestamo_id)
 
     raw_cache = prestamo.abonos_drive_cuotas_cache
     cache_at = getattr(prestamo, "abonos_drive_cuotas_cache_at", None)
@@ -137,7 +137,9 @@ class ConciliacionSheetLookupContext:
         if ced_key:
             sheet_rows = (
                 db.execute(
-                    select(ConciliacionSheetRow).order_by(ConciliacionSheetRow.row_index)
+                    select(ConciliacionSheetRow)
+                    .where(ConciliacionSheetRow.eliminado_en.is_(None))
+                    .order_by(ConciliacionSheetRow.row_index)
                 )
                 .scalars()
                 .all()
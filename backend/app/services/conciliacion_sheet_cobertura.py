@@ -89,9 +89,10 @@ def compute_scan_coverage_from_db(db: Session) -> Dict[str, Any]:
     row_count_meta = int(meta.row_count or 0) if meta else 0
     expected_last = header_row + row_count_meta if row_count_meta > 0 else header_row
 
-    max_row = db.scalar(select(func.max(DriveRow.sheet_row_number)))
-    min_row = db.scalar(select(func.min(DriveRow.sheet_row_number)))
-    drive_count = int(db.scalar(select(func.count()).select_from(DriveRow)) or 0)
+    vigente = DriveRow.eliminado_en.is_(None)
+    max_row = db.scalar(select(func.max(DriveRow.sheet_row_number)).where(vigente))
+    min_row = db.scalar(select(func.min(DriveRow.sheet_row_number)).where(vigente))
+    drive_count = int(db.scalar(select(func.count()).select_from(DriveRow).where(vigente)) or 0)
 
     max_row_i = int(max_row) if max_row is not None else None
     min_row_i = int(min_row) if min_row is not None else None
@@ -235,7 +236,7 @@ def probe_google_sheet_tail_row(
     columns_range = (getattr(settings, "CONCILIACION_SHEET_COLUMNS_RANGE", None) or "A:S").strip()
     meta = get_conciliacion_sheet_meta(db)
     header_row = int(meta.header_row_index or 1) if meta else 1
-    hint = db.scalar(select(func.max(DriveRow.sheet_row_number)))
+    hint = db.scalar(select(func.max(DriveRow.sheet_row_number)).where(DriveRow.eliminado_en.is_(None)))
     hint_i = int(hint) if hint is not None else header_row + int(meta.row_count or 0) if meta else header_row
 
     row_start = max(header_row + 1, hint_i - TAIL_PROBE_ROWS_ABOVE)
@@ -3,20 +3,30 @@ Sincroniza la pestaña CONCILIACIÓN de un Google Spreadsheet hacia PostgreSQL (
 Solo lee el rango de columnas configurado (por defecto A:S, anclado a fila 1); el resto de la hoja se ignora.
 La fila de cabecera se detecta buscando CONCILIACION_SHEET_HEADER_MARKER en las primeras columnas del rango (no solo A).
 Credenciales: get_google_credentials (OAuth / cuenta de servicio desde Informe de pagos) o pipeline Gmail.
+
+Escritura incremental: cada fila lleva row_hash (sha256 de su contenido); solo se insertan/reescriben filas
+nuevas o con hash distinto y las que ya no vienen en la hoja quedan con eliminado_en (baja lógica, sin DELETE
+masivo: los lectores nunca ven la tabla vacía). Cada alta/cambio/baja se anota en conciliacion_sheet_cambios
+con la cédula (columna E) antes y después, para que los jobs posteriores recalculen solo lo afectado
+(`cedulas_cambiadas_en_run`). La clave sigue siendo el número de fila: insertar filas a mitad de la hoja
+desplaza las siguientes y se registran como cambios.
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import time
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from sqlalchemy import delete, desc, func, select
+from sqlalchemy import delete, desc, func, insert, select, update
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import BUSINESS_TIMEZONE
 from app.models.conciliacion_sheet import (
+    ConciliacionSheetCambio,
     ConciliacionSheetMeta,
     ConciliacionSheetRow,
     ConciliacionSheetSyncRun,
@@ -39,6 +49,15 @@ MAX_SCAN_ROWS_FOR_HEADER = 80
 # Columnas del rango leído (índice 0 = primera letra del rango, p. ej. A) donde se busca el marcador de cabecera.
 MAX_HEADER_MARKER_COL_SCAN = 26
 
+# Tipos en conciliacion_sheet_cambios.
+CAMBIO_ALTA = "alta"
+CAMBIO_MODIFICACION = "cambio"
+CAMBIO_BAJA = "baja"
+# Filas por sentencia en inserciones/actualizaciones masivas del snapshot.
+_LOTE_ESCRITURA = 400
+# Días que se conserva el change set por corrida.
+_CAMBIOS_RETENCION_DIAS = 30
+
 
 def _build_sheets_service(creds: Any) -> Any:
     """
@@ -449,10 +468,171 @@ def fetch_sheet_values_slice(
     return exact_title, trimmed, ncols
 
 
+def _hash_contenido(valor: Any) -> str:
+    """sha256 del JSON canónico (claves ordenadas, sin espacios) del contenido de una fila."""
+    canon = json.dumps(valor, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+def _cedula_corta(v: Optional[str]) -> Optional[str]:
+    """Cédula tal como viene en la columna E (drive.col_e), acotada al ancho de conciliacion_sheet_cambios."""
+    return v[:40] if v else None
+
+
+def _en_lotes(filas: List[Any]) -> Iterable[List[Any]]:
+    for i in range(0, len(filas), _LOTE_ESCRITURA):
+        yield filas[i : i + _LOTE_ESCRITURA]
+
+
+def _aplicar_snapshot_incremental(
+    db: Session,
+    filas: Iterable[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+    *,
+    now: datetime,
+    run_id: int,
+) -> Dict[str, int]:
+    """
+    Compara `filas` (sheet_row_number, cells, col_a..col_s) con lo guardado por row_hash: inserta las nuevas,
+    reescribe solo las que cambiaron (o vuelven tras una baja), marca eliminado_en en las que ya no vienen y
+    anota cada alta/cambio/baja en conciliacion_sheet_cambios. No hace commit.
+    """
+    previas_sheet = {
+        n: (h, el)
+        for n, h, el in db.execute(
+            select(ConciliacionSheetRow.row_index, ConciliacionSheetRow.row_hash, ConciliacionSheetRow.eliminado_en)
+        ).all()
+    }
+    previas_drive = {
+        n: (h, el, ced)
+        for n, h, el, ced in db.execute(
+            select(DriveRow.sheet_row_number, DriveRow.row_hash, DriveRow.eliminado_en, DriveRow.col_e)
+        ).all()
+    }
+
+    ins_sheet: List[Dict[str, Any]] = []
+    upd_sheet: List[Dict[str, Any]] = []
+    ins_drive: List[Dict[str, Any]] = []
+    upd_drive: List[Dict[str, Any]] = []
+    cambios: List[Dict[str, Any]] = []
+    vistas: Set[int] = set()
+    nuevas = modificadas = sin_cambio = 0
+    for n, cells, drive_kwargs in filas:
+        vistas.add(n)
+        h_sheet = _hash_contenido(cells)
+        h_drive = _hash_contenido([drive_kwargs.get(c) for c in DRIVE_COLUMN_NAMES])
+        ps = previas_sheet.get(n)
+        pd = previas_drive.get(n)
+        sheet_activa = ps is not None and ps[1] is None
+        drive_activa = pd is not None and pd[1] is None
+        sheet_igual = sheet_activa and ps[0] == h_sheet
+        drive_igual = drive_activa and pd[0] == h_drive
+        if sheet_igual and drive_igual:
+            sin_cambio += 1
+            continue
+        if not sheet_igual:
+            fila_sheet = {"row_index": n, "cells": cells, "row_hash": h_sheet, "eliminado_en": None}
+            (upd_sheet if ps is not None else ins_sheet).append(fila_sheet)
+        if not drive_igual:
+            fila_drive = {
+                "sheet_row_number": n,
+                "synced_at": now,
+                "row_hash": h_drive,
+                "eliminado_en": None,
+                **drive_kwargs,
+            }
+            (upd_drive if pd is not None else ins_drive).append(fila_drive)
+        previa_activa = sheet_activa or drive_activa
+        if previa_activa:
+            modificadas += 1
+        else:
+            nuevas += 1
+        cambios.append(
+            {
+                "run_id": run_id,
+                "sheet_row_number": n,
+                "tipo": CAMBIO_MODIFICACION if previa_activa else CAMBIO_ALTA,
+                "cedula": _cedula_corta(drive_kwargs.get("col_e")),
+                "cedula_anterior": _cedula_corta(pd[2]) if drive_activa else None,
+                "creado_en": now,
+            }
+        )
+
+    bajas = sorted(
+        n
+        for n in set(previas_sheet) | set(previas_drive)
+        if n not in vistas
+        and (
+            (n in previas_sheet and previas_sheet[n][1] is None)
+            or (n in previas_drive and previas_drive[n][1] is None)
+        )
+    )
+    for n in bajas:
+        pd = previas_drive.get(n)
+        cambios.append(
+            {
+                "run_id": run_id,
+                "sheet_row_number": n,
+                "tipo": CAMBIO_BAJA,
+                "cedula": None,
+                "cedula_anterior": _cedula_corta(pd[2]) if pd else None,
+                "creado_en": now,
+            }
+        )
+
+    for modelo, inserts, updates in (
+        (ConciliacionSheetRow, ins_sheet, upd_sheet),
+        (DriveRow, ins_drive, upd_drive),
+    ):
+        for lote in _en_lotes(inserts):
+            db.execute(insert(modelo), lote)
+        for lote in _en_lotes(updates):
+            db.execute(update(modelo), lote)
+    for lote in _en_lotes(bajas):
+        for modelo, pk in ((ConciliacionSheetRow, ConciliacionSheetRow.row_index), (DriveRow, DriveRow.sheet_row_number)):
+            db.execute(
+                update(modelo)
+                .where(pk.in_(lote), modelo.eliminado_en.is_(None))
+                .values(eliminado_en=now)
+                .execution_options(synchronize_session=False)
+            )
+    for lote in _en_lotes(cambios):
+        db.execute(insert(ConciliacionSheetCambio), lote)
+    db.execute(
+        delete(ConciliacionSheetCambio).where(
+            ConciliacionSheetCambio.creado_en < now - timedelta(days=_CAMBIOS_RETENCION_DIAS)
+        )
+    )
+    return {
+        "filas_nuevas": nuevas,
+        "filas_modificadas": modificadas,
+        "filas_eliminadas": len(bajas),
+        "filas_sin_cambio": sin_cambio,
+    }
+
+
+def cedulas_cambiadas_en_run(db: Session, run_id: int) -> Optional[Set[str]]:
+    """
+    Cédulas (columna E, antes y después) de las filas con alta/cambio/baja en la corrida `run_id`.
+    None si la corrida no existe o no registró change set (fallida o anterior al sync incremental):
+    el consumidor debe hacer su pasada completa.
+    """
+    run = db.get(ConciliacionSheetSyncRun, int(run_id))
+    if run is None or not run.success or run.filas_nuevas is None:
+        return None
+    out: Set[str] = set()
+    for ced, ced_ant in db.execute(
+        select(ConciliacionSheetCambio.cedula, ConciliacionSheetCambio.cedula_anterior).where(
+            ConciliacionSheetCambio.run_id == int(run_id)
+        )
+    ).all():
+        out.update(c for c in (ced, ced_ant) if c)
+    return out
+
+
 def run_sync_to_db(db: Session) -> Dict[str, Any]:
     """
-    Descarga la pestaña configurada y reemplaza conciliacion_sheet_rows.
-    Registra conciliacion_sheet_sync_run (una fila por ejecución).
+    Descarga la pestaña configurada y actualiza conciliacion_sheet_rows / drive de forma incremental.
+    Registra conciliacion_sheet_sync_run (una fila por ejecución, con conteo de altas/cambios/bajas).
     """
     spreadsheet_id = (getattr(settings, "CONCILIACION_SHEET_SPREADSHEET_ID", None) or "").strip()
     if not spreadsheet_id:
@@ -568,31 +748,18 @@ def run_sync_to_db(db: Session) -> Dict[str, Any]:
             meta = ConciliacionSheetMeta(id=1)
             db.add(meta)
 
-        db.execute(delete(ConciliacionSheetRow))
-        db.execute(delete(DriveRow))
-        batch: List[ConciliacionSheetRow] = []
-        batch_drive: List[DriveRow] = []
-        for offset, row in enumerate(data_rows):
-            sheet_row_number = h_idx + 2 + offset
-            cells = _row_to_cells(headers, _trim_row_width(row or [], ncols_expected))
-            batch.append(ConciliacionSheetRow(row_index=sheet_row_number, cells=cells))
-            batch_drive.append(
-                DriveRow(
-                    sheet_row_number=sheet_row_number,
-                    synced_at=now,
-                    **_drive_kwargs_from_row(row, ncols_expected),
-                )
+        run = ConciliacionSheetSyncRun(started_at=started, success=False, message="en curso")
+        db.add(run)
+        db.flush()
+        filas_snapshot = (
+            (
+                h_idx + 2 + offset,
+                _row_to_cells(headers, _trim_row_width(row or [], ncols_expected)),
+                _drive_kwargs_from_row(row, ncols_expected),
             )
-            if len(batch) >= 400:
-                db.add_all(batch)
-                db.add_all(batch_drive)
-                db.flush()
-                batch.clear()
-                batch_drive.clear()
-        if batch:
-            db.add_all(batch)
-        if batch_drive:
-            db.add_all(batch_drive)
+            for offset, row in enumerate(data_rows)
+        )
+        conteo = _aplicar_snapshot_incremental(db, filas_snapshot, now=now, run_id=run.id)
 
         meta.spreadsheet_id = spreadsheet_id
         meta.sheet_title = sheet_title
@@ -604,16 +771,15 @@ def run_sync_to_db(db: Session) -> Dict[str, Any]:
         meta.last_error = None
         meta.updated_at = now
 
-        run = ConciliacionSheetSyncRun(
-            started_at=started,
-            finished_at=now,
-            success=True,
-            message="OK",
-            row_count=len(data_rows),
-            col_count=col_count,
-            duration_ms=int((time.perf_counter() - t0) * 1000),
-        )
-        db.add(run)
+        run.finished_at = now
+        run.success = True
+        run.message = "OK"
+        run.row_count = len(data_rows)
+        run.col_count = col_count
+        run.duration_ms = int((time.perf_counter() - t0) * 1000)
+        run.filas_nuevas = conteo["filas_nuevas"]
+        run.filas_modificadas = conteo["filas_modificadas"]
+        run.filas_eliminadas = conteo["filas_eliminadas"]
         db.commit()
         db.refresh(run)
 
@@ -643,11 +809,15 @@ def run_sync_to_db(db: Session) -> Dict[str, Any]:
 
         logger.info(
             "[conciliacion_sheet] run_sync_to_db OK run_id=%s filas=%s cols=%s drive_filas=%s "
-            "ultima_fila_datos=%s duracion_ms=%s",
+            "nuevas=%s modificadas=%s eliminadas=%s sin_cambio=%s ultima_fila_datos=%s duracion_ms=%s",
             run.id,
             len(data_rows),
             col_count,
             len(data_rows),
+            conteo["filas_nuevas"],
+            conteo["filas_modificadas"],
+            conteo["filas_eliminadas"],
+            conteo["filas_sin_cambio"],
             last_data_sheet_row,
             run.duration_ms,
         )
@@ -659,6 +829,7 @@ def run_sync_to_db(db: Session) -> Dict[str, Any]:
             "row_count": len(data_rows),
             "col_count": col_count,
             "drive_rows": len(data_rows),
+            **conteo,
             "last_data_sheet_row_number": last_data_sheet_row,
             "column_a_last_row": column_a_last_row,
             "sync_end_row": sync_end_row,
@@ -812,7 +983,10 @@ def build_conciliacion_sheet_diagnostico(db: Session) -> Dict[str, Any]:
         )
 
     n_rows = int(
-        db.execute(select(func.count()).select_from(ConciliacionSheetRow)).scalar_one() or 0
+        db.execute(
+            select(func.count()).select_from(ConciliacionSheetRow).where(ConciliacionSheetRow.eliminado_en.is_(None))
+        ).scalar_one()
+        or 0
     )
     ok_rows = n_rows > 0
     checks.append(
@@ -827,7 +1001,10 @@ def build_conciliacion_sheet_diagnostico(db: Session) -> Dict[str, Any]:
             "Ejecute POST /api/v1/conciliacion-sheet/sync-now (sesión) o /sync (cron) tras configurar credenciales."
         )
 
-    n_drive = int(db.execute(select(func.count()).select_from(DriveRow)).scalar_one() or 0)
+    n_drive = int(
+        db.execute(select(func.count()).select_from(DriveRow).where(DriveRow.eliminado_en.is_(None))).scalar_one()
+        or 0
+    )
     ok_drive = n_drive == n_rows
     checks.append(
         {
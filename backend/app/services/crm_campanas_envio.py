@@ -0,0 +1,515 @@
+"""
+Envío reanudable de campañas CRM.
+
+Antes: `_run_envio_lotes` resolvía todos los destinatarios en memoria (escaneo completo de clientes) y
+enviaba en un hilo; parar era definitivo y un reinicio perdía el avance.
+
+Ahora el envío es un pipeline sobre `crm_campana_destinatario`:
+1. Materialización por tramos (`CRM_CAMPANA_MATERIALIZAR_CHUNK` clientes por transacción) con cursor por
+   cliente_id en `crm_campana.destinatarios_cursor`. Modo "todos": inserta filas desde clientes;
+   modo "seleccion": resuelve correos de las filas ya elegidas. Dedupe global de direcciones igual que antes.
+2. Claim por lote con `FOR UPDATE SKIP LOCKED` (pendiente -> enviando); cada destinatario queda en
+   enviado/fallido/omitido en su propia transacción junto con su fila en crm_campana_envio.
+3. Antes de cada correo se relee `crm_campana.estado`: parar (cancelada) surte efecto inmediato y los
+   destinatarios reclamados vuelven a pendiente. `reanudar` continúa desde donde quedó.
+4. Claims huérfanos (proceso caído) se recuperan si `reclamado_en` es más viejo que
+   `CRM_CAMPANA_CLAIM_STALE_MIN`: si ya hay fila en crm_campana_envio de la corrida actual (desde
+   `fecha_envio_inicio`) se toma ese resultado; si no, pendiente.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.cliente import Cliente
+from app.models.crm_campana import CampanaCrm
+from app.models.crm_campana_destinatario import CampanaDestinatarioCrm
+from app.models.crm_campana_envio import CampanaEnvioCrm
+from app.utils.cliente_emails import emails_destino_cliente, unir_destinatarios_log
+
+logger = logging.getLogger(__name__)
+
+MODO_TODOS = "todos"
+MODO_SELECCION = "seleccion"
+
+DEST_PENDIENTE = "pendiente"
+DEST_ENVIANDO = "enviando"
+DEST_ENVIADO = "enviado"
+DEST_FALLIDO = "fallido"
+DEST_OMITIDO = "omitido"
+
+_DEFAULT_CHUNK = 2000
+_DEFAULT_CLAIM_STALE_MIN = 10
+
+
+def _email_valido(s: str) -> bool:
+    s = (s or "").strip()
+    return bool(s and "@" in s and "." in s.split("@")[-1])
+
+
+def _setting_int(nombre: str, default: int, minimo: int) -> int:
+    try:
+        from app.core.config import settings
+
+        return max(minimo, int(getattr(settings, nombre, default)))
+    except Exception:
+        return default
+
+
+def _correos_nuevos(email: Optional[str], email_sec: Optional[str], seen: set) -> List[str]:
+    """Correos válidos del cliente aún no asignados a otro cliente de la campaña (actualiza `seen`)."""
+    if not email or not _email_valido(email.strip()):
+        return []
+    tos = [e for e in emails_destino_cliente(email, email_sec) if _email_valido(e)]
+    tos = [e for e in tos if e.strip().lower() not in seen]
+    for e in tos:
+        seen.add(e.strip().lower())
+    return tos
+
+
+def modo_destinatarios(db: Session, campana: CampanaCrm) -> str:
+    """Modo persistido; en campañas anteriores a la columna se infiere por existencia de filas."""
+    modo = (getattr(campana, "destinatarios_modo", None) or "").strip()
+    if modo in (MODO_TODOS, MODO_SELECCION):
+        return modo
+    hay = db.scalar(
+        select(CampanaDestinatarioCrm.id).where(CampanaDestinatarioCrm.campana_id == campana.id).limit(1)
+    )
+    return MODO_SELECCION if hay else MODO_TODOS
+
+
+def _emails_ya_asignados(db: Session, campana_id: int) -> set:
+    """Al reanudar la materialización, reconstruye el dedupe global con los correos ya resueltos."""
+    seen: set = set()
+    rows = db.execute(
+        select(CampanaDestinatarioCrm.emails).where(
+            CampanaDestinatarioCrm.campana_id == campana_id,
+            CampanaDestinatarioCrm.emails.isnot(None),
+        )
+    ).scalars()
+    for emails in rows:
+        for e in (emails or "").split(";"):
+            if e.strip():
+                seen.add(e.strip().lower())
+    return seen
+
+
+def materializar_destinatarios_tramo(
+    db: Session,
+    campana: CampanaCrm,
+    *,
+    chunk_size: Optional[int] = None,
+    seen: Optional[set] = None,
+) -> int:
+    """
+    Materializa el siguiente tramo de destinatarios (clientes con id > cursor) y hace commit.
+    Devuelve cuántos clientes se procesaron; 0 cuando la materialización terminó.
+    `seen` (dedupe global) se reconstruye desde BD si no se pasa.
+    """
+    if campana.destinatarios_materializados:
+        return 0
+    chunk = chunk_size or _setting_int("CRM_CAMPANA_MATERIALIZAR_CHUNK", _DEFAULT_CHUNK, 50)
+    modo = modo_destinatarios(db, campana)
+    if campana.destinatarios_modo != modo:
+        campana.destinatarios_modo = modo
+    if seen is None:
+        seen = _emails_ya_asignados(db, campana.id)
+    cursor = campana.destinatarios_cursor or 0
+
+    q = select(Cliente.id, Cliente.email, Cliente.email_secundario).where(
+        Cliente.id > cursor, Cliente.email.isnot(None)
+    )
+    if modo == MODO_SELECCION:
+        q = q.join(
+            CampanaDestinatarioCrm,
+            (CampanaDestinatarioCrm.cliente_id == Cliente.id)
+            & (CampanaDestinatarioCrm.campana_id == campana.id),
+        )
+    rows = db.execute(q.order_by(Cliente.id).limit(chunk)).all()
+
+    if modo == MODO_TODOS:
+        filas = []
+        for cliente_id, email, email_sec in rows:
+            tos = _correos_nuevos(email, email_sec, seen)
+            if tos:
+                filas.append(
+                    {
+                        "campana_id": campana.id,
+                        "cliente_id": cliente_id,
+                        "emails": ";".join(tos),
+                        "estado": DEST_PENDIENTE,
+                    }
+                )
+        if filas:
+            db.execute(insert(CampanaDestinatarioCrm), filas)
+    else:
+        resueltos: Dict[int, Optional[str]] = {}
+        for cliente_id, email, email_sec in rows:
+            tos = _correos_nuevos(email, email_sec, seen)
+            resueltos[cliente_id] = ";".join(tos) if tos else None
+        for cliente_id, emails in resueltos.items():
+            db.execute(
+                update(CampanaDestinatarioCrm)
+                .where(
+                    CampanaDestinatarioCrm.campana_id == campana.id,
+                    CampanaDestinatarioCrm.cliente_id == cliente_id,
+                )
+                .values(emails=emails, estado=DEST_PENDIENTE if emails else DEST_OMITIDO)
+            )
+
+    if rows:
+        campana.destinatarios_cursor = rows[-1][0]
+    if len(rows) < chunk:
+        campana.destinatarios_materializados = True
+        if modo == MODO_SELECCION:
+            # Seleccionados sin correo válido (o sin fila en clientes con email) no se envían.
+            db.execute(
+                update(CampanaDestinatarioCrm)
+                .where(
+                    CampanaDestinatarioCrm.campana_id == campana.id,
+                    CampanaDestinatarioCrm.emails.is_(None),
+                    CampanaDestinatarioCrm.estado == DEST_PENDIENTE,
+                )
+                .values(estado=DEST_OMITIDO)
+            )
+        campana.total_destinatarios = (
+            db.scalar(
+                select(func.count())
+                .select_from(CampanaDestinatarioCrm)
+                .where(
+                    CampanaDestinatarioCrm.campana_id == campana.id,
+                    CampanaDestinatarioCrm.emails.isnot(None),
+                )
+            )
+            or 0
+        )
+    db.commit()
+    return len(rows)
+
+
+def recuperar_claims_huerfanos(db: Session, campana_id: int, *, ahora: Optional[datetime] = None) -> int:
+    """Destinatarios en 'enviando' de un proceso caído: cierra con el resultado registrado o vuelve a pendiente."""
+    ahora = ahora or datetime.utcnow()
+    limite = ahora - timedelta(minutes=_setting_int("CRM_CAMPANA_CLAIM_STALE_MIN", _DEFAULT_CLAIM_STALE_MIN, 1))
+    huerfanos = db.execute(
+        select(CampanaDestinatarioCrm.id, CampanaDestinatarioCrm.cliente_id).where(
+            CampanaDestinatarioCrm.campana_id == campana_id,
+            CampanaDestinatarioCrm.estado == DEST_ENVIANDO,
+            CampanaDestinatarioCrm.reclamado_en < limite,
+        )
+    ).all()
+    if not huerfanos:
+        return 0
+    # Solo el log de la corrida actual: en campañas recurrentes hay filas de corridas anteriores por cliente.
+    q_log = select(CampanaEnvioCrm.cliente_id, CampanaEnvioCrm.estado).where(
+        CampanaEnvioCrm.campana_id == campana_id,
+        CampanaEnvioCrm.cliente_id.in_([c for _, c in huerfanos]),
+    )
+    inicio_corrida = db.scalar(select(CampanaCrm.fecha_envio_inicio).where(CampanaCrm.id == campana_id))
+    if inicio_corrida is not None:
+        q_log = q_log.where(CampanaEnvioCrm.fecha_envio >= inicio_corrida)
+    registrados = dict(db.execute(q_log.order_by(CampanaEnvioCrm.id)).all())
+    for dest_id, cliente_id in huerfanos:
+        estado_envio = registrados.get(cliente_id)
+        nuevo = DEST_PENDIENTE if estado_envio is None else (
+            DEST_ENVIADO if estado_envio == "enviado" else DEST_FALLIDO
+        )
+        db.execute(
+            update(CampanaDestinatarioCrm)
+            .where(CampanaDestinatarioCrm.id == dest_id)
+            .values(estado=nuevo, reclamado_en=None)
+        )
+    db.commit()
+    logger.warning("Campaña %s: %s destinatarios reclamados por un proceso caído recuperados", campana_id, len(huerfanos))
+    return len(huerfanos)
+
+
+def reclamar_lote(db: Session, campana_id: int, limite: int) -> List[Tuple[int, int, str]]:
+    """Reclama hasta `limite` destinatarios pendientes (SKIP LOCKED) y hace commit. Devuelve (id, cliente_id, emails)."""
+    rows = db.execute(
+        select(
+            CampanaDestinatarioCrm.id,
+            CampanaDestinatarioCrm.cliente_id,
+            CampanaDestinatarioCrm.emails,
+        )
+        .where(
+            CampanaDestinatarioCrm.campana_id == campana_id,
+            CampanaDestinatarioCrm.estado == DEST_PENDIENTE,
+            CampanaDestinatarioCrm.emails.isnot(None),
+        )
+        .order_by(CampanaDestinatarioCrm.id)
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if rows:
+        db.execute(
+            update(CampanaDestinatarioCrm)
+            .where(CampanaDestinatarioCrm.id.in_([r[0] for r in rows]))
+            .values(estado=DEST_ENVIANDO, reclamado_en=datetime.utcnow())
+        )
+    db.commit()
+    return [(r[0], r[1], r[2]) for r in rows]
+
+
+def _liberar(db: Session, dest_ids: List[int]) -> None:
+    if dest_ids:
+        db.execute(
+            update(CampanaDestinatarioCrm)
+            .where(
+                CampanaDestinatarioCrm.id.in_(dest_ids),
+                CampanaDestinatarioCrm.estado == DEST_ENVIANDO,
+            )
+            .values(estado=DEST_PENDIENTE, reclamado_en=None)
+        )
+    db.commit()
+
+
+def _estado_campana(db: Session, campana_id: int) -> Optional[str]:
+    return db.scalar(select(CampanaCrm.estado).where(CampanaCrm.id == campana_id))
+
+
+def _registrar_resultado(
+    db: Session,
+    campana_id: int,
+    dest_id: int,
+    cliente_id: int,
+    email_log: str,
+    ok: bool,
+    error: Optional[str],
+) -> None:
+    """Fila en crm_campana_envio + estado del destinatario + contador de la campaña, en una transacción."""
+    now = datetime.utcnow()
+    db.add(
+        CampanaEnvioCrm(
+            campana_id=campana_id,
+            cliente_id=cliente_id,
+            email=email_log,
+            estado="enviado" if ok else "fallido",
+            fecha_envio=now,
+            error_mensaje=None if ok else (error or "Error desconocido"),
+        )
+    )
+    db.execute(
+        update(CampanaDestinatarioCrm)
+        .where(CampanaDestinatarioCrm.id == dest_id)
+        .values(estado=DEST_ENVIADO if ok else DEST_FALLIDO)
+    )
+    contador = {"enviados": CampanaCrm.enviados + 1} if ok else {"fallidos": CampanaCrm.fallidos + 1}
+    db.execute(update(CampanaCrm).where(CampanaCrm.id == campana_id).values(envio_heartbeat=now, **contador))
+    db.commit()
+
+
+def ejecutar_envio_campana(
+    campana_id: int,
+    *,
+    session_factory: Optional[Callable[[], Session]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, Any]:
+    """
+    Envía (o continúa enviando) una campaña hasta terminar, pararse o quedar sin servicio de correo.
+    Devuelve {"estado", "enviados", "fallidos"} de esta ejecución.
+    """
+    if session_factory is None:
+        from app.core.database import SessionLocal
+
+        session_factory = SessionLocal
+    from app.core.email import send_email
+    from app.core.email_config_holder import get_email_activo_servicio
+    from app.services.notificaciones_exclusion_desistimiento import cliente_bloqueado_para_notificacion
+
+    enviados = fallidos = 0
+    db = session_factory()
+    try:
+        campana = db.get(CampanaCrm, campana_id)
+        if not campana or campana.estado not in ("borrador", "enviando", "programada"):
+            logger.warning("Campaña %s no existe o no está en borrador/enviando/programada", campana_id)
+            return {"estado": getattr(campana, "estado", None), "enviados": 0, "fallidos": 0}
+        era_programada = bool((campana.programado_cada_dias or 0) or (campana.programado_cada_horas or 0))
+        if campana.estado in ("borrador", "programada"):
+            if campana.estado == "programada":
+                # Nueva corrida de una campaña recurrente: se vuelve a materializar la lista.
+                if modo_destinatarios(db, campana) == MODO_TODOS:
+                    db.execute(delete(CampanaDestinatarioCrm).where(CampanaDestinatarioCrm.campana_id == campana_id))
+                else:
+                    db.execute(
+                        update(CampanaDestinatarioCrm)
+                        .where(CampanaDestinatarioCrm.campana_id == campana_id)
+                        .values(estado=DEST_PENDIENTE, emails=None, reclamado_en=None)
+                    )
+                campana.destinatarios_cursor = None
+                campana.destinatarios_materializados = False
+            campana.estado = "enviando"
+            campana.fecha_envio_inicio = datetime.utcnow()
+        campana.envio_heartbeat = datetime.utcnow()
+        db.commit()
+        recuperar_claims_huerfanos(db, campana_id)
+
+        cc_list: List[str] = []
+        if campana.cc_emails and campana.cc_emails.strip():
+            cc_list = [e.strip() for e in campana.cc_emails.split(",") if e and _email_valido(e.strip())]
+        attachments: Optional[List[Tuple[str, bytes]]] = None
+        if campana.adjunto_contenido and campana.adjunto_nombre:
+            attachments = [(campana.adjunto_nombre, bytes(campana.adjunto_contenido))]
+        asunto = campana.asunto
+        cuerpo_texto = campana.cuerpo_texto or ""
+        cuerpo_html = campana.cuerpo_html or None
+        batch_size = max(5, min(100, campana.batch_size))
+        delay = max(1, min(60, campana.delay_entre_batches_seg))
+
+        seen: Optional[set] = None
+        pausa_pendiente = False
+        detenida = False
+        while True:
+            if pausa_pendiente:
+                sleep(delay)
+                pausa_pendiente = False
+            lote = reclamar_lote(db, campana_id, batch_size)
+            if not lote:
+                campana = db.get(CampanaCrm, campana_id)
+                if campana.estado != "enviando":
+                    detenida = True
+                    break
+                if campana.destinatarios_materializados:
+                    break
+                if seen is None:
+                    seen = _emails_ya_asignados(db, campana_id)
+                materializar_destinatarios_tramo(db, campana, seen=seen)
+                continue
+            if not get_email_activo_servicio("campanas"):
+                logger.warning("Campaña %s: servicio de correo 'campanas' inactivo; envío en pausa", campana_id)
+                _liberar(db, [d for d, _, _ in lote])
+                db.execute(update(CampanaCrm).where(CampanaCrm.id == campana_id).values(estado="cancelada"))
+                db.commit()
+                detenida = True
+                break
+            for pos, (dest_id, cliente_id, emails_str) in enumerate(lote):
+                if _estado_campana(db, campana_id) != "enviando":
+                    logger.info("Campaña %s detenida por el usuario (cancelada)", campana_id)
+                    _liberar(db, [d for d, _, _ in lote[pos:]])
+                    detenida = True
+                    break
+                emails = [e for e in (emails_str or "").split(";") if e.strip()]
+                email_log = unir_destinatarios_log(emails) or emails[0]
+                bloq_cli, motivo_cli = cliente_bloqueado_para_notificacion(db, cliente_id=cliente_id, email=emails[0])
+                if bloq_cli:
+                    logger.info(
+                        "Campaña %s: omitir cliente_id=%s por %s",
+                        campana_id,
+                        cliente_id,
+                        motivo_cli or "LIQUIDADO_O_DESISTIMIENTO",
+                    )
+                    _registrar_resultado(
+                        db,
+                        campana_id,
+                        dest_id,
+                        cliente_id,
+                        email_log,
+                        False,
+                        f"Bloqueado por regla {motivo_cli or 'LIQUIDADO_O_DESISTIMIENTO'}",
+                    )
+                    fallidos += 1
+                    continue
+                ok, err = send_email(
+                    emails,
+                    asunto,
+                    cuerpo_texto,
+                    body_html=cuerpo_html,
+                    cc_emails=cc_list if cc_list else None,
+                    attachments=attachments,
+                    servicio="campanas",
+                )
+                _registrar_resultado(db, campana_id, dest_id, cliente_id, email_log, ok, err)
+                if ok:
+                    enviados += 1
+                else:
+                    fallidos += 1
+            if detenida:
+                break
+            pausa_pendiente = True
+
+        campana = db.get(CampanaCrm, campana_id)
+        db.refresh(campana)
+        if detenida or campana.estado != "enviando":
+            logger.info("Campaña %s en pausa: enviados=%s fallidos=%s en esta ejecución", campana_id, enviados, fallidos)
+            return {"estado": campana.estado, "enviados": enviados, "fallidos": fallidos}
+        now = datetime.utcnow()
+        campana.fecha_envio_fin = now
+        if era_programada:
+            campana.programado_proxima_ejecucion = now + timedelta(
+                days=campana.programado_cada_dias or 0, hours=campana.programado_cada_horas or 0
+            )
+            campana.estado = "programada"
+            db.commit()
+            logger.info("Campaña %s programada: próxima ejecución %s", campana_id, campana.programado_proxima_ejecucion)
+            return {"estado": campana.estado, "enviados": enviados, "fallidos": fallidos}
+        campana.estado = "completada"
+        db.commit()
+        logger.info("Campaña %s completada: enviados=%s fallidos=%s", campana_id, campana.enviados, campana.fallidos)
+        return {"estado": campana.estado, "enviados": enviados, "fallidos": fallidos}
+    except Exception as e:
+        logger.exception("Error en envío campaña %s: %s", campana_id, e)
+        try:
+            db.rollback()
+            # Queda cancelada (reanudable): el avance por destinatario ya está persistido.
+            db.execute(
+                update(CampanaCrm)
+                .where(CampanaCrm.id == campana_id, CampanaCrm.estado == "enviando")
+                .values(estado="cancelada", fecha_envio_fin=datetime.utcnow())
+            )
+            db.commit()
+        except Exception:
+            pass
+        return {"estado": "cancelada", "enviados": enviados, "fallidos": fallidos}
+    finally:
+        db.close()
+
+
+def progreso_campana(db: Session, campana_id: int, *, ventana_min: int = 5) -> Optional[Dict[str, Any]]:
+    """Conteo por estado de destinatario, avance de la materialización y ritmo (correos/min) reciente."""
+    campana = db.get(CampanaCrm, campana_id)
+    if not campana:
+        return None
+    por_estado = dict(
+        db.execute(
+            select(CampanaDestinatarioCrm.estado, func.count())
+            .where(
+                CampanaDestinatarioCrm.campana_id == campana_id,
+                CampanaDestinatarioCrm.emails.isnot(None),
+            )
+            .group_by(CampanaDestinatarioCrm.estado)
+        ).all()
+    )
+    ahora = datetime.utcnow()
+    recientes = (
+        db.scalar(
+            select(func.count())
+            .select_from(CampanaEnvioCrm)
+            .where(
+                CampanaEnvioCrm.campana_id == campana_id,
+                CampanaEnvioCrm.fecha_envio >= ahora - timedelta(minutes=ventana_min),
+            )
+        )
+        or 0
+    )
+    por_minuto = round(recientes / float(ventana_min), 2)
+    pendientes = int(por_estado.get(DEST_PENDIENTE, 0)) + int(por_estado.get(DEST_ENVIANDO, 0))
+    return {
+        "campana_id": campana_id,
+        "estado": campana.estado,
+        "destinatarios_modo": modo_destinatarios(db, campana),
+        "materializacion_completa": bool(campana.destinatarios_materializados),
+        "materializacion_cursor_cliente_id": campana.destinatarios_cursor,
+        "total_destinatarios": campana.total_destinatarios,
+        "por_estado": {k: int(v) for k, v in por_estado.items()},
+        "pendientes": pendientes,
+        "enviados": campana.enviados,
+        "fallidos": campana.fallidos,
+        "envios_por_minuto": por_minuto,
+        "eta_seg": int(pendientes / por_minuto * 60) if por_minuto > 0 and pendientes else None,
+        "ultimo_latido": campana.envio_heartbeat,
+    }
@@ -17,7 +17,8 @@ Persistencia en BD:
   con el mismo codigo que se devuelve en JSON (`estado` / `estado_etiqueta`). Asi informes que lean solo la tabla
   ven el mismo estado que la API.
 - `sincronizar_estado_cuotas_cartera`: alinea en lote todas las cuotas de prestamos APROBADO/LIQUIDADO (job nocturno
-  tras auditoria o POST admin), sin tocar montos ni cuota_pagos.
+  tras auditoria o POST admin), sin tocar montos ni cuota_pagos. En PostgreSQL usa un UPDATE set-based por rangos
+  de id (`expr_estado_cuota_sql`) y deja los cambios en `cuota_estado_cambios`; en SQLite conserva el motor Python.
 
 """
 from __future__ import annotations
@@ -213,19 +214,79 @@ def sincronizar_columna_estado_cuotas(db: object, cuotas: list, *, commit: bool
     return changed
 
 
-def sincronizar_estado_cuotas_cartera(db: Any, *, commit: bool = True) -> dict[str, int]:
+def _ultimo_vencimiento_en_mora(fecha_referencia: date) -> date:
     """
-    Recalcula y persiste `cuotas.estado` con la misma regla que la auditoria y GET cuotas,
-    para todos los prestamos en APROBADO o LIQUIDADO. No modifica total_pagado ni articulacion.
+    Mayor fecha de vencimiento que ya esta en MORA a `fecha_referencia`.
+
+    `_sumar_meses_calendario` es monotona en la fecha base, asi que `_es_mora_por_4_meses(fv, ref)`
+    equivale a `fv <= umbral`: el motor SQL compara contra esta fecha y no necesita aritmetica de
+    meses del dialecto (PostgreSQL y SQLite dan el mismo resultado que Python).
+    """
+    d = _sumar_meses_calendario(fecha_referencia, -_MORA_DESDE_MESES)
+    while _es_mora_por_4_meses(d + timedelta(days=1), fecha_referencia):
+        d += timedelta(days=1)
+    while not _es_mora_por_4_meses(d, fecha_referencia):
+        d -= timedelta(days=1)
+    return d
+
 
-    Paginacion por id para no cargar toda la tabla en memoria.
+def expr_estado_cuota_sql(fecha_referencia: date) -> Any:
     """
+    Expresion SQLAlchemy `CASE` equivalente a `clasificar_estado_cuota(total_pagado, monto, vencimiento, ref)`.
+
+    La fecha de referencia viaja como parametro (no CURRENT_TIMESTAMP) para que Python y SQL usen el mismo dia.
+    """
+    from sqlalchemy import and_, case, func, literal_column, or_
+
+    from app.models.cuota import Cuota
+
+    paid = func.coalesce(Cuota.total_pagado, 0)
+    monto = func.coalesce(Cuota.monto, 0)
+    fv = Cuota.fecha_vencimiento
+    umbral_mora = _ultimo_vencimiento_en_mora(fecha_referencia)
+    return case(
+        (
+            and_(monto > 0, paid >= monto - literal_column("0.01")),
+            case(
+                (and_(fv.isnot(None), fv > fecha_referencia), "PAGO_ADELANTADO"),
+                else_="PAGADO",
+            ),
+        ),
+        (
+            or_(fv.is_(None), fv >= fecha_referencia),
+            case((paid > literal_column("0.001"), "PARCIAL"), else_="PENDIENTE"),
+        ),
+        (fv <= umbral_mora, "MORA"),
+        else_="VENCIDO",
+    )
+
+
+def _expr_estado_cuota_columna_normalizada() -> Any:
+    """SQL de `normalizar_estado_cuota_columna_auditoria` (PAGADA -> PAGADO, mayusculas, sin espacios)."""
+    from sqlalchemy import func
+
+    from app.models.cuota import Cuota
+
+    return func.replace(func.upper(func.trim(Cuota.estado)), "PAGADA", "PAGADO")
+
+
+def _motor_sync_estado_cuotas(db: Any, motor: str) -> str:
+    m = (motor or "auto").strip().lower()
+    if m in ("sql", "python"):
+        return m
+    bind = db.get_bind()
+    if bind is not None and bind.dialect.name == "postgresql":
+        return "sql"
+    return "python"
+
+
+def _sincronizar_estado_cuotas_cartera_python(db: Any, hoy: date) -> tuple[int, int]:
+    """Motor ORM: pagina por id (500 filas) y clasifica en Python. Referencia para tests SQLite."""
     from sqlalchemy import select
 
     from app.models.cuota import Cuota
     from app.models.prestamo import Prestamo
 
-    hoy = hoy_negocio()
     scanned = 0
     changed = 0
     last_id = 0
@@ -257,14 +318,128 @@ def sincronizar_estado_cuotas_cartera(db: Any, *, commit: bool = True) -> dict[s
                 setattr(c, "estado", nuevo)
                 changed += 1
         db.flush()
+    return scanned, changed
+
+
+def _sincronizar_estado_cuotas_cartera_sql(
+    db: Any,
+    hoy: date,
+    *,
+    corrida_id: str,
+    chunk_size: int,
+    commit: bool,
+) -> tuple[int, int]:
+    """
+    Motor set-based: por cada rango de id, un INSERT ... SELECT a `cuota_estado_cambios` con las cuotas cuyo
+    estado difiere del calculado y un UPDATE con el mismo predicado (`estado IS DISTINCT FROM <case>`).
+    No hidrata objetos Cuota; con commit=True confirma cada rango para no retener locks toda la corrida.
+    """
+    from sqlalchemy import and_, func, insert, literal, select, update
+
+    from app.models.cuota import Cuota
+    from app.models.cuota_estado_cambio import CuotaEstadoCambio
+    from app.models.prestamo import Prestamo
+
+    en_cartera = Cuota.prestamo_id.in_(
+        select(Prestamo.id).where(Prestamo.estado.in_(("APROBADO", "LIQUIDADO")))
+    )
+    min_id, max_id = db.execute(select(func.min(Cuota.id), func.max(Cuota.id)).where(en_cartera)).one()
+    if min_id is None:
+        return 0, 0
+
+    nuevo = expr_estado_cuota_sql(hoy)
+    difiere = nuevo.is_distinct_from(_expr_estado_cuota_columna_normalizada())
+    scanned = 0
+    changed = 0
+    lo = int(min_id)
+    while lo <= int(max_id):
+        hi = lo + chunk_size - 1
+        en_rango = and_(Cuota.id >= lo, Cuota.id <= hi, en_cartera)
+        scanned += int(db.scalar(select(func.count()).select_from(Cuota).where(en_rango)) or 0)
+        db.execute(
+            insert(CuotaEstadoCambio).from_select(
+                [
+                    "corrida_id",
+                    "cuota_id",
+                    "prestamo_id",
+                    "estado_anterior",
+                    "estado_nuevo",
+                    "fecha_referencia",
+                    "motor",
+                ],
+                select(
+                    literal(corrida_id),
+                    Cuota.id,
+                    Cuota.prestamo_id,
+                    Cuota.estado,
+                    nuevo,
+                    literal(hoy),
+                    literal("sql"),
+                ).where(en_rango, difiere),
+            )
+        )
+        res = db.execute(
+            update(Cuota)
+            .where(en_rango, difiere)
+            .values(estado=nuevo)
+            .execution_options(synchronize_session=False)
+        )
+        changed += int(res.rowcount or 0)
+        if commit:
+            db.commit()
+        lo = hi + 1
+    return scanned, changed
+
+
+def sincronizar_estado_cuotas_cartera(
+    db: Any,
+    *,
+    commit: bool = True,
+    motor: str = "auto",
+    fecha_referencia: date | None = None,
+    chunk_size: int = 20000,
+) -> dict[str, Any]:
+    """
+    Recalcula y persiste `cuotas.estado` con la misma regla que la auditoria y GET cuotas,
+    para todos los prestamos en APROBADO o LIQUIDADO. No modifica total_pagado ni articulacion.
+
+    motor:
+      - "sql": UPDATE set-based por rangos de id; los cambios quedan en `cuota_estado_cambios`
+        (corrida_id en la respuesta). No carga objetos ORM: cuotas ya presentes en la sesion no se refrescan.
+      - "python": paginacion ORM de 500 filas y `calcular_estado_cuota_desde_fila` (sin bitacora).
+      - "auto" (default): "sql" en PostgreSQL, "python" en otros motores (tests SQLite).
+    """
+    hoy = fecha_referencia or hoy_negocio()
+    motor_ef = _motor_sync_estado_cuotas(db, motor)
+    corrida_id: str | None = None
+    if motor_ef == "sql":
+        import uuid
+
+        corrida_id = str(uuid.uuid4())
+        scanned, changed = _sincronizar_estado_cuotas_cartera_sql(
+            db,
+            hoy,
+            corrida_id=corrida_id,
+            chunk_size=max(1, int(chunk_size)),
+            commit=commit,
+        )
+    else:
+        scanned, changed = _sincronizar_estado_cuotas_cartera_python(db, hoy)
     if commit:
         db.commit()
     logger.info(
-        "sincronizar_estado_cuotas_cartera: escaneadas=%s estados_actualizados=%s",
+        "sincronizar_estado_cuotas_cartera: motor=%s escaneadas=%s estados_actualizados=%s corrida_id=%s",
+        motor_ef,
         scanned,
         changed,
+        corrida_id,
     )
-    return {"cuotas_escaneadas": scanned, "estados_actualizados": changed}
+    return {
+        "cuotas_escaneadas": scanned,
+        "estados_actualizados": changed,
+        "motor": motor_ef,
+        "corrida_id": corrida_id,
+    }
 
 
 # SQL PostgreSQL (misma regla que clasificar_estado_cuota).
@@ -0,0 +1,123 @@
+"""
+Pares de textos cortos (numero_documento) con difflib.SequenceMatcher.ratio >= umbral, sin comparar todos los pares.
+
+Resultado idéntico a comparar cada par (i < j) con `SequenceMatcher(None, a_i, a_j).ratio()`; solo se
+descartan pares cuya cota superior ya queda bajo el umbral. Con T = len(a) + len(b) y M = caracteres de
+los bloques coincidentes, ratio = 2M / T, y M está acotado por:
+
+1. longitud: M <= min(len) -> ventana de longitudes compatible (orden por longitud);
+2. multiconjunto de caracteres: M <= |a ∩ b| (lo que usa `quick_ratio`). Se indexan tokens
+   (carácter, n-ésima aparición) por rareza y solo se prueban pares que comparten un token del prefijo
+   (prefix filtering): si |a ∩ b| alcanza el mínimo, los prefijos se cruzan;
+3. subsecuencia común más larga: los bloques de SequenceMatcher son una subsecuencia común, M <= LCS.
+   La LCS se calcula bit-paralelo (Hyyrö), equivalente a acotar la distancia de edición por inserción/borrado.
+
+Los sobrevivientes se confirman con `SequenceMatcher.ratio` en la misma orientación (a = índice menor),
+porque ratio no es simétrico.
+"""
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Sequence, Tuple
+
+# Tolerancia al redondear cotas: un mínimo de coincidencias menor solo agranda prefijos (nunca pierde pares).
+_EPS = 1e-9
+
+
+def normalizar_documento(s: str) -> str:
+    return (s or "").strip().upper()
+
+
+def ratio_documentos(a: str, b: str) -> float:
+    na, nb = normalizar_documento(a), normalizar_documento(b)
+    if not na or not nb:
+        return 0.0
+    return float(SequenceMatcher(None, na, nb).ratio())
+
+
+def _tokens(s: str) -> List[Tuple[str, int]]:
+    vistos: Dict[str, int] = defaultdict(int)
+    out: List[Tuple[str, int]] = []
+    for ch in s:
+        out.append((ch, vistos[ch]))
+        vistos[ch] += 1
+    return out
+
+
+def _coincidencias_minimas(largo: int, umbral: float) -> int:
+    """Mínimo |a ∩ b| que debe tener un texto de `largo` con cualquier pareja compatible en longitud."""
+    return max(1, math.ceil(umbral * largo / (2.0 - umbral) - _EPS))
+
+
+def _lcs_bit_paralelo(a: str, b: str, mascaras: Dict[str, int]) -> int:
+    """Longitud de la LCS de a y b (Hyyrö); `mascaras[c]` = bits de las posiciones de c en a."""
+    lleno = (1 << len(a)) - 1
+    v = lleno
+    for ch in b:
+        u = v & mascaras.get(ch, 0)
+        v = ((v + u) | (v - u)) & lleno
+    return len(a) - bin(v).count("1")
+
+
+def pares_similares(docs: Sequence[str], umbral: float) -> List[Tuple[int, int, float]]:
+    """
+    (i, j, ratio) con i < j y ratio(docs[i], docs[j]) >= umbral, ordenados por (i, j).
+    Mismo criterio que `ratio_documentos` (trim + mayúsculas; vacíos nunca coinciden).
+    """
+    umbral = float(umbral)
+    if umbral <= 0:
+        # Todo par califica (incluso vacíos, ratio 0): no hay nada que podar.
+        return [
+            (i, j, ratio_documentos(docs[i], docs[j]))
+            for i in range(len(docs))
+            for j in range(i + 1, len(docs))
+        ]
+    norm = [normalizar_documento(d) for d in docs]
+    idx = [k for k, s in enumerate(norm) if s]
+    if len(idx) < 2 or umbral > 1:
+        return []
+
+    tokens = {k: _tokens(norm[k]) for k in idx}
+    frecuencia = Counter(t for k in idx for t in set(tokens[k]))
+    # Tokens raros primero: prefijos cortos y selectivos.
+    for k in idx:
+        tokens[k].sort(key=lambda t: (frecuencia[t], t))
+    conteos = {k: Counter(norm[k]) for k in idx}
+    mascaras: Dict[int, Dict[str, int]] = {}
+
+    orden = sorted(idx, key=lambda k: (len(norm[k]), k))
+    indice: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+    out: List[Tuple[int, int, float]] = []
+    for y in orden:
+        ly = len(norm[y])
+        prefijo = ly - _coincidencias_minimas(ly, umbral) + 1
+        candidatos = set()
+        for t in tokens[y][:prefijo]:
+            candidatos.update(indice[t])
+            indice[t].append(y)
+        for x in candidatos:
+            lx = len(norm[x])  # lx <= ly por el orden de inserción
+            total = lx + ly
+            if 2.0 * lx / total < umbral:
+                continue
+            cx, cy = conteos[x], conteos[y]
+            if len(cx) > len(cy):
+                cx, cy = cy, cx
+            comunes = sum(min(n, cy.get(ch, 0)) for ch, n in cx.items())
+            if 2.0 * comunes / total < umbral:
+                continue
+            i, j = (x, y) if x < y else (y, x)
+            m = mascaras.get(i)
+            if m is None:
+                m = mascaras[i] = {}
+                for pos, ch in enumerate(norm[i]):
+                    m[ch] = m.get(ch, 0) | (1 << pos)
+            if 2.0 * _lcs_bit_paralelo(norm[i], norm[j], m) / total < umbral:
+                continue
+            r = float(SequenceMatcher(None, norm[i], norm[j]).ratio())
+            if r >= umbral:
+                out.append((i, j, r))
+    out.sort(key=lambda p: (p[0], p[1]))
+    return out
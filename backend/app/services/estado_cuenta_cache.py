@@ -0,0 +1,110 @@
+"""
+Cache en proceso del estado de cuenta armado (dict de ``obtener_datos_estado_cuenta_*``).
+
+Clave: (prestamo_id, version en ``prestamo_versiones``, fecha_corte). La versión sube en la misma
+transacción que cualquier cambio de cuotas/pagos/cliente (ver ``app.models.prestamo_version``), así
+que una entrada nunca sirve datos de una versión anterior; el TTL solo acota lo que no versiona
+(p. ej. institución/recibo desde pagos_reportados).
+
+No se usa la cache si la sesión del llamador ya subió la versión de ese préstamo en la transacción
+en curso (lectura propia no confirmada: si hace rollback, esa versión volvería a usarse).
+LRU acotado (ESTADO_CUENTA_CACHE_MAX_ITEMS); cada worker tiene la suya.
+"""
+from __future__ import annotations
+
+import copy
+import time
+from collections import OrderedDict
+from datetime import date
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.prestamo_version import INFO_VERSION_TOCADA, PrestamoVersion, tabla_disponible
+
+_lock = Lock()
+_entradas: "OrderedDict[Hashable, tuple[float, Dict[str, Any]]]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "bypass": 0}
+
+
+def _ttl_y_max() -> tuple[int, int]:
+    try:
+        from app.core.config import settings
+
+        return (
+            int(getattr(settings, "ESTADO_CUENTA_CACHE_TTL_SEC", 600) or 0),
+            max(1, int(getattr(settings, "ESTADO_CUENTA_CACHE_MAX_ITEMS", 2000) or 1)),
+        )
+    except Exception:
+        return 600, 2000
+
+
+def versiones_prestamos(db: Session, prestamo_ids: Iterable[int]) -> Optional[Dict[int, int]]:
+    """{prestamo_id: version} (0 si no hay fila). None si la sesión tocó alguno en la transacción actual
+    o si la tabla no existe (sin cache)."""
+    ids = sorted({int(x) for x in prestamo_ids if x is not None})
+    if not ids:
+        return {}
+    if not tabla_disponible(db.connection(), PrestamoVersion.__tablename__):
+        return None
+    # La consulta hace autoflush: los cambios ORM pendientes suben la versión antes del chequeo.
+    rows = db.execute(
+        select(PrestamoVersion.prestamo_id, PrestamoVersion.version).where(PrestamoVersion.prestamo_id.in_(ids))
+    ).all()
+    if (db.info.get(INFO_VERSION_TOCADA) or set()).intersection(ids):
+        return None
+    out = {i: 0 for i in ids}
+    out.update({int(r[0]): int(r[1]) for r in rows})
+    return out
+
+
+def obtener_o_armar(clave: Hashable, armar: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Devuelve una copia del dict cacheado o lo arma con `armar()` y lo guarda (None no se cachea)."""
+    ttl, max_items = _ttl_y_max()
+    if ttl <= 0:
+        return armar()
+    ahora = time.monotonic()
+    with _lock:
+        hit = _entradas.get(clave)
+        if hit is not None and hit[0] > ahora:
+            _entradas.move_to_end(clave)
+            _stats["hits"] += 1
+            return copy.deepcopy(hit[1])
+        _stats["misses"] += 1
+    datos = armar()
+    if datos is None:
+        return None
+    with _lock:
+        _entradas[clave] = (ahora + ttl, copy.deepcopy(datos))
+        _entradas.move_to_end(clave)
+        while len(_entradas) > max_items:
+            _entradas.popitem(last=False)
+    return datos
+
+
+def registrar_bypass() -> None:
+    with _lock:
+        _stats["bypass"] += 1
+
+
+def clave_prestamo(prestamo_id: int, version: int, fecha_corte: date) -> tuple:
+    return ("prestamo", int(prestamo_id), int(version), fecha_corte.isoformat())
+
+
+def clave_cliente(cliente_id: int, versiones: Dict[int, int], fecha_corte: date) -> tuple:
+    return ("cliente", int(cliente_id), tuple(sorted(versiones.items())), fecha_corte.isoformat())
+
+
+def estado_cuenta_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "entradas": len(_entradas)}
+
+
+def estado_cuenta_cache_reset() -> None:
+    """Tests o mantenimiento manual."""
+    with _lock:
+        _entradas.clear()
+        for k in _stats:
+            _stats[k] = 0
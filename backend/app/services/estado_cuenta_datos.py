@@ -11,7 +11,7 @@ import logging
 import re
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, desc, func, select
+from sqlalchemy import and_, desc, select
 from sqlalchemy.orm import Session
 
 from app.models.cliente import Cliente
@@ -20,6 +20,7 @@ from app.models.cuota_pago import CuotaPago
 from app.models.pago import Pago
 from app.models.pago_reportado import PagoReportado
 from app.models.prestamo import Prestamo
+from app.services import estado_cuenta_cache as ec_cache
 from app.services.cobros.pago_reportado_documento import claves_documento_pago_para_reportado
 from app.services.cuota_estado import etiqueta_estado_cuota, estado_cuota_para_mostrar, hoy_negocio
 from app.services.pagos.comprobante_link_desde_gmail import (
@@ -28,7 +29,10 @@ from app.services.pagos.comprobante_link_desde_gmail import (
 )
 from app.services.pagos_cuotas_sincronizacion import sincronizar_pagos_pendientes_a_prestamos
 from app.utils.cliente_emails import emails_destino_desde_objeto
-from app.utils.cedula_almacenamiento import expr_cedula_normalizada_para_comparar
+from app.utils.cedula_almacenamiento import (
+    expr_cedula_documento_concatenada,
+    expr_cedula_normalizada_para_comparar,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -42,10 +46,7 @@ def prestamo_muestra_tabla_amortizacion(estado_prestamo: str) -> bool:
 
 def obtener_recibos_cliente_estado_cuenta(db: Session, cedula_lookup: str) -> List[dict]:
     """Pagos reportados del cliente (cédula comparable a ``texto_cedula_comparable_bd``) con recibo PDF."""
-    cedula_concat = func.concat(
-        func.coalesce(PagoReportado.tipo_cedula, ""),
-        func.coalesce(PagoReportado.numero_cedula, ""),
-    )
+    cedula_concat = expr_cedula_documento_concatenada(PagoReportado.tipo_cedula, PagoReportado.numero_cedula)
     rows = db.execute(
         select(PagoReportado)
         .where(
@@ -465,10 +466,8 @@ def _cargar_prestamo_para_estado_cuenta(db, prestamo_id: int):
     return SimpleNamespace(**dict(rowm))
 
 
-def obtener_datos_estado_cuenta_prestamo(db, prestamo_id: int, sincronizar: bool = True):
-
+def obtener_datos_estado_cuenta_prestamo(db, prestamo_id: int, sincronizar: bool = False):
     """
-
     Obtiene datos formateados para PDF/JSON de estado de cuenta de UN prestamo.
 
     Consumidores: GET /prestamos/{id}/estado-cuenta, GET /prestamos/{id}/estado-cuenta/pdf,
@@ -476,70 +475,52 @@ def obtener_datos_estado_cuenta_prestamo(db, prestamo_id: int, sincronizar: bool
 
     Tabla de amortizacion completa si el prestamo esta en ESTADOS_PRESTAMO_TABLA_AMORTIZACION.
 
-    Si sincronizar es False, el llamador debe haber llamado ya sincronizar_pagos_pendientes_a_prestamos.
-
+    Lectura pura: los pagos pendientes de aplicar los drena el job ``prestamos_sync_cola`` (la cola se
+    alimenta al registrar/conciliar el pago). ``sincronizar=True`` fuerza la sincronizacion previa
+    (puede hacer commit). El resultado se cachea por (prestamo, version, fecha de corte); ver
+    ``app.services.estado_cuenta_cache``.
     """
+    if sincronizar:
+        _sincronizar_antes_de_leer(db, [prestamo_id], f"prestamo_id={prestamo_id}")
 
-    from sqlalchemy import select
-
-    from app.models.cliente import Cliente
-
-    from app.models.cuota import Cuota
+    fecha_corte_dt = hoy_negocio()
+    versiones = ec_cache.versiones_prestamos(db, [prestamo_id])
+    if versiones is None:
+        ec_cache.registrar_bypass()
+        return _armar_estado_cuenta_prestamo(db, prestamo_id, fecha_corte_dt)
+    return ec_cache.obtener_o_armar(
+        ec_cache.clave_prestamo(prestamo_id, versiones[prestamo_id], fecha_corte_dt),
+        lambda: _armar_estado_cuenta_prestamo(db, prestamo_id, fecha_corte_dt),
+    )
 
-    from app.services.cuota_estado import estado_cuota_para_mostrar, hoy_negocio
 
-    from app.services.pagos_cuotas_sincronizacion import sincronizar_pagos_pendientes_a_prestamos
+def _sincronizar_antes_de_leer(db, prestamo_ids: List[int], contexto: str) -> None:
+    try:
+        sincronizar_pagos_pendientes_a_prestamos(db, prestamo_ids)
+    except Exception as sync_exc:
+        logger.warning(
+            "estado de cuenta: sincronizar_pagos_pendientes_a_prestamos %s: %s",
+            contexto,
+            sync_exc,
+        )
 
-    
 
+def _armar_estado_cuenta_prestamo(db, prestamo_id: int, fecha_corte_dt):
+    """Arma el dict de un prestamo sin escribir en BD."""
     prestamo = _cargar_prestamo_para_estado_cuenta(db, prestamo_id)
-
     if not prestamo:
-
         return None
 
-    
-
     cliente = db.get(Cliente, prestamo.cliente_id)
-
     if not cliente:
-
         return None
 
-    
-
     cedula_display = (getattr(cliente, "cedula", None) or "").strip()
-
     nombre = (getattr(cliente, "nombres", None) or "").strip()
-
     email = (getattr(cliente, "email", None) or "").strip()
-
     email_sec = (getattr(cliente, "email_secundario", None) or "").strip()
-
     correos_cliente = emails_destino_desde_objeto(cliente)
 
-    
-
-    if sincronizar:
-
-        try:
-
-            sincronizar_pagos_pendientes_a_prestamos(db, [prestamo_id])
-
-        except Exception as sync_exc:
-
-            logger.warning(
-
-                "obtener_datos_estado_cuenta_prestamo: sincronizar_pagos_pendientes_a_prestamos prestamo_id=%s: %s",
-
-                prestamo_id,
-
-                sync_exc,
-
-            )
-
-    
-
     prestamos_list = [{
 
         "id": prestamo.id,
@@ -558,8 +539,6 @@ def obtener_datos_estado_cuenta_prestamo(db, prestamo_id: int, sincronizar: bool
 
     total_pendiente = 0.0
 
-    fecha_corte_dt = hoy_negocio()
-
     
 
     cuotas_rows = db.execute(
@@ -726,20 +705,15 @@ def obtener_datos_estado_cuenta_prestamo(db, prestamo_id: int, sincronizar: bool
 
     }
 
-def obtener_datos_estado_cuenta_cliente(db, cedula_lookup: str):
+def obtener_datos_estado_cuenta_cliente(db, cedula_lookup: str, sincronizar: bool = False):
     """
     Arma el mismo dict que consume generar_pdf_estado_cuenta para todos los prestamos
     del cliente (cedula normalizada sin guiones). Reutiliza obtener_datos_estado_cuenta_prestamo
     por cada prestamo para que cuotas pendientes, totales y amortizacion coincidan con
     GET /prestamos/{id}/estado-cuenta, GET /prestamos/{id}/estado-cuenta/pdf y notificaciones liquidado.
-    """
-    from sqlalchemy import func, select
-
-    from app.models.cliente import Cliente
-    from app.models.prestamo import Prestamo
-    from app.services.cuota_estado import hoy_negocio
-    from app.services.pagos_cuotas_sincronizacion import sincronizar_pagos_pendientes_a_prestamos
 
+    Lectura pura y cacheada igual que la de un prestamo (clave: cliente + versiones de sus prestamos).
+    """
     cedula_lookup = (cedula_lookup or "").strip()
     if not cedula_lookup:
         return None
@@ -758,32 +732,33 @@ def obtener_datos_estado_cuenta_cliente(db, cedula_lookup: str):
     if not cliente_id:
         return None
 
+    prestamo_ids = list(
+        db.execute(
+            select(Prestamo.id).where(Prestamo.cliente_id == cliente_id).order_by(Prestamo.id)
+        ).scalars().all()
+    )
+
+    if sincronizar and prestamo_ids:
+        _sincronizar_antes_de_leer(db, prestamo_ids, f"cliente_id={cliente_id}")
+
+    fecha_corte_dt = hoy_negocio()
+    versiones = ec_cache.versiones_prestamos(db, prestamo_ids)
+    if versiones is None:
+        ec_cache.registrar_bypass()
+        return _armar_estado_cuenta_cliente(db, cliente, prestamo_ids, fecha_corte_dt)
+    return ec_cache.obtener_o_armar(
+        ec_cache.clave_cliente(cliente_id, versiones, fecha_corte_dt),
+        lambda: _armar_estado_cuenta_cliente(db, cliente, prestamo_ids, fecha_corte_dt),
+    )
+
+
+def _armar_estado_cuenta_cliente(db, cliente, prestamo_ids: List[int], fecha_corte_dt):
     nombre = (getattr(cliente, "nombres", None) or "").strip()
     email = (getattr(cliente, "email", None) or "").strip()
     email_sec = (getattr(cliente, "email_secundario", None) or "").strip()
     correos_cliente = emails_destino_desde_objeto(cliente)
     cedula_display = (getattr(cliente, "cedula", None) or "").strip()
 
-    prestamos_rows = db.execute(
-        select(Prestamo).where(Prestamo.cliente_id == cliente_id)
-    ).scalars().all()
-
-    prestamo_ids = []
-    for row in prestamos_rows:
-        p = row[0] if hasattr(row, "__getitem__") else row
-        prestamo_ids.append(p.id)
-
-    if prestamo_ids:
-        try:
-            sincronizar_pagos_pendientes_a_prestamos(db, prestamo_ids)
-        except Exception as sync_exc:
-            logger.warning(
-                "obtener_datos_estado_cuenta_cliente: sincronizar_pagos_pendientes_a_prestamos "
-                "cliente_id=%s: %s",
-                cliente_id,
-                sync_exc,
-            )
-
     merged = {
         "cedula_display": cedula_display,
         "nombre": nombre,
@@ -795,13 +770,13 @@ def obtener_datos_estado_cuenta_cliente(db, cedula_lookup: str):
         "prestamos_list": [],
         "cuotas_pendientes": [],
         "total_pendiente": 0.0,
-        "fecha_corte": hoy_negocio(),
+        "fecha_corte": fecha_corte_dt,
         "amortizaciones_por_prestamo": [],
         "pagos_realizados": [],
     }
 
     for pid in prestamo_ids:
-        part = obtener_datos_estado_cuenta_prestamo(db, pid, sincronizar=False)
+        part = obtener_datos_estado_cuenta_prestamo(db, pid)
         if not part:
             continue
         merged["fecha_corte"] = part["fecha_corte"]
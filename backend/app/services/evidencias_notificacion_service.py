@@ -24,6 +24,7 @@ from app.models.cliente import Cliente
 from app.models.evidencia_notificacion import EvidenciaNotificacion
 from app.models.envio_notificacion import EnvioNotificacion
 from app.models.envio_notificacion_adjunto import EnvioNotificacionAdjunto
+from app.utils.cliente_emails import expr_email_normalizado_para_comparar
 
 logger = logging.getLogger(__name__)
 
@@ -194,7 +195,7 @@ def _cedula_por_correo(db: Session, email_raw: str) -> Optional[str]:
         rows_main = (
             db.execute(
                 select(Cliente.cedula)
-                .where(func.lower(func.trim(Cliente.email)) == em)
+                .where(expr_email_normalizado_para_comparar(Cliente.email) == em)
                 .limit(2)
             )
             .scalars()
@@ -209,7 +210,7 @@ def _cedula_por_correo(db: Session, email_raw: str) -> Optional[str]:
                 select(Cliente.cedula)
                 .where(Cliente.email_secundario.isnot(None))
                 .where(func.trim(Cliente.email_secundario) != "")
-                .where(func.lower(func.trim(Cliente.email_secundario)) == em)
+                .where(expr_email_normalizado_para_comparar(Cliente.email_secundario) == em)
                 .limit(2)
             )
             .scalars()
@@ -402,7 +403,7 @@ def _pdfs_anexo_sistema(db: Session, email_cliente: str) -> list[bytes]:
     try:
         envio_id = db.execute(
             select(EnvioNotificacion.id)
-            .where(func.lower(func.trim(EnvioNotificacion.email)) == em)
+            .where(expr_email_normalizado_para_comparar(EnvioNotificacion.email) == em)
             .where(EnvioNotificacion.tipo_tab == TIPO_TAB_ANEXO_SISTEMA)
             .where(EnvioNotificacion.exito.is_(True))
             .order_by(EnvioNotificacion.fecha_envio.desc())
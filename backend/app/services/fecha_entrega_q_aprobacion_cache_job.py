@@ -1,8 +1,8 @@
 """
 Persiste en `prestamos.fecha_entrega_q_aprobacion_cache` la comparación columna Q (hoja) vs fecha_aprobacion.
 
-- Tras cada sync exitoso de la hoja CONCILIACIÓN (Drive → `conciliacion_sheet_*`), el API dispara la misma pasada
-  masiva para que listados y auditoría vuelvan a leer la Q frente a la BD con el snapshot nuevo.
+- Tras cada sync exitoso de la hoja CONCILIACIÓN (Drive → `conciliacion_sheet_*`) se recalculan solo los préstamos
+  cuya cédula aparece en el change set de esa corrida (`conciliacion_sheet_cambios`); sin change set, pasada masiva.
 - Job programado: lunes y jueves 04:00 America/Caracas (si `ENABLE_FECHA_ENTREGA_Q_CACHE_NIGHTLY` y scheduler activo).
 - POST manual `/notificaciones/refresh-fecha-entrega-q-cache` (misma función `ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly`).
 - Ámbito: todos los préstamos con cédula en BD (sin excluir LIQUIDADO, DESISTIMIENTO ni otro estado).
@@ -11,7 +11,7 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Sequence
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -22,6 +22,7 @@ from app.services.comparar_fecha_entrega_q_aprobacion_service import (
     comparar_fecha_entrega_column_q_vs_aprobacion,
     prestamo_fecha_q_cache_vigente_y_alineado,
 )
+from app.utils.cedula_almacenamiento import normalizar_cedula_clave_cupo
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +32,15 @@ _LOTE_COMMIT = 100
 _LOG_PROGRESO_CADA = 250
 
 
-def ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db: Session) -> Dict[str, Any]:
+def ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(
+    db: Session,
+    *,
+    prestamo_ids: Optional[Sequence[int]] = None,
+) -> Dict[str, Any]:
     """
     Recalcula caché Q vs aprobación para **todos** los préstamos con cédula (sin excluir por estado:
     LIQUIDADO, DESISTIMIENTO, etc. entran igual; coherente con auditoría /notificaciones/fecha-q-auditoria-total).
+    Con `prestamo_ids`, solo esos (refresco tras sync incremental).
     """
     t0 = time.perf_counter()
     ok = 0
@@ -45,9 +51,12 @@ def ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db: Session) -> Di
     lote_commit = 0
     pendientes_commit = 0
 
-    ids = list(
-        db.scalars(select(Prestamo.id).order_by(Prestamo.id.asc())).all()
-    )
+    if prestamo_ids is not None:
+        ids = sorted(int(x) for x in prestamo_ids)
+    else:
+        ids = list(
+            db.scalars(select(Prestamo.id).order_by(Prestamo.id.asc())).all()
+        )
     total = len(ids)
     sheet_lookup = ConciliacionSheetLookupContext.build_from_db(db)
     meta_synced_at = sheet_lookup.meta_synced_at
@@ -156,21 +165,63 @@ def ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db: Session) -> Di
     }
 
 
-def ejecutar_refresh_fecha_entrega_q_cache_tras_sync_conciliacion(db: Session) -> Dict[str, Any]:
+def _prestamo_ids_por_cedulas(db: Session, cedulas: set[str]) -> list[int]:
+    """Préstamos cuya cédula normalizada (misma clave que el índice de la hoja) está en `cedulas`."""
+    claves = {normalizar_cedula_clave_cupo(c) for c in cedulas}
+    claves.discard(None)
+    claves.discard("")
+    if not claves:
+        return []
+    return [
+        int(pid)
+        for pid, ced in db.execute(select(Prestamo.id, Prestamo.cedula)).all()
+        if ced and normalizar_cedula_clave_cupo(ced) in claves
+    ]
+
+
+def ejecutar_refresh_fecha_entrega_q_cache_tras_sync_conciliacion(
+    db: Session, run_id: Optional[int] = None
+) -> Dict[str, Any]:
     """
     Invocado inmediatamente después de un sync exitoso CONCILIACIÓN (Google Sheets → BD).
-    Misma pasada que el job programado / el POST de refresco manual.
+    Con `run_id` recalcula solo los préstamos de las cédulas del change set de esa corrida (antes y después
+    del cambio); sin run_id o sin change set, misma pasada masiva que el job programado / el POST manual.
     """
-    logger.info(
-        "[fecha_q_cache] Refresco masivo por sincronización Drive (conciliacion_sheet → comparación Q vs BD)"
-    )
-    return ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db)
+    from app.services.conciliacion_sheet_sync import cedulas_cambiadas_en_run
 
+    cedulas = cedulas_cambiadas_en_run(db, run_id) if run_id is not None else None
+    if cedulas is None:
+        logger.info(
+            "[fecha_q_cache] Refresco masivo por sincronización Drive (conciliacion_sheet → comparación Q vs BD)"
+        )
+        return ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db)
 
-def ejecutar_refresh_fecha_entrega_q_cache_background() -> None:
+    ids = _prestamo_ids_por_cedulas(db, cedulas)
+    logger.info(
+        "[fecha_q_cache] Refresco incremental tras sync run_id=%s cedulas_cambiadas=%s prestamos=%s",
+        run_id,
+        len(cedulas),
+        len(ids),
+    )
+    if not ids:
+        return {
+            "prestamos_considerados": 0,
+            "actualizados_ok": 0,
+            "errores": 0,
+            "cedulas_cambiadas": len(cedulas),
+            "run_id": run_id,
+        }
+    res = ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db, prestamo_ids=ids)
+    res["cedulas_cambiadas"] = len(cedulas)
+    res["run_id"] = run_id
+    return res
+
+
+def ejecutar_refresh_fecha_entrega_q_cache_background(run_id: Optional[int] = None) -> None:
     """
-    Ejecuta el refresco masivo en un hilo de BackgroundTasks (sesión propia).
-    Usado tras POST /conciliacion-sheet/sync y /sync-now para no bloquear la respuesta HTTP.
+    Ejecuta el refresco en un hilo de BackgroundTasks (sesión propia).
+    Usado tras POST /conciliacion-sheet/sync y /sync-now (con el run_id del sync: solo lo que cambió)
+    para no bloquear la respuesta HTTP.
     """
     from app.core.database import SessionLocal
 
@@ -179,7 +230,10 @@ def ejecutar_refresh_fecha_entrega_q_cache_background() -> None:
         logger.info(
             "[fecha_q_cache] inicio refresco en segundo plano (post-sync CONCILIACIÓN)"
         )
-        res = ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db)
+        if run_id is not None:
+            res = ejecutar_refresh_fecha_entrega_q_cache_tras_sync_conciliacion(db, run_id)
+        else:
+            res = ejecutar_refresh_fecha_entrega_q_aprobacion_cache_nightly(db)
         logger.info("[fecha_q_cache] fin refresco background resultado=%s", res)
     except Exception:
         logger.exception("[fecha_q_cache] error en refresco background")
@@ -197,22 +197,41 @@ def ejecutar_refresh_finiquito_casos(db: Session) -> dict[str, Any]:
     """
     persistir_liquidaciones_efectivas_para_finiquito(db)
 
-    sql = text(
-        """
-        SELECT p.id AS prestamo_id,
-               p.cliente_id,
-               TRIM(p.cedula) AS cedula,
-               p.total_financiamiento,
-               COALESCE(SUM(COALESCE(c.total_pagado, 0)), 0) AS sum_tp
-        FROM prestamos p
-        INNER JOIN cuotas c ON c.prestamo_id = p.id
-        WHERE UPPER(TRIM(COALESCE(p.estado, ''))) IN ('LIQUIDADO', 'FINIQUITO')
-        GROUP BY p.id, p.cliente_id, p.cedula, p.total_financiamiento
-        HAVING ABS(
-            COALESCE(SUM(COALESCE(c.total_pagado, 0)), 0) - COALESCE(p.total_financiamiento, 0)
-        ) <= 0.02
-        """
-    )
+    from app.services.prestamo_saldos import lectura_resumen_habilitada
+
+    if lectura_resumen_habilitada():
+        # Una fila por préstamo (prestamo_saldos.total_pagado = SUM(cuotas.total_pagado)).
+        sql = text(
+            """
+            SELECT p.id AS prestamo_id,
+                   p.cliente_id,
+                   TRIM(p.cedula) AS cedula,
+                   p.total_financiamiento,
+                   s.total_pagado AS sum_tp
+            FROM prestamos p
+            INNER JOIN prestamo_saldos s ON s.prestamo_id = p.id
+            WHERE UPPER(TRIM(COALESCE(p.estado, ''))) IN ('LIQUIDADO', 'FINIQUITO')
+              AND s.cuotas_total > 0
+              AND ABS(s.total_pagado - COALESCE(p.total_financiamiento, 0)) <= 0.02
+            """
+        )
+    else:
+        sql = text(
+            """
+            SELECT p.id AS prestamo_id,
+                   p.cliente_id,
+                   TRIM(p.cedula) AS cedula,
+                   p.total_financiamiento,
+                   COALESCE(SUM(COALESCE(c.total_pagado, 0)), 0) AS sum_tp
+            FROM prestamos p
+            INNER JOIN cuotas c ON c.prestamo_id = p.id
+            WHERE UPPER(TRIM(COALESCE(p.estado, ''))) IN ('LIQUIDADO', 'FINIQUITO')
+            GROUP BY p.id, p.cliente_id, p.cedula, p.total_financiamiento
+            HAVING ABS(
+                COALESCE(SUM(COALESCE(c.total_pagado, 0)), 0) - COALESCE(p.total_financiamiento, 0)
+            ) <= 0.02
+            """
+        )
     rows = db.execute(sql).fetchall()
     now = datetime.utcnow()
     qualifying_ids = [int(r[0]) for r in rows]
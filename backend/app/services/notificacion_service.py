@@ -18,6 +18,7 @@ from app.core.serializers import to_finite_float, to_finite_float_or_zero
 from app.models.cliente import Cliente
 from app.models.cuota import Cuota
 from app.models.prestamo import Prestamo
+from app.models.prestamo_saldo import PrestamoSaldo
 from app.utils.cliente_emails import (
     lista_correo_principal_notificaciones_desde_objeto,
     secundario_distinto_del_principal,
@@ -38,6 +39,7 @@ from app.services.cuota_estado import (
     dias_retraso_desde_vencimiento,
     hoy_negocio,
 )
+from app.services.prestamo_saldos import leer_prestamo_saldos, lectura_resumen_habilitada
 
 logger = logging.getLogger(__name__)
 
@@ -258,8 +260,31 @@ def build_cuotas_pendiente_2_dias_antes_items(
 
     Nota: el nombre de función/ruta conserva «2_dias» por compatibilidad de API y config
     (PAGO_2_DIAS_ANTES_PENDIENTE); el criterio de fecha es hoy + 3.
+
+    Hoy: lista materializada (notificacion_elegibles_dia); otra fecha o sin tabla: en vivo.
     """
+    from app.services.notificaciones_elegibles_dia import (
+        SEGMENTO_D_2_ANTES_VENCIMIENTO,
+        leer_elegibles,
+    )
+
     hoy = fecha_referencia or hoy_negocio()
+    listas = leer_elegibles(db, (SEGMENTO_D_2_ANTES_VENCIMIENTO,), hoy)
+    if listas is not None:
+        out = listas[SEGMENTO_D_2_ANTES_VENCIMIENTO]
+    else:
+        out = build_cuotas_pendiente_2_dias_antes_vivo(db, hoy)
+    enriquecer_items_notificacion_revision_manual(db, out)
+    return out
+
+
+def build_cuotas_pendiente_2_dias_antes_vivo(
+    db: Session, hoy: date, prestamo_ids: Optional[Sequence[int]] = None
+) -> List[dict]:
+    """
+    Motor «2 días antes» (hoy + 3) en vivo, sin enriquecimiento (revisión manual / cachés).
+    ``prestamo_ids``: solo esos préstamos (recálculo incremental de elegibles); None = todos.
+    """
     fv_objetivo = hoy + timedelta(days=3)
     q = (
         select(Cuota, Cliente)
@@ -272,6 +297,8 @@ def build_cuotas_pendiente_2_dias_antes_items(
         .where(_prestamo_no_excluido_notif())
         .where(sql_cliente_sin_desistimiento())
     )
+    if prestamo_ids is not None:
+        q = q.where(Cuota.prestamo_id.in_(list(prestamo_ids)))
     rows = db.execute(q).all()
     if not rows:
         return []
@@ -309,12 +336,13 @@ def build_cuotas_pendiente_2_dias_antes_items(
                 total_pendiente_pagar=tp,
             )
         )
-    enriquecer_items_notificacion_revision_manual(db, out)
     return out
 
 
 def get_cuotas_pendientes_por_vencimientos(
-    db: Session, fechas_vencimiento: Sequence[date]
+    db: Session,
+    fechas_vencimiento: Sequence[date],
+    prestamo_ids: Optional[Sequence[int]] = None,
 ) -> List[Tuple[Cuota, Cliente]]:
     """
     Misma semántica que get_cuotas_pendientes_con_cliente pero solo filas cuya
@@ -322,12 +350,14 @@ def get_cuotas_pendientes_por_vencimientos(
     (timeout en /clientes-retrasados y get_notificaciones_tabs_data).
 
     No ejecuta sincronización de pagos: el listado debe ser lectura rápida; la conciliación
-    ocurre al registrar pagos o en jobs dedicados.
+    ocurre al registrar pagos o en jobs dedicados. ``prestamo_ids``: solo esos préstamos (None = todos).
     """
     fechas = tuple({d for d in fechas_vencimiento if d is not None})
     if not fechas:
         return []
     q = _select_cuotas_pendientes_con_cliente().where(Cuota.fecha_vencimiento.in_(fechas))
+    if prestamo_ids is not None:
+        q = q.where(Cuota.prestamo_id.in_(list(prestamo_ids)))
     rows = db.execute(q).all()
     return [(row[0], row[1]) for row in rows]
 
@@ -336,17 +366,21 @@ def get_cuotas_pendientes_vencidas_hasta(
     db: Session,
     fecha_vencimiento_max: date,
     fecha_vencimiento_min: Optional[date] = None,
+    prestamo_ids: Optional[Sequence[int]] = None,
 ) -> List[Tuple[Cuota, Cliente]]:
     """
     Cuotas pendientes notificables con fecha_vencimiento <= fecha_vencimiento_max
     (p. ej. hoy − 6 para atraso >= 6 días). Si se pasa fecha_vencimiento_min,
     también exige fecha_vencimiento >= ese valor (p. ej. hoy − 59 para atraso <= 59).
+    ``prestamo_ids``: solo esos préstamos (None = todos).
     """
     q = _select_cuotas_pendientes_con_cliente().where(
         Cuota.fecha_vencimiento <= fecha_vencimiento_max
     )
     if fecha_vencimiento_min is not None:
         q = q.where(Cuota.fecha_vencimiento >= fecha_vencimiento_min)
+    if prestamo_ids is not None:
+        q = q.where(Cuota.prestamo_id.in_(list(prestamo_ids)))
     rows = db.execute(q).all()
     return [(row[0], row[1]) for row in rows]
 
@@ -401,6 +435,27 @@ def sum_saldo_pendiente_cuotas_tabla_amortizacion_ui(
     ids = sorted({int(x) for x in prestamo_ids if x is not None})
     if not ids:
         return {}
+    out: Dict[int, float] = {}
+    if lectura_resumen_habilitada():
+        # Una fila por préstamo en prestamo_saldos; sin fila (p. ej. recién creado) se agrega sobre cuotas.
+        q_res = (
+            select(
+                PrestamoSaldo.prestamo_id,
+                PrestamoSaldo.saldo_pendiente,
+                case((_prestamo_no_excluido_notif(), 1), else_=0),
+            )
+            .join(Prestamo, PrestamoSaldo.prestamo_id == Prestamo.id)
+            .where(PrestamoSaldo.prestamo_id.in_(ids))
+        )
+        con_resumen: set[int] = set()
+        for pid, saldo, incluido in db.execute(q_res).all():
+            con_resumen.add(int(pid))
+            xf = to_finite_float(saldo) if incluido else None
+            if xf is not None:
+                out[int(pid)] = xf
+        ids = [pid for pid in ids if pid not in con_resumen]
+        if not ids:
+            return out
     m = func.coalesce(Cuota.monto, 0)
     tp = func.coalesce(Cuota.total_pagado, 0)
     per_cuota = func.greatest(0, m - tp)
@@ -411,7 +466,6 @@ def sum_saldo_pendiente_cuotas_tabla_amortizacion_ui(
         .where(_prestamo_no_excluido_notif())
         .group_by(Cuota.prestamo_id)
     )
-    out: Dict[int, float] = {}
     for row in db.execute(q).all():
         pid = int(row[0])
         total = row[1]
@@ -470,13 +524,20 @@ def contar_cuotas_atraso_por_prestamos(
     if not ids:
         return {}
     hoy = fecha_referencia or hoy_negocio()
+    out: dict[int, int] = {}
+    if lectura_resumen_habilitada():
+        # Filas de prestamo_saldos calculadas para el mismo día; el resto se agrega sobre cuotas.
+        for pid, fila in leer_prestamo_saldos(db, ids, fecha_referencia=hoy).items():
+            out[pid] = int(fila["cuotas_vencidas"] or 0)
+        ids = [pid for pid in ids if pid not in out]
+        if not ids:
+            return out
     cuotas = (
         db.execute(select(Cuota).where(Cuota.prestamo_id.in_(ids))).scalars().all()
     )
     by_pid: Dict[int, List[Cuota]] = defaultdict(list)
     for c in cuotas:
         by_pid[c.prestamo_id].append(c)
-    out: dict[int, int] = {}
     for pid in ids:
         n = 0
         for c in by_pid.get(pid, []):
@@ -20,7 +20,7 @@ from __future__ import annotations
 
 import logging
 from datetime import date, timedelta
-from typing import List, Optional, Set, Tuple
+from typing import List, Optional, Sequence, Set, Tuple
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
@@ -111,11 +111,14 @@ def clientes_en_regla_dia_siguiente(
 
 
 def select_prestamos_prejudicial(
-    db: Session, fecha_referencia: Optional[date] = None
+    db: Session,
+    fecha_referencia: Optional[date] = None,
+    prestamo_ids: Optional[Sequence[int]] = None,
 ) -> List[Tuple[int, int, int]]:
     """
     Prestamos «2 Cuotas»: >=2 cuotas impagas con atraso >= 1 dia,
     excluyendo titulares que ya califican en dia siguiente (prioridad 1).
+    ``prestamo_ids``: solo esos prestamos (None = todos); dia siguiente se evalua siempre completo.
 
     Returns list of (prestamo_id, cliente_id, total_cuotas_atrasadas).
     Fail-closed: propaga errores de BD.
@@ -136,6 +139,8 @@ def select_prestamos_prejudicial(
         .group_by(Prestamo.id, Prestamo.cliente_id)
         .having(func.count(Cuota.id) >= PREJUDICIAL_MIN_CUOTAS_CON_ATRASO_60)
     )
+    if prestamo_ids is not None:
+        q = q.where(Prestamo.id.in_(list(prestamo_ids)))
     rows = db.execute(q).all()
     cids_dia, _ceds_dia = clientes_en_regla_dia_siguiente(db, fecha_referencia)
     out: List[Tuple[int, int, int]] = []
@@ -0,0 +1,656 @@
+"""
+Listas de elegibles de Notificaciones materializadas por día (America/Caracas) y segmento.
+
+El motor de elegibilidad (cuotas en mora, jerarquía día siguiente > 2 Cuotas > 1 Cuota, revalidación
+estricta, totales por préstamo y alineación del contacto con el titular) se ejecuta una vez por día en
+el job 00:15 y se guarda en `notificacion_elegibles_dia`. Pestañas, conteos y envíos leen esas filas.
+
+Frescura (en sesión propia, una sola puesta al día por proceso a la vez):
+- recálculo completo del grupo si no tiene fila en `notificacion_elegibles_estado`, `calculado_desde` es
+  NULL (botón «Actualización manual», `invalidar_elegibles_dia`), el último recálculo completo
+  (`calculado_en`) supera NOTIFICACIONES_ELEGIBLES_MAX_EDAD_MIN (red de seguridad para cambios que no suben
+  versión, p. ej. SQL directo) o cambiaron más de _MAX_PRESTAMOS_INCREMENTAL préstamos;
+- si no, solo los préstamos con `prestamo_versiones.actualizado_en` posterior a `calculado_desde` (pagos,
+  cuotas, estado del préstamo, contacto del cliente, refresco de saldos), ampliados a los demás préstamos de
+  sus titulares (la jerarquía día siguiente > 2 Cuotas > 1 Cuota es por titular): el motor corre filtrado a
+  esos préstamos y sus filas se parchean por clave y hash. Las filas nuevas van al final de la lista.
+- `calculado_desde` es la marca: mayor `actualizado_en` leído antes de calcular, nunca el reloj. Como
+  actualizado_en es la hora del flush y no del commit, se guarda también `calculado_huella`
+  (`huella_versiones` de la ventana bajo la marca): si una transacción confirma tarde con un actualizado_en
+  anterior la huella cambia y el parche relee desde marca - PRESTAMO_VERSIONES_MARGEN_RELECTURA_MIN.
+  Transacciones más largas que el margen esperan a la edad máxima.
+
+Solo se sirve la fecha de hoy: listados retroactivos (`fecha_caracas`) siguen en vivo. Las columnas
+volátiles (revisión manual, caché de abonos y de fecha Q) no se guardan; se enriquecen en cada lectura.
+
+Recálculo completo: diff por clave (préstamo:cuota:cliente) y hash del ítem; solo se reescriben filas
+cambiadas.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.cliente import Cliente
+from app.models.notificacion_elegible_dia import NotificacionElegibleDia, NotificacionElegiblesEstado
+from app.models.prestamo import Prestamo
+from app.models.prestamo_version import (
+    PrestamoVersion,
+    huella_versiones,
+    margen_relectura_versiones,
+    tabla_disponible,
+)
+from app.services.cuota_estado import hoy_negocio
+
+logger = logging.getLogger(__name__)
+
+SEGMENTO_DIAS_1_RETRASO = "dias_1_retraso"
+SEGMENTO_DIAS_10_RETRASO = "dias_10_retraso"
+SEGMENTO_PREJUDICIAL = "prejudicial"
+SEGMENTO_D_2_ANTES_VENCIMIENTO = "d_2_antes_vencimiento"
+SEGMENTO_LIQUIDADOS = "liquidados"
+
+# Grupo = segmentos que salen de una misma pasada del motor (1 día y menor a 60 comparten consulta).
+GRUPOS: Dict[str, Tuple[str, ...]] = {
+    "retraso": (SEGMENTO_DIAS_1_RETRASO, SEGMENTO_DIAS_10_RETRASO),
+    "prejudicial": (SEGMENTO_PREJUDICIAL,),
+    "d_2_antes_vencimiento": (SEGMENTO_D_2_ANTES_VENCIMIENTO,),
+    "liquidados": (SEGMENTO_LIQUIDADOS,),
+}
+GRUPO_POR_SEGMENTO: Dict[str, str] = {seg: g for g, segs in GRUPOS.items() for seg in segs}
+# Liquidados no se envía por correo: sin datos de contacto que alinear.
+_SEGMENTOS_SIN_CONTACTO = frozenset({SEGMENTO_LIQUIDADOS})
+
+_TABLA_ITEMS = NotificacionElegibleDia.__tablename__
+_TABLA_ESTADO = NotificacionElegiblesEstado.__tablename__
+
+# Más préstamos cambiados desde la marca: recálculo completo del grupo en lugar de parchear.
+_MAX_PRESTAMOS_INCREMENTAL = 1000
+_LOTE_IN = 500
+
+# Un recálculo bajo demanda por proceso: lecturas concurrentes esperan y luego leen lo ya calculado.
+_recalculo_lock = threading.Lock()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _como_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """SQLite devuelve naive; PostgreSQL con zona. Se compara todo en UTC con zona."""
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    """prestamo_versiones.actualizado_en es naive UTC: la marca se compara en el mismo formato."""
+    return _como_utc(dt).replace(tzinfo=None)
+
+
+def _payload_json(item: dict) -> dict:
+    """Mismo dict que devolvería el listado en vivo, serializable a JSON (fechas/decimales como texto)."""
+    return json.loads(json.dumps(item, default=str))
+
+
+def _hash_item(payload: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _claves_items(items: Sequence[dict]) -> List[str]:
+    """Clave estable por ítem; repetidos (mismo préstamo/cuota/cliente) reciben sufijo #n."""
+    vistas: Dict[str, int] = {}
+    claves: List[str] = []
+    for it in items:
+        base = f"{it.get('prestamo_id') or ''}:{it.get('numero_cuota') or ''}:{it.get('cliente_id') or ''}"
+        n = vistas.get(base, 0)
+        vistas[base] = n + 1
+        claves.append(base if n == 0 else f"{base}#{n}")
+    return claves
+
+
+def _entero_o_none(val: Any) -> Optional[int]:
+    try:
+        return int(val) if val is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def materializacion_disponible(db: Session) -> bool:
+    conn = db.connection()
+    return tabla_disponible(conn, _TABLA_ITEMS) and tabla_disponible(conn, _TABLA_ESTADO)
+
+
+def _calcular_grupo(
+    db: Session, grupo: str, fecha: date, prestamo_ids: Optional[Sequence[int]] = None
+) -> Dict[str, List[dict]]:
+    """
+    Ejecuta el motor en vivo (sin enriquecimiento volátil) para los segmentos del grupo;
+    con `prestamo_ids`, solo para esos préstamos.
+    """
+    from app.api.v1.endpoints.notificaciones.routes import (
+        build_liquidados_items,
+        build_prejudicial_items_vivo,
+    )
+    from app.services.notificacion_service import (
+        alinear_items_contacto_titular_prestamo,
+        build_cuotas_pendiente_2_dias_antes_vivo,
+    )
+    from app.services.notificaciones_listados_motor import build_items_retraso_uno_y_diez_dias
+
+    if grupo == "retraso":
+        d1, d10 = build_items_retraso_uno_y_diez_dias(
+            db,
+            fecha,
+            formato="item_tab",
+            con_enriquecimiento_revision_manual=False,
+            prestamo_ids=prestamo_ids,
+        )
+        listas = {SEGMENTO_DIAS_1_RETRASO: d1, SEGMENTO_DIAS_10_RETRASO: d10}
+    elif grupo == "prejudicial":
+        listas = {SEGMENTO_PREJUDICIAL: build_prejudicial_items_vivo(db, fecha, prestamo_ids)}
+    elif grupo == "d_2_antes_vencimiento":
+        listas = {SEGMENTO_D_2_ANTES_VENCIMIENTO: build_cuotas_pendiente_2_dias_antes_vivo(db, fecha, prestamo_ids)}
+    elif grupo == "liquidados":
+        listas = {SEGMENTO_LIQUIDADOS: build_liquidados_items(db, prestamo_ids)}
+    else:
+        raise ValueError(f"Grupo de elegibles desconocido: {grupo}")
+    for seg, items in listas.items():
+        if seg not in _SEGMENTOS_SIN_CONTACTO:
+            alinear_items_contacto_titular_prestamo(db, items)
+    return listas
+
+
+def _fila_nueva(
+    fecha: date, segmento: str, clave: str, pos: int, item: dict, payload: dict, h: str, ahora: datetime
+) -> dict:
+    return {
+        "fecha_referencia": fecha,
+        "segmento": segmento,
+        "clave": clave,
+        "posicion": pos,
+        "prestamo_id": _entero_o_none(item.get("prestamo_id")),
+        "cliente_id": _entero_o_none(item.get("cliente_id")),
+        "payload": payload,
+        "item_hash": h,
+        "computed_at": ahora,
+    }
+
+
+def _anotar_estado(
+    db: Session,
+    fecha: date,
+    segmento: str,
+    hashes: Sequence[str],
+    resumen: Dict[str, int],
+    *,
+    desde: datetime,
+    huella: Optional[str],
+    inicio: datetime,
+    ahora: datetime,
+    completo: bool,
+) -> None:
+    """`calculado_en` solo avanza con el recálculo completo: de ahí se mide la edad máxima."""
+    estado = db.get(NotificacionElegiblesEstado, (fecha, segmento))
+    if estado is None:
+        estado = NotificacionElegiblesEstado(fecha_referencia=fecha, segmento=segmento)
+        db.add(estado)
+    estado.total = len(hashes)
+    estado.lista_hash = hashlib.sha256("\n".join(hashes).encode("ascii")).hexdigest()
+    estado.calculado_desde = desde
+    estado.calculado_huella = huella
+    if completo:
+        estado.calculado_en = ahora
+    estado.duracion_ms = int((ahora - inicio).total_seconds() * 1000)
+    estado.filas_cambiadas = resumen["nuevas"] + resumen["cambiadas"] + resumen["eliminadas"]
+
+
+def _guardar_segmento(
+    db: Session,
+    fecha: date,
+    segmento: str,
+    items: Sequence[dict],
+    *,
+    desde: datetime,
+    huella: Optional[str],
+    inicio: datetime,
+    ahora: datetime,
+) -> Dict[str, int]:
+    """Diff contra lo guardado: inserta nuevas, reescribe cambiadas (hash o posición), borra ausentes."""
+    t = NotificacionElegibleDia
+    existentes = {
+        r.clave: r
+        for r in db.execute(
+            select(t.id, t.clave, t.item_hash, t.posicion).where(
+                t.fecha_referencia == fecha, t.segmento == segmento
+            )
+        ).all()
+    }
+    nuevas: List[dict] = []
+    cambiadas = 0
+    hashes: List[str] = []
+    claves = _claves_items(items)
+    for pos, (clave, item) in enumerate(zip(claves, items)):
+        payload = _payload_json(item)
+        h = _hash_item(payload)
+        hashes.append(h)
+        previa = existentes.pop(clave, None)
+        if previa is None:
+            nuevas.append(_fila_nueva(fecha, segmento, clave, pos, item, payload, h, ahora))
+        elif previa.item_hash != h or previa.posicion != pos:
+            db.execute(
+                update(t)
+                .where(t.id == previa.id)
+                .values(
+                    posicion=pos,
+                    prestamo_id=_entero_o_none(item.get("prestamo_id")),
+                    cliente_id=_entero_o_none(item.get("cliente_id")),
+                    payload=payload,
+                    item_hash=h,
+                    computed_at=ahora,
+                )
+            )
+            cambiadas += 1
+    if nuevas:
+        db.execute(t.__table__.insert(), nuevas)
+    ids_borrar = [r.id for r in existentes.values()]
+    for i in range(0, len(ids_borrar), 1000):
+        db.execute(delete(t).where(t.id.in_(ids_borrar[i : i + 1000])))
+
+    resumen = {
+        "total": len(items),
+        "nuevas": len(nuevas),
+        "cambiadas": cambiadas,
+        "eliminadas": len(ids_borrar),
+    }
+    _anotar_estado(
+        db, fecha, segmento, hashes, resumen, desde=desde, huella=huella, inicio=inicio, ahora=ahora, completo=True
+    )
+    return resumen
+
+
+def _parchear_segmento(
+    db: Session,
+    fecha: date,
+    segmento: str,
+    items: Sequence[dict],
+    prestamo_ids: Sequence[int],
+    *,
+    desde: datetime,
+    huella: Optional[str],
+    inicio: datetime,
+    ahora: datetime,
+) -> Dict[str, int]:
+    """
+    Diff acotado a `prestamo_ids`: `items` es la salida del motor filtrado a esos préstamos. Las filas de
+    otros préstamos no se tocan; las nuevas se agregan al final.
+    """
+    t = NotificacionElegibleDia
+    filtro = (t.fecha_referencia == fecha, t.segmento == segmento)
+    ids = sorted({int(p) for p in prestamo_ids})
+    existentes = {}
+    for i in range(0, len(ids), _LOTE_IN):
+        for r in db.execute(
+            select(t.id, t.clave, t.item_hash).where(*filtro, t.prestamo_id.in_(ids[i : i + _LOTE_IN]))
+        ).all():
+            existentes[r.clave] = r
+    siguiente = db.scalar(select(func.max(t.posicion)).where(*filtro))
+    siguiente = 0 if siguiente is None else siguiente + 1
+    nuevas: List[dict] = []
+    cambiadas = 0
+    for clave, item in zip(_claves_items(items), items):
+        payload = _payload_json(item)
+        h = _hash_item(payload)
+        previa = existentes.pop(clave, None)
+        if previa is None:
+            nuevas.append(_fila_nueva(fecha, segmento, clave, siguiente, item, payload, h, ahora))
+            siguiente += 1
+        elif previa.item_hash != h:
+            db.execute(
+                update(t)
+                .where(t.id == previa.id)
+                .values(
+                    cliente_id=_entero_o_none(item.get("cliente_id")),
+                    payload=payload,
+                    item_hash=h,
+                    computed_at=ahora,
+                )
+            )
+            cambiadas += 1
+    ids_borrar = [r.id for r in existentes.values()]
+    for i in range(0, len(ids_borrar), 1000):
+        db.execute(delete(t).where(t.id.in_(ids_borrar[i : i + 1000])))
+    if nuevas:
+        db.execute(t.__table__.insert(), nuevas)
+
+    hashes = list(db.execute(select(t.item_hash).where(*filtro).order_by(t.posicion, t.id)).scalars())
+    resumen = {
+        "total": len(hashes),
+        "nuevas": len(nuevas),
+        "cambiadas": cambiadas,
+        "eliminadas": len(ids_borrar),
+    }
+    _anotar_estado(
+        db, fecha, segmento, hashes, resumen, desde=desde, huella=huella, inicio=inicio, ahora=ahora, completo=False
+    )
+    return resumen
+
+
+def materializar_elegibles_dia(
+    db: Session, fecha: Optional[date] = None, grupos: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    Recalcula y guarda los segmentos de `grupos` (todos por defecto) para `fecha` (hoy Caracas).
+    Commit por grupo: un fallo en uno no descarta lo ya guardado de los otros. La marca de cada grupo es
+    el mayor prestamo_versiones.actualizado_en (y su huella) leído antes de ejecutar el motor.
+    """
+    fecha = fecha or hoy_negocio()
+    if not materializacion_disponible(db):
+        return {"fecha": fecha.isoformat(), "omitido": "sin_tablas", "segmentos": {}}
+    segmentos: Dict[str, Any] = {}
+    errores: Dict[str, str] = {}
+    for grupo in list(grupos or GRUPOS):
+        inicio = _utcnow()
+        try:
+            desde = _ultimo_cambio_prestamo(db) or inicio
+            huella = _huella(db, desde)
+            listas = _calcular_grupo(db, grupo, fecha)
+            ahora = _utcnow()
+            for seg, items in listas.items():
+                segmentos[seg] = _guardar_segmento(
+                    db, fecha, seg, items, desde=desde, huella=huella, inicio=inicio, ahora=ahora
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            errores[grupo] = f"{type(e).__name__}: {e}"[:300]
+            logger.exception("[elegibles_dia] error materializando grupo=%s fecha=%s", grupo, fecha)
+    logger.info(
+        "[elegibles_dia] fecha=%s segmentos=%s errores=%s",
+        fecha.isoformat(),
+        {s: r["total"] for s, r in segmentos.items()},
+        list(errores),
+    )
+    return {"fecha": fecha.isoformat(), "segmentos": segmentos, "errores": errores}
+
+
+def invalidar_elegibles_dia(db: Session, fecha: Optional[date] = None) -> int:
+    """Marca los segmentos de la fecha para recálculo en la próxima lectura (no hace commit)."""
+    fecha = fecha or hoy_negocio()
+    if not materializacion_disponible(db):
+        return 0
+    res = db.execute(
+        update(NotificacionElegiblesEstado)
+        .where(NotificacionElegiblesEstado.fecha_referencia == fecha)
+        .values(calculado_desde=None)
+    )
+    return int(res.rowcount or 0)
+
+
+def purgar_elegibles_dia(db: Session, dias: int = 7) -> int:
+    """Borra fechas anteriores a hoy - `dias` (ítems y estado). Retorna ítems borrados."""
+    if not materializacion_disponible(db):
+        return 0
+    limite = hoy_negocio() - timedelta(days=max(1, int(dias)))
+    res = db.execute(delete(NotificacionElegibleDia).where(NotificacionElegibleDia.fecha_referencia < limite))
+    db.execute(delete(NotificacionElegiblesEstado).where(NotificacionElegiblesEstado.fecha_referencia < limite))
+    db.commit()
+    return int(res.rowcount or 0)
+
+
+def _max_edad() -> timedelta:
+    return timedelta(minutes=int(getattr(settings, "NOTIFICACIONES_ELEGIBLES_MAX_EDAD_MIN", 120) or 120))
+
+
+def _ultimo_cambio_prestamo(db: Session) -> Optional[datetime]:
+    if not tabla_disponible(db.connection(), PrestamoVersion.__tablename__):
+        return None
+    return _como_utc(db.scalar(select(func.max(PrestamoVersion.actualizado_en))))
+
+
+def _huella(db: Session, desde: datetime) -> Optional[str]:
+    if not tabla_disponible(db.connection(), PrestamoVersion.__tablename__):
+        return None
+    return huella_versiones(db, _naive_utc(desde))
+
+
+def _estados(db: Session, fecha: date, segmentos: Sequence[str]) -> Dict[str, NotificacionElegiblesEstado]:
+    return {
+        e.segmento: e
+        for e in db.execute(
+            select(NotificacionElegiblesEstado).where(
+                NotificacionElegiblesEstado.fecha_referencia == fecha,
+                NotificacionElegiblesEstado.segmento.in_(list(segmentos)),
+            )
+        ).scalars()
+    }
+
+
+def _requiere_completo(e: Optional[NotificacionElegiblesEstado], ahora: datetime) -> bool:
+    """Sin estado, invalidado o con el último recálculo completo más viejo que la edad máxima."""
+    if e is None or e.calculado_desde is None or e.calculado_en is None:
+        return True
+    return ahora - _como_utc(e.calculado_en) > _max_edad()
+
+
+def _grupos_vencidos(db: Session, fecha: date, segmentos: Sequence[str]) -> List[str]:
+    estados = _estados(db, fecha, segmentos)
+    ahora = _utcnow()
+    ultimo_cambio = _ultimo_cambio_prestamo(db)
+    huellas: Dict[datetime, Optional[str]] = {}
+    vencidos: List[str] = []
+    for seg in segmentos:
+        e = estados.get(seg)
+        fresco = not _requiere_completo(e, ahora)
+        if fresco and ultimo_cambio is not None:
+            desde = _como_utc(e.calculado_desde)
+            if ultimo_cambio > desde:
+                fresco = False
+            else:
+                # Una transacción que confirmó tarde bajo la marca cambia la huella de la ventana.
+                if desde not in huellas:
+                    huellas[desde] = _huella(db, desde)
+                fresco = huellas[desde] == e.calculado_huella
+        grupo = GRUPO_POR_SEGMENTO[seg]
+        if not fresco and grupo not in vencidos:
+            vencidos.append(grupo)
+    return vencidos
+
+
+def _prestamos_cambiados(
+    db: Session, desde: datetime, huella_previa: Optional[str]
+) -> Tuple[List[int], Optional[datetime], Optional[str]]:
+    """
+    (préstamos, hasta, huella): préstamos con versión en (desde, hasta], `hasta` = mayor actualizado_en y
+    `huella` su `huella_versiones`, leída antes que los préstamos (None si no hay versiones). Si la huella bajo
+    `desde` ya no es `huella_previa` se relee desde desde - margen. A lo sumo _MAX_PRESTAMOS_INCREMENTAL + 1.
+    """
+    v = PrestamoVersion
+    hasta = db.scalar(select(func.max(v.actualizado_en)))
+    if hasta is None:
+        return [], None, None
+    huella = huella_versiones(db, hasta)
+    piso = _naive_utc(desde)
+    if huella_versiones(db, piso) != huella_previa:
+        piso -= margen_relectura_versiones()
+    pids = [
+        int(pid)
+        for pid in db.execute(
+            select(v.prestamo_id)
+            .where(v.actualizado_en > piso, v.actualizado_en <= hasta)
+            .order_by(v.prestamo_id)
+            .limit(_MAX_PRESTAMOS_INCREMENTAL + 1)
+        ).scalars()
+    ]
+    return pids, _como_utc(hasta), huella
+
+
+def _ampliar_a_titulares(db: Session, prestamo_ids: Sequence[int]) -> List[int]:
+    """
+    Agrega los demás préstamos de los mismos titulares (por id o cédula, como la deduplicación entre
+    segmentos): un cambio en un préstamo puede sacar o meter a otro del mismo titular en «1 Cuota».
+    """
+    ids = sorted({int(p) for p in prestamo_ids})
+    afectados = set(ids)
+    for i in range(0, len(ids), _LOTE_IN):
+        titulares = select(Prestamo.cliente_id).where(Prestamo.id.in_(ids[i : i + _LOTE_IN]))
+        cedulas = select(Cliente.cedula).where(
+            Cliente.id.in_(titulares), Cliente.cedula.isnot(None), Cliente.cedula != ""
+        )
+        mismos = select(Cliente.id).where(or_(Cliente.id.in_(titulares), Cliente.cedula.in_(cedulas)))
+        afectados.update(
+            int(pid) for pid in db.execute(select(Prestamo.id).where(Prestamo.cliente_id.in_(mismos))).scalars()
+        )
+    return sorted(afectados)
+
+
+def _aplicar_cambios(
+    db: Session, fecha: date, grupo: str, prestamo_ids: Sequence[int], hasta: datetime, huella: Optional[str]
+) -> None:
+    """Motor filtrado a los préstamos cambiados (y los de sus titulares); parchea sus filas y mueve la marca."""
+    inicio = _utcnow()
+    try:
+        afectados = _ampliar_a_titulares(db, prestamo_ids)
+        # Sin préstamos en la ventana (solo cambió la huella): basta con mover la marca.
+        listas = _calcular_grupo(db, grupo, fecha, afectados) if afectados else {s: [] for s in GRUPOS[grupo]}
+        ahora = _utcnow()
+        resumen = {
+            seg: _parchear_segmento(
+                db, fecha, seg, items, afectados, desde=hasta, huella=huella, inicio=inicio, ahora=ahora
+            )
+            for seg, items in listas.items()
+        }
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("[elegibles_dia] error parcheando grupo=%s fecha=%s", grupo, fecha)
+        return
+    logger.info(
+        "[elegibles_dia] incremental grupo=%s prestamos=%d afectados=%d filas=%s",
+        grupo,
+        len(prestamo_ids),
+        len(afectados),
+        {s: r["nuevas"] + r["cambiadas"] + r["eliminadas"] for s, r in resumen.items()},
+    )
+
+
+def _recalcular_grupos(fecha: date, grupos: Sequence[str]) -> None:
+    """Pone al día en sesión propia (commit independiente del request que lee)."""
+    with _recalculo_lock:
+        db = SessionLocal()
+        try:
+            # Otro hilo pudo recalcular mientras se esperaba el lock.
+            pendientes = _grupos_vencidos(db, fecha, [s for g in grupos for s in GRUPOS[g]])
+            estados = _estados(db, fecha, [s for g in pendientes for s in GRUPOS[g]])
+            ahora = _utcnow()
+            completos: List[str] = []
+            for grupo in pendientes:
+                segs = GRUPOS[grupo]
+                if any(_requiere_completo(estados.get(s), ahora) for s in segs):
+                    completos.append(grupo)
+                    continue
+                e = min((estados[s] for s in segs), key=lambda x: _como_utc(x.calculado_desde))
+                pids, hasta, huella = _prestamos_cambiados(db, e.calculado_desde, e.calculado_huella)
+                if len(pids) > _MAX_PRESTAMOS_INCREMENTAL:
+                    completos.append(grupo)
+                elif hasta is not None:
+                    _aplicar_cambios(db, fecha, grupo, pids, hasta, huella)
+            if completos:
+                materializar_elegibles_dia(db, fecha, completos)
+        finally:
+            db.close()
+
+
+def leer_elegibles(
+    db: Session, segmentos: Sequence[str], fecha: Optional[date] = None
+) -> Optional[Dict[str, List[dict]]]:
+    """
+    Listas guardadas por segmento (orden del motor), recalculando antes las vencidas.
+    None si no aplica (otra fecha, función apagada, BD sin migración 094 o error): el llamador
+    usa el cálculo en vivo.
+    """
+    fecha = fecha or hoy_negocio()
+    if not getattr(settings, "NOTIFICACIONES_ELEGIBLES_MATERIALIZADOS", True) or fecha != hoy_negocio():
+        return None
+    try:
+        if not materializacion_disponible(db):
+            return None
+        vencidos = _grupos_vencidos(db, fecha, segmentos)
+        if vencidos:
+            t0 = time.perf_counter()
+            try:
+                _recalcular_grupos(fecha, vencidos)
+            except Exception as e:
+                # Sesión propia: el fallo no afecta a la transacción del llamador.
+                logger.warning("[elegibles_dia] recalculo bajo demanda falló grupos=%s: %s", vencidos, e)
+            logger.info(
+                "[elegibles_dia] recalculo bajo demanda grupos=%s ms=%.0f",
+                vencidos,
+                (time.perf_counter() - t0) * 1000,
+            )
+            # Si un grupo falló sigue sin estado fresco: no servir una lista vieja.
+            if _grupos_vencidos(db, fecha, segmentos):
+                return None
+        t = NotificacionElegibleDia
+        out: Dict[str, List[dict]] = {seg: [] for seg in segmentos}
+        for seg, payload in db.execute(
+            select(t.segmento, t.payload)
+            .where(t.fecha_referencia == fecha, t.segmento.in_(list(segmentos)))
+            .order_by(t.segmento, t.posicion, t.id)
+        ).all():
+            out[seg].append(dict(payload))
+        return out
+    except Exception as e:
+        logger.warning("[elegibles_dia] lectura materializada no disponible, se usa cálculo en vivo: %s", e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        return None
+
+
+def estado_elegibles_dia(db: Session, fecha: Optional[date] = None) -> Dict[str, Any]:
+    """Estado por segmento para la fecha (admin / diagnóstico)."""
+    fecha = fecha or hoy_negocio()
+    if not materializacion_disponible(db):
+        return {"fecha": fecha.isoformat(), "disponible": False, "segmentos": []}
+    ultimo_cambio = _ultimo_cambio_prestamo(db)
+    vencidos = set(_grupos_vencidos(db, fecha, list(GRUPO_POR_SEGMENTO)))
+    filas = db.execute(
+        select(NotificacionElegiblesEstado)
+        .where(NotificacionElegiblesEstado.fecha_referencia == fecha)
+        .order_by(NotificacionElegiblesEstado.segmento)
+    ).scalars()
+    return {
+        "fecha": fecha.isoformat(),
+        "disponible": True,
+        "habilitado": bool(getattr(settings, "NOTIFICACIONES_ELEGIBLES_MATERIALIZADOS", True)),
+        "max_edad_min": int(_max_edad().total_seconds() // 60),
+        "ultimo_cambio_prestamo": ultimo_cambio.isoformat() if ultimo_cambio else None,
+        "segmentos": [
+            {
+                "segmento": e.segmento,
+                "total": e.total,
+                "lista_hash": e.lista_hash,
+                "calculado_desde": e.calculado_desde.isoformat() if e.calculado_desde else None,
+                "calculado_huella": e.calculado_huella,
+                "calculado_en": e.calculado_en.isoformat() if e.calculado_en else None,
+                "duracion_ms": e.duracion_ms,
+                "filas_cambiadas": e.filas_cambiadas,
+                "vencido": GRUPO_POR_SEGMENTO.get(e.segmento) in vencidos,
+            }
+            for e in filas
+        ],
+    }
@@ -13,6 +13,8 @@ import threading
 import time
 from typing import Any, Callable, Optional
 
+from app.core import metricas
+
 logger = logging.getLogger(__name__)
 
 _lock = threading.Lock()
@@ -21,6 +23,15 @@ _active: dict[str, threading.Thread] = {}
 # Tope de espera en shutdown (s). Alineado a --graceful-timeout 900 con margen.
 SHUTDOWN_WAIT_ENVIO_BG_SEC = 850.0
 
+_lotes = metricas.contador(
+    "rapicredit_notif_envio_lotes_total",
+    "Lotes de envío en segundo plano: iniciado, omitido_activo (ya corría), ok, error.",
+    ("resultado",),
+)
+_duracion = metricas.histograma(
+    "rapicredit_notif_envio_lote_duracion_segundos", "Duración de lotes de envío.", buckets=metricas.BUCKETS_JOBS
+)
+
 
 def job_activo(clave: str) -> bool:
     with _lock:
@@ -37,6 +48,13 @@ def hay_envios_activos() -> bool:
     return bool(claves_activas())
 
 
+metricas.medidor(
+    "rapicredit_notif_envio_hilos_activos",
+    "Hilos de envío de notificaciones vivos.",
+    funcion=lambda: [({}, len(claves_activas()))],
+)
+
+
 def wait_envios_activos(timeout_sec: Optional[float] = None) -> bool:
     """
     Bloquea hasta que no queden hilos de envio vivos, o hasta timeout.
@@ -130,13 +148,17 @@ def spawn_envio_bg(
     clave = (clave or "").strip() or "default"
 
     def _runner() -> None:
+        t0 = time.monotonic()
         try:
             logger.info("[notif_bg] inicio clave=%s", clave)
             target(*args, **kwargs)
             logger.info("[notif_bg] fin ok clave=%s", clave)
+            _lotes.inc(resultado="ok")
         except Exception:
             logger.exception("[notif_bg] fin error clave=%s", clave)
+            _lotes.inc(resultado="error")
         finally:
+            _duracion.observe(time.monotonic() - t0)
             with _lock:
                 cur = _active.get(clave)
                 if cur is threading.current_thread():
@@ -146,6 +168,7 @@ def spawn_envio_bg(
         cur = _active.get(clave)
         if cur is not None and cur.is_alive():
             logger.warning("[notif_bg] omitido: ya activo clave=%s", clave)
+            _lotes.inc(resultado="omitido_activo")
             return False
         # daemon=False: permite que on_shutdown / graceful-timeout esperen el lote.
         t = threading.Thread(
@@ -155,4 +178,5 @@ def spawn_envio_bg(
         )
         _active[clave] = t
         t.start()
+        _lotes.inc(resultado="iniciado")
         return True
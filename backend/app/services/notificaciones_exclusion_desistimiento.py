@@ -28,6 +28,7 @@ from app.constants.prestamo_estados import (
 )
 from app.models.cliente import Cliente
 from app.models.prestamo import Prestamo
+from app.utils.cliente_emails import expr_email_normalizado_para_comparar
 
 logger = logging.getLogger(__name__)
 
@@ -160,8 +161,8 @@ def _resolver_cliente_ids(
         rows = db.execute(
             select(Cliente.id).where(
                 or_(
-                    func.lower(func.trim(Cliente.email)) == em,
-                    func.lower(func.trim(func.coalesce(Cliente.email_secundario, ""))) == em,
+                    expr_email_normalizado_para_comparar(Cliente.email) == em,
+                    expr_email_normalizado_para_comparar(Cliente.email_secundario) == em,
                 )
             )
         ).all()
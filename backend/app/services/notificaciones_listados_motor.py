@@ -11,7 +11,7 @@ Así se evita divergencia futura entre la vista y el armado de listas en el serv
 from __future__ import annotations
 
 from datetime import date, timedelta
-from typing import List, Literal, Tuple
+from typing import List, Literal, Optional, Sequence, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -44,6 +44,7 @@ def build_items_retraso_uno_y_diez_dias(
     *,
     formato: Literal["item", "item_tab"] = "item_tab",
     con_enriquecimiento_revision_manual: bool = True,
+    prestamo_ids: Optional[Sequence[int]] = None,
 ) -> Tuple[List[dict], List[dict]]:
     """
     Devuelve (lista_1_dia_atraso, lista_10_dias_atraso) según fecha de referencia (Caracas).
@@ -59,14 +60,17 @@ def build_items_retraso_uno_y_diez_dias(
     ``formato``:
       - ``item_tab``: mismas filas que ``get_notificaciones_tabs_data`` (envío / tabs).
       - ``item``: mismas filas que GET ``/clientes-retrasados`` (claves dias_*_atraso).
+
+    ``prestamo_ids``: solo cuotas de esos préstamos (recálculo incremental de elegibles); la jerarquía
+    sigue evaluándose contra todos los titulares.
     """
     fv_ayer = fecha_referencia - timedelta(days=1)
     fv_max_10 = fecha_referencia - timedelta(days=MIN_DIAS_ATRASO_PARA_LISTADO_10_DIAS)
     fv_min_10 = fecha_referencia - timedelta(days=MAX_DIAS_ATRASO_PARA_LISTADO_10_DIAS)
 
-    rows_1 = get_cuotas_pendientes_por_vencimientos(db, (fv_ayer,))
+    rows_1 = get_cuotas_pendientes_por_vencimientos(db, (fv_ayer,), prestamo_ids=prestamo_ids)
     rows_10 = get_cuotas_pendientes_vencidas_hasta(
-        db, fv_max_10, fecha_vencimiento_min=fv_min_10
+        db, fv_max_10, fecha_vencimiento_min=fv_min_10, prestamo_ids=prestamo_ids
     )
 
     pids = [c.prestamo_id for c, _ in rows_1] + [c.prestamo_id for c, _ in rows_10]
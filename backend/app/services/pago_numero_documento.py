@@ -330,3 +330,60 @@ def pago_con_error_ya_cargado_estricto(
             continue
         return pago_id
     return None
+
+
+def pagos_con_error_ya_cargados_estricto(
+    db: Session,
+    perrs: list[PagoConError],
+) -> dict[int, int]:
+    """
+    Versión por lote de `pago_con_error_ya_cargado_estricto`: {pago_con_error.id: pago.id}
+    con dos consultas (pagos por documento + cuota_pagos) en lugar de 1 + N por fila.
+    """
+    from app.models.cuota_pago import CuotaPago
+
+    por_doc: dict[str, list[PagoConError]] = {}
+    for perr in perrs:
+        num = normalize_documento(getattr(perr, "numero_documento", None))
+        if num:
+            por_doc.setdefault(num.upper(), []).append(perr)
+    if not por_doc:
+        return {}
+
+    doc_upper = func.upper(Pago.numero_documento)
+    candidatos: dict[str, list[tuple]] = {}
+    for doc, pago_id, cedula, prestamo_id in db.execute(
+        select(doc_upper, Pago.id, Pago.cedula_cliente, Pago.prestamo_id)
+        .where(doc_upper.in_(list(por_doc)))
+        .order_by(Pago.id.asc())
+    ).all():
+        candidatos.setdefault(doc, []).append((int(pago_id), cedula, prestamo_id))
+    if not candidatos:
+        return {}
+
+    ids_pago = [c[0] for lista in candidatos.values() for c in lista]
+    aplicados = set(
+        db.execute(
+            select(CuotaPago.pago_id).where(CuotaPago.pago_id.in_(ids_pago)).distinct()
+        ).scalars()
+    )
+
+    out: dict[int, int] = {}
+    for doc, lista_perr in por_doc.items():
+        for perr in lista_perr:
+            cedula_perr = normalizar_cedula_almacenamiento(
+                getattr(perr, "cedula_cliente", None) or ""
+            )
+            prestamo_perr = getattr(perr, "prestamo_id", None)
+            for pago_id, cedula, prestamo_pago in candidatos.get(doc, ()):
+                cedula_pago = normalizar_cedula_almacenamiento(cedula or "")
+                if cedula_perr and cedula_pago and cedula_perr != cedula_pago:
+                    continue
+                if prestamo_perr is not None and prestamo_pago is not None:
+                    if int(prestamo_perr) != int(prestamo_pago):
+                        continue
+                if pago_id not in aplicados:
+                    continue
+                out[int(perr.id)] = pago_id
+                break
+    return out
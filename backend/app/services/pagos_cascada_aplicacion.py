@@ -10,6 +10,8 @@ import logging
 from datetime import date, datetime
 from decimal import Decimal
 from time import perf_counter
+from typing import Callable, Optional
+
 from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
@@ -344,6 +346,10 @@ def _aplicar_pago_a_cuotas_interno(
 
         flush_started = perf_counter()
         db.flush()
+        if cuotas_completadas or cuotas_parciales:
+            from app.services.prestamo_saldos import refrescar_prestamo_saldos
+
+            refrescar_prestamo_saldos(db, [prestamo_id], fecha_referencia=hoy)
         flush_ms = _elapsed_ms(flush_started)
         integridad_started = perf_counter()
         validar_suma_aplicada_vs_monto_pago(db, pago.id, pago.monto_pagado)
@@ -366,3 +372,56 @@ def _aplicar_pago_a_cuotas_interno(
         _elapsed_ms(started_total),
     )
     return cuotas_completadas, cuotas_parciales
+
+
+def aplicar_pagos_a_cuotas_por_prestamo(
+    pagos: list[Pago],
+    db: Session,
+    *,
+    user=None,
+    tras_prestamo: Optional[Callable[[], None]] = None,
+) -> dict[int, tuple[int, int, Optional[str]]]:
+    """
+    Cascada por lote (p. ej. mover-a-pagos): agrupa los pagos por préstamo y recorre los préstamos en
+    orden de id (orden fijo de locks entre requests concurrentes). Por préstamo toma el lock una vez,
+    aplica sus pagos por (fecha_pago, id) y alinea LIQUIDADO una sola vez al final. `tras_prestamo` se
+    llama al terminar cada préstamo (p. ej. latido de un job).
+
+    Retorna {pago.id: (cuotas_completadas, cuotas_parciales, error | None)}; un error en un pago no
+    corta los demás (la cascada de ese pago se revierte en su savepoint). No hace commit.
+    """
+    from app.services.pagos_cascada_lock import adquirir_lock_cascada_prestamo
+
+    por_prestamo: dict[int, list[Pago]] = {}
+    for pago in pagos:
+        if pago.prestamo_id and float(pago.monto_pagado or 0) > 0:
+            por_prestamo.setdefault(int(pago.prestamo_id), []).append(pago)
+
+    resultado: dict[int, tuple[int, int, Optional[str]]] = {}
+    for prestamo_id in sorted(por_prestamo):
+        adquirir_lock_cascada_prestamo(db, prestamo_id)
+        hubo_aplicacion = False
+        for pago in sorted(por_prestamo[prestamo_id], key=lambda p: (str(p.fecha_pago or ""), p.id)):
+            try:
+                cc, cp = _aplicar_pago_a_cuotas_interno(pago, db, marcar_liquidado=False, user=user)
+            except Exception as e:
+                logger.error(
+                    "Cascada por lote: error aplicando pago id=%s prestamo_id=%s: %s",
+                    pago.id,
+                    prestamo_id,
+                    e,
+                    exc_info=True,
+                )
+                resultado[int(pago.id)] = (0, 0, str(e))
+                continue
+            resultado[int(pago.id)] = (cc, cp, None)
+            hubo_aplicacion = hubo_aplicacion or bool(cc or cp)
+        if hubo_aplicacion:
+            try:
+                with db.begin_nested():
+                    _marcar_prestamo_liquidado_si_corresponde(prestamo_id, db)
+            except Exception:
+                logger.exception("Cascada por lote: error alineando LIQUIDADO prestamo_id=%s", prestamo_id)
+        if tras_prestamo is not None:
+            tras_prestamo()
+    return resultado
@@ -28,6 +28,7 @@ from app.models.prestamo import Prestamo
 from app.models.reporte_contable_cache import ReporteContableCache
 from app.models.revisar_pago import RevisarPago
 from app.services.cuota_estado import sincronizar_columna_estado_cuotas
+from app.services.prestamo_saldos import refrescar_prestamo_saldos
 
 logger = logging.getLogger(__name__)
 
@@ -235,6 +236,7 @@ def eliminar_todos_pagos_prestamo(
 
     Por defecto solo préstamos APROBADO (alineado con el flujo «reemplazar pagos» en UI).
     Con contexto_revision_conciliar=True (admin, botón Conciliar) también permite LIQUIDADO.
+    Refresca `prestamo_saldos` en la misma transacción; no hace commit.
     """
     prestamo = db.get(Prestamo, prestamo_id)
     if not prestamo:
@@ -327,6 +329,7 @@ def eliminar_todos_pagos_prestamo(
     )
 
     _marcar_liquidado_tras_eliminar_pagos(db, prestamo_id)
+    refrescar_prestamo_saldos(db, [prestamo_id])
 
     return {
         "ok": True,
@@ -464,6 +467,7 @@ def realinear_cuotas_prestamo_desde_cuota_pagos(db: Session, prestamo_id: int) -
     sincronizar_columna_estado_cuotas(db, list(cuotas), commit=False)
     db.flush()
     _marcar_prestamo_liquidado_si_corresponde(prestamo_id, db)
+    refrescar_prestamo_saldos(db, [prestamo_id])
 
     integ = integridad_cuotas_prestamo(db, prestamo_id)
     return {
@@ -618,6 +622,7 @@ def _reset_y_reaplicar_cascada_prestamo_once(db: Session, prestamo_id: int, user
         ).scalars().all()
         sincronizar_columna_estado_cuotas(db, list(cuotas_despues), commit=False)
         _marcar_prestamo_liquidado_si_corresponde(prestamo_id, db)
+        refrescar_prestamo_saldos(db, [prestamo_id])
     except Exception as exc:
         # Dejar que deadlocks suban al wrapper de reintento.
         from app.core.db_transient import is_deadlock_error
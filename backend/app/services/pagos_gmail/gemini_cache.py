@@ -9,6 +9,8 @@ import time
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
+from app.core.metricas import cache_consulta, cache_tamano
+
 CACHE_TTL_HOURS = 24
 MAX_CACHE_SIZE = 1000
 
@@ -46,8 +48,11 @@ class GeminiComprobantesCache:
         if entry:
             if entry.is_expired():
                 del self.cache[key]
+                cache_consulta("gemini_comprobantes", False)
                 return None
+            cache_consulta("gemini_comprobantes", True)
             return entry.result
+        cache_consulta("gemini_comprobantes", False)
         return None
     
     def set(self, image_bytes: bytes, form_data: Dict[str, Any], result: Dict[str, Any]) -> None:
@@ -72,6 +77,7 @@ class GeminiComprobantesCache:
 
 
 _gemini_cache = GeminiComprobantesCache()
+cache_tamano("gemini_comprobantes", lambda: len(_gemini_cache.cache))
 
 
 def get_gemini_cache() -> GeminiComprobantesCache:
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Escaneo incremental del buzón de Pagos Gmail con la History API (PAGOS_GMAIL_HISTORY_INCREMENTAL).
+
+El escaneo programado (cada hora, filtro **all**) listaba la bandeja completa con **q** y pedía metadata de cada
+mensaje, aunque casi todos ya tuvieran etiqueta final y se omitieran. En modo incremental:
+
+  1. ``users.getProfile`` da el buzón y su historyId actual.
+  2. Con cursor guardado (tabla ``configuracion``, clave ``pagos_gmail_history:<buzón>:<filtro>``),
+     ``users.history.list`` devuelve solo los mensajes agregados al inbox o con cambios de etiqueta relevantes
+     desde la corrida anterior, y se pide ``format=full`` únicamente de esos para aplicar el mismo criterio
+     inbox + media que **q** (``list_messages_by_ids_for_scan_filter``).
+  3. Sin cursor, o con el historial vencido en Gmail (404), se hace el listado completo de siempre; el cursor
+     parte del historyId leído *antes* de listar (lo que llegue durante la corrida se verá en la siguiente).
+
+El cursor solo avanza cuando la corrida termina en **success** (``guardar_cursor``); si falla, la siguiente ronda
+vuelve a leer el mismo tramo. Los correos que fallaron dentro de una corrida exitosa quedan en ``pendientes`` y se
+vuelven a incluir en la próxima (el listado completo también los habría vuelto a traer).
+"""
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.configuracion import Configuracion
+from app.services.pagos_gmail.gmail_service import (
+    PAGOS_GMAIL_HISTORY_SCAN_FILTERS,
+    GmailHistoryExpiredError,
+    get_gmail_profile,
+    list_history_changed_message_ids,
+    list_messages_by_ids_for_scan_filter,
+)
+
+logger = logging.getLogger(__name__)
+
+CLAVE_PREFIJO = "pagos_gmail_history:"
+
+MODO_HISTORIAL = "historial"
+MODO_COMPLETO_SIN_CURSOR = "completo_sin_cursor"
+MODO_COMPLETO_EXPIRADO = "completo_historial_expirado"
+
+
+@dataclass
+class CursorHistorial:
+    """Posición a guardar al cerrar la corrida con éxito."""
+
+    buzon: str
+    filtro: str
+    history_id: Optional[str]
+    modo: str
+    pendientes: List[str] = field(default_factory=list)
+
+
+def _filtro_cursor(filter_type: str) -> str:
+    ft = (filter_type or "all").strip().lower()
+    # pending_identification es alias de all (mismo listado): comparten cursor.
+    return "all" if ft == "pending_identification" else ft
+
+
+def admite_incremental(filter_type: str, from_email: Optional[str] = None) -> bool:
+    """El modo historial solo reemplaza listados inbox + media sin acotar por remitente."""
+    return (filter_type or "").strip().lower() in PAGOS_GMAIL_HISTORY_SCAN_FILTERS and not (from_email or "").strip()
+
+
+def _clave(buzon: str, filtro: str) -> str:
+    return f"{CLAVE_PREFIJO}{buzon}:{filtro}"[:100]
+
+
+def leer_cursor(db: Session, buzon: str, filter_type: str = "all") -> Optional[dict]:
+    row = db.get(Configuracion, _clave(buzon, _filtro_cursor(filter_type)))
+    if not row or not row.valor:
+        return None
+    try:
+        data = json.loads(row.valor)
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) and data.get("history_id") else None
+
+
+def guardar_cursor(db: Session, cursor: CursorHistorial, *, ids_con_error: Optional[List[str]] = None) -> None:
+    """Persiste el historyId (commit propio). Un fallo solo se registra: la próxima corrida hará listado completo."""
+    if not cursor.history_id:
+        return
+    valor = json.dumps(
+        {
+            "history_id": str(cursor.history_id),
+            "pendientes": list(dict.fromkeys(ids_con_error or []))[:500],
+            "modo": cursor.modo,
+            "actualizado": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        }
+    )
+    clave = _clave(cursor.buzon, cursor.filtro)
+    try:
+        row = db.get(Configuracion, clave)
+        if row:
+            row.valor = valor
+        else:
+            db.add(Configuracion(clave=clave, valor=valor))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("[PAGOS_GMAIL] No se pudo guardar cursor de historial %s: %s", clave, e)
+
+
+def listar_mensajes_incremental(
+    db: Session,
+    service: Any,
+    filter_type: str,
+    listar_completo: Callable[[], List[dict]],
+) -> Tuple[List[dict], CursorHistorial]:
+    """
+    Mensajes a procesar (mismo formato que ``list_messages_by_filter``) y cursor a guardar si la corrida termina bien.
+    ``listar_completo`` es el listado por **q** de siempre (sin cursor o historial vencido).
+    """
+    filtro = _filtro_cursor(filter_type)
+    perfil = get_gmail_profile(service)
+    buzon = (perfil.get("emailAddress") or "me").strip().lower()
+    history_actual = str(perfil["historyId"]) if perfil.get("historyId") else None
+    previo = leer_cursor(db, buzon, filtro)
+
+    if previo is not None:
+        try:
+            ids, history_nuevo = list_history_changed_message_ids(service, previo["history_id"], filtro)
+            pendientes = [str(x) for x in previo.get("pendientes") or []]
+            ids = list(dict.fromkeys(pendientes + ids))
+            mensajes = list_messages_by_ids_for_scan_filter(service, ids, filtro)
+            logger.info(
+                "[PAGOS_GMAIL] Listado incremental buzon=%s desde historyId=%s: %d cambio(s) -> %d correo(s) elegibles",
+                buzon,
+                previo["history_id"],
+                len(ids),
+                len(mensajes),
+            )
+            return mensajes, CursorHistorial(buzon, filtro, history_nuevo or history_actual, MODO_HISTORIAL)
+        except GmailHistoryExpiredError as e:
+            logger.warning("[PAGOS_GMAIL] %s; listado completo y nuevo cursor", e)
+            modo = MODO_COMPLETO_EXPIRADO
+    else:
+        modo = MODO_COMPLETO_SIN_CURSOR
+
+    mensajes = listar_completo()
+    return mensajes, CursorHistorial(buzon, filtro, history_actual, modo)
@@ -257,11 +257,11 @@ def payload_has_media_candidate(payload: Optional[dict]) -> bool:
         mt = (part.get("mimeType") or "").lower()
         if mt in MIME_IMAGE_OR_PDF:
             return True
+        fname = part.get("filename") or ""
         if is_word_docx_attachment(mt, fname):
             return True
         if mt == "message/rfc822":
             return True
-        fname = part.get("filename") or ""
         if fname and is_allowed_attachment(fname):
             return True
         if fname.strip().lower().endswith((".eml", ".msg")):
@@ -772,6 +772,169 @@ def count_messages_by_filter(
         ) from e
 
 
+class GmailHistoryExpiredError(PagosGmailGmailListError):
+    """``startHistoryId`` fuera de la ventana de historial de Gmail (HTTP 404): hace falta un listado completo."""
+
+
+# Filtros de escaneo que el modo historial puede resolver sin q de Gmail (inbox + media, con o sin is:unread/is:read).
+PAGOS_GMAIL_HISTORY_SCAN_FILTERS = ("all", "pending_identification", "unread", "read")
+# Etiquetas cuyo retiro no vuelve elegible un correo (el pipeline omite por etiquetas de usuario, no por estas).
+_HISTORY_LABELS_IRRELEVANTES = frozenset({"STARRED", "IMPORTANT", "UNREAD", "SENT", "DRAFT", "CHAT"})
+
+
+def get_gmail_profile(service: Any) -> dict:
+    """``users.getProfile``: emailAddress e historyId actual del buzón (1 unidad de cuota)."""
+    return service.users().getProfile(userId="me").execute() or {}
+
+
+def _history_cambio_relevante(tipo: str, label_ids: List[str], filter_type: str) -> bool:
+    """
+    Si un registro de historial puede volver elegible el mensaje para el escaneo ``filter_type``.
+    Las etiquetas finales que pone el propio pipeline (y el leído) no vuelven a traer el mensaje.
+    """
+    ft = (filter_type or "").strip().lower()
+    labels = set(label_ids or [])
+    if tipo == "labelsAdded":
+        return "INBOX" in labels or (ft == "unread" and "UNREAD" in labels)
+    if tipo == "labelsRemoved":
+        if ft == "read" and "UNREAD" in labels:
+            return True
+        return any(
+            lb not in _HISTORY_LABELS_IRRELEVANTES and not lb.startswith("CATEGORY_") for lb in labels
+        )
+    return False
+
+
+def list_history_changed_message_ids(
+    service: Any,
+    start_history_id: str,
+    filter_type: str = "all",
+) -> Tuple[List[str], Optional[str]]:
+    """
+    ``users.history.list`` desde ``start_history_id``: ids de mensajes agregados al inbox o con cambios de
+    etiqueta que pueden volverlos elegibles (ver ``_history_cambio_relevante``), en orden de aparición.
+    Devuelve (ids, historyId actual del buzón). Solo lista ids: la metadata se pide aparte y únicamente para estos.
+    Lanza GmailHistoryExpiredError si Gmail ya no tiene ese historial (404).
+    """
+    from googleapiclient.errors import HttpError
+
+    ids: List[str] = []
+    vistos: Set[str] = set()
+    ultimo_history_id: Optional[str] = None
+    page_token: Optional[str] = None
+
+    def _agregar(mid: Optional[str]) -> None:
+        if mid and mid not in vistos:
+            vistos.add(mid)
+            ids.append(mid)
+
+    try:
+        while True:
+            params: dict = {
+                "userId": "me",
+                "startHistoryId": str(start_history_id),
+                "historyTypes": ["messageAdded", "labelAdded", "labelRemoved"],
+                "maxResults": 500,
+            }
+            if page_token:
+                params["pageToken"] = page_token
+            result = service.users().history().list(**params).execute() or {}
+            for h in result.get("history") or []:
+                for item in h.get("messagesAdded") or []:
+                    msg = item.get("message") or {}
+                    # labelIds al agregarse: enviados/borradores sin INBOX no entran al escaneo.
+                    if "INBOX" in (msg.get("labelIds") or ["INBOX"]):
+                        _agregar(msg.get("id"))
+                for tipo in ("labelsAdded", "labelsRemoved"):
+                    for item in h.get(tipo) or []:
+                        if _history_cambio_relevante(tipo, item.get("labelIds") or [], filter_type):
+                            _agregar((item.get("message") or {}).get("id"))
+            if result.get("historyId"):
+                ultimo_history_id = str(result["historyId"])
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
+    except HttpError as e:
+        if e.resp.status == 404:
+            raise GmailHistoryExpiredError(
+                f"Historial Gmail expirado (startHistoryId={start_history_id})."
+            ) from e
+        logger.warning("Gmail list_history_changed_message_ids(%s): %s", start_history_id, e)
+        raise PagosGmailGmailListError(
+            f"No se pudo leer el historial Gmail (HTTP {e.resp.status})."
+        ) from e
+    logger.info(
+        "[PAGOS_GMAIL] history.list desde %s: %d mensaje(s) con cambios relevantes (historyId actual=%s)",
+        start_history_id,
+        len(ids),
+        ultimo_history_id,
+    )
+    return ids, ultimo_history_id
+
+
+def _payload_solo_metadata(payload: dict, metadata_headers: Tuple[str, ...] = ("from", "date", "subject")) -> dict:
+    """
+    Reduce un payload format=full a lo que trae format=metadata con ``metadataHeaders`` From/Date/Subject
+    (sin partes, datos del cuerpo ni otras cabeceras), para que el pipeline vea lo mismo que tras un listado.
+    """
+    out = {k: v for k, v in payload.items() if k not in ("parts", "body", "headers")}
+    out["headers"] = [h for h in payload.get("headers") or [] if (h.get("name") or "").lower() in metadata_headers]
+    body = payload.get("body") or {}
+    if "size" in body:
+        out["body"] = {"size": body["size"]}
+    return out
+
+
+def list_messages_by_ids_for_scan_filter(
+    service: Any,
+    message_ids: List[str],
+    filter_type: str = "all",
+) -> List[dict]:
+    """
+    Equivalente local del criterio **q** de ``list_messages_by_filter`` aplicado a ids concretos (modo historial):
+    en INBOX (no SPAM/TRASH), con parte imagen/PDF/Word/.eml (``payload_has_media_candidate``) y, para
+    **unread**/**read**, según la etiqueta UNREAD. Mismo formato de salida que ``list_messages_by_filter``
+    (payload reducido a metadata). Ids borrados o inaccesibles se omiten.
+    """
+    ft = (filter_type or "").strip().lower()
+    if not message_ids:
+        return []
+    full_by_id = batch_get_messages_full(service, list(message_ids))
+    out: List[dict] = []
+    for mid in message_ids:
+        msg = full_by_id.get(mid)
+        if not msg:
+            continue
+        label_ids = list(msg.get("labelIds") or [])
+        if "INBOX" not in label_ids or "SPAM" in label_ids or "TRASH" in label_ids:
+            continue
+        if ft == "unread" and "UNREAD" not in label_ids:
+            continue
+        if ft == "read" and "UNREAD" in label_ids:
+            continue
+        full_payload = msg.get("payload") or {}
+        if not payload_has_media_candidate(full_payload):
+            continue
+        payload = _payload_solo_metadata(full_payload)
+        headers = {h["name"].lower(): h["value"] for h in payload.get("headers", [])}
+        try:
+            internal_date_ms = int(msg.get("internalDate") or 0)
+        except (TypeError, ValueError):
+            internal_date_ms = 0
+        _tid_raw = (msg.get("threadId") or "").strip()
+        out.append(
+            {
+                "id": mid,
+                "thread_id": _tid_raw[:100] if _tid_raw else None,
+                "payload": payload,
+                "headers": headers,
+                "internal_date_ms": internal_date_ms,
+                "label_ids": label_ids,
+            }
+        )
+    return out
+
+
 def list_unread_with_attachments(service: Any) -> List[dict]:
     """
     Lista correos en inbox con criterio imagen/PDF (leidos y no leidos; mismo listado que "all").
@@ -197,7 +197,14 @@ from app.services.pagos_gmail.gmail_service import (
     PAGOS_GMAIL_LABEL_CONCILIACION,
     PAGOS_GMAIL_LOTE_REMITENTE_IT_MASTER,
 )
+from app.services.pagos_gmail.gmail_history import (
+    CursorHistorial,
+    admite_incremental,
+    guardar_cursor,
+    listar_mensajes_incremental,
+)
 from app.utils.cedula_almacenamiento import resolver_cedula_almacenada_en_clientes
+from app.utils.cliente_emails import expr_email_normalizado_para_comparar
 from app.services.pagos_gmail.gemini_service import (
     classify_and_extract_pagos_gmail_attachment,
     PAGOS_GMAIL_FORMATOS_PLANTILLA,
@@ -312,7 +319,7 @@ def _cedula_por_email_cliente(db: Session, email_raw: str) -> tuple[Optional[str
     try:
         rows_main = db.execute(
             select(Cliente.cedula)
-            .where(func.lower(func.trim(Cliente.email)) == em)
+            .where(expr_email_normalizado_para_comparar(Cliente.email) == em)
             .limit(2)
         ).scalars().all()
         if len(rows_main) == 1:
@@ -328,7 +335,7 @@ def _cedula_por_email_cliente(db: Session, email_raw: str) -> tuple[Optional[str
             select(Cliente.cedula)
             .where(Cliente.email_secundario.isnot(None))
             .where(func.trim(Cliente.email_secundario) != "")
-            .where(func.lower(func.trim(Cliente.email_secundario)) == em)
+            .where(expr_email_normalizado_para_comparar(Cliente.email_secundario) == em)
             .limit(2)
         ).scalars().all()
         if len(rows_sec) == 1:
@@ -744,6 +751,7 @@ def run_pipeline(
     only_message_ids: Optional[list[str]] = None,
     max_messages: Optional[int] = None,
     criterio_remitente: str = "remitente",
+    incremental: bool = False,
 ) -> tuple[Optional[int], str]:
     """
     Ejecuta el pipeline Gmail -> Gemini -> BD (comprobante en pago_comprobante_imagen; sin subidas a Drive).
@@ -766,6 +774,9 @@ def run_pipeline(
     Cada mensaje que **entraba no leido** (labelIds al listar) se marca **leido** al terminar de procesarlo en esa corrida.
     Mensajes con etiquetas de usuario Gmail se omiten salvo que sean **solo** combinaciones de **MANUAL** y/o **ERROR EMAIL** (en **all** / **unread** / **read** / **pending_identification**; re-lectura A/B con cédula en imagen solo si es **exactamente** ERROR EMAIL), modo ``error_email_rescan``, o pasada redig **MANUAL+ERROR**. Fallo al listar catalogo de etiquetas: metrica ``gmail_labels_list_failed`` y no se aplica omision por etiqueta.
     No hay dedupe por contenido para saltar candidatos: cada candidato (imagen o PDF de una pagina) se escanea y evalúa.
+    incremental=True (escaneo programado): en **all**/**unread**/**read** sin remitente ni tope, lista solo lo cambiado
+    desde la última corrida exitosa con la History API de Gmail (ver ``gmail_history.py``); sin cursor o con historial
+    vencido, listado completo. El cursor avanza solo si la corrida termina en success.
     Returns (sync_id, "success"|"error"|"no_credentials").
     """
     # Modo manual por remitente: el endpoint valida que from_email exista; aquí solo normalizamos.
@@ -887,6 +898,9 @@ def run_pipeline(
     _sha256_pending_seen_in_run: set[str] = set()
     # Referencias ya empaquetadas en esta corrida (evita duplicados por sufijo/prefijo truncado).
     _refs_registradas_corrida: list[dict] = []
+    # Modo historial: cursor a guardar al terminar con success, y correos con error para reintentar en la próxima.
+    cursor_historial: Optional[CursorHistorial] = None
+    ids_error_corrida: list[str] = []
     # IDs de gmail_temporal cuyo delete inmediato falló tras alta automática OK; se reintenta antes de cerrar cada mensaje.
     pending_gmail_temporal_delete_ids: set[int] = set()
     # Métricas para GET /pagos/gmail/status → last_run_summary (diagnóstico en toast UI).
@@ -916,6 +930,7 @@ def run_pipeline(
         "manual_error_redigitaliza_listed": 0,
         "manual_error_redigitaliza_error": "",
         "messages_pipeline_errors": 0,
+        "gmail_list_mode": "completo",
     }
     none_reason_counts: dict[str, int] = {}
     none_reason_hint_counts: dict[str, int] = {}
@@ -955,6 +970,7 @@ def run_pipeline(
     try:
 
         def fetch_sorted_batch() -> list[dict]:
+            nonlocal cursor_historial
             if only_ids_set:
                 # Modo selección: no llamamos a messages.list. Construimos msg_info equivalentes
                 # con batch_get_messages_metadata (cabeceras + labelIds + internalDate).
@@ -995,6 +1011,16 @@ def run_pipeline(
                     len(raw_messages),
                     len(only_ids_set),
                 )
+            elif incremental and max_messages_int is None and admite_incremental(scan_filter, from_email_lc):
+                raw_messages, cursor_historial = listar_mensajes_incremental(
+                    db,
+                    gmail_svc,
+                    scan_filter,
+                    lambda: list_messages_by_filter(
+                        gmail_svc, scan_filter, from_email=from_email_lc, criterio=criterio_norm
+                    ),
+                )
+                run_stats["gmail_list_mode"] = cursor_historial.modo
             else:
                 raw_messages = list_messages_by_filter(
                     gmail_svc, scan_filter, from_email=from_email_lc, criterio=criterio_norm
@@ -2775,6 +2801,7 @@ def run_pipeline(
                     run_stats["messages_pipeline_errors"] = int(
                         run_stats.get("messages_pipeline_errors", 0) or 0
                     ) + 1
+                    ids_error_corrida.append(msg_id)
                     logger.exception(
                         "[PAGOS_GMAIL] Error procesando correo msg=%s (se continua con el siguiente): %s",
                         msg_id,
@@ -2891,6 +2918,7 @@ def run_pipeline(
             "messages_pipeline_errors": int(
                 run_stats.get("messages_pipeline_errors", 0) or 0
             ),
+            "gmail_list_mode": run_stats["gmail_list_mode"],
             "gemini_model": _gemini_model_snapshot,
             **_pagos_metrics,
         }
@@ -2915,6 +2943,8 @@ def run_pipeline(
             run_summary=_run_summary_ok,
             error_message=None,
         )
+        if cursor_historial is not None:
+            guardar_cursor(db, cursor_historial, ids_con_error=ids_error_corrida)
         return sync_id, "success"
 
     except PagosGmailGmailListError as e:
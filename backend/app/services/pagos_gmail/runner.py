@@ -65,6 +65,7 @@ def _schedule_auto_continue_round(
     from_email: Optional[str],
     criterio_remitente: str,
     continue_round: int,
+    incremental: bool = False,
 ) -> None:
     new_db = SessionLocal()
     try:
@@ -98,6 +99,7 @@ def _schedule_auto_continue_round(
         criterio_remitente=criterio_remitente,
         continue_round=continue_round,
         parent_sync_id=parent_sync_id,
+        incremental=incremental,
     )
 
 
@@ -112,6 +114,7 @@ def _maybe_auto_continue_after_run(
     max_messages: Optional[int],
     criterio_remitente: str,
     continue_round: int,
+    incremental: bool = False,
 ) -> None:
     sync = (
         db.execute(select(PagosGmailSync).where(PagosGmailSync.id == sync_id))
@@ -139,6 +142,7 @@ def _maybe_auto_continue_after_run(
         from_email=from_email,
         criterio_remitente=criterio_remitente,
         continue_round=continue_round + 1,
+        incremental=incremental,
     )
 
 
@@ -152,6 +156,7 @@ def run_gmail_pipeline_background(
     *,
     continue_round: int = 0,
     parent_sync_id: Optional[int] = None,
+    incremental: bool = False,
 ) -> None:
     """Ejecuta el pipeline con su propia sesion de BD (no comparte el timeout HTTP de 30s)."""
     db = SessionLocal()
@@ -179,6 +184,7 @@ def run_gmail_pipeline_background(
             only_message_ids=only_message_ids,
             max_messages=max_messages,
             criterio_remitente=criterio_remitente,
+            incremental=incremental,
         )
         if final_status == "success":
             from app.api.v1.endpoints.pagos_gmail.routes import (
@@ -202,6 +208,7 @@ def run_gmail_pipeline_background(
             max_messages=max_messages,
             criterio_remitente=criterio_remitente,
             continue_round=continue_round,
+            incremental=incremental,
         )
     except Exception as e:
         logger.info("[PAGOS_GMAIL] [ETAPA] Pipeline finalizado sync_id=%s", sync_id)
@@ -231,6 +238,7 @@ def run_gmail_pipeline_background(
                 max_messages=max_messages,
                 criterio_remitente=criterio_remitente,
                 continue_round=continue_round,
+                incremental=incremental,
             )
         except Exception:
             pass
@@ -248,6 +256,7 @@ def schedule_gmail_pipeline_background(
     *,
     continue_round: int = 0,
     parent_sync_id: Optional[int] = None,
+    incremental: bool = False,
 ) -> None:
     """Hilo dedicado: no bloquea el event loop ni el pool del scheduler APScheduler."""
     threading.Thread(
@@ -261,6 +270,7 @@ def schedule_gmail_pipeline_background(
             "criterio_remitente": criterio_remitente,
             "continue_round": continue_round,
             "parent_sync_id": parent_sync_id,
+            "incremental": incremental,
         },
         name=f"pagos-gmail-pipeline-{sync_id}",
         daemon=True,
@@ -0,0 +1,547 @@
+"""
+Importación reanudable de reportados aprobados (Cobros) a la tabla pagos.
+
+Antes: POST /pagos/importar-desde-cobros cargaba todos los `pagos_reportados` aprobados, creaba todos los
+`Pago`, aplicaba la cascada pago por pago y hacía un único commit al final: un día con muchas aprobaciones
+dejaba el request minutos con locks de cuotas tomados y, si el worker caía, no quedaba nada.
+
+Ahora la importación es un job (`importacion_cobros_jobs`) que corre en un hilo con sesión propia:
+1. Al crearlo se fija el tope (`hasta_reportado_id` = máximo id aprobado en ese momento): los reportados que
+   lleguen durante la importación entran en la siguiente.
+2. Tramos por keyset (`id > cursor_reportado_id ORDER BY id LIMIT PAGOS_IMPORTAR_COBROS_CHUNK`). Por tramo:
+   precarga de documentos existentes, `importar_un_pago_reportado_a_pagos` por fila (savepoint propio),
+   cascada agrupada por préstamo (`aplicar_pagos_a_cuotas_por_prestamo`) y, en la misma transacción, avance
+   del cursor y de los contadores. Un commit por tramo: si el proceso muere, el tramo en curso se revierte
+   completo y al reanudar se repite sin duplicar pagos.
+3. El cursor solo avanza con el `ejecutor` (token del hilo) vigente: tras un reanudar, un hilo viejo que
+   despierte no puede confirmar tramos.
+4. Cancelar marca `cancelando`; el tramo en curso termina y el job queda `cancelado` (reanudable). Un job
+   `en_proceso` sin latido en PAGOS_IMPORTAR_COBROS_STALE_MIN se considera interrumpido y se reanuda desde
+   su cursor. El latido se confirma al cerrar cada tramo y, dentro del tramo, en una sesión aparte tras cada
+   reportado y cada préstamo de la cascada (como mucho cada _LATIDO_MIN_SEG): un tramo lento no hace pasar
+   por interrumpido a un hilo vivo.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session
+
+from app.core import metricas
+from app.models.datos_importados_conerrores import DatosImportadosConErrores
+from app.models.importacion_cobros_job import ImportacionCobrosJob
+from app.models.pago_reportado import PagoReportado
+
+logger = logging.getLogger(__name__)
+
+ESTADO_EN_PROCESO = "en_proceso"
+ESTADO_CANCELANDO = "cancelando"
+ESTADO_CANCELADO = "cancelado"
+ESTADO_COMPLETADO = "completado"
+ESTADO_ERROR = "error"
+ESTADOS_ACTIVOS = (ESTADO_EN_PROCESO, ESTADO_CANCELANDO)
+
+_DEFAULT_CHUNK = 200
+_DEFAULT_STALE_MIN = 10
+_LIMITE_ERRORES_DETALLE = 100
+_LIMITE_SIN_APLICACION = 50
+# Latidos dentro de un tramo: como mucho uno cada tantos segundos (muy por debajo del umbral de interrumpido).
+_LATIDO_MIN_SEG = 30
+
+# Namespace de pg_advisory_xact_lock distinto a cascada (887766561) y conciliar cartera (887766560).
+_LOCK_NS_IMPORTACION_COBROS = 887766562
+
+_tramos = metricas.contador(
+    "rapicredit_importar_cobros_tramos_total", "Tramos de importación desde Cobros por resultado.", ("resultado",)
+)
+_duracion_tramo = metricas.histograma(
+    "rapicredit_importar_cobros_tramo_segundos", "Duración de cada tramo (import + cascada + commit)."
+)
+
+ProcesarTramo = Callable[[Session, List[PagoReportado], "ContextoImportacion"], Dict[str, Any]]
+
+
+def _setting_int(nombre: str, default: int, minimo: int) -> int:
+    try:
+        from app.core.config import settings
+
+        return max(minimo, int(getattr(settings, nombre, default)))
+    except Exception:
+        return default
+
+
+def _ahora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _utc(dt: Optional[datetime]) -> Optional[datetime]:
+    # SQLite devuelve naive aunque la columna sea timezone=True.
+    if dt is None or dt.tzinfo is not None:
+        return dt
+    return dt.replace(tzinfo=timezone.utc)
+
+
+def job_interrumpido(job: ImportacionCobrosJob, *, ahora: Optional[datetime] = None) -> bool:
+    """Activo pero sin latido reciente: el hilo que lo procesaba ya no existe (reinicio/caída del worker)."""
+    if job.estado not in ESTADOS_ACTIVOS:
+        return False
+    latido = _utc(job.latido or job.creado_en)
+    if latido is None:
+        return True
+    limite = timedelta(minutes=_setting_int("PAGOS_IMPORTAR_COBROS_STALE_MIN", _DEFAULT_STALE_MIN, 1))
+    return latido < (ahora or _ahora()) - limite
+
+
+def rol_usuario_importacion(usuario: Any) -> Optional[str]:
+    """Rol canónico persistido en el job (se usa al reanudar sin la sesión del usuario)."""
+    if usuario is None:
+        return None
+    from app.core.rol_normalization import canonical_rol
+
+    if bool(getattr(usuario, "is_admin", False)):
+        return "admin"
+    return canonical_rol(getattr(usuario, "rol", None) or getattr(usuario, "role", None))
+
+
+class ContextoImportacion:
+    """Estado en memoria de una ejecución: dedupe dentro de la corrida (lo ya confirmado se ve en BD)."""
+
+    def __init__(self, job: ImportacionCobrosJob, latir: Optional[Callable[[], None]] = None):
+        self.usuario_email = job.usuario_email or ""
+        self.usuario = {"rol": job.usuario_rol, "email": job.usuario_email} if job.usuario_rol else None
+        self.documentos_ya_en_bd: set[str] = set()
+        self.docs_en_lote: set[str] = set()
+        self.huellas_funcional_lote: set[tuple[int, str, str, str]] = set()
+        self._latir = latir
+        self._ultimo_latido = time.monotonic()
+
+    def latir(self) -> None:
+        """Latido a mitad de tramo (como mucho cada _LATIDO_MIN_SEG). Un fallo solo se registra."""
+        if self._latir is None or time.monotonic() - self._ultimo_latido < _LATIDO_MIN_SEG:
+            return
+        self._ultimo_latido = time.monotonic()
+        try:
+            self._latir()
+        except Exception:
+            logger.warning("Importar Cobros: no se pudo registrar el latido", exc_info=True)
+
+
+def importar_tramo(db: Session, reportados: List[PagoReportado], ctx: ContextoImportacion) -> Dict[str, Any]:
+    """
+    Importa un tramo (sin commit): mismas reglas que la importación de siempre y una cascada por préstamo.
+    Retorna contadores y detalle del tramo para acumular en el job.
+    """
+    from app.api.v1.endpoints.pagos.cascada_estado import _estado_pago_tras_aplicar_cascada
+    from app.api.v1.endpoints.pagos.upload_excel_routes import importar_un_pago_reportado_a_pagos
+    from app.models.pago import Pago
+    from app.services.cobros.pago_reportado_documento import claves_documento_para_lote_reportados
+    from app.services.pagos_cascada_aplicacion import aplicar_pagos_a_cuotas_por_prestamo
+
+    claves = [k for k in claves_documento_para_lote_reportados(reportados) if k not in ctx.documentos_ya_en_bd]
+    if claves:
+        existentes = db.execute(select(Pago.numero_documento).where(Pago.numero_documento.in_(claves))).scalars()
+        ctx.documentos_ya_en_bd.update(str(d) for d in existentes if d)
+
+    out: Dict[str, Any] = {
+        "registros_procesados": 0,
+        "errores": [],
+        "ids_pagos_con_errores": [],
+        "operaciones_cuota_total": 0,
+        "pagos_con_aplicacion_a_cuotas": 0,
+        "pagos_sin_aplicacion_cuotas": [],
+    }
+    pagos_creados: List[Pago] = []
+    for pr in reportados:
+        try:
+            with db.begin_nested():
+                res = importar_un_pago_reportado_a_pagos(
+                    db,
+                    pr,
+                    usuario_email=ctx.usuario_email,
+                    documentos_ya_en_bd=ctx.documentos_ya_en_bd,
+                    docs_en_lote=ctx.docs_en_lote,
+                    registrar_error_en_tabla=True,
+                    huellas_funcional_lote=ctx.huellas_funcional_lote,
+                    usuario=ctx.usuario,
+                )
+        except Exception as e:
+            logger.warning("Importar Cobros: reportado id=%s revertido: %s", pr.id, e)
+            res = {"ok": False, "error": str(e), "referencia": pr.referencia_interna, "pce_id": None}
+        ctx.latir()
+        if res.get("ok"):
+            out["registros_procesados"] += 1
+            pagos_creados.append(res["pago"])
+            continue
+        if res.get("pce_id") is not None:
+            out["ids_pagos_con_errores"].append(res["pce_id"])
+        out["errores"].append({"referencia": res.get("referencia"), "error": res.get("error", "Error")})
+
+    aplicacion = aplicar_pagos_a_cuotas_por_prestamo(pagos_creados, db, tras_prestamo=ctx.latir)
+    for p in pagos_creados:
+        cc, cp, err = aplicacion.get(int(p.id), (0, 0, None))
+        base = {"pago_id": p.id, "cedula_cliente": p.cedula_cliente or "", "prestamo_id": p.prestamo_id}
+        if err:
+            out["pagos_sin_aplicacion_cuotas"].append({**base, "motivo": "error", "detalle": err})
+            continue
+        p.estado = _estado_pago_tras_aplicar_cascada(cc, cp)
+        if cc > 0 or cp > 0:
+            out["operaciones_cuota_total"] += cc + cp
+            out["pagos_con_aplicacion_a_cuotas"] += 1
+        elif p.prestamo_id and float(p.monto_pagado or 0) > 0:
+            out["pagos_sin_aplicacion_cuotas"].append(
+                {
+                    **base,
+                    "motivo": "sin_cuotas_afectadas",
+                    "detalle": "Ninguna cuota recibió monto; revise cuotas pendientes o use Aplicar a cuotas.",
+                }
+            )
+    return out
+
+
+def _leer_detalle(job: ImportacionCobrosJob) -> Dict[str, list]:
+    try:
+        data = json.loads(job.detalle or "{}")
+    except (TypeError, ValueError):
+        data = {}
+    return {
+        "errores_detalle": list(data.get("errores_detalle") or []),
+        "ids_pagos_con_errores": list(data.get("ids_pagos_con_errores") or []),
+        "pagos_sin_aplicacion_cuotas": list(data.get("pagos_sin_aplicacion_cuotas") or []),
+    }
+
+
+def _tramo(db: Session, job: ImportacionCobrosJob, limite: int) -> List[PagoReportado]:
+    q = select(PagoReportado).where(PagoReportado.estado == "aprobado")
+    if job.cursor_reportado_id is not None:
+        q = q.where(PagoReportado.id > job.cursor_reportado_id)
+    if job.hasta_reportado_id is not None:
+        q = q.where(PagoReportado.id <= job.hasta_reportado_id)
+    return list(db.execute(q.order_by(PagoReportado.id).limit(limite)).scalars())
+
+
+def _avanzar(
+    db: Session,
+    job_id: int,
+    ejecutor: str,
+    reportados: List[PagoReportado],
+    res: Dict[str, Any],
+    detalle: Dict[str, list],
+) -> bool:
+    """Cursor, contadores y detalle del tramo en su misma transacción; False si el job cambió de ejecutor."""
+    detalle["errores_detalle"] = (detalle["errores_detalle"] + res["errores"])[:_LIMITE_ERRORES_DETALLE]
+    detalle["ids_pagos_con_errores"] += res["ids_pagos_con_errores"]
+    sin_aplicacion = res["pagos_sin_aplicacion_cuotas"]
+    detalle["pagos_sin_aplicacion_cuotas"] = (detalle["pagos_sin_aplicacion_cuotas"] + sin_aplicacion)[
+        :_LIMITE_SIN_APLICACION
+    ]
+    J = ImportacionCobrosJob
+    n = db.execute(
+        update(J)
+        .where(J.id == job_id, J.ejecutor == ejecutor, J.estado.in_(ESTADOS_ACTIVOS))
+        .values(
+            cursor_reportado_id=int(reportados[-1].id),
+            reportados_revisados=J.reportados_revisados + len(reportados),
+            tramos=J.tramos + 1,
+            registros_procesados=J.registros_procesados + res["registros_procesados"],
+            registros_con_error=J.registros_con_error + len(res["errores"]),
+            operaciones_cuota_total=J.operaciones_cuota_total + res["operaciones_cuota_total"],
+            pagos_con_aplicacion_a_cuotas=J.pagos_con_aplicacion_a_cuotas + res["pagos_con_aplicacion_a_cuotas"],
+            pagos_sin_aplicacion_cuotas_total=J.pagos_sin_aplicacion_cuotas_total + len(sin_aplicacion),
+            detalle=json.dumps(detalle, default=str),
+            latido=_ahora(),
+        )
+    ).rowcount
+    return bool(n)
+
+
+def _latido_en_sesion_propia(session_factory: Callable[[], Session], job_id: int, ejecutor: str) -> None:
+    """Latido confirmado fuera de la transacción del tramo (que no se ve hasta su commit)."""
+    db = session_factory()
+    try:
+        db.execute(
+            update(ImportacionCobrosJob)
+            .where(
+                ImportacionCobrosJob.id == job_id,
+                ImportacionCobrosJob.ejecutor == ejecutor,
+                ImportacionCobrosJob.estado.in_(ESTADOS_ACTIVOS),
+            )
+            .values(latido=_ahora())
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _cerrar(db: Session, job_id: int, ejecutor: str, estado: str, error: Optional[str] = None) -> bool:
+    ahora = _ahora()
+    n = db.execute(
+        update(ImportacionCobrosJob)
+        .where(
+            ImportacionCobrosJob.id == job_id,
+            ImportacionCobrosJob.ejecutor == ejecutor,
+            ImportacionCobrosJob.estado.in_(ESTADOS_ACTIVOS),
+        )
+        .values(estado=estado, error=error, latido=ahora, finalizado_en=ahora)
+    ).rowcount
+    db.commit()
+    return bool(n)
+
+
+def ejecutar_importacion(
+    job_id: int,
+    ejecutor: str,
+    *,
+    session_factory: Optional[Callable[[], Session]] = None,
+    procesar_tramo: Optional[ProcesarTramo] = None,
+) -> str:
+    """
+    Procesa el job desde su cursor hasta terminar, cancelarse o fallar. Devuelve el estado final
+    (o el actual si otro ejecutor tomó el job).
+    """
+    if session_factory is None:
+        from app.core.database import SessionLocal
+
+        session_factory = SessionLocal
+    procesar_tramo = procesar_tramo or importar_tramo
+    limite = _setting_int("PAGOS_IMPORTAR_COBROS_CHUNK", _DEFAULT_CHUNK, 1)
+
+    db = session_factory()
+    try:
+        job = db.get(ImportacionCobrosJob, job_id)
+        if job is None or job.ejecutor != ejecutor or job.estado not in ESTADOS_ACTIVOS:
+            logger.warning("Importar Cobros: job %s no existe o ya no corresponde a este ejecutor", job_id)
+            return getattr(job, "estado", None) or ESTADO_ERROR
+        ctx = ContextoImportacion(job, lambda: _latido_en_sesion_propia(session_factory, job_id, ejecutor))
+        detalle = _leer_detalle(job)
+        while True:
+            job = db.get(ImportacionCobrosJob, job_id, populate_existing=True)
+            if job.ejecutor != ejecutor:
+                logger.warning("Importar Cobros: job %s reanudado por otro ejecutor; este hilo termina", job_id)
+                return job.estado
+            if job.estado == ESTADO_CANCELANDO:
+                _cerrar(db, job_id, ejecutor, ESTADO_CANCELADO)
+                logger.info("Importar Cobros: job %s cancelado en cursor=%s", job_id, job.cursor_reportado_id)
+                return ESTADO_CANCELADO
+            reportados = _tramo(db, job, limite)
+            if not reportados:
+                _cerrar(db, job_id, ejecutor, ESTADO_COMPLETADO)
+                logger.info(
+                    "Importar Cobros: job %s completado: %s pagos, %s con error, %s tramos",
+                    job_id,
+                    job.registros_procesados,
+                    job.registros_con_error,
+                    job.tramos,
+                )
+                return ESTADO_COMPLETADO
+
+            t0 = time.monotonic()
+            try:
+                res = procesar_tramo(db, reportados, ctx)
+                if not _avanzar(db, job_id, ejecutor, reportados, res, detalle):
+                    db.rollback()
+                    _tramos.inc(resultado="descartado")
+                    logger.warning("Importar Cobros: job %s ya no pertenece a este ejecutor; tramo descartado", job_id)
+                    return db.scalar(select(ImportacionCobrosJob.estado).where(ImportacionCobrosJob.id == job_id))
+                db.commit()
+                _tramos.inc(resultado="ok")
+            except Exception as e:
+                db.rollback()
+                _tramos.inc(resultado="error")
+                logger.exception("Importar Cobros: job %s falló en tramo desde id=%s", job_id, reportados[0].id)
+                _cerrar(db, job_id, ejecutor, ESTADO_ERROR, str(e)[:2000])
+                return ESTADO_ERROR
+            finally:
+                _duracion_tramo.observe(time.monotonic() - t0)
+            # Los objetos del tramo ya están confirmados: no acumularlos en el identity map.
+            db.expunge_all()
+    finally:
+        db.close()
+
+
+def lanzar_importacion(job_id: int, ejecutor: str) -> threading.Thread:
+    """Hilo daemon: si el worker muere, el job queda sin latido y se reanuda desde su cursor."""
+    t = threading.Thread(
+        target=ejecutar_importacion,
+        args=(job_id, ejecutor),
+        name=f"importar-cobros-{job_id}",
+        daemon=True,
+    )
+    t.start()
+    return t
+
+
+def job_activo(db: Session) -> Optional[ImportacionCobrosJob]:
+    return db.execute(
+        select(ImportacionCobrosJob)
+        .where(ImportacionCobrosJob.estado.in_(ESTADOS_ACTIVOS))
+        .order_by(ImportacionCobrosJob.id.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def _tomar(job: ImportacionCobrosJob) -> str:
+    job.ejecutor = str(uuid.uuid4())
+    job.estado = ESTADO_EN_PROCESO
+    job.error = None
+    job.finalizado_en = None
+    job.latido = _ahora()
+    return job.ejecutor
+
+
+def iniciar_importacion(db: Session, usuario: Any) -> tuple[Optional[ImportacionCobrosJob], Optional[str]]:
+    """
+    Devuelve (job, ejecutor). ejecutor != None → el caller debe lanzar el hilo.
+    - Hay un job en curso con latido: se devuelve ese (sin ejecutor).
+    - Hay uno interrumpido: se reanuda desde su cursor.
+    - Si no, se crea uno nuevo con tope = máximo id aprobado; (None, None) si no hay aprobados.
+    """
+    bind = db.get_bind()
+    if bind is not None and bind.dialect.name == "postgresql":
+        # Dos clics simultáneos (o dos workers) no crean dos jobs.
+        db.execute(text("SELECT pg_advisory_xact_lock(:ns, 1)"), {"ns": _LOCK_NS_IMPORTACION_COBROS})
+    actual = job_activo(db)
+    if actual is not None:
+        if not job_interrumpido(actual):
+            db.commit()
+            return actual, None
+        if actual.estado == ESTADO_EN_PROCESO:
+            ejecutor = _tomar(actual)
+            db.commit()
+            logger.warning("Importar Cobros: job %s interrumpido; se reanuda desde id=%s", actual.id, actual.cursor_reportado_id)
+            return actual, ejecutor
+        # Cancelación pedida y el hilo murió antes de atenderla.
+        actual.estado = ESTADO_CANCELADO
+        actual.finalizado_en = _ahora()
+
+    total, hasta = db.execute(
+        select(func.count(PagoReportado.id), func.max(PagoReportado.id)).where(PagoReportado.estado == "aprobado")
+    ).one()
+    if not total:
+        db.commit()
+        return None, None
+    from app.api.v1.endpoints.pagos.pago_usuario_registro import _usuario_registro_desde_current_user
+
+    job = ImportacionCobrosJob(
+        usuario_email=_usuario_registro_desde_current_user(usuario),
+        usuario_rol=rol_usuario_importacion(usuario),
+        hasta_reportado_id=int(hasta),
+        total_estimado=int(total),
+    )
+    ejecutor = _tomar(job)
+    db.add(job)
+    db.commit()
+    logger.info("Importar Cobros: job %s creado (%s aprobados, hasta id=%s)", job.id, total, hasta)
+    return job, ejecutor
+
+
+def reanudar_importacion(db: Session, job: ImportacionCobrosJob) -> Optional[str]:
+    """Reanuda un job cancelado, con error o interrumpido; None si no corresponde (en curso o completado)."""
+    if job.estado in ESTADOS_ACTIVOS and not job_interrumpido(job):
+        return None
+    if job.estado == ESTADO_COMPLETADO:
+        return None
+    otro = job_activo(db)
+    if otro is not None and otro.id != job.id and not job_interrumpido(otro):
+        return None
+    ejecutor = _tomar(job)
+    db.commit()
+    return ejecutor
+
+
+def cancelar_importacion(db: Session, job: ImportacionCobrosJob) -> bool:
+    """Pide detener el job al terminar el tramo en curso; si ya no hay hilo, queda cancelado de inmediato."""
+    if job.estado not in ESTADOS_ACTIVOS:
+        return False
+    if job_interrumpido(job):
+        job.estado = ESTADO_CANCELADO
+        job.finalizado_en = _ahora()
+    else:
+        job.estado = ESTADO_CANCELANDO
+    db.commit()
+    return True
+
+
+def resumen_vacio() -> Dict[str, Any]:
+    return {
+        "job_id": None,
+        "estado": ESTADO_COMPLETADO,
+        "en_curso": False,
+        "registros_procesados": 0,
+        "registros_con_error": 0,
+        "errores_detalle": [],
+        "ids_pagos_con_errores": [],
+        "total_datos_revisar": 0,
+        "mensaje": "No hay pagos reportados aprobados para importar.",
+        "cuotas_aplicadas": 0,
+        "operaciones_cuota_total": 0,
+        "pagos_con_aplicacion_a_cuotas": 0,
+        "pagos_sin_aplicacion_cuotas": [],
+        "pagos_sin_aplicacion_cuotas_total": 0,
+        "pagos_sin_aplicacion_cuotas_truncados": False,
+    }
+
+
+def _mensaje(job: ImportacionCobrosJob, interrumpido: bool) -> str:
+    avance = f"{job.reportados_revisados} de {job.total_estimado} reportados revisados"
+    if job.estado == ESTADO_COMPLETADO:
+        msg = (
+            f"Importados {job.registros_procesados} pagos desde Cobros; "
+            f"{job.registros_con_error} con error (revisar: descargar Excel)."
+        )
+        if job.pagos_sin_aplicacion_cuotas_total:
+            msg += (
+                f" Atención: {job.pagos_sin_aplicacion_cuotas_total} pago(s) creado(s) pero sin aplicar a cuotas "
+                "(error o sin cuotas pendientes según reglas); use Aplicar a cuotas o revise el préstamo."
+            )
+        return msg
+    if interrumpido:
+        return f"Importación interrumpida ({avance}); vuelva a importar para continuar desde donde quedó."
+    if job.estado == ESTADO_EN_PROCESO:
+        return f"Importando desde Cobros: {avance}, {job.registros_procesados} pagos creados."
+    if job.estado == ESTADO_CANCELANDO:
+        return f"Deteniendo importación al terminar el tramo en curso ({avance})."
+    if job.estado == ESTADO_CANCELADO:
+        return f"Importación detenida ({avance}, {job.registros_procesados} pagos creados); puede reanudarse."
+    return f"Importación con error ({avance}): {job.error or 'desconocido'}; puede reanudarse."
+
+
+def estado_importacion(db: Session, job: ImportacionCobrosJob) -> Dict[str, Any]:
+    """Avance del job con las mismas claves del resumen de la importación síncrona anterior."""
+    detalle = _leer_detalle(job)
+    interrumpido = job_interrumpido(job)
+    total = int(job.total_estimado or 0)
+    return {
+        "job_id": job.id,
+        "estado": job.estado,
+        "en_curso": job.estado in ESTADOS_ACTIVOS and not interrumpido,
+        "interrumpido": interrumpido,
+        "total_estimado": total,
+        "reportados_revisados": job.reportados_revisados,
+        "porcentaje": round(100.0 * job.reportados_revisados / total, 1) if total else 100.0,
+        "tramos": job.tramos,
+        "cursor_reportado_id": job.cursor_reportado_id,
+        "hasta_reportado_id": job.hasta_reportado_id,
+        "creado_en": job.creado_en,
+        "ultimo_latido": job.latido,
+        "finalizado_en": job.finalizado_en,
+        "error": job.error,
+        "registros_procesados": job.registros_procesados,
+        "registros_con_error": job.registros_con_error,
+        "errores_detalle": detalle["errores_detalle"],
+        "ids_pagos_con_errores": detalle["ids_pagos_con_errores"],
+        "cuotas_aplicadas": job.operaciones_cuota_total,
+        "operaciones_cuota_total": job.operaciones_cuota_total,
+        "pagos_con_aplicacion_a_cuotas": job.pagos_con_aplicacion_a_cuotas,
+        "pagos_sin_aplicacion_cuotas": detalle["pagos_sin_aplicacion_cuotas"],
+        "pagos_sin_aplicacion_cuotas_total": job.pagos_sin_aplicacion_cuotas_total,
+        "pagos_sin_aplicacion_cuotas_truncados": job.pagos_sin_aplicacion_cuotas_total > _LIMITE_SIN_APLICACION,
+        "total_datos_revisar": db.scalar(select(func.count()).select_from(DatosImportadosConErrores)) or 0,
+        "mensaje": _mensaje(job, interrumpido),
+    }
@@ -0,0 +1,387 @@
+"""
+KPIs y estadísticas de pagos (GET /pagos/kpis, GET /pagos/stats) con cache en BD.
+
+- `calcular_kpis` / `calcular_stats`: agregados en vivo sobre cuotas de préstamos APROBADOS de clientes ACTIVOS.
+  Stats es un único rollup por estado de cuota (antes seis consultas).
+- `obtener`: sirve la entrada de `pagos_kpis_cache` si sigue vigente y si no calcula y la guarda. Vigente =
+  misma marca (suma de `prestamo_versiones.version`, que sube con cada pago registrado, cascada aplicada o
+  cuota editada) y edad menor a PAGOS_KPIS_CACHE_TTL_SEG (cambios que no pasan por prestamo_versiones:
+  estado del préstamo/cliente, analista, concesionario, modelo).
+- `verificar_cache`: recalcula en vivo las entradas vigentes y reporta (y corrige) diferencias.
+
+La marca se lee antes de calcular: un cambio confirmado durante el cálculo deja la entrada con marca vieja y
+la siguiente lectura recalcula. Sin la tabla (BD sin migración 099), con PAGOS_KPIS_CACHE=False o ante
+cualquier error de la cache se calcula en vivo.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import metricas
+from app.core.database import SessionLocal
+from app.models.cliente import Cliente
+from app.models.cuota import Cuota
+from app.models.pagos_kpis_cache import PagosKpisCache
+from app.models.prestamo import Prestamo
+from app.models.prestamo_version import PrestamoVersion, tabla_disponible
+from app.services.pago_huella_funcional import contar_prestamos_con_huella_funcional_duplicada
+
+logger = logging.getLogger(__name__)
+
+TIPO_KPIS = "kpis"
+TIPO_STATS = "stats"
+
+_DEFAULT_TTL_SEG = 600
+_TABLA = PagosKpisCache.__tablename__
+
+
+def _setting_int(nombre: str, default: int, minimo: int) -> int:
+    try:
+        from app.core.config import settings
+
+        return max(minimo, int(getattr(settings, nombre, default)))
+    except Exception:
+        return default
+
+
+def _cache_habilitada() -> bool:
+    try:
+        from app.core.config import settings
+
+        return bool(getattr(settings, "PAGOS_KPIS_CACHE", True))
+    except Exception:
+        return True
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _como_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """SQLite devuelve naive; PostgreSQL con zona. Se compara todo en UTC con zona."""
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _float(v: Any) -> float:
+    try:
+        return float(v or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _conds_cartera_activa(analista: Optional[str] = None, concesionario: Optional[str] = None, modelo: Optional[str] = None):
+    conds = [
+        Cuota.prestamo_id == Prestamo.id,
+        Prestamo.cliente_id == Cliente.id,
+        Cliente.estado == "ACTIVO",
+        Prestamo.estado == "APROBADO",
+    ]
+    if analista:
+        conds.append(Prestamo.analista == analista)
+    if concesionario:
+        conds.append(Prestamo.concesionario == concesionario)
+    if modelo:
+        conds.append(Prestamo.modelo_vehiculo == modelo)
+    return conds
+
+
+def _suma_si(cond, valor=Cuota.monto):
+    return func.coalesce(func.sum(case((cond, valor), else_=0)), 0)
+
+
+# --- Cálculo en vivo ---
+
+
+def calcular_kpis(db: Session, inicio: date, fin: date, fecha_referencia: date) -> Dict[str, Any]:
+    """
+    KPIs del periodo [inicio, fin] al corte `fecha_referencia` (fin del mes en meses pasados, hoy en el actual).
+
+    Incluye el conteo en BD de préstamos con huella funcional duplicada; los rechazos 409 del proceso
+    (memoria) los agrega la ruta en cada lectura.
+    """
+    conds = _conds_cartera_activa()
+    en_mes = and_(Cuota.fecha_vencimiento >= inicio, Cuota.fecha_vencimiento <= fin)
+    vencida = and_(en_mes, Cuota.fecha_vencimiento < fecha_referencia)
+    row = db.execute(
+        select(
+            _suma_si(en_mes).label("monto_a_cobrar_mes"),
+            _suma_si(
+                and_(Cuota.fecha_pago.isnot(None), Cuota.fecha_pago >= inicio, Cuota.fecha_pago <= fecha_referencia)
+            ).label("monto_cobrado_mes"),
+            _suma_si(vencida).label("total_vencido_mes"),
+            _suma_si(and_(vencida, Cuota.fecha_pago.is_(None))).label("no_cobrado_mes"),
+            _suma_si(Cuota.fecha_pago.is_(None)).label("cartera_pendiente"),
+        )
+        .select_from(Cuota)
+        .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
+        .join(Cliente, Prestamo.cliente_id == Cliente.id)
+        .where(and_(*conds))
+    ).one()
+    total_vencido = _float(row.total_vencido_mes)
+    morosidad = _float(row.no_cobrado_mes) / total_vencido * 100.0 if total_vencido > 0 else 0.0
+
+    en_mora = (
+        select(Prestamo.cliente_id)
+        .select_from(Cuota)
+        .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
+        .join(Cliente, Prestamo.cliente_id == Cliente.id)
+        .where(and_(*conds), Cuota.fecha_pago.is_(None), Cuota.fecha_vencimiento < fecha_referencia)
+        .distinct()
+    )
+    clientes_en_mora = int(db.scalar(select(func.count()).select_from(en_mora.subquery())) or 0)
+    clientes_con_prestamo = int(
+        db.scalar(
+            select(func.count(func.distinct(Prestamo.cliente_id)))
+            .select_from(Prestamo)
+            .join(Cliente, Prestamo.cliente_id == Cliente.id)
+            .where(Cliente.estado == "ACTIVO", Prestamo.estado == "APROBADO")
+        )
+        or 0
+    )
+    return {
+        "montoACobrarMes": _float(row.monto_a_cobrar_mes),
+        "montoCobradoMes": _float(row.monto_cobrado_mes),
+        "morosidadMensualPorcentaje": round(morosidad, 2),
+        "saldoPorCobrar": _float(row.cartera_pendiente),
+        "clientesEnMora": clientes_en_mora,
+        "clientesAlDia": max(0, clientes_con_prestamo - clientes_en_mora),
+        "prestamos_con_alerta_control_huella_funcional_duplicada": contar_prestamos_con_huella_funcional_duplicada(db),
+    }
+
+
+def calcular_stats(
+    db: Session,
+    hoy: date,
+    analista: Optional[str] = None,
+    concesionario: Optional[str] = None,
+    modelo: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Rollup por estado de cuota en una consulta; los totales son la suma de los grupos."""
+    pagada = Cuota.fecha_pago.isnot(None)
+    pendiente = Cuota.fecha_pago.is_(None)
+    rows = db.execute(
+        select(
+            Cuota.estado,
+            func.count().label("cuotas"),
+            _suma_si(pagada, 1).label("pagadas"),
+            _suma_si(pendiente, 1).label("pendientes"),
+            _suma_si(and_(pendiente, Cuota.fecha_vencimiento < hoy), 1).label("atrasadas"),
+            _suma_si(pagada).label("total_pagado"),
+            _suma_si(and_(pagada, func.date(Cuota.fecha_pago) == hoy), 1).label("pagos_hoy"),
+        )
+        .select_from(Cuota)
+        .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
+        .join(Cliente, Prestamo.cliente_id == Cliente.id)
+        .where(and_(*_conds_cartera_activa(analista, concesionario, modelo)))
+        .group_by(Cuota.estado)
+    ).all()
+    pagadas = sum(int(r.pagadas or 0) for r in rows)
+    pendientes = sum(int(r.pendientes or 0) for r in rows)
+    return {
+        "total_pagos": pagadas + pendientes,
+        "total_pagado": sum(_float(r.total_pagado) for r in rows),
+        "pagos_por_estado": sorted(
+            ({"estado": str(r.estado) if r.estado is not None else "N/A", "count": int(r.cuotas)} for r in rows),
+            key=lambda x: x["estado"],
+        ),
+        "cuotas_pagadas": pagadas,
+        "cuotas_pendientes": pendientes,
+        "cuotas_atrasadas": sum(int(r.atrasadas or 0) for r in rows),
+        "pagos_hoy": sum(int(r.pagos_hoy or 0) for r in rows),
+    }
+
+
+def parametros_kpis(inicio: date, fin: date, fecha_referencia: date) -> Dict[str, Any]:
+    return {"inicio": inicio.isoformat(), "fin": fin.isoformat(), "fecha_referencia": fecha_referencia.isoformat()}
+
+
+def parametros_stats(
+    hoy: date, analista: Optional[str] = None, concesionario: Optional[str] = None, modelo: Optional[str] = None
+) -> Dict[str, Any]:
+    return {
+        "fecha_referencia": hoy.isoformat(),
+        "analista": analista or None,
+        "concesionario": concesionario or None,
+        "modelo": modelo or None,
+    }
+
+
+def _calcular_desde_parametros(db: Session, tipo: str, p: Dict[str, Any]) -> Dict[str, Any]:
+    if tipo == TIPO_KPIS:
+        return calcular_kpis(
+            db, date.fromisoformat(p["inicio"]), date.fromisoformat(p["fin"]), date.fromisoformat(p["fecha_referencia"])
+        )
+    if tipo == TIPO_STATS:
+        return calcular_stats(
+            db, date.fromisoformat(p["fecha_referencia"]), p.get("analista"), p.get("concesionario"), p.get("modelo")
+        )
+    raise ValueError(f"tipo de KPI desconocido: {tipo}")
+
+
+# --- Cache ---
+
+
+def _clave(tipo: str, parametros_json: str) -> str:
+    return f"{tipo}:{hashlib.sha1(parametros_json.encode('utf-8')).hexdigest()}"
+
+
+def _parametros_json(parametros: Dict[str, Any]) -> str:
+    return json.dumps(parametros, sort_keys=True, separators=(",", ":"))
+
+
+def marca_actual(db: Session) -> Optional[int]:
+    """Suma de versiones de préstamo: estrictamente creciente (las filas no se borran). None sin la tabla."""
+    conn = db.connection()
+    if not tabla_disponible(conn, PrestamoVersion.__tablename__):
+        return None
+    return int(db.scalar(select(func.coalesce(func.sum(PrestamoVersion.version), 0))) or 0)
+
+
+def _vigente(fila, marca: int, ahora: datetime, ttl: timedelta) -> bool:
+    calculado = _como_utc(fila.calculado_en)
+    return fila.marca == marca and calculado is not None and calculado > ahora - ttl
+
+
+def _ttl() -> timedelta:
+    return timedelta(seconds=_setting_int("PAGOS_KPIS_CACHE_TTL_SEG", _DEFAULT_TTL_SEG, 10))
+
+
+def _guardar(tipo: str, parametros_json: str, fecha_referencia: date, marca: int, datos: dict) -> None:
+    """
+    Upsert de la entrada y purga de las vencidas por TTL en sesión propia (commit independiente: la sesión
+    del request que lee no confirma ni revierte). Un fallo solo se registra.
+    """
+    t = PagosKpisCache.__table__
+    ahora = _utcnow()
+    fila = {
+        "clave": _clave(tipo, parametros_json),
+        "tipo": tipo,
+        "parametros": parametros_json,
+        "fecha_referencia": fecha_referencia,
+        "marca": marca,
+        "datos": json.dumps(datos, default=str),
+        "calculado_en": ahora,
+    }
+    db = SessionLocal()
+    try:
+        db.execute(delete(t).where(t.c.calculado_en < ahora - _ttl()))
+        dialecto = db.get_bind().dialect.name
+        if dialecto in ("postgresql", "sqlite"):
+            if dialecto == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            stmt = dialect_insert(t).values(fila)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["clave"],
+                    set_={c: stmt.excluded[c] for c in ("fecha_referencia", "marca", "datos", "calculado_en")},
+                )
+            )
+        else:
+            db.execute(delete(t).where(t.c.clave == fila["clave"]))
+            db.execute(insert(t).values(**fila))
+        db.commit()
+    except Exception:
+        logger.warning("pagos_kpis_cache: no se pudo guardar %s", tipo, exc_info=True)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
+def obtener(
+    db: Session,
+    tipo: str,
+    parametros: Dict[str, Any],
+    calcular: Callable[[], Dict[str, Any]],
+    *,
+    refrescar: bool = False,
+) -> Dict[str, Any]:
+    """Entrada vigente de la cache o `calcular()` (y se guarda). `refrescar` ignora la entrada guardada."""
+    if not _cache_habilitada():
+        return calcular()
+    try:
+        if not tabla_disponible(db.connection(), _TABLA):
+            return calcular()
+        marca = marca_actual(db)
+    except Exception:
+        logger.warning("pagos_kpis_cache: sin marca, cálculo en vivo", exc_info=True)
+        return calcular()
+    if marca is None:
+        return calcular()
+
+    parametros_json = _parametros_json(parametros)
+    if not refrescar:
+        try:
+            fila = db.execute(
+                select(PagosKpisCache.marca, PagosKpisCache.calculado_en, PagosKpisCache.datos).where(
+                    PagosKpisCache.clave == _clave(tipo, parametros_json)
+                )
+            ).first()
+            if fila is not None and _vigente(fila, marca, _utcnow(), _ttl()):
+                metricas.cache_consulta("pagos_kpis", True)
+                return json.loads(fila.datos)
+        except Exception:
+            logger.warning("pagos_kpis_cache: lectura fallida, cálculo en vivo", exc_info=True)
+    metricas.cache_consulta("pagos_kpis", False)
+
+    datos = calcular()
+    _guardar(tipo, parametros_json, date.fromisoformat(parametros["fecha_referencia"]), marca, datos)
+    return datos
+
+
+def _normalizar(datos: Dict[str, Any]) -> Dict[str, Any]:
+    """Misma forma que tras pasar por JSON, con montos a 2 decimales (la suma en BD puede variar en el último bit)."""
+    norm = json.loads(json.dumps(datos, default=str))
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in norm.items()}
+
+
+def verificar_cache(db: Session, *, corregir: bool = True) -> Dict[str, Any]:
+    """
+    Control de consistencia: recalcula en vivo cada entrada vigente y la compara campo a campo.
+
+    Con `corregir`, una entrada con diferencias se reescribe con el valor en vivo (marca actual).
+    """
+    resultado: Dict[str, Any] = {"revisadas": 0, "vigentes": 0, "con_diferencias": [], "corregidas": 0}
+    if not tabla_disponible(db.connection(), _TABLA):
+        resultado["nota"] = "Tabla pagos_kpis_cache no disponible (migración 099)."
+        return resultado
+    marca = marca_actual(db)
+    ahora, ttl = _utcnow(), _ttl()
+    # Filas planas: `_guardar` escribe (y purga vencidas) en otra sesión dentro del recorrido.
+    filas = db.execute(select(PagosKpisCache.__table__).order_by(PagosKpisCache.clave)).all()
+    resultado["revisadas"] = len(filas)
+    diferencias: List[Dict[str, Any]] = resultado["con_diferencias"]
+    for fila in filas:
+        if marca is None or not _vigente(fila, marca, ahora, ttl):
+            continue
+        resultado["vigentes"] += 1
+        parametros = json.loads(fila.parametros)
+        vivo = _normalizar(_calcular_desde_parametros(db, fila.tipo, parametros))
+        guardado = _normalizar(json.loads(fila.datos))
+        campos = {
+            k: {"cache": guardado.get(k), "vivo": vivo.get(k)}
+            for k in sorted(vivo.keys() | guardado.keys())
+            if guardado.get(k) != vivo.get(k)
+        }
+        if not campos:
+            continue
+        diferencias.append({"clave": fila.clave, "tipo": fila.tipo, "parametros": parametros, "campos": campos})
+        if corregir:
+            _guardar(fila.tipo, fila.parametros, fila.fecha_referencia, marca, vivo)
+            resultado["corregidas"] += 1
+    if diferencias:
+        logger.warning("pagos_kpis_cache: %d entradas con diferencias frente al cálculo en vivo", len(diferencias))
+    return resultado
@@ -83,8 +83,11 @@ def actualizar_fecha_q_candidato_drive(
     row.payload = payload
 
     drive_row = db.get(DriveRow, int(row.sheet_row_number))
-    if drive_row is not None:
+    # Fila dada de baja por el sync incremental (ya no está en la hoja): se trata como inexistente.
+    if drive_row is not None and drive_row.eliminado_en is None:
         drive_row.col_q = iso
+        # La fila local ya no coincide con la hoja: sin hash, el próximo sync la vuelve a escribir.
+        drive_row.row_hash = None
 
     try:
         db.commit()
@@ -82,7 +82,11 @@ def ejecutar_refresh_prestamo_candidatos_drive(
     prestamo_counts_liq = conteo_prestamos_liquidados_por_cedula_norm(db)
 
     drive_rows: List[DriveRow] = list(
-        db.execute(select(DriveRow).order_by(DriveRow.sheet_row_number.asc())).scalars().all()
+        db.execute(
+            select(DriveRow).where(DriveRow.eliminado_en.is_(None)).order_by(DriveRow.sheet_row_number.asc())
+        )
+        .scalars()
+        .all()
         or []
     )
 
@@ -0,0 +1,337 @@
+"""
+Resumen por préstamo de `cuotas` en `prestamo_saldos` (una fila por préstamo).
+
+Escritura (sin commit, dentro de la transacción del llamador):
+- `refrescar_prestamo_saldos(db, ids)`: recalcula con un solo GROUP BY y reemplaza las filas.
+  Lo llaman la cascada de pagos, el reset/realineado de cascada, la generación de cuotas, el borrado de
+  todos los pagos del préstamo, el recálculo de fechas de vencimiento y los editores de cuota.
+- Además, cualquier escritura ORM de `Cuota` refresca sus préstamos en el mismo flush (after_flush):
+  un escritor nuevo no puede olvidarlo. Las escrituras Core siguen llamando a `refrescar_prestamo_saldos`.
+
+Verificación (job nocturno / POST admin):
+- `verificar_prestamo_saldos(db)`: recorre la cartera por rangos de prestamo_id, compara el
+  resumen guardado contra el agregado real, repara diferencias y mueve `fecha_referencia` al día.
+
+Lectura:
+- `leer_prestamo_saldos(db, ids, fecha_referencia=...)`: filas vigentes. Los campos de atraso solo
+  valen si `fecha_referencia` coincide; los lectores caen al agregado sobre cuotas cuando no hay fila
+  o cuando `settings.PRESTAMO_SALDOS_LECTURA_RESUMEN` está apagado.
+
+Reglas (mismas que los agregados que reemplaza):
+- saldo_pendiente = SUM(max(0, monto - total_pagado)) sobre todas las cuotas.
+- cuota cubierta: monto > 0 y total_pagado >= monto - 0.01 (clasificar_estado_cuota).
+- cuotas_vencidas: no cubiertas con fecha_vencimiento < fecha_referencia (>= 1 día de atraso).
+- cuotas_pagadas: chip «Pagadas» de la tabla de amortización (estado pagado o cubierta por monto).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Any, Iterable, Optional, Sequence
+
+from sqlalchemy import and_, case, delete, event, func, insert, literal_column, not_, or_, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.cuota import Cuota
+from app.models.prestamo_saldo import PrestamoSaldo
+from app.models.prestamo_version import incrementar_version_prestamos, tabla_disponible
+from app.services.cuota_estado import hoy_negocio
+
+logger = logging.getLogger(__name__)
+
+_CENT = Decimal("0.01")
+
+# Clave en Session.info: préstamos con cuotas escritas por ORM en el flush en curso.
+_INFO_SALDOS = "_prestamos_saldos_pendiente"
+
+# Campos comparados por la verificación (actualizado_en no cuenta).
+CAMPOS_RESUMEN = (
+    "cuotas_total",
+    "cuotas_pagadas",
+    "total_monto",
+    "total_pagado",
+    "saldo_pendiente",
+    "cuotas_vencidas",
+    "max_dias_atraso",
+    "fecha_vencimiento_pendiente_min",
+    "ultima_fecha_pago",
+)
+
+
+def lectura_resumen_habilitada() -> bool:
+    """True si los lectores deben preferir `prestamo_saldos` sobre el agregado de cuotas."""
+    return bool(getattr(settings, "PRESTAMO_SALDOS_LECTURA_RESUMEN", False))
+
+
+def _select_agregado_cuotas(fecha_referencia: date):
+    monto = func.coalesce(Cuota.monto, 0)
+    pagado = func.coalesce(Cuota.total_pagado, 0)
+    cubierta = and_(monto > 0, pagado >= monto - literal_column("0.01"))
+    vencida = and_(not_(cubierta), Cuota.fecha_vencimiento < fecha_referencia)
+    est_u = func.upper(func.trim(func.coalesce(Cuota.estado, "")))
+    pagada_ui = or_(
+        est_u.in_(["PAGADO", "PAGADA", "PAGO_ADELANTADO"]),
+        pagado >= monto - literal_column("0.01"),
+    )
+    return select(
+        Cuota.prestamo_id,
+        func.count().label("cuotas_total"),
+        func.sum(case((pagada_ui, 1), else_=0)).label("cuotas_pagadas"),
+        func.sum(monto).label("total_monto"),
+        func.sum(pagado).label("total_pagado"),
+        func.sum(case((monto - pagado > 0, monto - pagado), else_=0)).label("saldo_pendiente"),
+        func.sum(case((vencida, 1), else_=0)).label("cuotas_vencidas"),
+        func.min(case((vencida, Cuota.fecha_vencimiento), else_=None)).label("fv_vencida_min"),
+        func.min(case((not_(cubierta), Cuota.fecha_vencimiento), else_=None)).label(
+            "fecha_vencimiento_pendiente_min"
+        ),
+        func.max(Cuota.fecha_pago).label("ultima_fecha_pago"),
+    ).group_by(Cuota.prestamo_id)
+
+
+def _money(x: Any) -> Decimal:
+    return Decimal(str(x if x is not None else 0)).quantize(_CENT)
+
+
+def _as_date(x: Any) -> Optional[date]:
+    if x is None:
+        return None
+    if hasattr(x, "date") and callable(x.date):
+        return x.date()
+    if isinstance(x, str):
+        return date.fromisoformat(x[:10])
+    return x
+
+
+def _fila_desde_agregado(row: Any, fecha_referencia: date) -> dict[str, Any]:
+    fv_vencida_min = _as_date(row.fv_vencida_min)
+    return {
+        "prestamo_id": int(row.prestamo_id),
+        "cuotas_total": int(row.cuotas_total or 0),
+        "cuotas_pagadas": int(row.cuotas_pagadas or 0),
+        "total_monto": _money(row.total_monto),
+        "total_pagado": _money(row.total_pagado),
+        "saldo_pendiente": _money(row.saldo_pendiente),
+        "cuotas_vencidas": int(row.cuotas_vencidas or 0),
+        "max_dias_atraso": max(0, (fecha_referencia - fv_vencida_min).days) if fv_vencida_min else 0,
+        "fecha_vencimiento_pendiente_min": _as_date(row.fecha_vencimiento_pendiente_min),
+        "ultima_fecha_pago": _as_date(row.ultima_fecha_pago),
+        "fecha_referencia": fecha_referencia,
+    }
+
+
+def calcular_prestamo_saldos(
+    db: Session,
+    prestamo_ids: Optional[Sequence[int]] = None,
+    *,
+    fecha_referencia: Optional[date] = None,
+    id_desde: Optional[int] = None,
+    id_hasta: Optional[int] = None,
+) -> dict[int, dict[str, Any]]:
+    """Agregado real sobre `cuotas` (por lista de ids o rango [id_desde, id_hasta]). Sin escritura."""
+    ref = fecha_referencia or hoy_negocio()
+    q = _select_agregado_cuotas(ref)
+    if prestamo_ids is not None:
+        ids = sorted({int(x) for x in prestamo_ids if x is not None})
+        if not ids:
+            return {}
+        q = q.where(Cuota.prestamo_id.in_(ids))
+    if id_desde is not None:
+        q = q.where(Cuota.prestamo_id >= int(id_desde))
+    if id_hasta is not None:
+        q = q.where(Cuota.prestamo_id <= int(id_hasta))
+    return {int(r.prestamo_id): _fila_desde_agregado(r, ref) for r in db.execute(q).all()}
+
+
+def refrescar_prestamo_saldos(
+    db: Session,
+    prestamo_ids: Iterable[int],
+    *,
+    fecha_referencia: Optional[date] = None,
+) -> int:
+    """
+    Recalcula y reemplaza las filas de `prestamo_saldos` de esos préstamos (sin filas si no tienen cuotas).
+    Hace flush para ver los cambios ORM pendientes. No hace commit. Retorna filas escritas.
+    Sube también `prestamo_versiones` (cache de estado de cuenta): cubre escrituras Core de la cascada.
+    """
+    ids = sorted({int(x) for x in prestamo_ids if x is not None})
+    if not ids:
+        return 0
+    db.flush()
+    return _reemplazar_filas(db, ids, fecha_referencia=fecha_referencia)
+
+
+def _reemplazar_filas(db: Session, ids: list[int], *, fecha_referencia: Optional[date] = None) -> int:
+    filas = calcular_prestamo_saldos(db, ids, fecha_referencia=fecha_referencia)
+    db.execute(
+        delete(PrestamoSaldo)
+        .where(PrestamoSaldo.prestamo_id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    if filas:
+        db.execute(insert(PrestamoSaldo), list(filas.values()))
+    incrementar_version_prestamos(db, ids)
+    return len(filas)
+
+
+@event.listens_for(Cuota, "after_insert")
+@event.listens_for(Cuota, "after_update")
+@event.listens_for(Cuota, "after_delete")
+def _cuota_toca_saldos(_mapper, _connection, target: Cuota) -> None:
+    s = object_session(target)
+    if s is None:
+        return
+    ids = s.info.setdefault(_INFO_SALDOS, set())
+    for pid in [target.prestamo_id, *(target._sa_instance_state.attrs["prestamo_id"].history.deleted or ())]:
+        if pid is not None:
+            ids.add(int(pid))
+
+
+@event.listens_for(Session, "after_flush")
+def _refrescar_saldos_tras_flush(session: Session, _flush_context) -> None:
+    ids = session.info.pop(_INFO_SALDOS, None)
+    # Sin flush propio (ya se está en uno): las cuotas del flush ya están escritas en la transacción.
+    if ids and tabla_disponible(session.connection(), PrestamoSaldo.__tablename__):
+        _reemplazar_filas(session, sorted(ids))
+
+
+def leer_prestamo_saldos(
+    db: Session,
+    prestamo_ids: Sequence[int],
+    *,
+    fecha_referencia: Optional[date] = None,
+) -> dict[int, dict[str, Any]]:
+    """
+    Filas guardadas por préstamo. Si se pasa `fecha_referencia`, solo devuelve filas calculadas para
+    ese día (los campos de atraso dependen de la fecha); los demás campos no dependen del día.
+    """
+    ids = sorted({int(x) for x in prestamo_ids if x is not None})
+    if not ids:
+        return {}
+    # Core (no entidades ORM): las filas se reemplazan con DELETE/INSERT y el identity map quedaria viejo.
+    t = PrestamoSaldo.__table__
+    q = select(t).where(t.c.prestamo_id.in_(ids))
+    if fecha_referencia is not None:
+        q = q.where(t.c.fecha_referencia == fecha_referencia)
+    return {int(m["prestamo_id"]): dict(m) for m in db.execute(q).mappings().all()}
+
+
+def _normalizar_para_comparar(fila: dict[str, Any]) -> tuple:
+    vals = []
+    for c in CAMPOS_RESUMEN:
+        v = fila.get(c)
+        if c in ("total_monto", "total_pagado", "saldo_pendiente"):
+            v = _money(v)
+        elif c in ("fecha_vencimiento_pendiente_min", "ultima_fecha_pago"):
+            v = _as_date(v)
+        elif v is not None:
+            v = int(v)
+        vals.append(v)
+    return tuple(vals)
+
+
+def verificar_prestamo_saldos(
+    db: Session,
+    *,
+    reparar: bool = True,
+    fecha_referencia: Optional[date] = None,
+    chunk_size: int = 2000,
+    max_ejemplos: int = 20,
+) -> dict[str, Any]:
+    """
+    Compara `prestamo_saldos` contra el agregado real de `cuotas` por rangos de prestamo_id.
+
+    Con `reparar=True` reescribe las filas con diferencias, inserta las faltantes, borra las de préstamos
+    sin cuotas y actualiza `fecha_referencia` en el resto (commit por rango). Las diferencias solo de
+    atraso por cambio de día no cuentan como inconsistencia.
+    """
+    ref = fecha_referencia or hoy_negocio()
+    step = max(1, int(chunk_size))
+    res: dict[str, Any] = {
+        "fecha_referencia": ref.isoformat(),
+        "prestamos_verificados": 0,
+        "faltantes": 0,
+        "sobrantes": 0,
+        "con_diferencias": 0,
+        "filas_reescritas": 0,
+        "ejemplos": [],
+    }
+
+    lo_c, hi_c = db.execute(select(func.min(Cuota.prestamo_id), func.max(Cuota.prestamo_id))).one()
+    lo_s, hi_s = db.execute(
+        select(func.min(PrestamoSaldo.prestamo_id), func.max(PrestamoSaldo.prestamo_id))
+    ).one()
+    limites = [x for x in (lo_c, hi_c, lo_s, hi_s) if x is not None]
+    if not limites:
+        return res
+    lo, hi = int(min(limites)), int(max(limites))
+
+    for desde in range(lo, hi + 1, step):
+        hasta = desde + step - 1
+        reales = calcular_prestamo_saldos(db, fecha_referencia=ref, id_desde=desde, id_hasta=hasta)
+        t = PrestamoSaldo.__table__
+        guardadas = {
+            int(m["prestamo_id"]): m
+            for m in db.execute(
+                select(t).where(t.c.prestamo_id >= desde, t.c.prestamo_id <= hasta)
+            ).mappings()
+        }
+        reescribir: list[int] = []
+        for pid, real in reales.items():
+            res["prestamos_verificados"] += 1
+            s = guardadas.get(pid)
+            if s is None:
+                res["faltantes"] += 1
+                reescribir.append(pid)
+                continue
+            guardada = {c: s[c] for c in CAMPOS_RESUMEN}
+            if _as_date(s["fecha_referencia"]) != ref:
+                # El atraso guardado es de otro día: solo se comparan los campos independientes de la fecha.
+                guardada["cuotas_vencidas"] = real["cuotas_vencidas"]
+                guardada["max_dias_atraso"] = real["max_dias_atraso"]
+            if _normalizar_para_comparar(guardada) != _normalizar_para_comparar(real):
+                res["con_diferencias"] += 1
+                if len(res["ejemplos"]) < max_ejemplos:
+                    res["ejemplos"].append(
+                        {
+                            "prestamo_id": pid,
+                            "campos": [
+                                c
+                                for c, a, b in zip(
+                                    CAMPOS_RESUMEN,
+                                    _normalizar_para_comparar(guardada),
+                                    _normalizar_para_comparar(real),
+                                )
+                                if a != b
+                            ],
+                        }
+                    )
+            reescribir.append(pid)
+        sobrantes = [pid for pid in guardadas if pid not in reales]
+        res["sobrantes"] += len(sobrantes)
+
+        if not reparar:
+            db.rollback()
+            continue
+        if reescribir or sobrantes:
+            db.execute(
+                delete(PrestamoSaldo)
+                .where(PrestamoSaldo.prestamo_id.in_(reescribir + sobrantes))
+                .execution_options(synchronize_session=False)
+            )
+        if reescribir:
+            db.execute(insert(PrestamoSaldo), [reales[pid] for pid in reescribir])
+        db.commit()
+        res["filas_reescritas"] += len(reescribir)
+
+    if res["faltantes"] or res["sobrantes"] or res["con_diferencias"]:
+        logger.warning(
+            "[prestamo_saldos] verificacion: faltantes=%s sobrantes=%s con_diferencias=%s ejemplos=%s",
+            res["faltantes"],
+            res["sobrantes"],
+            res["con_diferencias"],
+            res["ejemplos"][:5],
+        )
+    return res
@@ -0,0 +1,237 @@
+"""
+Motor de tablas de amortización por lote (NumPy sobre períodos + redondeo Decimal).
+
+Dos tipos de tabla:
+- `filas_cuotas_plan_lote`: filas de `cuotas` con la regla de `_generar_cuotas_amortizacion`
+  (cuota fija por fila; saldo_capital = monto_cuota * n - cuotas ya vencidas). Resultado idéntico
+  al cálculo fila a fila: NumPy hace la aritmética float64 y el redondeo a centavos se hace con
+  Decimal sobre el valor binario exacto (mismo resultado que `round(x, 2)`).
+- `tabla_francesa_lote`: sistema francés (cuota constante) con capital/interés por período.
+  Los saldos se redondean a centavos (ROUND_HALF_UP) y la última cuota absorbe la diferencia
+  para que la suma de capital sea exactamente el principal.
+
+`insertar_filas_cuotas` persiste las filas con un INSERT multi-fila por lote (sin objetos ORM).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+_CENT = Decimal("0.01")
+_DELTA_DIAS_MODALIDAD = {"QUINCENAL": 15, "SEMANAL": 7}
+
+
+@dataclass(frozen=True)
+class PlanCuotas:
+    """Parámetros de una tabla de cuotas (mismos argumentos que `_generar_cuotas_amortizacion`)."""
+
+    prestamo_id: int
+    cliente_id: int | None
+    fecha_base: date
+    modalidad_pago: str | None
+    numero_cuotas: int
+    monto_cuota: float
+
+
+def _centavos_como_round(x: float) -> Decimal:
+    """Equivale a `Decimal(str(round(x, 2)))`: redondeo correcto sobre el valor binario del float."""
+    return Decimal(float(x)).quantize(_CENT, rounding=ROUND_HALF_EVEN)
+
+
+def _centavos_half_up(x: float) -> Decimal:
+    return Decimal(repr(float(x))).quantize(_CENT, rounding=ROUND_HALF_UP)
+
+
+def _normalizar_modalidad(modalidad_pago: str | None) -> str:
+    modalidad = (modalidad_pago or "MENSUAL").upper()
+    if modalidad != "MENSUAL" and modalidad not in _DELTA_DIAS_MODALIDAD:
+        raise ValueError(f"Modalidad de pago no soportada para amortización: {modalidad}")
+    return modalidad
+
+
+def _fechas_mensuales(fecha_base: np.ndarray, meses: np.ndarray) -> np.ndarray:
+    """fecha_base + meses conservando el día (último día del mes si no existe); meses <= 0 → fecha_base."""
+    base_d = fecha_base.astype("datetime64[D]")
+    mes_base = base_d.astype("datetime64[M]")
+    dia = (base_d - mes_base.astype("datetime64[D]")).astype(np.int64)
+    mes_dest = mes_base + np.maximum(meses, 0).astype("timedelta64[M]")
+    ultimo_dia = ((mes_dest + 1).astype("datetime64[D]") - mes_dest.astype("datetime64[D]")).astype(np.int64) - 1
+    fechas = mes_dest.astype("datetime64[D]") + np.minimum(dia, ultimo_dia).astype("timedelta64[D]")
+    return np.where(meses <= 0, base_d, fechas)
+
+
+def _fechas_vencimiento_np(fecha_base: np.ndarray, modalidades: Sequence[str], numeros: np.ndarray) -> np.ndarray:
+    mensual = np.array([m == "MENSUAL" for m in modalidades], dtype=bool)
+    delta = np.array([_DELTA_DIAS_MODALIDAD.get(m, 0) for m in modalidades], dtype=np.int64)
+    base_d = fecha_base.astype("datetime64[D]")
+    por_dias = base_d + (delta * numeros - 1).astype("timedelta64[D]")
+    if not mensual.any():
+        return por_dias
+    return np.where(mensual, _fechas_mensuales(base_d, numeros), por_dias)
+
+
+def fechas_vencimiento_cuotas(
+    fecha_base: date,
+    modalidad_pago: str | None,
+    numeros_cuota: Sequence[int],
+) -> list[date]:
+    """
+    Fechas de vencimiento para los números de cuota dados (regla única de la tabla):
+      - MENSUAL: fecha_base + n meses, mismo día (o último día del mes).
+      - QUINCENAL: fecha_base + (15*n - 1) días; SEMANAL: fecha_base + (7*n - 1) días.
+    """
+    modalidad = _normalizar_modalidad(modalidad_pago)
+    numeros = np.asarray(list(numeros_cuota), dtype=np.int64)
+    if numeros.size == 0:
+        return []
+    base = np.full(numeros.shape, np.datetime64(fecha_base, "D"))
+    return _fechas_vencimiento_np(base, [modalidad] * numeros.size, numeros).astype(object).tolist()
+
+
+def filas_cuotas_plan_lote(planes: Iterable[PlanCuotas]) -> list[dict[str, Any]]:
+    """
+    Filas listas para INSERT en `cuotas` para todos los planes (orden: préstamo, numero_cuota).
+
+    Misma aritmética que `_generar_cuotas_amortizacion`:
+      total = monto_cuota * numero_cuotas
+      saldo_inicial_n = round(total - (n-1)*monto_cuota, 2); saldo_final_n = max(round(total - n*monto_cuota, 2), 0)
+    """
+    planes = [p for p in planes if int(p.numero_cuotas or 0) > 0]
+    if not planes:
+        return []
+    modalidades = [_normalizar_modalidad(p.modalidad_pago) for p in planes]
+    cuotas_por_plan = np.array([int(p.numero_cuotas) for p in planes], dtype=np.int64)
+    idx = np.repeat(np.arange(len(planes)), cuotas_por_plan)
+    inicio = np.cumsum(cuotas_por_plan) - cuotas_por_plan
+    n = np.arange(idx.size, dtype=np.int64) - np.repeat(inicio, cuotas_por_plan) + 1
+
+    monto = np.array([float(p.monto_cuota) for p in planes], dtype=np.float64)[idx]
+    total = (np.array([float(p.monto_cuota) for p in planes], dtype=np.float64) * cuotas_por_plan)[idx]
+    saldo_ini = total - (n - 1) * monto
+    saldo_fin = total - n * monto
+
+    base = np.array([np.datetime64(p.fecha_base, "D") for p in planes])[idx]
+    fechas = _fechas_vencimiento_np(base, [modalidades[i] for i in idx.tolist()], n).astype(object).tolist()
+
+    monto_dec = [_centavos_como_round(float(p.monto_cuota)) for p in planes]
+    filas: list[dict[str, Any]] = []
+    for k, i in enumerate(idx.tolist()):
+        plan = planes[i]
+        s_ini = _centavos_como_round(saldo_ini[k])
+        s_fin = _centavos_como_round(saldo_fin[k])
+        if s_fin < 0:
+            s_fin = Decimal("0")
+        m = monto_dec[i]
+        filas.append(
+            {
+                "prestamo_id": plan.prestamo_id,
+                "cliente_id": plan.cliente_id,
+                "numero_cuota": int(n[k]),
+                "fecha_vencimiento": fechas[k],
+                "monto": m,
+                "saldo_capital_inicial": s_ini,
+                "saldo_capital_final": s_fin,
+                "monto_capital": s_ini - s_fin,
+                "monto_interes": m - (s_ini - s_fin),
+                "estado": "PENDIENTE",
+                "dias_mora": 0,
+            }
+        )
+    return filas
+
+
+def tabla_francesa_lote(
+    principales: Sequence[float],
+    tasas_periodo: Sequence[float],
+    numeros_cuotas: Sequence[int],
+) -> list[list[dict[str, Decimal]]]:
+    """
+    Sistema francés para varios préstamos a la vez. Por préstamo devuelve una lista de períodos con
+    `cuota`, `interes`, `capital`, `saldo_inicial`, `saldo_final` (Decimal a centavos).
+
+    Saldo teórico (NumPy): S_k = P(1+i)^k - C((1+i)^k - 1)/i, con C = cuota fija redondeada a centavos.
+    Capital_k = S_{k-1} - S_k sobre saldos redondeados; interés_k = C - capital_k. La última cuota lleva
+    el saldo a 0 y su cuota = capital + interés del período (reconciliación de redondeos).
+    """
+    p = np.asarray(principales, dtype=np.float64)
+    i = np.asarray(tasas_periodo, dtype=np.float64)
+    nc = np.asarray(numeros_cuotas, dtype=np.int64)
+    if p.size == 0:
+        return []
+    if np.any(nc <= 0):
+        raise ValueError("Número de cuotas debe ser mayor a 0")
+
+    cuotas_fijas: list[Decimal] = []
+    for pi, ii, ni in zip(p.tolist(), i.tolist(), nc.tolist()):
+        pd = Decimal(repr(pi))
+        if ii <= 0:
+            c = pd / Decimal(ni)
+        else:
+            idec = Decimal(repr(ii))
+            factor = (Decimal(1) + idec) ** ni
+            c = pd * (idec * factor) / (factor - Decimal(1))
+        cuotas_fijas.append(c.quantize(_CENT, rounding=ROUND_HALF_UP))
+    c_arr = np.array([float(c) for c in cuotas_fijas], dtype=np.float64)
+
+    max_n = int(nc.max())
+    k = np.arange(max_n + 1, dtype=np.float64)[None, :]
+    ii = i[:, None]
+    crec = np.power(1.0 + ii, k)
+    con_tasa = ii > 0
+    safe_i = np.where(con_tasa, ii, 1.0)
+    saldos = np.where(
+        con_tasa,
+        p[:, None] * crec - c_arr[:, None] * (crec - 1.0) / safe_i,
+        p[:, None] - c_arr[:, None] * k,
+    )
+    saldos = np.maximum(saldos, 0.0)
+
+    tablas: list[list[dict[str, Decimal]]] = []
+    for row, ni in enumerate(nc.tolist()):
+        c = cuotas_fijas[row]
+        tasa = Decimal(repr(float(i[row])))
+        prev = Decimal(repr(float(p[row]))).quantize(_CENT, rounding=ROUND_HALF_UP)
+        periodos: list[dict[str, Decimal]] = []
+        for kk in range(1, ni + 1):
+            if kk == ni:
+                nuevo = Decimal("0.00")
+                capital = prev
+                interes = (prev * tasa).quantize(_CENT, rounding=ROUND_HALF_UP)
+                cuota = capital + interes
+            else:
+                nuevo = min(_centavos_half_up(saldos[row, kk]), prev)
+                capital = prev - nuevo
+                interes = c - capital
+                cuota = c
+            periodos.append(
+                {
+                    "cuota": cuota,
+                    "interes": interes,
+                    "capital": capital,
+                    "saldo_inicial": prev,
+                    "saldo_final": nuevo,
+                }
+            )
+            prev = nuevo
+        tablas.append(periodos)
+    return tablas
+
+
+def insertar_filas_cuotas(db: Any, filas: Sequence[dict[str, Any]], *, batch_size: int = 5000) -> int:
+    """INSERT multi-fila en `cuotas` (un statement por lote de `batch_size`). No hace commit."""
+    from sqlalchemy import insert
+
+    from app.models.cuota import Cuota
+
+    total = 0
+    for start in range(0, len(filas), max(1, int(batch_size))):
+        chunk = list(filas[start : start + batch_size])
+        if not chunk:
+            continue
+        db.execute(insert(Cuota), chunk)
+        total += len(chunk)
+    return total
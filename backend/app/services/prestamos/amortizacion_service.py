@@ -14,6 +14,7 @@ from app.services.cuota_estado import (
     dias_retraso_desde_vencimiento,
     hoy_negocio,
 )
+from .amortizacion_lote import insertar_filas_cuotas, tabla_francesa_lote
 from .prestamos_calculo import PrestamosCalculo
 from .prestamos_excepciones import (
     AmortizacionCalculoError,
@@ -76,77 +77,65 @@ class AmortizacionService:
             self.db.query(Cuota).filter(Cuota.prestamo_id == prestamo_id).delete()
             self.db.commit()
 
-        # Calcular cuota fija
-        cuota_fija = self.calculo.calcular_cuota_fija(
-            float(prestamo.total_financiamiento),
-            float(prestamo.tasa_interes),
-            prestamo.numero_cuotas,
-            prestamo.modalidad_pago
-        )
-
-        # Generar tabla de amortización
-        tabla = []
-        saldo_actual = float(prestamo.total_financiamiento)
-        fecha_vencimiento = fecha_inicio
+        # Tabla francesa calculada en bloque (NumPy + reconciliación Decimal en la última cuota)
         dias_periodo = self.calculo._calcular_dias_periodo(prestamo.modalidad_pago)
-
-        for numero_cuota in range(1, prestamo.numero_cuotas + 1):
-            # Calcular interés del período
-            interes = self.calculo.calcular_interes_periodo(
-                saldo_actual,
-                float(prestamo.tasa_interes),
-                prestamo.modalidad_pago
-            )
-
-            # Calcular amortización (capital)
-            amortizacion = self.calculo.calcular_amortizacion_periodo(
-                cuota_fija,
-                interes
+        tasa_periodo = float(prestamo.tasa_interes or 0) / 100 * dias_periodo / 365
+        try:
+            (periodos,) = tabla_francesa_lote(
+                [float(prestamo.total_financiamiento)],
+                [tasa_periodo],
+                [prestamo.numero_cuotas],
             )
+        except ValueError as e:
+            raise AmortizacionCalculoError(str(e))
 
-            # Actualizar saldo (puede quedar negativo por redondeo en última cuota)
-            saldo_nuevo = max(saldo_actual - amortizacion, 0.0)
-
-            # Si es la última cuota, ajustar para que saldo quede en 0
-            if numero_cuota == prestamo.numero_cuotas:
-                amortizacion = saldo_actual
-                saldo_nuevo = 0.0
+        existentes = {
+            int(n)
+            for (n,) in self.db.query(Cuota.numero_cuota)
+            .filter(Cuota.prestamo_id == prestamo_id)
+            .all()
+        }
 
-            # Crear registro de cuota
-            cuota_data = {
+        tabla = []
+        filas_nuevas = []
+        fecha_vencimiento = fecha_inicio
+        for numero_cuota, periodo in enumerate(periodos, start=1):
+            tabla.append({
                 'prestamo_id': prestamo_id,
                 'numero_cuota': numero_cuota,
                 'fecha_vencimiento': fecha_vencimiento,
-                'monto_cuota': cuota_fija,
-                'interes_cuota': interes,
-                'amortizacion_cuota': amortizacion,
-                'saldo_vigente': saldo_nuevo,
+                'monto_cuota': float(periodo['cuota']),
+                'interes_cuota': float(periodo['interes']),
+                'amortizacion_cuota': float(periodo['capital']),
+                'saldo_vigente': float(periodo['saldo_final']),
                 'estado': 'PENDIENTE',
                 'pagado': False,
                 'monto_pagado': 0.0,
-            }
-
-            tabla.append(cuota_data)
-
-            # Crear objeto Cuota en BD si no existe
-            cuota_existente = self.db.query(Cuota).filter(
-                and_(
-                    Cuota.prestamo_id == prestamo_id,
-                    Cuota.numero_cuota == numero_cuota
-                )
-            ).first()
-
-            if not cuota_existente:
-                cuota_obj = Cuota(**cuota_data)
-                self.db.add(cuota_obj)
+            })
+
+            # Solo se insertan los números de cuota que aún no existen en BD
+            if numero_cuota not in existentes:
+                filas_nuevas.append({
+                    'prestamo_id': prestamo_id,
+                    'cliente_id': prestamo.cliente_id,
+                    'numero_cuota': numero_cuota,
+                    'fecha_vencimiento': fecha_vencimiento,
+                    'monto': periodo['cuota'],
+                    'saldo_capital_inicial': periodo['saldo_inicial'],
+                    'saldo_capital_final': periodo['saldo_final'],
+                    'monto_capital': periodo['capital'],
+                    'monto_interes': periodo['interes'],
+                    'estado': 'PENDIENTE',
+                    'dias_mora': 0,
+                })
 
             # Siguiente período
             fecha_vencimiento = self.calcular_siguiente_fecha_cuota(
                 fecha_vencimiento,
                 prestamo.modalidad_pago
             )
-            saldo_actual = saldo_nuevo
 
+        insertar_filas_cuotas(self.db, filas_nuevas)
         self.db.commit()
         return tabla
 
@@ -0,0 +1,133 @@
+"""
+Cola de préstamos con pagos por aplicar a cuotas (`prestamos_sync_pendiente`).
+
+Antes cada GET de estado de cuenta (interno, PDF, portal público) llamaba a
+``sincronizar_pagos_pendientes_a_prestamos`` y podía reaplicar en cascada y hacer commit.
+Ahora:
+- alimentación: al insertar/actualizar un pago (conciliado, monto o préstamo) el flush encola el
+  préstamo (``app.models.prestamo_version``);
+- drenado: ``drenar_cola_sync_prestamos`` reclama un lote (SKIP LOCKED en PostgreSQL), sincroniza cada
+  préstamo en su transacción y borra la fila solo si no se volvió a encolar mientras tanto;
+- red de seguridad: ``encolar_prestamos_con_pagos_sin_aplicar`` encola préstamos con pagos
+  conciliados sin cuota_pagos (altas por SQL/Core que no pasan por el ORM).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.cuota_pago import CuotaPago
+from app.models.pago import Pago
+from app.models.prestamo_version import PrestamoSyncPendiente, encolar_sync_prestamos
+from app.services.pagos_cuotas_sincronizacion import sincronizar_pagos_pendientes_a_prestamos
+
+logger = logging.getLogger(__name__)
+
+# Tras este número de fallos seguidos la fila queda en la tabla (visible) pero no se reintenta.
+MAX_INTENTOS = 20
+# Un claim más viejo que esto se considera de un proceso caído (o reintento tras error).
+CLAIM_STALE_MIN = 10
+
+
+def reclamar_prestamos(db: Session, limite: int, *, ahora: Optional[datetime] = None) -> List[Tuple[int, datetime]]:
+    """Reclama hasta `limite` préstamos encolados (más antiguos primero) y hace commit. Devuelve (id, encolado_en)."""
+    ahora = ahora or datetime.utcnow()
+    t = PrestamoSyncPendiente
+    rows = db.execute(
+        select(t.prestamo_id, t.encolado_en)
+        .where(
+            or_(t.reclamado_en.is_(None), t.reclamado_en < ahora - timedelta(minutes=CLAIM_STALE_MIN)),
+            t.intentos < MAX_INTENTOS,
+        )
+        .order_by(t.encolado_en, t.prestamo_id)
+        .limit(max(1, int(limite)))
+        .with_for_update(skip_locked=True)
+    ).all()
+    if rows:
+        db.execute(
+            update(t).where(t.prestamo_id.in_([r[0] for r in rows])).values(reclamado_en=ahora)
+        )
+    db.commit()
+    return [(int(r[0]), r[1]) for r in rows]
+
+
+def drenar_cola_sync_prestamos(db: Session, limite: int = 50) -> Dict[str, Any]:
+    """Sincroniza los préstamos reclamados. Retorna {reclamados, procesados, pagos_aplicados, errores}."""
+    lote = reclamar_prestamos(db, limite)
+    procesados = 0
+    aplicados = 0
+    errores = 0
+    for prestamo_id, encolado_en in lote:
+        try:
+            aplicados += sincronizar_pagos_pendientes_a_prestamos(db, [prestamo_id])
+            db.execute(
+                delete(PrestamoSyncPendiente).where(
+                    PrestamoSyncPendiente.prestamo_id == prestamo_id,
+                    PrestamoSyncPendiente.encolado_en <= encolado_en,
+                )
+            )
+            db.commit()
+            procesados += 1
+        except Exception as e:
+            errores += 1
+            logger.warning("prestamos_sync_cola: prestamo_id=%s error=%s", prestamo_id, e)
+            db.rollback()
+            db.execute(
+                update(PrestamoSyncPendiente)
+                .where(PrestamoSyncPendiente.prestamo_id == prestamo_id)
+                .values(
+                    intentos=PrestamoSyncPendiente.intentos + 1,
+                    ultimo_error=str(e)[:500],
+                )
+            )
+            db.commit()
+    return {
+        "reclamados": len(lote),
+        "procesados": procesados,
+        "pagos_aplicados": aplicados,
+        "errores": errores,
+    }
+
+
+def encolar_prestamos_con_pagos_sin_aplicar(db: Session) -> int:
+    """Encola préstamos con pagos conciliados (monto > 0) sin fila en cuota_pagos. Hace commit."""
+    conciliado_o_si = or_(
+        Pago.conciliado.is_(True),
+        func.coalesce(func.upper(func.trim(Pago.verificado_concordancia)), "") == "SI",
+    )
+    ids = db.execute(
+        select(Pago.prestamo_id)
+        .where(
+            Pago.prestamo_id.isnot(None),
+            conciliado_o_si,
+            Pago.monto_pagado > 0,
+            ~select(CuotaPago.id).where(CuotaPago.pago_id == Pago.id).exists(),
+        )
+        .distinct()
+    ).scalars().all()
+    ids = sorted({int(x) for x in ids if x is not None})
+    if ids:
+        encolar_sync_prestamos(db, ids)
+    db.commit()
+    return len(ids)
+
+
+def resumen_cola_sync_prestamos(db: Session) -> Dict[str, Any]:
+    """Tamaño de la cola, filas agotadas (intentos >= MAX_INTENTOS) y antigüedad de la más vieja."""
+    t = PrestamoSyncPendiente
+    total, agotadas, mas_antigua = db.execute(
+        select(
+            func.count(),
+            func.count().filter(t.intentos >= MAX_INTENTOS),
+            func.min(t.encolado_en),
+        ).select_from(t)
+    ).one()
+    return {
+        "pendientes": int(total or 0),
+        "agotadas": int(agotadas or 0),
+        "mas_antigua": mas_antigua.isoformat() if mas_antigua else None,
+    }
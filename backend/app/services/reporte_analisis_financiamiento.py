@@ -155,7 +155,9 @@ def build_analisis_financiamiento_excel(db: Session) -> Tuple[bytes, int]:
     )
 
     sheet_rows = db.execute(
-        select(ConciliacionSheetRow).order_by(ConciliacionSheetRow.row_index)
+        select(ConciliacionSheetRow)
+        .where(ConciliacionSheetRow.eliminado_en.is_(None))
+        .order_by(ConciliacionSheetRow.row_index)
     ).scalars().all()
     if not sheet_rows:
         logger.warning("[analisis_financiamiento] abort: conciliacion_sheet_rows vacío")
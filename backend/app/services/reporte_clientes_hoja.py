@@ -219,7 +219,9 @@ def build_clientes_hoja_excel(
     )
 
     sheet_rows = db.execute(
-        select(ConciliacionSheetRow).order_by(ConciliacionSheetRow.row_index)
+        select(ConciliacionSheetRow)
+        .where(ConciliacionSheetRow.eliminado_en.is_(None))
+        .order_by(ConciliacionSheetRow.row_index)
     ).scalars().all()
     if not sheet_rows:
         raise ValueError(
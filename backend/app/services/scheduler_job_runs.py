@@ -0,0 +1,167 @@
+"""
+Historial de jobs programados (tabla scheduler_job_runs): escritura desde el scheduler y resumen por job.
+
+La escritura usa su propia sesión y nunca propaga errores: un fallo al registrar no debe romper el job
+(ni el hilo del scheduler). BD sin la migración 092 simplemente no guarda historial.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core import metricas
+from app.core.database import SessionLocal
+from app.models.scheduler_job_run import SchedulerJobRun
+
+logger = logging.getLogger(__name__)
+
+RESULTADO_OK = "ok"
+RESULTADO_ERROR = "error"
+RESULTADO_OMITIDO_EXCLUSION = "omitido_exclusion"
+RESULTADO_MISFIRE = "misfire"
+RESULTADO_OMITIDO_MAX_INSTANCIAS = "omitido_max_instancias"
+
+_ERROR_MAX_CHARS = 2000
+
+_corridas = metricas.contador(
+    "rapicredit_scheduler_job_corridas_total", "Corridas de jobs programados por resultado.", ("job", "resultado")
+)
+_duracion = metricas.histograma(
+    "rapicredit_scheduler_job_duracion_segundos", "Duración de corridas de jobs.", ("job",), buckets=metricas.BUCKETS_JOBS
+)
+_espera_exclusion = metricas.histograma(
+    "rapicredit_scheduler_job_espera_exclusion_segundos",
+    "Espera por el lock de exclusión antes de correr el job.",
+    ("job",),
+    buckets=metricas.BUCKETS_JOBS,
+)
+
+
+def registrar_job_run(
+    job_id: str,
+    resultado: str,
+    *,
+    clase: Optional[str] = None,
+    programado_para: Optional[datetime] = None,
+    inicio: Optional[datetime] = None,
+    fin: Optional[datetime] = None,
+    espera_exclusion_ms: Optional[int] = None,
+    filas: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """Inserta una fila (commit propio). Calcula duración y retraso respecto de la hora programada."""
+    inicio = inicio or datetime.now(timezone.utc)
+    duracion_ms = int((fin - inicio).total_seconds() * 1000) if fin is not None else None
+    retraso_ms = None
+    if programado_para is not None:
+        retraso_ms = max(0, int((inicio - programado_para).total_seconds() * 1000))
+    _corridas.inc(job=job_id, resultado=resultado)
+    if duracion_ms is not None:
+        _duracion.observe(duracion_ms / 1000.0, job=job_id)
+    if espera_exclusion_ms is not None:
+        _espera_exclusion.observe(espera_exclusion_ms / 1000.0, job=job_id)
+    db = SessionLocal()
+    try:
+        db.add(
+            SchedulerJobRun(
+                job_id=job_id[:120],
+                clase=clase,
+                programado_para=programado_para,
+                inicio=inicio,
+                fin=fin,
+                duracion_ms=duracion_ms,
+                espera_exclusion_ms=espera_exclusion_ms,
+                retraso_ms=retraso_ms,
+                filas=filas,
+                resultado=resultado,
+                error=(error or None) and error[:_ERROR_MAX_CHARS],
+            )
+        )
+        db.commit()
+    except Exception as e:
+        logger.warning("[scheduler] no se pudo registrar corrida job=%s resultado=%s: %s", job_id, resultado, e)
+        try:
+            db.rollback()
+        except Exception:
+            pass
+    finally:
+        db.close()
+
+
+def resumen_job_runs(db: Session, *, horas: int = 24, limite_corridas: int = 200) -> dict[str, Any]:
+    """Por job en la ventana: corridas, errores, misfires, omisiones, duración total/máx, retraso máx; y últimas filas."""
+    desde = datetime.now(timezone.utc) - timedelta(hours=horas)
+    t = SchedulerJobRun
+    filas = db.execute(
+        select(
+            t.job_id,
+            func.max(t.clase),
+            func.count(),
+            func.sum(case((t.resultado == RESULTADO_OK, 1), else_=0)),
+            func.sum(case((t.resultado == RESULTADO_ERROR, 1), else_=0)),
+            func.sum(case((t.resultado == RESULTADO_MISFIRE, 1), else_=0)),
+            func.sum(case((t.resultado.in_((RESULTADO_OMITIDO_EXCLUSION, RESULTADO_OMITIDO_MAX_INSTANCIAS)), 1), else_=0)),
+            func.coalesce(func.sum(t.duracion_ms), 0),
+            func.max(t.duracion_ms),
+            func.max(t.espera_exclusion_ms),
+            func.max(t.retraso_ms),
+            func.coalesce(func.sum(t.filas), 0),
+            func.max(t.inicio),
+        )
+        .where(t.inicio >= desde)
+        .group_by(t.job_id)
+        .order_by(func.coalesce(func.sum(t.duracion_ms), 0).desc())
+    ).all()
+    jobs = [
+        {
+            "job_id": r[0],
+            "clase": r[1],
+            "corridas": int(r[2]),
+            "ok": int(r[3] or 0),
+            "errores": int(r[4] or 0),
+            "misfires": int(r[5] or 0),
+            "omitidos": int(r[6] or 0),
+            "duracion_ms_total": int(r[7] or 0),
+            "duracion_ms_max": r[8],
+            "espera_exclusion_ms_max": r[9],
+            "retraso_ms_max": r[10],
+            "filas_total": int(r[11] or 0),
+            "ultima": r[12].isoformat() if r[12] else None,
+        }
+        for r in filas
+    ]
+    recientes = db.execute(
+        select(t).where(t.inicio >= desde).order_by(t.inicio.desc(), t.id.desc()).limit(limite_corridas)
+    ).scalars().all()
+    return {
+        "desde": desde.isoformat(),
+        "horas": horas,
+        "jobs": jobs,
+        "corridas": [
+            {
+                "job_id": r.job_id,
+                "clase": r.clase,
+                "resultado": r.resultado,
+                "programado_para": r.programado_para.isoformat() if r.programado_para else None,
+                "inicio": r.inicio.isoformat() if r.inicio else None,
+                "duracion_ms": r.duracion_ms,
+                "espera_exclusion_ms": r.espera_exclusion_ms,
+                "retraso_ms": r.retraso_ms,
+                "filas": r.filas,
+                "error": r.error,
+            }
+            for r in recientes
+        ],
+    }
+
+
+def purgar_job_runs(db: Session, dias: int) -> int:
+    """Borra historial con inicio anterior a `dias` días. Retorna filas borradas."""
+    limite = datetime.now(timezone.utc) - timedelta(days=max(1, int(dias)))
+    res = db.execute(delete(SchedulerJobRun).where(SchedulerJobRun.inicio < limite))
+    db.commit()
+    return int(res.rowcount or 0)
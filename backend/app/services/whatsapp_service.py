@@ -24,6 +24,7 @@ from app.models.conversacion_cobranza import ConversacionCobranza
 from app.models.pagos_informe import PagosInforme
 from app.models.mensaje_whatsapp import MensajeWhatsapp
 from app.models.ticket import Ticket
+from app.utils.cliente_telefonos import cliente_id_por_telefono, digitos_telefono
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,7 @@ LOG_TAG_FALLO = "[INFORME_PAGOS] FALLO"
 
 def _telefono_normalizado(phone: str) -> str:
     """TelÃ©fono solo dÃ­gitos para guardar/consultar historial."""
-    return re.sub(r"\D", "", (phone or "").strip())
+    return digitos_telefono(phone)
 
 
 def guardar_mensaje_whatsapp(
@@ -355,6 +356,8 @@ def _crear_ticket_recibo_no_claro(
             c = db.execute(select(Cliente.id).where(Cliente.cedula == conv.cedula.strip()).limit(1)).scalar_one_or_none()
             if c is not None:
                 cliente_id = int(c) if isinstance(c, (int, float)) else getattr(c, "id", None)
+        if cliente_id is None:
+            cliente_id = cliente_id_por_telefono(db, phone)
         titulo = f"Recibo de pago no claro tras 3 intentos - CÃ©dula {conv.cedula or 'N/A'}"
         desc_parts = [
             "La imagen del recibo de pago no fue clara despuÃ©s de 3 intentos. Se almacenÃ³ igual para revisiÃ³n.",
@@ -422,6 +425,8 @@ def _crear_ticket_informe_revisar(
             c = db.execute(select(Cliente.id).where(Cliente.cedula == conv.cedula.strip()).limit(1)).scalar_one_or_none()
             if c is not None:
                 cliente_id = int(c) if isinstance(c, (int, float)) else getattr(c, "id", None)
+        if cliente_id is None:
+            cliente_id = cliente_id_por_telefono(db, phone)
         nombre_campo = _nombre_campo_para_usuario(campo_corregido)
         titulo = f"Informe de pago requiere revisiÃ³n - CÃ©dula {informe.cedula or 'N/A'}"
         desc_parts = [
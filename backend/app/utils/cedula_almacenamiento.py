@@ -1,4 +1,9 @@
-"""Normalizacion de cedula para almacenamiento: trim + mayusculas."""
+"""Normalizacion de cedula para almacenamiento: trim + mayusculas.
+
+Las comparaciones SQL de cedula pasan por ``expr_cedula_normalizada_para_comparar``: en PostgreSQL la
+migracion 090 crea indices de expresion con exactamente ese mismo arbol (constantes literales, no
+parametros), de modo que el planner usa index scan en clientes, prestamos, pagos y pagos_reportados.
+"""
 
 from __future__ import annotations
 
@@ -6,7 +11,7 @@ import re
 import unicodedata
 from typing import Iterable, Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import func, literal_column, select
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.elements import ColumnElement
 
@@ -34,22 +39,38 @@ def _database_url_es_postgresql() -> bool:
     return u.startswith("postgresql") or u.startswith("postgres://")
 
 
+def _lit(valor: str) -> ColumnElement:
+    """Constante SQL literal (no bind): el arbol debe coincidir con el de los indices de expresion."""
+    return literal_column("'" + valor.replace("'", "''") + "'")
+
+
 def expr_cedula_normalizada_para_comparar(column) -> ColumnElement:
     """
     Expresión SQL alineada con ``texto_cedula_comparable_bd`` (mayúsculas, solo V/E/G/J y dígitos).
 
     En PostgreSQL se eliminan además otros separadores vía ``regexp_replace``; en SQLite (p. ej. tests)
-    se aplica solo guión, punto y espacio como antes.
+    se aplica solo guión, punto y espacio como antes. No cambiar sin recrear los índices de la migración
+    ``090_claves_normalizadas_cedula_email`` (deben compartir la misma expresión).
     """
-    x = func.upper(func.trim(func.coalesce(column, "")))
-    x = func.replace(x, "-", "")
-    x = func.replace(x, ".", "")
-    x = func.replace(x, " ", "")
+    x = func.upper(func.trim(func.coalesce(column, _lit(""))))
+    x = func.replace(x, _lit("-"), _lit(""))
+    x = func.replace(x, _lit("."), _lit(""))
+    x = func.replace(x, _lit(" "), _lit(""))
     if _database_url_es_postgresql():
-        return func.regexp_replace(x, "[^VEGJ0-9]", "", "g")
+        return func.regexp_replace(x, _lit("[^VEGJ0-9]"), _lit(""), _lit("g"))
     return x
 
 
+def expr_cedula_documento_concatenada(tipo_column, numero_column) -> ColumnElement:
+    """
+    ``tipo || numero`` sin NULL (p. ej. pagos_reportados.tipo_cedula + numero_cedula).
+
+    Usa el operador ``||`` y no ``concat()``: en PostgreSQL ``concat`` no es IMMUTABLE y no admite
+    índice de expresión.
+    """
+    return func.coalesce(tipo_column, _lit("")).op("||")(func.coalesce(numero_column, _lit("")))
+
+
 def normalizar_cedula_almacenamiento(value: Optional[str]) -> Optional[str]:
     """Devuelve la cedula lista para persistir: strip + MAYUSCULAS. None si no hay valor."""
     if value is None:
@@ -124,6 +145,39 @@ def resolver_cedula_almacenada_en_clientes(
     return None
 
 
+def resolver_cedulas_almacenadas_en_clientes(
+    db: Session, cedulas_raw: Iterable[Optional[str]]
+) -> dict[str, Optional[str]]:
+    """
+    Versión por lote de `resolver_cedula_almacenada_en_clientes`: {cedula_raw: cedula en clientes | None}
+    con una sola consulta sobre todos los candidatos (mismo orden de preferencia por entrada).
+    """
+    from app.models.cliente import Cliente
+
+    candidatos_por_raw: dict[str, list[str]] = {}
+    for raw in cedulas_raw:
+        if raw is None or raw in candidatos_por_raw:
+            continue
+        cedula_norm = normalizar_cedula_almacenamiento(raw) or ""
+        candidatos: list[str] = []
+        if cedula_norm:
+            candidatos.append(cedula_norm)
+            if cedula_norm[0].isdigit():
+                candidatos.extend(f"{prefijo}{cedula_norm}" for prefijo in ("V", "E", "J", "G"))
+        candidatos_por_raw[raw] = candidatos
+
+    todos = sorted({c for lista in candidatos_por_raw.values() for c in lista})
+    existentes: set[str] = set()
+    for i in range(0, len(todos), 1000):
+        existentes.update(
+            db.execute(select(Cliente.cedula).where(Cliente.cedula.in_(todos[i : i + 1000]))).scalars()
+        )
+    return {
+        raw: next((c for c in candidatos if c in existentes), None)
+        for raw, candidatos in candidatos_por_raw.items()
+    }
+
+
 class CedulaPagoFkError(ValueError):
     """Cédula de pago no resoluble contra `clientes` (FK fk_pagos_cedula)."""
 
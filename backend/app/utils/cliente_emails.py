@@ -20,6 +20,9 @@ Funciones de este módulo:
       → normaliza y verifica que correo_2 no sea idéntico a correo_1 antes de guardarlo o mostrarlo.
   - algun_email_coincide
       → útil al cruzar un remitente o lista con correo_1 y correo_2 en BD (mismo orden de prioridad).
+  - texto_email_comparable_bd / expr_email_normalizado_para_comparar
+      → clave de búsqueda por correo (trim + minúsculas) en Python y en SQL; la expresión SQL coincide con
+        los índices de expresión de la migración 090 (clientes.email, email_secundario, envios_notificacion.email).
 
 Escaneo Gmail / digitalización de pagos (plantillas Mercantil, BNC, Binance, BDV, NR, etc.):
   En flujo normal la cédula del Excel **no** sale de la imagen; el backend resuelve el cliente comparando el **From** (De)
@@ -33,6 +36,9 @@ from __future__ import annotations
 import logging
 from typing import Iterable, List, Optional, Sequence
 
+from sqlalchemy import func
+from sqlalchemy.sql.elements import ColumnElement
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +46,19 @@ def _norm_email(s: Optional[str]) -> str:
     return (s or "").strip()
 
 
+def texto_email_comparable_bd(value: Optional[str]) -> str:
+    """Clave de comparación por correo: trim + minúsculas ('' si no hay valor)."""
+    return _norm_email(value).lower()
+
+
+def expr_email_normalizado_para_comparar(column) -> ColumnElement:
+    """
+    ``lower(trim(col))``: misma forma que los índices de expresión sobre correos; comparar siempre
+    contra ``texto_email_comparable_bd`` (no envolver la columna en ``coalesce``: rompe el índice).
+    """
+    return func.lower(func.trim(column))
+
+
 def _email_smtp_enrutable(email: str) -> bool:
     """
     True si `email` se puede entregar por SMTP estándar (ASCII puro, sin caracteres
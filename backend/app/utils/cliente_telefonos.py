@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Identidad de cliente por teléfono.
+
+Un mismo número llega con formatos distintos: `+58 412-1234567` en clientes, `584121234567` desde el webhook
+de WhatsApp, `04121234567` capturado a mano. La clave canónica es la de la búsqueda histórica de Comunicaciones:
+
+  - solo dígitos; menos de 8 dígitos no identifica a nadie (clave None);
+  - 10 dígitos o más: los últimos 10 (número nacional sin código de país ni 0 inicial);
+  - 8 o 9 dígitos: el número completo.
+
+Dos números con la misma clave son el mismo teléfono a efectos de identidad. La clave se guarda en
+`clientes.telefono_clave` (indexada, se actualiza al asignar `Cliente.telefono`; backfill en la migración 097),
+así que resolver un teléfono es una búsqueda por índice y no un recorrido de la tabla clientes.
+
+Funciones:
+  - digitos_telefono / clave_telefono → normalización en Python (también la usa el webhook de WhatsApp).
+  - clientes_por_telefonos / cliente_id_por_telefono → resolución teléfono → cliente.id (listados, webhook).
+  - telefono_exacto_registrado → duplicado de alta/edición (mismos dígitos exactos, no solo misma clave).
+"""
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+_LARGO_MINIMO = 8
+_LARGO_CLAVE = 10
+
+
+def digitos_telefono(s: Optional[str]) -> str:
+    """Solo dígitos del teléfono (formato con el que se guardan conversaciones y mensajes de WhatsApp)."""
+    return re.sub(r"\D", "", (s or "").strip())
+
+
+def clave_telefono(s: Optional[str]) -> Optional[str]:
+    d = digitos_telefono(s)
+    if len(d) < _LARGO_MINIMO:
+        return None
+    return d[-_LARGO_CLAVE:]
+
+
+def clientes_por_telefonos(db: "Session", telefonos: Iterable[str]) -> Dict[str, int]:
+    """
+    {dígitos del teléfono: cliente.id} para los teléfonos que identifican a un cliente (una sola consulta).
+    Si varios clientes comparten la clave, gana el que tiene exactamente los mismos dígitos y luego el menor id.
+    """
+    from sqlalchemy import select
+
+    from app.models.cliente import Cliente
+
+    por_clave: Dict[str, list[str]] = {}
+    for t in telefonos:
+        d = digitos_telefono(t)
+        k = clave_telefono(d)
+        if k is not None:
+            por_clave.setdefault(k, []).append(d)
+    if not por_clave:
+        return {}
+    candidatos: Dict[str, list[tuple[int, str]]] = {}
+    filas = db.execute(
+        select(Cliente.id, Cliente.telefono, Cliente.telefono_clave)
+        .where(Cliente.telefono_clave.in_(list(por_clave)))
+        .order_by(Cliente.id)
+    ).all()
+    for cid, tel, k in filas:
+        candidatos.setdefault(k, []).append((int(cid), digitos_telefono(tel)))
+    out: Dict[str, int] = {}
+    for k, digitos in por_clave.items():
+        lista = candidatos.get(k)
+        if not lista:
+            continue
+        for d in digitos:
+            exacto = next((cid for cid, dc in lista if dc == d), None)
+            out[d] = exacto if exacto is not None else lista[0][0]
+    return out
+
+
+def cliente_id_por_telefono(db: "Session", telefono: Optional[str]) -> Optional[int]:
+    return clientes_por_telefonos(db, [telefono or ""]).get(digitos_telefono(telefono))
+
+
+def telefono_exacto_registrado(
+    db: "Session", telefono: Optional[str], *, excluir_cliente_id: Optional[int] = None
+) -> Optional[int]:
+    """id de un cliente cuyo teléfono tiene exactamente los mismos dígitos (búsqueda por clave indexada)."""
+    from sqlalchemy import select
+
+    from app.models.cliente import Cliente
+
+    d = digitos_telefono(telefono)
+    k = clave_telefono(d)
+    if k is None:
+        return None
+    q = select(Cliente.id, Cliente.telefono).where(Cliente.telefono_clave == k).order_by(Cliente.id)
+    if excluir_cliente_id is not None:
+        q = q.where(Cliente.id != excluir_cliente_id)
+    for cid, tel in db.execute(q).all():
+        if digitos_telefono(tel) == d:
+            return int(cid)
+    return None
@@ -0,0 +1,15 @@
+"""
+Banco de pruebas de rendimiento (no forma parte de pytest ni del deploy).
+
+Flujo:
+  1) Cartera sintética determinista (misma semilla + escala + fecha = mismas filas):
+       BENCH_DATABASE_URL=postgresql://... python -m benchmarks generar --prestamos 10000 --semilla 7
+     En SQLite crea las tablas del modelo que compilan en ese motor; en PostgreSQL espera el esquema migrado
+     (alembic upgrade head). Nunca usa DATABASE_URL: la BD de benchmark se indica aparte.
+  2) Medición de rutas calientes (cascada, comparar_lote, dashboard, listados, PDF):
+       python -m benchmarks correr --salida benchmarks/baselines/local.json
+  3) Comparación contra una línea base (exit 1 si algún caso empeora más que la tolerancia):
+       python -m benchmarks comparar benchmarks/baselines/main.json benchmarks/baselines/local.json --tolerancia 0.15
+
+Los casos que dependen de SQL solo-PostgreSQL quedan como "error" en SQLite (no abortan la corrida).
+"""
@@ -0,0 +1,124 @@
+"""
+CLI: python -m benchmarks {generar|correr|comparar} ...  (ver benchmarks/__init__.py).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+ESCALA_MIN, ESCALA_MAX = 10_000, 500_000
+
+
+def _url(args) -> str:
+    url = (args.url or os.environ.get("BENCH_DATABASE_URL") or "").strip()
+    if not url:
+        sys.exit("Indique --url o BENCH_DATABASE_URL (nunca se usa DATABASE_URL de la aplicación).")
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    # app.core.config exige DATABASE_URL al importarse: se sobrescribe (antes de importar app.*) para que el
+    # engine y SessionLocal de la aplicación apunten a la BD de benchmark aunque el shell ya la tenga definida.
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+def _engine(url: str):
+    from sqlalchemy import create_engine
+
+    return create_engine(url, future=True)
+
+
+def _cmd_generar(args) -> int:
+    url = _url(args)
+    if not (ESCALA_MIN <= args.prestamos <= ESCALA_MAX) and not args.forzar:
+        sys.exit(f"--prestamos fuera de {ESCALA_MIN}..{ESCALA_MAX} (use --forzar para escalas de prueba).")
+    from benchmarks.generador import EscalaCartera, generar_cartera
+
+    escala = EscalaCartera(
+        prestamos=args.prestamos,
+        semilla=args.semilla,
+        hoy=date.fromisoformat(args.hoy) if args.hoy else date.today(),
+        movimientos_banco=args.movimientos_banco,
+    )
+    res = generar_cartera(_engine(url), escala, progreso=lambda t, n: print(f"  {t}: {n} filas"))
+    for tabla, estado in res["esquema"].items():
+        if estado not in ("ok", "creada"):
+            print(f"  (omitida) {tabla}: {estado}")
+    return 0
+
+
+def _cmd_correr(args) -> int:
+    url = _url(args)
+    from benchmarks.medicion import guardar, medir_casos
+
+    def _progreso(nombre, r):
+        if r["estado"] == "ok":
+            print(f"  {nombre:<48} mediana={r['mediana_ms']:>10.2f} ms  p95={r['p95_ms']:>10.2f} ms")
+        else:
+            print(f"  {nombre:<48} ERROR {r['error']}")
+
+    res = medir_casos(
+        _engine(url),
+        date.fromisoformat(args.hoy) if args.hoy else date.today(),
+        nombres=args.casos,
+        repeticiones=args.repeticiones,
+        calentamiento=args.calentamiento,
+        progreso=_progreso,
+    )
+    if args.salida:
+        print(f"Guardado en {guardar(res, args.salida)}")
+    return 0
+
+
+def _cmd_comparar(args) -> int:
+    from benchmarks.medicion import cargar, comparar_corridas
+
+    filas = comparar_corridas(
+        cargar(args.base), cargar(args.nueva), tolerancia=args.tolerancia, piso_ms=args.piso_ms
+    )
+    regresiones = [f for f in filas if f["regresion"]]
+    for f in filas:
+        marca = "REGRESION" if f["regresion"] else ""
+        ratio = f"{f['ratio']:.3f}x" if f["ratio"] is not None else f["estado"]
+        print(f"  {f['caso']:<48} {str(f['base_ms']):>10} -> {str(f['nueva_ms']):>10} ms  {ratio:>8}  {marca}")
+    print(f"{len(regresiones)} regresión(es) de {len(filas)} caso(s); tolerancia {args.tolerancia:.0%}")
+    return 1 if regresiones else 0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    g = sub.add_parser("generar", help="Inserta la cartera sintética en una BD vacía")
+    g.add_argument("--url")
+    g.add_argument("--prestamos", type=int, default=ESCALA_MIN)
+    g.add_argument("--semilla", type=int, default=7)
+    g.add_argument("--hoy", help="Fecha de referencia YYYY-MM-DD (por defecto hoy)")
+    g.add_argument("--movimientos-banco", type=int, default=2000)
+    g.add_argument("--forzar", action="store_true")
+    g.set_defaults(fn=_cmd_generar)
+
+    c = sub.add_parser("correr", help="Mide los casos y opcionalmente guarda el JSON")
+    c.add_argument("--url")
+    c.add_argument("--casos", nargs="*", help="Nombres o prefijos (p. ej. dashboard cascada.aplicar_pago_a_cuotas)")
+    c.add_argument("--repeticiones", type=int, default=5)
+    c.add_argument("--calentamiento", type=int, default=1)
+    c.add_argument("--hoy")
+    c.add_argument("--salida", type=Path)
+    c.set_defaults(fn=_cmd_correr)
+
+    k = sub.add_parser("comparar", help="Compara dos corridas; exit 1 si hay regresiones")
+    k.add_argument("base", type=Path)
+    k.add_argument("nueva", type=Path)
+    k.add_argument("--tolerancia", type=float, default=0.15)
+    k.add_argument("--piso-ms", type=float, default=2.0)
+    k.set_defaults(fn=_cmd_comparar)
+
+    args = p.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
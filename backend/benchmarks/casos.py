@@ -0,0 +1,177 @@
+"""
+Casos de benchmark: cada uno prepara su contexto una vez (ids, datos de entrada) y devuelve la función
+que se mide. Los casos que mutan (cascada) trabajan dentro de un SAVEPOINT que se revierte en cada vuelta.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.cuota import Cuota
+from app.models.pago import Pago
+from app.models.prestamo import Prestamo
+
+
+@dataclass(frozen=True)
+class Caso:
+    nombre: str
+    preparar: Callable[[Session, date], Callable[[], Any]]
+    descripcion: str = ""
+
+
+_USUARIO_BENCH = SimpleNamespace(id=0, email="bench@bench.invalid", rol="administrador")
+
+
+def _prestamo_con_cuotas_impagas(db: Session) -> int:
+    pid = db.execute(
+        select(func.min(Prestamo.id))
+        .join(Cuota, Cuota.prestamo_id == Prestamo.id)
+        .where(Prestamo.estado == "APROBADO", Cuota.fecha_pago.is_(None))
+    ).scalar()
+    if pid is None:
+        raise LookupError("No hay préstamos APROBADO con cuotas impagas (genere la cartera primero)")
+    return int(pid)
+
+
+def _aplicar_pago_a_cuotas(db: Session, hoy: date) -> Callable[[], Any]:
+    from app.services.pagos_cascada_aplicacion import _aplicar_pago_a_cuotas_interno
+
+    prestamo = db.get(Prestamo, _prestamo_con_cuotas_impagas(db))
+    monto = Decimal(prestamo.cuota_periodo) * Decimal("2.5")
+    vuelta = {"n": 0}
+
+    def _correr():
+        vuelta["n"] += 1
+        sp = db.begin_nested()
+        try:
+            pago = Pago(
+                cedula_cliente=prestamo.cedula,
+                prestamo_id=prestamo.id,
+                fecha_pago=datetime.combine(hoy, datetime.min.time()),
+                monto_pagado=monto,
+                numero_documento=f"BENCH-CASCADA-{vuelta['n']}",
+                estado="PAGADO",
+                conciliado=True,
+                verificado_concordancia="SI",
+                referencia_pago=f"BENCH-CASCADA-{vuelta['n']}",
+            )
+            db.add(pago)
+            db.flush()
+            return _aplicar_pago_a_cuotas_interno(pago, db)
+        finally:
+            sp.rollback()
+
+    return _correr
+
+
+def _comparar_lote(db: Session, _hoy: date) -> Callable[[], Any]:
+    from app.models.conciliacion_banco_ocr import ConciliacionBancoOcrLote
+    from app.services.conciliacion_bancos_service import BANCOS_CATEGORIAS, comparar_lote
+
+    lote_id = db.execute(select(func.max(ConciliacionBancoOcrLote.id))).scalar()
+    if lote_id is None:
+        raise LookupError("No hay lote de conciliación (genere la cartera primero)")
+    return lambda: comparar_lote(db, int(lote_id), bancos_filtro=list(BANCOS_CATEGORIAS))
+
+
+def _dashboard(nombre_modulo: str, nombre_fn: str, *args, **kwargs) -> Callable[[Session, date], Callable[[], Any]]:
+    def _preparar(db: Session, _hoy: date) -> Callable[[], Any]:
+        import importlib
+
+        fn = getattr(importlib.import_module(nombre_modulo), nombre_fn)
+        return lambda: fn(db, *args, **kwargs)
+
+    return _preparar
+
+
+def _retraso_uno_y_diez(db: Session, hoy: date) -> Callable[[], Any]:
+    from app.services.notificaciones_listados_motor import build_items_retraso_uno_y_diez_dias
+
+    return lambda: build_items_retraso_uno_y_diez_dias(db, hoy)
+
+
+def _listar_prestamos(db: Session, _hoy: date) -> Callable[[], Any]:
+    from app.api.v1.endpoints.prestamos.routes import listar_prestamos
+
+    return lambda: listar_prestamos(page=1, per_page=100, estado="APROBADO", current_user=_USUARIO_BENCH, db=db)
+
+
+def _estado_cuenta_datos(db: Session, _hoy: date) -> Callable[[], Any]:
+    from app.services.estado_cuenta_cache import estado_cuenta_cache_reset
+    from app.services.estado_cuenta_datos import obtener_datos_estado_cuenta_prestamo
+
+    pid = _prestamo_con_cuotas_impagas(db)
+
+    def _correr():
+        estado_cuenta_cache_reset()
+        return obtener_datos_estado_cuenta_prestamo(db, pid)
+
+    return _correr
+
+
+def _generar_pdf_estado_cuenta(db: Session, _hoy: date) -> Callable[[], Any]:
+    from app.services.estado_cuenta_datos import obtener_datos_estado_cuenta_prestamo
+    from app.services.estado_cuenta_pdf import generar_pdf_estado_cuenta
+
+    datos = obtener_datos_estado_cuenta_prestamo(db, _prestamo_con_cuotas_impagas(db))
+    return lambda: generar_pdf_estado_cuenta(
+        cedula=datos.get("cedula_display") or "",
+        nombre=datos.get("nombre") or "",
+        prestamos=datos.get("prestamos_list") or [],
+        fecha_corte=datos.get("fecha_corte") or date.today(),
+        amortizaciones_por_prestamo=datos.get("amortizaciones_por_prestamo") or [],
+        pagos_realizados=datos.get("pagos_realizados") or [],
+        recibos=[],
+    )
+
+
+def _morosidad_por_mes(db: Session, _hoy: date) -> Callable[[], Any]:
+    from app.api.v1.endpoints.reportes.reportes_morosidad import get_morosidad_por_mes
+
+    return lambda: get_morosidad_por_mes(db=db, meses=12, anos=None, meses_list=None)
+
+
+_GRAFICOS = "app.api.v1.endpoints.dashboard.graficos"
+_KPIS = "app.api.v1.endpoints.dashboard.kpis"
+_SIN_FILTROS = (None, None, None, None, None)
+
+CASOS: tuple[Caso, ...] = (
+    Caso("cascada.aplicar_pago_a_cuotas", _aplicar_pago_a_cuotas, "Pago de 2.5 cuotas sobre un préstamo con impagas"),
+    Caso("conciliacion.comparar_lote", _comparar_lote, "Lote sintético contra pagos (commit interno)"),
+    Caso("dashboard.kpis_principales", _dashboard(_KPIS, "_compute_kpis_principales", *_SIN_FILTROS)),
+    Caso("dashboard.kpis_dashboard_flat", _dashboard(_KPIS, "_compute_kpis_dashboard_flat", *_SIN_FILTROS)),
+    Caso("dashboard.dashboard_admin", _dashboard(_KPIS, "_compute_dashboard_admin", None, None)),
+    Caso("dashboard.morosidad_por_dia", _dashboard(_GRAFICOS, "_compute_morosidad_por_dia", None, None, 30)),
+    Caso("dashboard.financiamiento_por_rangos", _dashboard(_GRAFICOS, "_compute_financiamiento_por_rangos", *_SIN_FILTROS)),
+    Caso("dashboard.composicion_morosidad", _dashboard(_GRAFICOS, "_compute_composicion_morosidad", *_SIN_FILTROS)),
+    Caso("dashboard.morosidad_por_analista", _dashboard(_GRAFICOS, "_compute_morosidad_por_analista", *_SIN_FILTROS)),
+    Caso("dashboard.prestamos_por_concesionario", _dashboard(_GRAFICOS, "_compute_prestamos_por_concesionario", *_SIN_FILTROS)),
+    Caso("dashboard.prestamos_por_modelo", _dashboard(_GRAFICOS, "_compute_prestamos_por_modelo", *_SIN_FILTROS)),
+    Caso(
+        "dashboard.tendencia_programado_cobrado_diario",
+        _dashboard(_GRAFICOS, "_compute_tendencia_programado_cobrado_diario", dias_atras=30),
+    ),
+    Caso("notificaciones.retraso_uno_y_diez_dias", _retraso_uno_y_diez),
+    Caso(
+        "cobranzas.analizar_universo",
+        _dashboard("app.services.cobranzas.universo_analisis_service", "analizar_universo"),
+        "Buckets, serie 30 días y lecturas de lunes (commit interno)",
+    ),
+    Caso(
+        "auditoria.documentos_similares_liquidados",
+        _dashboard(
+            "app.services.auditoria_liquidados_docs_similares", "documentos_similares_liquidados", min_ratio=0.7
+        ),
+        "Pares de numero_documento por préstamo LIQUIDADO (almacén por firma, commit interno)",
+    ),
+    Caso("prestamos.listar_prestamos", _listar_prestamos, "Página de 100 APROBADO"),
+    Caso("estado_cuenta.datos_prestamo", _estado_cuenta_datos, "Armado sin cache"),
+    Caso("estado_cuenta.generar_pdf", _generar_pdf_estado_cuenta),
+    Caso("reportes.morosidad_por_mes", _morosidad_por_mes, "12 cortes"),
+)
@@ -0,0 +1,325 @@
+"""
+Generador determinista de cartera sintética: clientes, préstamos, cuotas, pagos (+ cuota_pagos),
+pagos_reportados y un lote de conciliación bancaria con movimientos.
+
+Todo sale de `random.Random(semilla)` y de `hoy`; ids explícitos para que dos corridas con los mismos
+parámetros produzcan exactamente las mismas filas (y los mismos casos de benchmark).
+"""
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import CompileError
+
+from app.models.cliente import Cliente
+from app.models.conciliacion_banco_ocr import ConciliacionBancoOcrBanco, ConciliacionBancoOcrLote
+from app.models.cuota import Cuota
+from app.models.cuota_pago import CuotaPago
+from app.models.pago import Pago
+from app.models.pago_reportado import PagoReportado
+from app.models.prestamo import Prestamo
+
+LOTE_INSERT = 5000
+
+ANALISTAS = tuple(f"Analista {i:02d}" for i in range(1, 13))
+CONCESIONARIOS = tuple(f"Concesionario {i:02d}" for i in range(1, 21))
+MODELOS = tuple(f"Modelo {i:02d}" for i in range(1, 16))
+BANCOS = ("Mercantil", "BNC", "Banesco", "Venezuela", "Provincial")
+
+# Perfil de comportamiento por préstamo: (peso, fracción de cuotas vencidas que quedan impagas).
+PERFILES = (
+    (0.62, 0.0),  # al día
+    (0.18, 0.15),  # atraso leve
+    (0.12, 0.45),  # moroso
+    (0.08, 1.0),  # no paga desde la primera
+)
+
+# Tablas que llena el generador, en orden de dependencias.
+MODELOS_GENERADOS = (
+    Cliente,
+    Prestamo,
+    Cuota,
+    Pago,
+    CuotaPago,
+    PagoReportado,
+    ConciliacionBancoOcrLote,
+    ConciliacionBancoOcrBanco,
+)
+
+
+@dataclass
+class EscalaCartera:
+    prestamos: int = 10_000
+    semilla: int = 7
+    hoy: date = date(2026, 1, 15)
+    prestamos_por_cliente: float = 1.3
+    fraccion_reportados: float = 0.05
+    movimientos_banco: int = 2_000
+
+    @property
+    def clientes(self) -> int:
+        return max(1, math.ceil(self.prestamos / self.prestamos_por_cliente))
+
+
+def preparar_esquema(engine: Engine) -> dict[str, str]:
+    """
+    PostgreSQL: solo verifica que las tablas generadas existan (esquema migrado).
+    Otros motores: crea todas las tablas del modelo que compilan (las auxiliares que leen los casos,
+    p. ej. prestamo_saldos o revision_manual_prestamos, quedan vacías); las de tipos solo-PG se omiten.
+    Retorna {tabla: "ok" | "creada" | motivo} para las tablas que llena el generador.
+    """
+    import app.models  # noqa: F401  (registra todos los modelos en Base.metadata)
+    from app.core.database import Base
+
+    existentes = set(inspect(engine).get_table_names())
+    estado: dict[str, str] = {}
+    if engine.dialect.name == "postgresql":
+        for model in MODELOS_GENERADOS:
+            nombre = model.__tablename__
+            estado[nombre] = "ok" if nombre in existentes else "falta (ejecute alembic upgrade head)"
+        return estado
+
+    for tabla in Base.metadata.sorted_tables:
+        if tabla.name in existentes:
+            estado[tabla.name] = "ok"
+            continue
+        try:
+            tabla.create(engine)
+            estado[tabla.name] = "creada"
+        except CompileError as e:
+            estado[tabla.name] = f"no soportada en {engine.dialect.name}: {str(e)[:120]}"
+    generadas = {m.__tablename__ for m in MODELOS_GENERADOS}
+    return {k: v for k, v in estado.items() if k in generadas}
+
+
+def _cuota_estado(pagada: bool, fv: date, hoy: date) -> str:
+    if pagada:
+        return "PAGADO"
+    dias = (hoy - fv).days
+    if dias <= 0:
+        return "PENDIENTE"
+    if dias <= 120:
+        return "VENCIDO"
+    return "MORA"
+
+
+def _filas_cartera(escala: EscalaCartera) -> dict[str, list[dict[str, Any]]]:
+    rnd = random.Random(escala.semilla)
+    hoy = escala.hoy
+    out: dict[str, list[dict[str, Any]]] = {m.__tablename__: [] for m in MODELOS_GENERADOS}
+
+    for i in range(1, escala.clientes + 1):
+        out["clientes"].append(
+            {
+                "id": i,
+                "cedula": f"V{10_000_000 + i}",
+                "nombres": f"Cliente Sintetico {i}",
+                "telefono": f"+58414{rnd.randint(1_000_000, 9_999_999)}",
+                "email": f"cliente{i}@bench.invalid",
+                "direccion": "Caracas",
+                "fecha_nacimiento": date(1960, 1, 1) + timedelta(days=rnd.randint(0, 14_000)),
+                "ocupacion": "Bench",
+                "estado": "ACTIVO" if rnd.random() < 0.95 else "INACTIVO",
+                "usuario_registro": "bench",
+                "notas": "",
+            }
+        )
+
+    pesos = [p[0] for p in PERFILES]
+    cuota_id = pago_id = cuota_pago_id = 0
+    for pid in range(1, escala.prestamos + 1):
+        cliente_id = rnd.randint(1, escala.clientes)
+        modalidad = "MENSUAL" if rnd.random() < 0.8 else "QUINCENAL"
+        paso = 30 if modalidad == "MENSUAL" else 15
+        n_cuotas = rnd.choice((6, 9, 12, 12, 18, 24))
+        monto_cuota = Decimal(rnd.randint(40, 400))
+        total = monto_cuota * n_cuotas
+        inicio = hoy - timedelta(days=rnd.randint(0, 720))
+        impago = PERFILES[rnd.choices(range(len(PERFILES)), weights=pesos)[0]][1]
+        vencidas = sum(1 for k in range(1, n_cuotas + 1) if inicio + timedelta(days=paso * k) <= hoy)
+        n_pagadas = vencidas - math.ceil(vencidas * impago)
+        estado = "LIQUIDADO" if n_pagadas >= n_cuotas else ("APROBADO" if rnd.random() < 0.97 else "DRAFT")
+        cedula = f"V{10_000_000 + cliente_id}"
+        out["prestamos"].append(
+            {
+                "id": pid,
+                "cliente_id": cliente_id,
+                "cedula": cedula,
+                "nombres": f"Cliente Sintetico {cliente_id}",
+                "total_financiamiento": total,
+                "fecha_requerimiento": inicio - timedelta(days=7),
+                "modalidad_pago": modalidad,
+                "numero_cuotas": n_cuotas,
+                "cuota_periodo": monto_cuota,
+                "fecha_base_calculo": inicio,
+                "producto": "Moto",
+                "estado": estado,
+                "fecha_aprobacion": datetime.combine(inicio, datetime.min.time()),
+                "concesionario": rnd.choice(CONCESIONARIOS),
+                "analista": rnd.choice(ANALISTAS),
+                "modelo_vehiculo": rnd.choice(MODELOS),
+            }
+        )
+        saldo = total
+        for k in range(1, n_cuotas + 1):
+            cuota_id += 1
+            fv = inicio + timedelta(days=paso * k)
+            pagada = k <= n_pagadas
+            fp = min(hoy, fv + timedelta(days=rnd.randint(-5, 10))) if pagada else None
+            out["cuotas"].append(
+                {
+                    "id": cuota_id,
+                    "prestamo_id": pid,
+                    "numero_cuota": k,
+                    "fecha_vencimiento": fv,
+                    "fecha_pago": fp,
+                    "monto_cuota": monto_cuota,
+                    "saldo_capital_inicial": saldo,
+                    "saldo_capital_final": saldo - monto_cuota,
+                    "monto_capital": monto_cuota,
+                    "monto_interes": Decimal("0"),
+                    "total_pagado": monto_cuota if pagada else Decimal("0"),
+                    "dias_mora": 0 if pagada else max(0, (hoy - fv).days),
+                    "estado": _cuota_estado(pagada, fv, hoy),
+                }
+            )
+            saldo -= monto_cuota
+            if not pagada:
+                continue
+            pago_id += 1
+            cuota_pago_id += 1
+            fecha_pago = datetime.combine(fp, datetime.min.time()) + timedelta(hours=rnd.randint(8, 18))
+            out["pagos"].append(
+                {
+                    "id": pago_id,
+                    "prestamo_id": pid,
+                    "cedula": cedula,
+                    "fecha_pago": fecha_pago,
+                    "monto_pagado": monto_cuota,
+                    "numero_documento": f"BENCH{escala.semilla:03d}{pago_id:09d}",
+                    "institucion_bancaria": rnd.choice(BANCOS),
+                    "estado": "PAGADO",
+                    "conciliado": True,
+                    "fecha_conciliacion": fecha_pago,
+                    "verificado_concordancia": "SI",
+                    "referencia_pago": f"REF{pago_id:09d}",
+                }
+            )
+            out["cuota_pagos"].append(
+                {
+                    "id": cuota_pago_id,
+                    "cuota_id": cuota_id,
+                    "pago_id": pago_id,
+                    "monto_aplicado": monto_cuota,
+                    "fecha_aplicacion": fecha_pago,
+                    "orden_aplicacion": 0,
+                    "es_pago_completo": True,
+                }
+            )
+
+    n_reportados = int(escala.prestamos * escala.fraccion_reportados)
+    for i in range(1, n_reportados + 1):
+        cliente_id = rnd.randint(1, escala.clientes)
+        out["pagos_reportados"].append(
+            {
+                "id": i,
+                "referencia_interna": f"RPC-BENCH-{i:08d}",
+                "nombres": f"Cliente Sintetico {cliente_id}",
+                "apellidos": "",
+                "tipo_cedula": "V",
+                "numero_cedula": str(10_000_000 + cliente_id),
+                "fecha_pago": hoy - timedelta(days=rnd.randint(0, 90)),
+                "institucion_financiera": rnd.choice(BANCOS),
+                "numero_operacion": f"OP{escala.semilla:03d}{i:09d}",
+                "monto": Decimal(rnd.randint(40, 400)),
+                "moneda": "USD",
+                "estado": rnd.choices(("pendiente", "en_revision", "aprobado", "rechazado"), (4, 2, 3, 1))[0],
+            }
+        )
+
+    desde = hoy - timedelta(days=60)
+    out["conciliacion_banco_ocr_lote"].append(
+        {"id": 1, "archivo_nombre": "bench.xlsx", "fecha_desde": desde, "fecha_hasta": hoy, "estado": "CARGADO"}
+    )
+    pagos_ventana = [p for p in out["pagos"] if p["fecha_pago"].date() >= desde]
+    for i in range(1, escala.movimientos_banco + 1):
+        if pagos_ventana and rnd.random() < 0.85:
+            p = rnd.choice(pagos_ventana)
+            ref, fecha, monto = p["referencia_pago"], p["fecha_pago"].date(), p["monto_pagado"]
+        else:
+            ref, fecha, monto = f"SUELTO{i:08d}", desde + timedelta(days=rnd.randint(0, 60)), Decimal(rnd.randint(5, 500))
+        out["conciliacion_banco_ocr_banco"].append(
+            {
+                "id": i,
+                "lote_id": 1,
+                "fila_excel": i + 1,
+                "fecha_banco": fecha,
+                "referencia_banco": ref,
+                "ref_banco_norm": ref.upper(),
+                "monto_banco": monto,
+                "monto_banco_original": monto,
+                "moneda_fila": "USD",
+            }
+        )
+    return out
+
+
+def _en_lotes(filas: list[dict[str, Any]], n: int) -> Iterable[list[dict[str, Any]]]:
+    for i in range(0, len(filas), n):
+        yield filas[i : i + n]
+
+
+def _alinear_secuencias(conn, tablas: Iterable[str]) -> None:
+    """Tras insertar ids explícitos en PostgreSQL, las secuencias deben continuar desde max(id)."""
+    if conn.dialect.name != "postgresql":
+        return
+    from sqlalchemy import text
+
+    for t in tablas:
+        conn.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence(:t, 'id'), COALESCE((SELECT MAX(id) FROM "
+                + t
+                + "), 1))"
+            ),
+            {"t": t},
+        )
+
+
+def generar_cartera(
+    engine: Engine,
+    escala: EscalaCartera,
+    *,
+    progreso: Optional[Callable[[str, int], None]] = None,
+) -> dict[str, Any]:
+    """
+    Inserta la cartera sintética. Exige tablas vacías (no mezcla con datos reales ni con otra corrida).
+    Retorna {"escala": ..., "filas": {tabla: n}, "esquema": {...}}.
+    """
+    esquema = preparar_esquema(engine)
+    tablas = [m.__table__ for m in MODELOS_GENERADOS if esquema.get(m.__tablename__) in ("ok", "creada")]
+    with engine.connect() as conn:
+        ocupadas = [t.name for t in tablas if conn.execute(select(func.count()).select_from(t)).scalar()]
+    if ocupadas:
+        raise RuntimeError(f"La BD de benchmark ya tiene filas en: {', '.join(ocupadas)}")
+
+    filas = _filas_cartera(escala)
+    conteo: dict[str, int] = {}
+    with engine.begin() as conn:
+        for t in tablas:
+            for lote in _en_lotes(filas[t.name], LOTE_INSERT):
+                conn.execute(t.insert(), lote)
+            conteo[t.name] = len(filas[t.name])
+            if progreso:
+                progreso(t.name, conteo[t.name])
+        _alinear_secuencias(conn, [t.name for t in tablas])
+    escala_dict = asdict(escala)
+    escala_dict["hoy"] = escala.hoy.isoformat()
+    return {"escala": escala_dict, "filas": conteo, "esquema": esquema}
@@ -0,0 +1,157 @@
+"""
+Medición de casos y comparación de corridas (JSON de línea base).
+
+Formato de corrida:
+  {"meta": {...}, "casos": {nombre: {"estado": "ok", "n": 5, "min_ms": .., "mediana_ms": .., "p95_ms": ..,
+                                    "max_ms": ..} | {"estado": "error", "error": "..."}}}
+"""
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.casos import CASOS, Caso
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    orden = sorted(valores)
+    k = min(len(orden) - 1, max(0, round(p * (len(orden) - 1))))
+    return orden[k]
+
+
+def _commit_git() -> Optional[str]:
+    try:
+        return (
+            subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+            ).stdout.strip()
+            or None
+        )
+    except Exception:
+        return None
+
+
+def medir_caso(engine: Engine, caso: Caso, hoy: date, *, repeticiones: int, calentamiento: int) -> dict[str, Any]:
+    Session = sessionmaker(bind=engine, autoflush=True, expire_on_commit=False)
+    db = Session()
+    try:
+        fn = caso.preparar(db, hoy)
+        for _ in range(calentamiento):
+            fn()
+        tiempos: list[float] = []
+        for _ in range(repeticiones):
+            t0 = time.perf_counter()
+            fn()
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        return {
+            "estado": "ok",
+            "n": len(tiempos),
+            "min_ms": round(min(tiempos), 3),
+            "mediana_ms": round(statistics.median(tiempos), 3),
+            "p95_ms": round(_percentil(tiempos, 0.95), 3),
+            "max_ms": round(max(tiempos), 3),
+        }
+    except Exception as e:
+        return {"estado": "error", "error": f"{type(e).__name__}: {str(e).splitlines()[0][:300] if str(e) else ''}"}
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _escala_actual(engine: Engine) -> dict[str, int]:
+    from benchmarks.generador import MODELOS_GENERADOS
+
+    out: dict[str, int] = {}
+    with engine.connect() as conn:
+        for m in MODELOS_GENERADOS:
+            try:
+                out[m.__tablename__] = int(conn.execute(select(func.count()).select_from(m.__table__)).scalar() or 0)
+            except Exception:
+                conn.rollback()
+    return out
+
+
+def medir_casos(
+    engine: Engine,
+    hoy: date,
+    *,
+    nombres: Optional[Iterable[str]] = None,
+    repeticiones: int = 5,
+    calentamiento: int = 1,
+    progreso=None,
+) -> dict[str, Any]:
+    filtro = set(nombres or ())
+    casos = [c for c in CASOS if not filtro or c.nombre in filtro or c.nombre.split(".")[0] in filtro]
+    resultado: dict[str, Any] = {
+        "meta": {
+            "fecha": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": _commit_git(),
+            "python": platform.python_version(),
+            "motor": engine.dialect.name,
+            "hoy": hoy.isoformat(),
+            "repeticiones": repeticiones,
+            "calentamiento": calentamiento,
+            "escala": _escala_actual(engine),
+        },
+        "casos": {},
+    }
+    for caso in casos:
+        r = medir_caso(engine, caso, hoy, repeticiones=repeticiones, calentamiento=calentamiento)
+        resultado["casos"][caso.nombre] = r
+        if progreso:
+            progreso(caso.nombre, r)
+    return resultado
+
+
+def comparar_corridas(
+    base: dict[str, Any],
+    nueva: dict[str, Any],
+    *,
+    tolerancia: float = 0.15,
+    piso_ms: float = 2.0,
+) -> list[dict[str, Any]]:
+    """
+    Fila por caso presente en ambas corridas. `regresion` = la mediana nueva supera a la base en más de
+    `tolerancia` (fracción) y en más de `piso_ms` absolutos (ruido en casos de pocos ms).
+    """
+    filas: list[dict[str, Any]] = []
+    casos_base = base.get("casos") or {}
+    for nombre, r_nueva in (nueva.get("casos") or {}).items():
+        r_base = casos_base.get(nombre)
+        if r_base is None:
+            continue
+        fila: dict[str, Any] = {"caso": nombre, "base_ms": r_base.get("mediana_ms"), "nueva_ms": r_nueva.get("mediana_ms")}
+        if r_base.get("estado") != "ok" or r_nueva.get("estado") != "ok":
+            fila.update(ratio=None, regresion=r_base.get("estado") == "ok", estado=r_nueva.get("estado"))
+            filas.append(fila)
+            continue
+        b, n = float(r_base["mediana_ms"]), float(r_nueva["mediana_ms"])
+        ratio = n / b if b > 0 else None
+        fila.update(
+            ratio=round(ratio, 3) if ratio is not None else None,
+            regresion=bool(ratio is not None and ratio > 1 + tolerancia and n - b > piso_ms),
+            estado="ok",
+        )
+        filas.append(fila)
+    return filas
+
+
+def guardar(resultado: dict[str, Any], ruta: str | Path) -> Path:
+    p = Path(ruta)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(resultado, indent=2, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    return p
+
+
+def cargar(ruta: str | Path) -> dict[str, Any]:
+    return json.loads(Path(ruta).read_text(encoding="utf-8"))
@@ -0,0 +1,139 @@
+"""Motor de amortización por lote: paridad con el cálculo fila a fila y reconciliación de la tabla francesa."""
+import calendar
+import os
+import random
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.services.prestamos.amortizacion_lote import (
+    PlanCuotas,
+    fechas_vencimiento_cuotas,
+    filas_cuotas_plan_lote,
+    tabla_francesa_lote,
+)
+
+
+def _fecha_base_mas_meses(fecha_base, meses):
+    if meses <= 0:
+        return fecha_base
+    year = fecha_base.year + (fecha_base.month + meses - 1) // 12
+    month = (fecha_base.month + meses - 1) % 12 + 1
+    return date(year, month, min(fecha_base.day, calendar.monthrange(year, month)[1]))
+
+
+def _filas_referencia(plan):
+    """Copia del bucle historico de `_generar_cuotas_amortizacion` (una cuota a la vez)."""
+    modalidad = (plan.modalidad_pago or "MENSUAL").upper()
+    delta_dias = 15 if modalidad == "QUINCENAL" else (7 if modalidad == "SEMANAL" else None)
+    monto_cuota = plan.monto_cuota
+    total = monto_cuota * plan.numero_cuotas
+    monto_cuota_dec = Decimal(str(round(monto_cuota, 2)))
+    out = []
+    for n in range(1, plan.numero_cuotas + 1):
+        if modalidad == "MENSUAL":
+            next_date = _fecha_base_mas_meses(plan.fecha_base, n)
+        else:
+            next_date = plan.fecha_base + timedelta(days=delta_dias * n - 1)
+        saldo_inicial = Decimal(str(round(total - (n - 1) * monto_cuota, 2)))
+        saldo_final = Decimal(str(round(total - n * monto_cuota, 2)))
+        if saldo_final < 0:
+            saldo_final = Decimal("0")
+        out.append(
+            (
+                n,
+                next_date,
+                monto_cuota_dec,
+                saldo_inicial,
+                saldo_final,
+                saldo_inicial - saldo_final,
+                monto_cuota_dec - (saldo_inicial - saldo_final),
+            )
+        )
+    return out
+
+
+def test_filas_lote_identicas_al_calculo_por_cuota():
+    rnd = random.Random(20261019)
+    planes = []
+    for pid in range(1, 301):
+        n = rnd.choice([1, 6, 12, 18, 24, 36, 52])
+        total = round(rnd.uniform(150, 25000), 2)
+        planes.append(
+            PlanCuotas(
+                prestamo_id=pid,
+                cliente_id=pid * 10,
+                fecha_base=date(2025, 1, 1) + timedelta(days=rnd.randint(0, 700)),
+                modalidad_pago=rnd.choice(["MENSUAL", "QUINCENAL", "SEMANAL", None, "mensual"]),
+                numero_cuotas=n,
+                monto_cuota=total / n,
+            )
+        )
+    filas = filas_cuotas_plan_lote(planes)
+    assert len(filas) == sum(p.numero_cuotas for p in planes)
+
+    pos = 0
+    for plan in planes:
+        for ref in _filas_referencia(plan):
+            f = filas[pos]
+            pos += 1
+            assert f["prestamo_id"] == plan.prestamo_id
+            assert f["cliente_id"] == plan.cliente_id
+            got = (
+                f["numero_cuota"],
+                f["fecha_vencimiento"],
+                f["monto"],
+                f["saldo_capital_inicial"],
+                f["saldo_capital_final"],
+                f["monto_capital"],
+                f["monto_interes"],
+            )
+            assert got == ref
+            assert f["estado"] == "PENDIENTE"
+
+
+def test_fechas_vencimiento_fin_de_mes_y_quincenal():
+    assert fechas_vencimiento_cuotas(date(2025, 1, 31), "MENSUAL", [1, 2, 13]) == [
+        date(2025, 2, 28),
+        date(2025, 3, 31),
+        date(2026, 2, 28),
+    ]
+    assert fechas_vencimiento_cuotas(date(2025, 1, 1), "QUINCENAL", [1, 2, 3]) == [
+        date(2025, 1, 15),
+        date(2025, 1, 30),
+        date(2025, 2, 14),
+    ]
+    assert fechas_vencimiento_cuotas(date(2025, 1, 1), "SEMANAL", [1]) == [date(2025, 1, 7)]
+    with pytest.raises(ValueError):
+        fechas_vencimiento_cuotas(date(2025, 1, 1), "DIARIA", [1])
+
+
+def test_tabla_francesa_reconcilia_principal_en_ultima_cuota():
+    principales = [1000.0, 12345.67, 500.0, 999.99]
+    tasas = [0.01, 24 / 100 * 15 / 365, 0.0, 0.035]
+    cuotas = [12, 24, 7, 1]
+    tablas = tabla_francesa_lote(principales, tasas, cuotas)
+    assert [len(t) for t in tablas] == cuotas
+    for principal, tabla in zip(principales, tablas):
+        assert sum(p["capital"] for p in tabla) == Decimal(str(principal)).quantize(Decimal("0.01"))
+        assert tabla[-1]["saldo_final"] == Decimal("0.00")
+        for p in tabla:
+            assert p["cuota"] == p["capital"] + p["interes"]
+            assert p["saldo_inicial"] - p["capital"] == p["saldo_final"]
+        # Cuota constante salvo la última (ajuste de redondeo).
+        assert len({p["cuota"] for p in tabla[:-1]}) <= 1
+        assert abs(tabla[-1]["cuota"] - tabla[0]["cuota"]) <= Decimal("0.005") * len(tabla) + Decimal("0.01")
+
+
+def test_tabla_francesa_cuota_fija_formula():
+    (tabla,) = tabla_francesa_lote([1000.0], [0.01], [12])
+    # C = P * i(1+i)^n / ((1+i)^n - 1) = 88.85 (1% por periodo, 12 cuotas)
+    assert tabla[0]["cuota"] == Decimal("88.85")
+    assert tabla[0]["interes"] == Decimal("10.00")
@@ -0,0 +1,186 @@
+"""Documentos similares en liquidados: detector con poda exacta vs todos los pares y almacén incremental por firma."""
+import os
+import random
+import sys
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.models.auditoria_docs_similares import AuditoriaDocsSimilaresEstado, AuditoriaDocsSimilaresPar
+from app.models.pago import Pago
+from app.models.prestamo import Prestamo
+from app.services import auditoria_liquidados_docs_similares as svc
+from app.services.documentos_similitud import pares_similares, ratio_documentos
+
+
+def _todos_los_pares(docs, umbral):
+    return [
+        (i, j, ratio_documentos(docs[i], docs[j]))
+        for i in range(len(docs))
+        for j in range(i + 1, len(docs))
+        if ratio_documentos(docs[i], docs[j]) >= umbral
+    ]
+
+
+def _docs_aleatorios(rnd, n):
+    docs = []
+    for _ in range(n):
+        d = "".join(rnd.choice("0123456789") for _ in range(rnd.randint(1, 14)))
+        if rnd.random() < 0.2:
+            d = rnd.choice(["BNC", "merc", " REF-", "ref "]) + d
+        docs.append(d)
+    # Variantes con un carácter cambiado, repetidas y en minúsculas/espacios.
+    for d in list(docs[: n // 3]):
+        if d.strip():
+            k = rnd.randrange(len(d))
+            docs.append(d[:k] + rnd.choice("0123456789X") + d[k + 1 :])
+    docs += [docs[0].lower() + "  ", "", "   "] if docs else []
+    rnd.shuffle(docs)
+    return docs
+
+
+@pytest.mark.parametrize("semilla", [1, 2, 3, 4, 5])
+@pytest.mark.parametrize("umbral", [0.0, 0.5, 0.63, 0.7, 0.85, 1.0])
+def test_detector_igual_a_comparar_todos_los_pares(semilla, umbral):
+    rnd = random.Random(semilla)
+    for _ in range(20):
+        docs = _docs_aleatorios(rnd, rnd.randint(0, 45))
+        assert pares_similares(docs, umbral) == _todos_los_pares(docs, umbral)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for m in (Prestamo, Pago, AuditoriaDocsSimilaresPar, AuditoriaDocsSimilaresEstado):
+        m.__table__.create(engine)
+    monkeypatch.setattr(settings, "AUDITORIA_DOCS_SIMILARES_UMBRAL_BASE", 0.6, raising=False)
+    with engine.begin() as conn:
+        for pid, estado in ((1, "LIQUIDADO"), (2, "LIQUIDADO"), (3, "APROBADO")):
+            conn.execute(
+                insert(Prestamo.__table__).values(
+                    id=pid, cliente_id=pid, cedula=f"V{pid}", nombres="X", total_financiamiento=1000,
+                    fecha_requerimiento=date(2026, 1, 1), modalidad_pago="MENSUAL", numero_cuotas=10,
+                    cuota_periodo=100, producto="P", analista="A", estado=estado,
+                )
+            )
+        docs = {
+            1: ["00123456", "00123457", "98765", "0012345", "ZZ"],
+            2: ["ABC-1001", "abc-1010 ", "77"],
+            3: ["555111", "555112"],
+        }
+        pago_id = 0
+        for pid, lista in docs.items():
+            for d in lista:
+                pago_id += 1
+                conn.execute(
+                    insert(Pago.__table__).values(
+                        id=pago_id, prestamo_id=pid, fecha_pago=date(2026, 2, 1), monto_pagado=10,
+                        numero_documento=d, estado="PAGADO",
+                    )
+                )
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(svc, "SessionLocal", factory)
+    with factory() as s:
+        yield s
+
+
+def _referencia(db, umbral):
+    """Pares esperados comparando todos los pagos de cada préstamo LIQUIDADO."""
+    filas = db.execute(
+        select(Pago.prestamo_id, Pago.id, Pago.numero_documento)
+        .join(Prestamo, Prestamo.id == Pago.prestamo_id)
+        .where(Prestamo.estado == "LIQUIDADO")
+        .order_by(Pago.prestamo_id, Pago.id)
+    ).all()
+    por_pid = {}
+    for pid, pago, doc in filas:
+        por_pid.setdefault(pid, []).append((pago, doc.strip()))
+    out = {}
+    for pid, lista in por_pid.items():
+        pares = sorted(
+            (
+                (-round(ratio_documentos(a[1], b[1]), 4), a[0], b[0])
+                for k, a in enumerate(lista)
+                for b in lista[k + 1 :]
+                if ratio_documentos(a[1], b[1]) >= umbral
+            )
+        )
+        if pares:
+            out[pid] = [(p[1], p[2], -p[0]) for p in pares]
+    return out
+
+
+def _como_dict(tarjetas):
+    return {t["prestamo_id"]: [(p["pago_id_a"], p["pago_id_b"], p["similitud"]) for p in t["pares"]] for t in tarjetas}
+
+
+def test_almacen_recalcula_solo_prestamos_con_documentos_cambiados(db, monkeypatch):
+    calculados = []
+    original = svc._pares_prestamo
+
+    def _contar(filas, umbral):
+        calculados.append(filas[0]["pago_id"])
+        return original(filas, umbral)
+
+    monkeypatch.setattr(svc, "_pares_prestamo", _contar)
+
+    tarjetas, resumen = svc.documentos_similares_liquidados(db, min_ratio=0.7)
+    assert _como_dict(tarjetas) == _referencia(db, 0.7)
+    assert resumen["total_pares_listados"] == sum(len(v) for v in _referencia(db, 0.7).values())
+    assert sorted(calculados) == [1, 6]  # primer pago de cada préstamo LIQUIDADO
+    assert db.execute(select(AuditoriaDocsSimilaresEstado.prestamo_id)).scalars().all() == [1, 2]
+
+    # Umbral mayor que el base: filtra lo guardado sin recalcular.
+    calculados.clear()
+    tarjetas, _ = svc.documentos_similares_liquidados(db, min_ratio=0.9)
+    assert _como_dict(tarjetas) == _referencia(db, 0.9)
+    assert calculados == []
+
+    # Cambia un documento del préstamo 2: solo ese préstamo se recalcula.
+    db.execute(update(Pago).where(Pago.id == 8).values(numero_documento="ABC-1002"))
+    db.commit()
+    tarjetas, _ = svc.documentos_similares_liquidados(db, min_ratio=0.7)
+    assert calculados == [6]
+    assert _como_dict(tarjetas) == _referencia(db, 0.7)
+
+    # Umbral menor que el base: cálculo en vivo, el almacén no cambia.
+    calculados.clear()
+    tarjetas, _ = svc.documentos_similares_liquidados(db, min_ratio=0.5)
+    assert _como_dict(tarjetas) == _referencia(db, 0.5)
+    assert sorted(calculados) == [1, 6]
+    assert {e.umbral_base for e in db.execute(select(AuditoriaDocsSimilaresEstado)).scalars()} == {0.6}
+
+
+def test_consulta_completa_purga_prestamos_que_dejan_de_ser_liquidados(db):
+    svc.documentos_similares_liquidados(db, min_ratio=0.7)
+    db.execute(update(Prestamo).where(Prestamo.id == 1).values(estado="APROBADO"))
+    db.commit()
+
+    # Filtrada por préstamo: no purga el resto.
+    svc.documentos_similares_liquidados(db, min_ratio=0.7, prestamo_id=2)
+    assert db.execute(select(AuditoriaDocsSimilaresEstado.prestamo_id)).scalars().all() == [1, 2]
+
+    tarjetas, _ = svc.documentos_similares_liquidados(db, min_ratio=0.7)
+    assert [t["prestamo_id"] for t in tarjetas] == [2]
+    assert db.execute(select(AuditoriaDocsSimilaresEstado.prestamo_id)).scalars().all() == [2]
+    assert set(db.execute(select(AuditoriaDocsSimilaresPar.prestamo_id)).scalars()) == {2}
+
+
+def test_almacen_no_confirma_ni_revierte_la_sesion_del_request(db, monkeypatch):
+    def _prohibido():
+        raise AssertionError("la sesión del GET no debe confirmar ni revertir")
+
+    monkeypatch.setattr(db, "commit", _prohibido)
+    monkeypatch.setattr(db, "rollback", _prohibido)
+    tarjetas, _ = svc.documentos_similares_liquidados(db, min_ratio=0.7)
+    assert _como_dict(tarjetas) == _referencia(db, 0.7)
+    assert db.execute(select(AuditoriaDocsSimilaresEstado.prestamo_id)).scalars().all() == [1, 2]
@@ -0,0 +1,223 @@
+"""Snapshot de hallazgos de cierre liquidados: filtro/página/resumen en SQL iguales al cálculo en memoria."""
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.models.auditoria_liquidados_hallazgo import AuditoriaLiquidadosHallazgo
+from app.models.configuracion import Configuracion
+from app.models.prestamo_version import PrestamoVersion
+from app.services import auditoria_liquidados_cierre_snapshot as snap
+from app.services.auditoria_liquidados_intensiva import (
+    filtrar_filas_cierre,
+    paginar_filas,
+    resumen_cierre_desde_filas,
+)
+
+_CODIGOS = (
+    "liquidado_sin_fecha_liquidado",
+    "elegible_finiquito_sin_caso_materializado",
+    "doc_operativo_duplicado_mismo_prestamo",
+)
+
+
+def _fila(pid, codigos, cedula=None):
+    return {
+        "prestamo_id": pid,
+        "cliente_id": pid * 10,
+        "cedula": cedula or f"V-{pid:04d} 1",
+        "nombres": f"Cliente {pid}",
+        "estado_prestamo": "LIQUIDADO",
+        "cliente_email": f"c{pid}@x.test",
+        "tiene_alerta": True,
+        "controles": [
+            {"codigo": c, "titulo": c.upper(), "alerta": "SI", "detalle": f"detalle {pid}"} for c in codigos
+        ],
+    }
+
+
+@pytest.fixture
+def entorno(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for m in (AuditoriaLiquidadosHallazgo, Configuracion, PrestamoVersion):
+        m.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE prestamos (id INTEGER PRIMARY KEY, estado VARCHAR(50))"))
+        for pid in range(1, 41):
+            conn.execute(
+                text("INSERT INTO prestamos (id, estado) VALUES (:i, :e)"),
+                {"i": pid, "e": "LIQUIDADO" if pid <= 30 else "APROBADO"},
+            )
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(snap, "SessionLocal", factory)
+    monkeypatch.setattr(settings, "AUDITORIA_LIQUIDADOS_CIERRE_SNAPSHOT", True, raising=False)
+
+    motor = {pid: _fila(pid, _CODIGOS[: 1 + pid % 3]) for pid in range(1, 31)}
+    motor[7] = _fila(7, _CODIGOS[1:], cedula="e_12%5")
+    llamadas = []
+
+    def _hallazgos(db, *, prestamo_ids=None):
+        llamadas.append(None if prestamo_ids is None else sorted(prestamo_ids))
+        filas = [motor[p] for p in sorted(motor) if prestamo_ids is None or p in prestamo_ids]
+        return filas, resumen_cierre_desde_filas(filas)
+
+    monkeypatch.setattr(snap, "hallazgos_cierre_prestamos_liquidados", _hallazgos)
+    return factory, motor, llamadas
+
+
+@pytest.mark.parametrize(
+    "filtro",
+    [
+        {},
+        {"skip": 5, "limit": 7},
+        {"skip": 28, "limit": 50},
+        {"prestamo_id": 12},
+        {"cedula_contiene": "v-001"},
+        {"cedula_contiene": "0 2 1"},
+        {"cedula_contiene": "E_12%", "limit": 3},
+    ],
+)
+def test_pagina_y_resumen_iguales_al_calculo_en_memoria(entorno, filtro):
+    factory, motor, llamadas = entorno
+    skip, limit = filtro.get("skip", 0), filtro.get("limit", 50)
+    with factory() as db:
+        page, resumen = snap.listar_hallazgos_cierre(
+            db,
+            prestamo_id=filtro.get("prestamo_id"),
+            cedula_contiene=filtro.get("cedula_contiene"),
+            skip=skip,
+            limit=limit,
+        )
+    ref = filtrar_filas_cierre(
+        [motor[p] for p in sorted(motor)],
+        prestamo_id=filtro.get("prestamo_id"),
+        cedula_contiene=filtro.get("cedula_contiene"),
+    )
+    assert page == paginar_filas(ref, skip=skip, limit=limit)
+    esperado = resumen_cierre_desde_filas(ref)
+    assert {k: resumen[k] for k in esperado} == esperado
+    assert resumen["fuente"] == "snapshot" and resumen["snapshot_calculado_en"]
+    assert llamadas == [None]  # primera lectura sin snapshot: un refresco completo
+
+
+def test_lectura_refresca_solo_prestamos_con_version_nueva(entorno):
+    factory, motor, llamadas = entorno
+    with factory() as db:
+        snap.listar_hallazgos_cierre(db, limit=50)
+        snap.listar_hallazgos_cierre(db, limit=50)
+    assert llamadas == [None]
+
+    # Un pago al préstamo 4 le quita el hallazgo; el 35 (aprobado, sin filas) también sube de versión.
+    del motor[4]
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=4, version=2, actualizado_en=datetime.utcnow()))
+        # La marca avanza a la mayor versión leída (no al reloj del refresco).
+        db.add(PrestamoVersion(prestamo_id=35, version=2, actualizado_en=datetime.utcnow() + timedelta(seconds=1)))
+        db.commit()
+        page, resumen = snap.listar_hallazgos_cierre(db, limit=50)
+        hasta = db.execute(text("SELECT MAX(actualizado_en) FROM prestamo_versiones")).scalar()
+        assert snap.leer_meta_snapshot(db)["calculado_desde"] == datetime.fromisoformat(str(hasta)).isoformat()
+    assert llamadas == [None, [4]]
+    assert 4 not in [r["prestamo_id"] for r in page]
+    assert resumen["prestamos_con_hallazgo_cierre"] == 29 and resumen["snapshot_desactualizado"] is False
+
+    with factory() as db:
+        snap.listar_hallazgos_cierre(db, limit=50)
+    assert llamadas == [None, [4]]
+
+    # Solo cambian préstamos que no pueden tener hallazgos: se mueve la marca sin recalcular.
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=36, version=1, actualizado_en=datetime.utcnow() + timedelta(seconds=2)))
+        db.commit()
+        snap.listar_hallazgos_cierre(db, limit=50)
+        snap.listar_hallazgos_cierre(db, limit=50)
+    assert llamadas == [None, [4]]
+
+    # Refresco puntual manual: no avanza la marca de versiones.
+    motor[5] = _fila(5, _CODIGOS)
+    with factory() as db:
+        desde = snap.leer_meta_snapshot(db)["calculado_desde"]
+        res = snap.refrescar_hallazgos_cierre(db, prestamo_ids=[5])
+        page, _ = snap.listar_hallazgos_cierre(db, prestamo_id=5)
+        assert snap.leer_meta_snapshot(db)["calculado_desde"] == desde
+    assert res["hallazgos_totales"] == 3
+    assert [c["codigo"] for c in page[0]["controles"]] == list(_CODIGOS)
+
+
+def test_transaccion_que_confirma_tarde_bajo_la_marca_se_relee(entorno):
+    factory, motor, llamadas = entorno
+    ahora = datetime.utcnow()
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=2, version=1, actualizado_en=ahora))
+        db.commit()
+        snap.listar_hallazgos_cierre(db, limit=50)
+
+    # Una transacción corta (préstamo 3) confirma y la marca avanza a su flush.
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=3, version=1, actualizado_en=ahora + timedelta(seconds=20)))
+        db.commit()
+        snap.listar_hallazgos_cierre(db, limit=50)
+    assert llamadas == [None, [3]]
+
+    # Una transacción larga que hizo flush antes (t=10) confirma después: queda bajo la marca.
+    del motor[6]
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=6, version=1, actualizado_en=ahora + timedelta(seconds=10)))
+        db.commit()
+        page, resumen = snap.listar_hallazgos_cierre(db, limit=50)
+    assert llamadas == [None, [3], [2, 3, 6]]
+    assert 6 not in [r["prestamo_id"] for r in page] and resumen["snapshot_desactualizado"] is False
+
+    with factory() as db:
+        snap.listar_hallazgos_cierre(db, limit=50)
+    assert len(llamadas) == 3
+
+
+def test_demasiados_candidatos_sirve_el_snapshot_desactualizado(entorno, monkeypatch):
+    factory, motor, llamadas = entorno
+    with factory() as db:
+        snap.listar_hallazgos_cierre(db, limit=50)
+    monkeypatch.setattr(snap, "_MAX_PRESTAMOS_REFRESCO_PUNTUAL", 2)
+    del motor[1]
+    with factory() as db:
+        for pid in (1, 2, 3):
+            db.add(PrestamoVersion(prestamo_id=pid, version=2, actualizado_en=datetime.utcnow() + timedelta(seconds=1)))
+        db.commit()
+        page, resumen = snap.listar_hallazgos_cierre(db, limit=50)
+    # Sin escaneo completo en la lectura: queda para el job nocturno o el POST.
+    assert llamadas == [None]
+    assert resumen["snapshot_desactualizado"] is True and 1 in [r["prestamo_id"] for r in page]
+
+    with factory() as db:
+        snap.refrescar_hallazgos_cierre(db)
+        page, resumen = snap.listar_hallazgos_cierre(db, limit=50)
+    assert llamadas == [None, None]
+    assert resumen["snapshot_desactualizado"] is False and 1 not in [r["prestamo_id"] for r in page]
+
+
+def test_apagado_o_fallo_del_refresco_inicial_usan_calculo_en_vivo(entorno, monkeypatch):
+    factory, _, llamadas = entorno
+    monkeypatch.setattr(settings, "AUDITORIA_LIQUIDADOS_CIERRE_SNAPSHOT", False, raising=False)
+    with factory() as db:
+        assert snap.listar_hallazgos_cierre(db) is None
+    assert llamadas == []
+
+    monkeypatch.setattr(settings, "AUDITORIA_LIQUIDADOS_CIERRE_SNAPSHOT", True, raising=False)
+
+    def _falla(db, *, prestamo_ids=None):
+        raise RuntimeError("consulta cancelada")
+
+    monkeypatch.setattr(snap, "hallazgos_cierre_prestamos_liquidados", _falla)
+    with factory() as db:
+        assert snap.listar_hallazgos_cierre(db) is None
+        assert snap.leer_meta_snapshot(db) == {}
@@ -0,0 +1,73 @@
+"""Banco de benchmarks: cartera sintética determinista y comparación de corridas contra línea base."""
+import os
+import sys
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from benchmarks.generador import EscalaCartera, _filas_cartera, generar_cartera
+from benchmarks.medicion import comparar_corridas
+
+
+def _escala(**kw) -> EscalaCartera:
+    base = dict(prestamos=60, semilla=11, hoy=date(2026, 3, 1), movimientos_banco=40)
+    base.update(kw)
+    return EscalaCartera(**base)
+
+
+def test_filas_deterministas_por_semilla():
+    a = _filas_cartera(_escala())
+    b = _filas_cartera(_escala())
+    c = _filas_cartera(_escala(semilla=12))
+    assert a == b
+    assert a != c
+    assert len(a["prestamos"]) == 60
+    assert {r["prestamo_id"] for r in a["cuotas"]} == set(range(1, 61))
+    # Cada pago generado queda aplicado completo a una sola cuota pagada.
+    cuotas_pagadas = {r["id"] for r in a["cuotas"] if r["fecha_pago"] is not None}
+    assert {r["cuota_id"] for r in a["cuota_pagos"]} == cuotas_pagadas
+    assert len(a["pagos"]) == len(a["cuota_pagos"])
+
+
+def test_generar_cartera_sqlite_y_rechaza_bd_con_filas(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+    res = generar_cartera(engine, _escala())
+    assert res["filas"]["prestamos"] == 60
+    assert res["esquema"]["prestamos"] == "creada"
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM cuotas")).scalar() == res["filas"]["cuotas"]
+        assert conn.execute(text("SELECT COUNT(*) FROM conciliacion_banco_ocr_banco")).scalar() == 40
+    with pytest.raises(RuntimeError, match="ya tiene filas"):
+        generar_cartera(engine, _escala())
+
+
+def test_comparar_corridas_tolerancia_piso_y_errores():
+    base = {
+        "casos": {
+            "lento": {"estado": "ok", "mediana_ms": 100.0},
+            "rapido": {"estado": "ok", "mediana_ms": 1.0},
+            "roto": {"estado": "ok", "mediana_ms": 10.0},
+            "estable": {"estado": "ok", "mediana_ms": 50.0},
+        }
+    }
+    nueva = {
+        "casos": {
+            "lento": {"estado": "ok", "mediana_ms": 130.0},
+            "rapido": {"estado": "ok", "mediana_ms": 2.5},
+            "roto": {"estado": "error", "error": "x"},
+            "estable": {"estado": "ok", "mediana_ms": 55.0},
+            "nuevo": {"estado": "ok", "mediana_ms": 1.0},
+        }
+    }
+    filas = {f["caso"]: f for f in comparar_corridas(base, nueva, tolerancia=0.15, piso_ms=2.0)}
+    assert set(filas) == {"lento", "rapido", "roto", "estable"}
+    assert filas["lento"]["regresion"] is True
+    assert filas["rapido"]["regresion"] is False  # 2.5x pero bajo el piso absoluto
+    assert filas["roto"]["regresion"] is True
+    assert filas["estable"]["regresion"] is False
@@ -0,0 +1,142 @@
+"""Bulkhead por clase de tráfico: clasificación de rutas, 503 por cola/espera y engine BD según la clase."""
+import os
+import sys
+import threading
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anyio
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core import database
+from app.core.config import settings
+from app.middleware import bulkhead
+
+
+@pytest.fixture(autouse=True)
+def _limpio(monkeypatch):
+    monkeypatch.setattr(settings, "BULKHEAD_ENABLED", True, raising=False)
+    bulkhead.reiniciar_bulkhead()
+    yield
+    bulkhead.reiniciar_bulkhead()
+
+
+@pytest.mark.parametrize(
+    "path,clase",
+    [
+        ("/api/v1/cobros/public/validar-cedula", "publico"),
+        ("/api/v1/estado-cuenta/public/solicitar-estado-cuenta", "publico"),
+        ("/api/v1/finiquito/public/verificar-codigo", "publico"),
+        ("/api/v1/whatsapp/webhook", "publico"),
+        ("/api/v1/reportes/exportar/morosidad", "pesado"),
+        ("/api/v1/reportes/cartera/excel", "pesado"),
+        ("/api/v1/pagos/export/excel/pagos-sin-aplicar-cuotas", "pesado"),
+        ("/api/v1/prestamos/reaplicar-cascada-aplicacion-masiva", "pesado"),
+        ("/api/v1/conciliacion-bancos/lotes/12/comparar", "pesado"),
+        ("/api/v1/finiquito/admin/casos", "interactivo"),
+        ("/api/v1/whatsapp/conversaciones", "interactivo"),
+        ("/api/v1/reportes/morosidad", "interactivo"),
+        ("/api/v1/conciliacion-bancos/lotes/12", "interactivo"),
+        ("/health", None),
+        ("/api/v1/health/db", None),
+    ],
+)
+def test_clasificar_ruta(path, clase):
+    assert bulkhead.clasificar_ruta(path) == clase
+
+
+def _app(puerta: anyio.Event):
+    async def lento(request):
+        await puerta.wait()
+        return JSONResponse({"ok": True})
+
+    def clase(request):
+        # Endpoint síncrono: corre en el threadpool y debe ver la clase del request.
+        return JSONResponse({"clase": database.clase_trafico_actual()})
+
+    rutas = [
+        Route("/api/v1/reportes/exportar/morosidad", lento),
+        Route("/api/v1/cobros/public/info", clase),
+        Route("/api/v1/dashboard/resumen", clase),
+    ]
+    return bulkhead.BulkheadMiddleware(Starlette(routes=rutas))
+
+
+def test_cola_llena_y_espera_vencida_responden_503_sin_afectar_otras_clases(monkeypatch):
+    monkeypatch.setattr(settings, "BULKHEAD_PESADO_CONCURRENCIA", 1, raising=False)
+    monkeypatch.setattr(settings, "BULKHEAD_PESADO_COLA", 1, raising=False)
+    monkeypatch.setattr(settings, "BULKHEAD_PESADO_ESPERA_SEG", 0.2, raising=False)
+
+    async def _correr():
+        puerta = anyio.Event()
+        transport = httpx.ASGITransport(app=_app(puerta))
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            respuestas = {}
+
+            async def _get(nombre, url):
+                respuestas[nombre] = await client.get(url)
+
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(_get, "export_1", "/api/v1/reportes/exportar/morosidad")
+                await anyio.sleep(0.02)
+                tg.start_soon(_get, "export_2", "/api/v1/reportes/exportar/morosidad")
+                await anyio.sleep(0.02)
+                # Cola (1) ocupada por export_2: rechazo inmediato.
+                r3 = await client.get("/api/v1/reportes/exportar/morosidad")
+                assert r3.status_code == 503
+                assert r3.headers["Retry-After"] == "1"
+                assert r3.json()["clase"] == "pesado"
+                # Con exports saturados, público e interactivo responden.
+                assert (await client.get("/api/v1/cobros/public/info")).json() == {"clase": "publico"}
+                assert (await client.get("/api/v1/dashboard/resumen")).json() == {"clase": "interactivo"}
+                await anyio.sleep(0.3)
+                puerta.set()
+            return respuestas
+
+    respuestas = anyio.run(_correr)
+    assert respuestas["export_1"].status_code == 200
+    assert respuestas["export_2"].status_code == 503  # esperó más de 0.2 s
+    pesado = bulkhead.bulkhead_snapshot()["clases"]["pesado"]
+    assert (pesado["admitidos"], pesado["rechazados_cola"], pesado["rechazados_espera"]) == (1, 1, 1)
+    assert pesado["activos"] == 0 and pesado["esperando"] == 0
+
+
+def test_sesion_usa_el_engine_de_la_clase(monkeypatch):
+    creados = {}
+
+    def _crear(**kw):
+        creados[kw["application_name"]] = kw
+        return create_engine("sqlite://")
+
+    monkeypatch.setattr(database, "_is_postgres", True)
+    monkeypatch.setattr(database, "_crear_engine", _crear)
+    monkeypatch.setattr(database, "_motores_clase", {})
+    monkeypatch.setattr(settings, "BULKHEAD_PUBLICO_STATEMENT_TIMEOUT_MS", 20_000, raising=False)
+
+    with database.usar_clase_trafico("publico"):
+        with database.SessionLocal() as s:
+            assert s.get_bind() is database.motor_para_clase("publico")
+    with database.usar_clase_trafico("interactivo"):
+        with database.SessionLocal() as s:
+            assert s.get_bind() is database.engine
+
+    # Hilo sin clase (como un job del scheduler): engine de fondo.
+    binds = []
+    hilo = threading.Thread(target=lambda: binds.append(database.SessionLocal().get_bind()))
+    hilo.start()
+    hilo.join()
+    assert binds == [database.motor_para_clase("fondo")]
+    assert binds[0] is not database.engine
+    assert creados["rapicredit_backend_publico"]["statement_timeout_ms"] == 20_000
+    assert set(creados) == {"rapicredit_backend_publico", "rapicredit_backend_fondo"}
+
+    monkeypatch.setattr(settings, "BULKHEAD_ENABLED", False, raising=False)
+    assert database.motor_para_clase("publico") is database.engine
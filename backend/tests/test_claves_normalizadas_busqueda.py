@@ -0,0 +1,61 @@
+"""Expresiones de búsqueda por cédula/correo: paridad con los índices de la migración 090 y semántica en SQLite."""
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import column, create_engine, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.utils import cedula_almacenamiento as ca
+from app.utils.cliente_emails import expr_email_normalizado_para_comparar, texto_email_comparable_bd
+
+_MIG = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "090_claves_normalizadas_cedula_email.py"
+
+
+def _migracion():
+    spec = importlib.util.spec_from_file_location("mig_090", _MIG)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _pg(expr) -> str:
+    return str(expr.compile(dialect=postgresql.dialect()))
+
+
+def test_expresiones_coinciden_con_indices_postgresql(monkeypatch):
+    monkeypatch.setattr(ca, "_database_url_es_postgresql", lambda: True)
+    indices = {nombre: expr for _t, nombre, expr in _migracion().INDICES}
+    assert _pg(ca.expr_cedula_normalizada_para_comparar(column("cedula"))) == indices["ix_clientes_cedula_norm"]
+    assert (
+        _pg(ca.expr_cedula_normalizada_para_comparar(column("cedula_cliente")))
+        == indices["ix_pagos_cedula_cliente_norm"]
+    )
+    concat = ca.expr_cedula_documento_concatenada(column("tipo_cedula"), column("numero_cedula"))
+    assert _pg(ca.expr_cedula_normalizada_para_comparar(concat)) == indices["ix_pagos_reportados_cedula_norm"]
+    assert _pg(expr_email_normalizado_para_comparar(column("email"))) == indices["ix_clientes_email_norm"]
+
+
+def test_comparaciones_en_sqlite():
+    eng = create_engine("sqlite://")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE t (tipo TEXT, num TEXT, email TEXT)"))
+        conn.execute(
+            text("INSERT INTO t VALUES ('v-', '12.345 678', '  Ana@Mail.COM '), (NULL, 'E999', NULL)")
+        )
+        t_tipo, t_num, t_email = column("tipo"), column("num"), column("email")
+        ced = ca.expr_cedula_normalizada_para_comparar(ca.expr_cedula_documento_concatenada(t_tipo, t_num))
+        assert conn.execute(
+            select(t_num).select_from(text("t")).where(ced == ca.texto_cedula_comparable_bd("V12345678"))
+        ).scalar_one() == "12.345 678"
+        assert conn.execute(select(t_num).select_from(text("t")).where(ced == "E999")).scalar_one() == "E999"
+        em = expr_email_normalizado_para_comparar(t_email)
+        assert conn.execute(
+            select(t_num).select_from(text("t")).where(em == texto_email_comparable_bd(" ana@mail.com"))
+        ).scalar_one() == "12.345 678"
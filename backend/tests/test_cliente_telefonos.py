@@ -0,0 +1,122 @@
+"""Identidad por teléfono: clave canónica, sincronía en escrituras ORM y resolución indexada vs recorrido completo."""
+import os
+import random
+import sys
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.cliente import Cliente
+from app.utils.cliente_telefonos import (
+    clave_telefono,
+    cliente_id_por_telefono,
+    clientes_por_telefonos,
+    digitos_telefono,
+    telefono_exacto_registrado,
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Cliente.__table__.create(engine)
+    with sessionmaker(bind=engine)() as s:
+        yield s
+
+
+def _cliente(n, telefono):
+    return Cliente(
+        cedula=f"V{10000000 + n}",
+        nombres=f"Cliente {n}",
+        telefono=telefono,
+        email=f"c{n}@x.test",
+        direccion="-",
+        fecha_nacimiento=date(2000, 1, 1),
+        ocupacion="-",
+        estado="ACTIVO",
+        usuario_registro="test",
+        notas="-",
+    )
+
+
+def _resolver_recorriendo(clientes, telefono):
+    """Referencia: recorrer todos los clientes con la regla de coincidencia exacta o por últimos 10 dígitos."""
+    d = digitos_telefono(telefono)
+    if len(d) < 8:
+        return None
+    exactos = [c.id for c in clientes if digitos_telefono(c.telefono) == d]
+    if exactos:
+        return min(exactos)
+    if len(d) < 10:
+        return None
+    sufijo = [c.id for c in clientes if len(digitos_telefono(c.telefono)) >= 10 and digitos_telefono(c.telefono)[-10:] == d[-10:]]
+    return min(sufijo) if sufijo else None
+
+
+@pytest.mark.parametrize(
+    "raw,clave",
+    [
+        ("+58 412-123.45.67", "4121234567"),
+        ("04121234567", "4121234567"),
+        ("584121234567", "4121234567"),
+        ("12345678", "12345678"),
+        ("123-4567", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_clave_telefono(raw, clave):
+    assert clave_telefono(raw) == clave
+
+
+def test_clave_se_mantiene_en_alta_y_edicion(db):
+    c = _cliente(1, "+58 (412) 555-0001")
+    db.add(c)
+    db.commit()
+    assert db.execute(select(Cliente.telefono_clave)).scalar() == "4125550001"
+
+    c.telefono = "0414 777 0002"
+    db.commit()
+    assert db.execute(select(Cliente.telefono_clave)).scalar() == "4147770002"
+    assert cliente_id_por_telefono(db, "584147770002") == c.id
+    assert cliente_id_por_telefono(db, "584125550001") is None
+
+
+def test_resolucion_indexada_igual_a_recorrer_clientes(db):
+    rnd = random.Random(11)
+    nacionales = [f"4{rnd.randint(100000000, 999999999)}" for _ in range(40)]
+    formatos = [
+        lambda n: f"+58{n}",
+        lambda n: f"0{n}",
+        lambda n: f"+58 {n[:3]}-{n[3:]}",
+        lambda n: n,
+        lambda n: f"+593{n}",
+        lambda n: n[-8:],
+    ]
+    clientes = [_cliente(k, rnd.choice(formatos)(rnd.choice(nacionales))) for k in range(120)]
+    db.add_all(clientes)
+    db.commit()
+
+    consultas = [rnd.choice(formatos)(rnd.choice(nacionales)) for _ in range(200)] + ["", "1234", "99999999999"]
+    resueltos = clientes_por_telefonos(db, consultas)
+    for t in consultas:
+        esperado = _resolver_recorriendo(clientes, t)
+        assert resueltos.get(digitos_telefono(t)) == esperado, t
+
+
+def test_duplicado_exacto_excluye_al_propio_cliente(db):
+    a, b = _cliente(1, "+584121112233"), _cliente(2, "04121112233")
+    db.add_all([a, b])
+    db.commit()
+    # Misma clave pero dígitos distintos: no es el mismo número registrado.
+    assert telefono_exacto_registrado(db, "584121112233") == a.id
+    assert telefono_exacto_registrado(db, "4121112233") is None
+    assert telefono_exacto_registrado(db, "584121112233", excluir_cliente_id=a.id) is None
+    assert telefono_exacto_registrado(db, "04121112233", excluir_cliente_id=a.id) == b.id
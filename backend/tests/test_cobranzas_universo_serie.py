@@ -0,0 +1,141 @@
+"""Cobranzas universo: serie diaria por barrido de intervalos vs cálculo día a día (paridad)."""
+import os
+import random
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.services.cobranzas import universo_analisis_service as svc
+
+HOY = date(2026, 10, 19)
+
+
+def _cuota(fv, pago=None, monto="100.00", pagado="0"):
+    return SimpleNamespace(
+        fecha_vencimiento=fv,
+        fecha_pago=pago,
+        monto=Decimal(monto),
+        total_pagado=Decimal(pagado),
+    )
+
+
+def _cartera_aleatoria(semilla: int, n_prestamos: int = 80):
+    rnd = random.Random(semilla)
+    by_pid = {}
+    for pid in range(1, n_prestamos + 1):
+        cuotas = []
+        inicio = HOY - timedelta(days=rnd.randint(0, 200))
+        for k in range(rnd.randint(0, 10)):
+            fv = inicio + timedelta(days=15 * k)
+            pago = None
+            if rnd.random() < 0.6:
+                pago = fv + timedelta(days=rnd.randint(-5, 40))
+            monto = f"{rnd.randint(1, 40000) / 100:.2f}"
+            pagado = monto if pago is not None and pago <= HOY else "0"
+            cuotas.append(_cuota(fv, pago, monto, pagado))
+        by_pid[pid] = cuotas
+    return list(by_pid), by_pid
+
+
+@pytest.mark.parametrize("semilla", [1, 7, 42])
+def test_barrido_igual_a_calculo_por_dia(semilla):
+    pids, by_pid = _cartera_aleatoria(semilla)
+    desde, hasta = HOY - timedelta(days=40), HOY - timedelta(days=1)
+    barrido = svc._metricas_historicas_por_dia(pids, by_pid, desde, hasta)
+    assert sorted(barrido) == [desde + timedelta(days=k) for k in range(40)]
+    for dia, (montos, cants) in barrido.items():
+        assert (montos, cants) == svc._buckets_metricas_en_fecha(pids, by_pid, dia, HOY), dia
+
+
+def test_bordes_vencimiento_pago_y_buckets():
+    d = HOY - timedelta(days=10)
+    by_pid = {
+        # Vence d: cuenta desde d+1; pagada d+3 deja de contar ese mismo día.
+        1: [_cuota(d, d + timedelta(days=3))],
+        # Pagada el mismo día del vencimiento o antes: nunca cuenta.
+        2: [_cuota(d, d), _cuota(d, d - timedelta(days=2))],
+        # Cuatro vencidas impagas desde d+1 -> 4plus; la quinta vence después.
+        3: [_cuota(d - timedelta(days=k), monto="10.10") for k in range(4)] + [_cuota(HOY)],
+    }
+    res = svc._metricas_historicas_por_dia([1, 2, 3], by_pid, d, HOY - timedelta(days=1))
+    assert res[d][1] == {"1": 0, "2": 0, "3": 1, "4plus": 0}
+    assert res[d + timedelta(days=1)][1]["1"] == 1
+    assert res[d + timedelta(days=2)][1]["1"] == 1
+    assert res[d + timedelta(days=3)][1]["1"] == 0
+    assert res[d + timedelta(days=1)][0]["4plus"] == 40.4
+    assert res[d + timedelta(days=1)][1]["4plus"] == 1
+
+
+def test_metricas_por_dia_serie_y_lecturas_usan_mismo_calculo():
+    pids, by_pid = _cartera_aleatoria(3)
+    dias = sorted(set(svc._fechas_serie_30(HOY)) | set(svc._fechas_4_lunes_mas_hoy(HOY)))
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="sqlite")))
+    metricas = svc._metricas_por_dia(db, pids, by_pid, dias, HOY)
+
+    serie = svc._serie_diaria_30_desde_universo(metricas, HOY)
+    assert [p["fecha"] for p in serie] == svc._fechas_serie_30(HOY)
+    for punto in serie:
+        montos, cants = svc._buckets_metricas_en_fecha(pids, by_pid, punto["fecha"], HOY)
+        assert punto == svc._punto_serie_desde_metricas(punto["fecha"], montos, cants)
+
+    lecturas = svc._lecturas_lunes_desempeno(metricas, HOY)
+    assert lecturas["columnas"][-1]["es_hoy"] is True
+    primer_lunes = svc._fechas_4_lunes_mas_hoy(HOY)[0]
+    montos, cants = svc._buckets_metricas_en_fecha(pids, by_pid, primer_lunes, HOY)
+    assert lecturas["buckets"]["2"]["lecturas"][0] == {
+        "fecha": primer_lunes.isoformat(),
+        "cantidad": cants["2"],
+        "monto_usd": montos["2"],
+    }
+
+
+def test_analizar_universo_carga_filtrada_coincide_con_referencia(monkeypatch):
+    from collections import defaultdict
+
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.cobranza_universo import CobranzaUniversoDesempenoDiario
+    from app.models.cuota import Cuota
+    from app.models.prestamo import Prestamo
+
+    engine = create_engine("sqlite://")
+    for m in (Prestamo, Cuota, CobranzaUniversoDesempenoDiario):
+        m.__table__.create(engine)
+    pids, by_pid = _cartera_aleatoria(5, n_prestamos=40)
+    with engine.begin() as conn:
+        for pid in pids:
+            conn.execute(
+                insert(Prestamo.__table__).values(
+                    id=pid, cliente_id=pid, cedula=f"V{pid}", nombres="X", total_financiamiento=1000,
+                    fecha_requerimiento=HOY, modalidad_pago="MENSUAL", numero_cuotas=10, cuota_periodo=100,
+                    producto="P", analista="A", estado="APROBADO" if pid % 5 else "LIQUIDADO",
+                )
+            )
+            for n, c in enumerate(by_pid[pid], start=1):
+                conn.execute(
+                    insert(Cuota.__table__).values(
+                        prestamo_id=pid, numero_cuota=n, fecha_vencimiento=c.fecha_vencimiento,
+                        fecha_pago=c.fecha_pago, monto_cuota=c.monto, total_pagado=c.total_pagado,
+                        saldo_capital_inicial=0, saldo_capital_final=0, estado="PENDIENTE",
+                    )
+                )
+    monkeypatch.setattr(svc, "hoy_negocio", lambda: HOY)
+    with sessionmaker(bind=engine)() as db:
+        res = svc.analizar_universo(db)
+        snap = {r.bucket: r.cantidad_prestamos for r in db.query(CobranzaUniversoDesempenoDiario).all()}
+
+    activos = [pid for pid in pids if pid % 5]
+    ref = defaultdict(list, {pid: by_pid[pid] for pid in activos})
+    for punto in res["serie_diaria"]:
+        montos, cants = svc._buckets_metricas_en_fecha(activos, ref, punto["fecha"], HOY)
+        assert punto == svc._punto_serie_desde_metricas(punto["fecha"], montos, cants)
+    assert snap == {b: res["buckets"][b]["cantidad"] for b in svc._BUCKET_KEYS}
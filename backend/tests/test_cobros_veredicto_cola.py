@@ -0,0 +1,167 @@
+"""Veredicto materializado de cola manual (pagos_reportados): cálculo, invalidación incremental y conteo SQL."""
+import os
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registra tablas referenciadas por FK)
+from app.api.v1.endpoints.cobros import reportados_veredicto as rv
+from app.api.v1.endpoints.cobros.reportados_listado_payload import _where_clauses_cola_reportados
+from app.models.pago import Pago
+from app.models.pago_reportado import PagoReportado
+from app.models.pago_reportado_exportado import PagoReportadoExportado
+
+T0 = datetime(2026, 5, 1, 8, 0, 0)
+
+
+def _items_falsos(db, rows, **_kw):
+    """Sustituye el armado completo de items: `gemini_comentario` hace de observación de reglas."""
+    return [
+        SimpleNamespace(
+            id=r.id,
+            estado=r.estado,
+            numero_operacion=r.numero_operacion,
+            monto=float(r.monto),
+            moneda=r.moneda,
+            duplicado_en_pagos=False,
+            observacion=r.gemini_comentario,
+            institucion_financiera=r.institucion_financiera,
+            prestamo_duplicado_es_objetivo=None,
+            gemini_coincide_exacto=r.gemini_coincide_exacto,
+            prestamo_objetivo_id=77 if r.numero_cedula == "1" else None,
+        )
+        for r in rows
+    ]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(rv, "_pago_reportado_list_items_from_rows", _items_falsos)
+    eng = create_engine("sqlite://")
+    for model in (PagoReportado, PagoReportadoExportado, Pago):
+        model.__table__.create(eng)
+    s = sessionmaker(bind=eng, autoflush=False, expire_on_commit=False)()
+    yield s
+    s.close()
+
+
+def _rep(db, id_, numero_operacion, *, estado="pendiente", obs=None, minutos=0, cedula="1"):
+    db.add(
+        PagoReportado(
+            id=id_,
+            referencia_interna=f"RPC-{id_}",
+            nombres="N",
+            apellidos="A",
+            tipo_cedula="V",
+            numero_cedula=cedula,
+            fecha_pago=date(2026, 5, 1),
+            institucion_financiera="Mercantil",
+            numero_operacion=numero_operacion,
+            monto=Decimal("100.00"),
+            moneda="USD",
+            estado=estado,
+            gemini_coincide_exacto="true",
+            gemini_comentario=obs,
+            created_at=T0 + timedelta(minutes=minutos),
+            updated_at=T0,
+        )
+    )
+
+
+def _alcance():
+    return _where_clauses_cola_reportados(None, False, select(PagoReportadoExportado.pago_reportado_id), [])
+
+
+def _poblar(db):
+    _rep(db, 1, "123456789", obs="NO CLIENTES", minutos=0)
+    _rep(db, 2, "123456789", obs="NO CLIENTES", minutos=5)  # seguidor de 1
+    _rep(db, 3, "555000111", obs=None, minutos=1)  # cumple validadores
+    _rep(db, 4, "777000222", estado="en_revision", minutos=2, cedula="2")
+    _rep(db, 5, "888000333", estado="rechazado", obs="X", minutos=3)
+    db.commit()
+
+
+def _veredicto_en(db, id_):
+    return db.execute(select(PagoReportado.veredicto_en).where(PagoReportado.id == id_)).scalar_one()
+
+
+def test_veredicto_se_calcula_en_el_commit_y_el_listado_solo_lee(db):
+    _poblar(db)
+    filas = {
+        r.id: r
+        for r in db.execute(select(PagoReportado).execution_options(populate_existing=True)).scalars()
+    }
+    assert all(f.veredicto_en is not None for f in filas.values())
+    assert filas[1].cola_manual is True and filas[1].dedup_lider_id == 1
+    assert filas[1].validadores_fallidos == "OBSERVACION" and filas[1].prestamo_objetivo_id == 77
+    assert filas[2].cola_manual is False and filas[2].dedup_lider_id == 1
+    assert filas[3].cola_manual is False and filas[3].validadores_fallidos is None
+    assert filas[4].cola_manual is True and filas[4].validadores_fallidos == "EN_REVISION"
+    assert filas[5].cola_manual is False
+    assert filas[1].updated_at == T0
+    assert rv.veredictos_al_dia(db, _alcance()) is True
+    assert rv.contar_cola_por_estado(db, _alcance()) == {"pendiente": 1, "en_revision": 1}
+
+    # Cambio por SQL directo: el listado no lo recalcula, cae al barrido clásico.
+    db.execute(update(PagoReportado).where(PagoReportado.id == 3).values(veredicto_en=None))
+    db.commit()
+    assert rv.veredictos_al_dia(db, _alcance()) is False
+    assert _veredicto_en(db, 3) is None
+
+
+def test_cambio_de_estado_del_lider_promueve_seguidor_en_la_misma_transaccion(db):
+    _poblar(db)
+    lider = db.get(PagoReportado, 1)
+    lider.estado = "rechazado"
+    db.commit()
+    assert rv.veredictos_al_dia(db, _alcance()) is True
+    assert rv.contar_cola_por_estado(db, _alcance()) == {"pendiente": 1, "en_revision": 1}
+    fila2 = db.execute(select(PagoReportado.cola_manual, PagoReportado.dedup_lider_id).where(PagoReportado.id == 2)).one()
+    assert tuple(fila2) == (True, 2)
+
+
+def test_exportar_lider_y_pago_en_conflicto_recalculan_al_commit(db, monkeypatch):
+    _poblar(db)
+    antes = _veredicto_en(db, 2)
+    # Líder exportado: su seguidor pasa a liderar la cadena.
+    db.add(PagoReportadoExportado(pago_reportado_id=1))
+    rv.invalidar_veredictos(db, [1])
+    db.commit()
+    assert _veredicto_en(db, 2) is not None and _veredicto_en(db, 2) >= antes
+    assert db.execute(select(PagoReportado.dedup_lider_id).where(PagoReportado.id == 2)).scalar_one() == 2
+    assert rv.veredictos_al_dia(db, _alcance()) is True
+
+    calculados = []
+    original = rv.calcular_veredictos
+
+    def _calcular(db_, rows, **kw):
+        calculados.extend(r.id for r in rows)
+        return original(db_, rows, **kw)
+
+    monkeypatch.setattr(rv, "calcular_veredictos", _calcular)
+    db.add(Pago(prestamo_id=None, cedula_cliente="V1", fecha_pago=T0, monto_pagado=Decimal("100"), numero_documento="555000111"))
+    db.commit()
+    assert calculados == [3]
+    assert _veredicto_en(db, 3) is not None
+
+
+def test_tope_por_transaccion_y_reconciliacion(db, monkeypatch):
+    monkeypatch.setattr(rv, "_refresco_max", lambda: 2)
+    _poblar(db)
+    assert rv.veredictos_al_dia(db, _alcance()) is False
+    res = rv.reconciliar_veredictos_pagos_reportados(db, chunk_size=2)
+    assert res["revisados"] == 4 and res["cambiados"] == 4
+    assert res["terminales_limpiados"] == 1
+    assert rv.veredictos_al_dia(db, _alcance()) is True
+    res = rv.reconciliar_veredictos_pagos_reportados(db)
+    assert res["cambiados"] == 0
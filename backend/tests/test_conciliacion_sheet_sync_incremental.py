@@ -0,0 +1,135 @@
+"""Sync CONCILIACIÓN incremental: hash por fila, upsert solo de cambios, baja lógica y change set por corrida."""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.conciliacion_sheet import ConciliacionSheetCambio, ConciliacionSheetRow, ConciliacionSheetSyncRun
+from app.models.drive import DriveRow
+from app.services import conciliacion_sheet_sync as sync
+
+_T0 = datetime(2026, 10, 1, 1, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        # JSONB y BigInteger autoincremental no existen en SQLite: DDL equivalente a mano.
+        conn.execute(
+            text(
+                "CREATE TABLE conciliacion_sheet_rows (row_index INTEGER PRIMARY KEY, cells JSON NOT NULL, "
+                "row_hash VARCHAR(64), eliminado_en DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE conciliacion_sheet_sync_run (id INTEGER PRIMARY KEY, started_at DATETIME, "
+                "finished_at DATETIME, success BOOLEAN, message TEXT, row_count INTEGER DEFAULT 0, "
+                "col_count INTEGER DEFAULT 0, duration_ms INTEGER, filas_nuevas INTEGER, "
+                "filas_modificadas INTEGER, filas_eliminadas INTEGER)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE conciliacion_sheet_cambios (id INTEGER PRIMARY KEY, run_id INTEGER NOT NULL, "
+                "sheet_row_number INTEGER NOT NULL, tipo VARCHAR(12) NOT NULL, cedula VARCHAR(40), "
+                "cedula_anterior VARCHAR(40), creado_en DATETIME NOT NULL)"
+            )
+        )
+    DriveRow.__table__.create(engine)
+    with sessionmaker(bind=engine)() as s:
+        yield s
+
+
+def _fila(n, cedula, monto):
+    row = ["L1", "", "", "", cedula, monto]
+    return n, sync._row_to_cells(["LOTE", "B", "C", "D", "CEDULA", "MONTO"], row), sync._drive_kwargs_from_row(row, 6)
+
+
+def _sync(db, filas, now):
+    run = ConciliacionSheetSyncRun(started_at=now, success=False)
+    db.add(run)
+    db.flush()
+    conteo = sync._aplicar_snapshot_incremental(db, filas, now=now, run_id=run.id)
+    run.success = True
+    run.filas_nuevas = conteo["filas_nuevas"]
+    run.filas_modificadas = conteo["filas_modificadas"]
+    run.filas_eliminadas = conteo["filas_eliminadas"]
+    db.commit()
+    return run.id, conteo
+
+
+def _cambios(db, run_id):
+    return [
+        (c.sheet_row_number, c.tipo, c.cedula, c.cedula_anterior)
+        for c in db.execute(
+            select(ConciliacionSheetCambio)
+            .where(ConciliacionSheetCambio.run_id == run_id)
+            .order_by(ConciliacionSheetCambio.sheet_row_number)
+        ).scalars()
+    ]
+
+
+def test_hash_estable_e_independiente_del_orden_de_claves():
+    assert sync._hash_contenido({"a": 1, "b": "x"}) == sync._hash_contenido({"b": "x", "a": 1})
+    assert sync._hash_contenido({"a": 1}) != sync._hash_contenido({"a": 1.5})
+    assert len(sync._hash_contenido(["V1", None])) == 64
+
+
+def test_segundo_sync_escribe_solo_cambios_y_registra_change_set(db):
+    run1, c1 = _sync(db, [_fila(2, "V100", 10), _fila(3, "V200", 20), _fila(4, "V300", 30)], _T0)
+    assert c1 == {"filas_nuevas": 3, "filas_modificadas": 0, "filas_eliminadas": 0, "filas_sin_cambio": 0}
+    assert [t for _, t, _, _ in _cambios(db, run1)] == ["alta", "alta", "alta"]
+
+    t1 = _T0 + timedelta(days=1)
+    run2, c2 = _sync(db, [_fila(2, "V100", 10), _fila(3, "V201", 20), _fila(5, "V500", 50)], t1)
+    assert c2 == {"filas_nuevas": 1, "filas_modificadas": 1, "filas_eliminadas": 1, "filas_sin_cambio": 1}
+    assert _cambios(db, run2) == [
+        (3, "cambio", "V201", "V200"),
+        (4, "baja", None, "V300"),
+        (5, "alta", "V500", None),
+    ]
+    drive = {d.sheet_row_number: d for d in db.execute(select(DriveRow)).scalars()}
+    # La fila sin cambios no se reescribe; la quitada de la hoja queda con baja lógica (no se borra).
+    assert drive[2].synced_at.replace(tzinfo=timezone.utc) == _T0
+    assert drive[3].col_e == "V201" and drive[4].eliminado_en is not None
+    hoja_4 = db.get(ConciliacionSheetRow, 4)
+    assert hoja_4.eliminado_en is not None and hoja_4.cells["CEDULA"] == "V300"
+    assert sync.cedulas_cambiadas_en_run(db, run2) == {"V200", "V201", "V300", "V500"}
+
+    # La fila dada de baja vuelve: se reactiva como alta; sin cambios reales, change set vacío.
+    run3, c3 = _sync(db, [_fila(2, "V100", 10), _fila(3, "V201", 20), _fila(4, "V300", 30), _fila(5, "V500", 50)], t1)
+    assert (c3["filas_nuevas"], c3["filas_eliminadas"]) == (1, 0)
+    assert db.get(DriveRow, 4).eliminado_en is None
+    run4, c4 = _sync(db, [_fila(2, "V100", 10), _fila(3, "V201", 20), _fila(4, "V300", 30), _fila(5, "V500", 50)], t1)
+    assert c4["filas_sin_cambio"] == 4
+    assert sync.cedulas_cambiadas_en_run(db, run4) == set()
+
+
+def test_sin_change_set_el_consumidor_hace_pasada_completa(db):
+    run = ConciliacionSheetSyncRun(started_at=_T0, success=True)
+    db.add(run)
+    db.commit()
+    assert sync.cedulas_cambiadas_en_run(db, run.id) is None
+    assert sync.cedulas_cambiadas_en_run(db, 999) is None
+
+
+def test_edicion_local_de_drive_invalida_hash_y_el_sync_la_reescribe(db):
+    _sync(db, [_fila(2, "V100", 10)], _T0)
+    fila = db.get(DriveRow, 2)
+    fila.col_f = "99"
+    fila.row_hash = None
+    db.commit()
+    run, conteo = _sync(db, [_fila(2, "V100", 10)], _T0 + timedelta(hours=1))
+    assert conteo["filas_modificadas"] == 1
+    assert db.get(DriveRow, 2).col_f == "10"
+    assert _cambios(db, run) == [(2, "cambio", "V100", "V100")]
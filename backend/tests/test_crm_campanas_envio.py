@@ -0,0 +1,195 @@
+"""Envío reanudable de campañas CRM: materialización por tramos, parada inmediata y reanudación sin reenvíos."""
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.core.email as core_email
+import app.core.email_config_holder as email_holder
+import app.services.notificaciones_exclusion_desistimiento as exclusion
+from app.models.crm_campana import CampanaCrm
+from app.models.crm_campana_destinatario import CampanaDestinatarioCrm
+from app.models.crm_campana_envio import CampanaEnvioCrm
+from app.services.crm_campanas_envio import (
+    ejecutar_envio_campana,
+    materializar_destinatarios_tramo,
+    progreso_campana,
+)
+
+
+def _factory():
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with eng.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE clientes (id INTEGER PRIMARY KEY, email VARCHAR(100), "
+                "email_secundario VARCHAR(100), nombres VARCHAR(100))"
+            )
+        )
+    for model in (CampanaCrm, CampanaDestinatarioCrm, CampanaEnvioCrm):
+        model.__table__.create(eng)
+    return sessionmaker(bind=eng, autoflush=False, expire_on_commit=False)
+
+
+def _poblar(Session, n=30, modo="todos", seleccion=()):
+    db = Session()
+    for i in range(1, n + 1):
+        # Cliente 7 repite el correo del 3 (dedupe global); 11 sin correo válido.
+        email = "c3@x.com" if i == 7 else ("invalido" if i == 11 else f"c{i}@x.com")
+        db.execute(
+            text("INSERT INTO clientes (id, email, email_secundario, nombres) VALUES (:i, :e, NULL, 'N')"),
+            {"i": i, "e": email},
+        )
+    camp = CampanaCrm(
+        id=1,
+        nombre="c",
+        asunto="a",
+        cuerpo_texto="t",
+        estado="borrador",
+        total_destinatarios=n,
+        enviados=0,
+        fallidos=0,
+        batch_size=5,
+        delay_entre_batches_seg=1,
+        destinatarios_modo=modo,
+        destinatarios_materializados=False,
+    )
+    db.add(camp)
+    db.flush()
+    for cid in seleccion:
+        db.add(CampanaDestinatarioCrm(campana_id=1, cliente_id=cid))
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def envios(monkeypatch):
+    enviados = []
+    monkeypatch.setattr(core_email, "send_email", lambda tos, *a, **k: (enviados.append(tuple(tos)) or (True, None)))
+    monkeypatch.setattr(email_holder, "get_email_activo_servicio", lambda servicio: True)
+    monkeypatch.setattr(exclusion, "cliente_bloqueado_para_notificacion", lambda db, **k: (False, ""))
+    return enviados
+
+
+def test_materializacion_por_tramos_con_cursor_y_dedupe():
+    Session = _factory()
+    _poblar(Session)
+    db = Session()
+    camp = db.get(CampanaCrm, 1)
+    procesados = []
+    while True:
+        n = materializar_destinatarios_tramo(db, camp, chunk_size=8)
+        procesados.append(n)
+        if camp.destinatarios_materializados:
+            break
+    assert procesados == [8, 8, 8, 6]
+    assert camp.destinatarios_cursor == 30
+    # 30 clientes - duplicado (7) - inválido (11)
+    assert camp.total_destinatarios == 28
+    emails = db.execute(select(CampanaDestinatarioCrm.emails)).scalars().all()
+    assert len(emails) == len(set(emails)) == 28
+
+
+def test_envio_completo_y_seleccion(envios):
+    Session = _factory()
+    _poblar(Session, n=12, modo="seleccion", seleccion=(2, 3, 7, 11))
+    res = ejecutar_envio_campana(1, session_factory=Session, sleep=lambda s: None)
+    assert res == {"estado": "completada", "enviados": 2, "fallidos": 0}
+    assert sorted(envios) == [("c2@x.com",), ("c3@x.com",)]
+    db = Session()
+    estados = dict(db.execute(select(CampanaDestinatarioCrm.cliente_id, CampanaDestinatarioCrm.estado)).all())
+    assert estados == {2: "enviado", 3: "enviado", 7: "omitido", 11: "omitido"}
+    assert db.get(CampanaCrm, 1).total_destinatarios == 2
+
+
+def test_parar_es_inmediato_y_reanudar_no_reenvia(monkeypatch, envios):
+    Session = _factory()
+    _poblar(Session, n=20)
+
+    def _enviar_y_parar(tos, *a, **k):
+        envios.append(tuple(tos))
+        if len(envios) == 7:
+            s = Session()
+            s.get(CampanaCrm, 1).estado = "cancelada"
+            s.commit()
+            s.close()
+        return True, None
+
+    monkeypatch.setattr(core_email, "send_email", _enviar_y_parar)
+    res = ejecutar_envio_campana(1, session_factory=Session, sleep=lambda s: None)
+    assert res["estado"] == "cancelada"
+    assert len(envios) == 7
+
+    db = Session()
+    prog = progreso_campana(db, 1)
+    assert prog["por_estado"]["enviado"] == 7
+    assert prog["pendientes"] == 11 and "enviando" not in prog["por_estado"]
+    db.get(CampanaCrm, 1).estado = "enviando"
+    db.commit()
+    db.close()
+
+    res = ejecutar_envio_campana(1, session_factory=Session, sleep=lambda s: None)
+    assert res["estado"] == "completada" and res["enviados"] == 11
+    assert len(envios) == len(set(envios)) == 18
+    db = Session()
+    camp = db.get(CampanaCrm, 1)
+    assert (camp.enviados, camp.fallidos) == (18, 0)
+    assert db.scalar(select(CampanaEnvioCrm.id).order_by(CampanaEnvioCrm.id.desc()).limit(1)) == 18
+
+
+def test_claim_huerfano_tras_reinicio(envios):
+    Session = _factory()
+    _poblar(Session, n=6)
+    db = Session()
+    camp = db.get(CampanaCrm, 1)
+    materializar_destinatarios_tramo(db, camp)
+    viejo = datetime.utcnow() - timedelta(hours=1)
+    # Proceso caído: cliente 1 ya se envió (hay registro), cliente 2 quedó reclamado sin enviar.
+    db.execute(text("UPDATE crm_campana_destinatario SET estado='enviando', reclamado_en=:v WHERE cliente_id IN (1, 2)"), {"v": viejo})
+    db.add(CampanaEnvioCrm(campana_id=1, cliente_id=1, email="c1@x.com", estado="enviado", fecha_envio=viejo))
+    camp.estado = "enviando"
+    camp.enviados = 1
+    db.commit()
+    db.close()
+
+    res = ejecutar_envio_campana(1, session_factory=Session, sleep=lambda s: None)
+    assert res["estado"] == "completada"
+    assert ("c1@x.com",) not in envios
+    assert sorted(envios) == [(f"c{i}@x.com",) for i in range(2, 7)]
+    assert Session().get(CampanaCrm, 1).enviados == 6
+
+
+def test_claim_huerfano_ignora_log_de_corridas_anteriores(envios):
+    Session = _factory()
+    _poblar(Session, n=4)
+    db = Session()
+    camp = db.get(CampanaCrm, 1)
+    materializar_destinatarios_tramo(db, camp)
+    inicio = datetime.utcnow() - timedelta(hours=1)
+    anterior = inicio - timedelta(days=7)
+    db.execute(
+        text("UPDATE crm_campana_destinatario SET estado='enviando', reclamado_en=:v WHERE cliente_id IN (1, 2, 3)"),
+        {"v": inicio},
+    )
+    # Corrida anterior de la campaña recurrente: 1 enviado, 2 fallido. Corrida actual: 3 ya enviado.
+    db.add(CampanaEnvioCrm(campana_id=1, cliente_id=1, email="c1@x.com", estado="enviado", fecha_envio=anterior))
+    db.add(CampanaEnvioCrm(campana_id=1, cliente_id=2, email="c2@x.com", estado="fallido", fecha_envio=anterior))
+    db.add(CampanaEnvioCrm(campana_id=1, cliente_id=3, email="c3@x.com", estado="enviado", fecha_envio=inicio))
+    camp.estado = "enviando"
+    camp.fecha_envio_inicio = inicio
+    camp.enviados = 1
+    db.commit()
+    db.close()
+
+    res = ejecutar_envio_campana(1, session_factory=Session, sleep=lambda s: None)
+    assert res["estado"] == "completada"
+    assert sorted(envios) == [("c1@x.com",), ("c2@x.com",), ("c4@x.com",)]
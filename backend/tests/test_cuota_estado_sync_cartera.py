@@ -0,0 +1,135 @@
+"""Paridad motor SQL set-based vs motor Python de sincronizar_estado_cuotas_cartera (SQLite en memoria)."""
+import os
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.cuota import Cuota
+from app.models.cuota_estado_cambio import CuotaEstadoCambio
+from app.services.cuota_estado import (
+    _ultimo_vencimiento_en_mora,
+    _es_mora_por_4_meses,
+    clasificar_estado_cuota,
+    normalizar_estado_cuota_columna_auditoria,
+    sincronizar_estado_cuotas_cartera,
+)
+
+REF = date(2026, 6, 30)
+
+
+def _session():
+    eng = create_engine("sqlite://")
+    with eng.begin() as conn:
+        # Solo id/estado de prestamos intervienen en la sincronizacion.
+        conn.execute(text("CREATE TABLE prestamos (id INTEGER PRIMARY KEY, estado VARCHAR(50) NOT NULL)"))
+    Cuota.__table__.create(eng)
+    CuotaEstadoCambio.__table__.create(eng)
+    return sessionmaker(bind=eng, autoflush=False, expire_on_commit=False)()
+
+
+def _poblar(db):
+    db.execute(
+        text("INSERT INTO prestamos (id, estado) VALUES (1, 'APROBADO'), (2, 'LIQUIDADO'), (3, 'DESISTIMIENTO')")
+    )
+    casos = [
+        # (monto, total_pagado, dias respecto a REF, estado guardado)
+        (100, 100, -10, "PAGADA"),
+        (100, 100, 5, "PAGADO"),
+        (100, Decimal("99.995"), 0, "PENDIENTE"),
+        (100, 0, 0, "PENDIENTE"),
+        (100, 30, 3, "PENDIENTE"),
+        (100, 0, -1, "PENDIENTE"),
+        (100, 20, -60, "PARCIAL"),
+        (100, 0, -200, "VENCIDO"),
+        (0, 0, -200, "PENDIENTE"),
+        (100, None, -400, "MORA"),
+    ]
+    # Bordes del umbral de mora (fin de mes: 4 meses calendario ajustados al ultimo dia valido).
+    umbral = _ultimo_vencimiento_en_mora(REF)
+    for d in (umbral - REF, umbral - REF + timedelta(days=1)):
+        casos.append((50, 0, d.days, "VENCIDO"))
+    n = 0
+    for pid in (1, 2, 3):
+        for monto, pagado, delta, estado in casos:
+            n += 1
+            db.add(
+                Cuota(
+                    id=n,
+                    prestamo_id=pid,
+                    numero_cuota=n,
+                    fecha_vencimiento=REF + timedelta(days=delta),
+                    monto=monto,
+                    saldo_capital_inicial=0,
+                    saldo_capital_final=0,
+                    total_pagado=pagado,
+                    estado=estado,
+                )
+            )
+    db.commit()
+
+
+def _estados(db):
+    return dict(db.execute(select(Cuota.id, Cuota.estado).order_by(Cuota.id)).all())
+
+
+def test_umbral_mora_equivale_a_regla_por_meses():
+    for ref in (date(2026, 6, 30), date(2026, 3, 1), date(2024, 2, 29), date(2026, 10, 31)):
+        umbral = _ultimo_vencimiento_en_mora(ref)
+        assert _es_mora_por_4_meses(umbral, ref)
+        assert not _es_mora_por_4_meses(umbral + timedelta(days=1), ref)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 20000])
+def test_paridad_motor_sql_vs_python(chunk_size):
+    db_py = _session()
+    _poblar(db_py)
+    db_sql = _session()
+    _poblar(db_sql)
+
+    res_py = sincronizar_estado_cuotas_cartera(db_py, motor="python", fecha_referencia=REF)
+    res_sql = sincronizar_estado_cuotas_cartera(
+        db_sql, motor="sql", fecha_referencia=REF, chunk_size=chunk_size
+    )
+
+    assert res_py["motor"] == "python"
+    assert res_sql["motor"] == "sql"
+    assert res_sql["cuotas_escaneadas"] == res_py["cuotas_escaneadas"]
+    assert res_sql["estados_actualizados"] == res_py["estados_actualizados"]
+    assert _estados(db_sql) == _estados(db_py)
+
+    cambios = db_sql.execute(select(CuotaEstadoCambio)).scalars().all()
+    assert len(cambios) == res_sql["estados_actualizados"]
+    assert {c.corrida_id for c in cambios} == {res_sql["corrida_id"]}
+    assert all(c.prestamo_id in (1, 2) for c in cambios)
+
+
+def test_motor_sql_coincide_con_clasificar_estado_cuota():
+    db = _session()
+    _poblar(db)
+    sincronizar_estado_cuotas_cartera(db, motor="sql", fecha_referencia=REF)
+    for c in db.execute(select(Cuota).where(Cuota.prestamo_id.in_((1, 2)))).scalars():
+        db.refresh(c)
+        esperado = clasificar_estado_cuota(
+            float(c.total_pagado or 0), float(c.monto or 0), c.fecha_vencimiento, REF
+        )
+        assert normalizar_estado_cuota_columna_auditoria(c.estado) == esperado
+    # Segunda corrida: nada que cambiar.
+    res = sincronizar_estado_cuotas_cartera(db, motor="sql", fecha_referencia=REF)
+    assert res["estados_actualizados"] == 0
+
+
+def test_motor_auto_sqlite_usa_python():
+    db = _session()
+    _poblar(db)
+    res = sincronizar_estado_cuotas_cartera(db, fecha_referencia=REF)
+    assert res["motor"] == "python"
+    assert res["corrida_id"] is None
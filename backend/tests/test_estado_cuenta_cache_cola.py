@@ -0,0 +1,186 @@
+"""Estado de cuenta sin efectos: versión por préstamo, cache y cola de sincronización de pagos (SQLite en memoria)."""
+import os
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, select, text, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.cuota import Cuota
+from app.models.pago import Pago
+from app.models.prestamo_version import (
+    PrestamoSyncPendiente,
+    PrestamoVersion,
+    encolar_sync_prestamos,
+)
+from app.services import estado_cuenta_cache as ec_cache
+from app.services import estado_cuenta_datos as ecd
+from app.services import prestamos_sync_cola as cola
+
+
+@pytest.fixture
+def db():
+    eng = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE prestamos (id INTEGER PRIMARY KEY, cliente_id INTEGER, estado VARCHAR(50))"))
+        conn.execute(text("INSERT INTO prestamos (id, cliente_id, estado) VALUES (1, 1, 'APROBADO'), (2, 1, 'APROBADO')"))
+    for model in (Cuota, Pago, PrestamoVersion, PrestamoSyncPendiente):
+        model.__table__.create(eng)
+    ec_cache.estado_cuenta_cache_reset()
+    s = sessionmaker(bind=eng, autoflush=True, expire_on_commit=False)()
+    yield s
+    s.close()
+
+
+def _version(db, pid):
+    return db.execute(select(PrestamoVersion.version).where(PrestamoVersion.prestamo_id == pid)).scalar()
+
+
+def _cuota(pid, n):
+    return Cuota(
+        prestamo_id=pid,
+        numero_cuota=n,
+        fecha_vencimiento=date(2026, 7, n),
+        monto=Decimal("100"),
+        saldo_capital_inicial=Decimal("0"),
+        saldo_capital_final=Decimal("0"),
+        total_pagado=Decimal("0"),
+        estado="PENDIENTE",
+    )
+
+
+def test_pago_encola_y_cambios_suben_version(db):
+    c = _cuota(1, 1)
+    db.add(c)
+    db.commit()
+    assert _version(db, 1) == 1
+    db.add(Pago(prestamo_id=1, cedula_cliente="V1", fecha_pago=datetime(2026, 7, 1), monto_pagado=Decimal("50")))
+    db.commit()
+    assert _version(db, 1) == 2
+    assert db.execute(select(PrestamoSyncPendiente.prestamo_id)).scalars().all() == [1]
+    c.total_pagado = Decimal("50")
+    db.commit()
+    assert _version(db, 1) == 3
+    assert _version(db, 2) is None
+
+
+def test_cache_por_version_y_bypass_en_transaccion_propia(db, monkeypatch):
+    armados = []
+
+    def _armar(_db, pid, fecha):
+        armados.append(pid)
+        return {"prestamo_id": pid, "n": len(armados), "fecha_corte": fecha}
+
+    monkeypatch.setattr(ecd, "_armar_estado_cuenta_prestamo", _armar)
+    c = _cuota(1, 1)
+    db.add(c)
+    db.commit()
+
+    a = ecd.obtener_datos_estado_cuenta_prestamo(db, 1)
+    a["n"] = 99  # el llamador puede mutar su copia sin afectar la cache
+    b = ecd.obtener_datos_estado_cuenta_prestamo(db, 1)
+    assert armados == [1] and b["n"] == 1
+
+    c.total_pagado = Decimal("10")
+    db.flush()
+    ecd.obtener_datos_estado_cuenta_prestamo(db, 1)
+    ecd.obtener_datos_estado_cuenta_prestamo(db, 1)
+    assert armados == [1, 1, 1]  # versión tocada sin commit: no se cachea
+    assert ec_cache.estado_cuenta_cache_stats()["bypass"] == 2
+
+    db.commit()
+    ecd.obtener_datos_estado_cuenta_prestamo(db, 1)
+    ecd.obtener_datos_estado_cuenta_prestamo(db, 1)
+    assert armados == [1, 1, 1, 1]
+
+
+def test_drenado_respeta_reencolado_durante_el_proceso(db, monkeypatch):
+    encolar_sync_prestamos(db, [1, 2])
+    db.commit()
+    llamados = []
+
+    def _sync(s, ids, **_kw):
+        llamados.extend(ids)
+        if ids == [2]:
+            s.execute(
+                update(PrestamoSyncPendiente)
+                .where(PrestamoSyncPendiente.prestamo_id == 2)
+                .values(encolado_en=datetime.utcnow() + timedelta(seconds=5), reclamado_en=None)
+            )
+        return 1
+
+    monkeypatch.setattr(cola, "sincronizar_pagos_pendientes_a_prestamos", _sync)
+    res = cola.drenar_cola_sync_prestamos(db, limite=10)
+    assert sorted(llamados) == [1, 2]
+    assert res == {"reclamados": 2, "procesados": 2, "pagos_aplicados": 2, "errores": 0}
+    assert db.execute(select(PrestamoSyncPendiente.prestamo_id)).scalars().all() == [2]
+
+
+def test_drenado_registra_error_y_no_reclama_hasta_vencer_claim(db, monkeypatch):
+    encolar_sync_prestamos(db, [1])
+    db.commit()
+
+    def _falla(*_a, **_kw):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(cola, "sincronizar_pagos_pendientes_a_prestamos", _falla)
+    assert cola.drenar_cola_sync_prestamos(db)["errores"] == 1
+    fila = db.execute(select(PrestamoSyncPendiente)).scalar_one()
+    db.refresh(fila)
+    assert fila.intentos == 1 and fila.ultimo_error == "boom"
+    assert cola.drenar_cola_sync_prestamos(db)["reclamados"] == 0
+
+
+def test_cambio_de_estado_del_prestamo_invalida_la_cache(monkeypatch):
+    from app.models.prestamo import Prestamo
+
+    eng = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (Prestamo, PrestamoVersion):
+        model.__table__.create(eng)
+    ec_cache.estado_cuenta_cache_reset()
+    s = sessionmaker(bind=eng, autoflush=True, expire_on_commit=False)()
+    p = Prestamo(
+        id=1,
+        cliente_id=1,
+        cedula="V1",
+        nombres="A",
+        total_financiamiento=Decimal("1000"),
+        fecha_requerimiento=date(2026, 7, 1),
+        modalidad_pago="MENSUAL",
+        numero_cuotas=10,
+        cuota_periodo=Decimal("100"),
+        producto="Moto",
+        estado="APROBADO",
+        analista="ana",
+    )
+    s.add(p)
+    s.commit()
+
+    armados = []
+    monkeypatch.setattr(
+        ecd, "_armar_estado_cuenta_prestamo", lambda _db, pid, fecha: armados.append(pid) or {"prestamo_id": pid}
+    )
+    ecd.obtener_datos_estado_cuenta_prestamo(s, 1)
+    ecd.obtener_datos_estado_cuenta_prestamo(s, 1)
+    assert armados == [1]
+
+    # Campo que el estado de cuenta no muestra: la versión no sube.
+    p.analista = "luis"
+    s.commit()
+    ecd.obtener_datos_estado_cuenta_prestamo(s, 1)
+    assert armados == [1] and _version(s, 1) is None
+
+    p.estado = "LIQUIDADO"
+    s.commit()
+    assert _version(s, 1) == 1
+    ecd.obtener_datos_estado_cuenta_prestamo(s, 1)
+    assert armados == [1, 1]
+    s.close()
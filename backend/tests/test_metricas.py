@@ -0,0 +1,107 @@
+"""Métricas internas: formato Prometheus, hits/misses de caché, checkout del pool y endpoint /health/metrics."""
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core import database, metricas
+from app.core.config import settings
+
+
+def test_formato_texto_prometheus():
+    reg = metricas.Registro()
+    c = reg.contador("x_total", "Eventos", ("tipo",))
+    c.inc(tipo="a")
+    c.inc(2, tipo='b"c')
+    reg.medidor("x_vivos", "Vivos", funcion=lambda: [({}, 3)])
+    h = reg.histograma("x_segundos", "Duración", buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v)
+    assert reg.contador("x_total", "Eventos", ("tipo",)) is c
+    with pytest.raises(ValueError):
+        reg.medidor("x_total", "Otro tipo")
+    with pytest.raises(ValueError):
+        c.inc(otra="a")
+
+    lineas = reg.exponer().splitlines()
+    assert "# TYPE x_total counter" in lineas
+    assert 'x_total{tipo="a"} 1' in lineas
+    assert 'x_total{tipo="b\\"c"} 2' in lineas
+    assert "x_vivos 3" in lineas
+    assert [ln for ln in lineas if ln.startswith("x_segundos")] == [
+        'x_segundos_bucket{le="0.1"} 1',
+        'x_segundos_bucket{le="1"} 2',
+        'x_segundos_bucket{le="+Inf"} 3',
+        "x_segundos_sum 5.55",
+        "x_segundos_count 3",
+    ]
+
+
+def test_colector_roto_no_tumba_el_scrape():
+    reg = metricas.Registro()
+    reg.medidor("roto", "Falla", funcion=lambda: 1 / 0)
+    reg.contador("sano_total", "Ok").inc()
+    texto = reg.exponer()
+    assert "sano_total 1" in texto and "# TYPE roto gauge" in texto
+
+
+def test_cache_service_cuenta_hits_y_misses():
+    from app.services.cache_service import CacheService
+
+    cache_service = CacheService(None)
+    consultas = metricas.REGISTRO.contador(
+        "rapicredit_cache_consultas_total", "", ("cache", "resultado")
+    )
+    hits = consultas.valor(cache="cache_service", resultado="hit")
+    misses = consultas.valor(cache="cache_service", resultado="miss")
+    cache_service.set("test_metricas:k", {"v": 1}, ttl_seconds=60)
+    assert cache_service.get("test_metricas:k") == {"v": 1}
+    assert cache_service.get("test_metricas:no_existe") is None
+    assert consultas.valor(cache="cache_service", resultado="hit") == hits + 1
+    assert consultas.valor(cache="cache_service", resultado="miss") == misses + 1
+    assert 'rapicredit_cache_entradas{cache="cache_service"}' in metricas.exponer_prometheus()
+
+
+def test_checkout_del_pool_medido(tmp_path):
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=database._QueuePoolMedido,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+        pool_logging_name="prueba",
+    )
+    antes = database._checkout_espera.cuenta(motor="prueba")
+    with eng.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(database.PoolTimeoutError):
+            eng.connect()
+    # El checkout vencido también cuenta su espera.
+    assert database._checkout_espera.cuenta(motor="prueba") == antes + 2
+    assert database._checkout_timeouts.valor(motor="prueba") == 1
+    eng.dispose()
+
+
+def test_endpoint_metrics_con_token(monkeypatch):
+    from app.api.v1.endpoints.health.routes import router
+    from app.middleware import bulkhead  # noqa: F401  (registra los medidores de hilos)
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "token-scraper", raising=False)
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[database.get_db] = lambda: None
+    with TestClient(app) as client:
+        r = client.get("/health/metrics", headers={"Authorization": "Bearer token-scraper"})
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE rapicredit_cache_consultas_total counter" in r.text
+        assert "rapicredit_anyio_hilos" in r.text
+        assert client.get("/health/metrics").status_code == 401
@@ -0,0 +1,256 @@
+"""Elegibles de Notificaciones materializados por día: diff por hash, parche por prestamo_versiones y fallback."""
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, select, text, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.models.notificacion_elegible_dia import NotificacionElegibleDia, NotificacionElegiblesEstado
+from app.models.prestamo_version import PrestamoVersion
+from app.services import notificaciones_elegibles_dia as ne
+
+HOY = date(2026, 10, 19)
+
+
+def _item(pid, cuota=1, cid=None, monto=50.0):
+    return {"prestamo_id": pid, "numero_cuota": cuota, "cliente_id": cid or pid * 10, "monto": monto}
+
+
+@pytest.fixture
+def entorno(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for m in (NotificacionElegibleDia, NotificacionElegiblesEstado, PrestamoVersion):
+        m.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE clientes (id INTEGER PRIMARY KEY, cedula VARCHAR(20))"))
+        conn.execute(text("CREATE TABLE prestamos (id INTEGER PRIMARY KEY, cliente_id INTEGER, estado VARCHAR(20))"))
+        # 7 y 8 del mismo titular; 9 de otro cliente con la misma cédula que 70.
+        conn.execute(text("INSERT INTO clientes (id, cedula) VALUES (70, 'V1'), (90, 'V1'), (20, 'V2'), (30, 'V3')"))
+        conn.execute(
+            text(
+                "INSERT INTO prestamos (id, cliente_id, estado) VALUES "
+                "(7, 70, 'APROBADO'), (8, 70, 'APROBADO'), (9, 90, 'APROBADO'), (2, 20, 'APROBADO'), (3, 30, 'APROBADO')"
+            )
+        )
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(ne, "SessionLocal", factory)
+    monkeypatch.setattr(ne, "hoy_negocio", lambda: HOY)
+    monkeypatch.setattr(settings, "NOTIFICACIONES_ELEGIBLES_MATERIALIZADOS", True, raising=False)
+    monkeypatch.setattr(settings, "NOTIFICACIONES_ELEGIBLES_MAX_EDAD_MIN", 120, raising=False)
+
+    listas = {seg: [] for seg in ne.GRUPO_POR_SEGMENTO}
+    llamadas = []
+
+    def _calcular(db, grupo, fecha, prestamo_ids=None):
+        if prestamo_ids is None:
+            llamadas.append(grupo)
+            return {seg: [dict(it) for it in listas[seg]] for seg in ne.GRUPOS[grupo]}
+        llamadas.append((grupo, tuple(prestamo_ids)))
+        return {
+            seg: [dict(it) for it in listas[seg] if it["prestamo_id"] in prestamo_ids] for seg in ne.GRUPOS[grupo]
+        }
+
+    monkeypatch.setattr(ne, "_calcular_grupo", _calcular)
+    return factory, listas, llamadas
+
+
+def test_materializar_reescribe_solo_filas_cambiadas(entorno):
+    factory, listas, _ = entorno
+    listas[ne.SEGMENTO_PREJUDICIAL] = [_item(1), _item(2), _item(3)]
+    with factory() as db:
+        res = ne.materializar_elegibles_dia(db, HOY, ["prejudicial"])
+    assert res["segmentos"][ne.SEGMENTO_PREJUDICIAL] == {"total": 3, "nuevas": 3, "cambiadas": 0, "eliminadas": 0}
+    with factory() as db:
+        antes = {r.clave for r in db.execute(select(NotificacionElegibleDia)).scalars()}
+
+    # 1 sale, 2 cambia de monto, 3 igual (misma posición), 4 entra.
+    listas[ne.SEGMENTO_PREJUDICIAL] = [_item(2, monto=25.0), _item(3), _item(4)]
+    with factory() as db:
+        res = ne.materializar_elegibles_dia(db, HOY, ["prejudicial"])
+    # 3 pasa de posición 2 a 1: se reescribe aunque su hash no cambie.
+    assert res["segmentos"][ne.SEGMENTO_PREJUDICIAL] == {"total": 3, "nuevas": 1, "cambiadas": 2, "eliminadas": 1}
+
+    listas[ne.SEGMENTO_PREJUDICIAL] = [_item(2, monto=25.0), _item(3), _item(4)]
+    with factory() as db:
+        res = ne.materializar_elegibles_dia(db, HOY, ["prejudicial"])
+        assert res["segmentos"][ne.SEGMENTO_PREJUDICIAL]["cambiadas"] == 0
+        filas = db.execute(
+            select(NotificacionElegibleDia).order_by(NotificacionElegibleDia.posicion)
+        ).scalars().all()
+        estado = db.get(NotificacionElegiblesEstado, (HOY, ne.SEGMENTO_PREJUDICIAL))
+    assert [f.payload["prestamo_id"] for f in filas] == [2, 3, 4]
+    assert filas[0].payload["monto"] == 25.0
+    assert "1:1:10" not in {f.clave for f in filas}
+    assert (estado.total, estado.filas_cambiadas) == (3, 0)
+    assert estado.lista_hash and len(estado.lista_hash) == 64
+    assert "1:1:10" in antes
+
+
+def test_lectura_recalcula_solo_si_hay_cambios_o_invalidacion(entorno):
+    factory, listas, llamadas = entorno
+    listas[ne.SEGMENTO_DIAS_1_RETRASO] = [_item(7)]
+    listas[ne.SEGMENTO_DIAS_10_RETRASO] = [_item(8), _item(8, cuota=2)]
+    segs = (ne.SEGMENTO_DIAS_1_RETRASO, ne.SEGMENTO_DIAS_10_RETRASO)
+
+    with factory() as db:
+        out = ne.leer_elegibles(db, segs)
+    assert llamadas == ["retraso"]  # sin estado: un solo recálculo para ambos segmentos del grupo
+    assert [it["prestamo_id"] for it in out[ne.SEGMENTO_DIAS_10_RETRASO]] == [8, 8]
+
+    with factory() as db:
+        ne.leer_elegibles(db, segs)
+    assert llamadas == ["retraso"]
+
+    # Un pago sube la versión del préstamo después del cálculo: solo se reevalúan él y los de su titular.
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=7, version=2, actualizado_en=datetime.utcnow()))
+        db.commit()
+    listas[ne.SEGMENTO_DIAS_1_RETRASO] = []
+    with factory() as db:
+        out = ne.leer_elegibles(db, segs)
+    assert llamadas == ["retraso", ("retraso", (7, 8, 9))]
+    assert out[ne.SEGMENTO_DIAS_1_RETRASO] == []
+
+    # Botón «Actualización manual».
+    with factory() as db:
+        assert ne.invalidar_elegibles_dia(db) == 2
+        db.commit()
+    with factory() as db:
+        ne.leer_elegibles(db, segs)
+    assert llamadas[-1] == "retraso" and len(llamadas) == 3
+
+
+def test_otra_fecha_apagado_o_error_usan_calculo_en_vivo(entorno, monkeypatch):
+    factory, listas, llamadas = entorno
+    with factory() as db:
+        assert ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,), HOY - timedelta(days=1)) is None
+    monkeypatch.setattr(settings, "NOTIFICACIONES_ELEGIBLES_MATERIALIZADOS", False, raising=False)
+    with factory() as db:
+        assert ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,)) is None
+    assert llamadas == []
+
+    monkeypatch.setattr(settings, "NOTIFICACIONES_ELEGIBLES_MATERIALIZADOS", True, raising=False)
+
+    def _falla(db, grupo, fecha, prestamo_ids=None):
+        raise RuntimeError("motor caido")
+
+    monkeypatch.setattr(ne, "_calcular_grupo", _falla)
+    with factory() as db:
+        assert ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,)) is None
+        assert db.get(NotificacionElegiblesEstado, (HOY, ne.SEGMENTO_PREJUDICIAL)) is None
+
+
+def test_purga_y_estado(entorno):
+    factory, listas, _ = entorno
+    listas[ne.SEGMENTO_LIQUIDADOS] = [{"prestamo_id": 5, "cliente_id": 50, "total_abonos": 100.0}]
+    with factory() as db:
+        ne.materializar_elegibles_dia(db, HOY - timedelta(days=10), ["liquidados"])
+        ne.materializar_elegibles_dia(db, HOY, ["liquidados"])
+        assert ne.purgar_elegibles_dia(db, dias=7) == 1
+        est = ne.estado_elegibles_dia(db)
+    assert est["disponible"] is True
+    (seg,) = est["segmentos"]
+    assert (seg["segmento"], seg["total"], seg["vencido"]) == (ne.SEGMENTO_LIQUIDADOS, 1, False)
+
+
+def test_cambio_de_un_prestamo_parchea_solo_sus_filas_y_la_marca_es_su_version(entorno, monkeypatch):
+    factory, listas, llamadas = entorno
+    t0 = datetime(2026, 10, 19, 8, 0, 0)
+    with factory() as db:
+        db.add_all([PrestamoVersion(prestamo_id=p, version=1, actualizado_en=t0) for p in (2, 3)])
+        # 7 fuera de la ventana de relectura bajo la marca: su cambio no altera la huella.
+        db.add(PrestamoVersion(prestamo_id=7, version=1, actualizado_en=t0 - timedelta(hours=1)))
+        db.commit()
+    listas[ne.SEGMENTO_PREJUDICIAL] = [_item(2), _item(7), _item(3)]
+    with factory() as db:
+        ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,))
+        estado = db.get(NotificacionElegiblesEstado, (HOY, ne.SEGMENTO_PREJUDICIAL))
+        assert ne._como_utc(estado.calculado_desde) == ne._como_utc(t0)
+        computed = {f.clave: f.computed_at for f in db.execute(select(NotificacionElegibleDia)).scalars()}
+        calculado_en = estado.calculado_en
+
+    # 7 cambia de monto y su préstamo hermano 8 entra; 2 también cambia en el motor pero no subió versión.
+    t1 = t0 + timedelta(minutes=5)
+    with factory() as db:
+        db.execute(update(PrestamoVersion).where(PrestamoVersion.prestamo_id == 7).values(version=2, actualizado_en=t1))
+        db.commit()
+    listas[ne.SEGMENTO_PREJUDICIAL] = [_item(2, monto=1.0), _item(8), _item(7, monto=10.0), _item(3)]
+    with factory() as db:
+        out = ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,))[ne.SEGMENTO_PREJUDICIAL]
+        estado = db.get(NotificacionElegiblesEstado, (HOY, ne.SEGMENTO_PREJUDICIAL))
+        filas = {f.clave: f for f in db.execute(select(NotificacionElegibleDia)).scalars()}
+    assert llamadas == ["prejudicial", ("prejudicial", (7, 8, 9))]
+    assert [(it["prestamo_id"], it["monto"]) for it in out] == [(2, 50.0), (7, 10.0), (3, 50.0), (8, 50.0)]
+    assert filas["2:1:20"].computed_at == computed["2:1:20"] and filas["3:1:30"].computed_at == computed["3:1:30"]
+    assert (estado.total, estado.filas_cambiadas) == (4, 2)
+    # Marca = versión procesada (no el reloj); la edad máxima sigue contando desde el recálculo completo.
+    assert ne._como_utc(estado.calculado_desde) == ne._como_utc(t1)
+    assert estado.calculado_en == calculado_en
+
+    # 7 sale de la lista: su fila se borra, las demás siguen en su posición.
+    with factory() as db:
+        db.execute(
+            update(PrestamoVersion)
+            .where(PrestamoVersion.prestamo_id == 7)
+            .values(version=3, actualizado_en=t1 + timedelta(minutes=1))
+        )
+        db.commit()
+    listas[ne.SEGMENTO_PREJUDICIAL] = [_item(2, monto=1.0), _item(8), _item(3)]
+    with factory() as db:
+        out = ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,))[ne.SEGMENTO_PREJUDICIAL]
+    assert [it["prestamo_id"] for it in out] == [2, 3, 8]
+    assert len(llamadas) == 3
+
+    # Más préstamos cambiados que el tope: recálculo completo (y 2 toma su monto nuevo).
+    monkeypatch.setattr(ne, "_MAX_PRESTAMOS_INCREMENTAL", 1)
+    with factory() as db:
+        db.execute(update(PrestamoVersion).values(actualizado_en=t1 + timedelta(minutes=2)))
+        db.commit()
+    with factory() as db:
+        out = ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,))[ne.SEGMENTO_PREJUDICIAL]
+    assert llamadas[-1] == "prejudicial"
+    assert [(it["prestamo_id"], it["monto"]) for it in out] == [(2, 1.0), (8, 50.0), (3, 50.0)]
+
+
+def test_transaccion_que_confirma_tarde_bajo_la_marca_se_parchea(entorno):
+    factory, listas, llamadas = entorno
+    t0 = datetime(2026, 10, 19, 8, 0, 0)
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=2, version=1, actualizado_en=t0))
+        db.commit()
+    listas[ne.SEGMENTO_PREJUDICIAL] = [_item(2), _item(3)]
+    with factory() as db:
+        ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,))
+
+    # Una transacción corta confirma (t0 + 20 s) y la marca avanza a su flush.
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=7, version=1, actualizado_en=t0 + timedelta(seconds=20)))
+        db.commit()
+    with factory() as db:
+        ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,))
+    assert llamadas == ["prejudicial", ("prejudicial", (7, 8, 9))]
+
+    # Una transacción larga que hizo flush antes (t0 + 10 s) confirma después: queda bajo la marca.
+    with factory() as db:
+        db.add(PrestamoVersion(prestamo_id=3, version=1, actualizado_en=t0 + timedelta(seconds=10)))
+        db.commit()
+    listas[ne.SEGMENTO_PREJUDICIAL] = [_item(2)]
+    with factory() as db:
+        out = ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,))[ne.SEGMENTO_PREJUDICIAL]
+        estado = db.get(NotificacionElegiblesEstado, (HOY, ne.SEGMENTO_PREJUDICIAL))
+    assert llamadas[-1] == ("prejudicial", (2, 3, 7, 8, 9))
+    assert [it["prestamo_id"] for it in out] == [2]
+    assert ne._como_utc(estado.calculado_desde) == ne._como_utc(t0 + timedelta(seconds=20))
+
+    with factory() as db:
+        ne.leer_elegibles(db, (ne.SEGMENTO_PREJUDICIAL,))
+    assert len(llamadas) == 3
@@ -0,0 +1,126 @@
+"""mover-a-pagos por lote: resoluciones por conjunto (paridad con las versiones por fila) y cascada por préstamo."""
+import os
+import sys
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.models.cuota_pago import CuotaPago
+from app.models.pago import Pago
+from app.services import pagos_cascada_aplicacion as pca
+from app.services.pago_numero_documento import (
+    pago_con_error_ya_cargado_estricto,
+    pagos_con_error_ya_cargados_estricto,
+)
+from app.utils.cedula_almacenamiento import (
+    resolver_cedula_almacenada_en_clientes,
+    resolver_cedulas_almacenadas_en_clientes,
+)
+
+
+@pytest.fixture
+def db():
+    eng = create_engine("sqlite://")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE clientes (id INTEGER PRIMARY KEY, cedula VARCHAR(20))"))
+        conn.execute(
+            text("INSERT INTO clientes (id, cedula) VALUES (1, 'V22621583'), (2, 'E123456'), (3, 'J9')")
+        )
+    Pago.__table__.create(eng)
+    CuotaPago.__table__.create(eng)
+    s = sessionmaker(bind=eng)()
+    yield s
+    s.close()
+
+
+def test_cedulas_por_lote_igual_que_por_fila(db):
+    entradas = ["22621583", "v22621583", "123456", "E123456", "9", "999", "", None, " j9 "]
+    por_lote = resolver_cedulas_almacenadas_en_clientes(db, entradas)
+    for raw in entradas:
+        if raw is None:
+            continue
+        assert por_lote[raw] == resolver_cedula_almacenada_en_clientes(db, raw), raw
+
+
+def test_ya_cargados_por_lote_igual_que_por_fila(db):
+    def _pago(pid, doc, cedula, prestamo):
+        db.execute(
+            text(
+                "INSERT INTO pagos (id, cedula, prestamo_id, fecha_pago, monto_pagado, numero_documento, "
+                "estado, referencia_pago) VALUES (:i, :c, :p, '2026-01-01', 10, :d, 'PAGADO', 'r')"
+            ),
+            {"i": pid, "c": cedula, "p": prestamo, "d": doc},
+        )
+
+    _pago(1, "ABC1", "V1", 10)
+    _pago(2, "abc2", "V2", 20)
+    _pago(3, "X3", "V3", 30)
+    _pago(4, "X3b", "V3", 31)
+    db.execute(
+        text(
+            "INSERT INTO cuota_pagos (id, cuota_id, pago_id, monto_aplicado, fecha_aplicacion, orden_aplicacion, "
+            "es_pago_completo) VALUES (1, 1, 1, 10, '2026-01-01', 0, 1), (2, 2, 2, 10, '2026-01-01', 0, 1)"
+        )
+    )
+    db.commit()
+
+    perrs = [
+        SimpleNamespace(id=101, numero_documento="abc1", cedula_cliente="V1", prestamo_id=None),
+        SimpleNamespace(id=102, numero_documento="ABC1", cedula_cliente="V9", prestamo_id=None),
+        SimpleNamespace(id=103, numero_documento="ABC2", cedula_cliente="V2", prestamo_id=21),
+        SimpleNamespace(id=104, numero_documento="ABC2", cedula_cliente="", prestamo_id=20),
+        SimpleNamespace(id=105, numero_documento="X3", cedula_cliente="V3", prestamo_id=30),
+        SimpleNamespace(id=106, numero_documento=None, cedula_cliente="V1", prestamo_id=10),
+    ]
+    por_lote = pagos_con_error_ya_cargados_estricto(db, perrs)
+    assert por_lote == {101: 1, 104: 2}
+    for perr in perrs:
+        assert por_lote.get(perr.id) == pago_con_error_ya_cargado_estricto(db, perr), perr.id
+
+
+def test_cascada_por_prestamo_ordena_y_aisla_errores(monkeypatch):
+    eventos = []
+
+    def _aplicar(pago, _db, *, marcar_liquidado=True, user=None):
+        assert marcar_liquidado is False
+        eventos.append(("aplicar", pago.prestamo_id, pago.id))
+        if pago.id == 3:
+            raise RuntimeError("cuota bloqueada")
+        return (1, 0) if pago.prestamo_id == 20 else (0, 0)
+
+    monkeypatch.setattr(pca, "_aplicar_pago_a_cuotas_interno", _aplicar)
+    monkeypatch.setattr(
+        pca, "_marcar_prestamo_liquidado_si_corresponde", lambda pid, _db: eventos.append(("liquidar", pid))
+    )
+    monkeypatch.setattr(
+        "app.services.pagos_cascada_lock.adquirir_lock_cascada_prestamo",
+        lambda _db, pid: eventos.append(("lock", pid)),
+    )
+    db = SimpleNamespace(begin_nested=nullcontext)
+
+    def _p(pid, prestamo, dia, monto="10"):
+        return SimpleNamespace(id=pid, prestamo_id=prestamo, fecha_pago=datetime(2026, 1, dia), monto_pagado=Decimal(monto))
+
+    pagos = [_p(1, 20, 5), _p(2, 10, 1), _p(3, 20, 2), _p(4, 20, 9), _p(5, None, 1), _p(6, 10, 3, "0")]
+    res = pca.aplicar_pagos_a_cuotas_por_prestamo(pagos, db)
+
+    assert eventos == [
+        ("lock", 10),
+        ("aplicar", 10, 2),
+        ("lock", 20),
+        ("aplicar", 20, 3),
+        ("aplicar", 20, 1),
+        ("aplicar", 20, 4),
+        ("liquidar", 20),
+    ]
+    assert res == {2: (0, 0, None), 3: (0, 0, "cuota bloqueada"), 1: (1, 0, None), 4: (1, 0, None)}
@@ -0,0 +1,266 @@
+"""Escaneo incremental Gmail (History API): cursor por buzón, solo cambios relevantes y fallback a listado completo."""
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import Counter
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.configuracion import Configuracion
+from app.services.pagos_gmail import gmail_history
+from app.services.pagos_gmail.gmail_service import list_messages_by_filter
+
+
+class _Req:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class _Batch:
+    def __init__(self):
+        self._items = []
+
+    def add(self, req, callback=None, request_id=None):
+        self._items.append((req, callback, request_id))
+
+    def execute(self):
+        for req, callback, request_id in self._items:
+            try:
+                callback(request_id, req.execute(), None)
+            except HttpError as e:
+                callback(request_id, None, e)
+
+
+def _http_error(status):
+    return HttpError(httplib2.Response({"status": status}), b"error")
+
+
+class FakeGmail:
+    """Buzón en memoria con la forma de googleapiclient (users().messages()/history()/getProfile())."""
+
+    def __init__(self, email="pagos@rapicredit.test"):
+        self.email = email
+        self.mensajes = {}
+        self.registros = []  # (historyId, registro de historial)
+        self.history_id = 100
+        self.history_min = 1  # historyId más antiguo que Gmail conserva
+        self.llamadas = Counter()
+
+    # --- cambios en el buzón (generan historial como Gmail) ---
+    def _registrar(self, **registro):
+        self.history_id += 1
+        self.registros.append((self.history_id, registro))
+
+    def recibir(self, mid, *, adjunto=True, labels=("INBOX", "UNREAD")):
+        parts = [{"mimeType": "text/plain", "filename": "", "body": {"size": 4, "data": "aG9sYQ"}}]
+        if adjunto:
+            parts.append({"mimeType": "image/jpeg", "filename": "pago.jpg", "body": {"attachmentId": "a1"}})
+        self.mensajes[mid] = {
+            "id": mid,
+            "threadId": f"t{mid}",
+            "labelIds": list(labels),
+            "internalDate": str(1_700_000_000_000 + len(self.mensajes)),
+            "payload": {
+                "mimeType": "multipart/mixed",
+                "headers": [
+                    {"name": "From", "value": "cliente@x.test"},
+                    {"name": "To", "value": self.email},
+                    {"name": "Subject", "value": f"Pago {mid}"},
+                    {"name": "Date", "value": "Mon, 6 Jan 2025 10:00:00 -0400"},
+                ],
+                "parts": parts,
+            },
+        }
+        self._registrar(messagesAdded=[{"message": {"id": mid, "labelIds": list(labels)}}])
+
+    def etiquetar(self, mid, agregar=(), quitar=()):
+        labels = self.mensajes[mid]["labelIds"]
+        labels.extend(agregar)
+        for lb in quitar:
+            labels.remove(lb)
+        if agregar:
+            self._registrar(labelsAdded=[{"message": {"id": mid}, "labelIds": list(agregar)}])
+        if quitar:
+            self._registrar(labelsRemoved=[{"message": {"id": mid}, "labelIds": list(quitar)}])
+
+    # --- API ---
+    def users(self):
+        return self
+
+    def getProfile(self, userId):
+        self.llamadas["getProfile"] += 1
+        return _Req(lambda: {"emailAddress": self.email, "historyId": str(self.history_id)})
+
+    def messages(self):
+        return _Mensajes(self)
+
+    def history(self):
+        return _Historial(self)
+
+    def new_batch_http_request(self):
+        return _Batch()
+
+
+class _Mensajes:
+    def __init__(self, fake):
+        self.fake = fake
+
+    def list(self, userId, q=None, pageToken=None, **kw):
+        def _run():
+            self.fake.llamadas["messages.list"] += 1
+            # q simplificado: inbox + adjunto.
+            ids = [
+                m["id"]
+                for m in self.fake.mensajes.values()
+                if "INBOX" in m["labelIds"] and len(m["payload"]["parts"]) > 1
+            ]
+            return {"messages": [{"id": i, "threadId": f"t{i}"} for i in ids]}
+
+        return _Req(_run)
+
+    def get(self, userId, id, format="full", metadataHeaders=None):
+        def _run():
+            self.fake.llamadas[f"messages.get.{format}"] += 1
+            if id not in self.fake.mensajes:
+                raise _http_error(404)
+            return self.fake.mensajes[id]
+
+        return _Req(_run)
+
+
+class _Historial:
+    def __init__(self, fake):
+        self.fake = fake
+
+    def list(self, userId, startHistoryId, pageToken=None, **kw):
+        def _run():
+            self.fake.llamadas["history.list"] += 1
+            inicio = int(startHistoryId)
+            if inicio < self.fake.history_min:
+                raise _http_error(404)
+            regs = [dict(r, id=str(h)) for h, r in self.fake.registros if h > inicio]
+            desde = int(pageToken or 0)
+            out = {"history": regs[desde : desde + 2], "historyId": str(self.fake.history_id)}
+            if desde + 2 < len(regs):  # páginas chicas: ejercita nextPageToken
+                out["nextPageToken"] = str(desde + 2)
+            return out
+
+        return _Req(_run)
+
+
+@pytest.fixture
+def gmail(monkeypatch):
+    monkeypatch.setattr(settings, "PAGOS_GMAIL_METADATA_INTER_CHUNK_SLEEP_SEC", 0.0, raising=False)
+    return FakeGmail()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Configuracion.__table__.create(engine)
+    with sessionmaker(bind=engine)() as s:
+        yield s
+
+
+def _listar(db, gmail, filtro="all"):
+    return gmail_history.listar_mensajes_incremental(
+        db, gmail, filtro, lambda: list_messages_by_filter(gmail, filtro)
+    )
+
+
+def test_sin_cursor_lista_completo_y_luego_solo_cambios(db, gmail):
+    for i in range(30):
+        gmail.recibir(f"viejo{i}")
+        gmail.etiquetar(f"viejo{i}", agregar=["Label_MERCANTIL"], quitar=["UNREAD"])
+
+    mensajes, cursor = _listar(db, gmail)
+    assert cursor.modo == gmail_history.MODO_COMPLETO_SIN_CURSOR
+    assert len(mensajes) == 30 and gmail.llamadas["messages.list"] == 1
+    gmail_history.guardar_cursor(db, cursor)
+
+    # Entre corridas: un pago nuevo, un correo sin adjunto, uno enviado y el pipeline etiquetando uno viejo.
+    gmail.recibir("nuevo")
+    gmail.recibir("sin_adjunto", adjunto=False)
+    gmail.recibir("enviado", labels=("SENT",))
+    gmail.etiquetar("viejo3", agregar=["Label_BNC"])
+    gmail.llamadas.clear()
+
+    mensajes, cursor2 = _listar(db, gmail)
+    assert cursor2.modo == gmail_history.MODO_HISTORIAL
+    assert [m["id"] for m in mensajes] == ["nuevo"]
+    assert gmail.llamadas["messages.list"] == 0
+    # Solo se pidió el contenido de los dos correos que entraron al inbox (no los 30 viejos ni el enviado).
+    assert gmail.llamadas["messages.get.full"] == 2
+    # Mismo formato que el listado por q: sin partes y solo cabeceras From/Date/Subject.
+    m = mensajes[0]
+    assert "parts" not in m["payload"] and set(m["headers"]) == {"from", "date", "subject"}
+    assert m["label_ids"] == ["INBOX", "UNREAD"] and m["thread_id"] == "tnuevo"
+    assert cursor2.history_id == str(gmail.history_id)
+
+
+def test_quitar_etiqueta_de_usuario_vuelve_a_traer_el_correo(db, gmail):
+    gmail.recibir("a")
+    gmail.etiquetar("a", agregar=["Label_MANUAL"], quitar=["UNREAD"])
+    _, cursor = _listar(db, gmail)
+    gmail_history.guardar_cursor(db, cursor)
+
+    gmail.etiquetar("a", quitar=["Label_MANUAL"])
+    mensajes, _ = _listar(db, gmail)
+    assert [m["id"] for m in mensajes] == ["a"]
+
+
+def test_historial_vencido_hace_listado_completo(db, gmail):
+    gmail.recibir("a")
+    _, cursor = _listar(db, gmail)
+    gmail_history.guardar_cursor(db, cursor)
+    gmail.recibir("b")
+    gmail.history_min = gmail.history_id + 1  # Gmail ya descartó ese tramo
+    gmail.llamadas.clear()
+
+    mensajes, cursor2 = _listar(db, gmail)
+    assert cursor2.modo == gmail_history.MODO_COMPLETO_EXPIRADO
+    assert {m["id"] for m in mensajes} == {"a", "b"}
+    assert gmail.llamadas["history.list"] == 1 and gmail.llamadas["messages.list"] == 1
+
+
+def test_correos_con_error_se_reintentan_y_cursor_por_buzon(db, gmail):
+    gmail.recibir("a")
+    _, cursor = _listar(db, gmail)
+    gmail_history.guardar_cursor(db, cursor, ids_con_error=["a"])
+
+    mensajes, cursor2 = _listar(db, gmail)
+    assert [m["id"] for m in mensajes] == ["a"]
+    gmail_history.guardar_cursor(db, cursor2)
+    assert _listar(db, gmail)[0] == []
+
+    otro = FakeGmail(email="otro@rapicredit.test")
+    otro.recibir("x")
+    _, cursor_otro = _listar(db, otro)
+    assert cursor_otro.modo == gmail_history.MODO_COMPLETO_SIN_CURSOR
+
+
+def test_filtro_unread_considera_marcado_como_no_leido(db, gmail):
+    gmail.recibir("a")
+    gmail.etiquetar("a", quitar=["UNREAD"])
+    _, cursor = _listar(db, gmail, "unread")
+    gmail_history.guardar_cursor(db, cursor)
+
+    gmail.etiquetar("a", agregar=["UNREAD"])
+    mensajes, _ = _listar(db, gmail, "unread")
+    assert [m["id"] for m in mensajes] == ["a"]
+    assert gmail_history.admite_incremental("pending_identification")
+    assert not gmail_history.admite_incremental("all", from_email="x@y.test")
+    assert not gmail_history.admite_incremental("error_email_rescan")
@@ -0,0 +1,212 @@
+"""Importar desde Cobros como job: tramos por cursor con commit propio, cancelar/reanudar y sin duplicados."""
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.importacion_cobros_job import ImportacionCobrosJob
+from app.models.pago_reportado import PagoReportado
+from app.services import pagos_importacion_cobros as imp
+
+
+@pytest.fixture
+def Session(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PAGOS_IMPORTAR_COBROS_CHUNK", 3, raising=False)
+    engine = create_engine(f"sqlite:///{tmp_path / 'imp.db'}")
+    PagoReportado.__table__.create(engine)
+    ImportacionCobrosJob.__table__.create(engine)
+    with engine.begin() as conn:
+        # JSONB no existe en SQLite: solo se cuenta la tabla.
+        conn.execute(text("CREATE TABLE datos_importados_conerrores (id INTEGER PRIMARY KEY)"))
+        # Efecto de cada import (en lugar de pagos): una fila por reportado importado.
+        conn.execute(text("CREATE TABLE marcas (reportado_id INTEGER NOT NULL)"))
+    return sessionmaker(bind=engine)
+
+
+def _reportados(Session, estados, desde=1):
+    with Session() as s:
+        for i, estado in enumerate(estados, desde):
+            s.add(
+                PagoReportado(
+                    id=i,
+                    referencia_interna=f"RPC-{i}",
+                    nombres="A",
+                    apellidos="B",
+                    tipo_cedula="V",
+                    numero_cedula=str(1000 + i),
+                    fecha_pago=date(2026, 10, 1),
+                    institucion_financiera="BNC",
+                    numero_operacion=f"OP{i}",
+                    monto=10,
+                    moneda="USD",
+                    estado=estado,
+                )
+            )
+        s.commit()
+
+
+class Procesador:
+    def __init__(self, falla_en_llamada=None, al_llamar=None):
+        self.llamadas = []
+        self.falla_en_llamada = falla_en_llamada
+        self.al_llamar = al_llamar
+
+    def __call__(self, db, reportados, ctx):
+        ids = [r.id for r in reportados]
+        self.llamadas.append(ids)
+        if self.al_llamar:
+            self.al_llamar(len(self.llamadas))
+        for rid in ids:
+            db.execute(text("INSERT INTO marcas (reportado_id) VALUES (:r)"), {"r": rid})
+        if len(self.llamadas) == self.falla_en_llamada:
+            raise RuntimeError("BD caída a mitad de tramo")
+        return {
+            "registros_procesados": len(ids) - 1,
+            "errores": [{"referencia": f"RPC-{ids[0]}", "error": "Cédula no encontrada en clientes"}],
+            "ids_pagos_con_errores": [ids[0]],
+            "operaciones_cuota_total": len(ids),
+            "pagos_con_aplicacion_a_cuotas": len(ids) - 1,
+            "pagos_sin_aplicacion_cuotas": [],
+        }
+
+
+def _iniciar(Session):
+    with Session() as s:
+        job, ejecutor = imp.iniciar_importacion(s, SimpleNamespace(email="ops@rapicredit.test", rol="operador"))
+        return (job.id if job else None), ejecutor
+
+
+def _marcas(Session):
+    with Session() as s:
+        return [r for (r,) in s.execute(text("SELECT reportado_id FROM marcas ORDER BY reportado_id"))]
+
+
+def _estado(Session, job_id):
+    with Session() as s:
+        return imp.estado_importacion(s, s.get(ImportacionCobrosJob, job_id))
+
+
+def test_tramos_por_cursor_hasta_el_tope_del_job(Session):
+    _reportados(Session, ["aprobado"] * 4 + ["rechazado"] + ["aprobado"] * 3)
+    job_id, ejecutor = _iniciar(Session)
+    # Reportado aprobado después de crear el job: queda para la siguiente importación.
+    _reportados(Session, ["aprobado"], desde=9)
+    proc = Procesador()
+
+    assert imp.ejecutar_importacion(job_id, ejecutor, session_factory=Session, procesar_tramo=proc) == "completado"
+    assert proc.llamadas == [[1, 2, 3], [4, 6, 7], [8]]
+    r = _estado(Session, job_id)
+    assert r["estado"] == "completado" and not r["en_curso"]
+    assert (r["tramos"], r["reportados_revisados"], r["total_estimado"], r["porcentaje"]) == (3, 7, 7, 100.0)
+    assert r["registros_procesados"] == 4 and r["registros_con_error"] == 3
+    assert r["ids_pagos_con_errores"] == [1, 4, 8] and r["operaciones_cuota_total"] == 7
+    assert r["mensaje"].startswith("Importados 4 pagos desde Cobros; 3 con error")
+    with Session() as s:
+        assert s.get(ImportacionCobrosJob, job_id).usuario_rol == "operator"
+
+
+def test_fallo_revierte_el_tramo_y_reanudar_no_duplica(Session):
+    _reportados(Session, ["aprobado"] * 7)
+    job_id, ejecutor = _iniciar(Session)
+
+    assert imp.ejecutar_importacion(
+        job_id, ejecutor, session_factory=Session, procesar_tramo=Procesador(falla_en_llamada=2)
+    ) == "error"
+    r = _estado(Session, job_id)
+    assert r["cursor_reportado_id"] == 3 and r["reportados_revisados"] == 3
+    assert "BD caída" in r["error"]
+    assert _marcas(Session) == [1, 2, 3]  # el tramo 4-6 se revirtió completo
+
+    with Session() as s:
+        ejecutor2 = imp.reanudar_importacion(s, s.get(ImportacionCobrosJob, job_id))
+    proc = Procesador()
+    assert imp.ejecutar_importacion(job_id, ejecutor2, session_factory=Session, procesar_tramo=proc) == "completado"
+    assert proc.llamadas == [[4, 5, 6], [7]]
+    assert _marcas(Session) == [1, 2, 3, 4, 5, 6, 7]
+    assert _estado(Session, job_id)["errores_detalle"] == [
+        {"referencia": f"RPC-{i}", "error": "Cédula no encontrada en clientes"} for i in (1, 4, 7)
+    ]
+
+
+def test_cancelar_termina_el_tramo_en_curso_y_se_puede_reanudar(Session):
+    _reportados(Session, ["aprobado"] * 7)
+    job_id, ejecutor = _iniciar(Session)
+
+    def cancelar_desde_otro_request(n):
+        if n == 1:
+            with Session() as s:
+                assert imp.cancelar_importacion(s, s.get(ImportacionCobrosJob, job_id))
+
+    proc = Procesador(al_llamar=cancelar_desde_otro_request)
+    assert imp.ejecutar_importacion(job_id, ejecutor, session_factory=Session, procesar_tramo=proc) == "cancelado"
+    assert proc.llamadas == [[1, 2, 3]]
+    r = _estado(Session, job_id)
+    assert r["estado"] == "cancelado" and r["cursor_reportado_id"] == 3
+    assert "puede reanudarse" in r["mensaje"]
+
+    with Session() as s:
+        job = s.get(ImportacionCobrosJob, job_id)
+        assert not imp.cancelar_importacion(s, job)
+        ejecutor2 = imp.reanudar_importacion(s, job)
+    assert imp.ejecutar_importacion(job_id, ejecutor2, session_factory=Session, procesar_tramo=Procesador()) == "completado"
+    assert _marcas(Session) == list(range(1, 8))
+
+
+def test_latido_a_mitad_de_tramo_visible_para_otros_requests(Session, monkeypatch):
+    monkeypatch.setattr(imp, "_LATIDO_MIN_SEG", 0)
+    _reportados(Session, ["aprobado"] * 2)
+    job_id, ejecutor = _iniciar(Session)
+    with Session() as s:
+        s.get(ImportacionCobrosJob, job_id).latido = datetime.now(timezone.utc) - timedelta(hours=1)
+        s.commit()
+    vistos = []
+
+    def tramo_lento(db, reportados, ctx):
+        # Cascada de un tramo largo: cada préstamo terminado late en su propia sesión.
+        ctx.latir()
+        with Session() as s:
+            vistos.append(imp.estado_importacion(s, s.get(ImportacionCobrosJob, job_id))["interrumpido"])
+        return Procesador()(db, reportados, ctx)
+
+    assert imp.ejecutar_importacion(job_id, ejecutor, session_factory=Session, procesar_tramo=tramo_lento) == "completado"
+    assert vistos == [False]
+
+
+def test_iniciar_devuelve_el_activo_y_reanuda_el_interrumpido(Session):
+    _reportados(Session, ["aprobado"] * 4)
+    job_id, ejecutor = _iniciar(Session)
+    assert ejecutor
+    # Segundo clic con el job vivo: mismo job, sin lanzar otro hilo.
+    assert _iniciar(Session) == (job_id, None)
+
+    # Worker reiniciado: sin latido reciente → el siguiente POST lo reanuda con otro ejecutor.
+    with Session() as s:
+        s.get(ImportacionCobrosJob, job_id).latido = datetime.now(timezone.utc) - timedelta(hours=1)
+        s.commit()
+        assert imp.estado_importacion(s, s.get(ImportacionCobrosJob, job_id))["interrumpido"]
+    mismo, ejecutor2 = _iniciar(Session)
+    assert mismo == job_id and ejecutor2 and ejecutor2 != ejecutor
+
+    # El hilo viejo ya no puede confirmar tramos.
+    viejo = Procesador()
+    assert imp.ejecutar_importacion(job_id, ejecutor, session_factory=Session, procesar_tramo=viejo) == "en_proceso"
+    assert viejo.llamadas == [] and _marcas(Session) == []
+    assert imp.ejecutar_importacion(job_id, ejecutor2, session_factory=Session, procesar_tramo=Procesador()) == "completado"
+
+    # Sin aprobados: no se crea job y el POST responde el resumen vacío de siempre.
+    with Session() as s:
+        s.execute(text("UPDATE pagos_reportados SET estado='importado'"))
+        s.commit()
+    assert _iniciar(Session) == (None, None)
+    assert imp.resumen_vacio()["mensaje"] == "No hay pagos reportados aprobados para importar."
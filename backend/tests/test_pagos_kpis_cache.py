@@ -0,0 +1,197 @@
+"""KPIs/stats de pagos: rollup por estado, cache por marca de prestamo_versiones, TTL y control de consistencia."""
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select, text, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.cuota import Cuota
+from app.models.pagos_kpis_cache import PagosKpisCache
+from app.models.prestamo_version import PrestamoVersion
+from app.services import pagos_kpis
+
+HOY = date(2026, 10, 19)
+INICIO, FIN = date(2026, 10, 1), date(2026, 10, 31)
+
+
+# Motor del último `_session`: la cache escribe en su propia sesión (SessionLocal) sobre la misma BD.
+_MOTOR = []
+
+
+def _session(con_cache=True):
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    _MOTOR[:] = [eng]
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE clientes (id INTEGER PRIMARY KEY, estado VARCHAR(20) NOT NULL)"))
+        conn.execute(
+            text(
+                "CREATE TABLE prestamos (id INTEGER PRIMARY KEY, cliente_id INTEGER, estado VARCHAR(50) NOT NULL, "
+                "analista VARCHAR(100), concesionario VARCHAR(100), modelo_vehiculo VARCHAR(100))"
+            )
+        )
+        conn.execute(text("INSERT INTO clientes (id, estado) VALUES (1, 'ACTIVO'), (2, 'ACTIVO'), (3, 'INACTIVO')"))
+        conn.execute(
+            text(
+                "INSERT INTO prestamos (id, cliente_id, estado, analista) VALUES "
+                "(1, 1, 'APROBADO', 'ana'), (2, 2, 'APROBADO', 'luis'), (3, 3, 'APROBADO', 'ana')"
+            )
+        )
+    Cuota.__table__.create(eng)
+    PrestamoVersion.__table__.create(eng)
+    if con_cache:
+        PagosKpisCache.__table__.create(eng)
+    db = sessionmaker(bind=eng, autoflush=False, expire_on_commit=False)()
+    filas = [
+        # (prestamo_id, monto, fecha_vencimiento, fecha_pago, estado)
+        (1, 100, date(2026, 9, 5), date(2026, 9, 5), "PAGADO"),
+        (1, 100, date(2026, 10, 5), HOY, "PAGADO"),
+        (1, 100, date(2026, 11, 5), None, "PENDIENTE"),
+        (2, 50, date(2026, 10, 10), None, "VENCIDO"),
+        (2, 50, date(2026, 10, 25), None, "PENDIENTE"),
+        (3, 70, date(2026, 10, 1), None, "VENCIDO"),  # cliente inactivo: fuera de todo
+    ]
+    for i, (pid, monto, fv, fp, estado) in enumerate(filas, start=1):
+        db.add(
+            Cuota(
+                id=i,
+                prestamo_id=pid,
+                numero_cuota=i,
+                fecha_vencimiento=fv,
+                fecha_pago=fp,
+                monto=monto,
+                saldo_capital_inicial=0,
+                saldo_capital_final=0,
+                total_pagado=monto if fp else 0,
+                estado=estado,
+            )
+        )
+    db.commit()
+    return db
+
+
+@pytest.fixture(autouse=True)
+def _sin_huella(monkeypatch):
+    monkeypatch.setattr(pagos_kpis, "contar_prestamos_con_huella_funcional_duplicada", lambda db: 0)
+    monkeypatch.setattr(pagos_kpis, "SessionLocal", lambda: sessionmaker(bind=_MOTOR[0])())
+
+
+class Contador:
+    def __init__(self, db, tipo=pagos_kpis.TIPO_STATS):
+        self.db, self.tipo, self.llamadas = db, tipo, 0
+
+    def __call__(self, refrescar=False, **filtros):
+        def calcular():
+            self.llamadas += 1
+            if self.tipo == pagos_kpis.TIPO_KPIS:
+                return pagos_kpis.calcular_kpis(self.db, INICIO, FIN, HOY)
+            return pagos_kpis.calcular_stats(self.db, HOY, **filtros)
+
+        if self.tipo == pagos_kpis.TIPO_KPIS:
+            parametros = pagos_kpis.parametros_kpis(INICIO, FIN, HOY)
+        else:
+            parametros = pagos_kpis.parametros_stats(HOY, **filtros)
+        return pagos_kpis.obtener(self.db, self.tipo, parametros, calcular, refrescar=refrescar)
+
+
+def test_rollup_de_stats_y_kpis_del_mes():
+    db = _session()
+    stats = pagos_kpis.calcular_stats(db, HOY)
+    assert (stats["total_pagos"], stats["cuotas_pagadas"], stats["cuotas_pendientes"]) == (5, 2, 3)
+    assert (stats["cuotas_atrasadas"], stats["pagos_hoy"], stats["total_pagado"]) == (1, 1, 200.0)
+    assert stats["pagos_por_estado"] == [
+        {"estado": "PAGADO", "count": 2},
+        {"estado": "PENDIENTE", "count": 2},
+        {"estado": "VENCIDO", "count": 1},
+    ]
+    assert pagos_kpis.calcular_stats(db, HOY, analista="luis")["total_pagos"] == 2
+
+    kpis = pagos_kpis.calcular_kpis(db, INICIO, FIN, HOY)
+    assert (kpis["montoACobrarMes"], kpis["montoCobradoMes"], kpis["saldoPorCobrar"]) == (200.0, 100.0, 200.0)
+    assert kpis["morosidadMensualPorcentaje"] == 33.33  # 50 no cobrado de 150 vencido
+    assert (kpis["clientesEnMora"], kpis["clientesAlDia"]) == (1, 1)
+
+
+def test_hit_hasta_que_un_cambio_de_cuota_sube_la_marca():
+    db = _session()
+    stats = Contador(db)
+    primero = stats()
+    assert stats() == primero and stats.llamadas == 1
+    # Otro filtro es otra entrada.
+    stats(analista="ana")
+    assert stats.llamadas == 2
+
+    # Pago aplicado a la cuota vencida (ORM → prestamo_versiones sube en el flush).
+    db.get(Cuota, 4).fecha_pago = HOY
+    db.commit()
+    nuevo = stats()
+    assert stats.llamadas == 3
+    assert (nuevo["cuotas_pagadas"], nuevo["cuotas_atrasadas"], nuevo["pagos_hoy"]) == (3, 0, 2)
+    assert stats() == nuevo and stats.llamadas == 3
+
+
+def test_guardar_no_confirma_ni_revierte_la_sesion_del_request(monkeypatch):
+    db = _session()
+
+    def _prohibido():
+        raise AssertionError("la sesión del GET no debe confirmar ni revertir")
+
+    monkeypatch.setattr(db, "commit", _prohibido)
+    monkeypatch.setattr(db, "rollback", _prohibido)
+    stats = Contador(db)
+    stats()
+    assert stats() and stats.llamadas == 1
+    assert db.scalar(select(func.count()).select_from(PagosKpisCache)) == 1
+
+
+def test_ttl_refrescar_y_sin_tabla():
+    db = _session()
+    stats = Contador(db)
+    stats()
+    stats(refrescar=True)
+    stats(analista="ana")
+    assert stats.llamadas == 3
+
+    viejo = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.execute(update(PagosKpisCache).values(calculado_en=viejo))
+    db.commit()
+    stats()
+    assert stats.llamadas == 4
+    # La escritura purga lo vencido: queda solo la entrada recién calculada.
+    assert db.scalar(select(func.count()).select_from(PagosKpisCache)) == 1
+
+    sin_tabla = Contador(_session(con_cache=False))
+    sin_tabla()
+    sin_tabla()
+    assert sin_tabla.llamadas == 2
+
+
+def test_verificar_detecta_y_corrige_cambios_no_versionados():
+    db = _session()
+    kpis = Contador(db, pagos_kpis.TIPO_KPIS)
+    stats = Contador(db)
+    kpis()
+    stats()
+    assert pagos_kpis.verificar_cache(db)["con_diferencias"] == []
+
+    # Cambio de estado del cliente por SQL: no pasa por prestamo_versiones.
+    db.execute(text("UPDATE clientes SET estado = 'INACTIVO' WHERE id = 2"))
+    db.commit()
+    r = pagos_kpis.verificar_cache(db)
+    assert (r["revisadas"], r["vigentes"], r["corregidas"]) == (2, 2, 2)
+    por_tipo = {d["tipo"]: d["campos"] for d in r["con_diferencias"]}
+    assert por_tipo["kpis"]["clientesEnMora"] == {"cache": 1, "vivo": 0}
+    assert por_tipo["stats"]["total_pagos"] == {"cache": 5, "vivo": 3}
+
+    # Corregida: se sirve sin recalcular y coincide con el cálculo en vivo.
+    assert kpis()["clientesEnMora"] == 0 and stats()["total_pagos"] == 3
+    assert kpis.llamadas == 1 and stats.llamadas == 1
+    assert pagos_kpis.verificar_cache(db)["con_diferencias"] == []
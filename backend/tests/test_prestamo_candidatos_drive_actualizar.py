@@ -7,6 +7,8 @@ os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from datetime import datetime
+
 import pytest
 from fastapi import HTTPException
 from unittest.mock import MagicMock
@@ -52,6 +54,21 @@ def test_actualizar_fecha_q_actualiza_snapshot_y_drive():
     db.commit.assert_called_once()
 
 
+def test_actualizar_fecha_q_no_toca_fila_drive_dada_de_baja():
+    drive = DriveRow(sheet_row_number=42, col_q="04/07/2026", row_hash="h", eliminado_en=datetime(2026, 10, 1))
+    cand = PrestamoCandidatoDrive(id=7, sheet_row_number=42, cedula_cmp="V12345678", payload={"col_q_fecha": "x"})
+    db = MagicMock()
+    db.get.side_effect = lambda model, key: {
+        (PrestamoCandidatoDrive, 7): cand,
+        (DriveRow, 42): drive,
+    }.get((model, key))
+
+    res = actualizar_fecha_q_candidato_drive(db, fila_id=7, fecha_q="2026-07-04")
+
+    assert res["ok"] is True and cand.payload["col_q_fecha_iso"] == "2026-07-04"
+    assert (drive.col_q, drive.row_hash) == ("04/07/2026", "h")
+
+
 def test_actualizar_fecha_q_rechaza_formato_no_iso():
     cand = PrestamoCandidatoDrive(
         id=1,
@@ -0,0 +1,201 @@
+"""Resumen prestamo_saldos: agregado, refresco por préstamo, verificación/reparación y lectura (SQLite en memoria)."""
+import os
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, delete, text, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.cuota import Cuota
+from app.models.prestamo_saldo import PrestamoSaldo
+from app.services.notificacion_service import contar_cuotas_atraso_por_prestamos
+from app.services.prestamo_saldos import (
+    calcular_prestamo_saldos,
+    leer_prestamo_saldos,
+    refrescar_prestamo_saldos,
+    verificar_prestamo_saldos,
+)
+
+REF = date(2026, 6, 30)
+
+
+def _session():
+    eng = create_engine("sqlite://")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE prestamos (id INTEGER PRIMARY KEY, estado VARCHAR(50) NOT NULL)"))
+    Cuota.__table__.create(eng)
+    PrestamoSaldo.__table__.create(eng)
+    return sessionmaker(bind=eng, autoflush=False, expire_on_commit=False)()
+
+
+def _poblar(db):
+    db.execute(text("INSERT INTO prestamos (id, estado) VALUES (1, 'APROBADO'), (2, 'APROBADO'), (3, 'LIQUIDADO')"))
+    casos = {
+        # prestamo_id: [(monto, total_pagado, dias respecto a REF, fecha_pago, estado)]
+        1: [
+            (100, 100, -40, REF - timedelta(days=41), "PAGADO"),
+            (100, 30, -10, None, "VENCIDO"),
+            (100, 0, 0, None, "PENDIENTE"),
+            (100, 60, 20, REF - timedelta(days=2), "PARCIAL"),
+        ],
+        2: [
+            (50, 0, -130, None, "MORA"),
+            (50, 0, -1, None, "VENCIDO"),
+            (50, 70, 15, REF, "PAGO_ADELANTADO"),
+        ],
+        3: [(80, 80, -5, REF - timedelta(days=6), "PAGADA")],
+    }
+    n = 0
+    for pid, filas in casos.items():
+        for k, (monto, pagado, delta, fpago, estado) in enumerate(filas, start=1):
+            n += 1
+            db.add(
+                Cuota(
+                    id=n,
+                    prestamo_id=pid,
+                    numero_cuota=k,
+                    fecha_vencimiento=REF + timedelta(days=delta),
+                    fecha_pago=fpago,
+                    monto=monto,
+                    saldo_capital_inicial=0,
+                    saldo_capital_final=0,
+                    total_pagado=pagado,
+                    estado=estado,
+                )
+            )
+    db.commit()
+    # El alta ORM ya dejó el resumen (fecha de hoy); los tests parten de una cartera sin resumen.
+    db.execute(delete(PrestamoSaldo))
+    db.commit()
+
+
+def test_agregado_por_prestamo():
+    db = _session()
+    _poblar(db)
+    res = calcular_prestamo_saldos(db, fecha_referencia=REF)
+    assert set(res) == {1, 2, 3}
+
+    p1 = res[1]
+    assert p1["cuotas_total"] == 4
+    assert p1["cuotas_pagadas"] == 1
+    assert p1["total_monto"] == Decimal("400.00")
+    assert p1["total_pagado"] == Decimal("190.00")
+    assert p1["saldo_pendiente"] == Decimal("210.00")
+    assert p1["cuotas_vencidas"] == 1
+    assert p1["max_dias_atraso"] == 10
+    assert p1["fecha_vencimiento_pendiente_min"] == REF - timedelta(days=10)
+    assert p1["ultima_fecha_pago"] == REF - timedelta(days=2)
+
+    p2 = res[2]
+    assert p2["cuotas_vencidas"] == 2
+    assert p2["max_dias_atraso"] == 130
+    # El sobrepago de una cuota no descuenta saldo de otras (max(0, monto - pagado) por cuota).
+    assert p2["saldo_pendiente"] == Decimal("100.00")
+    assert p2["total_pagado"] == Decimal("70.00")
+
+    assert res[3]["saldo_pendiente"] == Decimal("0.00")
+    assert res[3]["cuotas_vencidas"] == 0
+
+
+def test_refrescar_reemplaza_filas_y_borra_sin_cuotas():
+    db = _session()
+    _poblar(db)
+    assert refrescar_prestamo_saldos(db, [1, 2], fecha_referencia=REF) == 2
+    db.commit()
+
+    db.execute(update(Cuota).where(Cuota.id == 2).values(total_pagado=100))
+    refrescar_prestamo_saldos(db, [1], fecha_referencia=REF)
+    filas = leer_prestamo_saldos(db, [1, 2, 3])
+    assert set(filas) == {1, 2}
+    assert filas[1]["cuotas_vencidas"] == 0
+    assert filas[1]["saldo_pendiente"] == Decimal("140.00")
+    assert filas[1]["fecha_vencimiento_pendiente_min"] == REF
+
+    db.execute(text("DELETE FROM cuotas WHERE prestamo_id = 2"))
+    refrescar_prestamo_saldos(db, [2], fecha_referencia=REF)
+    assert leer_prestamo_saldos(db, [2]) == {}
+
+
+def test_verificacion_detecta_y_repara():
+    db = _session()
+    _poblar(db)
+    res = verificar_prestamo_saldos(db, fecha_referencia=REF, chunk_size=2)
+    assert res["faltantes"] == 3
+    assert res["prestamos_verificados"] == 3
+
+    # Sin cambios: ni faltantes ni diferencias.
+    res = verificar_prestamo_saldos(db, fecha_referencia=REF)
+    assert (res["faltantes"], res["sobrantes"], res["con_diferencias"]) == (0, 0, 0)
+
+    # Un escritor que no mantiene el resumen deja diferencias; la verificación las detecta y repara.
+    db.execute(update(Cuota).where(Cuota.id == 5).values(total_pagado=50))
+    db.execute(text("DELETE FROM cuotas WHERE prestamo_id = 3"))
+    db.commit()
+    res = verificar_prestamo_saldos(db, fecha_referencia=REF, reparar=False)
+    assert res["con_diferencias"] == 1 and res["sobrantes"] == 1
+    assert res["ejemplos"][0]["prestamo_id"] == 2
+    assert "total_pagado" in res["ejemplos"][0]["campos"]
+
+    verificar_prestamo_saldos(db, fecha_referencia=REF)
+    res = verificar_prestamo_saldos(db, fecha_referencia=REF)
+    assert (res["faltantes"], res["sobrantes"], res["con_diferencias"]) == (0, 0, 0)
+    assert leer_prestamo_saldos(db, [2])[2]["total_pagado"] == Decimal("120.00")
+
+
+def test_cambio_de_dia_no_es_diferencia_y_mueve_fecha_referencia():
+    db = _session()
+    _poblar(db)
+    verificar_prestamo_saldos(db, fecha_referencia=REF)
+    manana = REF + timedelta(days=1)
+    res = verificar_prestamo_saldos(db, fecha_referencia=manana)
+    assert res["con_diferencias"] == 0
+    fila = leer_prestamo_saldos(db, [1], fecha_referencia=manana)[1]
+    # La cuota que vencía en REF ya tiene 1 día de atraso.
+    assert fila["cuotas_vencidas"] == 2
+    assert fila["max_dias_atraso"] == 11
+
+
+def test_contar_cuotas_atraso_desde_resumen(monkeypatch):
+    db = _session()
+    _poblar(db)
+    esperado = contar_cuotas_atraso_por_prestamos(db, [1, 2, 3, 99], fecha_referencia=REF)
+
+    monkeypatch.setattr(settings, "PRESTAMO_SALDOS_LECTURA_RESUMEN", True)
+    refrescar_prestamo_saldos(db, [1, 2], fecha_referencia=REF)
+    db.commit()
+    # Préstamo 3 sin fila y 99 sin cuotas: caen al agregado sobre cuotas.
+    assert contar_cuotas_atraso_por_prestamos(db, [1, 2, 3, 99], fecha_referencia=REF) == esperado
+
+    # Fila de otro día: no se usa para atraso.
+    otro_dia = REF + timedelta(days=30)
+    assert contar_cuotas_atraso_por_prestamos(
+        db, [1, 2], fecha_referencia=otro_dia
+    ) == {1: 3, 2: 2}
+
+
+def test_escritura_orm_de_cuota_refresca_el_resumen_en_el_flush():
+    db = _session()
+    _poblar(db)
+    refrescar_prestamo_saldos(db, [1], fecha_referencia=REF)
+    db.commit()
+
+    # Sin llamar a refrescar_prestamo_saldos: el flush de la cuota lo mantiene.
+    cuota = db.get(Cuota, 2)
+    cuota.total_pagado = 100
+    cuota.fecha_pago = REF
+    db.commit()
+    fila = leer_prestamo_saldos(db, [1])[1]
+    assert fila["total_pagado"] == Decimal("260.00")
+    assert fila["saldo_pendiente"] == Decimal("140.00")
+    assert fila["ultima_fecha_pago"] == REF
+
+    db.delete(db.get(Cuota, 8))
+    db.commit()
+    assert leer_prestamo_saldos(db, [3]) == {}
@@ -0,0 +1,129 @@
+"""Limitador público GCRA: ráfaga, recarga gradual, LRU acotado y fallback si Redis falla."""
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import public_rate_limit as prl
+from app.core.public_rate_limit import RateLimitPolicy, check_rate_limit
+
+
+class _Reloj:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _sin_redis():
+    return None
+
+
+@pytest.fixture(autouse=True)
+def _limpio():
+    prl.rate_limit_reset()
+    yield
+    prl.rate_limit_reset()
+
+
+def test_rafaga_y_recarga_gradual():
+    pol = RateLimitPolicy("t_rafaga", 5, 60, "limite")
+    reloj = _Reloj()
+    for _ in range(5):
+        check_rate_limit(pol, "198.51.100.1", redis_client_getter=_sin_redis, clock=reloj)
+    with pytest.raises(HTTPException) as exc:
+        check_rate_limit(pol, "198.51.100.1", redis_client_getter=_sin_redis, clock=reloj)
+    assert exc.value.status_code == 429
+    assert exc.value.detail == "limite"
+    assert exc.value.headers["Retry-After"] == "12"
+
+    # Otra IP no se ve afectada.
+    check_rate_limit(pol, "198.51.100.2", redis_client_getter=_sin_redis, clock=reloj)
+
+    # Ventana deslizante: tras T = 60/5 s se libera un solo cupo (no la ventana entera).
+    reloj.t += 12
+    check_rate_limit(pol, "198.51.100.1", redis_client_getter=_sin_redis, clock=reloj)
+    with pytest.raises(HTTPException):
+        check_rate_limit(pol, "198.51.100.1", redis_client_getter=_sin_redis, clock=reloj)
+
+    reloj.t += 60
+    for _ in range(5):
+        check_rate_limit(pol, "198.51.100.1", redis_client_getter=_sin_redis, clock=reloj)
+
+    m = prl.rate_limit_metrics_snapshot()["politicas"]["t_rafaga"]
+    assert m["rechazadas"] == 2
+    assert m["permitidas"] == 12
+    assert m["memoria"] == 14
+
+
+def test_memoria_acotada_lru(monkeypatch):
+    monkeypatch.setattr(prl, "_memory_max_keys", lambda: 100)
+    pol = RateLimitPolicy("t_lru", 1, 3600, "limite")
+    reloj = _Reloj()
+    for i in range(5000):
+        check_rate_limit(pol, f"10.0.{i // 256}.{i % 256}", redis_client_getter=_sin_redis, clock=reloj)
+    assert prl.rate_limit_metrics_snapshot()["claves_en_memoria"] == 100
+    # La IP más reciente sigue limitada; la más antigua fue descartada.
+    with pytest.raises(HTTPException):
+        check_rate_limit(pol, "10.0.19.135", redis_client_getter=_sin_redis, clock=reloj)
+    check_rate_limit(pol, "10.0.0.0", redis_client_getter=_sin_redis, clock=reloj)
+
+
+class _RedisRoto:
+    def register_script(self, _lua):
+        def _script(**_kw):
+            raise ConnectionError("redis caido")
+
+        return _script
+
+
+class _RedisFalso:
+    """Simula el script Lua: admite las dos primeras y rechaza con 1500 ms de espera."""
+
+    def __init__(self):
+        self.llamadas = []
+
+    def register_script(self, lua):
+        assert "TIME" in lua
+
+        def _script(keys, args):
+            self.llamadas.append((keys, args))
+            return [1, 0] if len(self.llamadas) <= 2 else [0, 1500]
+
+        return _script
+
+
+def test_redis_falla_usa_memoria():
+    pol = RateLimitPolicy("t_redis_roto", 2, 60, "limite")
+    reloj = _Reloj()
+    roto = _RedisRoto()
+    check_rate_limit(pol, "ip", redis_client_getter=lambda: roto, clock=reloj)
+    check_rate_limit(pol, "ip", redis_client_getter=lambda: roto, clock=reloj)
+    with pytest.raises(HTTPException):
+        check_rate_limit(pol, "ip", redis_client_getter=lambda: roto, clock=reloj)
+    m = prl.rate_limit_metrics_snapshot()["politicas"]["t_redis_roto"]
+    assert m["redis_error"] == 3 and m["memoria"] == 3
+
+
+def test_redis_script_atomico():
+    pol = RateLimitPolicy("t_redis", 2, 60, "limite")
+    falso = _RedisFalso()
+    check_rate_limit(pol, "ip", redis_client_getter=lambda: falso)
+    check_rate_limit(pol, "ip", redis_client_getter=lambda: falso)
+    with pytest.raises(HTTPException) as exc:
+        check_rate_limit(pol, "ip", redis_client_getter=lambda: falso)
+    assert exc.value.headers["Retry-After"] == "2"
+    assert falso.llamadas[0] == (["rate_limit:gcra:t_redis:ip"], ["30.0", "60"])
+    assert prl.rate_limit_metrics_snapshot()["politicas"]["t_redis"]["redis"] == 3
+
+
+def test_politicas_historicas_en_un_solo_lugar():
+    from app.core import cobros_public_rate_limit as rl
+
+    assert rl.FINIQUITO_VERIFICAR_CODIGO_MAX == prl.POLICIES["finiquito_verificar"].max_requests == 15
+    assert rl.ENVIAR_REPORTE_WINDOW_SEC == 3600
+    assert {"validar_cedula", "ec_solicitar", "finiquito_registro", "cobros_escaner"} <= set(prl.POLICIES)
@@ -0,0 +1,121 @@
+"""Sesiones de lectura: réplica dentro del presupuesto de retraso, fallback al primario y rechazo de escrituras."""
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+
+from app.core import database
+from app.core.config import settings
+from app.models.configuracion import Configuracion
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    eng = create_engine(url)
+    Configuracion.__table__.create(eng)
+    with eng.begin() as conn:
+        conn.execute(insert(Configuracion.__table__).values(clave="origen", valor="replica"))
+    eng.dispose()
+
+    mediciones = []
+    retraso = {"seg": 0.0}
+
+    def _medir(conn):
+        mediciones.append(1)
+        return retraso["seg"]
+
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URL", url, raising=False)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_MAX_LAG_SEG", 30.0, raising=False)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_CHECK_SEG", 60.0, raising=False)
+    monkeypatch.setattr(database, "_motor_replica", None)
+    monkeypatch.setattr(
+        database,
+        "_estado_replica",
+        {"verificado": None, "usable": False, "retraso_seg": None, "error": None, "midiendo": False},
+    )
+    monkeypatch.setattr(database, "_medir_retraso_replica", _medir)
+    yield retraso, mediciones
+    if database._motor_replica is not None:
+        database._motor_replica.dispose()
+
+
+def test_lee_de_la_replica_y_reutiliza_la_medicion(replica):
+    _, mediciones = replica
+    for _ in range(3):
+        with database.ReadSessionLocal() as s:
+            assert s.get_bind() is database.motor_replica()
+            assert s.execute(select(Configuracion.valor).where(Configuracion.clave == "origen")).scalar() == "replica"
+    assert len(mediciones) == 1
+    assert database.estado_replica(forzar=True)["usable"] is True
+    assert len(mediciones) == 2
+
+
+def test_retraso_sobre_el_presupuesto_usa_el_primario(replica):
+    retraso, _ = replica
+    retraso["seg"] = 120.0
+    with database.ReadSessionLocal() as s:
+        assert s.get_bind() is database.engine
+    # Un export que tolera más retraso sigue en la réplica.
+    with database.ReadSessionLocal(retraso_max_seg=300) as s:
+        assert s.get_bind() is database.motor_replica()
+
+
+def test_medicion_unica_fuera_del_lock_y_los_demas_usan_el_ultimo_estado(replica, monkeypatch):
+    _, mediciones = replica
+    en_medicion, liberar = threading.Event(), threading.Event()
+
+    def _medir_lento(conn):
+        mediciones.append(1)
+        en_medicion.set()
+        liberar.wait(5)
+        return 0.0
+
+    monkeypatch.setattr(database, "_medir_retraso_replica", _medir_lento)
+    sondeo = threading.Thread(target=database.estado_replica)
+    sondeo.start()
+    assert en_medicion.wait(5)
+    # Réplica lenta/caída: otro request no espera la medición en curso y va al primario.
+    with database.ReadSessionLocal() as s:
+        assert s.get_bind() is database.engine
+    assert database.estado_replica(forzar=True)["usable"] is False
+    liberar.set()
+    sondeo.join(5)
+    assert len(mediciones) == 1
+    with database.ReadSessionLocal() as s:
+        assert s.get_bind() is database.motor_replica()
+
+
+def test_replica_caida_usa_el_primario(replica, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URL", f"sqlite:///{tmp_path / 'no' / 'existe.db'}", raising=False)
+    monkeypatch.setattr(database, "_motor_replica", None)
+    with database.ReadSessionLocal() as s:
+        assert s.get_bind() is database.engine
+    est = database.estado_replica()
+    assert est["configurada"] is True and est["usable"] is False and est["error"]
+
+
+def test_sin_replica_configurada_usa_el_primario(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URL", None, raising=False)
+    with database.ReadSessionLocal() as s:
+        assert s.get_bind() is database.engine
+    assert database.estado_replica()["configurada"] is False
+
+
+def test_sesion_de_lectura_rechaza_escrituras(replica):
+    with database.ReadSessionLocal() as s:
+        s.add(Configuracion(clave="nueva", valor="x"))
+        with pytest.raises(database.EscrituraEnSesionLectura):
+            s.flush()
+        s.rollback()
+        with pytest.raises(database.EscrituraEnSesionLectura):
+            s.execute(insert(Configuracion.__table__).values(clave="nueva", valor="x"))
+        assert s.execute(text("SELECT COUNT(*) FROM configuracion")).scalar() == 1
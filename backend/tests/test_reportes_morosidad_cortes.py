@@ -0,0 +1,153 @@
+"""Reportes de pago vencido (/morosidad, /por-mes, /por-rangos) en una consulta: umbral y paridad (SQLite)."""
+import calendar
+import os
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints.reportes import reportes_morosidad as rm
+from app.models.cuota import Cuota
+
+
+def _pg_moroso(fv: date, fc: date) -> bool:
+    """fv + INTERVAL '4 months 1 day' <= fc con el recorte a fin de mes de PostgreSQL."""
+    ano, mes = fv.year, fv.month + 4
+    if mes > 12:
+        mes -= 12
+        ano += 1
+    d = date(ano, mes, min(fv.day, calendar.monthrange(ano, mes)[1]))
+    return d + timedelta(days=1) <= fc
+
+
+def test_umbral_reproduce_intervalo_postgres():
+    fc = date(2024, 1, 1)
+    while fc <= date(2026, 12, 31):
+        umbral = rm._umbral_vencimiento_moroso(fc)
+        for delta in range(-40, 41):
+            fv = umbral + timedelta(days=delta)
+            assert _pg_moroso(fv, fc) == (fv <= umbral), (fc, fv)
+        fc += timedelta(days=1)
+
+
+@pytest.fixture
+def db():
+    eng = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE clientes (id INTEGER PRIMARY KEY, estado VARCHAR(20))"))
+        conn.execute(
+            text(
+                "CREATE TABLE prestamos (id INTEGER PRIMARY KEY, cliente_id INTEGER, cedula VARCHAR(20), "
+                "nombres VARCHAR(100), estado VARCHAR(20), analista VARCHAR(50), concesionario VARCHAR(50), "
+                "total_financiamiento NUMERIC(14, 2))"
+            )
+        )
+        conn.execute(text("INSERT INTO clientes (id, estado) VALUES (1, 'ACTIVO'), (2, 'ACTIVO'), (3, 'INACTIVO')"))
+        conn.execute(
+            text(
+                "INSERT INTO prestamos VALUES "
+                "(10, 1, 'V1', 'Ana', 'APROBADO', 'Luis', 'C1', 1000), "
+                "(11, 1, 'V1', 'Ana B', 'APROBADO', 'Luis', 'C1', 500), "
+                "(20, 2, 'V2', 'Beto', 'APROBADO', 'Marta', 'C2', 800), "
+                "(21, 2, '', 'Beto', 'APROBADO', NULL, 'C2', 300), "
+                "(30, 3, 'V3', 'Caro', 'APROBADO', 'Luis', 'C3', 900), "
+                "(40, 1, 'V1', 'Ana', 'LIQUIDADO', 'Luis', 'C1', 700)"
+            )
+        )
+    Cuota.__table__.create(eng)
+    s = sessionmaker(bind=eng)()
+    cuotas = [
+        # (prestamo, vencimiento, monto, fecha_pago, total_pagado)
+        (10, date(2025, 9, 30), "100", None, "0"),
+        (10, date(2025, 10, 31), "100", None, "0"),
+        (10, date(2025, 11, 30), "100", None, "0"),
+        (10, date(2025, 8, 31), "100", date(2025, 9, 5), "100"),
+        (11, date(2025, 10, 28), "50", None, "10"),
+        (20, date(2025, 8, 15), "80", None, "0"),
+        (20, date(2026, 4, 15), "80", None, "0"),
+        (21, date(2025, 7, 1), "30", None, "0"),
+        (30, date(2025, 1, 1), "90", None, "0"),
+        (40, date(2025, 1, 1), "70", None, "0"),
+    ]
+    for i, (pid, fv, monto, fp, tp) in enumerate(cuotas, start=1):
+        s.add(
+            Cuota(
+                prestamo_id=pid,
+                numero_cuota=i,
+                fecha_vencimiento=fv,
+                fecha_pago=fp,
+                monto=Decimal(monto),
+                saldo_capital_inicial=Decimal("0"),
+                saldo_capital_final=Decimal("0"),
+                total_pagado=Decimal(tp),
+                estado="PENDIENTE",
+            )
+        )
+    s.commit()
+    yield s
+    s.close()
+
+
+def test_por_mes_una_consulta_y_cortes_no_consecutivos(db):
+    sentencias = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a, **k: sentencias.append(a[2]))
+    out = rm.get_morosidad_por_mes(db=db, meses=12, anos="2026", meses_list="1,3")
+    assert len(sentencias) == 1
+
+    marzo, enero = out["meses"]
+    assert (marzo["mes"], enero["mes"]) == (3, 1)
+    # 31/03/2026: umbral 30/11/2025 -> p10 (3 cuotas), p11, p20 (1), p21 (sin cedula).
+    assert marzo["total_prestamos_mora"] == 4
+    assert marzo["total_clientes_mora"] == 2
+    assert marzo["monto_total_mora"] == pytest.approx(460.0)
+    dias = [182, 151, 121, 154, 228, 273]
+    assert marzo["promedio_dias_mora"] == round(sum(dias) / len(dias), 1)
+    assert [c["cedula"] for c in marzo["morosidad_por_cedula"]] == ["V1", "V2"]
+    v1 = marzo["morosidad_por_cedula"][0]
+    assert v1["nombres"] == "Ana"
+    assert v1["cantidad_prestamos"] == 2
+    assert v1["monto_total_mora"] == 350.0
+    assert v1["promedio_dias_mora"] == round((182 + 151 + 121 + 154) / 4, 1)
+
+    # 31/01/2026: umbral 30/09/2025 -> p10 (30/09), p20, p21.
+    assert enero["total_prestamos_mora"] == 3
+    assert enero["monto_total_mora"] == pytest.approx(210.0)
+
+
+def test_por_rangos_y_reporte_por_prestamo(db):
+    rangos = rm.get_morosidad_por_rangos(db=db, fecha_corte="2026-03-31")["rangos"]
+    assert [k for k in rangos] == [r["key"] for r in rm.RANGOS_ATRASO]
+    items = rangos["4_meses"]["items"]
+    assert [i["prestamo_id"] for i in items] == [10, 11, 20, 21]
+    p10 = items[0]
+    assert p10["dias_atraso"] == 182
+    assert p10["saldo"] == 300.0
+    assert p10["pagos_totales"] == 100.0
+    assert p10["ultimo_pago_fecha"] == "2025-09-05"
+    assert p10["proximo_pago_fecha"] == "2025-09-30"
+    p20 = items[2]
+    assert p20["saldo"] == 160.0
+    assert p20["ultimo_pago_fecha"] is None
+
+    rep = rm.get_reporte_morosidad(db=db, fecha_corte="2026-03-31")
+    assert rep["total_prestamos_mora"] == 4
+    assert rep["monto_total_mora"] == pytest.approx(460.0)
+    analistas = {a["analista"]: a for a in rep["morosidad_por_analista"]}
+    assert set(analistas) == {"Luis", "Marta"}
+    assert analistas["Luis"]["cantidad_prestamos"] == 2
+    assert analistas["Luis"]["cantidad_clientes"] == 1
+    assert analistas["Luis"]["monto_total_mora"] == pytest.approx(350.0)
+    det20 = next(d for d in rep["detalle_prestamos"] if d["prestamo_id"] == 20)
+    # Detalle: cuotas impagas con vencimiento < corte (la del 15/04/2026 queda fuera).
+    assert det20["cuotas_en_mora"] == 1
+    assert det20["primera_cuota_vencida"] == "2025-08-15"
+    assert det20["max_dias_mora"] == 228
@@ -0,0 +1,144 @@
+"""Scheduler: executors por clase de recurso, exclusión entre jobs y historial scheduler_job_runs."""
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from apscheduler.events import EVENT_JOB_MISSED
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.core.scheduler as sched_mod
+from app.core.config import settings
+from app.models.scheduler_job_run import SchedulerJobRun
+from app.services import scheduler_job_runs as runs
+
+
+@pytest.fixture
+def Session(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SchedulerJobRun.__table__.create(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(runs, "SessionLocal", factory)
+    return factory
+
+
+def _filas(Session):
+    with Session() as db:
+        return db.execute(select(SchedulerJobRun).order_by(SchedulerJobRun.id)).scalars().all()
+
+
+def test_jobs_con_mismo_recurso_no_se_solapan_y_quedan_en_historial(Session, monkeypatch):
+    monkeypatch.setitem(sched_mod.JOB_PERFILES, "t_a", sched_mod.PerfilJob(sched_mod.CLASE_DB, ("cuotas",)))
+    monkeypatch.setitem(sched_mod.JOB_PERFILES, "t_b", sched_mod.PerfilJob(sched_mod.CLASE_DB, ("cuotas", "drive")))
+    activos, maximo = [0], [0]
+    guard = threading.Lock()
+
+    def _cuerpo():
+        with guard:
+            activos[0] += 1
+            maximo[0] = max(maximo[0], activos[0])
+        time.sleep(0.15)
+        with guard:
+            activos[0] -= 1
+        sched_mod._reportar_job(filas=3)
+
+    hilos = [threading.Thread(target=sched_mod._wrap_job_with_timing(j, _cuerpo)) for j in ("t_a", "t_b")]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert maximo[0] == 1
+    filas = _filas(Session)
+    assert sorted(f.job_id for f in filas) == ["t_a", "t_b"]
+    assert {f.resultado for f in filas} == {"ok"}
+    assert {f.filas for f in filas} == {3}
+    assert max(f.espera_exclusion_ms for f in filas) >= 100
+    assert all(f.clase == "db" and f.duracion_ms >= 150 for f in filas)
+
+
+def test_recurso_ocupado_sin_espera_omite_y_error_capturado_se_registra(Session, monkeypatch):
+    monkeypatch.setitem(
+        sched_mod.JOB_PERFILES, "t_intervalo", sched_mod.PerfilJob(sched_mod.CLASE_DB, ("cuotas",), espera_max_seg=0)
+    )
+    monkeypatch.setitem(sched_mod.JOB_PERFILES, "t_largo", sched_mod.PerfilJob(sched_mod.CLASE_DB, ("cuotas",)))
+    corriendo = threading.Event()
+    soltar = threading.Event()
+
+    def _largo():
+        corriendo.set()
+        soltar.wait(5)
+
+    h = threading.Thread(target=sched_mod._wrap_job_with_timing("t_largo", _largo))
+    h.start()
+    corriendo.wait(5)
+    llamado = []
+    sched_mod._wrap_job_with_timing("t_intervalo", lambda: llamado.append(1))()
+    soltar.set()
+    h.join()
+
+    def _falla_capturada():
+        try:
+            raise RuntimeError("sheets caido")
+        except Exception as e:
+            sched_mod._reportar_job(error=e)
+
+    sched_mod._wrap_job_with_timing("t_intervalo", _falla_capturada)()
+
+    assert llamado == []
+    por_resultado = [(f.job_id, f.resultado) for f in _filas(Session)]
+    assert por_resultado == [
+        ("t_intervalo", "omitido_exclusion"),
+        ("t_largo", "ok"),
+        ("t_intervalo", "error"),
+    ]
+    assert _filas(Session)[-1].error == "RuntimeError: sheets caido"
+
+
+def test_misfire_y_retraso_en_historial_y_resumen(Session):
+    programado = datetime.now(timezone.utc) - timedelta(minutes=5)
+    sched_mod._on_evento_scheduler(
+        SimpleNamespace(code=EVENT_JOB_MISSED, job_id="auditoria_cartera_prestamos_0300", scheduled_run_time=programado)
+    )
+    runs.registrar_job_run(
+        "auditoria_cartera_prestamos_0300",
+        runs.RESULTADO_OK,
+        clase="db",
+        programado_para=programado,
+        inicio=programado + timedelta(seconds=90),
+        fin=programado + timedelta(seconds=150),
+        filas=40,
+    )
+    with Session() as db:
+        res = runs.resumen_job_runs(db, horas=1)
+    (job,) = res["jobs"]
+    assert (job["corridas"], job["ok"], job["misfires"], job["filas_total"]) == (2, 1, 1, 40)
+    assert job["duracion_ms_total"] == 60_000
+    assert job["retraso_ms_max"] >= 300_000  # el misfire se registra con el retraso hasta su descarte
+    assert res["corridas"][0]["resultado"] in ("ok", "misfire")
+
+
+def test_start_scheduler_asigna_executor_por_clase(monkeypatch):
+    monkeypatch.setattr(settings, "PAGOS_GMAIL_SCHEDULED_SCAN_ENABLED", True, raising=False)
+    sched_mod.stop_scheduler()
+    try:
+        sched_mod.start_scheduler()
+        jobs = sched_mod._scheduler.get_jobs()
+        assert jobs
+        for j in jobs:
+            assert j.executor == sched_mod.perfil_job(j.id).clase, j.id
+        assert set(sched_mod._scheduler._executors) >= {"db", "externo", "ligero"}
+        assert sched_mod._scheduler.get_job(sched_mod.PAGOS_GMAIL_PENDING_SCAN_JOB_ID).executor == "externo"
+        assert sched_mod._scheduler.get_job("auditoria_cartera_prestamos_0300").executor == "db"
+    finally:
+        sched_mod.stop_scheduler()
@@ -0,0 +1,106 @@
+"""Perfilador SQL por request/job: normalización, conteo, sospecha de N+1, agregado y cabecera en DEBUG."""
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-32-chars-123456")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import sql_profiler as sp
+from app.core.config import settings
+from app.middleware.security_headers import RequestIdMiddleware
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(settings, "SQL_PROFILER_ENABLED", True)
+    monkeypatch.setattr(settings, "SQL_PROFILER_N1_UMBRAL", 5)
+    eng = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    sp.instalar_sql_profiler(eng)
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)"))
+        conn.execute(text("INSERT INTO t (id, v) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    sp.sql_profiler_reset()
+    yield eng
+    sp.sql_profiler_reset()
+
+
+def test_normalizar_sql_agrupa_literales_parametros_y_listas():
+    n = sp.normalizar_sql
+    assert n("SELECT * FROM t WHERE id = 1") == n("SELECT  *\nFROM t WHERE id = 42")
+    assert n("SELECT * FROM t WHERE v = 'x'") == "SELECT * FROM t WHERE v = ?"
+    assert n("SELECT * FROM t WHERE id = %(id_1)s") == "SELECT * FROM t WHERE id = ?"
+    assert n("SELECT * FROM t WHERE id IN (?, ?, ?)") == n("SELECT * FROM t WHERE id IN (%(p_1)s, %(p_2)s)")
+    # Casts PG y nombres con dígitos no se tocan.
+    assert n("SELECT x::date FROM t1 WHERE c_2 = :p") == "SELECT x::date FROM t1 WHERE c_2 = ?"
+
+
+def test_perfil_cuenta_sentencias_y_marca_n_mas_1(engine):
+    with sp.perfil_sql("job", "job_prueba") as perfil:
+        with engine.connect() as conn:
+            for i in range(1, 4):
+                conn.execute(text("SELECT v FROM t WHERE id = :i"), {"i": i})
+            for i in range(6):
+                conn.execute(text(f"SELECT COUNT(*) FROM t WHERE id > {i}"))
+    assert perfil.sentencias == 9
+    sospechas = perfil.sospechas_n_mas_1()
+    assert [s["veces"] for s in sospechas] == [6]
+    assert sospechas[0]["sql"] == "SELECT COUNT(*) FROM t WHERE id > ?"
+
+    # Fuera de un perfil no se cuenta nada.
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert perfil.sentencias == 9
+
+    snap = sp.sql_profiler_snapshot()
+    assert snap["etiquetas"] == 1
+    fila = snap["perfiles"][0]
+    assert (fila["ambito"], fila["etiqueta"], fila["ejecuciones"], fila["sentencias_max"]) == ("job", "job_prueba", 1, 9)
+    assert fila["ejecuciones_con_n_mas_1"] == 1
+    assert fila["repetidas"][0] == {"sql": "SELECT COUNT(*) FROM t WHERE id > ?", "veces_max": 6}
+    assert snap["recientes_n_mas_1"][0]["etiqueta"] == "job_prueba"
+
+
+def test_perfilador_apagado_no_abre_perfil(engine, monkeypatch):
+    monkeypatch.setattr(settings, "SQL_PROFILER_ENABLED", False)
+    with sp.perfil_sql("job", "apagado") as perfil:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert perfil is None
+    assert sp.sql_profiler_snapshot()["etiquetas"] == 0
+
+
+def test_middleware_etiqueta_por_plantilla_y_cabecera_debug(engine, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", True)
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/items/{item_id}")
+    def _item(item_id: int):
+        with engine.connect() as conn:
+            for _ in range(item_id):
+                conn.execute(text("SELECT v FROM t WHERE id = :i"), {"i": 1})
+        return {"ok": True}
+
+    client = TestClient(app)
+    r1 = client.get("/items/2")
+    r2 = client.get("/items/7")
+    assert r1.status_code == r2.status_code == 200
+    assert r1.headers["X-SQL-Stats"].startswith("sentencias=2;")
+    assert "n_mas_1=1" in r2.headers["X-SQL-Stats"]
+
+    fila = sp.sql_profiler_snapshot()["perfiles"][0]
+    assert fila["etiqueta"] == "GET /items/{item_id}"
+    assert (fila["ejecuciones"], fila["sentencias_total"], fila["sentencias_max"]) == (2, 9, 7)
+    reciente = sp.sql_profiler_snapshot()["recientes_n_mas_1"][0]
+    assert reciente["request_id"] == r2.headers["X-Request-ID"]
+
+    monkeypatch.setattr(settings, "DEBUG", False)
+    assert "X-SQL-Stats" not in client.get("/items/1").headers
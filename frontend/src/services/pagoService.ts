@@ -707,11 +707,23 @@ class PagoService {
 
     mensaje: string
   }> {
-    return await apiClient.post(
+    // El backend responde con un job (tramos con commit propio); se consulta hasta que termine.
+    let job: any = await apiClient.post(
       `${this.baseUrl}/importar-desde-cobros`,
       undefined,
-      { timeout: 120000 }
+      { timeout: 30000 }
     )
+    while (job?.job_id && job.en_curso) {
+      await new Promise(r => setTimeout(r, 2000))
+      job = await apiClient.get(
+        `${this.baseUrl}/importar-desde-cobros/jobs/${job.job_id}`,
+        { timeout: 30000 }
+      )
+    }
+    if (job?.job_id && job.estado !== 'completado') {
+      throw new Error(job.mensaje || 'La importación desde Cobros no terminó')
+    }
+    return job
   }
 
   /**